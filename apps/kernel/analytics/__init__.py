@@ -20,6 +20,7 @@ from .models import (
     UserMetrics,
     UserRole,
 )
+from .rollups import AnalyticsRollups, HyperLogLog
 from .user_analytics import (
     InMemoryStorage,
     UserAnalyticsService,
@@ -41,6 +42,9 @@ __all__ = [
     # Services
     "UserAnalyticsService",
     "InMemoryStorage",
+    # Rollups
+    "AnalyticsRollups",
+    "HyperLogLog",
 ]
 
 __version__ = "1.0.0"
@@ -0,0 +1,431 @@
+"""
+تجميعات التحليلات - SAHOOL Analytics Rollups
+=============================================
+طبقة تجميع يومية تُحدّث مع كل حدث بدلاً من مسح الأحداث الخام
+
+Daily aggregation layer updated on every tracked event:
+- Per-day user bitmaps for exact DAU/WAU/MAU and retention cohorts
+- Per-day HyperLogLog sketches per dimension (governorate, crop, feature)
+- Pre-aggregated event counters
+
+Dashboard queries merge a handful of per-day structures instead of
+scanning raw events, so their cost depends on the number of days in
+the range, not on event volume. Rollups are day-granular (UTC dates).
+"""
+
+import hashlib
+import math
+from collections import Counter, defaultdict
+from collections.abc import Iterable
+from datetime import date, timedelta
+from typing import Any
+
+from .models import AnalyticsEvent, EventType
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# ============== الثوابت - Constants ==============
+
+# دقة HyperLogLog: 2^12 سجل ≈ 1.6% خطأ معياري
+# HyperLogLog precision: 2^12 registers ≈ 1.6% standard error
+HLL_PRECISION = 12
+
+# الأبعاد المدعومة - Supported dimensions
+DIMENSION_GOVERNORATE = "governorate"
+DIMENSION_CROP = "crop"
+DIMENSION_FEATURE = "feature"
+DIMENSION_GOVERNORATE_FIELDS = "governorate_fields"
+
+# جدول 2^-r لحساب التقدير - 2^-rank lookup for the estimator
+_INVERSE_POWERS = [2.0**-rank for rank in range(65)]
+
+
+def _hash64(value: str) -> int:
+    """تجزئة 64 بت ثابتة - Stable 64-bit hash"""
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+# ============== HyperLogLog ==============
+
+
+class HyperLogLog:
+    """
+    مخطط HyperLogLog لتقدير عدد العناصر الفريدة
+    HyperLogLog sketch for distinct counts
+
+    يبدأ بتمثيل متفرق (قاموس) ويتحول إلى مصفوفة كثيفة عند الامتلاء،
+    لأن معظم المخططات اليومية لكل بُعد صغيرة.
+
+    Starts sparse (a dict of touched registers) and switches to a dense
+    bytearray once it fills up, since most per-day dimension sketches are small.
+    """
+
+    __slots__ = ("precision", "_sparse", "_dense")
+
+    def __init__(self, precision: int = HLL_PRECISION):
+        self.precision = precision
+        self._sparse: dict[int, int] | None = {}
+        self._dense: bytearray | None = None
+
+    @property
+    def m(self) -> int:
+        return 1 << self.precision
+
+    @staticmethod
+    def position(hash_value: int, precision: int = HLL_PRECISION) -> tuple[int, int]:
+        """
+        السجل والرتبة لقيمة تجزئة
+        Register index and rank for a 64-bit hash
+        """
+        width = 64 - precision
+        remainder = hash_value & ((1 << width) - 1)
+        return hash_value >> width, width - remainder.bit_length() + 1
+
+    def add(self, value: str) -> None:
+        """إضافة قيمة - Add a value"""
+        self.add_position(*self.position(_hash64(value), self.precision))
+
+    def add_position(self, index: int, rank: int) -> None:
+        """إضافة موضع محسوب مسبقاً - Add a precomputed (index, rank)"""
+        if self._dense is not None:
+            if self._dense[index] < rank:
+                self._dense[index] = rank
+            return
+
+        if self._sparse.get(index, 0) < rank:
+            self._sparse[index] = rank
+            if len(self._sparse) > self.m // 8:
+                self._densify()
+
+    def _densify(self) -> None:
+        dense = bytearray(self.m)
+        for index, rank in self._sparse.items():
+            dense[index] = rank
+        self._dense = dense
+        self._sparse = None
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        """
+        دمج مخطط آخر في هذا المخطط
+        Merge another sketch into this one (register-wise max)
+        """
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision")
+
+        if other._dense is None:
+            for index, rank in other._sparse.items():
+                self.add_position(index, rank)
+            return self
+
+        if self._dense is None:
+            self._densify()
+        if NUMPY_AVAILABLE:
+            registers = np.frombuffer(self._dense, dtype=np.uint8)
+            np.maximum(registers, np.frombuffer(other._dense, dtype=np.uint8), out=registers)
+        else:
+            self._dense = bytearray(map(max, self._dense, other._dense))
+        return self
+
+    def copy(self) -> "HyperLogLog":
+        clone = HyperLogLog(self.precision)
+        clone._sparse = dict(self._sparse) if self._sparse is not None else None
+        clone._dense = bytearray(self._dense) if self._dense is not None else None
+        return clone
+
+    def count(self) -> int:
+        """
+        تقدير عدد العناصر الفريدة
+        Estimated distinct count
+        """
+        m = self.m
+        if self._dense is None:
+            zeros = m - len(self._sparse)
+            inverse_sum = zeros + sum(map(_INVERSE_POWERS.__getitem__, self._sparse.values()))
+        else:
+            zeros = self._dense.count(0)
+            inverse_sum = sum(map(_INVERSE_POWERS.__getitem__, self._dense))
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / inverse_sum
+
+        # تصحيح النطاق الصغير - Small-range (linear counting) correction
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return round(estimate)
+
+    def __len__(self) -> int:
+        return self.count()
+
+
+# ============== التجميع اليومي - Daily Rollup ==============
+
+
+class _UserIds:
+    """
+    ترقيم كثيف للمستخدمين لاستخدامه في الخرائط النقطية
+    Dense user numbering for bitmaps, with cached HLL positions
+    """
+
+    def __init__(self, precision: int):
+        self.precision = precision
+        self._ids: dict[str, tuple[int, int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def lookup(self, user_id: str) -> tuple[int, int, int]:
+        """(bit, hll_index, hll_rank) للمستخدم - Bit number and HLL position"""
+        entry = self._ids.get(user_id)
+        if entry is None:
+            index, rank = HyperLogLog.position(_hash64(user_id), self.precision)
+            entry = (len(self._ids), index, rank)
+            self._ids[user_id] = entry
+        return entry
+
+
+def _set_bit(bitmap: bytearray, bit: int) -> None:
+    byte = bit >> 3
+    if byte >= len(bitmap):
+        bitmap.extend(bytes(max(byte + 1 - len(bitmap), len(bitmap))))
+    bitmap[byte] |= 1 << (bit & 7)
+
+
+def _as_int(bitmap: bytearray) -> int:
+    return int.from_bytes(bitmap, "little")
+
+
+class _DayRollup:
+    """تجميعات يوم واحد - Aggregates for a single day"""
+
+    __slots__ = ("users", "logins", "sketches", "counters", "feature_user_uses")
+
+    def __init__(self):
+        self.users = bytearray()
+        self.logins = bytearray()
+        self.sketches: dict[tuple[str, str], HyperLogLog] = {}
+        self.counters: Counter = Counter()
+        self.feature_user_uses: dict[str, Counter] = defaultdict(Counter)
+
+
+# ============== طبقة التجميع - Rollup Layer ==============
+
+
+class AnalyticsRollups:
+    """
+    طبقة التجميع اليومية للتحليلات
+    Daily analytics rollups
+
+    تُحدَّث من UserAnalyticsService.track_event وتجيب عن استعلامات
+    لوحات المعلومات بدمج التجميعات اليومية.
+
+    Updated from UserAnalyticsService.track_event; answers dashboard
+    queries by merging per-day aggregates.
+    """
+
+    def __init__(self, precision: int = HLL_PRECISION):
+        """
+        Args:
+            precision: دقة HyperLogLog - HyperLogLog precision (registers = 2^precision)
+        """
+        self.precision = precision
+        self._users = _UserIds(precision)
+        self._days: dict[date, _DayRollup] = {}
+
+    def __len__(self) -> int:
+        return len(self._days)
+
+    # ============== التحديث - Updates ==============
+
+    def add(self, event: AnalyticsEvent) -> None:
+        """
+        إضافة حدث إلى التجميعات
+        Add an event to the rollups
+        """
+        self.record(
+            day=event.timestamp.date(),
+            user_id=event.user_id,
+            event_type=event.event_type,
+            governorate=event.governorate.value if event.governorate else None,
+            crop_type=event.crop_type,
+            feature=event.metadata.get("feature"),
+            field_id=event.field_id,
+        )
+
+    def add_many(self, events: Iterable[AnalyticsEvent]) -> int:
+        """
+        إضافة عدة أحداث (لإعادة بناء التجميعات من التخزين)
+        Add many events (to rebuild rollups from storage)
+        """
+        count = 0
+        for event in events:
+            self.add(event)
+            count += 1
+        return count
+
+    def record(
+        self,
+        day: date,
+        user_id: str,
+        event_type: EventType,
+        governorate: str | None = None,
+        crop_type: str | None = None,
+        feature: str | None = None,
+        field_id: str | None = None,
+    ) -> None:
+        """
+        تسجيل حدث بحقوله الأساسية فقط
+        Record an event from its raw fields
+        """
+        rollup = self._days.get(day)
+        if rollup is None:
+            rollup = self._days[day] = _DayRollup()
+
+        bit, index, rank = self._users.lookup(user_id)
+        _set_bit(rollup.users, bit)
+        if event_type == EventType.LOGIN:
+            _set_bit(rollup.logins, bit)
+
+        rollup.counters[("event", event_type.value)] += 1
+
+        if governorate:
+            self._sketch(rollup, DIMENSION_GOVERNORATE, governorate).add_position(index, rank)
+            if field_id:
+                self._sketch(rollup, DIMENSION_GOVERNORATE_FIELDS, governorate).add(field_id)
+        if crop_type:
+            self._sketch(rollup, DIMENSION_CROP, crop_type).add_position(index, rank)
+            if event_type == EventType.CROP_PLANTED:
+                rollup.counters[("crop_planted", governorate, crop_type)] += 1
+        if feature:
+            self._sketch(rollup, DIMENSION_FEATURE, feature).add_position(index, rank)
+            rollup.counters[("feature", feature)] += 1
+            rollup.feature_user_uses[feature][bit] += 1
+
+    def _sketch(self, rollup: _DayRollup, dimension: str, value: str) -> HyperLogLog:
+        sketch = rollup.sketches.get((dimension, value))
+        if sketch is None:
+            sketch = rollup.sketches[(dimension, value)] = HyperLogLog(self.precision)
+        return sketch
+
+    # ============== الاستعلامات - Queries ==============
+
+    def _range(self, start: date, end: date) -> list[_DayRollup]:
+        """التجميعات اليومية بين تاريخين (شاملة) - Day rollups in [start, end]"""
+        days = []
+        day = start
+        while day <= end:
+            rollup = self._days.get(day)
+            if rollup is not None:
+                days.append(rollup)
+            day += timedelta(days=1)
+        return days
+
+    def active_users(self, start: date, end: date) -> int:
+        """
+        عدد المستخدمين النشطين (دقيق) بين تاريخين
+        Exact active users between two dates (inclusive)
+        """
+        merged = 0
+        for rollup in self._range(start, end):
+            merged |= _as_int(rollup.users)
+        return merged.bit_count()
+
+    def retention(self, cohort_start: date, cohort_days: int, offsets: Iterable[int]) -> dict:
+        """
+        الاحتفاظ الدقيق لفوج المستخدمين الذين سجلوا الدخول في نافذة الفوج
+        Exact retention of users who logged in during the cohort window
+
+        Returns:
+            {"total_users": int, "retention": {offset: rate}}
+        """
+        cohort = 0
+        for rollup in self._range(cohort_start, cohort_start + timedelta(days=cohort_days - 1)):
+            cohort |= _as_int(rollup.logins)
+        total = cohort.bit_count()
+
+        retention = {}
+        for offset in offsets:
+            rollup = self._days.get(cohort_start + timedelta(days=offset))
+            active = _as_int(rollup.users) & cohort if rollup is not None and total else 0
+            retention[offset] = active.bit_count() / total if total else 0.0
+        return {"total_users": total, "retention": retention}
+
+    def distinct(self, dimension: str, value: str, start: date, end: date) -> int:
+        """
+        عدد القيم الفريدة لبُعد معين (تقديري)
+        Estimated distinct users (or fields) for one dimension value
+        """
+        merged = HyperLogLog(self.precision)
+        for rollup in self._range(start, end):
+            sketch = rollup.sketches.get((dimension, value))
+            if sketch is not None:
+                merged.merge(sketch)
+        return merged.count()
+
+    def distinct_by(self, dimension: str, start: date, end: date) -> dict[str, int]:
+        """
+        عدد القيم الفريدة لكل قيمة في البُعد
+        Estimated distinct counts for every value of a dimension
+        """
+        merged: dict[str, HyperLogLog] = {}
+        for rollup in self._range(start, end):
+            for (dim, value), sketch in rollup.sketches.items():
+                if dim != dimension:
+                    continue
+                if value in merged:
+                    merged[value].merge(sketch)
+                else:
+                    merged[value] = sketch.copy()
+        return {value: sketch.count() for value, sketch in merged.items()}
+
+    def counter(self, key: tuple, start: date, end: date) -> int:
+        """مجموع عداد بين تاريخين - Sum of a counter over the range"""
+        return sum(rollup.counters.get(key, 0) for rollup in self._range(start, end))
+
+    def crop_plantings(
+        self, start: date, end: date, governorate: str | None = None
+    ) -> dict[str, int]:
+        """
+        عدد أحداث الزراعة لكل محصول
+        Crop planting counts by crop type
+        """
+        totals: Counter = Counter()
+        for rollup in self._range(start, end):
+            for key, count in rollup.counters.items():
+                if key[0] != "crop_planted":
+                    continue
+                if governorate is None or key[1] == governorate:
+                    totals[key[2]] += count
+        return dict(totals)
+
+    def feature_power_users(self, feature: str, start: date, end: date, min_uses: int) -> int:
+        """
+        عدد المستخدمين الذين استخدموا الميزة أكثر من الحد
+        Users who used a feature more than ``min_uses`` times in the range
+        """
+        uses: Counter = Counter()
+        for rollup in self._range(start, end):
+            per_user = rollup.feature_user_uses.get(feature)
+            if per_user:
+                uses.update(per_user)
+        return sum(1 for count in uses.values() if count > min_uses)
+
+    def get_stats(self) -> dict[str, Any]:
+        """إحصائيات التجميعات - Rollup statistics"""
+        return {
+            "days": len(self._days),
+            "users": len(self._users),
+            "sketches": sum(len(r.sketches) for r in self._days.values()),
+            "precision": self.precision,
+        }
+
+
+# ============== مصدّر الوحدة - Module Exports ==============
+
+__all__ = [
+    "AnalyticsRollups",
+    "HyperLogLog",
+]
@@ -7,7 +7,7 @@ Advanced user activity tracking and analytics system
 """
 
 import uuid
-from collections import Counter, defaultdict
+from collections import defaultdict
 from datetime import date, datetime, timedelta
 from typing import Any
 
@@ -20,6 +20,12 @@ from .models import (
     TimePeriod,
     UserMetrics,
 )
+from .rollups import (
+    DIMENSION_FEATURE,
+    DIMENSION_GOVERNORATE,
+    DIMENSION_GOVERNORATE_FIELDS,
+    AnalyticsRollups,
+)
 
 # ============== خدمة تحليلات المستخدمين - User Analytics Service ==============
 
@@ -46,7 +52,11 @@ class UserAnalyticsService:
     - Regional metrics
     """
 
-    def __init__(self, storage_backend: Any | None = None):
+    def __init__(
+        self,
+        storage_backend: Any | None = None,
+        rollups: AnalyticsRollups | None = None,
+    ):
         """
         تهيئة خدمة التحليلات
         Initialize analytics service
@@ -55,10 +65,22 @@ class UserAnalyticsService:
             storage_backend: نظام التخزين (اختياري) - Storage backend (optional)
                            يمكن استخدام قاعدة بيانات، Redis، أو ملفات JSON
                            Can use database, Redis, or JSON files
+            rollups: التجميعات اليومية (اختياري) - Daily rollups (optional)
+                    تُستخدم لاستعلامات لوحات المعلومات بدلاً من مسح الأحداث
+                    Used by dashboard queries instead of scanning raw events
+                    إذا مُرّر تخزين دون تجميعات تُبنى من أحداثه المخزنة
+                    Rebuilt from stored events when a storage backend is
+                    passed without rollups
         """
         self.storage = storage_backend or InMemoryStorage()
+        self.rollups = rollups or AnalyticsRollups()
         self.events: list[AnalyticsEvent] = []
 
+        # التجميعات في الذاكرة فقط: تُبنى من التخزين الدائم عند البدء
+        # Rollups live in memory: rebuild them from a persistent backend on start
+        if storage_backend is not None and rollups is None:
+            self.rebuild_rollups(datetime.min, datetime.max)
+
     # ============== تتبع الأحداث - Event Tracking ==============
 
     def track_event(
@@ -106,8 +128,25 @@ class UserAnalyticsService:
         self.storage.save_event(event)
         self.events.append(event)
 
+        # تحديث التجميعات - Update rollups
+        self.rollups.add(event)
+
         return event
 
+    def rebuild_rollups(self, start_date: datetime, end_date: datetime) -> int:
+        """
+        إعادة بناء التجميعات من الأحداث المخزنة
+        Rebuild rollups from stored events
+
+        يُستخدم عند تشغيل الخدمة مع تخزين يحتوي على أحداث سابقة
+        Use when starting the service on top of storage with existing history
+
+        Returns:
+            int: عدد الأحداث المضافة - Number of events added
+        """
+        self.rollups = AnalyticsRollups(self.rollups.precision)
+        return self.rollups.add_many(self.storage.get_events_in_range(start_date, end_date))
+
     def track_session(
         self, user_id: str, session_id: str, action: str = "start", **kwargs
     ) -> AnalyticsEvent:
@@ -305,9 +344,12 @@ class UserAnalyticsService:
             ...     days=90
             ... )
         """
-        # الحصول على مستخدمي الفوج - Get cohort users
-        cohort_users = self.storage.get_cohort_users(cohort_period)
-        total_users = len(cohort_users)
+        # فوج المستخدمين من الخرائط النقطية اليومية (شهر واحد)
+        # Cohort users from daily login bitmaps (one month)
+        cohort_stats = self.rollups.retention(
+            cohort_start=cohort_period, cohort_days=30, offsets=(1, 7, 30, 90)
+        )
+        total_users = cohort_stats["total_users"]
 
         if total_users == 0:
             return CohortAnalysis(
@@ -321,11 +363,11 @@ class UserAnalyticsService:
                 retention_day_90=0,
             )
 
-        # حساب معدلات الاحتفاظ - Calculate retention rates
-        retention_1 = self._calculate_retention_for_day(cohort_users, cohort_period, 1)
-        retention_7 = self._calculate_retention_for_day(cohort_users, cohort_period, 7)
-        retention_30 = self._calculate_retention_for_day(cohort_users, cohort_period, 30)
-        retention_90 = self._calculate_retention_for_day(cohort_users, cohort_period, 90)
+        # معدلات الاحتفاظ - Retention rates
+        retention_1 = cohort_stats["retention"][1]
+        retention_7 = cohort_stats["retention"][7]
+        retention_30 = cohort_stats["retention"][30]
+        retention_90 = cohort_stats["retention"][90]
 
         return CohortAnalysis(
             cohort_id=cohort,
@@ -338,27 +380,6 @@ class UserAnalyticsService:
             retention_day_90=retention_90,
         )
 
-    def _calculate_retention_for_day(self, users: list[str], start_date: date, day: int) -> float:
-        """
-        حساب معدل الاحتفاظ ليوم محدد
-        Calculate retention rate for a specific day
-        """
-        target_date = start_date + timedelta(days=day)
-        active_users = 0
-
-        for user_id in users:
-            # التحقق من نشاط المستخدم في اليوم المحدد
-            # Check if user was active on target day
-            events = self.storage.get_user_events(
-                user_id=user_id,
-                start_date=datetime.combine(target_date, datetime.min.time()),
-                end_date=datetime.combine(target_date, datetime.max.time()),
-            )
-            if events:
-                active_users += 1
-
-        return active_users / len(users) if users else 0
-
     # ============== استخدام الميزات - Feature Usage ==============
 
     def get_feature_usage(
@@ -387,26 +408,24 @@ class UserAnalyticsService:
         if not start_date:
             start_date = self._get_period_start(end_date, period)
 
-        # الحصول على أحداث الميزة - Get feature events
-        feature_events = self.storage.get_feature_events(
-            feature_name=feature_name, start_date=start_date, end_date=end_date
+        # المقاييس من التجميعات اليومية - Metrics from daily rollups
+        first_day, last_day = start_date.date(), end_date.date()
+        total_uses = self.rollups.counter(("feature", feature_name), first_day, last_day)
+        unique_users = min(
+            self.rollups.distinct(DIMENSION_FEATURE, feature_name, first_day, last_day),
+            total_uses,
         )
 
-        # حساب المقاييس - Calculate metrics
-        total_uses = len(feature_events)
-        unique_users = len({event.user_id for event in feature_events})
-
         # متوسط الاستخدامات لكل مستخدم - Average uses per user
         avg_uses_per_user = total_uses / unique_users if unique_users > 0 else 0
 
         # معدل التبني - Adoption rate (نسبة المستخدمين الذين استخدموا الميزة)
-        total_users = self.storage.get_total_active_users(start_date, end_date)
-        adoption_rate = unique_users / total_users if total_users > 0 else 0
+        total_users = self.rollups.active_users(first_day, last_day)
+        adoption_rate = min(1.0, unique_users / total_users) if total_users > 0 else 0
 
         # المستخدمون المكثفون (استخدموا الميزة أكثر من 10 مرات)
         # Power users (used feature more than 10 times)
-        user_counts = Counter(event.user_id for event in feature_events)
-        power_users = sum(1 for count in user_counts.values() if count > 10)
+        power_users = self.rollups.feature_power_users(feature_name, first_day, last_day, 10)
 
         return FeatureUsage(
             feature_name=feature_name,
@@ -435,11 +454,7 @@ class UserAnalyticsService:
         if not date_val:
             date_val = date.today()
 
-        start_time = datetime.combine(date_val, datetime.min.time())
-        end_time = datetime.combine(date_val, datetime.max.time())
-
-        events = self.storage.get_events_in_range(start_time, end_time)
-        return len({event.user_id for event in events})
+        return self.rollups.active_users(date_val, date_val)
 
     def weekly_active_users(self, week_start: date | None = None) -> int:
         """
@@ -455,11 +470,7 @@ class UserAnalyticsService:
         if not week_start:
             week_start = date.today() - timedelta(days=7)
 
-        start_time = datetime.combine(week_start, datetime.min.time())
-        end_time = datetime.combine(week_start + timedelta(days=7), datetime.max.time())
-
-        events = self.storage.get_events_in_range(start_time, end_time)
-        return len({event.user_id for event in events})
+        return self.rollups.active_users(week_start, week_start + timedelta(days=7))
 
     def monthly_active_users(self, month_start: date | None = None) -> int:
         """
@@ -475,11 +486,7 @@ class UserAnalyticsService:
         if not month_start:
             month_start = date.today() - timedelta(days=30)
 
-        start_time = datetime.combine(month_start, datetime.min.time())
-        end_time = datetime.combine(month_start + timedelta(days=30), datetime.max.time())
-
-        events = self.storage.get_events_in_range(start_time, end_time)
-        return len({event.user_id for event in events})
+        return self.rollups.active_users(month_start, month_start + timedelta(days=30))
 
     def average_session_duration(
         self, start_date: datetime | None = None, end_date: datetime | None = None
@@ -709,15 +716,9 @@ class UserAnalyticsService:
         if not start_date:
             start_date = end_date - timedelta(days=30)
 
-        events = self.storage.get_events_in_range(start_date, end_date)
-
-        # تجميع المستخدمين حسب المحافظة - Group users by governorate
-        governorate_users = defaultdict(set)
-        for event in events:
-            if event.governorate:
-                governorate_users[event.governorate].add(event.user_id)
-
-        return {gov: len(users) for gov, users in governorate_users.items()}
+        # دمج مخططات المحافظات اليومية - Merge daily governorate sketches
+        counts = self.rollups.distinct_by(DIMENSION_GOVERNORATE, start_date.date(), end_date.date())
+        return {Governorate(gov): count for gov, count in counts.items()}
 
     def active_fields_by_region(
         self, start_date: datetime | None = None, end_date: datetime | None = None
@@ -738,15 +739,11 @@ class UserAnalyticsService:
         if not start_date:
             start_date = end_date - timedelta(days=30)
 
-        events = self.storage.get_events_in_range(start_date, end_date)
-
-        # تجميع الحقول حسب المحافظة - Group fields by governorate
-        governorate_fields = defaultdict(set)
-        for event in events:
-            if event.governorate and event.field_id:
-                governorate_fields[event.governorate].add(event.field_id)
-
-        return {gov: len(fields) for gov, fields in governorate_fields.items()}
+        # دمج مخططات الحقول اليومية - Merge daily field sketches
+        counts = self.rollups.distinct_by(
+            DIMENSION_GOVERNORATE_FIELDS, start_date.date(), end_date.date()
+        )
+        return {Governorate(gov): count for gov, count in counts.items()}
 
     def crop_distribution(
         self,
@@ -771,17 +768,12 @@ class UserAnalyticsService:
         if not start_date:
             start_date = end_date - timedelta(days=365)
 
-        events = self.storage.get_events_in_range(start_date, end_date)
-
-        # تصفية حسب المحافظة إذا تم تحديدها - Filter by governorate if specified
-        if governorate:
-            events = [e for e in events if e.governorate == governorate]
-
-        # تجميع المحاصيل - Group crops
-        crop_events = [e for e in events if e.event_type == EventType.CROP_PLANTED]
-        crop_counts = Counter(e.crop_type for e in crop_events if e.crop_type)
-
-        return dict(crop_counts)
+        # العدادات المجمعة مسبقاً - Pre-aggregated counters
+        return self.rollups.crop_plantings(
+            start_date.date(),
+            end_date.date(),
+            governorate=governorate.value if governorate else None,
+        )
 
     # ============== دوال مساعدة - Helper Functions ==============
 
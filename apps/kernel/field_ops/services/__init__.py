@@ -26,6 +26,7 @@ from .crop_calendar import (
     YemenRegion,
 )
 from .irrigation_scheduler import IrrigationScheduler
+from .spatial_index import FieldSpatialIndex
 
 __all__ = [
     # Irrigation
@@ -47,6 +48,7 @@ __all__ = [
     "ValidationSeverity",
     "GeometryIssueType",
     "BoundarySeverity",
+    "FieldSpatialIndex",
     "YEMEN_BOUNDS",
     "AREA_LIMITS",
     "YEMEN_GOVERNORATES",
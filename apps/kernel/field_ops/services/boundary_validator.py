@@ -17,14 +17,16 @@ Version: 1.0.0
 """
 
 import json
-import math
+import sys
 from datetime import datetime
 from enum import Enum
+from pathlib import Path
 from typing import Any
 
 from pydantic import BaseModel, ConfigDict, Field
 
 try:
+    import shapely
     from shapely import normalize, simplify
     from shapely.geometry import (
         LineString,
@@ -43,6 +45,15 @@ except ImportError:
     print("تحذير: مكتبة Shapely غير مثبتة - Warning: Shapely not installed")
     print("يرجى التثبيت: pip install shapely")
 
+try:
+    from apps.services.shared import geometry
+except ImportError:
+    # محاولة بديلة - Fallback: shared services modules on the path
+    sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "services"))
+    from shared import geometry
+
+from .spatial_index import FieldSpatialIndex
+
 
 # ============== الثوابت - Constants ==============
 
@@ -190,6 +201,21 @@ class OverlapResult(BaseModel):
 # ============== فئة المحقق - Validator Class ==============
 
 
+def _polygon_parts(geom) -> list:
+    """
+    أجزاء المضلعات في الهندسة
+    Polygon parts of a geometry: itself, or the polygons of a MultiPolygon
+    or GeometryCollection (e.g. an overlap with a U-shaped neighbour)
+    """
+    parts = []
+    for part in getattr(geom, "geoms", [geom]):
+        if part.geom_type == "Polygon":
+            parts.append(part)
+        elif hasattr(part, "geoms"):
+            parts.extend(_polygon_parts(part))
+    return parts
+
+
 class BoundaryValidator:
     """
     محقق حدود الحقول
@@ -210,7 +236,11 @@ class BoundaryValidator:
     - Automatic repair of common issues
     """
 
-    def __init__(self, yemen_boundaries_path: str | None = None):
+    def __init__(
+        self,
+        yemen_boundaries_path: str | None = None,
+        spatial_index: FieldSpatialIndex | None = None,
+    ):
         """
         تهيئة المحقق
         Initialize validator
@@ -218,6 +248,8 @@ class BoundaryValidator:
         Args:
             yemen_boundaries_path: مسار ملف حدود اليمن GeoJSON
                                   Path to Yemen boundaries GeoJSON file
+            spatial_index: فهرس الحقول المسجلة لكشف التداخل
+                          Index of registered fields for overlap detection
         """
         if not SHAPELY_AVAILABLE:
             raise ImportError(
@@ -226,6 +258,7 @@ class BoundaryValidator:
 
         self.yemen_boundaries = None
         self.governorate_boundaries = {}
+        self.spatial_index = spatial_index
 
         # تحميل حدود اليمن إذا كان المسار موجوداً
         # Load Yemen boundaries if path provided
@@ -739,9 +772,11 @@ class BoundaryValidator:
     def check_overlap_with_existing(
         self,
         new_boundary: dict[str, Any],
-        existing_fields: list[dict[str, Any]],
+        existing_fields: list[dict[str, Any]] | None = None,
         user_id: str | None = None,
         tolerance_percentage: float = 5.0,
+        partition: str | None = None,
+        exclude_field_id: str | None = None,
     ) -> OverlapResult:
         """
         فحص التداخل مع الحقول الموجودة
@@ -751,64 +786,69 @@ class BoundaryValidator:
             new_boundary: حدود الحقل الجديد (GeoJSON) - New field boundary (GeoJSON)
             existing_fields: قائمة الحقول الموجودة - List of existing fields
                             كل حقل يحتوي على: {"field_id": ..., "geometry": ..., "user_id": ...}
+                            None = استخدام الفهرس المكاني - None = use the spatial index
             user_id: معرف المستخدم (للسماح بالتداخل مع حقول نفس المستخدم)
                     User ID (to allow overlap with same user's fields)
             tolerance_percentage: نسبة التفاوت المسموح - Allowed overlap percentage
+            partition: تقسيم الفهرس (مستأجر/محافظة) - Index partition (tenant/governorate)
+            exclude_field_id: حقل يُستثنى (عند تعديل حدوده) - Field to skip (when editing it)
 
         Returns:
             OverlapResult: نتيجة فحص التداخل - Overlap detection result
         """
+        if existing_fields is None and self.spatial_index is None:
+            raise ValueError(
+                "existing_fields أو spatial_index مطلوب - existing_fields or spatial_index required"
+            )
+
         try:
             # تحويل الحد الجديد - Convert new boundary
             new_polygon = shape(
                 new_boundary if new_boundary.get("type") != "Feature" else new_boundary["geometry"]
             )
+            new_area_ha = self.calculate_area_hectares(new_polygon)
+
+            # المرشحون بعد فحص المربع المحيط والتقاطع
+            # Candidates that passed the bounding-box and intersects tests
+            if existing_fields is None:
+                candidates = self.spatial_index.query(new_polygon, partition=partition)
+            else:
+                candidates = self._intersecting_fields(new_polygon, existing_fields)
 
             overlapping_fields = []
             total_overlap_area = 0.0
             max_overlap_percentage = 0.0
 
-            for field in existing_fields:
+            for field, field_polygon in candidates:
                 # تخطي حقول نفس المستخدم إذا لزم الأمر
                 # Skip same user's fields if needed
                 if user_id and field.get("user_id") == user_id:
                     continue
-
-                # تحويل هندسة الحقل - Convert field geometry
-                field_geom = field.get("geometry")
-                if not field_geom:
+                if exclude_field_id and field.get("field_id") == exclude_field_id:
                     continue
 
-                field_polygon = shape(
-                    field_geom if field_geom.get("type") != "Feature" else field_geom["geometry"]
-                )
-
-                # فحص التداخل - Check overlap
-                if new_polygon.intersects(field_polygon):
-                    intersection = new_polygon.intersection(field_polygon)
-                    overlap_area_ha = self.calculate_area_hectares(intersection)
-
-                    # حساب نسبة التداخل - Calculate overlap percentage
-                    new_area_ha = self.calculate_area_hectares(new_polygon)
-                    overlap_percentage = (
-                        (overlap_area_ha / new_area_ha * 100) if new_area_ha > 0 else 0
+                # مساحة التداخل - Overlap area
+                intersection = new_polygon.intersection(field_polygon)
+                overlap_area_ha = self.calculate_area_hectares(intersection)
+
+                # حساب نسبة التداخل - Calculate overlap percentage
+                overlap_percentage = (overlap_area_ha / new_area_ha * 100) if new_area_ha > 0 else 0
+
+                # إذا كان التداخل أكبر من التفاوت المسموح
+                # If overlap exceeds tolerance
+                if overlap_percentage > tolerance_percentage:
+                    overlapping_fields.append(
+                        {
+                            "field_id": field.get("field_id"),
+                            "overlap_area_hectares": overlap_area_ha,
+                            "overlap_percentage": overlap_percentage,
+                            "field_name": field.get("name", "غير معروف - Unknown"),
+                            "intersection_geometry": mapping(intersection),
+                        }
                     )
 
-                    # إذا كان التداخل أكبر من التفاوت المسموح
-                    # If overlap exceeds tolerance
-                    if overlap_percentage > tolerance_percentage:
-                        overlapping_fields.append(
-                            {
-                                "field_id": field.get("field_id"),
-                                "overlap_area_hectares": overlap_area_ha,
-                                "overlap_percentage": overlap_percentage,
-                                "field_name": field.get("name", "غير معروف - Unknown"),
-                                "intersection_geometry": mapping(intersection),
-                            }
-                        )
-
-                        total_overlap_area += overlap_area_ha
-                        max_overlap_percentage = max(max_overlap_percentage, overlap_percentage)
+                    total_overlap_area += overlap_area_ha
+                    max_overlap_percentage = max(max_overlap_percentage, overlap_percentage)
 
             has_overlap = len(overlapping_fields) > 0
 
@@ -823,6 +863,28 @@ class BoundaryValidator:
             print(f"خطأ في فحص التداخل - Overlap check error: {e}")
             return OverlapResult(has_overlap=False, overlapping_fields=[])
 
+    def _intersecting_fields(
+        self, new_polygon: Polygon, existing_fields: list[dict[str, Any]]
+    ) -> list[tuple[dict[str, Any], Polygon]]:
+        """
+        الحقول التي تتقاطع مع المضلع الجديد (بدون فهرس)
+        Fields intersecting the new polygon (without an index)
+
+        المضلع الجديد يُجهّز مرة واحدة ويُفحص مع كل الحقول دفعة واحدة
+        The new polygon is prepared once and tested against all fields in one call
+        """
+        fields = [f for f in existing_fields if f.get("geometry")]
+        polygons = [
+            shape(g if g.get("type") != "Feature" else g["geometry"])
+            for g in (f["geometry"] for f in fields)
+        ]
+        if not polygons:
+            return []
+
+        shapely.prepare(new_polygon)
+        mask = shapely.intersects(new_polygon, polygons)
+        return [(fields[i], polygons[i]) for i in range(len(fields)) if mask[i]]
+
     def get_overlapping_fields(
         self, boundary: dict[str, Any], field_database: list[dict[str, Any]]
     ) -> list[dict[str, Any]]:
@@ -883,44 +945,26 @@ class BoundaryValidator:
         حساب المساحة بالهكتار
         Calculate area in hectares
 
-        يستخدم إسقاط UTM لليمن للحصول على دقة عالية
-        Uses UTM projection for Yemen for high accuracy
+        يستخدم المساحة الجيوديزية على الكرة مع طرح الثقوب
+        Uses the geodesic area on the sphere, minus holes
 
         Args:
-            polygon: المضلع - Polygon
+            polygon: المضلع - Polygon (أو هندسة متعددة الأجزاء - or multipart geometry)
 
         Returns:
             float: المساحة بالهكتار - Area in hectares
         """
         try:
-            # حساب المساحة الجيوديزية - Calculate geodesic area
-            # نستخدم تقريب WGS84 ellipsoid
-            # Use WGS84 ellipsoid approximation
-
-            # للبساطة، نستخدم حساب تقريبي بناءً على خط العرض
-            # For simplicity, use approximate calculation based on latitude
-            centroid = polygon.centroid
-            lat = centroid.y
-
-            # عامل التحويل من الدرجات المربعة إلى متر مربع عند خط العرض
-            # Conversion factor from square degrees to square meters at latitude
-            # 1 degree latitude ≈ 111,320 meters
-            # 1 degree longitude ≈ 111,320 * cos(latitude) meters
-            lat_rad = math.radians(lat)
-            meters_per_deg_lat = 111320
-            meters_per_deg_lon = 111320 * math.cos(lat_rad)
-
-            # حساب المساحة بالدرجات المربعة - Calculate area in square degrees
-            area_deg2 = polygon.area
-
-            # تحويل إلى متر مربع - Convert to square meters
-            area_m2 = area_deg2 * meters_per_deg_lat * meters_per_deg_lon
+            area_m2 = sum(
+                geometry.polygon_area_m2(
+                    [list(part.exterior.coords)] + [list(hole.coords) for hole in part.interiors]
+                )
+                for part in _polygon_parts(polygon)
+            )
 
             # تحويل إلى هكتار (1 هكتار = 10,000 م²)
             # Convert to hectares (1 hectare = 10,000 m²)
-            area_ha = area_m2 / 10000
-
-            return round(area_ha, 4)
+            return round(area_m2 / 10000, 4)
 
         except Exception as e:
             print(f"خطأ في حساب المساحة - Area calculation error: {e}")
@@ -932,36 +976,20 @@ class BoundaryValidator:
         Calculate perimeter in meters
 
         Args:
-            polygon: المضلع - Polygon
+            polygon: المضلع - Polygon (أو هندسة متعددة الأجزاء - or multipart geometry)
 
         Returns:
             float: المحيط بالأمتار - Perimeter in meters
         """
         try:
-            centroid = polygon.centroid
-            lat = centroid.y
-
-            # عامل التحويل - Conversion factor
-            lat_rad = math.radians(lat)
-            meters_per_deg_lat = 111320
-            meters_per_deg_lon = 111320 * math.cos(lat_rad)
-
-            # حساب المحيط - Calculate perimeter
-            coords = list(polygon.exterior.coords)
-            perimeter_m = 0.0
-
-            for i in range(len(coords) - 1):
-                lon1, lat1 = coords[i]
-                lon2, lat2 = coords[i + 1]
-
-                # حساب المسافة التقريبية - Calculate approximate distance
-                dlat = (lat2 - lat1) * meters_per_deg_lat
-                dlon = (lon2 - lon1) * meters_per_deg_lon
-
-                distance = math.sqrt(dlat**2 + dlon**2)
-                perimeter_m += distance
-
-            return round(perimeter_m, 2)
+            # مسافات هافرساين - Haversine distances along each exterior
+            return round(
+                sum(
+                    geometry.perimeter_m(list(part.exterior.coords))
+                    for part in _polygon_parts(polygon)
+                ),
+                2,
+            )
 
         except Exception as e:
             print(f"خطأ في حساب المحيط - Perimeter calculation error: {e}")
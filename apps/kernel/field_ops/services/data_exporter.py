@@ -9,10 +9,14 @@ Comprehensive data export service for field data and reports in multiple formats
 import csv
 import io
 import json
+import tempfile
+import zlib
+from collections.abc import Iterable, Iterator
 from datetime import date, datetime, timedelta
 from enum import Enum
+from itertools import chain, islice
 from pathlib import Path
-from typing import TYPE_CHECKING, Any
+from typing import IO, TYPE_CHECKING, Any
 
 try:
     import pandas as pd
@@ -51,8 +55,10 @@ except ImportError:
 
 try:
     from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
     from openpyxl.chart import LineChart, Reference
     from openpyxl.styles import Alignment, Font, PatternFill
+    from openpyxl.utils import get_column_letter
 
     OPENPYXL_AVAILABLE = True
 except ImportError:
@@ -72,6 +78,7 @@ class ExportFormat(str, Enum):
     EXCEL = "xlsx"
     JSON = "json"
     GEOJSON = "geojson"
+    NDJSON = "ndjson"
     PDF = "pdf"
 
 
@@ -116,6 +123,96 @@ class ExportResult:
         self.metadata = metadata or {}
 
 
+class StreamingExport:
+    """
+    تصدير متدفق
+    Streaming export: the file is produced lazily as byte chunks
+
+    Iterate it once - e.g. as the body of a FastAPI ``StreamingResponse`` - or
+    hand it to ``write_to`` / ``upload_to``. ``size_bytes`` is known only once
+    the stream has been consumed.
+    """
+
+    def __init__(
+        self,
+        format: ExportFormat,
+        filename: str,
+        content_type: str,
+        chunks: Iterable[bytes],
+        generated_at: datetime,
+        compressed: bool = False,
+        metadata: dict[str, Any] | None = None,
+    ):
+        self.format = format
+        self.filename = filename
+        self.content_type = content_type
+        self.generated_at = generated_at
+        self.compressed = compressed
+        self.metadata = metadata or {}
+        self.size_bytes = 0
+        self._chunks = iter(chunks)
+        self._consumed = False
+
+    def __iter__(self) -> Iterator[bytes]:
+        if self._consumed:
+            raise RuntimeError("Streaming export can only be consumed once")
+        self._consumed = True
+        for chunk in self._chunks:
+            self.size_bytes += len(chunk)
+            yield chunk
+
+    @property
+    def headers(self) -> dict[str, str]:
+        """HTTP headers for a download response"""
+        return {"Content-Disposition": f'attachment; filename="{self.filename}"'}
+
+    def write_to(self, fileobj: IO[bytes]) -> int:
+        """
+        كتابة التصدير إلى ملف
+        Write the export to a binary file object, returns bytes written
+        """
+        for chunk in self:
+            fileobj.write(chunk)
+        return self.size_bytes
+
+    def upload_to(self, client: Any, bucket: str, key: str) -> int:
+        """
+        رفع التصدير إلى التخزين السحابي
+        Upload to object storage without buffering the whole file
+
+        ``client`` is any S3-compatible client exposing ``upload_fileobj``
+        (boto3, MinIO gateway); it reads the stream in multipart-sized parts.
+        """
+        client.upload_fileobj(
+            _ChunkReader(iter(self)),
+            bucket,
+            key,
+            ExtraArgs={"ContentType": self.content_type},
+        )
+        return self.size_bytes
+
+
+class _ChunkReader(io.RawIOBase):
+    """Read-only file object over an iterator of byte chunks"""
+
+    def __init__(self, chunks: Iterator[bytes]):
+        self._chunks = chunks
+        self._pending = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            self._pending = next(self._chunks, b"")
+            if not self._pending:
+                return 0
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
 # ============== Main Data Exporter ==============
 
 
@@ -129,14 +226,25 @@ class DataExporter:
     - Excel (xlsx) with multiple sheets
     - JSON and GeoJSON for spatial data
     - PDF formatted reports with bilingual support
+    - Streaming CSV, NDJSON, GeoJSON and Excel for large exports
     """
 
+    # Streamed exports are emitted in chunks of about this many bytes
+    STREAM_CHUNK_SIZE = 64 * 1024
+
+    # Rows fetched per page from the readings store
+    SENSOR_PAGE_SIZE = 10_000
+
+    # Excel sheet limit (1,048,576 rows) minus the header row
+    EXCEL_MAX_DATA_ROWS = 1_048_575
+
     # Content types for different formats
     CONTENT_TYPES = {
         ExportFormat.CSV: "text/csv; charset=utf-8",
         ExportFormat.EXCEL: "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         ExportFormat.JSON: "application/json; charset=utf-8",
         ExportFormat.GEOJSON: "application/geo+json; charset=utf-8",
+        ExportFormat.NDJSON: "application/x-ndjson; charset=utf-8",
         ExportFormat.PDF: "application/pdf",
     }
 
@@ -160,6 +268,16 @@ class DataExporter:
         "notes": "ملاحظات",
     }
 
+    # Excel sheet titles for field data sections
+    EXCEL_SHEET_TITLES = {
+        "metadata": "معلومات الحقل",
+        "ndvi_history": "NDVI History",
+        "sensor_readings": "قراءات المستشعرات",
+        "weather_data": "بيانات الطقس",
+        "recommendations": "التوصيات",
+        "actions": "الإجراءات",
+    }
+
     def __init__(self, arabic_font_path: str | None = None):
         """
         Initialize data exporter
@@ -353,6 +471,104 @@ class DataExporter:
             metadata={"field_id": field_id, "type": "recommendations"},
         )
 
+    # ============== Streaming Export ==============
+
+    def stream_sensor_readings(
+        self,
+        field_id: str,
+        format: ExportFormat,
+        date_range: tuple[date, date] | None = None,
+        rows: Iterable[dict[str, Any]] | None = None,
+        compress: bool = False,
+    ) -> StreamingExport:
+        """
+        تصدير متدفق لقراءات المستشعرات
+        Stream sensor readings without holding the dataset in memory
+
+        Args:
+            field_id: Field identifier
+            format: CSV, NDJSON, GEOJSON or EXCEL
+            date_range: Optional date range
+            rows: Optional row iterable (e.g. a server-side DB cursor);
+                defaults to paging through the readings store
+            compress: Gzip the stream
+
+        Returns:
+            StreamingExport yielding the file in chunks
+        """
+        if rows is None:
+            rows = self._iter_sensor_readings(field_id, date_range)
+
+        if format == ExportFormat.CSV:
+            pieces = self._iter_csv(rows)
+        elif format == ExportFormat.NDJSON:
+            pieces = self._iter_ndjson(rows)
+        elif format == ExportFormat.GEOJSON:
+            pieces = self._iter_geojson(rows, self._get_field_metadata(field_id))
+        elif format == ExportFormat.EXCEL:
+            pieces = self._iter_excel([(self.EXCEL_SHEET_TITLES["sensor_readings"], rows)])
+        else:
+            raise ValueError(f"Format {format} not supported for streaming sensor readings")
+
+        return self._streaming_export(
+            "sensors", field_id, format, pieces, compress, {"field_id": field_id, "type": "sensors"}
+        )
+
+    def stream_field_data(
+        self,
+        field_id: str,
+        format: ExportFormat,
+        date_range: tuple[date, date] | None = None,
+        include_metadata: bool = True,
+        include_ndvi: bool = True,
+        include_sensors: bool = True,
+        include_weather: bool = True,
+        include_recommendations: bool = True,
+        include_actions: bool = True,
+        compress: bool = False,
+    ) -> StreamingExport:
+        """
+        تصدير متدفق لبيانات الحقل
+        Stream comprehensive field data
+
+        EXCEL writes the same sheets as ``export_field_data`` using openpyxl's
+        write-only mode. NDJSON writes one record per line tagged with its
+        ``record_type`` (metadata, ndvi_history, sensor_readings, ...).
+        Sensor readings are paged from the store as the file is written.
+
+        Returns:
+            StreamingExport yielding the file in chunks
+        """
+        sections: list[tuple[str, Iterable[dict[str, Any]]]] = []
+        if include_ndvi:
+            sections.append(("ndvi_history", self._get_ndvi_history(field_id, date_range)))
+        if include_sensors:
+            sections.append(("sensor_readings", self._iter_sensor_readings(field_id, date_range)))
+        if include_weather:
+            sections.append(("weather_data", self._get_weather_data(field_id, date_range)))
+        if include_recommendations:
+            sections.append(("recommendations", self._get_recommendations(field_id, date_range)))
+        if include_actions:
+            sections.append(("actions", self._get_actions_taken(field_id, date_range)))
+        metadata = self._get_field_metadata(field_id) if include_metadata else None
+
+        if format == ExportFormat.EXCEL:
+            pieces = self._iter_excel(
+                [(self.EXCEL_SHEET_TITLES[name], rows) for name, rows in sections], metadata
+            )
+        elif format == ExportFormat.NDJSON:
+            if metadata is not None:
+                sections.insert(0, ("metadata", [metadata]))
+            pieces = self._iter_ndjson(
+                {"record_type": name, **record} for name, rows in sections for record in rows
+            )
+        else:
+            raise ValueError(f"Format {format} not supported for streaming field data")
+
+        return self._streaming_export(
+            "field_data", field_id, format, pieces, compress, {"field_id": field_id}
+        )
+
     # ============== Report Generation ==============
 
     def generate_report(
@@ -440,9 +656,51 @@ class DataExporter:
                 "value": 35.5,
                 "unit": "%",
                 "location": "منطقة A",
+                "reading_id": f"{field_id}-1",
             }
         ]
 
+    @staticmethod
+    def _sensor_reading_key(reading: dict[str, Any]) -> tuple[str, str]:
+        """Keyset position of a reading: (timestamp, reading_id)"""
+        return reading["timestamp"], str(reading["reading_id"])
+
+    def _get_sensor_readings_page(
+        self,
+        field_id: str,
+        date_range: tuple[date, date] | None,
+        after: tuple[str, str] | None,
+        limit: int,
+    ) -> list[dict[str, Any]]:
+        """
+        Get one page of sensor readings ordered by (timestamp, reading_id) - placeholder
+
+        The reading id breaks ties, since every sensor of a farm reports on the
+        same tick. In real implementation, a keyset query on the row value:
+        WHERE field_id = :field_id AND (timestamp, reading_id) > (:after_ts, :after_id)
+        ORDER BY timestamp, reading_id LIMIT :limit
+        """
+        readings = sorted(
+            self._get_sensor_readings(field_id, date_range), key=self._sensor_reading_key
+        )
+        if after is not None:
+            readings = [r for r in readings if self._sensor_reading_key(r) > after]
+        return readings[:limit]
+
+    def _iter_sensor_readings(
+        self, field_id: str, date_range: tuple[date, date] | None = None
+    ) -> Iterator[dict[str, Any]]:
+        """Iterate over sensor readings one page at a time"""
+        after = None
+        while True:
+            page = self._get_sensor_readings_page(
+                field_id, date_range, after, self.SENSOR_PAGE_SIZE
+            )
+            yield from page
+            if len(page) < self.SENSOR_PAGE_SIZE:
+                return
+            after = self._sensor_reading_key(page[-1])
+
     def _get_weather_data(
         self, field_id: str, date_range: tuple[date, date] | None = None
     ) -> list[dict[str, Any]]:
@@ -493,49 +751,11 @@ class DataExporter:
 
     def _to_csv(self, data: dict[str, Any]) -> str:
         """Convert data to CSV with Arabic headers"""
-        output = io.StringIO()
-
-        # Add BOM for UTF-8 Excel compatibility
-        output.write("\ufeff")
-
-        # Create flattened rows
-        rows = self._flatten_for_csv(data)
-
-        if not rows:
-            return ""
-
-        # Get headers
-        fieldnames = list(rows[0].keys())
-
-        # Translate to Arabic if available
-        translated_fieldnames = [self.ARABIC_HEADERS.get(f, f) for f in fieldnames]
-
-        writer = csv.DictWriter(output, fieldnames=fieldnames)
-
-        # Write Arabic headers
-        writer.writerow(dict(zip(fieldnames, translated_fieldnames, strict=False)))
-
-        # Write data rows
-        writer.writerows(rows)
-
-        return output.getvalue()
+        return "".join(self._iter_csv(self._flatten_for_csv(data)))
 
     def _sensors_to_csv(self, sensors: list[dict]) -> str:
         """Export sensors to CSV"""
-        if not sensors:
-            return ""
-
-        output = io.StringIO()
-        output.write("\ufeff")  # BOM
-
-        fieldnames = list(sensors[0].keys())
-        translated = [self.ARABIC_HEADERS.get(f, f) for f in fieldnames]
-
-        writer = csv.DictWriter(output, fieldnames=fieldnames)
-        writer.writerow(dict(zip(fieldnames, translated, strict=False)))
-        writer.writerows(sensors)
-
-        return output.getvalue()
+        return "".join(self._iter_csv(sensors))
 
     def _recommendations_to_csv(self, recommendations: list[dict]) -> str:
         """Export recommendations to CSV"""
@@ -1023,6 +1243,193 @@ class DataExporter:
             metadata={"field_id": field_id, "report_type": "yield_forecast"},
         )
 
+    # ============== Streaming Writers ==============
+
+    def _iter_csv(self, rows: Iterable[dict[str, Any]]) -> Iterator[str]:
+        """Write rows as CSV with Arabic headers, one batch of rows at a time"""
+        rows = iter(rows)
+        first = next(rows, None)
+        if first is None:
+            return
+
+        output = io.StringIO()
+        output.write("\ufeff")  # BOM for UTF-8 Excel compatibility
+
+        fieldnames = list(first.keys())
+        translated = [self.ARABIC_HEADERS.get(f, f) for f in fieldnames]
+
+        writer = csv.DictWriter(output, fieldnames=fieldnames)
+        writer.writerow(dict(zip(fieldnames, translated, strict=False)))
+        for batch in self._row_batches(chain([first], rows)):
+            writer.writerows(batch)
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate()
+
+    def _iter_ndjson(self, rows: Iterable[dict[str, Any]]) -> Iterator[str]:
+        """Write rows as newline-delimited JSON"""
+        for batch in self._row_batches(rows):
+            yield "".join(json.dumps(row, ensure_ascii=False, default=str) + "\n" for row in batch)
+
+    def _iter_geojson(
+        self, rows: Iterable[dict[str, Any]], metadata: dict[str, Any]
+    ) -> Iterator[str]:
+        """
+        Write rows as a GeoJSON FeatureCollection of points
+
+        Rows with ``lat``/``lng`` keep their own position, others are placed
+        at the field coordinates.
+        """
+        coords = metadata.get("location", {}).get("coordinates", {})
+        field_point = [coords.get("lng", 0), coords.get("lat", 0)]
+
+        yield '{"type": "FeatureCollection", "features": ['
+        separator = "\n"
+        for batch in self._row_batches(rows):
+            features = (
+                json.dumps(
+                    {
+                        "type": "Feature",
+                        "geometry": {
+                            "type": "Point",
+                            "coordinates": [row["lng"], row["lat"]]
+                            if "lat" in row and "lng" in row
+                            else field_point,
+                        },
+                        "properties": row,
+                    },
+                    ensure_ascii=False,
+                    default=str,
+                )
+                for row in batch
+            )
+            yield separator + ",\n".join(features)
+            separator = ",\n"
+        yield "\n]}\n"
+
+    def _iter_excel(
+        self,
+        sheets: list[tuple[str, Iterable[dict[str, Any]]]],
+        metadata: dict[str, Any] | None = None,
+    ) -> Iterator[bytes]:
+        """
+        Write sheets with openpyxl's write-only mode
+
+        Rows are flushed to disk as they are appended, so memory stays flat;
+        the file is read back in chunks once the workbook is saved. Sheets
+        longer than Excel's row limit continue on "<title> (2)", ...
+        """
+        if not OPENPYXL_AVAILABLE:
+            raise RuntimeError("openpyxl is required for Excel export")
+        return self._write_only_workbook(sheets, metadata)
+
+    def _write_only_workbook(
+        self,
+        sheets: list[tuple[str, Iterable[dict[str, Any]]]],
+        metadata: dict[str, Any] | None,
+    ) -> Iterator[bytes]:
+        wb = Workbook(write_only=True)
+
+        if metadata is not None:
+            ws = wb.create_sheet(self.EXCEL_SHEET_TITLES["metadata"])
+            ws.column_dimensions["A"].width = 25
+            ws.column_dimensions["B"].width = 40
+            ws.append(self._write_only_header(ws, ["الحقل", "القيمة"], size=12))
+            for key, value in metadata.items():
+                if isinstance(value, dict):
+                    value = str(value)
+                ws.append([self.ARABIC_HEADERS.get(key, key), value])
+
+        for title, rows in sheets:
+            rows = iter(rows)
+            first = next(rows, None)
+            if first is None:
+                continue
+
+            headers = list(first.keys())
+            translated = [self.ARABIC_HEADERS.get(h, h) for h in headers]
+            # Column widths must be set before rows are written; size them
+            # from the header and first row instead of scanning every cell
+            widths = [
+                min(max(len(str(name)), len(str(first.get(h)))) + 2, 50)
+                for name, h in zip(translated, headers, strict=True)
+            ]
+
+            for count, row in enumerate(chain([first], rows)):
+                if count % self.EXCEL_MAX_DATA_ROWS == 0:
+                    part = count // self.EXCEL_MAX_DATA_ROWS + 1
+                    ws = wb.create_sheet(title if part == 1 else f"{title} ({part})")
+                    for column, width in enumerate(widths, start=1):
+                        ws.column_dimensions[get_column_letter(column)].width = width
+                    ws.append(self._write_only_header(ws, translated))
+                ws.append([row.get(h) for h in headers])
+
+        with tempfile.TemporaryFile() as output:
+            wb.save(output)
+            output.seek(0)
+            while chunk := output.read(self.STREAM_CHUNK_SIZE):
+                yield chunk
+
+    def _write_only_header(self, ws, values: list[str], size: int = 11) -> list:
+        """Styled header cells for a write-only sheet"""
+        cells = []
+        for value in values:
+            cell = WriteOnlyCell(ws, value=value)
+            cell.fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+            cell.font = Font(bold=True, color="FFFFFF", size=size)
+            cell.alignment = Alignment(horizontal="center")
+            cells.append(cell)
+        return cells
+
+    def _row_batches(
+        self, rows: Iterable[dict[str, Any]], size: int = 1000
+    ) -> Iterator[list[dict[str, Any]]]:
+        """Group rows so each write serializes many rows at once"""
+        rows = iter(rows)
+        while batch := list(islice(rows, size)):
+            yield batch
+
+    def _encode_chunks(self, pieces: Iterable[str | bytes], compress: bool) -> Iterator[bytes]:
+        """Encode writer output into ~STREAM_CHUNK_SIZE byte chunks, optionally gzipped"""
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None  # gzip
+        buffer = bytearray()
+        for piece in pieces:
+            data = piece.encode("utf-8") if isinstance(piece, str) else piece
+            buffer += compressor.compress(data) if compressor else data
+            if len(buffer) >= self.STREAM_CHUNK_SIZE:
+                yield bytes(buffer)
+                buffer.clear()
+        if compressor:
+            buffer += compressor.flush()
+        if buffer:
+            yield bytes(buffer)
+
+    def _streaming_export(
+        self,
+        prefix: str,
+        field_id: str,
+        format: ExportFormat,
+        pieces: Iterable[str | bytes],
+        compress: bool,
+        metadata: dict[str, Any],
+    ) -> StreamingExport:
+        """Wrap writer output in a StreamingExport"""
+        filename = self._generate_filename(prefix, field_id, format)
+        content_type = self.CONTENT_TYPES[format]
+        if compress:
+            filename += ".gz"
+            content_type = "application/gzip"
+
+        return StreamingExport(
+            format=format,
+            filename=filename,
+            content_type=content_type,
+            chunks=self._encode_chunks(pieces, compress),
+            generated_at=datetime.now(),
+            compressed=compress,
+            metadata=metadata,
+        )
+
     # ============== Helper Methods ==============
 
     def _flatten_for_csv(self, data: dict[str, Any]) -> list[dict[str, Any]]:
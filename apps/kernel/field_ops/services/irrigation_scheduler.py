@@ -7,8 +7,9 @@ Advanced irrigation scheduling and water optimization system
 Based on FAO-56 methodology (Penman-Monteith)
 """
 
-import math
+import sys
 from datetime import date, datetime, timedelta
+from pathlib import Path
 
 from ..models.irrigation import (
     CropType,
@@ -23,6 +24,13 @@ from ..models.irrigation import (
     WeatherData,
 )
 
+try:
+    from apps.services.shared import fao56
+except ImportError:
+    # محاولة بديلة - Fallback: shared services modules on the path
+    sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "services"))
+    from shared import fao56
+
 # ============== جداول معاملات المحاصيل اليمنية - Yemen Crop Coefficient Tables ==============
 
 # معاملات المحاصيل (Kc) حسب مراحل النمو لمحاصيل اليمن
@@ -334,21 +342,12 @@ class IrrigationScheduler:
         T_max = weather_data.temp_max
         T_min = weather_data.temp_min
         u2 = weather_data.wind_speed
-        lat = weather_data.latitude
         elev = weather_data.elevation
-
-        # الضغط الجوي - Atmospheric pressure (kPa)
-        P = 101.3 * ((293 - 0.0065 * elev) / 293) ** 5.26
-
-        # ثابت البسيكرومتر - Psychrometric constant (kPa/°C)
-        gamma = 0.000665 * P
-
-        # ميل منحنى ضغط البخار - Slope of saturation vapour pressure curve (kPa/°C)
-        delta = 4098 * (0.6108 * math.exp((17.27 * T) / (T + 237.3))) / ((T + 237.3) ** 2)
+        J = weather_data.date.timetuple().tm_yday
 
         # ضغط البخار المشبع - Saturation vapour pressure (kPa)
-        e_T_max = 0.6108 * math.exp((17.27 * T_max) / (T_max + 237.3))
-        e_T_min = 0.6108 * math.exp((17.27 * T_min) / (T_min + 237.3))
+        e_T_max = fao56.saturation_vapour_pressure(T_max)
+        e_T_min = fao56.saturation_vapour_pressure(T_min)
         es = (e_T_max + e_T_min) / 2
 
         # ضغط البخار الفعلي - Actual vapour pressure (kPa)
@@ -363,122 +362,40 @@ class IrrigationScheduler:
         else:
             ea = es * 0.7  # افتراض 70% رطوبة - Assume 70% humidity
 
-        # الإشعاع الصافي - Net radiation (MJ/m²/day)
+        # الإشعاع خارج الغلاف الجوي - Extraterrestrial radiation
+        Ra, ws = fao56.extraterrestrial_radiation(weather_data.latitude, J)
+
+        # الإشعاع الشمسي - Solar radiation (MJ/m²/day)
         if weather_data.solar_radiation:
             Rs = weather_data.solar_radiation
         else:
-            # تقدير الإشعاع الشمسي من ساعات السطوع
-            # Estimate solar radiation from sunshine hours
-            Rs = self._estimate_solar_radiation(
-                lat, weather_data.date, weather_data.sunshine_hours or 8
+            # تقدير الإشعاع الشمسي من ساعات السطوع (Angström)
+            # Estimate solar radiation from sunshine hours (Angström)
+            Rs = fao56.shortwave_radiation(
+                Ra, ws, T_max, T_min, sunshine_hours=weather_data.sunshine_hours or 8
             )
 
-        # الإشعاع خارج الغلاف الجوي - Extraterrestrial radiation
-        Ra = self._calculate_extraterrestrial_radiation(lat, weather_data.date)
-
-        # الإشعاع الصافي - Net radiation
-        albedo = 0.23  # معامل الانعكاس للمراعي - Albedo for grass reference
-        Rns = (1 - albedo) * Rs  # الإشعاع الشمسي الصافي قصير الموجة
-
-        # الإشعاع طويل الموجة الصافي - Net longwave radiation
-        stefan_boltzmann = 4.903e-9  # MJ/K⁴/m²/day
-        Rnl = (
-            stefan_boltzmann
-            * (((T_max + 273.16) ** 4 + (T_min + 273.16) ** 4) / 2)
-            * (0.34 - 0.14 * math.sqrt(ea))
-            * (1.35 * (Rs / Ra) - 0.35)
-        )
-
+        # الإشعاع الصافي - Net radiation (MJ/m²/day)
+        Rns = (1 - fao56.ALBEDO) * Rs  # الإشعاع الشمسي الصافي قصير الموجة
+        Rnl = fao56.net_longwave_radiation(T_max, T_min, ea, Rs / Ra)
         Rn = Rns - Rnl
 
-        # تدفق الحرارة في التربة - Soil heat flux (MJ/m²/day)
-        # للحسابات اليومية يُفترض أنه صفر - For daily calculations, assumed zero
-        G = 0
-
         # معادلة Penman-Monteith الكاملة - Full Penman-Monteith equation
-        numerator = 0.408 * delta * (Rn - G) + gamma * (900 / (T + 273)) * u2 * (es - ea)
-        denominator = delta + gamma * (1 + 0.34 * u2)
-
-        et0 = numerator / denominator
+        # تدفق الحرارة في التربة صفر للحسابات اليومية - Soil heat flux is zero for daily steps
+        et0 = fao56.penman_monteith(
+            fao56.vapour_pressure_slope(T),
+            fao56.psychrometric_constant(elev),
+            T,
+            u2,
+            es - ea,
+            Rn,
+        )
 
         # التأكد من أن القيمة موجبة ومنطقية - Ensure positive and reasonable value
-        et0 = max(0, min(et0, 15))  # الحد الأقصى 15 مم/يوم
+        et0 = max(0, min(float(et0), 15))  # الحد الأقصى 15 مم/يوم
 
         return et0
 
-    def _estimate_solar_radiation(
-        self, latitude: float, date_val: date, sunshine_hours: float
-    ) -> float:
-        """
-        تقدير الإشعاع الشمسي من ساعات السطوع
-        Estimate solar radiation from sunshine hours
-        """
-        # الإشعاع خارج الغلاف الجوي
-        Ra = self._calculate_extraterrestrial_radiation(latitude, date_val)
-
-        # أقصى ساعات نهار محتملة
-        N = self._calculate_daylight_hours(latitude, date_val)
-
-        # معادلة Angström - Angström formula
-        # Rs = (as + bs * (n/N)) * Ra
-        # as = 0.25, bs = 0.50 (قيم افتراضية)
-        as_coeff = 0.25
-        bs_coeff = 0.50
-
-        Rs = (as_coeff + bs_coeff * (sunshine_hours / N)) * Ra
-
-        return Rs
-
-    def _calculate_extraterrestrial_radiation(self, latitude: float, date_val: date) -> float:
-        """
-        حساب الإشعاع خارج الغلاف الجوي
-        Calculate extraterrestrial radiation (Ra)
-        """
-        # تحويل خط العرض إلى راديان
-        lat_rad = latitude * math.pi / 180
-
-        # رقم اليوم في السنة - Day of year
-        J = date_val.timetuple().tm_yday
-
-        # الميل الشمسي - Solar declination (rad)
-        delta = 0.409 * math.sin((2 * math.pi / 365) * J - 1.39)
-
-        # المسافة العكسية النسبية للأرض-الشمس
-        dr = 1 + 0.033 * math.cos((2 * math.pi / 365) * J)
-
-        # زاوية شروق الشمس - Sunset hour angle (rad)
-        ws = math.acos(-math.tan(lat_rad) * math.tan(delta))
-
-        # ثابت الإشعاع الشمسي - Solar constant
-        Gsc = 0.0820  # MJ/m²/min
-
-        # الإشعاع خارج الغلاف الجوي
-        Ra = (
-            (24 * 60 / math.pi)
-            * Gsc
-            * dr
-            * (
-                ws * math.sin(lat_rad) * math.sin(delta)
-                + math.cos(lat_rad) * math.cos(delta) * math.sin(ws)
-            )
-        )
-
-        return Ra
-
-    def _calculate_daylight_hours(self, latitude: float, date_val: date) -> float:
-        """
-        حساب أقصى ساعات النهار
-        Calculate maximum daylight hours
-        """
-        lat_rad = latitude * math.pi / 180
-        J = date_val.timetuple().tm_yday
-        delta = 0.409 * math.sin((2 * math.pi / 365) * J - 1.39)
-        ws = math.acos(-math.tan(lat_rad) * math.tan(delta))
-
-        N = (24 / math.pi) * ws
-
-        return N
-
     # ============== حساب الأمطار الفعالة - Effective Rainfall ==============
 
     def calculate_effective_rainfall(self, total_rainfall: float, soil_type: SoilType) -> float:
@@ -0,0 +1,359 @@
+"""
+فهرس مكاني لحدود الحقول - SAHOOL Field Spatial Index
+======================================================
+فهرس STRtree دائم لكشف تداخل الحقول بسرعة
+
+Persistent STRtree index for fast field overlap detection:
+- One partition per tenant (or governorate)
+- Incremental insert / update / delete with periodic rebuilds
+- Bounding-box query before any exact intersection test
+- Snapshot to disk so restarts skip GeoJSON parsing
+
+المطور: SAHOOL Platform
+Developer: SAHOOL Platform
+"""
+
+import json
+import os
+import tempfile
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+try:
+    import shapely
+    from shapely import STRtree
+    from shapely.geometry import shape
+
+    SHAPELY_AVAILABLE = True
+except ImportError:
+    SHAPELY_AVAILABLE = False
+
+
+# ============== الثوابت - Constants ==============
+
+# التقسيم الافتراضي للحقول غير المصنفة - Partition for fields without a key
+DEFAULT_PARTITION = "_default"
+
+# أقل عدد تغييرات قبل إعادة بناء الشجرة - Minimum pending changes before a rebuild
+MIN_REBUILD_CHANGES = 256
+
+# نسبة التغييرات إلى الحقول قبل إعادة البناء - Pending changes / live fields ratio
+REBUILD_RATIO = 0.1
+
+SNAPSHOT_VERSION = 1
+
+
+def _geometry_of(field_geom):
+    """
+    تحويل GeoJSON (هندسة أو Feature) إلى شكل؛ أشكال Shapely تمر كما هي
+    GeoJSON geometry or Feature to shape; Shapely geometries pass through
+    """
+    if not isinstance(field_geom, dict):
+        return field_geom
+    return shape(field_geom if field_geom.get("type") != "Feature" else field_geom["geometry"])
+
+
+# ============== التقسيم - Partition ==============
+
+
+class _Partition:
+    """
+    تقسيم واحد من الفهرس (مستأجر أو محافظة)
+    One index partition (tenant or governorate)
+
+    الحقول مخزنة في خانات؛ الشجرة تغطي الخانات حتى ``built``، والخانات
+    الأحدث تُفحص خطياً حتى إعادة البناء. الحذف يترك خانة فارغة.
+
+    Fields live in slots; the STRtree covers slots below ``built`` and newer
+    slots are scanned linearly until the next rebuild. Deletes leave a hole.
+    """
+
+    def __init__(self):
+        self.geoms: list[Any] = []
+        self.fields: list[dict[str, Any] | None] = []
+        self.slot_of: dict[str, int] = {}
+        self.tree: STRtree | None = None
+        self.built = 0
+        self.holes = 0
+
+    def __len__(self) -> int:
+        return len(self.slot_of)
+
+    @property
+    def pending(self) -> int:
+        return len(self.geoms) - self.built + self.holes
+
+    def add(self, field: dict[str, Any], geom) -> None:
+        self.remove(field["field_id"])
+        self.slot_of[field["field_id"]] = len(self.geoms)
+        self.geoms.append(geom)
+        self.fields.append(field)
+
+    def remove(self, field_id: str) -> bool:
+        slot = self.slot_of.pop(field_id, None)
+        if slot is None:
+            return False
+        self.fields[slot] = None
+        self.geoms[slot] = None
+        self.holes += 1
+        return True
+
+    def rebuild(self) -> None:
+        """ضغط الخانات وبناء الشجرة - Compact slots and rebuild the tree"""
+        live = [i for i, f in enumerate(self.fields) if f is not None]
+        self.geoms = [self.geoms[i] for i in live]
+        self.fields = [self.fields[i] for i in live]
+        self.slot_of = {f["field_id"]: i for i, f in enumerate(self.fields)}
+        self.tree = STRtree(self.geoms) if self.geoms else None
+        self.built = len(self.geoms)
+        self.holes = 0
+
+    def query(self, geom) -> list[int]:
+        """
+        الخانات التي تتقاطع مع الهندسة
+        Slots whose geometry intersects ``geom`` (prepared by the caller)
+        """
+        slots: list[int] = []
+        if self.tree is not None:
+            # الشجرة تفحص المربع المحيط أولاً ثم التقاطع الدقيق
+            # The tree filters by bounding box before the exact predicate
+            hits = self.tree.query(geom, predicate="intersects")
+            slots.extend(int(i) for i in hits if self.fields[i] is not None)
+
+        if self.built < len(self.geoms):
+            recent = self.geoms[self.built :]
+            live = [i for i, g in enumerate(recent) if g is not None]
+            if live:
+                mask = shapely.intersects(geom, [recent[i] for i in live])
+                slots.extend(self.built + live[i] for i in np.flatnonzero(mask))
+        return slots
+
+
+# ============== الفهرس - Index ==============
+
+
+class FieldSpatialIndex:
+    """
+    فهرس مكاني دائم لحدود الحقول
+    Persistent spatial index of field boundaries
+
+    كل حقل هو قاموس بنفس شكل ``existing_fields`` في BoundaryValidator:
+    {"field_id", "geometry", "user_id", "name", "tenant_id" | "governorate"}
+
+    Each field is a dict shaped like ``existing_fields`` in BoundaryValidator;
+    ``geometry`` may be GeoJSON or a Shapely geometry. The partition is read
+    from ``partition_key`` on the field.
+    """
+
+    def __init__(
+        self,
+        partition_key: str = "tenant_id",
+        rebuild_ratio: float = REBUILD_RATIO,
+        min_rebuild_changes: int = MIN_REBUILD_CHANGES,
+    ):
+        """
+        تهيئة الفهرس
+        Initialize index
+
+        Args:
+            partition_key: مفتاح التقسيم في بيانات الحقل - Field key to partition by
+            rebuild_ratio: نسبة التغييرات لإعادة البناء - Pending/live ratio that triggers a rebuild
+            min_rebuild_changes: أقل عدد تغييرات لإعادة البناء - Minimum pending changes to rebuild
+        """
+        if not SHAPELY_AVAILABLE:
+            raise ImportError(
+                "مكتبة Shapely مطلوبة - Shapely library required\nالتثبيت: pip install shapely"
+            )
+
+        self.partition_key = partition_key
+        self.rebuild_ratio = rebuild_ratio
+        self.min_rebuild_changes = min_rebuild_changes
+        self._partitions: dict[str, _Partition] = {}
+        self._partition_of: dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._partition_of)
+
+    def __contains__(self, field_id: str) -> bool:
+        return field_id in self._partition_of
+
+    @property
+    def partitions(self) -> list[str]:
+        return list(self._partitions)
+
+    def _maybe_rebuild(self, partition: _Partition) -> None:
+        threshold = max(self.min_rebuild_changes, int(len(partition) * self.rebuild_ratio))
+        if partition.pending > threshold:
+            partition.rebuild()
+
+    def _store(self, field: dict[str, Any], geom) -> str:
+        field_id = field["field_id"]
+        name = str(field.get(self.partition_key) or DEFAULT_PARTITION)
+
+        previous = self._partition_of.get(field_id)
+        if previous is not None and previous != name:
+            self._partitions[previous].remove(field_id)
+
+        partition = self._partitions.setdefault(name, _Partition())
+        meta = {k: v for k, v in field.items() if k != "geometry"}
+        partition.add(meta, geom)
+        self._partition_of[field_id] = name
+        return name
+
+    # ============== التحديث - Updates ==============
+
+    def upsert(self, field: dict[str, Any]) -> None:
+        """
+        إضافة أو تحديث حقل (عند الإنشاء أو تعديل الحدود)
+        Insert or update a field (on create or boundary edit)
+        """
+        if not field.get("geometry"):
+            self.remove(field["field_id"])
+            return
+        name = self._store(field, _geometry_of(field["geometry"]))
+        self._maybe_rebuild(self._partitions[name])
+
+    def bulk_load(self, fields: Iterable[dict[str, Any]]) -> int:
+        """
+        تحميل حقول كثيرة ثم بناء الأشجار مرة واحدة
+        Load many fields, then build each tree once
+
+        Returns:
+            int: عدد الحقول المحملة - Number of fields loaded
+        """
+        count = 0
+        for field in fields:
+            if field.get("geometry"):
+                self._store(field, _geometry_of(field["geometry"]))
+                count += 1
+        self.rebuild()
+        return count
+
+    def remove(self, field_id: str) -> bool:
+        """
+        حذف حقل من الفهرس
+        Remove a field from the index
+        """
+        name = self._partition_of.pop(field_id, None)
+        if name is None:
+            return False
+        partition = self._partitions[name]
+        partition.remove(field_id)
+        self._maybe_rebuild(partition)
+        return True
+
+    def rebuild(self) -> None:
+        """إعادة بناء كل الأشجار - Rebuild every partition tree"""
+        for partition in self._partitions.values():
+            partition.rebuild()
+
+    # ============== الاستعلام - Queries ==============
+
+    def query(self, geometry, partition: str | None = None) -> list[tuple[dict[str, Any], Any]]:
+        """
+        الحقول التي تتقاطع مع الهندسة
+        Fields whose boundary intersects ``geometry``
+
+        Args:
+            geometry: هندسة Shapely أو GeoJSON - Shapely geometry or GeoJSON dict
+            partition: التقسيم (None = الكل) - Partition to search (None = all)
+
+        Returns:
+            List[Tuple[Dict, Geometry]]: بيانات الحقل وهندسته - Field metadata and geometry
+        """
+        geom = _geometry_of(geometry)
+        shapely.prepare(geom)
+
+        if partition is None:
+            partitions = list(self._partitions.values())
+        else:
+            partitions = [self._partitions[partition]] if partition in self._partitions else []
+
+        results = []
+        for part in partitions:
+            for slot in part.query(geom):
+                results.append((part.fields[slot], part.geoms[slot]))
+        return results
+
+    # ============== اللقطات - Snapshots ==============
+
+    def save(self, path: str | Path) -> None:
+        """
+        حفظ لقطة من الفهرس (WKB + بيانات الحقول)
+        Save a snapshot of the index (WKB + field metadata)
+        """
+        geoms = []
+        fields = []
+        partition_names = []
+        for name, part in self._partitions.items():
+            for geom, field in zip(part.geoms, part.fields, strict=True):
+                if field is not None:
+                    geoms.append(geom)
+                    fields.append(field)
+                    partition_names.append(name)
+
+        wkb = shapely.to_wkb(np.array(geoms, dtype=object)) if geoms else np.array([], dtype=object)
+        offsets = np.zeros(len(wkb) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(b) for b in wkb])
+        meta = {
+            "version": SNAPSHOT_VERSION,
+            "partition_key": self.partition_key,
+            "partitions": partition_names,
+            "fields": fields,
+        }
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            np.savez(
+                f,
+                wkb=np.frombuffer(b"".join(wkb), dtype=np.uint8),
+                offsets=offsets,
+                meta=np.frombuffer(json.dumps(meta, ensure_ascii=False).encode(), dtype=np.uint8),
+            )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str | Path, **kwargs) -> "FieldSpatialIndex":
+        """
+        تحميل لقطة محفوظة
+        Load a saved snapshot
+
+        Raises:
+            ValueError: إذا كان إصدار اللقطة غير مدعوم - Unsupported snapshot version
+        """
+        with np.load(path) as data:
+            wkb = data["wkb"].tobytes()
+            offsets = data["offsets"]
+            meta = json.loads(data["meta"].tobytes().decode())
+
+        if meta.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported spatial index snapshot version: {meta.get('version')}")
+
+        index = cls(partition_key=meta["partition_key"], **kwargs)
+        blobs = [wkb[offsets[i] : offsets[i + 1]] for i in range(len(offsets) - 1)]
+        geoms = shapely.from_wkb(blobs) if blobs else []
+
+        for field, name, geom in zip(meta["fields"], meta["partitions"], geoms, strict=True):
+            partition = index._partitions.setdefault(name, _Partition())
+            partition.add(field, geom)
+            index._partition_of[field["field_id"]] = name
+        index.rebuild()
+        return index
+
+    def get_stats(self) -> dict[str, Any]:
+        """إحصائيات الفهرس - Index statistics"""
+        return {
+            "fields": len(self),
+            "partitions": len(self._partitions),
+            "pending_changes": sum(p.pending for p in self._partitions.values()),
+        }
+
+
+# ============== مصدّر الوحدة - Module Exports ==============
+
+__all__ = ["FieldSpatialIndex"]
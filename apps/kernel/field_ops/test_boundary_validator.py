@@ -8,6 +8,8 @@ Comprehensive examples of using the field boundary validation service
 
 from pathlib import Path
 
+from shapely.geometry import shape
+
 from services.boundary_validator import (
     AREA_LIMITS,
     YEMEN_BOUNDS,
@@ -281,6 +283,52 @@ def test_overlap_detection():
     return overlap_result
 
 
+def test_overlap_with_u_shaped_neighbour():
+    """
+    اختبار التداخل مع حقل على شكل حرف U (تقاطع متعدد الأجزاء)
+    Overlap with a U-shaped neighbour (multipart intersection)
+    """
+    validator = BoundaryValidator()
+
+    new_field = {
+        "type": "Polygon",
+        "coordinates": [
+            [[44.2, 15.35], [44.22, 15.35], [44.22, 15.37], [44.2, 15.37], [44.2, 15.35]]
+        ],
+    }
+    # ذراعا الحقل المجاور تغطيان نصف الحقل الجديد، وقاعدته خارجه
+    # The neighbour's two arms cover half of the new field; its base is outside
+    u_shaped = {
+        "type": "Polygon",
+        "coordinates": [
+            [
+                [44.195, 15.34],
+                [44.205, 15.34],
+                [44.205, 15.371],
+                [44.215, 15.371],
+                [44.215, 15.34],
+                [44.225, 15.34],
+                [44.225, 15.38],
+                [44.195, 15.38],
+                [44.195, 15.34],
+            ]
+        ],
+    }
+
+    overlap_result = validator.check_overlap_with_existing(
+        new_field, [{"field_id": "u_field", "user_id": "user_456", "geometry": u_shaped}]
+    )
+
+    assert overlap_result.has_overlap
+    assert abs(overlap_result.max_overlap_percentage - 50.0) < 0.5
+    assert validator.calculate_overlap_percentage(new_field, u_shaped) > 49.5
+
+    intersection = shape(new_field).intersection(shape(u_shaped))
+    assert intersection.geom_type == "MultiPolygon"
+    assert validator.calculate_perimeter_meters(intersection) > 0
+    return overlap_result
+
+
 def test_geometry_fixing():
     """
     اختبار إصلاح المشاكل الهندسية
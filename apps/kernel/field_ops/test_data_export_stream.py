@@ -0,0 +1,240 @@
+"""
+اختبار التصدير المتدفق - Streaming Data Export Test
+=====================================================
+اختبارات تصدير قراءات المستشعرات على دفعات دون تحميلها كاملة في الذاكرة
+
+Tests for chunked CSV / NDJSON / GeoJSON / Excel exports in DataExporter
+"""
+
+import gzip
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from services.data_exporter import DataExporter, ExportFormat, StreamingExport
+
+
+def make_readings(n: int, sensors: int = 1) -> list[dict]:
+    """
+    قراءات كل 10 دقائق - Readings every 10 minutes
+
+    ``sensors`` readings share each tick, ordered by reading id.
+    """
+    start = datetime(2026, 1, 1)
+    return [
+        {
+            "timestamp": (start + timedelta(minutes=10 * (i // sensors))).isoformat(),
+            "sensor_type": "رطوبة التربة",
+            "sensor_type_en": "soil_moisture",
+            "value": round(20 + (i % 300) / 10, 1),
+            "unit": "%",
+            "location": "منطقة A",
+            "reading_id": f"r{i:06d}",
+        }
+        for i in range(n)
+    ]
+
+
+class PagedExporter(DataExporter):
+    """مصدّر بمخزن قراءات في الذاكرة - Exporter over an in-memory readings store"""
+
+    STREAM_CHUNK_SIZE = 512
+    SENSOR_PAGE_SIZE = 100
+
+    def __init__(self, readings: list[dict]):
+        super().__init__()
+        self.readings = readings
+        self.pages: list[tuple[str, str] | None] = []
+
+    def _get_sensor_readings_page(self, field_id, date_range, after, limit):
+        self.pages.append(after)
+        rows = [r for r in self.readings if after is None or self._sensor_reading_key(r) > after]
+        return rows[:limit]
+
+
+def collect(stream: StreamingExport) -> bytes:
+    return b"".join(stream)
+
+
+def test_streamed_csv_matches_buffered_export():
+    """
+    CSV المتدفق يطابق التصدير الكامل
+    Streamed CSV is byte-identical to the buffered export
+    """
+    readings = make_readings(2_500)
+    exporter = PagedExporter(readings)
+
+    stream = exporter.stream_sensor_readings("F1", ExportFormat.CSV)
+    chunks = list(stream)
+
+    assert b"".join(chunks) == exporter._sensors_to_csv(readings).encode("utf-8")
+    assert len(chunks) > 1
+    assert stream.size_bytes == sum(len(c) for c in chunks)
+    assert stream.filename.endswith(".csv")
+
+
+def test_paged_cursor_reads_every_page():
+    """
+    القراءة بالصفحات تمر على كل القراءات
+    The keyset cursor walks every page once
+    """
+    readings = make_readings(250)
+    exporter = PagedExporter(readings)
+
+    rows = list(exporter._iter_sensor_readings("F1"))
+
+    assert rows == readings
+    assert exporter.pages == [
+        None,
+        (readings[99]["timestamp"], "r000099"),
+        (readings[199]["timestamp"], "r000199"),
+    ]
+
+
+def test_paged_cursor_keeps_readings_sharing_a_tick():
+    """
+    القراءات المتزامنة على حد الصفحة لا تُفقد
+    Readings sharing the boundary timestamp are not dropped
+    """
+    readings = make_readings(250, sensors=3)
+    exporter = PagedExporter(readings)
+
+    rows = list(exporter._iter_sensor_readings("F1"))
+
+    # Page boundaries fall inside a tick: readings 99 and 100 share one
+    assert readings[99]["timestamp"] == readings[100]["timestamp"]
+    assert rows == readings
+
+
+def test_gzip_stream_round_trips():
+    """
+    الضغط بـ gzip قابل للفك
+    Gzip stream decompresses to the plain export
+    """
+    readings = make_readings(1_000)
+    exporter = PagedExporter(readings)
+
+    stream = exporter.stream_sensor_readings("F1", ExportFormat.CSV, compress=True)
+    data = collect(stream)
+
+    assert gzip.decompress(data) == exporter._sensors_to_csv(readings).encode("utf-8")
+    assert stream.filename.endswith(".csv.gz")
+    assert stream.content_type == "application/gzip"
+
+
+def test_ndjson_lines_round_trip():
+    """
+    كل سطر NDJSON قراءة واحدة
+    Each NDJSON line is one reading
+    """
+    readings = make_readings(300)
+    exporter = PagedExporter(readings)
+
+    data = collect(exporter.stream_sensor_readings("F1", ExportFormat.NDJSON))
+
+    assert [json.loads(line) for line in data.decode("utf-8").splitlines()] == readings
+
+
+def test_geojson_feature_collection():
+    """
+    GeoJSON مجموعة نقاط صالحة
+    GeoJSON is a valid point FeatureCollection
+    """
+    readings = make_readings(150)
+    readings[0].update({"lat": 15.4, "lng": 44.2})
+    exporter = PagedExporter(readings)
+
+    collection = json.loads(collect(exporter.stream_sensor_readings("F1", ExportFormat.GEOJSON)))
+
+    assert collection["type"] == "FeatureCollection"
+    assert [f["properties"] for f in collection["features"]] == readings
+    assert collection["features"][0]["geometry"]["coordinates"] == [44.2, 15.4]
+    assert collection["features"][1]["geometry"]["coordinates"] == [44.1910, 15.3694]
+
+    empty = PagedExporter([]).stream_sensor_readings("F1", ExportFormat.GEOJSON)
+    assert json.loads(collect(empty))["features"] == []
+
+
+def test_field_data_ndjson_sections():
+    """
+    NDJSON لبيانات الحقل يوسم كل سجل بنوعه
+    Field data NDJSON tags each record with its section
+    """
+    exporter = PagedExporter(make_readings(120))
+
+    data = collect(exporter.stream_field_data("F1", ExportFormat.NDJSON))
+    records = [json.loads(line) for line in data.decode("utf-8").splitlines()]
+    types = [r["record_type"] for r in records]
+
+    assert types[0] == "metadata"
+    assert types.count("sensor_readings") == 120
+    assert {"ndvi_history", "weather_data", "recommendations", "actions"} <= set(types)
+
+
+def test_write_to_and_upload():
+    """
+    الكتابة إلى ملف والرفع إلى التخزين السحابي
+    Write to a file object and upload through an S3-style client
+    """
+    readings = make_readings(800)
+    expected = PagedExporter(readings)._sensors_to_csv(readings).encode("utf-8")
+
+    output = io.BytesIO()
+    written = PagedExporter(readings).stream_sensor_readings("F1", ExportFormat.CSV)
+    assert written.write_to(output) == len(expected)
+    assert output.getvalue() == expected
+
+    class FakeStorage:
+        def upload_fileobj(self, fileobj, bucket, key, ExtraArgs=None):
+            parts = []
+            while part := fileobj.read(1000):
+                parts.append(part)
+            self.uploaded = (bucket, key, b"".join(parts), ExtraArgs)
+
+    storage = FakeStorage()
+    uploaded = PagedExporter(readings).stream_sensor_readings("F1", ExportFormat.CSV)
+    assert uploaded.upload_to(storage, "exports", "f1.csv") == len(expected)
+    assert storage.uploaded == (
+        "exports",
+        "f1.csv",
+        expected,
+        {"ContentType": uploaded.content_type},
+    )
+
+
+def test_stream_is_single_use_and_validates_format():
+    """
+    التدفق يُستهلك مرة واحدة
+    Streams are single-use and unsupported formats are rejected up front
+    """
+    exporter = PagedExporter(make_readings(10))
+    stream = exporter.stream_sensor_readings("F1", ExportFormat.CSV)
+    collect(stream)
+
+    with pytest.raises(RuntimeError):
+        collect(stream)
+    with pytest.raises(ValueError):
+        exporter.stream_sensor_readings("F1", ExportFormat.PDF)
+    with pytest.raises(ValueError):
+        exporter.stream_field_data("F1", ExportFormat.CSV)
+
+
+def test_excel_write_only_splits_long_sheets():
+    """
+    Excel بوضع الكتابة فقط يقسم الأوراق الطويلة
+    Write-only Excel continues long sheets on numbered sheets
+    """
+    openpyxl = pytest.importorskip("openpyxl")
+    readings = make_readings(250)
+    exporter = PagedExporter(readings)
+    exporter.EXCEL_MAX_DATA_ROWS = 100
+
+    data = collect(exporter.stream_sensor_readings("F1", ExportFormat.EXCEL))
+    wb = openpyxl.load_workbook(io.BytesIO(data))
+
+    assert wb.sheetnames == ["قراءات المستشعرات", "قراءات المستشعرات (2)", "قراءات المستشعرات (3)"]
+    rows = [row for ws in wb for row in ws.iter_rows(min_row=2, values_only=True)]
+    assert [r[0] for r in rows] == [r["timestamp"] for r in readings]
+    assert wb.worksheets[0]["A1"].value == "timestamp"
@@ -0,0 +1,130 @@
+"""
+اختبار الفهرس المكاني للحقول - Field Spatial Index Test
+=========================================================
+اختبارات الفهرس المكاني وكشف التداخل عبر BoundaryValidator
+
+Tests for the field spatial index and indexed overlap detection
+"""
+
+from services.boundary_validator import BoundaryValidator
+from services.spatial_index import FieldSpatialIndex
+
+
+def square(x: float, y: float, size: float = 0.01) -> dict:
+    """مضلع مربع بصيغة GeoJSON - Square GeoJSON polygon"""
+    return {
+        "type": "Polygon",
+        "coordinates": [[[x, y], [x + size, y], [x + size, y + size], [x, y + size], [x, y]]],
+    }
+
+
+def make_field(field_id: str, x: float, y: float, tenant_id: str = "t1", **extra) -> dict:
+    return {"field_id": field_id, "geometry": square(x, y), "tenant_id": tenant_id, **extra}
+
+
+def query_ids(index: FieldSpatialIndex, geometry: dict, partition: str | None = None) -> set:
+    return {field["field_id"] for field, _ in index.query(geometry, partition=partition)}
+
+
+def test_query_returns_only_intersecting_fields():
+    """
+    الاستعلام يرجع الحقول المتقاطعة فقط
+    Query returns only intersecting fields
+    """
+    index = FieldSpatialIndex()
+    index.bulk_load(
+        [
+            make_field("a", 44.20, 15.35),
+            make_field("b", 44.25, 15.35),
+            make_field("c", 44.205, 15.355),
+        ]
+    )
+
+    assert query_ids(index, square(44.201, 15.351, 0.002)) == {"a"}
+    assert query_ids(index, square(44.206, 15.356, 0.002)) == {"a", "c"}
+
+
+def test_partitions_isolate_tenants():
+    """
+    التقسيم يعزل المستأجرين
+    Partitions isolate tenants
+    """
+    index = FieldSpatialIndex()
+    index.bulk_load([make_field("a", 44.2, 15.35, "t1"), make_field("b", 44.2, 15.35, "t2")])
+
+    assert query_ids(index, square(44.2, 15.35), partition="t1") == {"a"}
+    assert query_ids(index, square(44.2, 15.35)) == {"a", "b"}
+    assert query_ids(index, square(44.2, 15.35), partition="missing") == set()
+
+
+def test_incremental_updates_before_and_after_rebuild():
+    """
+    الإضافة والتعديل والحذف قبل إعادة البناء وبعدها
+    Insert, edit and delete before and after a rebuild
+    """
+    index = FieldSpatialIndex(min_rebuild_changes=2)
+    index.bulk_load([make_field("a", 44.2, 15.35)])
+
+    index.upsert(make_field("b", 44.3, 15.35))
+    assert query_ids(index, square(44.3, 15.35)) == {"b"}
+
+    # تعديل الحدود ينقل الحقل - Editing the boundary moves the field
+    index.upsert(make_field("a", 44.4, 15.35))
+    assert query_ids(index, square(44.2, 15.35)) == set()
+    assert query_ids(index, square(44.4, 15.35)) == {"a"}
+
+    assert index.remove("b")
+    assert not index.remove("b")
+    assert query_ids(index, square(44.3, 15.35)) == set()
+    assert len(index) == 1
+    assert index.get_stats()["pending_changes"] <= 2
+
+
+def test_snapshot_round_trip(tmp_path):
+    """
+    حفظ اللقطة وتحميلها
+    Snapshot save and load
+    """
+    index = FieldSpatialIndex(partition_key="governorate")
+    index.bulk_load(
+        [
+            make_field("a", 44.2, 15.35, governorate="صنعاء", name="حقل القمح"),
+            make_field("b", 43.9, 13.5, governorate="تعز"),
+        ]
+    )
+    index.remove("b")
+    path = tmp_path / "fields.npz"
+
+    index.save(path)
+    restored = FieldSpatialIndex.load(path)
+
+    assert len(restored) == 1
+    assert restored.partitions == ["صنعاء"]
+    [(field, _)] = restored.query(square(44.2, 15.35), partition="صنعاء")
+    assert field["name"] == "حقل القمح"
+
+
+def test_validator_uses_spatial_index():
+    """
+    المحقق يستخدم الفهرس ويعطي نفس نتيجة القائمة
+    Validator uses the index and matches the list-based result
+    """
+    fields = [
+        make_field("a", 44.20, 15.35, user_id="u1"),
+        make_field("b", 44.205, 15.355, user_id="u2"),
+        make_field("c", 44.30, 15.35, user_id="u3"),
+    ]
+    index = FieldSpatialIndex()
+    index.bulk_load(fields)
+    validator = BoundaryValidator(spatial_index=index)
+    new_field = square(44.204, 15.354)
+
+    indexed = validator.check_overlap_with_existing(new_field, partition="t1")
+    listed = validator.check_overlap_with_existing(new_field, existing_fields=fields)
+
+    assert indexed.has_overlap
+    assert {f["field_id"] for f in indexed.overlapping_fields} == {"a", "b"}
+    assert indexed.total_overlap_area_hectares == listed.total_overlap_area_hectares
+
+    own = validator.check_overlap_with_existing(new_field, user_id="u1", exclude_field_id="b")
+    assert not own.has_overlap
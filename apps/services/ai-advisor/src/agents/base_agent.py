@@ -133,11 +133,14 @@ class BaseAgent(ABC):
         """
         pass
 
-    def _retrieve_context(self, query: str) -> str:
+    async def _retrieve_context(self, query: str) -> str:
         """
         Retrieve relevant context from RAG system
         استرجاع السياق ذي الصلة من نظام RAG
 
+        Uses the retriever's async path, so embedding the query does not
+        block the event loop.
+
         Args:
             query: Search query | استعلام البحث
 
@@ -148,7 +151,7 @@ class BaseAgent(ABC):
             return ""
 
         try:
-            docs = self.retriever.retrieve(query, top_k=settings.rag_top_k)
+            docs = await self.retriever.aretrieve(query, top_k=settings.rag_top_k)
             context = "\n\n".join([doc.page_content for doc in docs])
             logger.debug("rag_context_retrieved", num_docs=len(docs))
             return context
@@ -177,7 +180,7 @@ class BaseAgent(ABC):
 
             # Add RAG context if enabled | إضافة سياق RAG إذا كان مفعلاً
             if use_rag:
-                rag_context = self._retrieve_context(query)
+                rag_context = await self._retrieve_context(query)
                 if rag_context:
                     context = context or {}
                     context["knowledge_base"] = rag_context
@@ -54,6 +54,11 @@ class Settings(BaseSettings):
     qdrant_collection: str = "agricultural_knowledge"
     qdrant_api_key: str | None = None
 
+    # Vector backend: "qdrant" or "local" (embedded IVF index from advisor.rag.ann_store)
+    # الواجهة الخلفية للمتجهات: Qdrant أو فهرس محلي مدمج
+    vector_backend: str = "qdrant"
+    local_index_path: str | None = None  # None keeps the local index in memory
+
     # NATS Messaging | نظام الرسائل NATS
     nats_url: str = "nats://nats:4222"
     nats_subject_prefix: str = "sahool.ai-advisor"
@@ -61,6 +66,10 @@ class Settings(BaseSettings):
     # Embeddings Model | نموذج التضمينات
     embeddings_model: str = "sentence-transformers/paraphrase-multilingual-mpnet-base-v2"
     embeddings_device: str = "cpu"  # or "cuda" for GPU
+    embeddings_cache_size: int = 10000  # in-memory LRU entries
+    embeddings_cache_dir: str | None = None  # on-disk cache tier, disabled when None
+    embeddings_batch_max_size: int = 64
+    embeddings_batch_max_wait_ms: float = 5.0
 
     # Agent Configuration | إعدادات الوكلاء
     max_agent_iterations: int = 5
@@ -73,6 +82,8 @@ class Settings(BaseSettings):
     # Cache Settings | إعدادات التخزين المؤقت
     enable_cache: bool = True
     cache_ttl: int = 3600  # seconds
+    response_cache_similarity: float = 0.92  # cosine threshold for a cache hit
+    response_cache_max_entries: int = 2000  # per tenant
 
     class Config:
         env_file = ".env"
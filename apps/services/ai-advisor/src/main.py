@@ -27,7 +27,7 @@ from .middleware import (
     InputValidationMiddleware,
 )
 from .monitoring import cost_tracker
-from .orchestration import Supervisor
+from .orchestration import SemanticResponseCache, Supervisor
 from .rag import EmbeddingsManager, KnowledgeRetriever
 from .security import PromptGuard
 from .tools import AgroTool, CropHealthTool, SatelliteTool, WeatherTool
@@ -60,6 +60,7 @@ except ImportError:
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 from shared.errors_py import setup_exception_handlers
 
+from shared.integration import DeadlineMiddleware, close_upstreams
 from shared.middleware import (
     RequestLoggingMiddleware,
     TenantContextMiddleware,
@@ -121,6 +122,15 @@ class QuestionRequest(BaseModel):
     context: dict[str, Any] | None = Field(default=None, description="Additional context")
 
 
+class CacheInvalidationRequest(BaseModel):
+    """Response cache invalidation request | طلب إبطال ذاكرة الاستجابات"""
+
+    tenant_id: str | None = Field(default=None, description="Tenant to invalidate")
+    region: str | None = Field(default=None, description="Governorate/region with new data")
+    field_ids: list[str] = Field(default_factory=list, description="Fields with new data")
+    reason: str = Field(default="weather_update", description="weather_update or ndvi_update")
+
+
 class DiagnoseRequest(BaseModel):
     """Disease diagnosis request | طلب تشخيص مرض"""
 
@@ -232,6 +242,17 @@ async def lifespan(app: FastAPI):
 
         supervisor = Supervisor(agents=agents)
 
+        # Semantic response cache for repeated questions | ذاكرة الاستجابات للأسئلة المتكررة
+        response_cache = None
+        if settings.enable_cache:
+            response_cache = SemanticResponseCache(
+                embed_fn=embeddings_manager.aencode_query,
+                similarity_threshold=settings.response_cache_similarity,
+                ttl_seconds=settings.cache_ttl,
+                max_entries_per_tenant=settings.response_cache_max_entries,
+                cost_tracker=cost_tracker,
+            )
+
         # Initialize context engineering modules | تهيئة وحدات هندسة السياق
         context_compressor = None
         farm_memory = None
@@ -280,10 +301,24 @@ async def lifespan(app: FastAPI):
         }
         app_state["agents"] = agents
         app_state["supervisor"] = supervisor
+        app_state["response_cache"] = response_cache
         app_state["context_compressor"] = context_compressor
         app_state["farm_memory"] = farm_memory
         app_state["recommendation_evaluator"] = recommendation_evaluator
 
+        # Invalidate cached answers on weather/NDVI events | الإبطال عند أحداث الطقس و NDVI
+        if response_cache:
+            try:
+                import nats
+
+                nats_client = await nats.connect(settings.nats_url)
+                await response_cache.subscribe(nats_client)
+                app_state["nats_client"] = nats_client
+                logger.info("response_cache_subscribed", nats_url=settings.nats_url)
+            except Exception as e:
+                # Cache entries still expire by TTL and via /v1/advisor/cache/invalidate
+                logger.warning("response_cache_nats_unavailable", error=str(e))
+
         # Initialize A2A agent if available | تهيئة وكيل A2A إذا كان متاحاً
         if A2A_AVAILABLE:
             try:
@@ -322,6 +357,17 @@ async def lifespan(app: FastAPI):
     if revocation_store := app_state.get("revocation_store"):
         await revocation_store.close()
 
+    # Stop cache invalidation events | إيقاف أحداث إبطال الذاكرة المؤقتة
+    if nats_client := app_state.get("nats_client"):
+        await nats_client.close()
+
+    # Stop the embeddings micro-batcher | إيقاف مجمّع التضمينات
+    if embeddings := app_state.get("embeddings"):
+        await embeddings.close()
+
+    # Close pooled connections to the other services | إغلاق اتصالات الخدمات
+    await close_upstreams()
+
     # Log memory and evaluation statistics | تسجيل إحصائيات الذاكرة والتقييم
     if farm_memory := app_state.get("farm_memory"):
         stats = farm_memory.get_stats()
@@ -386,6 +432,9 @@ if REVOCATION_AVAILABLE:
         exempt_paths=["/healthz", "/health", "/docs", "/redoc", "/openapi.json", "/a2a"],
     )
 
+# 8. Request deadline - Carries the caller's remaining time into tool calls
+app.add_middleware(DeadlineMiddleware)
+
 # Add A2A router if available | إضافة موجه A2A إذا كان متاحاً
 if A2A_AVAILABLE:
 
@@ -460,6 +509,21 @@ async def ask_question(request: QuestionRequest):
                 warnings=warnings,
             )
 
+        # Serve repeated questions from the semantic cache
+        # تقديم الأسئلة المتكررة من الذاكرة الدلالية
+        response_cache = app_state.get("response_cache")
+        cache_tenant = (request.context or {}).get("tenant_id", "default")
+        if response_cache:
+            try:
+                cached = await response_cache.lookup(
+                    cache_tenant, sanitized_question, request.context
+                )
+            except Exception as e:
+                logger.warning("response_cache_lookup_failed", error=str(e))
+                cached = None
+            if cached is not None:
+                return EnhancedAgentResponse(status="success", data=cached.response)
+
         # Compress context if available | ضغط السياق إذا كان متاحاً
         compression_info = None
         compressed_context = request.context
@@ -497,6 +561,24 @@ async def ask_question(request: QuestionRequest):
             context=compressed_context or request.context,
         )
 
+        if response_cache:
+            try:
+                # Rough LLM cost of routing, agent calls and synthesis (~4 chars/token)
+                estimated_cost = cost_tracker.calculate_cost(
+                    settings.claude_model,
+                    input_tokens=(len(sanitized_question) + len(str(request.context or ""))) // 4,
+                    output_tokens=len(str(result)) // 4,
+                )
+                await response_cache.store(
+                    cache_tenant,
+                    sanitized_question,
+                    request.context,
+                    result,
+                    estimated_cost=estimated_cost,
+                )
+            except Exception as e:
+                logger.warning("response_cache_store_failed", error=str(e))
+
         # Store interaction in memory if available | تخزين التفاعل في الذاكرة إذا كان متاحاً
         memory_stored = False
         if CONTEXT_ENGINEERING_AVAILABLE and farm_memory and request.context:
@@ -1073,6 +1155,8 @@ async def get_cost_usage(user_id: str | None = None):
                 "daily_limit_usd": stats["daily_limit"],
                 "monthly_limit_usd": stats["monthly_limit"],
                 "total_requests": stats["total_requests"],
+                "cache_hits": stats["cache_hits"],
+                "cost_saved_usd": round(stats["cost_saved"], 4),
                 "daily_remaining_usd": round(stats["daily_limit"] - stats["daily_cost"], 4),
                 "monthly_remaining_usd": round(stats["monthly_limit"] - stats["monthly_cost"], 4),
                 "daily_usage_percent": round((stats["daily_cost"] / stats["daily_limit"]) * 100, 2)
@@ -1091,6 +1175,37 @@ async def get_cost_usage(user_id: str | None = None):
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 
+@app.get("/v1/advisor/cache/stats", tags=["Monitoring"])
+async def get_response_cache_stats():
+    """
+    Get semantic response cache statistics
+    الحصول على إحصائيات ذاكرة الاستجابات
+    """
+    response_cache = app_state.get("response_cache")
+    if not response_cache:
+        return {"status": "disabled"}
+    return {"status": "success", "data": response_cache.get_stats()}
+
+
+@app.post("/v1/advisor/cache/invalidate", tags=["Monitoring"])
+async def invalidate_response_cache(request: CacheInvalidationRequest):
+    """
+    Invalidate cached answers after weather or NDVI updates
+    إبطال الإجابات المخزنة بعد تحديثات الطقس أو NDVI
+    """
+    response_cache = app_state.get("response_cache")
+    if not response_cache:
+        return {"status": "disabled", "removed": 0}
+
+    removed = response_cache.invalidate(
+        tenant_id=request.tenant_id,
+        region=request.region,
+        field_ids=request.field_ids,
+    )
+    logger.info("response_cache_invalidation_requested", reason=request.reason, removed=removed)
+    return {"status": "success", "removed": removed}
+
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -48,6 +48,8 @@ class CostTracker:
     _records: list = field(default_factory=list)
     _daily_costs: dict[str, float] = field(default_factory=lambda: defaultdict(float))
     _monthly_costs: dict[str, float] = field(default_factory=lambda: defaultdict(float))
+    _cache_hits: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    _cost_saved: dict[str, float] = field(default_factory=lambda: defaultdict(float))
     _lock: asyncio.Lock = field(default_factory=asyncio.Lock)
 
     def calculate_cost(self, model: str, input_tokens: int, output_tokens: int) -> float:
@@ -95,6 +97,13 @@ class CostTracker:
 
         return record
 
+    async def record_cache_hit(self, saved_cost: float, user_id: str | None = None) -> None:
+        """Record an LLM call avoided by the response cache"""
+        user_key = user_id or "anonymous"
+        async with self._lock:
+            self._cache_hits[user_key] += 1
+            self._cost_saved[user_key] += saved_cost
+
     async def check_budget(self, user_id: str | None = None) -> tuple[bool, str]:
         """Check if user is within budget limits"""
         user_key = user_id or "anonymous"
@@ -127,6 +136,8 @@ class CostTracker:
             "daily_limit": self.daily_limit,
             "monthly_limit": self.monthly_limit,
             "total_requests": len(self._records),
+            "cache_hits": self._cache_hits.get(user_key, 0),
+            "cost_saved": round(self._cost_saved.get(user_key, 0.0), 6),
         }
 
     def cleanup_old_records(self, days: int = 30):
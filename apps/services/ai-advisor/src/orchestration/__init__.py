@@ -6,10 +6,12 @@ Coordinates multiple agents and manages workflows.
 تنسق وكلاء متعددين وتدير سير العمل.
 """
 
+from .response_cache import SemanticResponseCache
 from .supervisor import Supervisor
 from .workflow import Workflow
 
 __all__ = [
+    "SemanticResponseCache",
     "Supervisor",
     "Workflow",
 ]
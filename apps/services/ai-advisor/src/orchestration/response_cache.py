@@ -0,0 +1,416 @@
+"""
+Semantic Response Cache
+ذاكرة مؤقتة دلالية للاستجابات
+
+Caches supervisor answers for near-identical farmer questions, e.g. "when
+should I irrigate tomatoes this week?" asked by many farmers in the same
+governorate. Entries are keyed by:
+- tenant (strict isolation, never shared across tenants)
+- context fingerprint: crop, region, growth stage and date bucket (ISO week)
+- normalized query embedding, matched by cosine similarity threshold
+
+Entries expire by TTL and are invalidated early by weather or NDVI updates
+for their region or field. Hits and estimated cost saved are reported to
+the CostTracker.
+"""
+
+import json
+import re
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Any
+
+import numpy as np
+import structlog
+
+logger = structlog.get_logger()
+
+EmbedFn = Callable[[str], Awaitable[np.ndarray]]
+
+# Event subjects that make cached advice stale
+# مواضيع الأحداث التي تجعل النصائح المخزنة قديمة
+INVALIDATING_SUBJECT_PREFIXES = ("sahool.weather.", "sahool.ndvi.", "sahool.satellite.ndvi.")
+INVALIDATING_SUBJECTS = tuple(f"{prefix}>" for prefix in INVALIDATING_SUBJECT_PREFIXES)
+
+_DIACRITICS_RE = re.compile(r"[\u064B-\u065F\u0670\u0640]")
+_PUNCTUATION_RE = re.compile(r"[^\w\s]")
+_ARABIC_FOLDING = str.maketrans({"أ": "ا", "إ": "ا", "آ": "ا", "ى": "ي", "ة": "ه"})
+
+_CROP_KEYS = ("crop", "crop_type", "crop_name")
+_REGION_KEYS = ("governorate", "region", "location")
+_STAGE_KEYS = ("growth_stage", "stage")
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize a question before embedding
+    تطبيع السؤال قبل التضمين
+
+    Lower-cases, strips punctuation and Arabic diacritics, folds alef/yaa/
+    taa-marbuta variants and collapses whitespace.
+    """
+    text = _DIACRITICS_RE.sub("", query).translate(_ARABIC_FOLDING).lower()
+    text = _PUNCTUATION_RE.sub(" ", text)
+    return " ".join(text.split())
+
+
+def _first(context: dict[str, Any], keys: tuple[str, ...]) -> str | None:
+    for key in keys:
+        value = context.get(key)
+        if value:
+            return str(value).strip().lower()
+    return None
+
+
+def context_fingerprint(context: dict[str, Any] | None, now: datetime | None = None) -> str:
+    """
+    Fingerprint of the context an answer depends on
+    بصمة السياق الذي تعتمد عليه الإجابة
+
+    Combines crop, region, growth stage and the ISO week, so answers are
+    never reused across crops, regions, stages or weeks.
+    """
+    context = context or {}
+    year, week, _ = (now or datetime.now(UTC)).isocalendar()
+    return "|".join(
+        [
+            _first(context, _CROP_KEYS) or "-",
+            _first(context, _REGION_KEYS) or "-",
+            _first(context, _STAGE_KEYS) or "-",
+            f"{year}-W{week:02d}",
+        ]
+    )
+
+
+@dataclass
+class CachedResponse:
+    """A cached supervisor answer | إجابة مخزنة"""
+
+    response: Any
+    query: str
+    embedding: np.ndarray
+    region: str | None
+    field_id: str | None
+    created_at: float
+    expires_at: float
+    estimated_cost: float = 0.0
+    hits: int = 0
+
+
+@dataclass
+class ResponseCacheStats:
+    """Response cache counters | عدادات ذاكرة الاستجابات"""
+
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    invalidations: int = 0
+    expirations: int = 0
+    cost_saved: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 4),
+            "stores": self.stores,
+            "invalidations": self.invalidations,
+            "expirations": self.expirations,
+            "cost_saved": round(self.cost_saved, 6),
+        }
+
+
+@dataclass
+class _Bucket:
+    """Entries sharing a tenant and context fingerprint"""
+
+    entries: list[CachedResponse] = field(default_factory=list)
+    matrix: np.ndarray | None = None  # stacked unit embeddings, rebuilt lazily
+
+    def embeddings(self) -> np.ndarray:
+        if self.matrix is None:
+            self.matrix = np.stack([entry.embedding for entry in self.entries])
+        return self.matrix
+
+
+class SemanticResponseCache:
+    """
+    Tenant-isolated semantic cache for advisor responses
+    ذاكرة مؤقتة دلالية معزولة لكل مستأجر لاستجابات المستشار
+    """
+
+    def __init__(
+        self,
+        embed_fn: EmbedFn,
+        similarity_threshold: float = 0.92,
+        ttl_seconds: float = 6 * 3600,
+        max_entries_per_tenant: int = 2000,
+        cost_tracker=None,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Args:
+            embed_fn: Async text embedder | دالة تضمين غير متزامنة
+            similarity_threshold: Minimum cosine similarity for a hit | الحد الأدنى للتشابه
+            ttl_seconds: Entry lifetime | مدة صلاحية المدخل
+            max_entries_per_tenant: Per-tenant capacity | السعة لكل مستأجر
+            cost_tracker: CostTracker receiving cache-hit savings | متتبع التكاليف
+            clock: Time source (seconds) | مصدر الوقت
+        """
+        self.embed_fn = embed_fn
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries_per_tenant = max_entries_per_tenant
+        self.cost_tracker = cost_tracker
+        self.clock = clock
+        self.stats = ResponseCacheStats()
+        self._buckets: dict[tuple[str, str], _Bucket] = {}
+        self._tenant_sizes: dict[str, int] = {}
+
+    async def _embed(self, query: str) -> np.ndarray:
+        vector = np.asarray(await self.embed_fn(normalize_query(query)), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _fingerprint(self, context: dict[str, Any] | None) -> str:
+        return context_fingerprint(context, datetime.fromtimestamp(self.clock(), UTC))
+
+    def _purge_expired(self, key: tuple[str, str]) -> None:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return
+        now = self.clock()
+        expired = {i for i, entry in enumerate(bucket.entries) if entry.expires_at <= now}
+        if expired:
+            self.stats.expirations += len(expired)
+            self._remove(key, expired)
+
+    def _remove(self, key: tuple[str, str], indices: set[int]) -> None:
+        bucket = self._buckets[key]
+        bucket.entries = [e for i, e in enumerate(bucket.entries) if i not in indices]
+        bucket.matrix = None
+        self._tenant_sizes[key[0]] -= len(indices)
+        if not bucket.entries:
+            del self._buckets[key]
+
+    async def lookup(
+        self,
+        tenant_id: str,
+        query: str,
+        context: dict[str, Any] | None = None,
+    ) -> CachedResponse | None:
+        """
+        Find a cached answer for a similar question in the same context
+        البحث عن إجابة مخزنة لسؤال مشابه في نفس السياق
+
+        Returns:
+            The best matching entry above the threshold, or None
+        """
+        key = (tenant_id, self._fingerprint(context))
+        if key not in self._buckets:
+            self.stats.misses += 1
+            return None
+
+        query_embedding = await self._embed(query)
+        self._purge_expired(key)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            self.stats.misses += 1
+            return None
+
+        similarities = bucket.embeddings() @ query_embedding
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.similarity_threshold:
+            self.stats.misses += 1
+            return None
+
+        entry = bucket.entries[best]
+        entry.hits += 1
+        self.stats.hits += 1
+        self.stats.cost_saved += entry.estimated_cost
+        if self.cost_tracker is not None:
+            await self.cost_tracker.record_cache_hit(entry.estimated_cost, user_id=tenant_id)
+
+        logger.info(
+            "response_cache_hit",
+            tenant_id=tenant_id,
+            similarity=round(float(similarities[best]), 4),
+            cost_saved=entry.estimated_cost,
+        )
+        return entry
+
+    async def store(
+        self,
+        tenant_id: str,
+        query: str,
+        context: dict[str, Any] | None,
+        response: Any,
+        estimated_cost: float = 0.0,
+    ) -> CachedResponse:
+        """
+        Cache an answer
+        تخزين إجابة
+
+        Args:
+            tenant_id: Tenant identifier | معرف المستأجر
+            query: Original question | السؤال الأصلي
+            context: Request context used for the fingerprint | سياق الطلب
+            response: Supervisor result to reuse | نتيجة المشرف
+            estimated_cost: LLM cost avoided by each future hit | التكلفة المقدرة
+        """
+        context = context or {}
+        embedding = await self._embed(query)
+        now = self.clock()
+        entry = CachedResponse(
+            response=response,
+            query=query,
+            embedding=embedding,
+            region=_first(context, _REGION_KEYS),
+            field_id=str(context["field_id"]) if context.get("field_id") else None,
+            created_at=now,
+            expires_at=now + self.ttl_seconds,
+            estimated_cost=estimated_cost,
+        )
+
+        key = (tenant_id, self._fingerprint(context))
+        self._purge_expired(key)
+        bucket = self._buckets.setdefault(key, _Bucket())
+        bucket.entries.append(entry)
+        bucket.matrix = None
+        self._tenant_sizes[tenant_id] = self._tenant_sizes.get(tenant_id, 0) + 1
+        self.stats.stores += 1
+
+        if self._tenant_sizes[tenant_id] > self.max_entries_per_tenant:
+            self._evict_oldest(tenant_id)
+        return entry
+
+    def _evict_oldest(self, tenant_id: str) -> None:
+        oldest_key, oldest_index, oldest_time = None, -1, float("inf")
+        for key, bucket in self._buckets.items():
+            if key[0] != tenant_id:
+                continue
+            for i, entry in enumerate(bucket.entries):
+                if entry.created_at < oldest_time:
+                    oldest_key, oldest_index, oldest_time = key, i, entry.created_at
+        if oldest_key is not None:
+            self._remove(oldest_key, {oldest_index})
+
+    def invalidate(
+        self,
+        tenant_id: str | None = None,
+        region: str | None = None,
+        field_ids: list[str] | None = None,
+    ) -> int:
+        """
+        Drop entries made stale by new weather or NDVI data
+        حذف المدخلات التي أصبحت قديمة بسبب بيانات طقس أو NDVI جديدة
+
+        Entries match when they belong to the tenant (if given) and to the
+        region or one of the fields (if given). With no region or fields,
+        every entry of the tenant (or of all tenants) is dropped.
+
+        Returns:
+            Number of entries removed | عدد المدخلات المحذوفة
+        """
+        region = region.strip().lower() if region else None
+        field_set = {str(f) for f in field_ids or [] if f}
+        removed = 0
+
+        for key in list(self._buckets):
+            if tenant_id is not None and key[0] != tenant_id:
+                continue
+            stale = {
+                i
+                for i, entry in enumerate(self._buckets[key].entries)
+                if (not region and not field_set)
+                or (region and entry.region == region)
+                or (entry.field_id in field_set)
+            }
+            if stale:
+                self._remove(key, stale)
+                removed += len(stale)
+
+        self.stats.invalidations += removed
+        if removed:
+            logger.info(
+                "response_cache_invalidated",
+                tenant_id=tenant_id,
+                region=region,
+                fields=len(field_set),
+                removed=removed,
+            )
+        return removed
+
+    def handle_event(self, subject: str, payload: dict[str, Any]) -> int:
+        """
+        Invalidate on weather and NDVI events
+        الإبطال عند أحداث الطقس و NDVI
+
+        Args:
+            subject: Event subject, e.g. "sahool.weather.forecast" | موضوع الحدث
+            payload: Event payload | حمولة الحدث
+
+        Returns:
+            Number of entries removed | عدد المدخلات المحذوفة
+        """
+        if not subject.startswith(INVALIDATING_SUBJECT_PREFIXES):
+            return 0
+
+        field_ids = list(payload.get("field_ids") or [])
+        if payload.get("field_id"):
+            field_ids.append(payload["field_id"])
+
+        tenant_id = payload.get("tenant_id")
+        return self.invalidate(
+            tenant_id=str(tenant_id) if tenant_id else None,
+            region=payload.get("governorate") or payload.get("region"),
+            field_ids=[str(f) for f in field_ids],
+        )
+
+    async def on_message(self, msg: Any) -> None:
+        """
+        NATS callback: unwrap the event envelope and invalidate
+        معالج NATS: فك غلاف الحدث والإبطال
+        """
+        try:
+            event = json.loads(msg.data.decode())
+        except (UnicodeDecodeError, ValueError):
+            logger.warning("response_cache_event_undecodable", subject=msg.subject)
+            return
+        if not isinstance(event, dict):
+            return
+
+        payload = event.get("payload")
+        if isinstance(payload, dict):
+            event = {"tenant_id": event.get("tenant_id"), **payload}
+        self.handle_event(msg.subject, event)
+
+    async def subscribe(self, nc: Any) -> list[Any]:
+        """
+        Subscribe to the weather and NDVI subjects on a NATS connection
+        الاشتراك في مواضيع الطقس و NDVI
+
+        Returns:
+            The subscriptions, for unsubscribing on shutdown | الاشتراكات
+        """
+        return [
+            await nc.subscribe(subject, cb=self.on_message) for subject in INVALIDATING_SUBJECTS
+        ]
+
+    def get_stats(self) -> dict[str, Any]:
+        """
+        Cache statistics
+        إحصائيات الذاكرة المؤقتة
+        """
+        return {
+            **self.stats.to_dict(),
+            "entries": sum(self._tenant_sizes.values()),
+            "tenants": sum(1 for size in self._tenant_sizes.values() if size),
+        }
@@ -0,0 +1,299 @@
+"""
+Embedding Cache and Micro-Batcher
+ذاكرة التضمينات المؤقتة والتجميع الدقيق
+
+Two building blocks for EmbeddingsManager:
+- EmbeddingCache: content-hash keyed cache with an in-memory LRU tier and an
+  optional on-disk tier (one .npy file per embedding)
+- MicroBatcher: collects concurrent encode requests for a few milliseconds
+  and encodes them in one forward pass on a worker thread, so the model
+  never blocks the event loop
+"""
+
+import asyncio
+import hashlib
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+import structlog
+
+logger = structlog.get_logger()
+
+
+def content_key(model_name: str, text: str) -> str:
+    """
+    Cache key for a text under a given model
+    مفتاح التخزين المؤقت لنص ونموذج
+    """
+    return hashlib.sha256(f"{model_name}\x00{text}".encode()).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    """Embedding cache counters | عدادات ذاكرة التضمينات"""
+
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.memory_hits + self.disk_hits + self.misses
+        return (self.memory_hits + self.disk_hits) / total if total else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 4),
+        }
+
+
+class EmbeddingCache:
+    """
+    Two-tier embedding cache
+    ذاكرة تضمينات مؤقتة بمستويين
+
+    Memory tier is an LRU bounded by entry count. The disk tier, when a
+    directory is configured, keeps every embedding it has seen and
+    promotes disk hits back into memory.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        max_entries: int = 10_000,
+        disk_dir: str | Path | None = None,
+    ):
+        """
+        Args:
+            model_name: Embedding model name, part of the cache key | اسم النموذج
+            max_entries: In-memory LRU capacity | سعة الذاكرة
+            disk_dir: Directory for the on-disk tier | مجلد التخزين على القرص
+        """
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.stats = CacheStats()
+        self._memory: OrderedDict[str, np.ndarray] = OrderedDict()
+
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / key[:2] / f"{key}.npy"
+
+    def _remember(self, key: str, embedding: np.ndarray) -> None:
+        self._memory[key] = embedding
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, text: str) -> np.ndarray | None:
+        """
+        Look up one embedding
+        البحث عن تضمين واحد
+        """
+        key = content_key(self.model_name, text)
+
+        embedding = self._memory.get(key)
+        if embedding is not None:
+            self._memory.move_to_end(key)
+            self.stats.memory_hits += 1
+            return embedding
+
+        if self.disk_dir is not None:
+            path = self._disk_path(key)
+            try:
+                embedding = np.load(path)
+            except (FileNotFoundError, ValueError, OSError):
+                embedding = None
+            if embedding is not None:
+                self._remember(key, embedding)
+                self.stats.disk_hits += 1
+                return embedding
+
+        self.stats.misses += 1
+        return None
+
+    def put(self, text: str, embedding: np.ndarray) -> None:
+        """
+        Store one embedding in both tiers
+        تخزين تضمين في المستويين
+        """
+        key = content_key(self.model_name, text)
+        self._remember(key, embedding)
+
+        if self.disk_dir is not None:
+            path = self._disk_path(key)
+            if path.exists():
+                return
+            try:
+                path.parent.mkdir(exist_ok=True)
+                # Atomic write so readers never see a partial file
+                fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+                with os.fdopen(fd, "wb") as f:
+                    np.save(f, embedding)
+                os.replace(tmp, path)
+            except OSError as e:
+                logger.warning("embedding_cache_disk_write_failed", error=str(e))
+
+    def get_many(self, texts: list[str]) -> tuple[list[np.ndarray | None], list[int]]:
+        """
+        Look up many embeddings
+        البحث عن عدة تضمينات
+
+        Returns:
+            (embeddings with None for misses, indices of misses)
+        """
+        found = [self.get(text) for text in texts]
+        missing = [i for i, embedding in enumerate(found) if embedding is None]
+        return found, missing
+
+
+@dataclass
+class BatcherStats:
+    """Micro-batcher metrics | مقاييس التجميع الدقيق"""
+
+    batches: int = 0
+    items: int = 0
+    max_batch_size: int = 0
+    total_queue_wait_ms: float = 0.0
+    max_queue_wait_ms: float = 0.0
+    batch_size_histogram: dict[int, int] = field(default_factory=dict)
+
+    def record(self, batch_size: int, waits_ms: list[float]) -> None:
+        self.batches += 1
+        self.items += batch_size
+        self.max_batch_size = max(self.max_batch_size, batch_size)
+        self.total_queue_wait_ms += sum(waits_ms)
+        self.max_queue_wait_ms = max(self.max_queue_wait_ms, max(waits_ms, default=0.0))
+        # Power-of-two buckets: 1, 2, 4, 8, ...
+        bucket = 1 << max(0, batch_size - 1).bit_length()
+        self.batch_size_histogram[bucket] = self.batch_size_histogram.get(bucket, 0) + 1
+
+    def to_dict(self) -> dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "avg_queue_wait_ms": round(self.total_queue_wait_ms / self.items, 3)
+            if self.items
+            else 0.0,
+            "max_queue_wait_ms": round(self.max_queue_wait_ms, 3),
+            "batch_size_histogram": dict(sorted(self.batch_size_histogram.items())),
+        }
+
+
+class MicroBatcher:
+    """
+    Async dynamic micro-batcher for an encode function
+    مجمّع دقيق غير متزامن لدالة الترميز
+
+    The first request of a batch opens a collection window of
+    ``max_wait_ms``; the batch is flushed when the window closes or
+    ``max_batch_size`` requests have arrived. ``encode_fn`` runs on a
+    dedicated worker thread.
+    """
+
+    def __init__(
+        self,
+        encode_fn: Callable[[list[str]], np.ndarray],
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5.0,
+        max_workers: int = 1,
+    ):
+        """
+        Args:
+            encode_fn: Encodes a list of texts into a 2-D array | دالة الترميز
+            max_batch_size: Maximum texts per forward pass | أقصى حجم للدفعة
+            max_wait_ms: Maximum time to hold the first request | أقصى زمن انتظار
+            max_workers: Worker threads running the model | عدد خيوط العمل
+        """
+        self.encode_fn = encode_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.stats = BatcherStats()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="embeddings"
+        )
+        self._queue: asyncio.Queue | None = None
+        self._worker: asyncio.Task | None = None
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def _ensure_worker(self) -> asyncio.Queue:
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+        return self._queue
+
+    async def submit(self, text: str) -> np.ndarray:
+        """
+        Encode one text as part of the next batch
+        ترميز نص واحد ضمن الدفعة التالية
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._ensure_worker().put((text, future, time.perf_counter()))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        queue = self._queue
+
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.max_wait_ms / 1000
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except TimeoutError:
+                    break
+
+            started = time.perf_counter()
+            texts = [text for text, _, _ in batch]
+            self.stats.record(len(batch), [(started - enqueued) * 1000 for _, _, enqueued in batch])
+
+            try:
+                embeddings = await loop.run_in_executor(self._executor, self.encode_fn, texts)
+            except Exception as e:
+                logger.error("embedding_batch_failed", error=str(e), batch_size=len(batch))
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future, _), embedding in zip(batch, embeddings, strict=False):
+                if not future.done():
+                    future.set_result(embedding)
+
+    async def close(self) -> None:
+        """
+        Stop the worker and release the thread pool
+        إيقاف العامل وتحرير الخيوط
+        """
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        self._executor.shutdown(wait=False)
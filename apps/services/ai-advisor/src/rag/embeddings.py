@@ -2,7 +2,8 @@
 Embeddings Manager
 مدير التضمينات
 
-Manages text embeddings using sentence-transformers.
+Manages text embeddings using sentence-transformers, with a two-tier
+embedding cache and an async micro-batcher for concurrent queries.
 يدير تضمينات النصوص باستخدام sentence-transformers.
 """
 
@@ -11,6 +12,7 @@ import structlog
 from sentence_transformers import SentenceTransformer
 
 from ..config import settings
+from .embedding_cache import EmbeddingCache, MicroBatcher
 
 logger = structlog.get_logger()
 
@@ -48,6 +50,19 @@ class EmbeddingsManager:
 
         self.embedding_dimension = self.model.get_sentence_embedding_dimension()
 
+        # Content-hash keyed cache and query micro-batcher
+        # ذاكرة مؤقتة للتضمينات ومجمّع دقيق للاستعلامات
+        self.cache = EmbeddingCache(
+            self.model_name,
+            max_entries=settings.embeddings_cache_size,
+            disk_dir=settings.embeddings_cache_dir,
+        )
+        self.batcher = MicroBatcher(
+            self._encode_batch,
+            max_batch_size=settings.embeddings_batch_max_size,
+            max_wait_ms=settings.embeddings_batch_max_wait_ms,
+        )
+
         logger.info(
             "embeddings_model_loaded",
             model_name=self.model_name,
@@ -64,6 +79,8 @@ class EmbeddingsManager:
         Generate embeddings for text(s)
         توليد التضمينات للنص/النصوص
 
+        Cached embeddings are reused; only cache misses reach the model.
+
         Args:
             texts: Single text or list of texts | نص واحد أو قائمة نصوص
             batch_size: Batch size for encoding | حجم الدفعة للترميز
@@ -78,18 +95,29 @@ class EmbeddingsManager:
             if isinstance(texts, str):
                 texts = [texts]
 
-            # Generate embeddings
-            # توليد التضمينات
-            embeddings = self.model.encode(
-                texts,
-                batch_size=batch_size,
-                show_progress_bar=show_progress,
-                convert_to_numpy=True,
-            )
+            # Reuse cached embeddings
+            # إعادة استخدام التضمينات المخزنة
+            found, missing = self.cache.get_many(texts)
+
+            # Generate embeddings for cache misses
+            # توليد التضمينات للنصوص غير المخزنة
+            if missing:
+                generated = self.model.encode(
+                    [texts[i] for i in missing],
+                    batch_size=batch_size,
+                    show_progress_bar=show_progress,
+                    convert_to_numpy=True,
+                )
+                for i, embedding in zip(missing, generated, strict=False):
+                    found[i] = embedding
+                    self.cache.put(texts[i], embedding)
+
+            embeddings = np.stack(found)
 
             logger.debug(
                 "embeddings_generated",
                 num_texts=len(texts),
+                num_cache_misses=len(missing),
                 embedding_shape=embeddings.shape,
             )
 
@@ -112,6 +140,39 @@ class EmbeddingsManager:
         """
         return self.encode(query)[0]
 
+    def _encode_batch(self, texts: list[str]) -> np.ndarray:
+        """
+        Encode a micro-batch on the worker thread (bypasses the cache)
+        ترميز دفعة على خيط العمل
+        """
+        return self.model.encode(texts, show_progress_bar=False, convert_to_numpy=True)
+
+    async def aencode_query(self, query: str) -> np.ndarray:
+        """
+        Generate a query embedding without blocking the event loop
+        توليد تضمين الاستعلام دون حجب حلقة الأحداث
+
+        Concurrent callers share one forward pass through the micro-batcher.
+
+        Args:
+            query: Search query | استعلام البحث
+
+        Returns:
+            Query embedding | تضمين الاستعلام
+        """
+        embedding = self.cache.get(query)
+        if embedding is None:
+            embedding = await self.batcher.submit(query)
+            self.cache.put(query, embedding)
+        return embedding
+
+    async def close(self) -> None:
+        """
+        Stop the micro-batcher
+        إيقاف المجمّع الدقيق
+        """
+        await self.batcher.close()
+
     def encode_documents(
         self,
         documents: list[str],
@@ -204,4 +265,6 @@ class EmbeddingsManager:
             "embedding_dimension": self.embedding_dimension,
             "device": self.device,
             "max_sequence_length": self.model.max_seq_length,
+            "cache": {"entries": len(self.cache), **self.cache.stats.to_dict()},
+            "batcher": {"queue_depth": self.batcher.queue_depth, **self.batcher.stats.to_dict()},
         }
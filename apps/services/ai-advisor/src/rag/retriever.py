@@ -2,10 +2,12 @@
 Knowledge Retriever
 مسترجع المعرفة
 
-Retrieves relevant knowledge from Qdrant vector database.
+Retrieves relevant knowledge from Qdrant vector database, or from an
+embedded in-process IVF index when ``vector_backend`` is "local".
 يسترجع المعرفة ذات الصلة من قاعدة بيانات المتجهات Qdrant.
 """
 
+import asyncio
 from dataclasses import dataclass
 from typing import Any
 
@@ -23,8 +25,20 @@ from qdrant_client.models import (
 from ..config import settings
 from .embeddings import EmbeddingsManager
 
+# Optional import - the embedded index ships with the advisor package
+try:
+    from advisor.rag.ann_store import IVFIndex
+
+    LOCAL_INDEX_AVAILABLE = True
+except ImportError:
+    IVFIndex = None  # type: ignore
+    LOCAL_INDEX_AVAILABLE = False
+
 logger = structlog.get_logger()
 
+# Payload keys the local index can filter on natively
+_LOCAL_INDEXED_FILTERS = ("tenant_id", "category")
+
 
 @dataclass
 class Document:
@@ -52,6 +66,7 @@ class KnowledgeRetriever:
         self,
         embeddings_manager: EmbeddingsManager | None = None,
         collection_name: str | None = None,
+        local_index: "IVFIndex | None" = None,
     ):
         """
         Initialize knowledge retriever
@@ -60,9 +75,30 @@ class KnowledgeRetriever:
         Args:
             embeddings_manager: Embeddings manager instance | مثيل مدير التضمينات
             collection_name: Qdrant collection name | اسم مجموعة Qdrant
+            local_index: Embedded vector index used instead of Qdrant | فهرس متجهات محلي
         """
         self.embeddings = embeddings_manager or EmbeddingsManager()
         self.collection_name = collection_name or settings.qdrant_collection
+        self.local_index = local_index
+
+        if self.local_index is None and settings.vector_backend == "local":
+            if not LOCAL_INDEX_AVAILABLE:
+                raise RuntimeError(
+                    "vector_backend=local requires the advisor package on PYTHONPATH"
+                )
+            self.local_index = IVFIndex(
+                self.embeddings.embedding_dimension,
+                path=settings.local_index_path,
+            )
+
+        if self.local_index is not None:
+            self.client = None
+            logger.info(
+                "knowledge_retriever_initialized",
+                collection_name=self.collection_name,
+                vector_backend="local",
+            )
+            return
 
         # Initialize Qdrant client
         # تهيئة عميل Qdrant
@@ -145,6 +181,23 @@ class KnowledgeRetriever:
 
                 ids = [str(uuid.uuid4()) for _ in documents]
 
+            if self.local_index is not None:
+                self.local_index.upsert(
+                    ids,
+                    embeddings,
+                    [
+                        {"content": document, **metadata}
+                        for document, metadata in zip(documents, metadatas, strict=False)
+                    ],
+                )
+                self.local_index.flush()
+                logger.info(
+                    "documents_added_to_knowledge_base",
+                    num_documents=len(documents),
+                    collection_name=self.collection_name,
+                )
+                return True
+
             # Create points
             # إنشاء النقاط
             points = [
@@ -186,6 +239,7 @@ class KnowledgeRetriever:
         top_k: int = None,
         score_threshold: float = None,
         filters: dict[str, Any] | None = None,
+        query_embedding=None,
     ) -> list[Document]:
         """
         Retrieve relevant documents
@@ -196,6 +250,7 @@ class KnowledgeRetriever:
             top_k: Number of documents to retrieve | عدد المستندات المراد استرجاعها
             score_threshold: Minimum similarity score | الحد الأدنى لدرجة التشابه
             filters: Metadata filters | فلاتر البيانات الوصفية
+            query_embedding: Precomputed query embedding | تضمين استعلام محسوب مسبقاً
 
         Returns:
             List of retrieved documents | قائمة المستندات المستردة
@@ -203,13 +258,26 @@ class KnowledgeRetriever:
         try:
             # Generate query embedding
             # توليد تضمين الاستعلام
-            query_embedding = self.embeddings.encode_query(query)
+            if query_embedding is None:
+                query_embedding = self.embeddings.encode_query(query)
 
             # Set defaults
             # تعيين القيم الافتراضية
             top_k = top_k or settings.rag_top_k
             score_threshold = score_threshold or settings.rag_score_threshold
 
+            if self.local_index is not None:
+                documents = self._retrieve_local(
+                    query_embedding, top_k, score_threshold, filters or {}
+                )
+                logger.info(
+                    "knowledge_retrieved",
+                    query_length=len(query),
+                    num_results=len(documents),
+                    top_score=documents[0].score if documents else 0,
+                )
+                return documents
+
             # Build filter if provided
             # بناء الفلتر إذا تم توفيره
             query_filter = None
@@ -257,6 +325,72 @@ class KnowledgeRetriever:
             logger.error("knowledge_retrieval_failed", error=str(e), query=query[:100])
             return []
 
+    async def aretrieve(
+        self,
+        query: str,
+        top_k: int = None,
+        score_threshold: float = None,
+        filters: dict[str, Any] | None = None,
+    ) -> list[Document]:
+        """
+        Retrieve relevant documents without blocking the event loop
+        استرجاع المستندات دون حجب حلقة الأحداث
+
+        The query is embedded through the micro-batcher and the vector
+        search runs on a worker thread.
+        """
+        try:
+            query_embedding = await self.embeddings.aencode_query(query)
+        except Exception as e:
+            logger.error("knowledge_retrieval_failed", error=str(e), query=query[:100])
+            return []
+
+        return await asyncio.to_thread(
+            self.retrieve, query, top_k, score_threshold, filters, query_embedding
+        )
+
+    def _retrieve_local(
+        self,
+        query_embedding,
+        top_k: int,
+        score_threshold: float,
+        filters: dict[str, Any],
+    ) -> list[Document]:
+        """
+        Search the embedded index
+        البحث في الفهرس المحلي
+
+        tenant_id and category filters are applied by the index; other
+        metadata filters are applied to an over-fetched candidate set.
+        """
+        extra_filters = {k: v for k, v in filters.items() if k not in _LOCAL_INDEXED_FILTERS}
+        fetch = top_k * 4 if extra_filters else top_k
+
+        hits = self.local_index.search(
+            query_embedding,
+            fetch,
+            tenant_id=filters.get("tenant_id"),
+            category=filters.get("category"),
+        )
+
+        documents = []
+        for doc_id, score, payload in hits:
+            if score < score_threshold:
+                break
+            if any(payload.get(k) != v for k, v in extra_filters.items()):
+                continue
+            documents.append(
+                Document(
+                    content=payload.get("content", ""),
+                    metadata={k: v for k, v in payload.items() if k != "content"},
+                    score=score,
+                    id=doc_id,
+                )
+            )
+            if len(documents) == top_k:
+                break
+        return documents
+
     def delete_documents(
         self,
         ids: list[str],
@@ -272,10 +406,14 @@ class KnowledgeRetriever:
             Success status | حالة النجاح
         """
         try:
-            self.client.delete(
-                collection_name=self.collection_name,
-                points_selector=ids,
-            )
+            if self.local_index is not None:
+                self.local_index.delete(ids)
+                self.local_index.flush()
+            else:
+                self.client.delete(
+                    collection_name=self.collection_name,
+                    points_selector=ids,
+                )
 
             logger.info(
                 "documents_deleted",
@@ -298,6 +436,14 @@ class KnowledgeRetriever:
             Collection information | معلومات المجموعة
         """
         try:
+            if self.local_index is not None:
+                return {
+                    "collection_name": self.collection_name,
+                    "vectors_count": len(self.local_index),
+                    "points_count": len(self.local_index),
+                    "status": "trained" if self.local_index.is_trained else "exact",
+                }
+
             collection_info = self.client.get_collection(collection_name=self.collection_name)
 
             return {
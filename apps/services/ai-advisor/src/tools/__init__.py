@@ -6,10 +6,16 @@ Tools for calling external microservices.
 أدوات لاستدعاء الخدمات المصغرة الخارجية.
 """
 
-from .agro_tool import AgroTool
-from .crop_health_tool import CropHealthTool
-from .satellite_tool import SatelliteTool
-from .weather_tool import WeatherTool
+import os
+import sys
+
+# Shared integration layer (/app/shared in Docker, apps/services/shared locally)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+
+from .agro_tool import AgroTool  # noqa: E402
+from .crop_health_tool import CropHealthTool  # noqa: E402
+from .satellite_tool import SatelliteTool  # noqa: E402
+from .weather_tool import WeatherTool  # noqa: E402
 
 __all__ = [
     "CropHealthTool",
@@ -10,6 +10,7 @@ from typing import Any
 
 import httpx
 import structlog
+from shared.integration.http_pool import get_upstream
 
 from ..config import settings
 
@@ -25,6 +26,7 @@ class AgroTool:
     def __init__(self):
         self.base_url = settings.agro_advisor_url
         self.timeout = 30.0
+        self.client = get_upstream("advisory-service", self.base_url, timeout=self.timeout)
 
     async def get_crop_info(
         self,
@@ -43,16 +45,15 @@ class AgroTool:
             Crop information | معلومات المحصول
         """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(
-                    f"{self.base_url}/api/v1/crops/{crop_type}",
-                    params={"language": language},
-                )
-                response.raise_for_status()
+            response = await self.client.get(
+                f"{self.base_url}/api/v1/crops/{crop_type}",
+                params={"language": language},
+            )
+            response.raise_for_status()
 
-                result = response.json()
-                logger.info("crop_info_retrieved", crop_type=crop_type, language=language)
-                return result
+            result = response.json()
+            logger.info("crop_info_retrieved", crop_type=crop_type, language=language)
+            return result
 
         except httpx.HTTPError as e:
             logger.error("crop_info_failed", error=str(e), crop_type=crop_type)
@@ -75,19 +76,18 @@ class AgroTool:
             Growth stage information | معلومات مرحلة النمو
         """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(
-                    f"{self.base_url}/api/v1/crops/{crop_type}/stages/{growth_stage}"
-                )
-                response.raise_for_status()
-
-                result = response.json()
-                logger.info(
-                    "growth_stage_info_retrieved",
-                    crop_type=crop_type,
-                    growth_stage=growth_stage,
-                )
-                return result
+            response = await self.client.get(
+                f"{self.base_url}/api/v1/crops/{crop_type}/stages/{growth_stage}"
+            )
+            response.raise_for_status()
+
+            result = response.json()
+            logger.info(
+                "growth_stage_info_retrieved",
+                crop_type=crop_type,
+                growth_stage=growth_stage,
+            )
+            return result
 
         except httpx.HTTPError as e:
             logger.error(
@@ -117,24 +117,23 @@ class AgroTool:
             Fertilizer recommendations | توصيات التسميد
         """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/api/v1/fertilizer/recommend",
-                    json={
-                        "crop_type": crop_type,
-                        "growth_stage": growth_stage,
-                        "soil_analysis": soil_analysis,
-                    },
-                )
-                response.raise_for_status()
-
-                result = response.json()
-                logger.info(
-                    "fertilizer_recommendation_generated",
-                    crop_type=crop_type,
-                    growth_stage=growth_stage,
-                )
-                return result
+            response = await self.client.post(
+                f"{self.base_url}/api/v1/fertilizer/recommend",
+                json={
+                    "crop_type": crop_type,
+                    "growth_stage": growth_stage,
+                    "soil_analysis": soil_analysis,
+                },
+            )
+            response.raise_for_status()
+
+            result = response.json()
+            logger.info(
+                "fertilizer_recommendation_generated",
+                crop_type=crop_type,
+                growth_stage=growth_stage,
+            )
+            return result
 
         except httpx.HTTPError as e:
             logger.error("fertilizer_recommendation_failed", error=str(e), crop_type=crop_type)
@@ -159,26 +158,25 @@ class AgroTool:
             Pest control recommendations | توصيات مكافحة الآفات
         """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                data = {
-                    "crop_type": crop_type,
-                    "pest_type": pest_type,
-                }
-                if infestation_level:
-                    data["infestation_level"] = infestation_level
-
-                response = await client.post(
-                    f"{self.base_url}/api/v1/pest-control/advise", json=data
-                )
-                response.raise_for_status()
-
-                result = response.json()
-                logger.info(
-                    "pest_control_advice_generated",
-                    crop_type=crop_type,
-                    pest_type=pest_type,
-                )
-                return result
+            data = {
+                "crop_type": crop_type,
+                "pest_type": pest_type,
+            }
+            if infestation_level:
+                data["infestation_level"] = infestation_level
+
+            response = await self.client.post(
+                f"{self.base_url}/api/v1/pest-control/advise", json=data
+            )
+            response.raise_for_status()
+
+            result = response.json()
+            logger.info(
+                "pest_control_advice_generated",
+                crop_type=crop_type,
+                pest_type=pest_type,
+            )
+            return result
 
         except httpx.HTTPError as e:
             logger.error(
@@ -208,24 +206,25 @@ class AgroTool:
             Best practices | أفضل الممارسات
         """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                params = {"crop_type": crop_type}
-                if region:
-                    params["region"] = region
-                if season:
-                    params["season"] = season
-
-                response = await client.get(f"{self.base_url}/api/v1/best-practices", params=params)
-                response.raise_for_status()
-
-                result = response.json()
-                logger.info(
-                    "best_practices_retrieved",
-                    crop_type=crop_type,
-                    region=region,
-                    season=season,
-                )
-                return result
+            params = {"crop_type": crop_type}
+            if region:
+                params["region"] = region
+            if season:
+                params["season"] = season
+
+            response = await self.client.get(
+                f"{self.base_url}/api/v1/best-practices", params=params
+            )
+            response.raise_for_status()
+
+            result = response.json()
+            logger.info(
+                "best_practices_retrieved",
+                crop_type=crop_type,
+                region=region,
+                season=season,
+            )
+            return result
 
         except httpx.HTTPError as e:
             logger.error("best_practices_failed", error=str(e), crop_type=crop_type)
@@ -248,17 +247,16 @@ class AgroTool:
             Market price data | بيانات أسعار السوق
         """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                params = {"crop_type": crop_type}
-                if region:
-                    params["region"] = region
+            params = {"crop_type": crop_type}
+            if region:
+                params["region"] = region
 
-                response = await client.get(f"{self.base_url}/api/v1/market/prices", params=params)
-                response.raise_for_status()
+            response = await self.client.get(f"{self.base_url}/api/v1/market/prices", params=params)
+            response.raise_for_status()
 
-                result = response.json()
-                logger.info("market_prices_retrieved", crop_type=crop_type, region=region)
-                return result
+            result = response.json()
+            logger.info("market_prices_retrieved", crop_type=crop_type, region=region)
+            return result
 
         except httpx.HTTPError as e:
             logger.error("market_prices_failed", error=str(e), crop_type=crop_type)
@@ -10,6 +10,7 @@ from typing import Any
 
 import httpx
 import structlog
+from shared.integration.http_pool import get_upstream
 
 from ..config import settings
 
@@ -25,6 +26,7 @@ class CropHealthTool:
     def __init__(self):
         self.base_url = settings.crop_health_ai_url
         self.timeout = 30.0
+        self.client = get_upstream("crop-intelligence-service", self.base_url, timeout=self.timeout)
 
     async def analyze_image(
         self,
@@ -43,24 +45,23 @@ class CropHealthTool:
             Analysis results | نتائج التحليل
         """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                # In real implementation, upload image as multipart/form-data
-                # في التنفيذ الحقيقي، قم بتحميل الصورة كـ multipart/form-data
-                data = {
-                    "image_path": image_path,
-                    "crop_type": crop_type,
-                }
-
-                response = await client.post(f"{self.base_url}/api/v1/analyze", json=data)
-                response.raise_for_status()
-
-                result = response.json()
-                logger.info(
-                    "crop_health_analysis_success",
-                    image_path=image_path,
-                    detected_issues=len(result.get("detections", [])),
-                )
-                return result
+            # In real implementation, upload image as multipart/form-data
+            # في التنفيذ الحقيقي، قم بتحميل الصورة كـ multipart/form-data
+            data = {
+                "image_path": image_path,
+                "crop_type": crop_type,
+            }
+
+            response = await self.client.post(f"{self.base_url}/api/v1/analyze", json=data)
+            response.raise_for_status()
+
+            result = response.json()
+            logger.info(
+                "crop_health_analysis_success",
+                image_path=image_path,
+                detected_issues=len(result.get("detections", [])),
+            )
+            return result
 
         except httpx.HTTPError as e:
             logger.error("crop_health_analysis_failed", error=str(e), image_path=image_path)
@@ -83,20 +84,19 @@ class CropHealthTool:
             Disease information | معلومات المرض
         """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(
-                    f"{self.base_url}/api/v1/diseases/{disease_name}",
-                    params={"language": language},
-                )
-                response.raise_for_status()
-
-                result = response.json()
-                logger.info(
-                    "disease_info_retrieved",
-                    disease_name=disease_name,
-                    language=language,
-                )
-                return result
+            response = await self.client.get(
+                f"{self.base_url}/api/v1/diseases/{disease_name}",
+                params={"language": language},
+            )
+            response.raise_for_status()
+
+            result = response.json()
+            logger.info(
+                "disease_info_retrieved",
+                disease_name=disease_name,
+                language=language,
+            )
+            return result
 
         except httpx.HTTPError as e:
             logger.error("disease_info_failed", error=str(e), disease_name=disease_name)
@@ -121,26 +121,25 @@ class CropHealthTool:
             Treatment options | خيارات العلاج
         """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                params = {
-                    "crop_type": crop_type,
-                }
-                if severity:
-                    params["severity"] = severity
-
-                response = await client.get(
-                    f"{self.base_url}/api/v1/diseases/{disease_name}/treatments",
-                    params=params,
-                )
-                response.raise_for_status()
-
-                result = response.json()
-                logger.info(
-                    "treatment_options_retrieved",
-                    disease_name=disease_name,
-                    crop_type=crop_type,
-                )
-                return result
+            params = {
+                "crop_type": crop_type,
+            }
+            if severity:
+                params["severity"] = severity
+
+            response = await self.client.get(
+                f"{self.base_url}/api/v1/diseases/{disease_name}/treatments",
+                params=params,
+            )
+            response.raise_for_status()
+
+            result = response.json()
+            logger.info(
+                "treatment_options_retrieved",
+                disease_name=disease_name,
+                crop_type=crop_type,
+            )
+            return result
 
         except httpx.HTTPError as e:
             logger.error("treatment_options_failed", error=str(e), disease_name=disease_name)
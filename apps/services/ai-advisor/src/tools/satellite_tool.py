@@ -10,6 +10,7 @@ from typing import Any
 
 import httpx
 import structlog
+from shared.integration.http_pool import get_upstream
 
 from ..config import settings
 
@@ -25,6 +26,9 @@ class SatelliteTool:
     def __init__(self):
         self.base_url = settings.satellite_service_url
         self.timeout = 60.0  # Satellite processing can take longer
+        self.client = get_upstream(
+            "vegetation-analysis-service", self.base_url, timeout=self.timeout
+        )
 
     async def get_ndvi(
         self,
@@ -45,23 +49,24 @@ class SatelliteTool:
             NDVI data | بيانات NDVI
         """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                params = {"field_id": field_id}
-                if start_date:
-                    params["start_date"] = start_date
-                if end_date:
-                    params["end_date"] = end_date
-
-                response = await client.get(f"{self.base_url}/api/v1/satellite/ndvi", params=params)
-                response.raise_for_status()
-
-                result = response.json()
-                logger.info(
-                    "ndvi_data_retrieved",
-                    field_id=field_id,
-                    data_points=len(result.get("data", [])),
-                )
-                return result
+            params = {"field_id": field_id}
+            if start_date:
+                params["start_date"] = start_date
+            if end_date:
+                params["end_date"] = end_date
+
+            response = await self.client.get(
+                f"{self.base_url}/api/v1/satellite/ndvi", params=params
+            )
+            response.raise_for_status()
+
+            result = response.json()
+            logger.info(
+                "ndvi_data_retrieved",
+                field_id=field_id,
+                data_points=len(result.get("data", [])),
+            )
+            return result
 
         except httpx.HTTPError as e:
             logger.error("ndvi_retrieval_failed", error=str(e), field_id=field_id)
@@ -86,27 +91,26 @@ class SatelliteTool:
             Satellite imagery data | بيانات صور الأقمار الصناعية
         """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                params = {
-                    "field_id": field_id,
-                    "layer": layer,
-                }
-                if date:
-                    params["date"] = date
-
-                response = await client.get(
-                    f"{self.base_url}/api/v1/satellite/imagery", params=params
-                )
-                response.raise_for_status()
-
-                result = response.json()
-                logger.info(
-                    "satellite_imagery_retrieved",
-                    field_id=field_id,
-                    layer=layer,
-                    date=date or "latest",
-                )
-                return result
+            params = {
+                "field_id": field_id,
+                "layer": layer,
+            }
+            if date:
+                params["date"] = date
+
+            response = await self.client.get(
+                f"{self.base_url}/api/v1/satellite/imagery", params=params
+            )
+            response.raise_for_status()
+
+            result = response.json()
+            logger.info(
+                "satellite_imagery_retrieved",
+                field_id=field_id,
+                layer=layer,
+                date=date or "latest",
+            )
+            return result
 
         except httpx.HTTPError as e:
             logger.error("satellite_imagery_failed", error=str(e), field_id=field_id)
@@ -129,24 +133,23 @@ class SatelliteTool:
             Zone analysis results | نتائج تحليل المناطق
         """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/api/v1/satellite/analyze-zones",
-                    json={
-                        "field_id": field_id,
-                        "analysis_type": analysis_type,
-                    },
-                )
-                response.raise_for_status()
-
-                result = response.json()
-                logger.info(
-                    "field_zones_analyzed",
-                    field_id=field_id,
-                    analysis_type=analysis_type,
-                    zones=len(result.get("zones", [])),
-                )
-                return result
+            response = await self.client.post(
+                f"{self.base_url}/api/v1/satellite/analyze-zones",
+                json={
+                    "field_id": field_id,
+                    "analysis_type": analysis_type,
+                },
+            )
+            response.raise_for_status()
+
+            result = response.json()
+            logger.info(
+                "field_zones_analyzed",
+                field_id=field_id,
+                analysis_type=analysis_type,
+                zones=len(result.get("zones", [])),
+            )
+            return result
 
         except httpx.HTTPError as e:
             logger.error("field_zones_analysis_failed", error=str(e), field_id=field_id)
@@ -173,26 +176,25 @@ class SatelliteTool:
             Time series data | بيانات السلسلة الزمنية
         """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(
-                    f"{self.base_url}/api/v1/satellite/time-series",
-                    params={
-                        "field_id": field_id,
-                        "index": index,
-                        "start_date": start_date,
-                        "end_date": end_date,
-                    },
-                )
-                response.raise_for_status()
-
-                result = response.json()
-                logger.info(
-                    "time_series_retrieved",
-                    field_id=field_id,
-                    index=index,
-                    period=f"{start_date} to {end_date}",
-                )
-                return result
+            response = await self.client.get(
+                f"{self.base_url}/api/v1/satellite/time-series",
+                params={
+                    "field_id": field_id,
+                    "index": index,
+                    "start_date": start_date,
+                    "end_date": end_date,
+                },
+            )
+            response.raise_for_status()
+
+            result = response.json()
+            logger.info(
+                "time_series_retrieved",
+                field_id=field_id,
+                index=index,
+                period=f"{start_date} to {end_date}",
+            )
+            return result
 
         except httpx.HTTPError as e:
             logger.error("time_series_failed", error=str(e), field_id=field_id)
@@ -217,25 +219,24 @@ class SatelliteTool:
             Change detection results | نتائج كشف التغيرات
         """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/api/v1/satellite/detect-changes",
-                    json={
-                        "field_id": field_id,
-                        "baseline_date": baseline_date,
-                        "comparison_date": comparison_date,
-                    },
-                )
-                response.raise_for_status()
-
-                result = response.json()
-                logger.info(
-                    "change_detection_complete",
-                    field_id=field_id,
-                    baseline_date=baseline_date,
-                    comparison_date=comparison_date,
-                )
-                return result
+            response = await self.client.post(
+                f"{self.base_url}/api/v1/satellite/detect-changes",
+                json={
+                    "field_id": field_id,
+                    "baseline_date": baseline_date,
+                    "comparison_date": comparison_date,
+                },
+            )
+            response.raise_for_status()
+
+            result = response.json()
+            logger.info(
+                "change_detection_complete",
+                field_id=field_id,
+                baseline_date=baseline_date,
+                comparison_date=comparison_date,
+            )
+            return result
 
         except httpx.HTTPError as e:
             logger.error("change_detection_failed", error=str(e), field_id=field_id)
@@ -10,6 +10,7 @@ from typing import Any
 
 import httpx
 import structlog
+from shared.integration.http_pool import get_upstream
 
 from ..config import settings
 
@@ -25,6 +26,7 @@ class WeatherTool:
     def __init__(self):
         self.base_url = settings.weather_core_url
         self.timeout = 30.0
+        self.client = get_upstream("weather-service", self.base_url, timeout=self.timeout)
 
     async def get_current_weather(
         self,
@@ -43,19 +45,18 @@ class WeatherTool:
             Current weather data | بيانات الطقس الحالية
         """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(
-                    f"{self.base_url}/api/v1/weather/current",
-                    params={
-                        "latitude": latitude,
-                        "longitude": longitude,
-                    },
-                )
-                response.raise_for_status()
-
-                result = response.json()
-                logger.info("current_weather_retrieved", latitude=latitude, longitude=longitude)
-                return result
+            response = await self.client.get(
+                f"{self.base_url}/api/v1/weather/current",
+                params={
+                    "latitude": latitude,
+                    "longitude": longitude,
+                },
+            )
+            response.raise_for_status()
+
+            result = response.json()
+            logger.info("current_weather_retrieved", latitude=latitude, longitude=longitude)
+            return result
 
         except httpx.HTTPError as e:
             logger.error(
@@ -85,25 +86,24 @@ class WeatherTool:
             Weather forecast data | بيانات توقعات الطقس
         """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(
-                    f"{self.base_url}/api/v1/weather/forecast",
-                    params={
-                        "latitude": latitude,
-                        "longitude": longitude,
-                        "days": days,
-                    },
-                )
-                response.raise_for_status()
-
-                result = response.json()
-                logger.info(
-                    "weather_forecast_retrieved",
-                    latitude=latitude,
-                    longitude=longitude,
-                    days=days,
-                )
-                return result
+            response = await self.client.get(
+                f"{self.base_url}/api/v1/weather/forecast",
+                params={
+                    "latitude": latitude,
+                    "longitude": longitude,
+                    "days": days,
+                },
+            )
+            response.raise_for_status()
+
+            result = response.json()
+            logger.info(
+                "weather_forecast_retrieved",
+                latitude=latitude,
+                longitude=longitude,
+                days=days,
+            )
+            return result
 
         except httpx.HTTPError as e:
             logger.error(
@@ -135,26 +135,25 @@ class WeatherTool:
             Historical weather data | بيانات الطقس التاريخية
         """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(
-                    f"{self.base_url}/api/v1/weather/historical",
-                    params={
-                        "latitude": latitude,
-                        "longitude": longitude,
-                        "start_date": start_date,
-                        "end_date": end_date,
-                    },
-                )
-                response.raise_for_status()
-
-                result = response.json()
-                logger.info(
-                    "historical_weather_retrieved",
-                    latitude=latitude,
-                    longitude=longitude,
-                    period=f"{start_date} to {end_date}",
-                )
-                return result
+            response = await self.client.get(
+                f"{self.base_url}/api/v1/weather/historical",
+                params={
+                    "latitude": latitude,
+                    "longitude": longitude,
+                    "start_date": start_date,
+                    "end_date": end_date,
+                },
+            )
+            response.raise_for_status()
+
+            result = response.json()
+            logger.info(
+                "historical_weather_retrieved",
+                latitude=latitude,
+                longitude=longitude,
+                period=f"{start_date} to {end_date}",
+            )
+            return result
 
         except httpx.HTTPError as e:
             logger.error(
@@ -184,25 +183,24 @@ class WeatherTool:
             ET0 data | بيانات التبخر النتح المرجعي
         """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                params = {
-                    "latitude": latitude,
-                    "longitude": longitude,
-                }
-                if date:
-                    params["date"] = date
-
-                response = await client.get(f"{self.base_url}/api/v1/weather/et0", params=params)
-                response.raise_for_status()
-
-                result = response.json()
-                logger.info(
-                    "et0_retrieved",
-                    latitude=latitude,
-                    longitude=longitude,
-                    date=date or "today",
-                )
-                return result
+            params = {
+                "latitude": latitude,
+                "longitude": longitude,
+            }
+            if date:
+                params["date"] = date
+
+            response = await self.client.get(f"{self.base_url}/api/v1/weather/et0", params=params)
+            response.raise_for_status()
+
+            result = response.json()
+            logger.info(
+                "et0_retrieved",
+                latitude=latitude,
+                longitude=longitude,
+                date=date or "today",
+            )
+            return result
 
         except httpx.HTTPError as e:
             logger.error(
@@ -230,24 +228,23 @@ class WeatherTool:
             Weather alerts | تنبيهات الطقس
         """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(
-                    f"{self.base_url}/api/v1/weather/alerts",
-                    params={
-                        "latitude": latitude,
-                        "longitude": longitude,
-                    },
-                )
-                response.raise_for_status()
-
-                result = response.json()
-                logger.info(
-                    "weather_alerts_retrieved",
-                    latitude=latitude,
-                    longitude=longitude,
-                    alert_count=len(result.get("alerts", [])),
-                )
-                return result
+            response = await self.client.get(
+                f"{self.base_url}/api/v1/weather/alerts",
+                params={
+                    "latitude": latitude,
+                    "longitude": longitude,
+                },
+            )
+            response.raise_for_status()
+
+            result = response.json()
+            logger.info(
+                "weather_alerts_retrieved",
+                latitude=latitude,
+                longitude=longitude,
+                alert_count=len(result.get("alerts", [])),
+            )
+            return result
 
         except httpx.HTTPError as e:
             logger.error(
@@ -92,12 +92,12 @@ def mock_knowledge_retriever(mock_embeddings_manager):
     محاكاة مسترجع المعرفة RAG
     """
     mock_retriever = Mock()
-    mock_retriever.retrieve = Mock(
-        return_value=[
-            Mock(page_content="Agricultural knowledge 1", metadata={"source": "test1"}),
-            Mock(page_content="Agricultural knowledge 2", metadata={"source": "test2"}),
-        ]
-    )
+    documents = [
+        Mock(page_content="Agricultural knowledge 1", metadata={"source": "test1"}),
+        Mock(page_content="Agricultural knowledge 2", metadata={"source": "test2"}),
+    ]
+    mock_retriever.retrieve = Mock(return_value=documents)
+    mock_retriever.aretrieve = AsyncMock(return_value=documents)
     mock_retriever.get_collection_info = Mock(
         return_value={"collection_name": "test-collection", "documents_count": 100}
     )
@@ -44,7 +44,10 @@ class TestBaseAgent:
         assert agent.retriever is mock_knowledge_retriever
         assert agent.conversation_memory.get_memory_usage()["message_count"] == 0
 
-    def test_retrieve_context_with_retriever(self, base_agent_class, mock_knowledge_retriever):
+    @pytest.mark.asyncio
+    async def test_retrieve_context_with_retriever(
+        self, base_agent_class, mock_knowledge_retriever
+    ):
         """Test context retrieval from RAG system"""
 
         class TestAgent(base_agent_class):
@@ -53,13 +56,15 @@ class TestBaseAgent:
 
         agent = TestAgent(name="TestAgent", role="Testing", retriever=mock_knowledge_retriever)
 
-        context = agent._retrieve_context("wheat farming")
+        context = await agent._retrieve_context("wheat farming")
 
         assert "Agricultural knowledge 1" in context
         assert "Agricultural knowledge 2" in context
-        mock_knowledge_retriever.retrieve.assert_called_once()
+        mock_knowledge_retriever.aretrieve.assert_awaited_once()
+        mock_knowledge_retriever.retrieve.assert_not_called()
 
-    def test_retrieve_context_without_retriever(self, base_agent_class):
+    @pytest.mark.asyncio
+    async def test_retrieve_context_without_retriever(self, base_agent_class):
         """Test context retrieval when no retriever is available"""
 
         class TestAgent(base_agent_class):
@@ -68,7 +73,7 @@ class TestBaseAgent:
 
         agent = TestAgent(name="TestAgent", role="Testing", retriever=None)
 
-        context = agent._retrieve_context("wheat farming")
+        context = await agent._retrieve_context("wheat farming")
 
         assert context == ""
 
@@ -58,7 +58,7 @@ class TestFieldAnalystAgent:
             await agent.analyze_field(field_id="test-field-123", satellite_data=satellite_data)
 
             # Verify RAG retrieval was called
-            mock_knowledge_retriever.retrieve.assert_called()
+            mock_knowledge_retriever.aretrieve.assert_called()
 
 
 class TestDiseaseExpertAgent:
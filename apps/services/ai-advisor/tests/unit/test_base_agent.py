@@ -54,34 +54,37 @@ class TestBaseAgent:
         prompt = agent.get_system_prompt()
         assert prompt == "You are a test agricultural advisor."
 
+    @pytest.mark.asyncio
     @patch.dict("os.environ", {"ANTHROPIC_API_KEY": "test_key"})
-    def test_retrieve_context_without_retriever(self):
+    async def test_retrieve_context_without_retriever(self):
         """Test context retrieval without RAG retriever"""
         agent = ConcreteAgent(name="test_agent", role="Test Advisor", retriever=None)
 
-        context = agent._retrieve_context("test query")
+        context = await agent._retrieve_context("test query")
         assert context == ""
 
+    @pytest.mark.asyncio
     @patch.dict("os.environ", {"ANTHROPIC_API_KEY": "test_key"})
-    def test_retrieve_context_with_retriever(self, mock_knowledge_retriever):
+    async def test_retrieve_context_with_retriever(self, mock_knowledge_retriever):
         """Test context retrieval with RAG retriever"""
         agent = ConcreteAgent(
             name="test_agent", role="Test Advisor", retriever=mock_knowledge_retriever
         )
 
-        context = agent._retrieve_context("wheat fertilizer")
+        context = await agent._retrieve_context("wheat fertilizer")
         assert "nitrogen" in context.lower()
-        assert mock_knowledge_retriever.retrieve.called
+        assert mock_knowledge_retriever.aretrieve.called
 
+    @pytest.mark.asyncio
     @patch.dict("os.environ", {"ANTHROPIC_API_KEY": "test_key"})
-    def test_retrieve_context_handles_error(self):
+    async def test_retrieve_context_handles_error(self):
         """Test context retrieval handles errors gracefully"""
         mock_retriever = MagicMock()
-        mock_retriever.retrieve.side_effect = Exception("RAG error")
+        mock_retriever.aretrieve = AsyncMock(side_effect=Exception("RAG error"))
 
         agent = ConcreteAgent(name="test_agent", role="Test Advisor", retriever=mock_retriever)
 
-        context = agent._retrieve_context("test query")
+        context = await agent._retrieve_context("test query")
         assert context == ""
 
     @pytest.mark.asyncio
@@ -128,7 +131,7 @@ class TestBaseAgent:
 
             assert response["agent"] == "test_agent"
             assert "fertilizer" in response["response"].lower()
-            assert mock_knowledge_retriever.retrieve.called
+            assert mock_knowledge_retriever.aretrieve.called
 
     @pytest.mark.asyncio
     @patch.dict("os.environ", {"ANTHROPIC_API_KEY": "test_key"})
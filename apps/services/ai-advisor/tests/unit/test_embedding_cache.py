@@ -0,0 +1,137 @@
+"""
+Unit Tests for Embedding Cache and Micro-Batcher
+اختبارات الوحدة لذاكرة التضمينات والمجمّع الدقيق
+
+Tests:
+- Memory LRU and on-disk cache tiers
+- Micro-batching of concurrent query embeddings
+- Batch metrics and error propagation
+"""
+
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+from src.rag.embedding_cache import EmbeddingCache, MicroBatcher, content_key
+
+
+class FakeModel:
+    """Deterministic encoder that records every batch it sees"""
+
+    def __init__(self, dim: int = 4):
+        self.dim = dim
+        self.batches: list[list[str]] = []
+        self.threads: set[str] = set()
+
+    def __call__(self, texts: list[str]) -> np.ndarray:
+        self.batches.append(list(texts))
+        self.threads.add(threading.current_thread().name)
+        return np.array([[len(t), *([i] * (self.dim - 1))] for i, t in enumerate(texts)], float)
+
+
+class TestEmbeddingCache:
+    """Test the two-tier embedding cache"""
+
+    def test_key_depends_on_model_and_text(self):
+        assert content_key("m1", "wheat") != content_key("m2", "wheat")
+        assert content_key("m1", "wheat") == content_key("m1", "wheat")
+
+    def test_memory_hit_and_miss(self):
+        cache = EmbeddingCache("model", max_entries=10)
+        assert cache.get("wheat") is None
+
+        cache.put("wheat", np.ones(3))
+
+        np.testing.assert_array_equal(cache.get("wheat"), np.ones(3))
+        assert cache.stats.memory_hits == 1
+        assert cache.stats.misses == 1
+
+    def test_lru_eviction(self):
+        cache = EmbeddingCache("model", max_entries=2)
+        cache.put("a", np.zeros(2))
+        cache.put("b", np.zeros(2))
+        cache.get("a")  # "b" becomes least recently used
+        cache.put("c", np.zeros(2))
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert len(cache) == 2
+
+    def test_disk_tier_survives_new_instance(self, tmp_path):
+        EmbeddingCache("model", disk_dir=tmp_path).put("wheat", np.arange(3.0))
+
+        cache = EmbeddingCache("model", disk_dir=tmp_path)
+
+        np.testing.assert_array_equal(cache.get("wheat"), np.arange(3.0))
+        assert cache.stats.disk_hits == 1
+
+    def test_get_many_reports_missing_indices(self):
+        cache = EmbeddingCache("model")
+        cache.put("b", np.ones(2))
+
+        found, missing = cache.get_many(["a", "b", "c"])
+
+        assert missing == [0, 2]
+        assert found[1] is not None
+
+
+class TestMicroBatcher:
+    """Test async micro-batching"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_a_batch(self):
+        model = FakeModel()
+        batcher = MicroBatcher(model, max_batch_size=64, max_wait_ms=20)
+
+        texts = [f"query {i}" for i in range(10)]
+        results = await asyncio.gather(*(batcher.submit(t) for t in texts))
+        await batcher.close()
+
+        assert len(model.batches) == 1
+        assert [r[0] for r in results] == [len(t) for t in texts]
+        assert batcher.stats.max_batch_size == 10
+
+    @pytest.mark.asyncio
+    async def test_batch_size_is_bounded(self):
+        model = FakeModel()
+        batcher = MicroBatcher(model, max_batch_size=4, max_wait_ms=20)
+
+        await asyncio.gather(*(batcher.submit(str(i)) for i in range(10)))
+        await batcher.close()
+
+        assert max(len(b) for b in model.batches) <= 4
+        assert batcher.stats.items == 10
+
+    @pytest.mark.asyncio
+    async def test_model_runs_on_worker_thread(self):
+        model = FakeModel()
+        batcher = MicroBatcher(model, max_wait_ms=1)
+
+        await batcher.submit("wheat")
+        await batcher.close()
+
+        assert threading.current_thread().name not in model.threads
+
+    @pytest.mark.asyncio
+    async def test_errors_propagate_to_callers(self):
+        def failing(texts):
+            raise RuntimeError("model failed")
+
+        batcher = MicroBatcher(failing, max_wait_ms=1)
+
+        with pytest.raises(RuntimeError, match="model failed"):
+            await batcher.submit("wheat")
+        await batcher.close()
+
+    @pytest.mark.asyncio
+    async def test_stats_report_queue_wait(self):
+        batcher = MicroBatcher(FakeModel(), max_wait_ms=5)
+
+        await asyncio.gather(batcher.submit("a"), batcher.submit("b"))
+        await batcher.close()
+
+        stats = batcher.stats.to_dict()
+        assert stats["batches"] >= 1
+        assert stats["avg_queue_wait_ms"] >= 0
+        assert sum(stats["batch_size_histogram"].values()) == stats["batches"]
@@ -0,0 +1,214 @@
+"""
+Unit Tests for Semantic Response Cache
+اختبارات الوحدة لذاكرة الاستجابات الدلالية
+
+Tests use a mock LLM pipeline and a local bag-of-words embedding model:
+- Similar questions in the same context hit the cache
+- Tenant and context isolation
+- TTL expiry and weather/NDVI invalidation, including NATS envelopes
+- Hit-rate and cost-saved metrics reaching the CostTracker
+"""
+
+import hashlib
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import numpy as np
+import pytest
+from src.monitoring.cost_tracker import CostTracker
+from src.orchestration.response_cache import (
+    SemanticResponseCache,
+    context_fingerprint,
+    normalize_query,
+)
+
+
+async def local_embedding(text: str) -> np.ndarray:
+    """Hashed bag-of-words embedding, a stand-in for a local model"""
+    vector = np.zeros(256, dtype=np.float32)
+    for word in text.split():
+        vector[int(hashlib.md5(word.encode()).hexdigest(), 16) % 256] += 1.0
+    return vector
+
+
+class MockLLMPipeline:
+    """Counts supervisor runs so tests can assert LLM calls were avoided"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def answer(self, question: str) -> dict:
+        self.calls += 1
+        return {"answer": f"advice for: {question}"}
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_760_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+TOMATO_SANAA = {"tenant_id": "t1", "crop": "tomato", "governorate": "Sanaa", "field_id": "f1"}
+
+
+async def ask(cache, llm, tenant, question, context):
+    hit = await cache.lookup(tenant, question, context)
+    if hit is not None:
+        return hit.response
+    result = await llm.answer(question)
+    await cache.store(tenant, question, context, result, estimated_cost=0.02)
+    return result
+
+
+class TestNormalization:
+    def test_normalize_query(self):
+        assert normalize_query("متى أروي الطماطم؟") == normalize_query("متي اروي الطماطم")
+        assert normalize_query("When to  IRRIGATE tomatoes?") == "when to irrigate tomatoes"
+
+    def test_fingerprint_includes_crop_region_and_week(self):
+        base = context_fingerprint(TOMATO_SANAA)
+        assert base != context_fingerprint({**TOMATO_SANAA, "crop": "wheat"})
+        assert base != context_fingerprint({**TOMATO_SANAA, "governorate": "Taiz"})
+        assert base.startswith("tomato|sanaa|-|")
+
+
+class TestSemanticResponseCache:
+    @pytest.mark.asyncio
+    async def test_similar_question_hits_cache(self):
+        cache = SemanticResponseCache(local_embedding, similarity_threshold=0.8)
+        llm = MockLLMPipeline()
+
+        first = await ask(
+            cache, llm, "t1", "When should I irrigate tomatoes this week?", TOMATO_SANAA
+        )
+        second = await ask(
+            cache, llm, "t1", "when should i irrigate tomatoes this week", TOMATO_SANAA
+        )
+
+        assert llm.calls == 1
+        assert first == second
+        assert cache.stats.hit_rate == 0.5
+
+    @pytest.mark.asyncio
+    async def test_different_question_misses(self):
+        cache = SemanticResponseCache(local_embedding, similarity_threshold=0.8)
+        llm = MockLLMPipeline()
+
+        await ask(cache, llm, "t1", "When should I irrigate tomatoes?", TOMATO_SANAA)
+        await ask(cache, llm, "t1", "Which fertilizer controls blight?", TOMATO_SANAA)
+
+        assert llm.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_tenants_are_isolated(self):
+        cache = SemanticResponseCache(local_embedding)
+        llm = MockLLMPipeline()
+
+        await ask(cache, llm, "t1", "When to irrigate tomatoes?", TOMATO_SANAA)
+        await ask(cache, llm, "t2", "When to irrigate tomatoes?", TOMATO_SANAA)
+
+        assert llm.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_context_changes_miss(self):
+        cache = SemanticResponseCache(local_embedding)
+        llm = MockLLMPipeline()
+
+        await ask(cache, llm, "t1", "When to irrigate?", TOMATO_SANAA)
+        await ask(
+            cache, llm, "t1", "When to irrigate?", {**TOMATO_SANAA, "growth_stage": "flowering"}
+        )
+
+        assert llm.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_ttl_expiry(self):
+        clock = FakeClock()
+        cache = SemanticResponseCache(local_embedding, ttl_seconds=60, clock=clock)
+        llm = MockLLMPipeline()
+
+        await ask(cache, llm, "t1", "When to irrigate?", TOMATO_SANAA)
+        clock.now += 61
+        await ask(cache, llm, "t1", "When to irrigate?", TOMATO_SANAA)
+
+        assert llm.calls == 2
+        assert cache.stats.expirations == 1
+
+    @pytest.mark.asyncio
+    async def test_weather_event_invalidates_region(self):
+        cache = SemanticResponseCache(local_embedding)
+        llm = MockLLMPipeline()
+        taiz = {**TOMATO_SANAA, "governorate": "Taiz", "field_id": "f2"}
+
+        await ask(cache, llm, "t1", "When to irrigate?", TOMATO_SANAA)
+        await ask(cache, llm, "t1", "When to irrigate?", taiz)
+
+        removed = cache.handle_event("sahool.weather.forecast", {"governorate": "Sanaa"})
+
+        assert removed == 1
+        assert await cache.lookup("t1", "When to irrigate?", TOMATO_SANAA) is None
+        assert await cache.lookup("t1", "When to irrigate?", taiz) is not None
+
+    @pytest.mark.asyncio
+    async def test_ndvi_event_invalidates_field(self):
+        cache = SemanticResponseCache(local_embedding)
+        llm = MockLLMPipeline()
+        await ask(cache, llm, "t1", "When to irrigate?", TOMATO_SANAA)
+
+        assert cache.handle_event("sahool.satellite.ndvi.computed", {"field_id": "f1"}) == 1
+        assert cache.handle_event("sahool.field.created", {"field_id": "f1"}) == 0
+
+    @pytest.mark.asyncio
+    async def test_nats_envelope_invalidates_tenant_field(self):
+        cache = SemanticResponseCache(local_embedding)
+        llm = MockLLMPipeline()
+        await ask(cache, llm, "t1", "When to irrigate?", TOMATO_SANAA)
+        await ask(cache, llm, "t2", "When to irrigate?", TOMATO_SANAA)
+        envelope = {"event_type": "ndvi_computed", "tenant_id": "t1", "payload": {"field_id": "f1"}}
+
+        await cache.on_message(
+            SimpleNamespace(subject="sahool.ndvi.computed", data=json.dumps(envelope).encode())
+        )
+        await cache.on_message(SimpleNamespace(subject="sahool.weather.alert", data=b"not json"))
+
+        assert await cache.lookup("t1", "When to irrigate?", TOMATO_SANAA) is None
+        assert await cache.lookup("t2", "When to irrigate?", TOMATO_SANAA) is not None
+
+    @pytest.mark.asyncio
+    async def test_subscribe_registers_invalidating_subjects(self):
+        cache = SemanticResponseCache(local_embedding)
+        nc = SimpleNamespace(subscribe=AsyncMock(side_effect=lambda subject, cb: subject))
+
+        subscriptions = await cache.subscribe(nc)
+
+        assert subscriptions == ["sahool.weather.>", "sahool.ndvi.>", "sahool.satellite.ndvi.>"]
+        assert nc.subscribe.await_args.kwargs["cb"] == cache.on_message
+
+    @pytest.mark.asyncio
+    async def test_per_tenant_capacity(self):
+        clock = FakeClock()
+        cache = SemanticResponseCache(local_embedding, max_entries_per_tenant=2, clock=clock)
+
+        for i in range(3):
+            clock.now += 1
+            await cache.store("t1", f"question number {i}", TOMATO_SANAA, {"i": i})
+
+        assert cache.get_stats()["entries"] == 2
+        assert await cache.lookup("t1", "question number 0", TOMATO_SANAA) is None
+
+    @pytest.mark.asyncio
+    async def test_cost_saved_feeds_cost_tracker(self):
+        tracker = CostTracker()
+        cache = SemanticResponseCache(local_embedding, cost_tracker=tracker)
+        llm = MockLLMPipeline()
+
+        for _ in range(3):
+            await ask(cache, llm, "t1", "When to irrigate?", TOMATO_SANAA)
+
+        stats = tracker.get_usage_stats(user_id="t1")
+        assert stats["cache_hits"] == 2
+        assert stats["cost_saved"] == pytest.approx(0.04)
+        assert cache.get_stats()["cost_saved"] == pytest.approx(0.04)
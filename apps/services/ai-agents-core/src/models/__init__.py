@@ -31,7 +31,10 @@ from .crop_parameters import (
     get_crops_by_region,
 )
 from .yield_ensemble import (
+    BatchYieldPrediction,
     ConfidenceMetrics,
+    CropParameterColumns,
+    FieldBatch,
     FieldData,
     GDDBasedPredictor,
     GrowthStage,
@@ -63,7 +66,10 @@ __all__ = [
     # Yield prediction ensemble - مجموعة التنبؤ بالإنتاج
     "YieldEnsembleModel",
     "YieldPrediction",
+    "BatchYieldPrediction",
     "FieldData",
+    "FieldBatch",
+    "CropParameterColumns",
     "ConfidenceMetrics",
     "GrowthStage",
     "LimitingFactor",
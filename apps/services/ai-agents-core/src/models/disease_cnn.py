@@ -8,6 +8,7 @@ This module provides a comprehensive wrapper for disease detection in Yemen crop
 
 import json
 import logging
+import math
 import os
 from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
@@ -111,6 +112,13 @@ class DiseaseConfig:
     # TTA (Test Time Augmentation) configuration
     TTA_ENABLED = True
     TTA_AUGMENTATIONS = 5
+    TTA_ROTATIONS = (-10, 10)  # degrees, counter-clockwise
+    TTA_BRIGHTNESS = 1.1
+
+    # Brown/yellow discoloration (HSV) used for region estimation
+    # تغير اللون البني/الأصفر المستخدم لتقدير المنطقة المصابة
+    DISEASE_HSV_LOWER = (10, 50, 50)
+    DISEASE_HSV_UPPER = (30, 255, 200)
 
 
 class DiseaseCNNModel:
@@ -162,6 +170,10 @@ class DiseaseCNNModel:
         # علم ONNX للمعالجة الخاصة
         self._is_onnx = False
 
+        # Gather maps for TTA rotations, keyed by (height, width, angle)
+        # خرائط الدوران المحسوبة مسبقاً للتعزيز
+        self._rotation_maps: dict[tuple[int, int, float], tuple[np.ndarray, np.ndarray]] = {}
+
         logger.info(
             f"Initialized DiseaseCNNModel with framework: {self.framework}, device: {self.device}"
         )
@@ -315,32 +327,42 @@ class DiseaseCNNModel:
             Preprocessed image array - مصفوفة الصورة المعالجة
         """
         try:
-            # Load image - تحميل الصورة
-            if isinstance(image_data, str):
-                image = Image.open(image_data).convert("RGB")
-            elif isinstance(image_data, np.ndarray):
-                image = Image.fromarray(image_data).convert("RGB")
-            elif isinstance(image_data, Image.Image):
-                image = image_data.convert("RGB")
-            else:
-                raise ValueError(f"Unsupported image type: {type(image_data)}")
+            image = self._load_rgb(image_data)
 
             # Resize - تغيير الحجم
             size = target_size or self.config.DEFAULT_INPUT_SIZE
             image = self.resize_to_input_size(image, size)
 
-            # Convert to array - تحويل إلى مصفوفة
-            img_array = np.array(image)
-
-            # Normalize - تطبيع
-            img_array = self.normalize_pixels(img_array)
-
-            return img_array
+            # Convert to array and normalize - تحويل إلى مصفوفة وتطبيع
+            return self.normalize_pixels(np.array(image))
 
         except Exception as e:
             logger.error(f"Error preprocessing image: {e}")
             raise
 
+    def _load_rgb(self, image_data: str | np.ndarray | Image.Image) -> Image.Image:
+        """Load image as RGB - تحميل الصورة بصيغة RGB"""
+        if isinstance(image_data, str):
+            return Image.open(image_data).convert("RGB")
+        if isinstance(image_data, np.ndarray):
+            return Image.fromarray(image_data).convert("RGB")
+        if isinstance(image_data, Image.Image):
+            return image_data.convert("RGB")
+        raise ValueError(f"Unsupported image type: {type(image_data)}")
+
+    def _load_resized(
+        self, image_data: str | np.ndarray | Image.Image, size: int
+    ) -> tuple[np.ndarray, tuple[int, int]]:
+        """
+        Load and resize one image for batching
+        تحميل الصورة وتغيير حجمها للدفعة
+
+        Returns:
+            (uint8 RGB array of size x size, original (width, height))
+        """
+        image = self._load_rgb(image_data)
+        return np.asarray(self.resize_to_input_size(image, size)), image.size
+
     def resize_to_input_size(self, image: Image.Image | np.ndarray, size: int = 224) -> Image.Image:
         """
         Resize image to model input size
@@ -373,13 +395,13 @@ class DiseaseCNNModel:
         # Scale to [0, 1] - تحجيم إلى [0، 1]
         image = image.astype(np.float32) / 255.0
 
-        # Apply ImageNet normalization - تطبيق تطبيع ImageNet
-        mean = np.array(self.config.NORMALIZATION_MEAN)
-        std = np.array(self.config.NORMALIZATION_STD)
+        return self._standardize(image)
 
-        image = (image - mean) / std
-
-        return image
+    def _standardize(self, image: np.ndarray) -> np.ndarray:
+        """Apply ImageNet normalization to [0, 1] pixels - تطبيق تطبيع ImageNet"""
+        mean = np.asarray(self.config.NORMALIZATION_MEAN, dtype=np.float32)
+        std = np.asarray(self.config.NORMALIZATION_STD, dtype=np.float32)
+        return (image - mean) / std
 
     def augment_for_inference(
         self, image: np.ndarray, n_augmentations: int = 5
@@ -398,23 +420,101 @@ class DiseaseCNNModel:
         if not self.config.TTA_ENABLED:
             return [image]
 
-        augmented = [image]  # Original image
+        variants = self.tta_batch(np.asarray(image, dtype=np.float32)[None], n_augmentations)
+        return list(variants[0])
+
+    def tta_batch(self, images: np.ndarray, n_augmentations: int | None = None) -> np.ndarray:
+        """
+        Build TTA variants for a whole batch with array operations
+        إنشاء متغيرات التعزيز لدفعة كاملة بعمليات المصفوفات
+
+        Variants, in order: original, horizontal flip, the TTA_ROTATIONS
+        (nearest neighbour, black fill, like PIL ``rotate``) and brightness.
+
+        Args:
+            images: Batch of [0, 1] pixels, shape (N, H, W, 3) - دفعة الصور
+            n_augmentations: Number of variants - عدد التعزيزات
+
+        Returns:
+            Array of shape (N, T, H, W, 3) - مصفوفة المتغيرات
+        """
+        n = self.config.TTA_AUGMENTATIONS if n_augmentations is None else n_augmentations
+        n = max(1, min(n, 3 + len(self.config.TTA_ROTATIONS)))
+        count, height, width, channels = images.shape
+
+        out = np.empty((count, n, height, width, channels), dtype=images.dtype)
+        out[:, 0] = images
+        variant = 1
+        if variant < n:
+            out[:, variant] = images[:, :, ::-1]  # Horizontal flip - قلب أفقي
+            variant += 1
+
+        # Rotations as one gather over the flattened pixels - دورانات طفيفة
+        flat = images.reshape(count, height * width, channels)
+        for angle in self.config.TTA_ROTATIONS:
+            if variant >= n:
+                break
+            source, outside = self._rotation_map(height, width, angle)
+            rotated = flat[:, source]
+            rotated[:, outside] = 0
+            out[:, variant] = rotated.reshape(count, height, width, channels)
+            variant += 1
+
+        if variant < n:
+            # Brightness adjustment - تعديل السطوع
+            np.clip(images * self.config.TTA_BRIGHTNESS, 0, 1, out=out[:, variant])
+
+        return out
+
+    def _rotation_map(self, height: int, width: int, angle: float) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Source pixel of every output pixel for a rotation about the centre
+        خريطة البكسلات المصدر لدوران حول المركز
 
-        # Horizontal flip - قلب أفقي
-        augmented.append(np.fliplr(image))
+        Returns:
+            (flat source indices, mask of output pixels outside the image)
+        """
+        key = (height, width, angle)
+        cached = self._rotation_maps.get(key)
+        if cached is not None:
+            return cached
+
+        theta = -math.radians(angle)
+        cos, sin = math.cos(theta), math.sin(theta)
+        cx, cy = width / 2.0, height / 2.0
+        ys, xs = np.mgrid[0:height, 0:width] + 0.5
+        x_in = cos * (xs - cx) + sin * (ys - cy) + cx
+        y_in = -sin * (xs - cx) + cos * (ys - cy) + cy
+        inside = (x_in >= 0) & (x_in < width) & (y_in >= 0) & (y_in < height)
+        rows = np.clip(np.floor(y_in), 0, height - 1).astype(np.intp)
+        cols = np.clip(np.floor(x_in), 0, width - 1).astype(np.intp)
+
+        cached = ((rows * width + cols).ravel(), ~inside.ravel())
+        self._rotation_maps[key] = cached
+        return cached
+
+    def _infer(self, batch: np.ndarray) -> np.ndarray:
+        """
+        Run the model once on a normalized NHWC batch
+        تشغيل النموذج مرة واحدة على دفعة مطبعة
 
-        # Slight rotations - دورانات طفيفة
-        for angle in [-10, 10]:
-            pil_img = Image.fromarray((image * 255).astype(np.uint8))
-            rotated = pil_img.rotate(angle, fillcolor=(0, 0, 0))
-            rotated_array = np.array(rotated).astype(np.float32) / 255.0
-            augmented.append(rotated_array)
+        Returns:
+            Class scores, shape (N, classes) - درجات الفئات
+        """
+        if self.framework == "tensorflow":
+            return np.asarray(self.model.predict(batch, verbose=0))
 
-        # Brightness adjustment - تعديل السطوع
-        brightened = np.clip(image * 1.1, 0, 1)
-        augmented.append(brightened)
+        if self._is_onnx:
+            model_input = self.model.get_inputs()[0]
+            if len(model_input.shape) == 4 and model_input.shape[1] == 3:
+                batch = batch.transpose(0, 3, 1, 2)
+            feed = {model_input.name: np.ascontiguousarray(batch, dtype=np.float32)}
+            return np.asarray(self.model.run(None, feed)[0])
 
-        return augmented[:n_augmentations]
+        batch_tensor = torch.from_numpy(np.ascontiguousarray(batch)).permute(0, 3, 1, 2)
+        batch_tensor = batch_tensor.to(self.device)
+        with torch.no_grad():
+            return self.model(batch_tensor).cpu().numpy()
 
     def predict(
         self, image: str | np.ndarray | Image.Image, return_bbox: bool = True
@@ -440,15 +540,7 @@ class DiseaseCNNModel:
             img_array = self.preprocess_image(image)
 
             # Add batch dimension - إضافة بُعد الدفعة
-            if self.framework == "tensorflow":
-                img_batch = np.expand_dims(img_array, axis=0)
-                predictions = self.model.predict(img_batch, verbose=0)[0]
-
-            elif self.framework == "pytorch":
-                img_tensor = torch.from_numpy(img_array).permute(2, 0, 1).unsqueeze(0)
-                img_tensor = img_tensor.to(self.device)
-                with torch.no_grad():
-                    predictions = self.model(img_tensor).cpu().numpy()[0]
+            predictions = self._infer(img_array[None])[0]
 
             # Get top prediction - الحصول على أعلى تنبؤ
             disease_idx = np.argmax(predictions)
@@ -497,8 +589,8 @@ class DiseaseCNNModel:
 
             # Detect brown/yellow discoloration (common in diseases)
             # كشف تغير اللون البني/الأصفر (شائع في الأمراض)
-            lower_brown = np.array([10, 50, 50])
-            upper_brown = np.array([30, 255, 200])
+            lower_brown = np.array(self.config.DISEASE_HSV_LOWER)
+            upper_brown = np.array(self.config.DISEASE_HSV_UPPER)
             mask = cv2.inRange(hsv, lower_brown, upper_brown)
 
             # Find contours
@@ -523,6 +615,75 @@ class DiseaseCNNModel:
             logger.warning(f"Could not estimate disease region: {e}")
             return None
 
+    def estimate_disease_regions(
+        self, images: np.ndarray, original_sizes: list[tuple[int, int]] | None = None
+    ) -> list[dict | None]:
+        """
+        Estimate the disease-affected region of every image in a batch
+        تقدير المنطقة المصابة لكل صور الدفعة
+
+        The batch is stacked into one tall image with a blank row between
+        images, so colour conversion, thresholding and connected-component
+        labelling run once for the whole batch. The largest component of
+        each image is its region.
+
+        Args:
+            images: uint8 RGB batch, shape (N, H, W, 3) - دفعة الصور
+            original_sizes: (width, height) to scale boxes back to - الأحجام الأصلية
+
+        Returns:
+            One bbox dict (or None) per image - صندوق حدود لكل صورة
+        """
+        count, height, width, _ = images.shape
+        regions: list[dict | None] = [None] * count
+        if count == 0:
+            return regions
+
+        try:
+            stride = height + 1
+            tall = np.zeros((count, stride, width, 3), dtype=np.uint8)
+            tall[:, :height] = images
+            hsv = cv2.cvtColor(tall.reshape(count * stride, width, 3), cv2.COLOR_RGB2HSV)
+            mask = cv2.inRange(
+                hsv,
+                np.array(self.config.DISEASE_HSV_LOWER),
+                np.array(self.config.DISEASE_HSV_UPPER),
+            )
+            _, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+            stats = stats[1:]  # Drop the background label
+            if len(stats) == 0:
+                return regions
+
+            # Largest component per image - أكبر منطقة لكل صورة
+            owner = stats[:, cv2.CC_STAT_TOP] // stride
+            order = np.lexsort((stats[:, cv2.CC_STAT_AREA], owner))
+            last = np.append(owner[order][1:] != owner[order][:-1], True)
+            best = stats[order[last]]
+            best_owner = owner[order[last]]
+
+            scale = np.ones((count, 2))
+            if original_sizes is not None:
+                scale = np.asarray(original_sizes, dtype=np.float64) / (width, height)
+            sx, sy = scale[best_owner, 0], scale[best_owner, 1]
+            xs = np.floor(best[:, cv2.CC_STAT_LEFT] * sx).astype(int)
+            ys = np.floor((best[:, cv2.CC_STAT_TOP] - best_owner * stride) * sy).astype(int)
+            ws = np.ceil(best[:, cv2.CC_STAT_WIDTH] * sx).astype(int)
+            hs = np.ceil(best[:, cv2.CC_STAT_HEIGHT] * sy).astype(int)
+
+            for i, x, y, w, h in zip(best_owner.tolist(), xs, ys, ws, hs, strict=True):
+                regions[i] = {
+                    "x": int(x),
+                    "y": int(y),
+                    "width": int(w),
+                    "height": int(h),
+                    "confidence": 0.7,  # Placeholder confidence
+                }
+            return regions
+
+        except Exception as e:
+            logger.warning(f"Could not estimate disease regions: {e}")
+            return regions
+
     def get_top_k_predictions(
         self, image: str | np.ndarray | Image.Image, k: int = 3
     ) -> list[dict[str, Any]]:
@@ -545,15 +706,7 @@ class DiseaseCNNModel:
             img_array = self.preprocess_image(image)
 
             # Predict - تنبؤ
-            if self.framework == "tensorflow":
-                img_batch = np.expand_dims(img_array, axis=0)
-                predictions = self.model.predict(img_batch, verbose=0)[0]
-
-            elif self.framework == "pytorch":
-                img_tensor = torch.from_numpy(img_array).permute(2, 0, 1).unsqueeze(0)
-                img_tensor = img_tensor.to(self.device)
-                with torch.no_grad():
-                    predictions = self.model(img_tensor).cpu().numpy()[0]
+            predictions = self._infer(img_array[None])[0]
 
             # Get top k indices - الحصول على أعلى k مؤشرات
             top_k_indices = np.argsort(predictions)[-k:][::-1]
@@ -744,15 +897,27 @@ class DiseaseCNNModel:
             raise
 
     def predict_batch(
-        self, images: list[str | np.ndarray | Image.Image], batch_size: int = 8
+        self,
+        images: list[str | np.ndarray | Image.Image],
+        batch_size: int = 8,
+        use_tta: bool = False,
+        return_bbox: bool = True,
     ) -> list[tuple[str, float, dict | None]]:
         """
         Predict diseases for a batch of images
         التنبؤ بالأمراض لدفعة من الصور
 
+        Each chunk of ``batch_size`` images is resized once; with TTA its
+        variants are built as array operations and the model runs once over
+        the expanded batch, averaging scores per image. Loading the next
+        chunk and estimating regions run on the thread pool while the
+        model works on the current chunk.
+
         Args:
             images: List of images - قائمة الصور
             batch_size: Batch size for processing - حجم الدفعة للمعالجة
+            use_tta: Average over TTA variants - استخدام التعزيز في وقت الاختبار
+            return_bbox: Estimate disease regions - تقدير المناطق المصابة
 
         Returns:
             List of predictions - قائمة التنبؤات
@@ -762,36 +927,51 @@ class DiseaseCNNModel:
 
         logger.info(f"Processing batch of {len(images)} images")
 
+        size = self.config.DEFAULT_INPUT_SIZE
+        n_variants = self.config.TTA_AUGMENTATIONS if use_tta and self.config.TTA_ENABLED else 1
+        disease_names = list(self.config.SUPPORTED_DISEASES.keys())
+        batch_size = max(1, batch_size)
+        chunks = [images[i : i + batch_size] for i in range(0, len(images), batch_size)]
+
+        def load(chunk: list) -> list:
+            return [self.executor.submit(self._load_resized, img, size) for img in chunk]
+
         try:
             results = []
+            pending = load(chunks[0]) if chunks else []
 
             # Process in batches - معالجة في دفعات
-            for i in range(0, len(images), batch_size):
-                batch = images[i : i + batch_size]
-
-                # Preprocess batch - معالجة الدفعة مسبقاً
-                batch_arrays = [self.preprocess_image(img) for img in batch]
-                batch_array = np.stack(batch_arrays, axis=0)
-
-                # Predict - تنبؤ
-                if self.framework == "tensorflow":
-                    predictions = self.model.predict(batch_array, verbose=0)
-
-                elif self.framework == "pytorch":
-                    batch_tensor = torch.from_numpy(batch_array).permute(0, 3, 1, 2)
-                    batch_tensor = batch_tensor.to(self.device)
-                    with torch.no_grad():
-                        predictions = self.model(batch_tensor).cpu().numpy()
-
-                # Process predictions - معالجة التنبؤات
-                disease_names = list(self.config.SUPPORTED_DISEASES.keys())
-                for j, pred in enumerate(predictions):
-                    disease_idx = np.argmax(pred)
-                    disease_name = disease_names[disease_idx]
-                    confidence = float(pred[disease_idx])
-                    bbox = self._estimate_disease_region(batch[j])
+            for index in range(len(chunks)):
+                loaded = [future.result() for future in pending]
+                # Prefetch the next chunk while this one is on the model
+                # تحميل الدفعة التالية أثناء تشغيل النموذج على الحالية
+                pending = load(chunks[index + 1]) if index + 1 < len(chunks) else []
+
+                pixels = np.stack([array for array, _ in loaded])
+                regions = None
+                if return_bbox:
+                    regions = self.executor.submit(
+                        self.estimate_disease_regions, pixels, [s for _, s in loaded]
+                    )
 
-                    results.append((disease_name, confidence, bbox))
+                batch = pixels.astype(np.float32) / 255.0
+                variants = 1
+                if n_variants > 1:
+                    batch = self.tta_batch(batch, n_variants)
+                    variants = batch.shape[1]  # tta_batch caps the variants it can build
+                batch = self._standardize(batch.reshape(-1, size, size, 3))
+
+                # Predict once over all variants - تنبؤ واحد لكل المتغيرات
+                predictions = self._infer(batch)
+                predictions = predictions.reshape(len(loaded), variants, -1).mean(axis=1)
+
+                disease_idx = predictions.argmax(axis=1)
+                confidences = predictions[np.arange(len(loaded)), disease_idx]
+                bboxes = regions.result() if regions is not None else [None] * len(loaded)
+                results.extend(
+                    (disease_names[idx], float(conf), bbox)
+                    for idx, conf, bbox in zip(disease_idx, confidences, bboxes, strict=True)
+                )
 
             logger.info(f"Batch processing completed: {len(results)} results")
             return results
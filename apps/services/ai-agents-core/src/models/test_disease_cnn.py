@@ -315,6 +315,84 @@ class TestImageFormats(unittest.TestCase):
             self.assertEqual(processed.shape, (224, 224, 3))
 
 
+class _RecordingModel:
+    """Keras-style stand-in that records batch sizes - نموذج بديل يسجل أحجام الدفعات"""
+
+    def __init__(self, n_classes: int):
+        self.weights = np.random.default_rng(0).standard_normal((3, n_classes)).astype(np.float32)
+        self.batch_sizes = []
+
+    def predict(self, batch, verbose=0):
+        self.batch_sizes.append(len(batch))
+        scores = np.exp(batch.mean(axis=(1, 2)) @ self.weights)
+        return scores / scores.sum(axis=1, keepdims=True)
+
+
+class TestBatchedInference(unittest.TestCase):
+    """
+    Test batched TTA, inference and region estimation
+    اختبار التعزيز والاستدلال وتقدير المناطق بالدفعات
+    """
+
+    def setUp(self):
+        """Set up test model - إعداد نموذج الاختبار"""
+        self.model = DiseaseCNNModel(framework="tensorflow", enable_gpu=False)
+        self.model.model = _RecordingModel(len(DiseaseConfig.SUPPORTED_DISEASES))
+        rng = np.random.default_rng(1)
+        self.images = [rng.integers(0, 255, (300, 400, 3), dtype=np.uint8) for _ in range(5)]
+
+    def test_tta_batch_variants(self):
+        """Test TTA variants match the per-image augmentations - اختبار متغيرات التعزيز"""
+        pixels = np.stack(
+            [np.asarray(Image.fromarray(img).resize((64, 64))) for img in self.images]
+        )
+        batch = pixels.astype(np.float32) / 255.0
+
+        variants = self.model.tta_batch(batch, 5)
+
+        self.assertEqual(variants.shape, (5, 5, 64, 64, 3))
+        np.testing.assert_array_equal(variants[:, 0], batch)
+        np.testing.assert_array_equal(variants[:, 1], batch[:, :, ::-1])
+        np.testing.assert_allclose(variants[:, 4], np.clip(batch * 1.1, 0, 1))
+        for k, angle in ((2, -10), (3, 10)):
+            rotated = np.asarray(Image.fromarray(pixels[0]).rotate(angle, fillcolor=(0, 0, 0)))
+            matching = np.isclose(variants[0, k], rotated / 255.0, atol=1e-6).all(axis=-1)
+            self.assertGreater(matching.mean(), 0.99)
+
+    def test_predict_batch_runs_model_once_per_chunk(self):
+        """Test TTA expands the batch instead of looping - اختبار تنفيذ النموذج مرة لكل دفعة"""
+        results = self.model.predict_batch(self.images, batch_size=4, use_tta=True)
+
+        self.assertEqual(len(results), 5)
+        self.assertEqual(self.model.model.batch_sizes, [4 * 5, 1 * 5])
+
+    def test_predict_batch_matches_single_prediction(self):
+        """Test batched results equal single-image predictions - اختبار تطابق النتائج"""
+        results = self.model.predict_batch(self.images, batch_size=2, return_bbox=False)
+
+        for image, (disease, confidence, bbox) in zip(self.images, results, strict=True):
+            expected_disease, expected_confidence, _ = self.model.predict(image, return_bbox=False)
+            self.assertEqual(disease, expected_disease)
+            self.assertAlmostEqual(confidence, expected_confidence, places=5)
+            self.assertIsNone(bbox)
+
+    def test_estimate_disease_regions(self):
+        """Test one labelling pass finds each image's region - اختبار تقدير المناطق"""
+        pixels = np.zeros((3, 100, 100, 3), dtype=np.uint8)
+        pixels[0, 10:30, 20:60] = (160, 110, 40)  # Brown patch - بقعة بنية
+        pixels[0, 80:85, 80:85] = (160, 110, 40)
+        pixels[2, 0:100, 50:70] = (200, 170, 40)  # Touches the image bottom
+
+        regions = self.model.estimate_disease_regions(pixels, [(200, 100)] * 3)
+
+        self.assertEqual(
+            (regions[0]["x"], regions[0]["y"], regions[0]["width"], regions[0]["height"]),
+            (40, 10, 80, 20),
+        )
+        self.assertIsNone(regions[1])
+        self.assertEqual((regions[2]["y"], regions[2]["height"]), (0, 100))
+
+
 def run_tests():
     """
     Run all tests
@@ -328,6 +406,7 @@ def run_tests():
     suite.addTests(loader.loadTestsFromTestCase(TestDiseaseCNNModel))
     suite.addTests(loader.loadTestsFromTestCase(TestDiseaseRecommendations))
     suite.addTests(loader.loadTestsFromTestCase(TestImageFormats))
+    suite.addTests(loader.loadTestsFromTestCase(TestBatchedInference))
 
     # Run tests - تشغيل الاختبارات
     runner = unittest.TextTestRunner(verbosity=2)
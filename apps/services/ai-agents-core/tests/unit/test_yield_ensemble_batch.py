@@ -0,0 +1,158 @@
+"""
+Unit Tests for Yield Ensemble Batch Prediction
+اختبارات الوحدة للتنبؤ الدفعي بالإنتاج
+
+Tests for YieldEnsembleModel.predict_batch:
+- Results match the single-field predict path
+- Missing and zero-valued inputs take the same branches
+- Lazy per-field predictions and explanations
+- Unknown crops
+"""
+
+import math
+import random
+from datetime import datetime
+
+import pytest
+from models.crop_parameters import Region, get_all_crop_ids
+from models.yield_ensemble import (
+    BatchYieldPrediction,
+    FieldBatch,
+    FieldData,
+    YieldEnsembleModel,
+)
+
+# ============================================================================
+# Fixtures
+# ============================================================================
+
+
+def _random_fields(n: int, seed: int = 11) -> list[FieldData]:
+    rng = random.Random(seed)
+    crops = get_all_crop_ids()
+
+    def maybe(value, p=0.25):
+        return None if rng.random() < p else value
+
+    return [
+        FieldData(
+            field_id=f"field_{i}",
+            crop_id=rng.choice(crops),
+            region=rng.choice(list(Region)),
+            area_hectares=rng.uniform(0.5, 20),
+            ndvi_current=maybe(rng.choice([0.0, rng.uniform(0.1, 0.9)])),
+            ndvi_peak=maybe(rng.uniform(0.2, 0.95)),
+            ndvi_history=maybe([(datetime(2026, 1, 1), 0.5)] * rng.randint(0, 8)),
+            accumulated_gdd=maybe(rng.uniform(100, 3500), 0.4),
+            current_temperature=maybe(rng.choice([0.0, rng.uniform(5, 45)])),
+            soil_moisture_current=maybe(rng.uniform(5, 80)),
+            soil_ph=maybe(rng.uniform(4.5, 9)),
+            soil_ec=maybe(rng.uniform(0, 12)),
+            soil_nutrient_score=maybe(rng.random()),
+            total_irrigation_mm=maybe(rng.choice([0.0, rng.uniform(0, 900)]), 0.4),
+            total_rainfall_mm=maybe(rng.uniform(0, 400), 0.5),
+            planting_date=maybe(datetime(2026, 3, 1)),
+            days_since_planting=maybe(rng.choice([0, rng.randint(1, 200)]), 0.4),
+            historical_yields=maybe([rng.uniform(500, 8000) for _ in range(rng.randint(0, 7))]),
+            disease_severity=maybe(rng.choice([0.0, rng.random()])),
+        )
+        for i in range(n)
+    ]
+
+
+@pytest.fixture
+def model():
+    return YieldEnsembleModel()
+
+
+@pytest.fixture
+def fields():
+    return _random_fields(300)
+
+
+def _close(a: float, b: float) -> bool:
+    return math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-9)
+
+
+# ============================================================================
+# Test Batch Prediction
+# ============================================================================
+
+
+@pytest.mark.unit
+class TestYieldEnsembleBatch:
+    """Test vectorized batch prediction"""
+
+    def test_matches_single_field_predict(self, model, fields):
+        """Batch results equal predict() for every field"""
+        batch = model.predict_batch(fields)
+
+        assert len(batch) == len(fields)
+        for field_data, batched in zip(fields, batch, strict=True):
+            single = model.predict(field_data)
+            assert _close(
+                batched.predicted_yield_kg_per_hectare, single.predicted_yield_kg_per_hectare
+            )
+            assert _close(batched.confidence, single.confidence)
+            for key in ("low", "mid", "high"):
+                assert _close(batched.confidence_interval[key], single.confidence_interval[key])
+            for name, value in single.sub_model_predictions.items():
+                assert _close(batched.sub_model_predictions[name], value)
+                assert _close(
+                    batched.confidence_metrics.model_confidences[name],
+                    single.confidence_metrics.model_confidences[name],
+                )
+            assert _close(batched.estimated_total_revenue, single.estimated_total_revenue)
+            assert batched.limiting_factors == single.limiting_factors
+            assert batched.recommendations == single.recommendations
+            assert batched.growth_stage == single.growth_stage
+            assert batched.days_to_harvest == single.days_to_harvest
+
+    def test_columns_pad_histories(self, fields):
+        """Historical yields are padded to the longest history"""
+        packed = FieldBatch.from_fields(fields)
+
+        longest = max(len(f.historical_yields or []) for f in fields)
+        assert packed.historical_yields.shape == (len(fields), longest)
+        assert packed.crop_ids == list(dict.fromkeys(f.crop_id for f in fields))
+
+    def test_zero_peak_ndvi_falls_back_to_current(self, model):
+        """A zero NDVI peak is treated like a missing one, as in predict()"""
+        field_data = FieldData(
+            field_id="f",
+            crop_id=get_all_crop_ids()[0],
+            region=Region.HIGHLANDS,
+            area_hectares=1.0,
+            ndvi_peak=0.0,
+            ndvi_current=0.6,
+        )
+
+        batch = model.predict_batch([field_data])
+
+        assert _close(
+            batch.sub_model_predictions["ndvi"][0],
+            model.predict(field_data).sub_model_predictions["ndvi"],
+        )
+
+    def test_predictions_are_built_lazily(self, model, fields):
+        """Per-field objects are only built when accessed"""
+        batch = model.predict_batch(fields)
+
+        assert isinstance(batch, BatchYieldPrediction)
+        assert batch._cache == {}
+        assert batch[-1] is batch[len(fields) - 1]
+        assert len(batch._cache) == 1
+        assert batch.explain(0)["summary"]["crop"] == fields[0].crop_id
+        with pytest.raises(IndexError):
+            batch[len(fields)]
+
+    def test_empty_batch(self, model):
+        """An empty batch returns no predictions"""
+        assert len(model.predict_batch([])) == 0
+
+    def test_unknown_crop_raises(self, model, fields):
+        """Unknown crops raise like predict()"""
+        fields[5].crop_id = "not_a_crop"
+
+        with pytest.raises(ValueError, match="Unknown crop"):
+            model.predict_batch(fields)
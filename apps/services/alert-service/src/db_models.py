@@ -10,7 +10,7 @@ from __future__ import annotations
 from datetime import UTC, datetime
 from uuid import UUID, uuid4
 
-from sqlalchemy import Boolean, DateTime, Index, Integer, String, Text
+from sqlalchemy import Boolean, DateTime, Float, Index, Integer, String, Text
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.dialects.postgresql import UUID as PGUUID
 from sqlalchemy.orm import Mapped, declarative_base, mapped_column
@@ -226,6 +226,59 @@ class Alert(Base):
         }
 
 
+class AlertStatsHourly(Base):
+    """
+    Hourly alert statistics rollup.
+
+    For each tenant and creation hour, one row per value of each counted
+    dimension: type, severity, status and resolution-time bucket. Every alert
+    is counted once per dimension, so an hour holds a few dozen rows however
+    many alerts it had. The repository keeps it in step with alert writes.
+    """
+
+    __tablename__ = "alert_stats_hourly"
+
+    tenant_id: Mapped[UUID] = mapped_column(
+        PGUUID(as_uuid=True),
+        primary_key=True,
+        comment="Tenant that owns the alerts (nil UUID for alerts without a tenant)",
+    )
+    bucket_start: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        primary_key=True,
+        comment="UTC hour in which the alerts were created",
+    )
+    dimension: Mapped[str] = mapped_column(
+        String(20),
+        primary_key=True,
+        comment="Counted dimension: type, severity, status or resolution",
+    )
+    value: Mapped[str] = mapped_column(
+        String(40),
+        primary_key=True,
+        comment="Dimension value; the histogram bucket index for resolution",
+    )
+
+    alert_count: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+        comment="Number of alerts",
+    )
+    resolution_seconds: Mapped[float] = mapped_column(
+        Float,
+        nullable=False,
+        default=0.0,
+        comment="Sum of resolved_at - created_at in seconds (resolution rows only)",
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<AlertStatsHourly(tenant_id={self.tenant_id}, bucket_start={self.bucket_start}, "
+            f"{self.dimension}={self.value}, alert_count={self.alert_count})>"
+        )
+
+
 class AlertRule(Base):
     """
     Alert rule configuration model.
@@ -898,6 +898,8 @@ async def get_stats(
         acknowledged_rate=round(acknowledged_rate, 2),
         resolved_rate=round(resolved_rate, 2),
         average_resolution_hours=stats.get("average_resolution_hours"),
+        median_resolution_hours=stats.get("median_resolution_hours"),
+        p90_resolution_hours=stats.get("p90_resolution_hours"),
     )
 
 
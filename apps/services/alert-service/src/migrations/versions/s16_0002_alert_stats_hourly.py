@@ -0,0 +1,79 @@
+"""
+Sprint 16: Hourly Alert Statistics Rollup
+
+Creates the alert_stats_hourly rollup read by the statistics endpoint and
+backfills it from existing alerts.
+
+Revision ID: s16_0002
+Revises: s16_0001
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = "s16_0002"
+down_revision = "s16_0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Create and backfill the alert_stats_hourly table.
+    """
+    op.create_table(
+        "alert_stats_hourly",
+        # Rollup key
+        sa.Column("tenant_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("bucket_start", sa.DateTime(timezone=True), nullable=False),
+        # type, severity, status or resolution (histogram bucket index, -1 unresolved)
+        sa.Column("dimension", sa.String(length=20), nullable=False),
+        sa.Column("value", sa.String(length=40), nullable=False),
+        # Aggregates
+        sa.Column("alert_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("resolution_seconds", sa.Float(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("tenant_id", "bucket_start", "dimension", "value"),
+    )
+
+    # Backfill; bucket bounds match RESOLUTION_BUCKET_HOURS in repository.py
+    op.execute(
+        """
+        INSERT INTO alert_stats_hourly (
+            tenant_id, bucket_start, dimension, value, alert_count, resolution_seconds
+        )
+        SELECT
+            COALESCE(a.tenant_id, '00000000-0000-0000-0000-000000000000'::uuid),
+            date_trunc('hour', a.created_at AT TIME ZONE 'UTC') AT TIME ZONE 'UTC',
+            d.dimension,
+            d.value,
+            COUNT(*),
+            COALESCE(SUM(CASE WHEN d.dimension = 'resolution' THEN a.seconds END), 0)
+        FROM (
+            SELECT *, EXTRACT(EPOCH FROM resolved_at - created_at) AS seconds
+            FROM alerts
+        ) AS a
+        CROSS JOIN LATERAL (
+            VALUES
+                ('type', a.type),
+                ('severity', a.severity),
+                ('status', a.status),
+                ('resolution', CASE
+                    WHEN a.seconds IS NULL THEN '-1'
+                    ELSE width_bucket(
+                        a.seconds / 3600,
+                        ARRAY[0.25, 0.5, 1, 2, 4, 8, 12, 24, 48, 72, 168, 336, 720]::float8[]
+                    )::text
+                END)
+        ) AS d (dimension, value)
+        GROUP BY 1, 2, 3, 4
+        """
+    )
+
+
+def downgrade() -> None:
+    """
+    Drop the alert_stats_hourly table.
+    """
+    op.drop_table("alert_stats_hourly")
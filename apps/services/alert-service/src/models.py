@@ -195,6 +195,8 @@ class AlertStats(BaseModel):
     acknowledged_rate: float
     resolved_rate: float
     average_resolution_hours: float | None
+    median_resolution_hours: float | None = None
+    p90_resolution_hours: float | None = None
 
 
 class PaginatedResponse(BaseModel):
@@ -7,13 +7,41 @@ Data access layer for alerts and alert rules
 
 from __future__ import annotations
 
+from bisect import bisect_right
 from datetime import UTC, datetime, timedelta
 from uuid import UUID
 
-from sqlalchemy import func, or_, select
+from sqlalchemy import (
+    Float,
+    String,
+    case,
+    cast,
+    delete,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    text,
+    true,
+    union_all,
+)
+from sqlalchemy.dialects.postgresql import array
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
-from .db_models import Alert, AlertRule
+from .db_models import Alert, AlertRule, AlertStatsHourly
+
+# Exclusive upper bounds (hours) of the resolution-time histogram kept in the hourly
+# rollup; longer resolutions fall in one final open bucket
+RESOLUTION_BUCKET_HOURS = (0.25, 0.5, 1, 2, 4, 8, 12, 24, 48, 72, 168, 336, 720)
+UNRESOLVED_BUCKET = -1
+
+# Dimensions counted in the hourly rollup, each alert once per dimension
+ROLLUP_DIMENSIONS = ("type", "severity", "status", "resolution")
+
+# Rollup tenant for alerts stored without one (primary key columns are NOT NULL)
+NO_TENANT = UUID(int=0)
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # Alerts Repository
@@ -33,6 +61,7 @@ def create_alert(db: Session, alert: Alert) -> Alert:
     """
     db.add(alert)
     db.flush()  # Get the ID without committing
+    _apply_rollup_change(db, None, _rollup_rows(alert))
     return alert
 
 
@@ -177,12 +206,14 @@ def update_alert_status(
     Returns:
         Updated alert or None if not found
     """
-    query = select(Alert).where(Alert.id == alert_id)
+    # Lock the row so concurrent transitions move the rollup counts once
+    query = select(Alert).where(Alert.id == alert_id).with_for_update()
     alert = db.execute(query).scalar_one_or_none()
 
     if not alert:
         return None
 
+    old_rows = _rollup_rows(alert)
     alert.status = status
     now = datetime.now(UTC)
 
@@ -198,6 +229,7 @@ def update_alert_status(
         if note:
             alert.resolution_note = note
 
+    _apply_rollup_change(db, old_rows, _rollup_rows(alert))
     return alert
 
 
@@ -248,12 +280,13 @@ def delete_alert(db: Session, alert_id: UUID) -> bool:
     Returns:
         True if deleted, False if not found
     """
-    query = select(Alert).where(Alert.id == alert_id)
+    query = select(Alert).where(Alert.id == alert_id).with_for_update()
     alert = db.execute(query).scalar_one_or_none()
 
     if not alert:
         return False
 
+    _apply_rollup_change(db, _rollup_rows(alert), None)
     db.delete(alert)
     return True
 
@@ -268,6 +301,91 @@ def get_alert_statistics(
     """
     Get alert statistics for a period.
 
+    Whole hours are read from the hourly rollup; the partial hour at the
+    start of the window is aggregated from the alerts table in the same
+    query. Resolution percentiles are interpolated from the rollup's
+    resolution-time histogram. The rollup is kept per tenant, so field
+    statistics, and windows the rollup has no rows for, use
+    get_alert_statistics_direct.
+
+    Args:
+        db: SQLAlchemy session
+        tenant_id: Optional tenant filter
+        field_id: Optional field filter
+        days: Number of days to look back
+
+    Returns:
+        Dictionary with statistics
+    """
+    if field_id:
+        return get_alert_statistics_direct(db, tenant_id=tenant_id, field_id=field_id, days=days)
+
+    cutoff = datetime.now(UTC) - timedelta(days=days)
+    first_hour = _hour(cutoff)
+    if first_hour < cutoff:
+        first_hour += timedelta(hours=1)
+
+    rollup = select(
+        AlertStatsHourly.dimension,
+        AlertStatsHourly.value,
+        func.sum(AlertStatsHourly.alert_count),
+        cast(func.sum(AlertStatsHourly.resolution_seconds), Float),
+        literal(True).label("rolled_up"),
+    ).where(AlertStatsHourly.bucket_start >= first_hour)
+    if tenant_id:
+        rollup = rollup.where(AlertStatsHourly.tenant_id == tenant_id)
+    rollup = rollup.group_by(AlertStatsHourly.dimension, AlertStatsHourly.value)
+
+    head = _dimension_counts().add_columns(literal(False).label("rolled_up"))
+    head = head.where(
+        *_alert_filters(tenant_id, None),
+        Alert.created_at >= cutoff,
+        Alert.created_at < first_hour,
+    )
+
+    rows = db.execute(union_all(rollup, head)).all()
+    if not any(rolled_up for *_, rolled_up in rows):
+        return get_alert_statistics_direct(db, tenant_id=tenant_id, days=days)
+
+    counts: dict[tuple[str, str], int] = {}
+    resolution_seconds = 0.0
+    for dimension, value, count, seconds, _ in rows:
+        counts[dimension, value] = counts.get((dimension, value), 0) + count
+        resolution_seconds += seconds
+
+    histogram = {
+        int(value): count
+        for (dimension, value), count in counts.items()
+        if dimension == "resolution" and int(value) != UNRESOLVED_BUCKET
+    }
+    resolved = sum(histogram.values())
+
+    def breakdown(dimension: str) -> dict[str, int]:
+        return {v: count for (d, v), count in counts.items() if d == dimension and count}
+
+    return _statistics_response(
+        breakdown("type"),
+        breakdown("severity"),
+        breakdown("status"),
+        resolution_seconds / resolved / 3600 if resolved else None,
+        _histogram_percentile(histogram, 0.5),
+        _histogram_percentile(histogram, 0.9),
+    )
+
+
+def get_alert_statistics_direct(
+    db: Session,
+    *,
+    tenant_id: UUID | None = None,
+    field_id: str | None = None,
+    days: int = 30,
+) -> dict:
+    """
+    Get alert statistics for a period straight from the alerts table.
+
+    One GROUP BY query for the counts and resolution time and one for exact
+    resolution percentiles, without loading alert rows.
+
     Args:
         db: SQLAlchemy session
         tenant_id: Optional tenant filter
@@ -278,51 +396,272 @@ def get_alert_statistics(
         Dictionary with statistics
     """
     cutoff = datetime.now(UTC) - timedelta(days=days)
+    conditions = [*_alert_filters(tenant_id, field_id), Alert.created_at >= cutoff]
+    seconds = _resolution_seconds()
+
+    rows = db.execute(
+        select(
+            Alert.type,
+            Alert.severity,
+            Alert.status,
+            func.count(),
+            func.count(Alert.resolved_at),
+            cast(func.coalesce(func.sum(seconds), 0), Float),
+        )
+        .where(*conditions)
+        .group_by(Alert.type, Alert.severity, Alert.status)
+    ).all()
+
+    median, p90 = db.execute(
+        select(
+            func.percentile_cont(0.5).within_group(seconds),
+            func.percentile_cont(0.9).within_group(seconds),
+        ).where(*conditions, Alert.resolved_at.is_not(None))
+    ).one()
+
+    by_type: dict[str, int] = {}
+    by_severity: dict[str, int] = {}
+    by_status: dict[str, int] = {}
+    resolved = 0
+    resolution_seconds = 0.0
+    for alert_type, severity, status, count, resolved_count, total_seconds in rows:
+        by_type[alert_type] = by_type.get(alert_type, 0) + count
+        by_severity[severity] = by_severity.get(severity, 0) + count
+        by_status[status] = by_status.get(status, 0) + count
+        resolved += resolved_count
+        resolution_seconds += total_seconds
+
+    return _statistics_response(
+        by_type,
+        by_severity,
+        by_status,
+        resolution_seconds / resolved / 3600 if resolved else None,
+        round(median / 3600, 2) if median is not None else None,
+        round(p90 / 3600, 2) if p90 is not None else None,
+    )
+
 
-    query = select(Alert).where(Alert.created_at >= cutoff)
+def rebuild_alert_rollups(db: Session, *, tenant_id: UUID | None = None) -> int:
+    """
+    Rebuild the hourly statistics rollup from the alerts table.
+
+    Repairs drift from alerts written outside this repository. Blocks alert
+    writes until the caller commits.
+
+    Args:
+        db: SQLAlchemy session
+        tenant_id: Optional tenant to rebuild; all tenants when omitted
 
+    Returns:
+        Number of rollup rows written
+    """
+    db.execute(text("LOCK TABLE alerts IN EXCLUSIVE MODE"))
+
+    clear = delete(AlertStatsHourly)
     if tenant_id:
-        query = query.where(Alert.tenant_id == tenant_id)
+        clear = clear.where(AlertStatsHourly.tenant_id == tenant_id)
+    db.execute(clear)
 
+    tenant = func.coalesce(Alert.tenant_id, NO_TENANT)
+    hour = func.timezone("UTC", func.date_trunc("hour", func.timezone("UTC", Alert.created_at)))
+    rows = _dimension_counts(tenant, hour)
+    if tenant_id:
+        rows = rows.where(Alert.tenant_id == tenant_id)
+
+    result = db.execute(
+        insert(AlertStatsHourly).from_select(
+            [
+                "tenant_id",
+                "bucket_start",
+                "dimension",
+                "value",
+                "alert_count",
+                "resolution_seconds",
+            ],
+            rows,
+        )
+    )
+    return result.rowcount
+
+
+def _alert_filters(tenant_id: UUID | None, field_id: str | None) -> list:
+    conditions = []
+    if tenant_id:
+        conditions.append(Alert.tenant_id == tenant_id)
     if field_id:
-        query = query.where(Alert.field_id == field_id)
+        conditions.append(Alert.field_id == field_id)
+    return conditions
 
-    alerts = list(db.execute(query).scalars())
 
-    total = len(alerts)
-    active = len([a for a in alerts if a.status == "active"])
+def _hour(moment: datetime) -> datetime:
+    return moment.astimezone(UTC).replace(minute=0, second=0, microsecond=0)
+
+
+def _resolution_seconds():
+    return func.extract("epoch", Alert.resolved_at - Alert.created_at)
+
 
-    by_type = {}
-    by_severity = {}
-    by_status = {}
+def _resolution_bucket(seconds: float | None) -> int:
+    """Histogram bucket for a resolution time (UNRESOLVED_BUCKET when None)"""
+    if seconds is None:
+        return UNRESOLVED_BUCKET
+    return bisect_right(RESOLUTION_BUCKET_HOURS, seconds / 3600)
 
-    for alert in alerts:
-        by_type[alert.type] = by_type.get(alert.type, 0) + 1
-        by_severity[alert.severity] = by_severity.get(alert.severity, 0) + 1
-        by_status[alert.status] = by_status.get(alert.status, 0) + 1
 
-    # Calculate resolution times
-    resolution_times = []
-    for alert in alerts:
-        if alert.resolved_at and alert.created_at:
-            delta = alert.resolved_at - alert.created_at
-            hours = delta.total_seconds() / 3600
-            resolution_times.append(hours)
+def _resolution_bucket_sql(seconds):
+    """SQL counterpart of _resolution_bucket"""
+    return case(
+        (seconds.is_(None), UNRESOLVED_BUCKET),
+        *((seconds < hours * 3600, i) for i, hours in enumerate(RESOLUTION_BUCKET_HOURS)),
+        else_=len(RESOLUTION_BUCKET_HOURS),
+    )
+
+
+def _dimension_counts(*keys):
+    """
+    Alerts counted per rollup dimension value, grouped by ``keys`` first.
+
+    Each alert row is unpivoted into its type, severity, status and
+    resolution rows, mirroring _rollup_rows.
+    """
+    seconds = _resolution_seconds()
+    dimensions = (
+        func.unnest(
+            array([literal(dimension) for dimension in ROLLUP_DIMENSIONS]),
+            array(
+                [
+                    Alert.type,
+                    Alert.severity,
+                    Alert.status,
+                    cast(_resolution_bucket_sql(seconds), String),
+                ]
+            ),
+        )
+        .table_valued("dimension", "value")
+        .render_derived(name="d")
+        .lateral()
+    )
+    resolution_seconds = case((dimensions.c.dimension == "resolution", seconds))
+    return (
+        select(
+            *keys,
+            dimensions.c.dimension,
+            dimensions.c.value,
+            func.count(),
+            cast(func.coalesce(func.sum(resolution_seconds), 0), Float),
+        )
+        .select_from(Alert)
+        .join(dimensions, true())
+        .group_by(*keys, dimensions.c.dimension, dimensions.c.value)
+    )
 
-    avg_resolution = sum(resolution_times) / len(resolution_times) if resolution_times else None
 
+def _histogram_percentile(histogram: dict[int, int], fraction: float) -> float | None:
+    """Resolution-time percentile in hours, interpolated within its bucket"""
+    total = sum(histogram.values())
+    if not total:
+        return None
+
+    rank = fraction * total
+    seen = 0
+    for bucket in sorted(histogram):
+        count = histogram[bucket]
+        if count and seen + count >= rank:
+            lower = RESOLUTION_BUCKET_HOURS[bucket - 1] if bucket else 0.0
+            # The open last bucket has no upper bound; report its lower bound
+            upper = (
+                RESOLUTION_BUCKET_HOURS[bucket] if bucket < len(RESOLUTION_BUCKET_HOURS) else lower
+            )
+            return round(lower + (upper - lower) * (rank - seen) / count, 2)
+        seen += count
+    return None
+
+
+def _statistics_response(
+    by_type: dict[str, int],
+    by_severity: dict[str, int],
+    by_status: dict[str, int],
+    avg_resolution: float | None,
+    median_hours: float | None,
+    p90_hours: float | None,
+) -> dict:
     return {
-        "total_alerts": total,
-        "active_alerts": active,
+        "total_alerts": sum(by_status.values()),
+        "active_alerts": by_status.get("active", 0),
         "by_type": by_type,
         "by_severity": by_severity,
         "by_status": by_status,
         "acknowledged_count": by_status.get("acknowledged", 0),
         "resolved_count": by_status.get("resolved", 0),
         "average_resolution_hours": (round(avg_resolution, 2) if avg_resolution else None),
+        "median_resolution_hours": median_hours,
+        "p90_resolution_hours": p90_hours,
     }
 
 
+def _rollup_rows(alert: Alert) -> dict[tuple, float]:
+    """
+    Rollup rows an alert is counted in, keyed by (tenant_id, bucket_start,
+    dimension, value), with the resolution seconds each row carries.
+    """
+    created_at = alert.created_at
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=UTC)
+
+    seconds = None
+    if alert.resolved_at:
+        resolved_at = alert.resolved_at
+        if resolved_at.tzinfo is None:
+            resolved_at = resolved_at.replace(tzinfo=UTC)
+        seconds = (resolved_at - created_at).total_seconds()
+
+    tenant_id = alert.tenant_id or NO_TENANT
+    hour = _hour(created_at)
+    return {
+        (tenant_id, hour, "type", alert.type): 0.0,
+        (tenant_id, hour, "severity", alert.severity): 0.0,
+        (tenant_id, hour, "status", alert.status): 0.0,
+        (tenant_id, hour, "resolution", str(_resolution_bucket(seconds))): seconds or 0.0,
+    }
+
+
+def _apply_rollup_change(
+    db: Session,
+    old: dict[tuple, float] | None,
+    new: dict[tuple, float] | None,
+) -> None:
+    """Move one alert's counts between rollup rows"""
+    deltas: dict[tuple, list] = {}
+    for rows, sign in ((old or {}, -1), (new or {}, 1)):
+        for key, seconds in rows.items():
+            delta = deltas.setdefault(key, [0, 0.0])
+            delta[0] += sign
+            delta[1] += sign * seconds
+
+    for (tenant_id, bucket_start, dimension, value), (count, seconds) in deltas.items():
+        if not count and not seconds:
+            continue
+        stmt = pg_insert(AlertStatsHourly).values(
+            tenant_id=tenant_id,
+            bucket_start=bucket_start,
+            dimension=dimension,
+            value=value,
+            alert_count=count,
+            resolution_seconds=seconds,
+        )
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["tenant_id", "bucket_start", "dimension", "value"],
+                set_={
+                    "alert_count": AlertStatsHourly.alert_count + stmt.excluded.alert_count,
+                    "resolution_seconds": (
+                        AlertStatsHourly.resolution_seconds + stmt.excluded.resolution_seconds
+                    ),
+                },
+            )
+        )
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # Alert Rules Repository
 # ═══════════════════════════════════════════════════════════════════════════════
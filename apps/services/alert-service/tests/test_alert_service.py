@@ -448,12 +448,20 @@ class TestAlertRuleRepository:
 class TestAlertStatistics:
     """Test alert statistics operations"""
 
-    def test_get_alert_statistics(self, mock_db_session, mock_alert):
+    def test_get_alert_statistics(self, mock_db_session):
         """Test getting alert statistics"""
         from src.repository import get_alert_statistics
 
+        # (dimension, value, alert count, resolution seconds, rolled_up)
         mock_result = MagicMock()
-        mock_result.scalars = MagicMock(return_value=[mock_alert])
+        mock_result.all = MagicMock(
+            return_value=[
+                ("type", "ndvi_low", 3, 0.0, True),
+                ("severity", "high", 3, 0.0, True),
+                ("status", "active", 3, 0.0, True),
+                ("resolution", "-1", 3, 0.0, True),
+            ]
+        )
         mock_db_session.execute = MagicMock(return_value=mock_result)
 
         stats = get_alert_statistics(
@@ -465,13 +473,18 @@ class TestAlertStatistics:
         assert "by_type" in stats
         assert "by_severity" in stats
         assert "by_status" in stats
+        assert stats["active_alerts"] == 3
+        assert mock_db_session.execute.call_count == 1
 
-    def test_get_alert_statistics_by_field(self, mock_db_session, mock_alert):
+    def test_get_alert_statistics_by_field(self, mock_db_session):
         """Test getting statistics for specific field"""
         from src.repository import get_alert_statistics
 
+        # Field statistics group the alerts table directly:
+        # (type, severity, status, alert count, resolved count, resolution seconds)
         mock_result = MagicMock()
-        mock_result.scalars = MagicMock(return_value=[mock_alert])
+        mock_result.all = MagicMock(return_value=[("ndvi_low", "high", "active", 1, 0, 0.0)])
+        mock_result.one = MagicMock(return_value=(None, None))
         mock_db_session.execute = MagicMock(return_value=mock_result)
 
         stats = get_alert_statistics(
@@ -483,15 +496,21 @@ class TestAlertStatistics:
 
         assert stats["total_alerts"] >= 0
 
-    def test_get_alert_statistics_resolution_time(self, mock_db_session, mock_alert):
+    def test_get_alert_statistics_resolution_time(self, mock_db_session):
         """Test calculating average resolution time"""
-        from src.repository import get_alert_statistics
-
-        # Set resolved times for calculation
-        mock_alert.resolved_at = mock_alert.created_at + timedelta(hours=4)
+        from src.repository import _resolution_bucket, get_alert_statistics
 
+        # One alert resolved 4 hours after it was created
+        bucket = _resolution_bucket(4 * 3600)
         mock_result = MagicMock()
-        mock_result.scalars = MagicMock(return_value=[mock_alert])
+        mock_result.all = MagicMock(
+            return_value=[
+                ("type", "ndvi_low", 1, 0.0, True),
+                ("severity", "high", 1, 0.0, True),
+                ("status", "resolved", 1, 0.0, True),
+                ("resolution", str(bucket), 1, 4 * 3600.0, True),
+            ]
+        )
         mock_db_session.execute = MagicMock(return_value=mock_result)
 
         stats = get_alert_statistics(
@@ -499,15 +518,16 @@ class TestAlertStatistics:
         )
 
         assert "average_resolution_hours" in stats
-        if stats["average_resolution_hours"] is not None:
-            assert stats["average_resolution_hours"] > 0
+        assert stats["average_resolution_hours"] == 4.0
+        assert 4 <= stats["median_resolution_hours"] <= 8
 
     def test_get_alert_statistics_empty(self, mock_db_session):
         """Test statistics with no alerts"""
         from src.repository import get_alert_statistics
 
         mock_result = MagicMock()
-        mock_result.scalars = MagicMock(return_value=[])
+        mock_result.all = MagicMock(return_value=[])
+        mock_result.one = MagicMock(return_value=(None, None))
         mock_db_session.execute = MagicMock(return_value=mock_result)
 
         stats = get_alert_statistics(
@@ -516,6 +536,7 @@ class TestAlertStatistics:
 
         assert stats["total_alerts"] == 0
         assert stats["active_alerts"] == 0
+        assert stats["average_resolution_hours"] is None
 
 
 class TestAlertModels:
@@ -762,17 +783,17 @@ class TestComplexQueries:
         """Test statistics with grouping"""
         from src.repository import get_alert_statistics
 
-        # Create multiple mock alerts with different types
-        alerts = []
-        for i in range(5):
-            alert = MagicMock()
-            alert.type = "ndvi_low" if i < 3 else "weather"
-            alert.severity = "high"
-            alert.status = "active"
-            alerts.append(alert)
+        # Rollup rows for alerts with different types
+        rows = [
+            ("type", "ndvi_low", 3, 0.0, True),
+            ("type", "weather", 2, 0.0, True),
+            ("severity", "high", 5, 0.0, True),
+            ("status", "active", 5, 0.0, True),
+            ("resolution", "-1", 5, 0.0, True),
+        ]
 
         mock_result = MagicMock()
-        mock_result.scalars = MagicMock(return_value=alerts)
+        mock_result.all = MagicMock(return_value=rows)
         mock_db_session.execute = MagicMock(return_value=mock_result)
 
         stats = get_alert_statistics(
@@ -0,0 +1,198 @@
+"""
+SAHOOL Alert Service - Statistics Tests
+Hourly rollup vs. direct GROUP BY statistics on PostgreSQL
+Requires PostgreSQL: set TEST_DATABASE_URL=postgresql://...
+"""
+
+import os
+from datetime import UTC, datetime, timedelta
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import Float, create_engine, insert, literal, select
+from sqlalchemy.orm import sessionmaker
+
+from src.db_models import Alert, AlertStatsHourly, Base
+from src.repository import (
+    RESOLUTION_BUCKET_HOURS,
+    UNRESOLVED_BUCKET,
+    _histogram_percentile,
+    _resolution_bucket,
+    _resolution_bucket_sql,
+    create_alert,
+    delete_alert,
+    get_alert_statistics,
+    get_alert_statistics_direct,
+    rebuild_alert_rollups,
+    update_alert_status,
+)
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL", "")
+
+requires_postgres = pytest.mark.skipif(
+    not TEST_DATABASE_URL.startswith("postgresql"),
+    reason="alert statistics use PostgreSQL upserts and percentile_cont",
+)
+
+TENANT = uuid4()
+OTHER_TENANT = uuid4()
+
+
+@pytest.fixture
+def db():
+    """Session on a fresh schema"""
+    engine = create_engine(TEST_DATABASE_URL)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine, autoflush=False)()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(engine)
+        engine.dispose()
+
+
+def make_alert(tenant_id, created_at, field_id="field-1", alert_type="irrigation", severity="high"):
+    return Alert(
+        tenant_id=tenant_id,
+        field_id=field_id,
+        type=alert_type,
+        severity=severity,
+        status="active",
+        title="تنبيه",
+        message="رسالة",
+        created_at=created_at,
+    )
+
+
+def seed(db) -> list[Alert]:
+    """Alerts across 40 days, including the partial hour at the 30-day cutoff"""
+    now = datetime.now(UTC)
+    ages = [timedelta(days=30, minutes=-5), timedelta(days=30, minutes=5), timedelta(days=35)]
+    ages += [timedelta(hours=h) for h in range(0, 700, 9)]
+    alerts = []
+    for i, age in enumerate(ages):
+        alert = make_alert(
+            TENANT if i % 4 else OTHER_TENANT,
+            now - age,
+            field_id=f"field-{i % 3}",
+            alert_type=("irrigation", "pest", "weather")[i % 3],
+            severity=("critical", "high", "low")[i % 2],
+        )
+        alerts.append(create_alert(db, alert))
+    db.commit()
+    return alerts
+
+
+@requires_postgres
+class TestRollupStatistics:
+    """Rollup statistics match the alerts table"""
+
+    def test_writes_keep_rollup_exact(self, db):
+        """Create, acknowledge, resolve, dismiss, reopen and delete"""
+        alerts = seed(db)
+        for alert in alerts[0:40]:
+            update_alert_status(db, alert_id=alert.id, status="acknowledged", user_id="u1")
+        for alert in alerts[10:60]:
+            update_alert_status(db, alert_id=alert.id, status="resolved", note="done")
+        for alert in alerts[60:70]:
+            update_alert_status(db, alert_id=alert.id, status="dismissed")
+        for alert in alerts[10:15]:
+            update_alert_status(db, alert_id=alert.id, status="active")
+        for alert in alerts[70:75]:
+            delete_alert(db, alert.id)
+        db.commit()
+
+        for filters in ({}, {"tenant_id": TENANT}, {"field_id": "field-1"}):
+            for days in (1, 7, 30):
+                rolled_up = get_alert_statistics(db, days=days, **filters)
+                direct = get_alert_statistics_direct(db, days=days, **filters)
+                # Percentiles are interpolated from the histogram; checked separately
+                for key in ("median_resolution_hours", "p90_resolution_hours"):
+                    del rolled_up[key], direct[key]
+                assert rolled_up == direct
+
+        stats = get_alert_statistics(db, tenant_id=TENANT)
+        assert stats["by_status"]["resolved"] > 0
+        assert stats["average_resolution_hours"] is not None
+
+    def test_percentiles_within_bucket(self, db):
+        """Histogram percentiles fall in the bucket holding the exact value"""
+        now = datetime.now(UTC)
+        for minutes in (5, 20, 50, 90, 150, 200, 300, 600, 2000, 3000):
+            alert = create_alert(db, make_alert(TENANT, now - timedelta(minutes=minutes)))
+            update_alert_status(db, alert_id=alert.id, status="resolved")
+        db.commit()
+
+        rolled_up = get_alert_statistics(db, tenant_id=TENANT)
+        direct = get_alert_statistics_direct(db, tenant_id=TENANT)
+
+        for key in ("median_resolution_hours", "p90_resolution_hours"):
+            bucket = _resolution_bucket(direct[key] * 3600)
+            lower = RESOLUTION_BUCKET_HOURS[bucket - 1] if bucket else 0.0
+            assert lower <= rolled_up[key] <= RESOLUTION_BUCKET_HOURS[bucket]
+
+    def test_empty_rollup_uses_direct_query(self, db):
+        """Alerts written outside the repository are counted until rebuilt"""
+        now = datetime.now(UTC)
+        db.execute(
+            insert(Alert),
+            [
+                {
+                    "id": uuid4(),
+                    "tenant_id": TENANT,
+                    "field_id": "field-1",
+                    "type": "pest",
+                    "severity": "low",
+                    "status": "active",
+                    "title": "آفة",
+                    "message": "رسالة",
+                    "created_at": now - timedelta(hours=h),
+                }
+                for h in range(5)
+            ],
+        )
+        db.commit()
+
+        assert db.execute(select(AlertStatsHourly)).first() is None
+        assert get_alert_statistics(db, tenant_id=TENANT)["total_alerts"] == 5
+
+    def test_rebuild_repairs_drift(self, db):
+        """Rebuilding from the alerts table restores exact statistics"""
+        alerts = seed(db)
+        for alert in alerts[:20]:
+            update_alert_status(db, alert_id=alert.id, status="resolved")
+        db.commit()
+        db.query(AlertStatsHourly).update({"alert_count": 7})
+        db.commit()
+
+        rebuild_alert_rollups(db, tenant_id=TENANT)
+        db.commit()
+
+        direct = get_alert_statistics_direct(db, tenant_id=TENANT, days=90)
+        rolled_up = get_alert_statistics(db, tenant_id=TENANT, days=90)
+        assert rolled_up["by_status"] == direct["by_status"]
+        assert rolled_up["average_resolution_hours"] == direct["average_resolution_hours"]
+
+        rebuild_alert_rollups(db)
+        db.commit()
+
+        rolled_up = get_alert_statistics(db, days=90)
+        assert rolled_up["by_type"] == get_alert_statistics_direct(db, days=90)["by_type"]
+
+    def test_sql_bucket_matches_python(self, db):
+        """The SQL resolution bucket agrees with _resolution_bucket at the bounds"""
+        samples = [0.0, 60.0, 900.0, 901.0, 3599.0, 3600.0, 86400.0, 2592000.0, 9e6]
+        for seconds in samples:
+            bucket = db.execute(select(_resolution_bucket_sql(literal(seconds, Float)))).scalar()
+            assert bucket == _resolution_bucket(seconds)
+
+
+def test_histogram_percentile():
+    """Percentiles are interpolated within the bucket holding the rank"""
+    assert _histogram_percentile({}, 0.5) is None
+    assert _histogram_percentile({2: 4}, 0.5) == 0.75
+    assert _histogram_percentile({0: 1, 3: 1}, 0.9) == pytest.approx(1.8)
+    assert _histogram_percentile({len(RESOLUTION_BUCKET_HOURS): 3}, 0.5) == 720
+    assert _resolution_bucket(None) == UNRESOLVED_BUCKET
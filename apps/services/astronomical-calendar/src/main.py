@@ -14,13 +14,14 @@ Port: 8111
 Version: 15.5.0
 """
 
+import hashlib
 import math
 import os
 import sys
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 
 import httpx
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 
 # Shared middleware imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
@@ -3190,6 +3191,160 @@ def get_daily_astronomical_data(dt: datetime) -> DailyAstronomicalData:
     )
 
 
+# ═══════════════════════════════════════════════════════════════════════════════
+# الجدول الفلكي المحسوب مسبقاً
+# ═══════════════════════════════════════════════════════════════════════════════
+
+ASTRO_TABLE_YEARS_BEFORE = int(os.getenv("ASTRO_TABLE_YEARS_BEFORE", "1"))
+ASTRO_TABLE_YEARS_AFTER = int(os.getenv("ASTRO_TABLE_YEARS_AFTER", "4"))
+
+# الأنشطة التي تحتفظ بدرجاتها في مصفوفات مضغوطة للبحث السريع
+TABLE_ACTIVITIES = ("زراعة", "ري", "حصاد", "تقليم")
+
+
+class AstronomicalTable:
+    """
+    جدول يومي محسوب مسبقاً للبيانات الفلكية
+
+    كل البيانات الفلكية تعتمد على التاريخ فقط، لذلك تُحسب مرة واحدة عند
+    بدء الخدمة لعدة سنوات. البحث عن يوم يتم بفهرس مباشر O(1)، ودرجات
+    الأنشطة محفوظة في bytearray لكل نشاط لتصفية نطاقات الأيام دون بناء
+    الكائنات. التواريخ خارج النطاق تُحسب مباشرة.
+    """
+
+    def __init__(self, start: date, end: date):
+        self.start = start
+        self.end = end
+        self.days: list[DailyAstronomicalData] = []
+        self.overall = bytearray()
+        self.activity_scores = {activity: bytearray() for activity in TABLE_ACTIVITIES}
+
+        current = start
+        while current <= end:
+            data = get_daily_astronomical_data(datetime(current.year, current.month, current.day))
+            self.days.append(data)
+            self.overall.append(data.overall_farming_score)
+            for rec in data.recommendations:
+                if rec.activity in self.activity_scores:
+                    self.activity_scores[rec.activity].append(rec.suitability_score)
+            current += timedelta(days=1)
+
+        # بصمة المحتوى: تتغير فقط إذا تغيرت الجداول أو الخوارزميات
+        digest = hashlib.sha256()
+        digest.update(str(start).encode())
+        digest.update(bytes(self.overall))
+        for activity in TABLE_ACTIVITIES:
+            digest.update(bytes(self.activity_scores[activity]))
+        self.version = digest.hexdigest()[:16]
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def index(self, day: date) -> int | None:
+        """فهرس اليوم في الجدول أو None إذا كان خارج النطاق"""
+        offset = (day - self.start).days
+        return offset if 0 <= offset < len(self.days) else None
+
+    def get(self, day: date) -> DailyAstronomicalData:
+        """البيانات الفلكية ليوم واحد"""
+        offset = self.index(day)
+        if offset is None:
+            return get_daily_astronomical_data(datetime(day.year, day.month, day.day))
+        return self.days[offset]
+
+    def range(self, start: date, count: int) -> list[DailyAstronomicalData]:
+        """البيانات الفلكية لعدد من الأيام المتتالية"""
+        first = self.index(start)
+        last = self.index(start + timedelta(days=count - 1))
+        if first is not None and last is not None:
+            return self.days[first : last + 1]
+        return [self.get(start + timedelta(days=i)) for i in range(count)]
+
+    def best_days(
+        self, activity: str, start: date, count: int, min_score: int = 7
+    ) -> list[DailyAstronomicalData]:
+        """الأيام التي تتجاوز فيها درجة النشاط الحد الأدنى"""
+        scores = self.activity_scores.get(activity)
+        first = self.index(start)
+        last = self.index(start + timedelta(days=count - 1))
+        if scores is None or first is None or last is None:
+            return [
+                data
+                for data in self.range(start, count)
+                if any(
+                    r.activity == activity and r.suitability_score >= min_score
+                    for r in data.recommendations
+                )
+            ]
+        return [
+            self.days[first + i]
+            for i, score in enumerate(scores[first : last + 1])
+            if score >= min_score
+        ]
+
+
+_astronomical_table: AstronomicalTable | None = None
+
+
+def get_astronomical_table() -> AstronomicalTable:
+    """الجدول الفلكي المشترك (يُبنى عند أول استخدام أو عند بدء الخدمة)"""
+    global _astronomical_table
+    if _astronomical_table is None:
+        this_year = datetime.utcnow().year
+        _astronomical_table = AstronomicalTable(
+            date(this_year - ASTRO_TABLE_YEARS_BEFORE, 1, 1),
+            date(this_year + ASTRO_TABLE_YEARS_AFTER, 12, 31),
+        )
+    return _astronomical_table
+
+
+def get_day_data(dt: datetime) -> DailyAstronomicalData:
+    """البيانات الفلكية ليوم من الجدول المحسوب مسبقاً"""
+    return get_astronomical_table().get(dt.date())
+
+
+@app.on_event("startup")
+def build_astronomical_table():
+    """بناء الجدول الفلكي عند بدء الخدمة"""
+    get_astronomical_table()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# التخزين المؤقت عبر HTTP (ETag / Cache-Control)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+
+def seconds_until_utc_midnight() -> int:
+    """الثواني المتبقية حتى منتصف الليل (UTC)"""
+    now = datetime.utcnow()
+    midnight = datetime(now.year, now.month, now.day) + timedelta(days=1)
+    return max(1, int((midnight - now).total_seconds()))
+
+
+def conditional_response(
+    request: Request, response: Response, key: str, max_age: int
+) -> Response | None:
+    """
+    إضافة ETag قوي و Cache-Control للاستجابة
+
+    ETag مشتق من نسخة الجدول ومفتاح الطلب لأن الاستجابة دالة حتمية فيهما.
+    يرجع استجابة 304 إذا تطابق If-None-Match، وإلا None.
+    """
+    etag = '"{}"'.format(
+        hashlib.sha256(f"{get_astronomical_table().version}|{key}".encode()).hexdigest()[:32]
+    )
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={max_age}"}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (
+        if_none_match.strip() == "*" or etag in [t.strip() for t in if_none_match.split(",")]
+    ):
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return None
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # نقاط النهاية (API Endpoints)
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -3207,7 +3362,7 @@ def health_check():
 
 
 @app.get("/v1/today", response_model=DailyAstronomicalData, tags=["Calendar"])
-def get_today():
+def get_today(request: Request, response: Response):
     """
     الحصول على البيانات الفلكية لليوم الحالي
 
@@ -3219,11 +3374,17 @@ def get_today():
     - الموسم الزراعي
     - التوصيات الزراعية
     """
-    return get_daily_astronomical_data(datetime.utcnow())
+    today = datetime.utcnow()
+    not_modified = conditional_response(
+        request, response, f"today|{today:%Y-%m-%d}", seconds_until_utc_midnight()
+    )
+    if not_modified:
+        return not_modified
+    return get_day_data(today)
 
 
 @app.get("/v1/date/{date_str}", response_model=DailyAstronomicalData, tags=["Calendar"])
-def get_date(date_str: str):
+def get_date(date_str: str, request: Request, response: Response):
     """
     الحصول على البيانات الفلكية لتاريخ محدد
 
@@ -3232,13 +3393,20 @@ def get_date(date_str: str):
     """
     try:
         dt = datetime.strptime(date_str, "%Y-%m-%d")
-        return get_daily_astronomical_data(dt)
     except ValueError:
         raise HTTPException(status_code=400, detail="صيغة التاريخ غير صحيحة. استخدم YYYY-MM-DD")
 
+    # بيانات تاريخ محدد لا تتغير
+    not_modified = conditional_response(request, response, f"date|{dt:%Y-%m-%d}", 86400)
+    if not_modified:
+        return not_modified
+    return get_day_data(dt)
+
 
 @app.get("/v1/week", response_model=WeeklyForecast, tags=["Calendar"])
 def get_weekly_forecast(
+    request: Request,
+    response: Response,
     start_date: str | None = Query(None, description="تاريخ البداية (YYYY-MM-DD)"),
 ):
     """
@@ -3254,17 +3422,22 @@ def get_weekly_forecast(
     else:
         start = datetime.utcnow()
 
-    days = []
+    not_modified = conditional_response(
+        request,
+        response,
+        f"week|{start:%Y-%m-%d}",
+        86400 if start_date else seconds_until_utc_midnight(),
+    )
+    if not_modified:
+        return not_modified
+
+    days = get_astronomical_table().range(start.date(), 7)
     best_planting = []
     best_harvesting = []
     avoid_days = []
 
-    for i in range(7):
-        dt = start + timedelta(days=i)
-        data = get_daily_astronomical_data(dt)
-        days.append(data)
-
-        date_str = dt.strftime("%Y-%m-%d")
+    for data in days:
+        date_str = data.date_gregorian
 
         if data.overall_farming_score >= 7:
             best_planting.append(date_str)
@@ -3746,8 +3919,10 @@ def get_region_crops(region_id: str):
 
 @app.get("/v1/best-days", tags=["Calendar"])
 def get_best_farming_days(
+    request: Request,
+    response: Response,
     activity: str = Query("زراعة", description="النشاط: زراعة، حصاد، ري، تقليم"),
-    days: int = Query(30, ge=7, le=90, description="عدد الأيام للبحث"),
+    days: int = Query(30, ge=7, le=365, description="عدد الأيام للبحث"),
 ):
     """
     البحث عن أفضل الأيام لنشاط زراعي معين
@@ -3755,18 +3930,24 @@ def get_best_farming_days(
     الأنشطة المدعومة: زراعة، حصاد، ري، تقليم، غرس، تطعيم
     """
     start = datetime.utcnow()
-    best_days = []
+    not_modified = conditional_response(
+        request,
+        response,
+        f"best-days|{start:%Y-%m-%d}|{activity}|{days}",
+        seconds_until_utc_midnight(),
+    )
+    if not_modified:
+        return not_modified
 
-    for i in range(days):
-        dt = start + timedelta(days=i)
-        data = get_daily_astronomical_data(dt)
+    best_days = []
 
+    for data in get_astronomical_table().best_days(activity, start.date(), days):
         # البحث عن التوصية المطلوبة
         for rec in data.recommendations:
             if rec.activity == activity and rec.suitability_score >= 7:
                 best_days.append(
                     {
-                        "date": dt.strftime("%Y-%m-%d"),
+                        "date": data.date_gregorian,
                         "hijri_date": f"{data.date_hijri.day} {data.date_hijri.month_name}",
                         "moon_phase": data.moon_phase.name,
                         "lunar_mansion": data.lunar_mansion.name,
@@ -4026,6 +4207,8 @@ def get_planting_guide(crop_id: str):
 
 @app.get("/v1/what-to-plant", tags=["Crops"])
 def what_to_plant_now(
+    request: Request,
+    response: Response,
     region: str = Query(None, description="المنطقة (اختياري): حراز، صنعاء، تهامة، إلخ"),
     altitude_min: int = Query(None, description="الارتفاع الأدنى بالمتر"),
     altitude_max: int = Query(None, description="الارتفاع الأعلى بالمتر"),
@@ -4040,8 +4223,18 @@ def what_to_plant_now(
     - المنطقة (اختياري)
     - الارتفاع (اختياري)
     """
-    today = get_daily_astronomical_data(datetime.utcnow())
-    current_month = datetime.utcnow().month
+    now = datetime.utcnow()
+    not_modified = conditional_response(
+        request,
+        response,
+        f"what-to-plant|{now:%Y-%m-%d}|{region}|{altitude_min}|{altitude_max}",
+        seconds_until_utc_midnight(),
+    )
+    if not_modified:
+        return not_modified
+
+    today = get_day_data(now)
+    current_month = now.month
     current_hijri_month = today.date_hijri.month_name
 
     recommendations = []
@@ -4122,7 +4315,7 @@ def what_to_plant_now(
     recommendations.sort(key=lambda x: x["suitability_score"], reverse=True)
 
     return {
-        "query_date": datetime.utcnow().strftime("%Y-%m-%d"),
+        "query_date": now.strftime("%Y-%m-%d"),
         "hijri_date": f"{today.date_hijri.day} {current_hijri_month} {today.date_hijri.year}هـ",
         "lunar_mansion": today.lunar_mansion.name,
         "moon_phase": today.moon_phase.name,
@@ -0,0 +1,108 @@
+"""
+SAHOOL Astronomical Calendar - Precomputed Table Tests
+اختبارات الجدول الفلكي المحسوب مسبقاً والتخزين المؤقت عبر HTTP
+"""
+
+import os
+import sys
+from datetime import date, datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import main  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def table():
+    return main.AstronomicalTable(date(2025, 1, 1), date(2026, 12, 31))
+
+
+@pytest.fixture
+def client():
+    return TestClient(main.app)
+
+
+class TestAstronomicalTable:
+    """Test the precomputed per-day table"""
+
+    def test_lookup_matches_direct_computation(self, table):
+        day = date(2026, 3, 15)
+
+        assert table.get(day) == main.get_daily_astronomical_data(datetime(2026, 3, 15))
+
+    def test_out_of_range_falls_back_to_computation(self, table):
+        data = table.get(date(2030, 6, 1))
+
+        assert table.index(date(2030, 6, 1)) is None
+        assert data.date_gregorian == "2030-06-01"
+
+    def test_range_slice(self, table):
+        days = table.range(date(2025, 12, 29), 7)
+
+        assert [d.date_gregorian for d in days] == [
+            (date(2025, 12, 29) + timedelta(days=i)).isoformat() for i in range(7)
+        ]
+
+    def test_range_crossing_table_end(self, table):
+        days = table.range(date(2026, 12, 30), 4)
+
+        assert days[-1].date_gregorian == "2027-01-02"
+
+    @pytest.mark.parametrize("activity", ["زراعة", "حصاد", "ري", "تقليم"])
+    def test_best_days_matches_full_scan(self, table, activity):
+        start = date(2025, 2, 1)
+        expected = [
+            d.date_gregorian
+            for d in table.range(start, 365)
+            if any(r.activity == activity and r.suitability_score >= 7 for r in d.recommendations)
+        ]
+
+        found = [d.date_gregorian for d in table.best_days(activity, start, 365)]
+
+        assert found == expected
+
+    def test_unknown_activity_finds_nothing(self, table):
+        assert table.best_days("غرس", date(2025, 2, 1), 30) == []
+
+
+class TestHTTPCaching:
+    """Test ETag and Cache-Control headers"""
+
+    def test_date_endpoint_sets_cache_headers(self, client):
+        response = client.get("/v1/date/2026-03-15")
+
+        assert response.status_code == 200
+        assert response.headers["etag"].startswith('"')
+        assert response.headers["cache-control"] == "public, max-age=86400"
+
+    def test_if_none_match_returns_304(self, client):
+        etag = client.get("/v1/week", params={"start_date": "2026-03-15"}).headers["etag"]
+
+        response = client.get(
+            "/v1/week", params={"start_date": "2026-03-15"}, headers={"If-None-Match": etag}
+        )
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    def test_etag_depends_on_query(self, client):
+        first = client.get("/v1/best-days", params={"activity": "زراعة", "days": 30})
+        second = client.get("/v1/best-days", params={"activity": "حصاد", "days": 30})
+
+        assert first.headers["etag"] != second.headers["etag"]
+
+    def test_best_days_accepts_a_full_year(self, client):
+        response = client.get("/v1/best-days", params={"days": 365})
+
+        assert response.status_code == 200
+        assert response.json()["search_period_days"] == 365
+
+    def test_what_to_plant_is_cacheable(self, client):
+        response = client.get("/v1/what-to-plant", params={"region": "صنعاء"})
+
+        assert response.status_code == 200
+        assert 0 < int(response.headers["cache-control"].split("=")[1]) <= 86400
@@ -77,6 +77,7 @@ except ImportError:
 from services import (
     diagnosis_service,
     disease_service,
+    inference_server,
     prediction_service,
 )
 
@@ -138,6 +139,10 @@ async def startup_event():
     logger.warning("=" * 80)
     prediction_service.load_model()
 
+    # Dynamic batching inference + background persistence
+    await inference_server.start()
+    await diagnosis_service.start()
+
     # Initialize file validator
     if FILE_VALIDATION_AVAILABLE:
         virus_scanner_type = os.getenv("VIRUS_SCANNER", "noop")
@@ -165,6 +170,13 @@ async def startup_event():
         logger.warning("⚠️  File validation module not available, using basic validation")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Drain queued inference and pending writes"""
+    await inference_server.stop()
+    await diagnosis_service.stop()
+
+
 @app.middleware("http")
 async def add_deprecation_header(request: Request, call_next):
     """Add deprecation headers to all responses"""
@@ -245,8 +257,8 @@ async def diagnose_plant_disease(
                 status_code=400, detail="حجم الصورة كبير جداً (الحد الأقصى 10 ميجابايت)"
             )
 
-    # Delegate to service
-    return diagnosis_service.diagnose(
+    # Delegate to service (batched inference, persistence off the request path)
+    return await diagnosis_service.diagnose_async(
         image_bytes=image_bytes,
         filename=image.filename,
         field_id=field_id,
@@ -296,7 +308,16 @@ async def batch_diagnose(
             status_code=400, detail="لم يتم العثور على صور صالحة / No valid images found"
         )
 
-    return diagnosis_service.batch_diagnose(image_data, field_id)
+    return await diagnosis_service.batch_diagnose_async(image_data, field_id)
+
+
+@app.get("/v1/inference/metrics")
+async def get_inference_metrics():
+    """📊 مقاييس خادم الاستدلال - queue depth and batch sizes"""
+    return {
+        **inference_server.get_metrics(),
+        "pending_writes": diagnosis_service.pending_writes,
+    }
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
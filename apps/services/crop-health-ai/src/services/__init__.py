@@ -6,6 +6,7 @@ from .diagnosis_service import DiagnosisService, diagnosis_service
 from .disease_service import DiseaseService, disease_service
 from .evaluation_scorer import EvaluationScorer, evaluation_scorer
 from .field_memory import FieldMemory, field_memory
+from .inference_server import InferenceServer, inference_server
 from .prediction_service import PredictionService, prediction_service
 
 __all__ = [
@@ -16,6 +17,7 @@ __all__ = [
     "ContextCompressionService",
     "FieldMemory",
     "EvaluationScorer",
+    "InferenceServer",
     # Singleton instances
     "disease_service",
     "prediction_service",
@@ -23,4 +25,5 @@ __all__ = [
     "context_compression_service",
     "field_memory",
     "evaluation_scorer",
+    "inference_server",
 ]
@@ -6,8 +6,12 @@ Sahool Vision - Diagnosis Service
 - إدارة عملية التشخيص الكاملة
 - حفظ الصور
 - إدارة سجل التشخيصات
+
+المسار غير المتزامن (diagnose_async) يمرر الصورة لخادم الدفعات الديناميكية
+ويؤجل حفظ الصورة والسجلات إلى كاتب خلفي خارج مسار الطلب.
 """
 
+import asyncio
 import logging
 import os
 import uuid
@@ -23,7 +27,8 @@ from .context_compression import context_compression_service
 from .disease_service import disease_service
 from .evaluation_scorer import evaluation_scorer
 from .field_memory import field_memory
-from .prediction_service import prediction_service
+from .inference_server import InferenceServer, inference_server
+from .prediction_service import Prediction, prediction_service
 
 logger = logging.getLogger("sahool-vision")
 
@@ -34,6 +39,7 @@ BASE_URL = os.getenv("BASE_URL", "http://localhost:8095")
 CONFIDENCE_THRESHOLD = float(os.getenv("CONFIDENCE_THRESHOLD", "0.7"))
 EXPERT_REVIEW_THRESHOLD = float(os.getenv("EXPERT_REVIEW_THRESHOLD", "0.5"))
 MAX_HISTORY_SIZE = 1000
+MAX_PENDING_WRITES = int(os.getenv("MAX_PENDING_WRITES", "1000"))
 
 
 class DiagnosisService:
@@ -42,7 +48,14 @@ class DiagnosisService:
     Diagnosis Management Service
     """
 
-    def __init__(self):
+    def __init__(self, inference: InferenceServer | None = None):
+        self.inference = inference or inference_server
+
+        # Background persistence for diagnose_async
+        self._writes: asyncio.Queue | None = None
+        self._writer: asyncio.Task | None = None
+        self._write_errors = 0
+
         # TODO: MIGRATE TO POSTGRESQL
         # Current: self._history stored in-memory (lost on restart, limited to MAX_HISTORY_SIZE=1000)
         # Issues:
@@ -94,6 +107,33 @@ class DiagnosisService:
         # In-memory diagnosis history (PostgreSQL in production)
         self._history: list[dict[str, Any]] = []
 
+    async def start(self) -> None:
+        """تشغيل الكاتب الخلفي"""
+        if self._writer is None or self._writer.done():
+            self._writes = asyncio.Queue(maxsize=MAX_PENDING_WRITES)
+            self._writer = asyncio.create_task(self._drain_writes())
+
+    async def stop(self) -> None:
+        """إنهاء الكتابات المعلقة وإيقاف الكاتب الخلفي"""
+        if self._writer is None:
+            return
+        await self.flush()
+        self._writer.cancel()
+        try:
+            await self._writer
+        except asyncio.CancelledError:
+            pass
+        self._writer = None
+
+    async def flush(self) -> None:
+        """انتظار إنهاء كل الكتابات المعلقة"""
+        if self._writes is not None:
+            await self._writes.join()
+
+    @property
+    def pending_writes(self) -> int:
+        return self._writes.qsize() if self._writes else 0
+
     def diagnose(
         self,
         image_bytes: bytes,
@@ -118,7 +158,81 @@ class DiagnosisService:
         image_url = self._save_image(image_bytes, filename, diagnosis_id)
 
         # Run prediction
-        disease_key, confidence, all_predictions = prediction_service.predict(image_bytes)
+        prediction = prediction_service.predict(image_bytes)
+
+        diagnosis, record = self._build_diagnosis(
+            diagnosis_id, timestamp, prediction, image_url, field_id
+        )
+        self._record(
+            record,
+            field_id=field_id,
+            governorate=governorate,
+            lat=lat,
+            lng=lng,
+            farmer_id=farmer_id,
+        )
+        return diagnosis
+
+    async def diagnose_async(
+        self,
+        image_bytes: bytes,
+        filename: str,
+        field_id: str | None = None,
+        crop_type: CropType | None = None,
+        symptoms: str | None = None,
+        governorate: str | None = None,
+        lat: float | None = None,
+        lng: float | None = None,
+        farmer_id: str | None = None,
+    ) -> DiagnosisResult:
+        """
+        تشخيص عبر خادم الدفعات مع حفظ مؤجل
+        Diagnose through the batching inference server
+
+        The result is returned as soon as the model has run; the image, the
+        history record, field memory and evaluation scoring are written by
+        the background writer. ``image_url`` points at where the image will
+        be saved.
+        """
+        diagnosis_id = str(uuid.uuid4())
+        timestamp = datetime.utcnow()
+
+        prediction = await self.inference.predict(image_bytes)
+
+        target = self._image_target(filename, diagnosis_id)
+        image_url = target[1] if target else None
+        diagnosis, record = self._build_diagnosis(
+            diagnosis_id, timestamp, prediction, image_url, field_id
+        )
+
+        if self._writer is None or self._writer.done():
+            await self.start()
+        await self._writes.put(
+            (
+                image_bytes if target else None,
+                target[0] if target else None,
+                record,
+                {
+                    "field_id": field_id,
+                    "governorate": governorate,
+                    "lat": lat,
+                    "lng": lng,
+                    "farmer_id": farmer_id,
+                },
+            )
+        )
+        return diagnosis
+
+    def _build_diagnosis(
+        self,
+        diagnosis_id: str,
+        timestamp: datetime,
+        prediction: Prediction,
+        image_url: str | None,
+        field_id: str | None,
+    ) -> tuple[DiagnosisResult, dict[str, Any]]:
+        """بناء نتيجة التشخيص وبيانات السجل من نتيجة النموذج"""
+        disease_key, confidence, _ = prediction
 
         # Get disease info
         disease_info = disease_service.get_disease(disease_key)
@@ -142,43 +256,6 @@ class DiagnosisService:
         # Get detected crop
         detected_crop = disease_info.get("crop", CropType.UNKNOWN)
 
-        # Save to history
-        self._save_to_history(
-            diagnosis_id=diagnosis_id,
-            image_url=image_url,
-            disease_key=disease_key,
-            disease_info=disease_info,
-            confidence=confidence,
-            severity=severity,
-            detected_crop=detected_crop,
-            field_id=field_id,
-            governorate=governorate,
-            lat=lat,
-            lng=lng,
-            farmer_id=farmer_id,
-            timestamp=timestamp,
-        )
-
-        # Record in field memory for pattern analysis
-        if field_id:
-            field_memory.record_diagnosis(
-                field_id=field_id,
-                diagnosis_id=diagnosis_id,
-                disease_id=disease_key,
-                disease_name_ar=disease_info["name_ar"],
-                confidence=confidence,
-                severity=severity.value,
-                affected_area_percent=min(confidence * 100, 100),
-            )
-
-        # Score prediction for evaluation
-        evaluation_scorer.score_prediction(
-            diagnosis_id=diagnosis_id,
-            predicted_disease=disease_key,
-            predicted_confidence=confidence,
-            field_id=field_id,
-        )
-
         # Build result
         diagnosis = DiagnosisResult(
             diagnosis_id=diagnosis_id,
@@ -208,7 +285,61 @@ class DiagnosisService:
             f"✅ Diagnosis completed: {disease_key} ({confidence:.2%}) for field {field_id}"
         )
 
-        return diagnosis
+        record = {
+            "diagnosis_id": diagnosis_id,
+            "image_url": image_url,
+            "disease_key": disease_key,
+            "disease_info": disease_info,
+            "confidence": confidence,
+            "severity": severity,
+            "detected_crop": detected_crop,
+            "timestamp": timestamp,
+        }
+        return diagnosis, record
+
+    def _record(self, record: dict[str, Any], **context: Any) -> None:
+        """حفظ التشخيص في السجل وذاكرة الحقل والتقييم"""
+        field_id = context["field_id"]
+
+        # Save to history
+        self._save_to_history(**record, **context)
+
+        # Record in field memory for pattern analysis
+        if field_id:
+            field_memory.record_diagnosis(
+                field_id=field_id,
+                diagnosis_id=record["diagnosis_id"],
+                disease_id=record["disease_key"],
+                disease_name_ar=record["disease_info"]["name_ar"],
+                confidence=record["confidence"],
+                severity=record["severity"].value,
+                affected_area_percent=min(record["confidence"] * 100, 100),
+            )
+
+        # Score prediction for evaluation
+        evaluation_scorer.score_prediction(
+            diagnosis_id=record["diagnosis_id"],
+            predicted_disease=record["disease_key"],
+            predicted_confidence=record["confidence"],
+            field_id=field_id,
+        )
+
+    async def _drain_writes(self) -> None:
+        """الكاتب الخلفي - Background writer for diagnose_async"""
+        while True:
+            image_bytes, image_path, record, context = await self._writes.get()
+            try:
+                if image_path is not None:
+                    # Disk I/O off the event loop; in-memory records stay on it
+                    saved = await asyncio.to_thread(self._write_image, image_path, image_bytes)
+                    if not saved:
+                        record["image_url"] = None
+                self._record(record, **context)
+            except Exception as e:
+                self._write_errors += 1
+                logger.error(f"Failed to persist diagnosis {record['diagnosis_id']}: {e}")
+            finally:
+                self._writes.task_done()
 
     def batch_diagnose(
         self,
@@ -216,11 +347,30 @@ class DiagnosisService:
         field_id: str | None = None,
     ) -> dict[str, Any]:
         """تشخيص دفعة من الصور"""
+        predictions = [prediction_service.predict(image_bytes) for image_bytes, _ in images]
+        return self._batch_summary(images, predictions, field_id)
+
+    async def batch_diagnose_async(
+        self,
+        images: list[tuple],  # List of (bytes, filename)
+        field_id: str | None = None,
+    ) -> dict[str, Any]:
+        """تشخيص دفعة من الصور عبر خادم الدفعات"""
+        predictions = await asyncio.gather(
+            *(self.inference.predict(image_bytes) for image_bytes, _ in images)
+        )
+        return self._batch_summary(images, predictions, field_id)
+
+    def _batch_summary(
+        self,
+        images: list[tuple],
+        predictions: list[Prediction],
+        field_id: str | None,
+    ) -> dict[str, Any]:
         batch_id = str(uuid.uuid4())
         results = []
 
-        for image_bytes, filename in images:
-            disease_key, confidence, _ = prediction_service.predict(image_bytes)
+        for (_, filename), (disease_key, confidence, _) in zip(images, predictions, strict=True):
             disease_info = disease_service.get_disease(disease_key)
 
             results.append(
@@ -356,6 +506,14 @@ class DiagnosisService:
         diagnosis_id: str,
     ) -> str | None:
         """حفظ الصورة على القرص مع التحقق من الأمان"""
+        target = self._image_target(filename, diagnosis_id)
+        if target is None:
+            return None
+        file_path, image_url = target
+        return image_url if self._write_image(file_path, image_bytes) else None
+
+    def _image_target(self, filename: str, diagnosis_id: str) -> tuple[Path, str] | None:
+        """مسار ورابط الصورة بعد التحقق من الأمان"""
         try:
             # Security: Validate and sanitize filename
             if not filename or len(filename) > self.MAX_FILENAME_LENGTH:
@@ -381,16 +539,22 @@ class DiagnosisService:
                 logger.error(f"Path traversal attempt detected: {filename}")
                 return None
 
+            return file_path, f"{BASE_URL}/static/uploads/{new_filename}"
+
+        except Exception as e:
+            logger.error(f"Failed to save image: {e}")
+            return None
+
+    def _write_image(self, file_path: Path, image_bytes: bytes) -> bool:
+        """كتابة الصورة على القرص"""
+        try:
             with open(file_path, "wb") as f:
                 f.write(image_bytes)
-
-            image_url = f"{BASE_URL}/static/uploads/{new_filename}"
             logger.info(f"📷 Image saved: {file_path}")
-            return image_url
-
+            return True
         except Exception as e:
             logger.error(f"Failed to save image: {e}")
-            return None
+            return False
 
     def _save_to_history(
         self,
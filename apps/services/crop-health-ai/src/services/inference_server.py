@@ -0,0 +1,220 @@
+"""
+Sahool Vision - Dynamic Batching Inference Server
+خادم الاستدلال بالدفعات الديناميكية
+
+هذه الخدمة مسؤولة عن:
+- تجميع طلبات التشخيص المتزامنة في دفعات (حد أقصى للحجم ولزمن الانتظار)
+- تشغيل النموذج على مجموعة عمال مخصصة للمعالج (خيوط أو عمليات)
+- قياس عمق الطابور وأحجام الدفعات
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import Counter
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any
+
+from .prediction_service import Prediction, PredictionService, prediction_service
+
+logger = logging.getLogger("sahool-vision")
+
+# Configuration
+MAX_BATCH_SIZE = int(os.getenv("INFERENCE_MAX_BATCH_SIZE", "16"))
+MAX_WAIT_MS = float(os.getenv("INFERENCE_MAX_WAIT_MS", "10"))
+WORKERS = int(os.getenv("INFERENCE_WORKERS", "2"))
+# thread: one shared model (TF / ONNX Runtime / TorchScript release the GIL)
+# process: one model per worker process (isolates GIL-bound preprocessing)
+WORKER_MODE = os.getenv("INFERENCE_WORKER_MODE", "thread")
+MAX_QUEUE_SIZE = int(os.getenv("INFERENCE_MAX_QUEUE_SIZE", "1000"))
+
+
+# Per-process model for WORKER_MODE=process
+_worker_service: PredictionService | None = None
+
+
+def _init_worker(model_path: str | None) -> None:
+    global _worker_service
+    _worker_service = PredictionService(model_path)
+    _worker_service.load_model()
+
+
+def _predict_in_worker(images: list[bytes]) -> list[Prediction | Exception]:
+    return _worker_service.predict_batch(images)
+
+
+class InferenceServer:
+    """
+    خادم الاستدلال بالدفعات الديناميكية
+    Dynamic Batching Inference Server
+
+    Requests wait in a queue; a collector takes the first one, then keeps
+    adding requests until the batch holds ``max_batch_size`` images or
+    ``max_wait_ms`` has passed, and hands the batch to a worker. Up to
+    ``workers`` batches run at once, so the next batch is collected while
+    the previous one is on the model.
+    """
+
+    def __init__(
+        self,
+        service: PredictionService = prediction_service,
+        max_batch_size: int = MAX_BATCH_SIZE,
+        max_wait_ms: float = MAX_WAIT_MS,
+        workers: int = WORKERS,
+        worker_mode: str = WORKER_MODE,
+        max_queue_size: int = MAX_QUEUE_SIZE,
+    ):
+        if worker_mode not in ("thread", "process"):
+            raise ValueError(f"Unknown worker mode: {worker_mode}")
+        self.service = service
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self.workers = max(1, workers)
+        self.worker_mode = worker_mode
+        self.max_queue_size = max_queue_size
+
+        self._queue: asyncio.Queue | None = None
+        self._collector: asyncio.Task | None = None
+        self._executor: Executor | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._running: set[asyncio.Task] = set()
+
+        # Metrics
+        self._batch_sizes: Counter[int] = Counter()
+        self._requests = 0
+        self._errors = 0
+        self._wait_seconds = 0.0
+        self._inference_seconds = 0.0
+
+    @property
+    def is_running(self) -> bool:
+        return self._collector is not None and not self._collector.done()
+
+    async def start(self) -> None:
+        """تشغيل مجمّع الدفعات ومجموعة العمال"""
+        if self.is_running:
+            return
+        if self.worker_mode == "process":
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.service.model_path,),
+            )
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="inference"
+            )
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._slots = asyncio.Semaphore(self.workers)
+        self._collector = asyncio.create_task(self._collect())
+        logger.info(
+            f"🚀 Inference server started: batch≤{self.max_batch_size}, "
+            f"wait≤{self.max_wait * 1000:.0f}ms, {self.workers} {self.worker_mode} workers"
+        )
+
+    async def stop(self) -> None:
+        """إيقاف الخادم بعد إنهاء الطلبات المنتظرة"""
+        if not self.is_running:
+            return
+        await self._queue.join()
+        self._collector.cancel()
+        try:
+            await self._collector
+        except asyncio.CancelledError:
+            pass
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+        self._executor.shutdown(wait=True)
+        self._collector = None
+        logger.info("🛑 Inference server stopped")
+
+    async def predict(self, image_bytes: bytes) -> Prediction:
+        """
+        تشخيص صورة واحدة عبر الدفعات الديناميكية
+        Predict one image; batched with concurrent requests
+
+        Returns:
+            tuple: (disease_key, confidence, all_predictions)
+        """
+        if not self.is_running:
+            await self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((image_bytes, future, time.perf_counter()))
+        return await future
+
+    async def _collect(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except TimeoutError:
+                    break
+
+            await self._slots.acquire()
+            task = asyncio.create_task(self._run_batch(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run_batch(self, batch: list[tuple[bytes, asyncio.Future, float]]) -> None:
+        started = time.perf_counter()
+        images = [image for image, _, _ in batch]
+        try:
+            if self.worker_mode == "process":
+                call = (_predict_in_worker, images)
+            else:
+                call = (self.service.predict_batch, images)
+            results = await asyncio.get_running_loop().run_in_executor(self._executor, *call)
+        except Exception as e:
+            logger.error(f"❌ Batch inference failed: {e}")
+            results = [e] * len(batch)
+        finally:
+            self._slots.release()
+
+        finished = time.perf_counter()
+        self._batch_sizes[len(batch)] += 1
+        self._requests += len(batch)
+        self._inference_seconds += finished - started
+        for (_, future, enqueued), result in zip(batch, results, strict=True):
+            self._wait_seconds += started - enqueued
+            if isinstance(result, Exception):
+                self._errors += 1
+                if not future.done():
+                    future.set_exception(result)
+            elif not future.done():
+                future.set_result(result)
+            self._queue.task_done()
+
+    def get_metrics(self) -> dict[str, Any]:
+        """مقاييس الطابور والدفعات"""
+        batches = sum(self._batch_sizes.values())
+        return {
+            "running": self.is_running,
+            "worker_mode": self.worker_mode,
+            "workers": self.workers,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "batches_in_flight": len(self._running),
+            "requests": self._requests,
+            "errors": self._errors,
+            "batches": batches,
+            "avg_batch_size": round(self._requests / batches, 2) if batches else 0,
+            "batch_size_histogram": dict(sorted(self._batch_sizes.items())),
+            "avg_queue_wait_ms": (
+                round(self._wait_seconds / self._requests * 1000, 2) if self._requests else 0
+            ),
+            "avg_batch_inference_ms": (
+                round(self._inference_seconds / batches * 1000, 2) if batches else 0
+            ),
+        }
+
+
+# Singleton instance
+inference_server = InferenceServer()
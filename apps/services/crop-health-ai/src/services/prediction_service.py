@@ -3,14 +3,15 @@ Sahool Vision - AI Prediction Service
 خدمة التنبؤ بالذكاء الاصطناعي
 
 هذه الخدمة مسؤولة عن:
-- تحميل نموذج TensorFlow
+- تحميل نموذج TensorFlow / ONNX Runtime / TorchScript
 - معالجة الصور
-- تشغيل الاستدلال
+- تشغيل الاستدلال (صورة واحدة أو دفعة)
 """
 
 import io
 import logging
 import os
+import threading
 from typing import Any
 
 import numpy as np
@@ -20,6 +21,11 @@ from .disease_service import disease_service
 
 logger = logging.getLogger("sahool-vision")
 
+# Threads per inference call for ONNX Runtime / TorchScript (0 = library default)
+INTRA_OP_THREADS = int(os.getenv("INFERENCE_INTRA_OP_THREADS", "0"))
+
+Prediction = tuple[str, float, list[dict[str, Any]]]
+
 
 class PredictionService:
     """
@@ -99,6 +105,9 @@ class PredictionService:
         self.model_type: str | None = None
         self.class_names = disease_service.get_disease_names()
         self.input_shape = (224, 224)
+        # TFLite interpreters are not thread-safe - one invoke at a time
+        self._tflite_lock = threading.Lock()
+        self._tflite_batch_size = 1
 
     def load_model(self) -> bool:
         """
@@ -126,6 +135,29 @@ class PredictionService:
                     self.is_real_model = True
                     logger.info("✅ Keras model loaded successfully!")
 
+                elif self.model_path.endswith(".onnx"):
+                    import onnxruntime as ort
+
+                    options = ort.SessionOptions()
+                    if INTRA_OP_THREADS:
+                        options.intra_op_num_threads = INTRA_OP_THREADS
+                    self.model = ort.InferenceSession(
+                        self.model_path, options, providers=["CPUExecutionProvider"]
+                    )
+                    self.model_type = "onnx"
+                    self.is_real_model = True
+                    logger.info("✅ ONNX Runtime model loaded successfully!")
+
+                elif self.model_path.endswith((".pt", ".torchscript")):
+                    import torch
+
+                    if INTRA_OP_THREADS:
+                        torch.set_num_threads(INTRA_OP_THREADS)
+                    self.model = torch.jit.load(self.model_path, map_location="cpu").eval()
+                    self.model_type = "torchscript"
+                    self.is_real_model = True
+                    logger.info("✅ TorchScript model loaded successfully!")
+
                 elif os.path.isdir(self.model_path):
                     import tensorflow as tf
 
@@ -138,8 +170,8 @@ class PredictionService:
                 return True
 
             except ImportError as e:
-                logger.warning(f"⚠️ TensorFlow not available: {e}")
-                logger.info("📦 Install with: pip install tensorflow-cpu")
+                logger.warning(f"⚠️ Inference runtime not available: {e}")
+                logger.info("📦 Install tensorflow-cpu, onnxruntime or torch for this model")
             except Exception as e:
                 logger.error(f"❌ Failed to load model: {e}")
         else:
@@ -160,6 +192,9 @@ class PredictionService:
             from PIL import Image
 
             image = Image.open(io.BytesIO(image_bytes))
+            # JPEG: let the decoder downscale (DCT) to >= 2x the input size
+            # before LANCZOS - most of the cost for full-size phone photos
+            image.draft("RGB", (self.input_shape[0] * 2, self.input_shape[1] * 2))
             image = image.resize(self.input_shape, Image.Resampling.LANCZOS)
 
             if image.mode != "RGB":
@@ -178,35 +213,50 @@ class PredictionService:
             raise ValueError(f"صورة غير صالحة: {str(e)}")
 
     def _run_real_inference(self, img_array: np.ndarray) -> np.ndarray:
-        """تشغيل استدلال حقيقي باستخدام TensorFlow"""
-        try:
-            import tensorflow as tf
-
-            if self.model_type == "tflite":
+        """
+        تشغيل استدلال حقيقي على دفعة صور
+        Run real inference on a (N, 224, 224, 3) batch; returns (N, classes)
+        """
+        if self.model_type == "tflite":
+            with self._tflite_lock:
                 input_details = self.model.get_input_details()
                 output_details = self.model.get_output_details()
+                if len(img_array) != self._tflite_batch_size:
+                    self.model.resize_tensor_input(input_details[0]["index"], img_array.shape)
+                    self.model.allocate_tensors()
+                    self._tflite_batch_size = len(img_array)
                 self.model.set_tensor(input_details[0]["index"], img_array)
                 self.model.invoke()
-                predictions = self.model.get_tensor(output_details[0]["index"])[0]
-            else:
-                predictions = self.model.predict(img_array, verbose=0)[0]
-
-            if np.max(predictions) > 1.0 or np.min(predictions) < 0.0:
-                predictions = tf.nn.softmax(predictions).numpy()
+                predictions = self.model.get_tensor(output_details[0]["index"])
+        elif self.model_type == "onnx":
+            input_name = self.model.get_inputs()[0].name
+            predictions = self.model.run(None, {input_name: img_array})[0]
+        elif self.model_type == "torchscript":
+            import torch
+
+            # TorchScript vision models take NCHW
+            with torch.inference_mode():
+                batch = torch.from_numpy(np.ascontiguousarray(img_array.transpose(0, 3, 1, 2)))
+                predictions = self.model(batch).numpy()
+        else:
+            predictions = self.model.predict(img_array, verbose=0)
 
-            return predictions
+        predictions = np.asarray(predictions, dtype=np.float64)
+        if np.max(predictions) > 1.0 or np.min(predictions) < 0.0:
+            # Logits - softmax per row
+            exp = np.exp(predictions - predictions.max(axis=1, keepdims=True))
+            predictions = exp / exp.sum(axis=1, keepdims=True)
 
-        except Exception as e:
-            logger.error(f"Real inference failed: {e}, falling back to mock")
-            return self._run_mock_inference(None)
+        return predictions
 
     def _run_mock_inference(self, image_bytes: bytes | None) -> np.ndarray:
         """
         تشغيل استدلال محاكاة للتطوير
         Run simulated inference for development
         """
-        seed = hash(image_bytes[:100]) % 2**32 if image_bytes else np.random.randint(0, 2**32)
-        np.random.seed(seed)
+        seed = hash(image_bytes[:100]) % 2**32 if image_bytes else None
+        # Local generator - safe to call from several worker threads
+        rng = np.random.default_rng(seed)
 
         weights = np.ones(len(self.class_names))
         if "healthy" in self.class_names:
@@ -218,7 +268,7 @@ class PredictionService:
         if "mango_anthracnose" in self.class_names:
             weights[self.class_names.index("mango_anthracnose")] = 1.5
 
-        predictions = np.random.dirichlet(weights)
+        predictions = rng.dirichlet(weights)
         return predictions
 
     def _map_plantvillage_to_disease(self, pv_class: str) -> str:
@@ -229,57 +279,97 @@ class PredictionService:
             return "healthy"
         return "healthy"
 
-    def predict(self, image_bytes: bytes) -> tuple[str, float, list[dict[str, Any]]]:
+    def _decode_real(self, predictions: np.ndarray) -> Prediction:
+        """تحويل مخرجات النموذج الحقيقي لنتيجة"""
+        top_idx = int(np.argmax(predictions))
+        confidence = float(predictions[top_idx])
+
+        if top_idx < len(self.PLANTVILLAGE_CLASSES):
+            pv_class = self.PLANTVILLAGE_CLASSES[top_idx]
+            disease_key = self._map_plantvillage_to_disease(pv_class)
+
+            sorted_indices = np.argsort(predictions)[::-1][:5]
+            all_predictions = []
+            for idx in sorted_indices:
+                if idx < len(self.PLANTVILLAGE_CLASSES):
+                    pv = self.PLANTVILLAGE_CLASSES[idx]
+                    all_predictions.append(
+                        {
+                            "disease": pv,
+                            "mapped_to": self._map_plantvillage_to_disease(pv),
+                            "confidence": float(predictions[idx]),
+                        }
+                    )
+        else:
+            pv_class = "unknown"
+            disease_key = "healthy"
+            all_predictions = [{"disease": "unknown", "confidence": confidence}]
+
+        logger.info(f"🤖 Real AI: {pv_class} -> {disease_key} ({confidence:.1%})")
+        return disease_key, confidence, all_predictions
+
+    def _decode_mock(self, predictions: np.ndarray) -> Prediction:
+        """تحويل مخرجات المحاكاة لنتيجة"""
+        top_idx = int(np.argmax(predictions))
+        confidence = float(predictions[top_idx])
+        disease_key = self.class_names[top_idx]
+
+        all_predictions = [
+            {"disease": self.class_names[i], "confidence": float(predictions[i])}
+            for i in np.argsort(predictions)[::-1][:5]
+        ]
+
+        logger.info(f"🧪 Mock AI: {disease_key} ({confidence:.1%})")
+        return disease_key, confidence, all_predictions
+
+    def predict_batch(self, images: list[bytes]) -> list[Prediction | Exception]:
         """
-        تشغيل استدلال الذكاء الاصطناعي على صورة النبات
-        Run AI inference on plant image
+        تشغيل الاستدلال على دفعة صور بتمريرة واحدة للنموذج
+        Run inference on a batch of images in a single model call
+
+        Images that fail preprocessing get their ValueError in place of a
+        result; the rest of the batch is unaffected.
 
         Returns:
-            tuple: (disease_key, confidence, all_predictions)
+            list: (disease_key, confidence, all_predictions) or the error, per image
         """
-        img_array = self.preprocess_image(image_bytes)
+        results: list[Prediction | Exception | None] = [None] * len(images)
+        arrays, positions = [], []
+        for i, image_bytes in enumerate(images):
+            try:
+                arrays.append(self.preprocess_image(image_bytes))
+                positions.append(i)
+            except ValueError as e:
+                results[i] = e
 
-        if self.is_real_model and self.model is not None:
-            predictions = self._run_real_inference(img_array)
-            top_idx = np.argmax(predictions)
-            confidence = float(predictions[top_idx])
-
-            if top_idx < len(self.PLANTVILLAGE_CLASSES):
-                pv_class = self.PLANTVILLAGE_CLASSES[top_idx]
-                disease_key = self._map_plantvillage_to_disease(pv_class)
-
-                sorted_indices = np.argsort(predictions)[::-1][:5]
-                all_predictions = []
-                for idx in sorted_indices:
-                    if idx < len(self.PLANTVILLAGE_CLASSES):
-                        pv = self.PLANTVILLAGE_CLASSES[idx]
-                        all_predictions.append(
-                            {
-                                "disease": pv,
-                                "mapped_to": self._map_plantvillage_to_disease(pv),
-                                "confidence": float(predictions[idx]),
-                            }
-                        )
-            else:
-                disease_key = "healthy"
-                all_predictions = [{"disease": "unknown", "confidence": confidence}]
-
-            logger.info(f"🤖 Real AI: {pv_class} -> {disease_key} ({confidence:.1%})")
+        if not positions:
+            return results
 
-        else:
-            predictions = self._run_mock_inference(image_bytes)
-            top_idx = np.argmax(predictions)
-            confidence = float(predictions[top_idx])
-            disease_key = self.class_names[top_idx]
+        if self.is_real_model and self.model is not None:
+            try:
+                predictions = self._run_real_inference(np.concatenate(arrays))
+                for i, row in zip(positions, predictions, strict=True):
+                    results[i] = self._decode_real(row)
+                return results
+            except Exception as e:
+                logger.error(f"Real inference failed: {e}, falling back to mock")
 
-            all_predictions = [
-                {"disease": self.class_names[i], "confidence": float(predictions[i])}
-                for i in np.argsort(predictions)[::-1][:5]
-            ]
+        for i in positions:
+            results[i] = self._decode_mock(self._run_mock_inference(images[i]))
+        return results
 
-            logger.info(f"🧪 Mock AI: {disease_key} ({confidence:.1%})")
+    def predict(self, image_bytes: bytes) -> Prediction:
+        """
+        تشغيل استدلال الذكاء الاصطناعي على صورة النبات
+        Run AI inference on plant image
 
-        return disease_key, confidence, all_predictions
+        Returns:
+            tuple: (disease_key, confidence, all_predictions)
+        """
+        (result,) = self.predict_batch([image_bytes])
+        if isinstance(result, Exception):
+            raise result
+        return result
 
 
 # Singleton instance
@@ -0,0 +1,82 @@
+"""
+SAHOOL Crop Health AI - Dynamic Batching Tests
+اختبارات خادم الاستدلال بالدفعات الديناميكية
+"""
+
+import asyncio
+import os
+import tempfile
+
+os.environ.setdefault("UPLOAD_DIR", tempfile.mkdtemp())
+
+import pytest  # noqa: E402
+
+from src.services.diagnosis_service import UPLOAD_DIR, DiagnosisService  # noqa: E402
+from src.services.inference_server import InferenceServer  # noqa: E402
+
+
+class FakePredictionService:
+    """Records batch sizes; image bytes b"bad" fail preprocessing"""
+
+    model_path = None
+
+    def __init__(self):
+        self.batches: list[int] = []
+
+    def predict_batch(self, images):
+        self.batches.append(len(images))
+        return [
+            ValueError("صورة غير صالحة")
+            if image == b"bad"
+            else ("healthy", 0.9, [{"disease": image.decode(), "confidence": 0.9}])
+            for image in images
+        ]
+
+
+@pytest.fixture
+async def server():
+    fake = FakePredictionService()
+    server = InferenceServer(fake, max_batch_size=8, max_wait_ms=20, workers=2)
+    await server.start()
+    yield server
+    await server.stop()
+
+
+class TestInferenceServer:
+    async def test_concurrent_requests_are_batched(self, server):
+        images = [f"img-{i}".encode() for i in range(20)]
+
+        results = await asyncio.gather(*(server.predict(image) for image in images))
+
+        assert [r[2][0]["disease"] for r in results] == [i.decode() for i in images]
+        assert sum(server.service.batches) == 20
+        assert max(server.service.batches) <= 8
+        assert len(server.service.batches) < 20
+
+        metrics = server.get_metrics()
+        assert metrics["requests"] == 20
+        assert metrics["queue_depth"] == 0
+        assert metrics["avg_batch_size"] > 1
+
+    async def test_bad_image_fails_only_its_request(self, server):
+        results = await asyncio.gather(
+            server.predict(b"good"), server.predict(b"bad"), return_exceptions=True
+        )
+
+        assert results[0][0] == "healthy"
+        assert isinstance(results[1], ValueError)
+        assert server.get_metrics()["errors"] == 1
+
+
+class TestDiagnoseAsync:
+    async def test_persistence_happens_in_background(self, server):
+        service = DiagnosisService(inference=server)
+        await service.start()
+
+        result = await service.diagnose_async(b"leaf", "leaf.png", governorate="Sana'a")
+        await service.flush()
+
+        assert result.image_url.endswith(f"{result.diagnosis_id}.png")
+        assert (UPLOAD_DIR / f"{result.diagnosis_id}.png").read_bytes() == b"leaf"
+        assert service.get_diagnosis_by_id(result.diagnosis_id)["governorate"] == "Sana'a"
+        await service.stop()
@@ -55,6 +55,16 @@ class ThreadResponse(BaseModel):
     created_at: str
 
 
+class InboxEntryResponse(ThreadResponse):
+    """Thread in a user's inbox with its latest message and unread count"""
+
+    unread_count: int
+    last_message_id: str | None
+    last_message_preview: str | None
+    last_sender_id: str | None
+    last_read_message_id: str | None
+
+
 class SendMessageRequest(BaseModel):
     """Request to send a message"""
 
@@ -79,6 +89,20 @@ class MessageResponse(BaseModel):
     created_at: str
 
 
+class MessageSearchHit(MessageResponse):
+    """Search result with its relevance and a highlighted snippet"""
+
+    rank: float
+    highlight: str = Field(..., description="HTML-escaped snippet, matches wrapped in <mark>")
+
+
+class MessageSearchResponse(BaseModel):
+    """A page of search results"""
+
+    results: list[MessageSearchHit]
+    next_cursor: str | None = Field(None, description="Pass as cursor for the next page")
+
+
 class MarkReadRequest(BaseModel):
     """Request to mark messages as read"""
 
@@ -359,6 +383,7 @@ async def send_message(
         text=req.text,
         attachments=req.attachments,
         reply_to_id=req.reply_to_id,
+        created_at=message.created_at.isoformat(),
         correlation_id=req.correlation_id,
     )
     await pub.close()
@@ -408,37 +433,56 @@ async def list_messages(
     ]
 
 
-@router.get("/messages/search", response_model=list[MessageResponse])
+@router.get("/messages/search", response_model=MessageSearchResponse)
 async def search_messages(
     tenant_id: str = Query(..., description="Tenant identifier"),
     q: str = Query(..., min_length=2, description="Search query"),
     thread_id: UUID | None = Query(None, description="Limit to specific thread"),
     sender_id: str | None = Query(None, description="Filter by sender"),
     limit: int = Query(50, ge=1, le=100),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
+    order: str = Query("relevance", pattern="^(relevance|recent)$"),
     repo: ChatRepository = Depends(get_repository),
 ):
-    """Search messages by text content"""
-    messages = await repo.search_messages(
-        tenant_id=tenant_id,
-        query_text=q,
-        thread_id=thread_id,
-        sender_id=sender_id,
-        limit=limit,
-    )
-
-    return [
-        MessageResponse(
-            message_id=str(m.id),
-            thread_id=str(m.thread_id),
-            sender_id=m.sender_id,
-            text=m.text,
-            attachments=m.attachments or [],
-            reply_to_id=str(m.reply_to_id) if m.reply_to_id else None,
-            message_type=m.message_type,
-            created_at=m.created_at.isoformat(),
+    """Full-text search over message text, Arabic-normalized and ranked"""
+    try:
+        page = await repo.search_messages(
+            tenant_id=tenant_id,
+            query_text=q,
+            thread_id=thread_id,
+            sender_id=sender_id,
+            limit=limit,
+            cursor=cursor,
+            order=order,
         )
-        for m in messages
-    ]
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "error": "invalid_cursor",
+                "message_ar": "مؤشر الصفحة غير صالح",
+                "message_en": "Invalid search cursor",
+            },
+        ) from None
+
+    return MessageSearchResponse(
+        results=[
+            MessageSearchHit(
+                message_id=str(hit.message.id),
+                thread_id=str(hit.message.thread_id),
+                sender_id=hit.message.sender_id,
+                text=hit.message.text,
+                attachments=hit.message.attachments or [],
+                reply_to_id=str(hit.message.reply_to_id) if hit.message.reply_to_id else None,
+                message_type=hit.message.message_type,
+                created_at=hit.message.created_at.isoformat(),
+                rank=hit.rank,
+                highlight=hit.highlight,
+            )
+            for hit in page.hits
+        ],
+        next_cursor=page.next_cursor,
+    )
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -540,3 +584,43 @@ async def get_unread_counts(
         "total_unread": total,
         "threads": counts,
     }
+
+
+@router.get("/inbox", response_model=list[InboxEntryResponse])
+async def get_inbox(
+    tenant_id: str = Query(..., description="Tenant identifier"),
+    user_id: str = Query(..., description="Inbox owner"),
+    scope_type: str | None = Query(None, description="Filter by scope type"),
+    limit: int = Query(50, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    repo: ChatRepository = Depends(get_repository),
+):
+    """A user's threads by latest activity, with message preview and unread count"""
+    entries = await repo.get_inbox(
+        tenant_id=tenant_id,
+        user_id=user_id,
+        scope_type=scope_type,
+        limit=limit,
+        offset=offset,
+    )
+
+    return [
+        InboxEntryResponse(
+            thread_id=str(e.thread_id),
+            tenant_id=e.tenant_id,
+            scope_type=e.scope_type,
+            scope_id=e.scope_id,
+            created_by=e.created_by,
+            title=e.title,
+            is_archived=e.is_archived,
+            message_count=e.message_count,
+            last_message_at=(e.last_message_at.isoformat() if e.last_message_at else None),
+            created_at=e.created_at.isoformat(),
+            unread_count=e.unread_count,
+            last_message_id=str(e.last_message_id) if e.last_message_id else None,
+            last_message_preview=e.last_message_preview,
+            last_sender_id=e.last_sender_id,
+            last_read_message_id=(str(e.last_read_message_id) if e.last_read_message_id else None),
+        )
+        for e in entries
+    ]
@@ -177,6 +177,7 @@ class ChatPublisher:
         text: str | None = None,
         attachments: list[str] | None = None,
         reply_to_id: str | None = None,
+        created_at: str | None = None,
         correlation_id: str | None = None,
     ):
         """Publish chat_message_sent event"""
@@ -193,6 +194,7 @@ class ChatPublisher:
                 "text": text or "",
                 "attachments": attachments or [],
                 "reply_to_id": reply_to_id,
+                "created_at": created_at,
             },
         )
 
@@ -0,0 +1,131 @@
+"""
+Chat Event Log
+Transactional append to the chat_events table read by projections
+"""
+
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from tortoise import connections
+from tortoise.expressions import F
+
+from ..models import ChatEvent, ChatThread
+
+# Characters of message text kept as the inbox preview
+PREVIEW_LENGTH = 100
+
+# Event log and inbox read model; kept in step with
+# infrastructure/core/postgres/init/00-init-sahool.sql
+_SCHEMA = """
+ALTER TABLE chat_threads ADD COLUMN IF NOT EXISTS event_seq INTEGER NOT NULL DEFAULT 0;
+
+CREATE TABLE IF NOT EXISTS chat_events (
+    id BIGSERIAL PRIMARY KEY,
+    tenant_id VARCHAR(64) NOT NULL,
+    thread_id UUID NOT NULL,
+    seq INTEGER NOT NULL,
+    event_type VARCHAR(64) NOT NULL,
+    payload JSONB NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    UNIQUE (thread_id, seq)
+);
+
+CREATE TABLE IF NOT EXISTS chat_inbox_threads (
+    thread_id UUID PRIMARY KEY,
+    tenant_id VARCHAR(64) NOT NULL,
+    seq INTEGER NOT NULL DEFAULT 0,
+    scope_type VARCHAR(16) NOT NULL,
+    scope_id VARCHAR(128) NOT NULL,
+    created_by VARCHAR(64) NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL,
+    title VARCHAR(255),
+    is_archived BOOLEAN NOT NULL DEFAULT false,
+    message_count INTEGER NOT NULL DEFAULT 0,
+    last_message_id UUID,
+    last_message_preview VARCHAR(255),
+    last_sender_id VARCHAR(64),
+    last_message_at TIMESTAMPTZ,
+    activity_at TIMESTAMPTZ NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_chat_inbox_threads_tenant ON chat_inbox_threads (tenant_id);
+
+CREATE TABLE IF NOT EXISTS chat_inbox (
+    id BIGSERIAL PRIMARY KEY,
+    tenant_id VARCHAR(64) NOT NULL,
+    user_id VARCHAR(64) NOT NULL,
+    thread_id UUID NOT NULL,
+    scope_type VARCHAR(16) NOT NULL,
+    scope_id VARCHAR(128) NOT NULL,
+    created_by VARCHAR(64) NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL,
+    title VARCHAR(255),
+    is_archived BOOLEAN NOT NULL DEFAULT false,
+    message_count INTEGER NOT NULL DEFAULT 0,
+    last_message_id UUID,
+    last_message_preview VARCHAR(255),
+    last_sender_id VARCHAR(64),
+    last_message_at TIMESTAMPTZ,
+    activity_at TIMESTAMPTZ NOT NULL,
+    unread_count INTEGER NOT NULL DEFAULT 0,
+    last_read_message_id UUID,
+    last_read_at TIMESTAMPTZ,
+    joined_at TIMESTAMPTZ,
+    UNIQUE (thread_id, user_id)
+);
+CREATE INDEX IF NOT EXISTS idx_chat_inbox_thread ON chat_inbox (thread_id);
+CREATE INDEX IF NOT EXISTS idx_chat_inbox_user_activity
+    ON chat_inbox (tenant_id, user_id, is_archived, activity_at DESC, thread_id DESC);
+"""
+
+
+async def ensure_schema(connection_name: str = "default") -> None:
+    """
+    Create the event log and inbox tables and ``chat_threads.event_seq``
+
+    Idempotent; a no-op outside PostgreSQL, where ``generate_schemas`` builds
+    them from the models.
+    """
+    db = connections.get(connection_name)
+    if db.capabilities.dialect == "postgres":
+        await db.execute_script(_SCHEMA)
+
+
+async def record_event(
+    tenant_id: str,
+    thread_id: UUID,
+    event_type: str,
+    payload: dict[str, Any],
+) -> ChatEvent:
+    """
+    Append an event to the thread's log with the next sequence number
+
+    Call inside the transaction that makes the change, so the event exists
+    exactly when the change does. Bumping ``ChatThread.event_seq`` locks the
+    thread row until commit, which keeps each thread's sequence gap-free and
+    in commit order.
+    """
+    await ChatThread.filter(id=thread_id).update(event_seq=F("event_seq") + 1)
+    seq = await ChatThread.filter(id=thread_id).first().values_list("event_seq", flat=True)
+    return await ChatEvent.create(
+        tenant_id=tenant_id,
+        thread_id=thread_id,
+        seq=seq,
+        event_type=event_type,
+        payload=payload,
+    )
+
+
+def preview_text(text: str | None) -> str | None:
+    """Inbox preview of a message text"""
+    if not text:
+        return None
+    text = " ".join(text.split())
+    if len(text) <= PREVIEW_LENGTH:
+        return text
+    return text[: PREVIEW_LENGTH - 1] + "…"
+
+
+def isoformat(value: datetime | None) -> str | None:
+    """Datetimes are stored in event payloads as ISO 8601 strings"""
+    return value.isoformat() if value else None
@@ -28,6 +28,8 @@ except ImportError:
 
 
 from .api import router
+from .events.store import ensure_schema as ensure_event_schema
+from .search import get_search_index
 
 # Configure logging
 logging.basicConfig(
@@ -75,6 +77,8 @@ async def lifespan(app: FastAPI):
     try:
         await Tortoise.init(config=TORTOISE_ORM)
         logger.info("Database connected")
+        await ensure_event_schema()
+        await get_search_index().ensure_schema()
     except Exception as e:
         logger.warning(f"Database connection failed (running without DB): {e}")
         # Initialize with SQLite for testing
@@ -38,6 +38,9 @@ class ChatThread(Model):
     last_message_at = fields.DatetimeField(null=True)
     message_count = fields.IntField(default=0)
 
+    # Sequence number of the thread's latest ChatEvent
+    event_seq = fields.IntField(default=0)
+
     class Meta:
         table = "chat_threads"
         unique_together = ("tenant_id", "scope_type", "scope_id")
@@ -100,7 +103,7 @@ class ChatParticipant(Model):
     thread_id = fields.UUIDField(index=True)
     user_id = fields.CharField(max_length=64, index=True)
 
-    # Read tracking
+    # Read tracking (unread counts are kept by the inbox read model)
     last_read_at = fields.DatetimeField(null=True)
     last_read_message_id = fields.UUIDField(null=True)
     unread_count = fields.IntField(default=0)
@@ -143,3 +146,98 @@ class ChatAttachment(Model):
 
     class Meta:
         table = "chat_attachments"
+
+
+class ChatEvent(Model):
+    """
+    Append-only log of chat events
+
+    Written in the same transaction as the change it records. ``seq`` numbers
+    each thread's events without gaps, so read models apply them in order and
+    know which ones they already applied. Rebuilding a read model replays it.
+    """
+
+    id = fields.BigIntField(pk=True)
+    tenant_id = fields.CharField(max_length=64)
+    thread_id = fields.UUIDField()
+    seq = fields.IntField()
+    event_type = fields.CharField(max_length=64)
+    payload = fields.JSONField()
+    created_at = fields.DatetimeField(auto_now_add=True)
+
+    class Meta:
+        table = "chat_events"
+        unique_together = ("thread_id", "seq")
+
+
+class ChatInboxThread(Model):
+    """
+    Inbox read model: thread state and projection checkpoint
+
+    Holds what every participant's inbox row repeats about the thread, so a
+    user joining later gets a complete row. ``seq`` is the last ChatEvent of
+    the thread applied to the inbox.
+    """
+
+    thread_id = fields.UUIDField(pk=True)
+    tenant_id = fields.CharField(max_length=64, index=True)
+    seq = fields.IntField(default=0)
+
+    scope_type = fields.CharField(max_length=16)
+    scope_id = fields.CharField(max_length=128)
+    created_by = fields.CharField(max_length=64)
+    created_at = fields.DatetimeField()
+    title = fields.CharField(max_length=255, null=True)
+    is_archived = fields.BooleanField(default=False)
+
+    message_count = fields.IntField(default=0)
+    last_message_id = fields.UUIDField(null=True)
+    last_message_preview = fields.CharField(max_length=255, null=True)
+    last_sender_id = fields.CharField(max_length=64, null=True)
+    last_message_at = fields.DatetimeField(null=True)
+    activity_at = fields.DatetimeField()  # last_message_at, or created_at before any message
+
+    class Meta:
+        table = "chat_inbox_threads"
+
+
+class ChatInboxEntry(Model):
+    """
+    Inbox read model: one row per thread and participant
+
+    Denormalized so opening an inbox is a single index range scan ordered by
+    activity, with the preview and unread count already on the row.
+    Maintained by the projection worker from ChatEvent.
+    """
+
+    id = fields.BigIntField(pk=True)
+    tenant_id = fields.CharField(max_length=64)
+    user_id = fields.CharField(max_length=64)
+    thread_id = fields.UUIDField(index=True)
+
+    # Copied from ChatInboxThread
+    scope_type = fields.CharField(max_length=16)
+    scope_id = fields.CharField(max_length=128)
+    created_by = fields.CharField(max_length=64)
+    created_at = fields.DatetimeField()
+    title = fields.CharField(max_length=255, null=True)
+    is_archived = fields.BooleanField(default=False)
+    message_count = fields.IntField(default=0)
+    last_message_id = fields.UUIDField(null=True)
+    last_message_preview = fields.CharField(max_length=255, null=True)
+    last_sender_id = fields.CharField(max_length=64, null=True)
+    last_message_at = fields.DatetimeField(null=True)
+    activity_at = fields.DatetimeField()
+
+    # Per participant
+    unread_count = fields.IntField(default=0)
+    last_read_message_id = fields.UUIDField(null=True)
+    last_read_at = fields.DatetimeField(null=True)
+    joined_at = fields.DatetimeField(null=True)
+
+    class Meta:
+        table = "chat_inbox"
+        unique_together = ("thread_id", "user_id")
+        indexes = [
+            ("tenant_id", "user_id", "is_archived", "activity_at"),
+        ]
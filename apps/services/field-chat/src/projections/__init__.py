@@ -3,6 +3,7 @@ Chat Projections Module
 Event-driven read model updates
 """
 
+from .inbox import InboxProjector, backfill_events
 from .worker import ChatProjectionWorker
 
-__all__ = ["ChatProjectionWorker"]
+__all__ = ["ChatProjectionWorker", "InboxProjector", "backfill_events"]
@@ -0,0 +1,374 @@
+"""
+Chat Inbox Projection
+Per-user inbox read model maintained from the chat event log
+
+Each thread's events are applied in ``seq`` order, starting after the
+checkpoint kept in ChatInboxThread, in one transaction that locks the
+checkpoint row. NATS messages only tell the worker which thread to catch up,
+so redelivered, duplicated or reordered messages cannot apply an event twice
+or out of order.
+
+Usage:
+    python -m src.projections.inbox backfill [--tenant-id TENANT]
+    python -m src.projections.inbox rebuild [--tenant-id TENANT]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from tortoise import connections
+from tortoise.exceptions import IntegrityError
+from tortoise.expressions import F
+from tortoise.transactions import in_transaction
+
+from ..events.store import ensure_schema, isoformat, preview_text, record_event
+from ..events.types import (
+    CHAT_MESSAGE_SENT,
+    CHAT_MESSAGES_READ,
+    CHAT_PARTICIPANT_JOINED,
+    CHAT_PARTICIPANT_LEFT,
+    CHAT_THREAD_ARCHIVED,
+    CHAT_THREAD_CREATED,
+)
+from ..models import (
+    ChatEvent,
+    ChatInboxEntry,
+    ChatInboxThread,
+    ChatMessage,
+    ChatParticipant,
+    ChatThread,
+)
+
+logger = logging.getLogger(__name__)
+
+# Events applied per transaction while catching up a thread
+BATCH_SIZE = 500
+
+# Threads whose log is ahead of their inbox checkpoint
+_PENDING_THREADS = """
+SELECT t.id FROM chat_threads t
+LEFT JOIN chat_inbox_threads s ON s.thread_id = t.id
+WHERE t.event_seq > COALESCE(s.seq, 0)
+"""
+
+# Thread state repeated on every participant's inbox row
+_THREAD_FIELDS = (
+    "scope_type",
+    "scope_id",
+    "created_by",
+    "created_at",
+    "title",
+    "is_archived",
+    "message_count",
+    "last_message_id",
+    "last_message_preview",
+    "last_sender_id",
+    "last_message_at",
+    "activity_at",
+)
+
+
+class InboxProjector:
+    """Applies ChatEvent to the ChatInboxThread / ChatInboxEntry read model"""
+
+    def __init__(self, batch_size: int = BATCH_SIZE):
+        self.batch_size = batch_size
+        self._handlers = {
+            CHAT_THREAD_CREATED: self._thread_created,
+            CHAT_THREAD_ARCHIVED: self._thread_archived,
+            CHAT_MESSAGE_SENT: self._message_sent,
+            CHAT_PARTICIPANT_JOINED: self._participant_joined,
+            CHAT_PARTICIPANT_LEFT: self._participant_left,
+            CHAT_MESSAGES_READ: self._messages_read,
+        }
+
+    async def catch_up(self, thread_id: UUID | str) -> int:
+        """Apply the thread's unapplied events; returns how many were applied"""
+        applied = 0
+        while True:
+            batch = await self._catch_up_batch(thread_id)
+            applied += batch
+            if batch < self.batch_size:
+                return applied
+
+    async def catch_up_pending(self) -> int:
+        """
+        Catch up every thread whose log is ahead of its checkpoint
+
+        Covers events whose NATS message was never published or was lost.
+        """
+        rows = await connections.get("default").execute_query_dict(_PENDING_THREADS)
+        applied = 0
+        for row in rows:
+            applied += await self.catch_up(row["id"])
+        return applied
+
+    async def rebuild(self, tenant_id: str | None = None) -> int:
+        """Drop the inbox (of one tenant) and replay it from the event log"""
+        scope = {"tenant_id": tenant_id} if tenant_id else {}
+        await ChatInboxEntry.filter(**scope).delete()
+        await ChatInboxThread.filter(**scope).delete()
+
+        applied = 0
+        async for thread_id in _thread_ids(ChatThread.filter(event_seq__gt=0, **scope)):
+            applied += await self.catch_up(thread_id)
+        return applied
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # Applying events
+    # ─────────────────────────────────────────────────────────────────────────
+
+    async def _catch_up_batch(self, thread_id: UUID | str) -> int:
+        try:
+            async with in_transaction():
+                state = await ChatInboxThread.select_for_update().get_or_none(thread_id=thread_id)
+                seq = state.seq if state else 0
+                events = (
+                    await ChatEvent.filter(thread_id=thread_id, seq__gt=seq)
+                    .order_by("seq")
+                    .limit(self.batch_size)
+                )
+                applied = 0
+                for event in events:
+                    if event.seq != seq + 1:
+                        logger.warning(f"Gap in events of thread {thread_id} after seq {seq}")
+                        break
+                    if state is None:
+                        state = await _initial_state(event)
+                        if state is None:
+                            break
+                    handler = self._handlers.get(event.event_type)
+                    if handler:
+                        await handler(state, event.payload)
+                    seq = state.seq = event.seq
+                    applied += 1
+                if applied:
+                    await state.save()
+                return applied
+        except IntegrityError:
+            # Another worker created this thread's checkpoint concurrently
+            logger.debug(f"Inbox of thread {thread_id} is being projected elsewhere")
+            return 0
+
+    async def _thread_created(self, state: ChatInboxThread, payload: dict[str, Any]):
+        """The state was built from this event by _initial_state"""
+
+    async def _thread_archived(self, state: ChatInboxThread, payload: dict[str, Any]):
+        state.is_archived = True
+        await ChatInboxEntry.filter(thread_id=state.thread_id).update(is_archived=True)
+
+    async def _message_sent(self, state: ChatInboxThread, payload: dict[str, Any]):
+        created_at = _parse(payload.get("created_at")) or state.activity_at
+        state.message_count = payload.get("message_count", state.message_count + 1)
+        state.last_message_id = payload.get("message_id")
+        state.last_message_preview = payload.get("preview")
+        state.last_sender_id = payload.get("sender_id")
+        state.last_message_at = created_at
+        state.activity_at = created_at
+
+        entries = ChatInboxEntry.filter(thread_id=state.thread_id)
+        await entries.update(**_thread_fields(state))
+        await entries.exclude(user_id=state.last_sender_id).update(
+            unread_count=F("unread_count") + 1
+        )
+
+    async def _participant_joined(self, state: ChatInboxThread, payload: dict[str, Any]):
+        fields = {
+            **_thread_fields(state),
+            "tenant_id": state.tenant_id,
+            "unread_count": payload.get("unread_count", 0),
+            "last_read_message_id": payload.get("last_read_message_id"),
+            "last_read_at": _parse(payload.get("last_read_at")),
+            "joined_at": _parse(payload.get("joined_at")),
+        }
+        entry = ChatInboxEntry.filter(thread_id=state.thread_id, user_id=payload["user_id"])
+        if not await entry.update(**fields):
+            await ChatInboxEntry.create(
+                thread_id=state.thread_id, user_id=payload["user_id"], **fields
+            )
+
+    async def _participant_left(self, state: ChatInboxThread, payload: dict[str, Any]):
+        await ChatInboxEntry.filter(thread_id=state.thread_id, user_id=payload["user_id"]).delete()
+
+    async def _messages_read(self, state: ChatInboxThread, payload: dict[str, Any]):
+        await ChatInboxEntry.filter(thread_id=state.thread_id, user_id=payload["user_id"]).update(
+            unread_count=0,
+            last_read_message_id=payload.get("last_read_message_id"),
+            last_read_at=_parse(payload.get("read_at")),
+        )
+
+
+async def _initial_state(event: ChatEvent) -> ChatInboxThread | None:
+    """Thread state before the first applied event"""
+    if event.event_type == CHAT_THREAD_CREATED:
+        payload = event.payload
+        created_at = _parse(payload.get("created_at")) or event.created_at
+        return ChatInboxThread(
+            thread_id=event.thread_id,
+            tenant_id=event.tenant_id,
+            scope_type=payload["scope_type"],
+            scope_id=payload["scope_id"],
+            created_by=payload["created_by"],
+            title=payload.get("title"),
+            created_at=created_at,
+            activity_at=created_at,
+        )
+
+    # The log of threads created before it existed starts with their backfill
+    thread = await ChatThread.get_or_none(id=event.thread_id)
+    if thread is None:
+        logger.warning(f"Events of unknown thread {event.thread_id} skipped")
+        return None
+    logger.warning(f"Thread {thread.id} has no {CHAT_THREAD_CREATED} event, run backfill")
+    return ChatInboxThread(
+        thread_id=thread.id,
+        tenant_id=thread.tenant_id,
+        scope_type=thread.scope_type,
+        scope_id=thread.scope_id,
+        created_by=thread.created_by,
+        title=thread.title,
+        created_at=thread.created_at,
+        activity_at=thread.created_at,
+    )
+
+
+def _thread_fields(state: ChatInboxThread) -> dict[str, Any]:
+    return {name: getattr(state, name) for name in _THREAD_FIELDS}
+
+
+def _parse(value: str | None) -> datetime | None:
+    return datetime.fromisoformat(value) if value else None
+
+
+async def _thread_ids(query, batch_size: int = BATCH_SIZE):
+    """Thread ids of a ChatThread query in id order, fetched in batches"""
+    last = None
+    while True:
+        page = query.filter(id__gt=last) if last else query
+        ids = await page.order_by("id").limit(batch_size).values_list("id", flat=True)
+        for thread_id in ids:
+            yield thread_id
+        if len(ids) < batch_size:
+            return
+        last = ids[-1]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Backfill
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+async def backfill_events(tenant_id: str | None = None) -> int:
+    """
+    Seed the event log of threads that predate it
+
+    Records a snapshot of each thread as regular events: created, its last
+    message (carrying the message count) and one join per participant
+    (carrying their unread count and read position). Run once before the
+    first rebuild. Returns the number of threads backfilled.
+    """
+    scope = {"tenant_id": tenant_id} if tenant_id else {}
+    backfilled = 0
+    async for thread_id in _thread_ids(ChatThread.filter(event_seq=0, **scope)):
+        async with in_transaction():
+            thread = await ChatThread.select_for_update().get_or_none(id=thread_id)
+            if thread is None or thread.event_seq:
+                continue
+            await _backfill_thread(thread)
+            backfilled += 1
+    return backfilled
+
+
+async def _backfill_thread(thread: ChatThread):
+    await record_event(
+        thread.tenant_id,
+        thread.id,
+        CHAT_THREAD_CREATED,
+        {
+            "scope_type": thread.scope_type,
+            "scope_id": thread.scope_id,
+            "created_by": thread.created_by,
+            "title": thread.title,
+            "created_at": isoformat(thread.created_at),
+        },
+    )
+    if thread.is_archived:
+        await record_event(thread.tenant_id, thread.id, CHAT_THREAD_ARCHIVED, {})
+
+    last = await ChatMessage.filter(thread_id=thread.id).order_by("-created_at").first()
+    if last:
+        await record_event(
+            thread.tenant_id,
+            thread.id,
+            CHAT_MESSAGE_SENT,
+            {
+                "message_id": str(last.id),
+                "sender_id": last.sender_id,
+                "message_type": last.message_type,
+                "preview": preview_text(last.text),
+                "created_at": isoformat(last.created_at),
+                "message_count": thread.message_count,
+            },
+        )
+
+    for participant in await ChatParticipant.filter(thread_id=thread.id):
+        await record_event(
+            thread.tenant_id,
+            thread.id,
+            CHAT_PARTICIPANT_JOINED,
+            {
+                "user_id": participant.user_id,
+                "joined_at": isoformat(participant.joined_at),
+                "unread_count": participant.unread_count,
+                "last_read_message_id": (
+                    str(participant.last_read_message_id)
+                    if participant.last_read_message_id
+                    else None
+                ),
+                "last_read_at": isoformat(participant.last_read_at),
+            },
+        )
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Command line
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+async def main(argv: list[str] | None = None):
+    """Backfill the event log or rebuild the inbox from it"""
+    parser = argparse.ArgumentParser(prog="python -m src.projections.inbox")
+    parser.add_argument("command", choices=["backfill", "rebuild"])
+    parser.add_argument("--tenant-id", help="Only this tenant")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+
+    from tortoise import Tortoise
+
+    await Tortoise.init(
+        db_url=os.getenv("DATABASE_URL", "sqlite://:memory:"),
+        modules={"models": ["src.models"]},
+    )
+    try:
+        await ensure_schema()
+        if args.command == "backfill":
+            threads = await backfill_events(args.tenant_id)
+            logger.info(f"Backfilled the event log of {threads} threads")
+        else:
+            events = await InboxProjector().rebuild(args.tenant_id)
+            logger.info(f"Rebuilt the inbox from {events} events")
+    finally:
+        await Tortoise.close_connections()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -9,25 +9,34 @@ import json
 import logging
 import os
 from collections.abc import Callable
+from datetime import UTC, datetime
 from typing import Any
+from uuid import UUID
 
 import nats
 from nats.aio.client import Client as NATS
 
+from ..events.store import ensure_schema as ensure_event_schema
 from ..events.types import (
     CHAT_MESSAGE_EDITED,
     CHAT_MESSAGE_SENT,
     CHAT_MESSAGES_READ,
     CHAT_PARTICIPANT_JOINED,
     CHAT_PARTICIPANT_LEFT,
+    CHAT_THREAD_ARCHIVED,
     CHAT_THREAD_CREATED,
     SUBJECTS,
 )
+from ..search import MessageSearchIndex, SearchDocument, get_search_index
+from .inbox import InboxProjector
 
 logger = logging.getLogger(__name__)
 
 NATS_URL = os.getenv("NATS_URL", "nats://nats:4222")
 
+# How often the inbox is checked for events whose NATS message never arrived
+INBOX_SWEEP_SECONDS = int(os.getenv("INBOX_SWEEP_SECONDS", "60"))
+
 
 class ChatProjectionWorker:
     """
@@ -35,14 +44,23 @@ class ChatProjectionWorker:
     1. Updates read models (denormalized tables)
     2. Broadcasts to WebSocket clients
     3. Triggers notifications
+    4. Keeps the message search index current
+    5. Keeps the per-user inbox read model current
     """
 
-    def __init__(self, broadcast_callback: Callable[[str, dict], Any] | None = None):
+    def __init__(
+        self,
+        broadcast_callback: Callable[[str, dict], Any] | None = None,
+        search_index: MessageSearchIndex | None = None,
+        inbox: InboxProjector | None = None,
+    ):
         self.nc: NATS | None = None
         self.js = None
         self.subscriptions = []
         self.running = False
         self.broadcast_callback = broadcast_callback
+        self.search_index = search_index
+        self.inbox = inbox or InboxProjector()
 
     async def connect(self):
         """Connect to NATS"""
@@ -66,9 +84,15 @@ class ChatProjectionWorker:
         await self.connect()
         self.running = True
 
+        await ensure_event_schema()
+        if self.search_index is None:
+            self.search_index = get_search_index()
+        await self.search_index.ensure_schema()
+
         # Subscribe to all chat events
         event_handlers = {
             SUBJECTS[CHAT_THREAD_CREATED]: self._handle_thread_created,
+            SUBJECTS[CHAT_THREAD_ARCHIVED]: self._handle_thread_archived,
             SUBJECTS[CHAT_MESSAGE_SENT]: self._handle_message_sent,
             SUBJECTS[CHAT_MESSAGE_EDITED]: self._handle_message_edited,
             SUBJECTS[CHAT_PARTICIPANT_JOINED]: self._handle_participant_joined,
@@ -86,8 +110,13 @@ class ChatProjectionWorker:
 
         logger.info("Chat projection worker started")
 
-        # Keep running
+        # Keep running, sweeping the inbox for missed events
+        loop = asyncio.get_running_loop()
+        next_sweep = loop.time()
         while self.running:
+            if loop.time() >= next_sweep:
+                await self._sweep_inbox()
+                next_sweep = loop.time() + INBOX_SWEEP_SECONDS
             await asyncio.sleep(1)
 
     # ─────────────────────────────────────────────────────────────────────────
@@ -116,9 +145,25 @@ class ChatProjectionWorker:
                 },
             )
 
+            await self._project_inbox(thread_id)
+
         except Exception as e:
             logger.error(f"Error handling thread_created: {e}")
 
+    async def _handle_thread_archived(self, msg):
+        """Handle chat_thread_archived event"""
+        try:
+            data = json.loads(msg.data.decode())
+            payload = data.get("payload", {})
+            thread_id = payload.get("thread_id")
+
+            logger.info(f"Thread archived: {thread_id}")
+
+            await self._project_inbox(thread_id)
+
+        except Exception as e:
+            logger.error(f"Error handling thread_archived: {e}")
+
     async def _handle_message_sent(self, msg):
         """Handle chat_message_sent event"""
         try:
@@ -144,6 +189,9 @@ class ChatProjectionWorker:
                 },
             )
 
+            await self._index_message(data, payload)
+            await self._project_inbox(thread_id)
+
             # Could trigger push notifications here
             await self._trigger_notifications(
                 thread_id=thread_id,
@@ -175,6 +223,13 @@ class ChatProjectionWorker:
                 },
             )
 
+            if self.search_index:
+                await self.search_index.update_text(
+                    UUID(payload["message_id"]),
+                    payload.get("new_text"),
+                    _parse_timestamp(data.get("timestamp")),
+                )
+
         except Exception as e:
             logger.error(f"Error handling message_edited: {e}")
 
@@ -198,6 +253,8 @@ class ChatProjectionWorker:
                 },
             )
 
+            await self._project_inbox(thread_id)
+
         except Exception as e:
             logger.error(f"Error handling participant_joined: {e}")
 
@@ -220,6 +277,8 @@ class ChatProjectionWorker:
                 },
             )
 
+            await self._project_inbox(thread_id)
+
         except Exception as e:
             logger.error(f"Error handling participant_left: {e}")
 
@@ -244,6 +303,8 @@ class ChatProjectionWorker:
                 },
             )
 
+            await self._project_inbox(thread_id)
+
         except Exception as e:
             logger.error(f"Error handling messages_read: {e}")
 
@@ -259,6 +320,45 @@ class ChatProjectionWorker:
             except Exception as e:
                 logger.error(f"Broadcast error: {e}")
 
+    async def _project_inbox(self, thread_id: str | None):
+        """
+        Bring the thread's inbox rows up to date with its event log
+
+        The event itself is not applied: the log holds it (and anything
+        before it that was missed), in order and exactly once.
+        """
+        if thread_id:
+            await self.inbox.catch_up(UUID(thread_id))
+
+    async def _sweep_inbox(self):
+        """Apply events whose NATS message was lost"""
+        try:
+            applied = await self.inbox.catch_up_pending()
+            if applied:
+                logger.info(f"Inbox sweep applied {applied} missed events")
+        except Exception as e:
+            logger.error(f"Inbox sweep failed: {e}")
+
+    async def _index_message(self, data: dict, payload: dict):
+        """Add a sent message to the search index (idempotent on redelivery)"""
+        if not self.search_index:
+            return
+        timestamp = _parse_timestamp(data.get("timestamp"))
+        created_at = payload.get("created_at")
+        await self.search_index.index(
+            [
+                SearchDocument(
+                    message_id=UUID(payload["message_id"]),
+                    tenant_id=data["tenant_id"],
+                    thread_id=UUID(payload["thread_id"]),
+                    sender_id=payload.get("sender_id", ""),
+                    text=payload.get("text"),
+                    created_at=_parse_timestamp(created_at) if created_at else timestamp,
+                    event_at=timestamp,
+                )
+            ]
+        )
+
     async def _trigger_notifications(
         self,
         thread_id: str,
@@ -278,6 +378,14 @@ class ChatProjectionWorker:
         return text[: max_length - 3] + "..."
 
 
+def _parse_timestamp(value: str | None) -> datetime:
+    """Envelope timestamps are ISO 8601 UTC, usually with a trailing Z"""
+    if not value:
+        return datetime.now(UTC)
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=UTC)
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Standalone runner
 # ─────────────────────────────────────────────────────────────────────────────
@@ -290,6 +398,12 @@ async def main():
         format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
     )
 
+    from tortoise import Tortoise
+
+    await Tortoise.init(
+        db_url=os.getenv("DATABASE_URL", "sqlite://:memory:"),
+        modules={"models": ["src.models"]},
+    )
     worker = ChatProjectionWorker()
 
     try:
@@ -298,6 +412,7 @@ async def main():
         logger.info("Shutting down...")
     finally:
         await worker.close()
+        await Tortoise.close_connections()
 
 
 if __name__ == "__main__":
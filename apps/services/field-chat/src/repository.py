@@ -3,14 +3,61 @@ Field Chat Repository
 Data access layer for chat operations
 """
 
+import logging
 from datetime import datetime
 from uuid import UUID, uuid4
 
-from .models import ChatMessage, ChatParticipant, ChatThread
+from tortoise.expressions import F
+from tortoise.transactions import in_transaction
+
+from .events.store import isoformat, preview_text, record_event
+from .events.types import (
+    CHAT_MESSAGE_SENT,
+    CHAT_MESSAGES_READ,
+    CHAT_PARTICIPANT_JOINED,
+    CHAT_PARTICIPANT_LEFT,
+    CHAT_THREAD_ARCHIVED,
+    CHAT_THREAD_CREATED,
+)
+from .models import ChatInboxEntry, ChatMessage, ChatParticipant, ChatThread
+from .projections.inbox import InboxProjector
+from .search import (
+    ORDER_RELEVANCE,
+    MessageSearchIndex,
+    SearchDocument,
+    SearchPage,
+    get_search_index,
+    highlight,
+    parse_query,
+)
+
+logger = logging.getLogger(__name__)
 
 
 class ChatRepository:
-    """Repository for chat data operations"""
+    """
+    Repository for chat data operations
+
+    Every change to threads, messages or participants appends its event to the
+    ChatEvent log in the same transaction. After the commit the thread's inbox
+    rows are caught up with that log, so the writer reads its own change; the
+    projection worker does the same on the NATS event and sweeps up anything
+    a failed catch-up left behind.
+    """
+
+    def __init__(
+        self,
+        search_index: MessageSearchIndex | None = None,
+        inbox: InboxProjector | None = None,
+    ):
+        self._search_index = search_index
+        self.inbox = inbox or InboxProjector()
+
+    @property
+    def search_index(self) -> MessageSearchIndex:
+        if self._search_index is None:
+            self._search_index = get_search_index()
+        return self._search_index
 
     # ─────────────────────────────────────────────────────────────
     # Thread Operations
@@ -37,18 +84,32 @@ class ChatRepository:
         if thread:
             return thread, False
 
-        thread = await ChatThread.create(
-            id=uuid4(),
-            tenant_id=tenant_id,
-            scope_type=scope_type,
-            scope_id=scope_id,
-            created_by=created_by,
-            title=title or self._generate_title(scope_type, scope_id),
-        )
+        async with in_transaction():
+            thread = await ChatThread.create(
+                id=uuid4(),
+                tenant_id=tenant_id,
+                scope_type=scope_type,
+                scope_id=scope_id,
+                created_by=created_by,
+                title=title or self._generate_title(scope_type, scope_id),
+            )
+            await record_event(
+                tenant_id,
+                thread.id,
+                CHAT_THREAD_CREATED,
+                {
+                    "scope_type": scope_type,
+                    "scope_id": scope_id,
+                    "created_by": created_by,
+                    "title": thread.title,
+                    "created_at": isoformat(thread.created_at),
+                },
+            )
 
-        # Add creator as participant
-        await self.add_participant(tenant_id, thread.id, created_by)
+            # Add creator as participant
+            await self._add_participant(tenant_id, thread.id, created_by)
 
+        await self._project_inbox(thread.id)
         return thread, True
 
     async def get_thread(
@@ -83,32 +144,58 @@ class ChatRepository:
         limit: int = 50,
         offset: int = 0,
     ) -> list[ChatThread]:
-        """List threads with optional filters"""
+        """
+        List threads with optional filters
+
+        With ``user_id`` the user's inbox read model picks and orders the
+        threads (most recent activity first), so only the page is loaded.
+        """
+        if user_id:
+            thread_ids = await (
+                self._inbox_query(tenant_id, user_id, scope_type)
+                .offset(offset)
+                .limit(limit)
+                .values_list("thread_id", flat=True)
+            )
+            threads = {t.id: t for t in await ChatThread.filter(id__in=thread_ids)}
+            return [threads[thread_id] for thread_id in thread_ids if thread_id in threads]
+
         query = ChatThread.filter(tenant_id=tenant_id, is_archived=False)
 
         if scope_type:
             query = query.filter(scope_type=scope_type)
 
-        if user_id:
-            # Only threads user participates in
-            participant_threads = await ChatParticipant.filter(
-                tenant_id=tenant_id,
-                user_id=user_id,
-            ).values_list("thread_id", flat=True)
-            query = query.filter(id__in=participant_threads)
-
         return await query.order_by("-last_message_at").offset(offset).limit(limit)
 
+    async def get_inbox(
+        self,
+        tenant_id: str,
+        user_id: str,
+        scope_type: str | None = None,
+        limit: int = 50,
+        offset: int = 0,
+    ) -> list[ChatInboxEntry]:
+        """
+        A user's inbox: their threads by most recent activity, each with the
+        last message preview and the user's unread count
+        """
+        return await self._inbox_query(tenant_id, user_id, scope_type).offset(offset).limit(limit)
+
     async def archive_thread(
         self,
         thread_id: UUID,
         tenant_id: str,
     ) -> bool:
         """Archive a thread"""
-        updated = await ChatThread.filter(
-            id=thread_id,
-            tenant_id=tenant_id,
-        ).update(is_archived=True)
+        async with in_transaction():
+            updated = await ChatThread.filter(
+                id=thread_id,
+                tenant_id=tenant_id,
+            ).update(is_archived=True)
+            if updated:
+                await record_event(tenant_id, thread_id, CHAT_THREAD_ARCHIVED, {})
+        if updated:
+            await self._project_inbox(thread_id)
         return updated > 0
 
     # ─────────────────────────────────────────────────────────────
@@ -125,35 +212,47 @@ class ChatRepository:
         reply_to_id: UUID | None = None,
         message_type: str = "text",
     ) -> ChatMessage:
-        """Create a new message"""
-        message = await ChatMessage.create(
-            id=uuid4(),
-            tenant_id=tenant_id,
-            thread_id=thread_id,
-            sender_id=sender_id,
-            text=text,
-            attachments=attachments,
-            reply_to_id=reply_to_id,
-            message_type=message_type,
-        )
-
-        # Update thread stats
-        await ChatThread.filter(id=thread_id).update(
-            last_message_at=datetime.utcnow(),
-            message_count=await ChatMessage.filter(thread_id=thread_id).count(),
-        )
+        """
+        Create a new message
 
-        # Increment unread for other participants
-        await (
-            ChatParticipant.filter(
+        Unread counts and previews of the participants' inboxes are updated
+        from the recorded event once it has committed. An embedded search
+        index is updated here; the PostgreSQL one by the projection worker.
+        """
+        async with in_transaction():
+            message = await ChatMessage.create(
+                id=uuid4(),
+                tenant_id=tenant_id,
                 thread_id=thread_id,
+                sender_id=sender_id,
+                text=text,
+                attachments=attachments,
+                reply_to_id=reply_to_id,
+                message_type=message_type,
+            )
+
+            # Update thread stats
+            await ChatThread.filter(id=thread_id).update(
+                last_message_at=message.created_at,
+                message_count=F("message_count") + 1,
             )
-            .exclude(user_id=sender_id)
-            .update(
-                unread_count=ChatParticipant.unread_count + 1,
+
+            await record_event(
+                tenant_id,
+                thread_id,
+                CHAT_MESSAGE_SENT,
+                {
+                    "message_id": str(message.id),
+                    "sender_id": sender_id,
+                    "message_type": message_type,
+                    "preview": preview_text(text),
+                    "created_at": isoformat(message.created_at),
+                },
             )
-        )
 
+        await self._project_inbox(thread_id)
+        if self.search_index.in_process:
+            await self.search_index.index([SearchDocument.from_message(message)])
         return message
 
     async def get_message(
@@ -195,19 +294,46 @@ class ChatRepository:
         thread_id: UUID | None = None,
         sender_id: str | None = None,
         limit: int = 50,
-    ) -> list[ChatMessage]:
-        """Search messages by text content"""
-        query = ChatMessage.filter(
-            tenant_id=tenant_id,
-            text__icontains=query_text,
-        )
+        cursor: str | None = None,
+        order: str = ORDER_RELEVANCE,
+    ) -> SearchPage:
+        """
+        Full-text search over message text
 
-        if thread_id:
-            query = query.filter(thread_id=thread_id)
-        if sender_id:
-            query = query.filter(sender_id=sender_id)
+        The query is normalized and stemmed like the indexed text, so Arabic
+        spelling variants, tashkeel and attached articles still match. Each hit
+        carries its message and a highlighted snippet; pass ``next_cursor`` back
+        as ``cursor`` for the next page. Raises ValueError for a bad cursor.
+        """
+        query = parse_query(query_text)
+        page = await self.search_index.search(
+            tenant_id,
+            query,
+            thread_id=thread_id,
+            sender_id=sender_id,
+            limit=limit,
+            cursor=cursor,
+            order=order,
+        )
+        if not page.hits:
+            return page
 
-        return await query.order_by("-created_at").limit(limit)
+        messages = {
+            m.id: m
+            for m in await ChatMessage.filter(
+                tenant_id=tenant_id, id__in=[hit.message_id for hit in page.hits]
+            )
+        }
+        hits = []
+        for hit in page.hits:
+            message = messages.get(hit.message_id)
+            if message is None:
+                continue  # Deleted after it was indexed
+            hit.message = message
+            hit.highlight = highlight(message.text, query)
+            hits.append(hit)
+        page.hits = hits
+        return page
 
     # ─────────────────────────────────────────────────────────────
     # Participant Operations
@@ -220,12 +346,9 @@ class ChatRepository:
         user_id: str,
     ) -> ChatParticipant:
         """Add participant to thread (idempotent)"""
-        participant, _ = await ChatParticipant.get_or_create(
-            tenant_id=tenant_id,
-            thread_id=thread_id,
-            user_id=user_id,
-            defaults={"id": uuid4()},
-        )
+        async with in_transaction():
+            participant = await self._add_participant(tenant_id, thread_id, user_id)
+        await self._project_inbox(thread_id)
         return participant
 
     async def remove_participant(
@@ -234,11 +357,19 @@ class ChatRepository:
         user_id: str,
     ) -> bool:
         """Remove participant from thread"""
-        deleted = await ChatParticipant.filter(
-            thread_id=thread_id,
-            user_id=user_id,
-        ).delete()
-        return deleted > 0
+        async with in_transaction():
+            participant = await ChatParticipant.get_or_none(
+                thread_id=thread_id,
+                user_id=user_id,
+            )
+            if participant is None:
+                return False
+            await participant.delete()
+            await record_event(
+                participant.tenant_id, thread_id, CHAT_PARTICIPANT_LEFT, {"user_id": user_id}
+            )
+        await self._project_inbox(thread_id)
+        return True
 
     async def mark_read(
         self,
@@ -246,17 +377,37 @@ class ChatRepository:
         user_id: str,
         message_id: UUID | None = None,
     ) -> bool:
-        """Mark thread as read up to message"""
+        """
+        Mark thread as read up to message
+
+        The user's inbox row is cleared right away so their next inbox open
+        already shows it; the recorded event keeps replays consistent.
+        """
         now = datetime.utcnow()
-        updated = await ChatParticipant.filter(
-            thread_id=thread_id,
-            user_id=user_id,
-        ).update(
-            last_read_at=now,
-            last_read_message_id=message_id,
-            unread_count=0,
-        )
-        return updated > 0
+        read = {"last_read_at": now, "last_read_message_id": message_id}
+        async with in_transaction():
+            participant = await ChatParticipant.get_or_none(
+                thread_id=thread_id,
+                user_id=user_id,
+            )
+            if participant is None:
+                return False
+            await ChatParticipant.filter(id=participant.id).update(unread_count=0, **read)
+            await record_event(
+                participant.tenant_id,
+                thread_id,
+                CHAT_MESSAGES_READ,
+                {
+                    "user_id": user_id,
+                    "last_read_message_id": str(message_id) if message_id else None,
+                    "read_at": isoformat(now),
+                },
+            )
+            await ChatInboxEntry.filter(thread_id=thread_id, user_id=user_id).update(
+                unread_count=0, **read
+            )
+        await self._project_inbox(thread_id)
+        return True
 
     async def get_unread_counts(
         self,
@@ -264,17 +415,55 @@ class ChatRepository:
         user_id: str,
     ) -> dict[str, int]:
         """Get unread counts for all threads"""
-        participants = await ChatParticipant.filter(
+        entries = await ChatInboxEntry.filter(
             tenant_id=tenant_id,
             user_id=user_id,
         ).values("thread_id", "unread_count")
 
-        return {str(p["thread_id"]): p["unread_count"] for p in participants}
+        return {str(e["thread_id"]): e["unread_count"] for e in entries}
 
     # ─────────────────────────────────────────────────────────────
     # Helpers
     # ─────────────────────────────────────────────────────────────
 
+    async def _add_participant(
+        self, tenant_id: str, thread_id: UUID, user_id: str
+    ) -> ChatParticipant:
+        """Add participant inside the caller's transaction"""
+        participant, created = await ChatParticipant.get_or_create(
+            tenant_id=tenant_id,
+            thread_id=thread_id,
+            user_id=user_id,
+            defaults={"id": uuid4()},
+        )
+        if created:
+            await record_event(
+                tenant_id,
+                thread_id,
+                CHAT_PARTICIPANT_JOINED,
+                {"user_id": user_id, "joined_at": isoformat(participant.joined_at)},
+            )
+        return participant
+
+    async def _project_inbox(self, thread_id: UUID) -> None:
+        """
+        Catch the thread's inbox rows up with its committed events
+
+        The change itself is already committed, so a failure is only logged:
+        the projection worker's sweep applies the events later.
+        """
+        try:
+            await self.inbox.catch_up(thread_id)
+        except Exception as e:
+            logger.warning(f"Inbox catch-up of thread {thread_id} failed: {e}")
+
+    def _inbox_query(self, tenant_id: str, user_id: str, scope_type: str | None):
+        """Unarchived inbox rows of a user, most recent activity first"""
+        query = ChatInboxEntry.filter(tenant_id=tenant_id, user_id=user_id, is_archived=False)
+        if scope_type:
+            query = query.filter(scope_type=scope_type)
+        return query.order_by("-activity_at", "-thread_id")
+
     def _generate_title(self, scope_type: str, scope_id: str) -> str:
         """Generate default thread title"""
         titles = {
@@ -0,0 +1,39 @@
+"""
+Chat Message Search Module
+Arabic-aware full-text search over chat messages
+"""
+
+from .arabic import SearchQuery, analyze, highlight, normalize_arabic, parse_query, stem_arabic
+from .index import (
+    ORDER_RECENT,
+    ORDER_RELEVANCE,
+    SEARCH_ORDERS,
+    MemorySearchIndex,
+    MessageSearchIndex,
+    PostgresSearchIndex,
+    SearchDocument,
+    SearchHit,
+    SearchPage,
+    get_search_index,
+    reindex_messages,
+)
+
+__all__ = [
+    "ORDER_RECENT",
+    "ORDER_RELEVANCE",
+    "SEARCH_ORDERS",
+    "MemorySearchIndex",
+    "MessageSearchIndex",
+    "PostgresSearchIndex",
+    "SearchDocument",
+    "SearchHit",
+    "SearchPage",
+    "SearchQuery",
+    "analyze",
+    "get_search_index",
+    "highlight",
+    "normalize_arabic",
+    "parse_query",
+    "reindex_messages",
+    "stem_arabic",
+]
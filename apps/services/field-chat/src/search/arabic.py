@@ -0,0 +1,198 @@
+"""
+Arabic Text Analysis for Message Search
+Normalization, light stemming, query parsing and highlighting
+
+The same analyzer runs when a message is indexed and when a query is parsed,
+so "الأمطار", "امطار" and "والامطار" all reduce to the same term.
+"""
+
+import html
+import re
+import unicodedata
+from dataclasses import dataclass
+
+# Tashkeel, Quranic annotation marks and superscript alef
+_DIACRITICS = re.compile("[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed]")
+_TATWEEL = "\u0640"
+_ARABIC_LETTER = re.compile("[\u0621-\u064a]")
+
+# Words including the marks stripped by normalization, so highlighting can
+# walk the original text with the same boundaries as indexing
+WORD = re.compile("[\\w\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed]+")
+
+_FOLD = str.maketrans(
+    {
+        "\u0623": "\u0627",  # أ → ا
+        "\u0625": "\u0627",  # إ → ا
+        "\u0622": "\u0627",  # آ → ا
+        "\u0671": "\u0627",  # ٱ → ا
+        "\u0649": "\u064a",  # ى → ي
+        "\u0629": "\u0647",  # ة → ه
+        "\u0624": "\u0648",  # ؤ → و
+        "\u0626": "\u064a",  # ئ → ي
+        **{chr(0x0660 + d): str(d) for d in range(10)},  # ٠-٩
+        **{chr(0x06F0 + d): str(d) for d in range(10)},  # ۰-۹
+    }
+)
+
+# Light stemming affixes (Light10 family), checked longest first
+_PREFIXES = ("وال", "بال", "كال", "فال", "لل", "ال")
+_SUFFIXES = ("ها", "ان", "ات", "ون", "ين", "يه", "ه", "ي")
+
+# Longest term kept in the index; longer "words" are usually pasted noise
+MAX_TERM_LENGTH = 64
+
+
+def normalize_arabic(text: str) -> str:
+    """
+    Fold text to its search form: NFKC, case-folded, without tashkeel or
+    tatweel, with alef/yaa/taa-marbuta variants and Eastern digits unified
+    """
+    text = unicodedata.normalize("NFKC", text).casefold()
+    text = _DIACRITICS.sub("", text).replace(_TATWEEL, "")
+    return text.translate(_FOLD)
+
+
+def stem_arabic(word: str) -> str:
+    """
+    Light stemmer for a normalized word: strip a leading waw, one definite
+    article prefix and one suffix, keeping at least two letters.
+    Non-Arabic words are returned unchanged.
+    """
+    if not _ARABIC_LETTER.search(word):
+        return word
+
+    if word.startswith("و") and len(word) > 3:
+        word = word[1:]
+
+    for prefix in _PREFIXES:
+        if word.startswith(prefix) and len(word) - len(prefix) >= 2:
+            word = word[len(prefix) :]
+            break
+
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 2:
+            word = word[: -len(suffix)]
+            break
+
+    return word
+
+
+def analyze(text: str | None) -> list[str]:
+    """Index terms of a text, in order, duplicates kept for positions"""
+    if not text:
+        return []
+    return [
+        stem_arabic(word)
+        for word in WORD.findall(normalize_arabic(text))
+        if len(word) <= MAX_TERM_LENGTH
+    ]
+
+
+@dataclass(frozen=True)
+class SearchQuery:
+    """
+    A parsed search query
+
+    All terms must match. The last term also matches as a prefix unless the
+    query ends with whitespace, so results follow the user while typing.
+    """
+
+    terms: tuple[str, ...]
+    prefix: bool = False
+
+    def __bool__(self) -> bool:
+        return bool(self.terms)
+
+    def matches(self, term: str) -> bool:
+        """Whether an index term satisfies any query term"""
+        if term in self.terms:
+            return True
+        return self.prefix and term.startswith(self.terms[-1])
+
+
+def parse_query(text: str) -> SearchQuery:
+    """Analyze a query string with the indexing analyzer"""
+    terms = tuple(dict.fromkeys(analyze(text)))
+    return SearchQuery(terms=terms, prefix=bool(terms) and not text[-1:].isspace())
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# PostgreSQL literals
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+def to_tsvector_literal(terms: list[str]) -> str:
+    """
+    tsvector literal with positions for already analyzed terms
+
+    Built here rather than with to_tsvector() so the stored lexemes are
+    exactly the analyzer output, independent of the database text parser.
+    Terms only contain word characters, so they need no escaping.
+    """
+    positions: dict[str, list[str]] = {}
+    for position, term in enumerate(terms[:16383], start=1):
+        positions.setdefault(term, []).append(str(position))
+    return " ".join(f"'{term}':{','.join(pos)}" for term, pos in positions.items())
+
+
+def to_tsquery_literal(query: SearchQuery) -> str:
+    """tsquery literal requiring every term, the last one as a prefix"""
+    parts = [f"'{term}'" for term in query.terms]
+    if query.prefix:
+        parts[-1] += ":*"
+    return " & ".join(parts)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Highlighting
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+def highlight(
+    text: str | None,
+    query: SearchQuery,
+    context_words: int = 12,
+    start_tag: str = "<mark>",
+    end_tag: str = "</mark>",
+) -> str:
+    """
+    HTML-escaped snippet of ``text`` around the first match with matching
+    words wrapped in ``start_tag``/``end_tag``
+    """
+    if not text:
+        return ""
+
+    words = list(WORD.finditer(text))
+    if not words:
+        return html.escape(text)
+
+    hits = [i for i, w in enumerate(words) if query.matches(_term(w.group()))]
+    if not hits:
+        first, last = 0, min(len(words), 2 * context_words) - 1
+    else:
+        first = max(0, hits[0] - context_words // 2)
+        last = min(len(words) - 1, first + 2 * context_words - 1)
+
+    hit_set = set(hits)
+    start = 0 if first == 0 else words[first].start()
+    end = len(text) if last == len(words) - 1 else words[last].end()
+
+    parts = ["…"] if start > 0 else []
+    cursor = start
+    for i in range(first, last + 1):
+        word = words[i]
+        if i in hit_set:
+            parts.append(html.escape(text[cursor : word.start()]))
+            parts.append(f"{start_tag}{html.escape(word.group())}{end_tag}")
+            cursor = word.end()
+    parts.append(html.escape(text[cursor:end]))
+    if end < len(text):
+        parts.append("…")
+    return "".join(parts)
+
+
+def _term(word: str) -> str:
+    """Index term of a single original word"""
+    terms = analyze(word)
+    return terms[0] if terms else ""
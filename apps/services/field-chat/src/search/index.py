@@ -0,0 +1,500 @@
+"""
+Message Search Indexes
+فهرس البحث في الرسائل
+
+PostgreSQL keeps one row per message in ``chat_message_search`` with the
+analyzed text as a positional tsvector under a GIN index. The table is a read
+model written by ChatProjectionWorker from chat events (the field-chat-worker
+service). When the database is not PostgreSQL (tests, local SQLite) an
+embedded in-memory inverted index with the same interface is used instead,
+written by ChatRepository as messages are created.
+
+Results are ordered by relevance (rank, created_at, message_id) among the
+RANK_WINDOW most recent matches, or by recency (created_at, message_id), and
+paginated with an opaque keyset cursor, so later pages cost the same as the
+first.
+"""
+
+import base64
+import binascii
+import json
+import math
+from collections import Counter
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from uuid import UUID
+
+from tortoise import connections
+from tortoise.transactions import in_transaction
+from tortoise.expressions import Q
+
+from ..models import ChatMessage
+from .arabic import SearchQuery, analyze, to_tsquery_literal, to_tsvector_literal
+
+SEARCH_TABLE = "chat_message_search"
+
+ORDER_RELEVANCE = "relevance"
+ORDER_RECENT = "recent"
+SEARCH_ORDERS = (ORDER_RELEVANCE, ORDER_RECENT)
+
+# Relevance ranks this many most recent matches. A word found in most
+# messages would otherwise rank the whole tenant on every request.
+RANK_WINDOW = 10_000
+
+
+@dataclass(frozen=True)
+class SearchDocument:
+    """A message as the search index sees it"""
+
+    message_id: UUID
+    tenant_id: str
+    thread_id: UUID
+    sender_id: str
+    text: str | None
+    created_at: datetime
+    # When this text became current; later versions win, replays are no-ops
+    event_at: datetime | None = None
+
+    @classmethod
+    def from_message(cls, message: ChatMessage) -> "SearchDocument":
+        return cls(
+            message_id=message.id,
+            tenant_id=message.tenant_id,
+            thread_id=message.thread_id,
+            sender_id=message.sender_id,
+            text=message.text,
+            created_at=message.created_at,
+            event_at=message.edited_at or message.created_at,
+        )
+
+
+@dataclass
+class SearchHit:
+    """One search result; ``message`` and ``highlight`` are set by ChatRepository"""
+
+    message_id: UUID
+    created_at: datetime
+    rank: float
+    message: ChatMessage | None = None
+    highlight: str = ""
+
+
+@dataclass
+class SearchPage:
+    """A page of results and the cursor of the next page, if any"""
+
+    hits: list[SearchHit]
+    next_cursor: str | None = None
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Cursors
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+def encode_cursor(hit: SearchHit, order: str) -> str:
+    """Opaque cursor positioned after ``hit``"""
+    data = {"o": order, "t": hit.created_at.isoformat(), "id": str(hit.message_id)}
+    if order == ORDER_RELEVANCE:
+        data["r"] = hit.rank
+    raw = json.dumps(data, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, order: str) -> tuple[float | None, datetime, UUID]:
+    """(rank, created_at, message_id) of a cursor; ValueError if malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if data["o"] != order:
+            raise ValueError(f"cursor was issued for order={data['o']}")
+        rank = float(data["r"]) if order == ORDER_RELEVANCE else None
+        return rank, _utc(datetime.fromisoformat(data["t"])), UUID(data["id"])
+    except (binascii.Error, KeyError, TypeError, UnicodeDecodeError) as e:
+        raise ValueError("invalid search cursor") from e
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Index interface
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+class MessageSearchIndex:
+    """Common interface and pagination of the search backends"""
+
+    rank_window = RANK_WINDOW
+    # Written by the process that writes messages, not by the projection worker
+    in_process = False
+
+    async def ensure_schema(self) -> None:
+        """Create backing storage if needed"""
+
+    async def index(self, documents: list[SearchDocument]) -> None:
+        """Insert or replace documents, ignoring versions older than the stored one"""
+        raise NotImplementedError
+
+    async def update_text(self, message_id: UUID, text: str | None, event_at: datetime) -> bool:
+        """Re-index the text of an indexed message; False if unknown or stale"""
+        raise NotImplementedError
+
+    async def search(
+        self,
+        tenant_id: str,
+        query: SearchQuery,
+        thread_id: UUID | None = None,
+        sender_id: str | None = None,
+        limit: int = 50,
+        cursor: str | None = None,
+        order: str = ORDER_RELEVANCE,
+    ) -> SearchPage:
+        """
+        One page of messages matching every query term
+
+        Raises ValueError for an unknown order or a malformed cursor.
+        """
+        if order not in SEARCH_ORDERS:
+            raise ValueError(f"order must be one of {SEARCH_ORDERS}")
+        after = decode_cursor(cursor, order) if cursor else None
+        if not query:
+            return SearchPage(hits=[])
+
+        hits = await self._search(tenant_id, query, thread_id, sender_id, limit + 1, after, order)
+        if len(hits) <= limit:
+            return SearchPage(hits=hits)
+        hits = hits[:limit]
+        return SearchPage(hits=hits, next_cursor=encode_cursor(hits[-1], order))
+
+    async def _search(
+        self,
+        tenant_id: str,
+        query: SearchQuery,
+        thread_id: UUID | None,
+        sender_id: str | None,
+        limit: int,
+        after: tuple[float | None, datetime, UUID] | None,
+        order: str,
+    ) -> list[SearchHit]:
+        raise NotImplementedError
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# PostgreSQL
+# ─────────────────────────────────────────────────────────────────────────────
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} (
+    message_id UUID PRIMARY KEY,
+    tenant_id VARCHAR(64) NOT NULL,
+    thread_id UUID NOT NULL,
+    sender_id VARCHAR(64) NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL,
+    event_at TIMESTAMPTZ NOT NULL,
+    terms TSVECTOR NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_chat_message_search_terms
+    ON {SEARCH_TABLE} USING GIN (terms);
+CREATE INDEX IF NOT EXISTS idx_chat_message_search_recent
+    ON {SEARCH_TABLE} (tenant_id, created_at DESC, message_id DESC);
+"""
+
+_UPSERT = f"""
+INSERT INTO {SEARCH_TABLE} AS s
+    (message_id, tenant_id, thread_id, sender_id, created_at, event_at, terms)
+VALUES ($1, $2, $3, $4, $5, $6, CAST($7 AS tsvector))
+ON CONFLICT (message_id) DO UPDATE
+    SET terms = EXCLUDED.terms, event_at = EXCLUDED.event_at
+    WHERE s.event_at < EXCLUDED.event_at
+"""
+
+_UPDATE_TEXT = f"""
+UPDATE {SEARCH_TABLE}
+SET terms = CAST($2 AS tsvector), event_at = $3
+WHERE message_id = $1 AND event_at < $3
+RETURNING message_id
+"""
+
+# Cover density rank divided by 1 + log(document length)
+_RANK = "ts_rank_cd(terms, CAST($2 AS tsquery), 1)"
+
+
+class PostgresSearchIndex(MessageSearchIndex):
+    """tsvector + GIN index in the service database"""
+
+    def __init__(self, connection_name: str = "default"):
+        self.connection_name = connection_name
+
+    @property
+    def _db(self):
+        return connections.get(self.connection_name)
+
+    async def ensure_schema(self) -> None:
+        await self._db.execute_script(_SCHEMA)
+
+    async def index(self, documents: list[SearchDocument]) -> None:
+        if not documents:
+            return
+        await self._db.execute_many(
+            _UPSERT,
+            [
+                [
+                    d.message_id,
+                    d.tenant_id,
+                    d.thread_id,
+                    d.sender_id,
+                    _utc(d.created_at),
+                    _utc(d.event_at or d.created_at),
+                    to_tsvector_literal(analyze(d.text)),
+                ]
+                for d in documents
+            ],
+        )
+
+    async def update_text(self, message_id: UUID, text: str | None, event_at: datetime) -> bool:
+        updated, _ = await self._db.execute_query(
+            _UPDATE_TEXT, [message_id, to_tsvector_literal(analyze(text)), _utc(event_at)]
+        )
+        return updated > 0
+
+    async def _search(self, tenant_id, query, thread_id, sender_id, limit, after, order):
+        params: list = [tenant_id, to_tsquery_literal(query)]
+        filters = ["tenant_id = $1", "terms @@ CAST($2 AS tsquery)"]
+        if thread_id:
+            params.append(thread_id)
+            filters.append(f"thread_id = ${len(params)}")
+        if sender_id:
+            params.append(sender_id)
+            filters.append(f"sender_id = ${len(params)}")
+
+        if order == ORDER_RELEVANCE:
+            keyset = ""
+            if after:
+                params.extend(after)
+                n = len(params)
+                keyset = f"WHERE (rank, created_at, message_id) < (CAST(${n - 2} AS real), ${n - 1}, ${n})"
+            params.extend([self.rank_window, limit])
+            sql = f"""
+                SELECT message_id, created_at, rank
+                FROM (
+                    SELECT message_id, created_at, {_RANK} AS rank
+                    FROM (
+                        SELECT message_id, created_at, terms
+                        FROM {SEARCH_TABLE}
+                        WHERE {" AND ".join(filters)}
+                        ORDER BY created_at DESC, message_id DESC
+                        LIMIT ${len(params) - 1}
+                    ) AS recent
+                ) AS matches
+                {keyset}
+                ORDER BY rank DESC, created_at DESC, message_id DESC
+                LIMIT ${len(params)}
+            """
+        else:
+            if after:
+                params.extend(after[1:])
+                n = len(params)
+                filters.append(f"(created_at, message_id) < (${n - 1}, ${n})")
+            params.append(limit)
+            # Rank only the page, not every match
+            sql = f"""
+                SELECT message_id, created_at, {_RANK} AS rank
+                FROM (
+                    SELECT message_id, created_at, terms
+                    FROM {SEARCH_TABLE}
+                    WHERE {" AND ".join(filters)}
+                    ORDER BY created_at DESC, message_id DESC
+                    LIMIT ${len(params)}
+                ) AS page
+                ORDER BY created_at DESC, message_id DESC
+            """
+
+        # A cached generic plan cannot tell a rare term from a common one and
+        # walks the recency index for both; plan each search for its terms.
+        async with in_transaction(self.connection_name) as db:
+            await db.execute_script("SET LOCAL plan_cache_mode = force_custom_plan")
+            rows = await db.execute_query_dict(sql, params)
+        return [
+            SearchHit(
+                message_id=row["message_id"],
+                created_at=row["created_at"],
+                rank=float(row["rank"]),
+            )
+            for row in rows
+        ]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Embedded fallback
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+@dataclass
+class _IndexedMessage:
+    tenant_id: str
+    thread_id: UUID
+    sender_id: str
+    created_at: datetime
+    event_at: datetime
+    terms: Counter
+    length: int
+
+
+class MemorySearchIndex(MessageSearchIndex):
+    """
+    In-process inverted index with the PostgreSQL index semantics
+
+    A tenant is loaded from chat_messages the first time it is searched and
+    kept current by index()/update_text() afterwards, which ChatRepository
+    calls for the messages it writes. Ranks are on a similar scale but not
+    identical to ts_rank_cd.
+    """
+
+    in_process = True
+
+    def __init__(self):
+        self._messages: dict[UUID, _IndexedMessage] = {}
+        self._postings: dict[str, dict[str, set[UUID]]] = {}
+        self._loaded_tenants: set[str] = set()
+
+    async def index(self, documents: list[SearchDocument]) -> None:
+        for d in documents:
+            self._put(
+                d.message_id,
+                d.tenant_id,
+                d.thread_id,
+                d.sender_id,
+                _utc(d.created_at),
+                _utc(d.event_at or d.created_at),
+                d.text,
+            )
+
+    async def update_text(self, message_id: UUID, text: str | None, event_at: datetime) -> bool:
+        current = self._messages.get(message_id)
+        if current is None:
+            return False
+        return self._put(
+            message_id,
+            current.tenant_id,
+            current.thread_id,
+            current.sender_id,
+            current.created_at,
+            _utc(event_at),
+            text,
+        )
+
+    def _put(self, message_id, tenant_id, thread_id, sender_id, created_at, event_at, text):
+        current = self._messages.get(message_id)
+        if current is not None:
+            if current.event_at >= event_at:
+                return False
+            postings = self._postings[current.tenant_id]
+            for term in current.terms:
+                postings[term].discard(message_id)
+
+        terms = analyze(text)
+        counts = Counter(terms)
+        self._messages[message_id] = _IndexedMessage(
+            tenant_id=tenant_id,
+            thread_id=thread_id,
+            sender_id=sender_id,
+            created_at=created_at,
+            event_at=event_at,
+            terms=counts,
+            length=len(terms),
+        )
+        postings = self._postings.setdefault(tenant_id, {})
+        for term in counts:
+            postings.setdefault(term, set()).add(message_id)
+        return True
+
+    async def _search(self, tenant_id, query, thread_id, sender_id, limit, after, order):
+        if tenant_id not in self._loaded_tenants:
+            self._loaded_tenants.add(tenant_id)
+            await reindex_messages(self, tenant_id=tenant_id)
+
+        postings = self._postings.get(tenant_id, {})
+        candidates: set[UUID] | None = None
+        for i, term in enumerate(query.terms):
+            if query.prefix and i == len(query.terms) - 1:
+                ids = set().union(*(v for t, v in postings.items() if t.startswith(term)))
+            else:
+                ids = postings.get(term, set())
+            candidates = ids if candidates is None else candidates & ids
+
+        hits = []
+        for message_id in candidates or ():
+            m = self._messages[message_id]
+            if thread_id and m.thread_id != thread_id:
+                continue
+            if sender_id and m.sender_id != sender_id:
+                continue
+            matched = sum(n for term, n in m.terms.items() if query.matches(term))
+            rank = matched / (1 + math.log(m.length))
+            hits.append(SearchHit(message_id=message_id, created_at=m.created_at, rank=rank))
+
+        if order == ORDER_RELEVANCE:
+            hits.sort(key=lambda h: (h.created_at, str(h.message_id)), reverse=True)
+            hits = hits[: self.rank_window]
+            key = lambda h: (h.rank, h.created_at, str(h.message_id))  # noqa: E731
+        else:
+            key = lambda h: (h.created_at, str(h.message_id))  # noqa: E731
+        if after:
+            rank, created_at, message_id = after
+            position = (created_at, str(message_id))
+            if order == ORDER_RELEVANCE:
+                position = (rank, *position)
+            hits = [h for h in hits if key(h) < position]
+        return sorted(hits, key=key, reverse=True)[:limit]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Helpers
+# ─────────────────────────────────────────────────────────────────────────────
+
+_search_index: MessageSearchIndex | None = None
+
+
+def get_search_index() -> MessageSearchIndex:
+    """The index for the default connection: PostgreSQL, otherwise embedded"""
+    global _search_index
+    if _search_index is None:
+        if connections.get("default").capabilities.dialect == "postgres":
+            _search_index = PostgresSearchIndex()
+        else:
+            _search_index = MemorySearchIndex()
+    return _search_index
+
+
+async def reindex_messages(
+    index: MessageSearchIndex,
+    tenant_id: str | None = None,
+    batch_size: int = 1000,
+) -> int:
+    """
+    Feed existing messages to ``index`` in (created_at, id) batches
+
+    Used to build the index for data written before it existed; safe to run
+    while the projection worker is live. Returns the number of messages read.
+    """
+    base = ChatMessage.all()
+    if tenant_id:
+        base = base.filter(tenant_id=tenant_id)
+
+    total = 0
+    last: ChatMessage | None = None
+    while True:
+        query = base
+        if last is not None:
+            query = query.filter(
+                Q(created_at__gt=last.created_at) | Q(created_at=last.created_at, id__gt=last.id)
+            )
+        batch = await query.order_by("created_at", "id").limit(batch_size)
+        if not batch:
+            return total
+        await index.index([SearchDocument.from_message(m) for m in batch])
+        total += len(batch)
+        last = batch[-1]
+
+
+def _utc(value: datetime) -> datetime:
+    """Naive timestamps are UTC"""
+    return value.replace(tzinfo=UTC) if value.tzinfo is None else value
@@ -100,11 +100,17 @@ def clean_db():
         try:
             from src.models import (
                 ChatAttachment,
+                ChatEvent,
+                ChatInboxEntry,
+                ChatInboxThread,
                 ChatMessage,
                 ChatParticipant,
                 ChatThread,
             )
 
+            await ChatEvent.all().delete()
+            await ChatInboxEntry.all().delete()
+            await ChatInboxThread.all().delete()
             await ChatMessage.all().delete()
             await ChatParticipant.all().delete()
             await ChatAttachment.all().delete()
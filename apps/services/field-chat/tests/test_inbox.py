@@ -0,0 +1,247 @@
+"""
+Tests for the Field Chat Inbox Read Model
+"""
+
+import json
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+
+async def _inbox(repo, user_id, tenant_id="tenant-1"):
+    return {
+        e.title: (e.unread_count, e.message_count, e.last_message_preview)
+        for e in await repo.get_inbox(tenant_id, user_id)
+    }
+
+
+class TestInboxProjection:
+    """Test the inbox built from the event log"""
+
+    @pytest.fixture
+    def projector(self):
+        from src.projections import InboxProjector
+
+        return InboxProjector(batch_size=2)
+
+    @pytest.fixture
+    def repo(self, db_available, projector):
+        from src.repository import ChatRepository
+        from src.search import MemorySearchIndex
+
+        return ChatRepository(search_index=MemorySearchIndex(), inbox=projector)
+
+    async def _seed(self, repo):
+        field, _ = await repo.get_or_create_thread("tenant-1", "field", "f-1", "user-1", "Field")
+        task, _ = await repo.get_or_create_thread("tenant-1", "task", "t-1", "user-1", "Task")
+        for thread in (field, task):
+            await repo.add_participant("tenant-1", thread.id, "user-2")
+        await repo.create_message("tenant-1", field.id, "user-1", text="بدأ الري")
+        await repo.create_message("tenant-1", field.id, "user-1", text="انتهى الري")
+        await repo.create_message("tenant-1", task.id, "user-2", text="Done")
+        return field, task
+
+    @pytest.mark.asyncio
+    async def test_previews_unread_and_order(self, repo, projector):
+        """Other participants' unread counts grow, latest thread first"""
+        field, task = await self._seed(repo)
+
+        assert await _inbox(repo, "user-2") == {
+            "Task": (0, 1, "Done"),
+            "Field": (2, 2, "انتهى الري"),
+        }
+        assert [t.id for t in await repo.list_threads("tenant-1", user_id="user-2")] == [
+            task.id,
+            field.id,
+        ]
+        assert await repo.get_unread_counts("tenant-1", "user-1") == {
+            str(field.id): 0,
+            str(task.id): 1,
+        }
+        # Each write caught its thread up, so no worker is needed
+        assert await projector.catch_up_pending() == 0
+
+    @pytest.mark.asyncio
+    async def test_sweep_applies_events_left_behind(self, repo, projector):
+        """Events whose catch-up failed after commit are applied by the sweep"""
+        from src.models import ChatInboxEntry, ChatInboxThread
+
+        await self._seed(repo)
+        await ChatInboxEntry.all().delete()
+        await ChatInboxThread.all().delete()
+
+        assert await projector.catch_up_pending() == 9
+        assert (await _inbox(repo, "user-2"))["Field"] == (2, 2, "انتهى الري")
+
+    @pytest.mark.asyncio
+    async def test_mark_read_is_immediate(self, repo, projector):
+        """Reading clears the row at once and stays cleared after projection"""
+        field, _ = await self._seed(repo)
+        await projector.catch_up_pending()
+
+        await repo.mark_read(field.id, "user-2")
+        assert (await _inbox(repo, "user-2"))["Field"][0] == 0
+
+        await repo.create_message("tenant-1", field.id, "user-1", text="تذكير")
+        await projector.catch_up(field.id)
+        assert (await _inbox(repo, "user-2"))["Field"] == (1, 3, "تذكير")
+
+    @pytest.mark.asyncio
+    async def test_redelivery_applies_once(self, repo, projector):
+        """Duplicate NATS messages trigger catch-ups that find nothing new"""
+        from src.projections.worker import ChatProjectionWorker
+
+        field, _ = await self._seed(repo)
+        worker = ChatProjectionWorker(search_index=repo.search_index, inbox=projector)
+        data = {
+            "tenant_id": "tenant-1",
+            "timestamp": datetime.now(UTC).isoformat(),
+            "payload": {"thread_id": str(field.id), "message_id": str(uuid4()), "sender_id": "u"},
+        }
+        msg = SimpleNamespace(data=json.dumps(data).encode())
+
+        for _ in range(3):
+            await worker._handle_message_sent(msg)
+
+        assert (await _inbox(repo, "user-2"))["Field"][0] == 2
+        assert await projector.catch_up(field.id) == 0
+
+    @pytest.mark.asyncio
+    async def test_rebuild_matches_incremental(self, repo, projector):
+        """Replaying the log gives the same inbox, departures and archives included"""
+        field, task = await self._seed(repo)
+        await projector.catch_up_pending()
+        await repo.add_participant("tenant-1", field.id, "user-3")
+        await projector.catch_up(field.id)
+        await repo.remove_participant(task.id, "user-2")
+        await repo.mark_read(field.id, "user-2")
+        await repo.archive_thread(task.id, "tenant-1")
+        await projector.catch_up_pending()
+        expected = {user: await _inbox(repo, user) for user in ("user-1", "user-2", "user-3")}
+
+        assert expected == {
+            "user-1": {"Field": (0, 2, "انتهى الري")},
+            "user-2": {"Field": (0, 2, "انتهى الري")},
+            "user-3": {"Field": (0, 2, "انتهى الري")},
+        }
+        assert await projector.rebuild() == 13
+        assert {user: await _inbox(repo, user) for user in expected} == expected
+
+    @pytest.mark.asyncio
+    async def test_backfill_existing_threads(self, repo, projector):
+        """Threads from before the event log enter the inbox as they were"""
+        from src.models import ChatMessage, ChatParticipant, ChatThread
+        from src.projections import backfill_events
+
+        thread = await ChatThread.create(
+            tenant_id="tenant-1",
+            scope_type="incident",
+            scope_id="i-1",
+            created_by="user-1",
+            title="Incident",
+            message_count=7,
+        )
+        await ChatParticipant.create(tenant_id="tenant-1", thread_id=thread.id, user_id="user-2")
+        await ChatParticipant.create(
+            tenant_id="tenant-1", thread_id=thread.id, user_id="user-3", unread_count=4
+        )
+        now = datetime.now(UTC)
+        for i, text in enumerate(("أول", "آخر")):
+            message = await ChatMessage.create(
+                tenant_id="tenant-1", thread_id=thread.id, sender_id="user-2", text=text
+            )
+            message.created_at = now + timedelta(minutes=i)
+            await message.save(update_fields=["created_at"])
+
+        assert await backfill_events() == 1
+        assert await backfill_events() == 0
+        await projector.rebuild("tenant-1")
+
+        assert await _inbox(repo, "user-3") == {"Incident": (4, 7, "آخر")}
+        assert await _inbox(repo, "user-2") == {"Incident": (0, 7, "آخر")}
+
+
+class TestEventSchema:
+    """Test the PostgreSQL DDL of the event log and inbox"""
+
+    @pytest.mark.parametrize("model", ["ChatEvent", "ChatInboxThread", "ChatInboxEntry"])
+    def test_ddl_covers_model_columns(self, model):
+        """Every model column is created by ensure_schema"""
+        from src import models
+        from src.events.store import _SCHEMA
+
+        cls = getattr(models, model)
+        table = _SCHEMA.split(f"CREATE TABLE IF NOT EXISTS {cls._meta.db_table} (")[1]
+        table = table.split(");")[0]
+        columns = {line.split()[0] for line in table.strip().splitlines()}
+        assert set(cls._meta.db_fields) <= columns
+
+    def test_adds_thread_event_seq(self):
+        from src.events.store import _SCHEMA
+
+        assert "ALTER TABLE chat_threads ADD COLUMN IF NOT EXISTS event_seq" in _SCHEMA
+
+    @pytest.mark.asyncio
+    async def test_noop_outside_postgres(self, db_available):
+        from src.events.store import ensure_schema
+
+        await ensure_schema()
+
+
+class TestInboxEndpoint:
+    """Test the inbox API response"""
+
+    def test_empty_inbox(self):
+        from fastapi.testclient import TestClient
+
+        from src.main import app
+
+        response = TestClient(app).get(
+            "/chat/inbox", params={"tenant_id": "tenant-empty", "user_id": "user-1"}
+        )
+
+        assert response.status_code == 200
+        assert response.json() == []
+
+    def test_writes_show_up_without_the_worker(self, db_available):
+        """Threads, unread counts and inbox read back through the API at once"""
+        from unittest.mock import AsyncMock
+
+        from fastapi.testclient import TestClient
+
+        from src.api import get_publisher
+        from src.main import app
+
+        # No NATS here: the publisher is a no-op and nothing projects the events
+        app.dependency_overrides[get_publisher] = lambda: AsyncMock()
+        try:
+            client = TestClient(app)
+            thread = client.post(
+                "/chat/threads",
+                json={
+                    "tenant_id": "t1",
+                    "scope_type": "field",
+                    "scope_id": "f-1",
+                    "created_by": "u1",
+                },
+            ).json()
+            thread_id = thread["thread_id"]
+            client.post(
+                f"/chat/threads/{thread_id}/participants", json={"tenant_id": "t1", "user_id": "u2"}
+            )
+            client.post(
+                f"/chat/threads/{thread_id}/messages",
+                json={"tenant_id": "t1", "sender_id": "u1", "text": "بدأ الري"},
+            )
+
+            threads = client.get("/chat/threads", params={"tenant_id": "t1", "user_id": "u2"})
+            unread = client.get("/chat/unread-counts", params={"tenant_id": "t1", "user_id": "u2"})
+            inbox = client.get("/chat/inbox", params={"tenant_id": "t1", "user_id": "u2"})
+        finally:
+            app.dependency_overrides.pop(get_publisher)
+
+        assert [t["thread_id"] for t in threads.json()] == [thread_id]
+        assert unread.json() == {"total_unread": 1, "threads": {thread_id: 1}}
+        assert inbox.json()[0]["last_message_preview"] == "بدأ الري"
@@ -0,0 +1,224 @@
+"""
+Tests for Field Chat Message Search
+"""
+
+import json
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+
+class TestArabicAnalyzer:
+    """Test normalization, stemming and query parsing"""
+
+    def test_spelling_variants_share_terms(self):
+        """Hamza, tashkeel, tatweel and articles do not affect terms"""
+        from src.search import analyze
+
+        assert analyze("الأمطار") == analyze("امطار") == analyze("والامطار") == ["امطار"]
+        assert analyze("مَزْرَعَةٌ") == analyze("المزرعة") == analyze("مزرعـــة")
+        assert analyze("بالمزارعين") == analyze("المزارعون")
+        assert analyze("٢٠٢٥ Irrigation") == ["2025", "irrigation"]
+
+    def test_parse_query(self):
+        """Last term is a prefix while the user is still typing"""
+        from src.search import parse_query
+
+        query = parse_query("الأمطار الغز")
+        assert query.terms == ("امطار", "غز")
+        assert query.prefix
+        assert query.matches("غزير")
+        assert not parse_query("الأمطار ").prefix
+        assert not parse_query("؟!")
+
+    def test_highlight(self):
+        """Matches are marked in the original text, the rest is escaped"""
+        from src.search import highlight, parse_query
+
+        snippet = highlight("هطلت الأَمطار <b>الغزيرة</b> على الحقول", parse_query("امطار"))
+
+        assert "<mark>الأَمطار</mark>" in snippet
+        assert "&lt;b&gt;" in snippet
+        assert snippet.count("<mark>") == 1
+
+
+class TestMemorySearchIndex:
+    """Test the embedded index through ChatRepository"""
+
+    @pytest.fixture
+    def repo(self, db_available):
+        from src.repository import ChatRepository
+        from src.search import MemorySearchIndex
+
+        return ChatRepository(search_index=MemorySearchIndex())
+
+    async def _seed(self, repo):
+        from src.models import ChatMessage
+
+        thread, _ = await repo.get_or_create_thread("tenant-1", "field", "f-1", "user-1")
+        other, _ = await repo.get_or_create_thread("tenant-1", "task", "t-1", "user-1")
+        texts = [
+            (thread, "بدأت الأمطار في الحقل الشمالي"),
+            (thread, "الامطار غزيرة اليوم، أوقفوا الري"),
+            (other, "تأجيل الري بسبب المطر"),
+            (other, "هل توقفت الأمطار؟ الأمطار مستمرة عندنا"),
+            (thread, "Irrigation pump repaired"),
+        ]
+        start = datetime.now(UTC) - timedelta(hours=1)
+        for i, (t, text) in enumerate(texts):
+            message = await ChatMessage.create(
+                tenant_id="tenant-1", thread_id=t.id, sender_id="user-2", text=text
+            )
+            message.created_at = start + timedelta(minutes=i)
+            await message.save(update_fields=["created_at"])
+        await ChatMessage.create(
+            tenant_id="tenant-2", thread_id=thread.id, sender_id="u", text="مطر"
+        )
+        return thread, other
+
+    @pytest.mark.asyncio
+    async def test_search_ranks_and_highlights(self, repo):
+        """Spelling variants match within the tenant, best match first"""
+        await self._seed(repo)
+
+        page = await repo.search_messages("tenant-1", "أمطار ")
+
+        assert len(page.hits) == 3
+        assert page.hits[0].message.text.startswith("هل توقفت")
+        assert page.hits[0].rank > page.hits[-1].rank
+        assert all("<mark>" in hit.highlight for hit in page.hits)
+        assert page.next_cursor is None
+
+    @pytest.mark.asyncio
+    async def test_keyset_pagination(self, repo):
+        """Pages follow each other without gaps or repeats"""
+        thread, _ = await self._seed(repo)
+
+        for order in ("relevance", "recent"):
+            seen, cursor = [], None
+            while True:
+                page = await repo.search_messages(
+                    "tenant-1", "الامطار", limit=1, cursor=cursor, order=order
+                )
+                seen.extend(hit.message_id for hit in page.hits)
+                cursor = page.next_cursor
+                if cursor is None:
+                    break
+            assert len(seen) == len(set(seen)) == 3
+
+        recent = await repo.search_messages("tenant-1", "ري", order="recent")
+        assert [h.message.text[:5] for h in recent.hits] == ["تأجيل", "الامط"]
+
+        in_thread = await repo.search_messages("tenant-1", "امطار", thread_id=thread.id)
+        assert len(in_thread.hits) == 2
+
+    @pytest.mark.asyncio
+    async def test_relevance_window(self, repo):
+        """Relevance only ranks the most recent matches"""
+        await self._seed(repo)
+        repo.search_index.rank_window = 2
+
+        page = await repo.search_messages("tenant-1", "امطار")
+
+        assert [h.message.text[:5] for h in page.hits] == ["هل تو", "الامط"]
+
+    @pytest.mark.asyncio
+    async def test_new_messages_found_after_load(self, repo):
+        """Messages created after the tenant was loaded are searchable at once"""
+        from src.repository import ChatRepository
+
+        thread, _ = await self._seed(repo)
+        assert len((await repo.search_messages("tenant-1", "مبيد")).hits) == 0
+
+        message = await repo.create_message("tenant-1", thread.id, "user-1", text="رش المبيد غداً")
+
+        for reader in (repo, ChatRepository(search_index=repo.search_index)):
+            page = await reader.search_messages("tenant-1", "المبيد")
+            assert [h.message.id for h in page.hits] == [message.id]
+
+    @pytest.mark.asyncio
+    async def test_invalid_cursor(self, repo):
+        """A cursor from another order or garbage is rejected"""
+        await self._seed(repo)
+        page = await repo.search_messages("tenant-1", "امطار", limit=1)
+
+        with pytest.raises(ValueError):
+            await repo.search_messages("tenant-1", "امطار", cursor=page.next_cursor, order="recent")
+        with pytest.raises(ValueError):
+            await repo.search_messages("tenant-1", "امطار", cursor="not-a-cursor")
+
+
+class TestSearchProjection:
+    """Test that the projection worker maintains the index"""
+
+    @staticmethod
+    def _msg(tenant_id, timestamp, **payload):
+        data = {"tenant_id": tenant_id, "timestamp": timestamp, "payload": payload}
+        return SimpleNamespace(data=json.dumps(data).encode())
+
+    @pytest.mark.asyncio
+    async def test_sent_and_edited_events(self):
+        """Edits replace the text; replayed older events are ignored"""
+        from src.projections.worker import ChatProjectionWorker
+        from src.search import MemorySearchIndex, parse_query
+
+        index = MemorySearchIndex()
+        index._loaded_tenants.add("tenant-1")  # No database behind this test
+        worker = ChatProjectionWorker(search_index=index)
+        message_id, thread_id = str(uuid4()), str(uuid4())
+        sent_at = datetime.now(UTC)
+        sent = self._msg(
+            "tenant-1",
+            sent_at.isoformat(),
+            message_id=message_id,
+            thread_id=thread_id,
+            sender_id="user-1",
+            text="رش المبيد غداً",
+        )
+        edited = self._msg(
+            "tenant-1",
+            (sent_at + timedelta(minutes=1)).isoformat(),
+            message_id=message_id,
+            thread_id=thread_id,
+            new_text="رش السماد غداً",
+        )
+
+        await worker._handle_message_sent(sent)
+        assert len((await index.search("tenant-1", parse_query("المبيد"))).hits) == 1
+
+        await worker._handle_message_edited(edited)
+        await worker._handle_message_sent(sent)  # Redelivered
+        assert not (await index.search("tenant-1", parse_query("المبيد"))).hits
+        assert len((await index.search("tenant-1", parse_query("سماد"))).hits) == 1
+
+
+class TestSearchEndpoint:
+    """Test the search API response"""
+
+    @pytest.fixture
+    def client(self):
+        from fastapi.testclient import TestClient
+
+        from src.main import app
+
+        return TestClient(app)
+
+    def test_search_page_shape(self, client):
+        """Results come wrapped in a page with a cursor"""
+        response = client.get(
+            "/chat/messages/search", params={"tenant_id": "tenant-empty", "q": "الأمطار"}
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {"results": [], "next_cursor": None}
+
+    def test_invalid_cursor(self, client):
+        """A malformed cursor is a 400, not a 500"""
+        response = client.get(
+            "/chat/messages/search",
+            params={"tenant_id": "tenant-1", "q": "الأمطار", "cursor": "garbage"},
+        )
+
+        assert response.status_code == 400
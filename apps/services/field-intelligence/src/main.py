@@ -53,6 +53,8 @@ except ImportError:
         pass
 
 
+from shared.integration import DeadlineMiddleware, close_upstreams
+
 from .api.routes import router
 from .services.event_processor import EventProcessor
 from .services.rules_engine import RulesEngine
@@ -112,6 +114,7 @@ async def lifespan(app: FastAPI):
 
     # إغلاق الاتصالات
     await event_processor.close()
+    await close_upstreams()
 
     logger.info("✓ Field Intelligence Service stopped")
 
@@ -162,6 +165,9 @@ app = FastAPI(
 setup_exception_handlers(app)
 add_request_id_middleware(app)
 
+# مهلة الطلب الواردة تُنقل إلى استدعاءات الخدمات - Propagate request deadlines
+app.add_middleware(DeadlineMiddleware)
+
 # CORS - استخدام الإعداد المركزي الآمن
 setup_cors_middleware(app)
 
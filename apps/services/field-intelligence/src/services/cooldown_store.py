@@ -0,0 +1,125 @@
+"""
+مخزن فترات التهدئة للقواعد - Rule Cooldown Store
+=================================================
+
+يحفظ آخر تفعيل لكل قاعدة حتى لا تتكرر الإجراءات خلال فترة التهدئة.
+Tracks when each rule last fired so its actions are not repeated within
+the rule's cooldown period.
+
+- InMemoryCooldownStore: لكل عملية (نسخة واحدة من الخدمة)
+- RedisCooldownStore: مشترك بين كل نسخ الخدمة (SET NX PX ذري)
+"""
+
+import logging
+import os
+from datetime import UTC, datetime, timedelta
+from typing import Any, Protocol
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.getenv("REDIS_URL", "")
+COOLDOWN_KEY_PREFIX = os.getenv("RULES_COOLDOWN_KEY_PREFIX", "sahool:field-intelligence:cooldown:")
+
+
+class CooldownStore(Protocol):
+    """واجهة مخزن التهدئة - Cooldown store interface"""
+
+    async def try_acquire(self, rule_id: str, cooldown_minutes: int) -> bool:
+        """Start the rule's cooldown; False if it is already cooling down"""
+        ...
+
+    async def active_count(self) -> int: ...
+
+    async def close(self) -> None: ...
+
+
+class InMemoryCooldownStore:
+    """
+    مخزن تهدئة داخل العملية
+    Per-process cooldown store (single service replica)
+    """
+
+    def __init__(self):
+        self.last_triggered: dict[str, datetime] = {}
+
+    async def try_acquire(self, rule_id: str, cooldown_minutes: int) -> bool:
+        now = datetime.now(UTC)
+        last = self.last_triggered.get(rule_id)
+        if last is not None:
+            cooldown_end = last + timedelta(minutes=cooldown_minutes)
+            if now < cooldown_end:
+                remaining_minutes = (cooldown_end - now).total_seconds() / 60
+                logger.debug(
+                    f"⏸️ القاعدة {rule_id} في فترة تهدئة. متبقي {remaining_minutes:.1f} دقيقة"
+                )
+                return False
+        self.last_triggered[rule_id] = now
+        return True
+
+    async def active_count(self) -> int:
+        return len(self.last_triggered)
+
+    async def close(self) -> None:
+        pass
+
+
+class RedisCooldownStore:
+    """
+    مخزن تهدئة موزع عبر Redis
+    Cooldown store shared by all service replicas
+
+    Each cooldown is a key written with SET NX PX: the first replica to
+    match a rule starts its cooldown and fires it, the others see the key
+    and skip. Redis expires the key when the cooldown ends.
+
+    Args:
+        client: عميل redis.asyncio
+        key_prefix: بادئة المفاتيح
+    """
+
+    def __init__(self, client: Any, key_prefix: str = COOLDOWN_KEY_PREFIX):
+        self.client = client
+        self.key_prefix = key_prefix
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs: Any) -> "RedisCooldownStore":
+        import redis.asyncio as redis
+
+        return cls(redis.from_url(url, decode_responses=True), **kwargs)
+
+    async def try_acquire(self, rule_id: str, cooldown_minutes: int) -> bool:
+        if cooldown_minutes <= 0:
+            return True
+        acquired = await self.client.set(
+            f"{self.key_prefix}{rule_id}",
+            datetime.now(UTC).isoformat(),
+            nx=True,
+            px=cooldown_minutes * 60_000,
+        )
+        if not acquired:
+            logger.debug(f"⏸️ القاعدة {rule_id} في فترة تهدئة (Redis)")
+        return bool(acquired)
+
+    async def active_count(self) -> int:
+        count = 0
+        async for _ in self.client.scan_iter(match=f"{self.key_prefix}*", count=1000):
+            count += 1
+        return count
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+def create_cooldown_store(redis_url: str = REDIS_URL) -> CooldownStore:
+    """
+    إنشاء مخزن التهدئة حسب الإعدادات
+    Redis-backed when REDIS_URL is set, in-memory otherwise
+    """
+    if redis_url:
+        try:
+            store = RedisCooldownStore.from_url(redis_url)
+            logger.info("✅ فترات التهدئة مشتركة عبر Redis - Redis cooldown store")
+            return store
+        except ImportError:
+            logger.warning("⚠️ redis غير مثبت، استخدام الذاكرة المحلية - redis not installed")
+    return InMemoryCooldownStore()
@@ -0,0 +1,496 @@
+"""
+مترجم القواعد وفهرس التوزيع - Rule Compiler and Dispatch Index
+==============================================================
+
+يحوّل شروط القواعد إلى دوال جاهزة مرة واحدة بدلاً من تفسيرها لكل حدث.
+Compiles rule conditions into predicate closures once, instead of
+interpreting operators and field paths for every event.
+
+- compile_rule: شروط → دالة (operator, path getter and thresholds bound once)
+- RuleIndex: فهرس حسب نوع الحدث والحقل ومسار البيانات، فتُقيَّم القواعد المرشحة فقط
+- RuleIndex.match_batch: تقييم متجه (NumPy) لشروط العتبات الرقمية لدفعة أحداث
+"""
+
+import logging
+import operator
+from collections import defaultdict
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass, replace
+from enum import Enum
+from itertools import chain
+from typing import Any
+
+from ..models.rules import ConditionOperator, Rule, RuleCondition, RuleConditionGroup, RuleStatus
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional
+    np = None
+
+logger = logging.getLogger(__name__)
+
+Predicate = Callable[[Any], bool]
+
+# حجم كتلة التقييم المتجه (أحداث × شروط) - Cells per vectorized block
+BATCH_BLOCK_CELLS = 2_000_000
+
+_NUMERIC_OPERATORS = {
+    ConditionOperator.GREATER_THAN: operator.gt,
+    ConditionOperator.LESS_THAN: operator.lt,
+    ConditionOperator.GREATER_EQUAL: operator.ge,
+    ConditionOperator.LESS_EQUAL: operator.le,
+}
+
+
+def _never(event: Any) -> bool:
+    return False
+
+
+def _always(event: Any) -> bool:
+    return True
+
+
+def _plain(value: Any) -> Any:
+    """قيمة Enum → قيمتها الخام - Enum members compare by value"""
+    return value.value if isinstance(value, Enum) else value
+
+
+def _as_float(value: Any) -> float | None:
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Compilation - الترجمة
+# ═══════════════════════════════════════════════════════════════════════════════
+
+
+_getters: dict[str, Callable[[Any], Any]] = {}
+
+
+def compile_getter(field_path: str) -> Callable[[Any], Any]:
+    """
+    ترجمة مسار الحقل (مثل metadata.current_ndvi) إلى دالة استخراج
+    Compile a dotted field path into a value getter
+
+    Same lookup as the interpreted engine: dict keys for dicts, attributes
+    otherwise, None as soon as a part is missing.
+    """
+    getter = _getters.get(field_path)
+    if getter is not None:
+        return getter
+
+    parts = tuple(field_path.split("."))
+
+    def step(value: Any, part: str) -> Any:
+        return value.get(part) if isinstance(value, dict) else getattr(value, part, None)
+
+    if len(parts) == 1:
+        (name,) = parts
+
+        def getter(event: Any) -> Any:
+            return step(event, name)
+
+    elif len(parts) == 2:
+        outer, inner = parts
+
+        def getter(event: Any) -> Any:
+            value = step(event, outer)
+            return None if value is None else step(value, inner)
+
+    else:
+
+        def getter(event: Any) -> Any:
+            value = event
+            for part in parts:
+                value = step(value, part)
+                if value is None:
+                    return None
+            return value
+
+    _getters[field_path] = getter
+    return getter
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledCondition:
+    """
+    شرط مترجم
+    Compiled condition
+
+    ``interval`` is set for numeric threshold operators as
+    (low, high, low_inclusive, high_inclusive), which lets a batch of
+    events be tested against many thresholds at once.
+    """
+
+    field: str
+    predicate: Predicate
+    interval: tuple[float, float, bool, bool] | None = None
+
+
+def compile_condition(condition: RuleCondition) -> CompiledCondition:
+    """
+    ترجمة شرط واحد إلى دالة
+    Compile a single condition into a predicate
+
+    Matches the interpreted semantics: a missing field or a value that
+    cannot be compared never matches.
+    """
+    get = compile_getter(condition.field)
+    op = condition.operator
+    expected = condition.value
+
+    if op == ConditionOperator.EQUALS:
+
+        def predicate(event: Any) -> bool:
+            value = get(event)
+            return value is not None and value == expected
+
+        return CompiledCondition(condition.field, predicate)
+
+    if op == ConditionOperator.NOT_EQUALS:
+
+        def predicate(event: Any) -> bool:
+            value = get(event)
+            return value is not None and value != expected
+
+        return CompiledCondition(condition.field, predicate)
+
+    if op in _NUMERIC_OPERATORS:
+        bound = _as_float(expected)
+        if bound is None:
+            return CompiledCondition(condition.field, _never)
+        compare = _NUMERIC_OPERATORS[op]
+
+        def predicate(event: Any) -> bool:
+            value = _as_float(get(event))
+            return value is not None and compare(value, bound)
+
+        inf = float("inf")
+        interval = {
+            ConditionOperator.GREATER_THAN: (bound, inf, False, True),
+            ConditionOperator.GREATER_EQUAL: (bound, inf, True, True),
+            ConditionOperator.LESS_THAN: (-inf, bound, True, False),
+            ConditionOperator.LESS_EQUAL: (-inf, bound, True, True),
+        }[op]
+        return CompiledCondition(condition.field, predicate, interval)
+
+    if op == ConditionOperator.BETWEEN:
+        if not (
+            isinstance(expected, list)
+            and len(expected) == 2
+            and all(isinstance(b, int | float) for b in expected)
+        ):
+            return CompiledCondition(condition.field, _never)
+        low, high = expected
+
+        def predicate(event: Any) -> bool:
+            value = _as_float(get(event))
+            return value is not None and low <= value <= high
+
+        return CompiledCondition(condition.field, predicate, (low, high, True, True))
+
+    if op == ConditionOperator.CONTAINS:
+        if not isinstance(expected, str):
+            return CompiledCondition(condition.field, _never)
+
+        def predicate(event: Any) -> bool:
+            value = get(event)
+            return value is not None and expected in str(value)
+
+        return CompiledCondition(condition.field, predicate)
+
+    if op == ConditionOperator.IN:
+        try:
+            members = frozenset(_plain(item) for item in expected)
+        except TypeError:
+            members = None
+
+        if members is not None and isinstance(expected, list | tuple | set | frozenset):
+
+            def predicate(event: Any) -> bool:
+                value = get(event)
+                if value is None:
+                    return False
+                try:
+                    return _plain(value) in members
+                except TypeError:
+                    return value in expected
+
+        else:
+
+            def predicate(event: Any) -> bool:
+                value = get(event)
+                try:
+                    return value is not None and value in expected
+                except TypeError:
+                    return False
+
+        return CompiledCondition(condition.field, predicate)
+
+    logger.warning(f"⚠️ معامل غير معروف: {op}")
+    return CompiledCondition(condition.field, _never)
+
+
+def compile_condition_group(
+    group: RuleConditionGroup,
+) -> tuple[Predicate, tuple[CompiledCondition, ...], str]:
+    """
+    ترجمة مجموعة شروط (AND/OR)
+    Compile a condition group
+
+    Returns:
+        (predicate, compiled conditions, normalized logic)
+    """
+    conditions = tuple(compile_condition(c) for c in group.conditions)
+    logic = group.logic.upper()
+    if logic not in ("AND", "OR"):
+        logger.warning(f"⚠️ معامل منطقي غير معروف: {group.logic}، استخدام AND")
+        logic = "AND"
+
+    predicates = tuple(c.predicate for c in conditions)
+    if not predicates:
+        return _always, conditions, logic
+    if len(predicates) == 1:
+        return predicates[0], conditions, logic
+    if logic == "OR":
+        return (lambda event: any(p(event) for p in predicates)), conditions, logic
+    return (lambda event: all(p(event) for p in predicates)), conditions, logic
+
+
+@dataclass(slots=True)
+class CompiledRule:
+    """
+    قاعدة مترجمة
+    Compiled rule
+
+    Attributes:
+        rule: القاعدة الأصلية
+        ordinal: ترتيب التنفيذ (الأولوية ثم ترتيب الإدخال)
+        predicate: دالة الشروط
+        required_paths: مسارات يجب وجودها لتطابق القاعدة (شروط AND)
+        vectorizable: كل الشروط عتبات رقمية مرتبطة بـ AND
+    """
+
+    rule: Rule
+    ordinal: int
+    predicate: Predicate
+    conditions: tuple[CompiledCondition, ...]
+    event_types: frozenset[str]
+    field_ids: frozenset[str]
+    required_paths: tuple[str, ...]
+    vectorizable: bool
+
+    def applies_to(self, event: Any) -> bool:
+        """نوع الحدث والحقل - Event type and field filters"""
+        if self.field_ids and event.field_id not in self.field_ids:
+            return False
+        return not self.event_types or _plain(event.event_type) in self.event_types
+
+
+def compile_rule(rule: Rule, ordinal: int = 0) -> CompiledRule:
+    """
+    ترجمة قاعدة كاملة
+    Compile a rule
+    """
+    predicate, conditions, logic = compile_condition_group(rule.conditions)
+    all_required = logic == "AND" or len(conditions) == 1
+    return CompiledRule(
+        rule=rule,
+        ordinal=ordinal,
+        predicate=predicate,
+        conditions=conditions,
+        event_types=frozenset(rule.event_types),
+        field_ids=frozenset(rule.field_ids),
+        required_paths=tuple(dict.fromkeys(c.field for c in conditions)) if all_required else (),
+        vectorizable=bool(conditions)
+        and all_required
+        and all(c.interval is not None for c in conditions),
+    )
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Dispatch Index - فهرس التوزيع
+# ═══════════════════════════════════════════════════════════════════════════════
+
+
+class _NumericPlan:
+    """
+    خطة التقييم المتجه لقواعد العتبات
+    Threshold conditions of many rules laid out as arrays
+    """
+
+    def __init__(self, rules: list[CompiledRule]):
+        self.rules = rules
+        self.paths = list(dict.fromkeys(c.field for r in rules for c in r.conditions))
+        self.getters = [compile_getter(p) for p in self.paths]
+        path_index = {p: i for i, p in enumerate(self.paths)}
+
+        conditions = [c for r in rules for c in r.conditions]
+        self.columns = np.array([path_index[c.field] for c in conditions], dtype=np.intp)
+        self.low = np.array([c.interval[0] for c in conditions], dtype=np.float64)
+        self.high = np.array([c.interval[1] for c in conditions], dtype=np.float64)
+        self.low_inclusive = np.array([c.interval[2] for c in conditions])
+        self.high_inclusive = np.array([c.interval[3] for c in conditions])
+        sizes = np.array([len(r.conditions) for r in rules], dtype=np.intp)
+        self.starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+
+    def match(self, events: Sequence[Any]) -> list[list[CompiledRule]]:
+        hits: list[list[CompiledRule]] = [[] for _ in events]
+        block = max(1, BATCH_BLOCK_CELLS // max(1, len(self.columns)))
+
+        for offset in range(0, len(events), block):
+            chunk = events[offset : offset + block]
+            values = np.array(
+                [[_as_float(get(e)) for get in self.getters] for e in chunk], dtype=np.float64
+            )
+            x = values[:, self.columns]
+            with np.errstate(invalid="ignore"):
+                satisfied = ((x > self.low) | (self.low_inclusive & (x == self.low))) & (
+                    (x < self.high) | (self.high_inclusive & (x == self.high))
+                )
+            matched = np.logical_and.reduceat(satisfied, self.starts, axis=1)
+            for row, col in zip(*np.nonzero(matched), strict=True):
+                compiled = self.rules[col]
+                event = chunk[row]
+                if not compiled.field_ids or event.field_id in compiled.field_ids:
+                    hits[offset + row].append(compiled)
+        return hits
+
+
+class RuleIndex:
+    """
+    فهرس القواعد المترجمة
+    Dispatch index over compiled active rules
+
+    Rules are bucketed by event type, field id and the first field path
+    their AND conditions require. An event only runs the rules in its
+    buckets whose required path is present, in priority order.
+
+    A ``cache`` dict shared between indexes keeps compiled rules keyed by
+    (rule_id, updated_at), so rebuilding after one rule changes only
+    recompiles that rule.
+
+    Usage:
+        ```python
+        index = RuleIndex(rules)
+        matched = index.match(event)             # [CompiledRule, ...]
+        per_event = index.match_batch(events)    # [[CompiledRule, ...], ...]
+        ```
+    """
+
+    def __init__(self, rules: Iterable[Rule], cache: dict[tuple, CompiledRule] | None = None):
+        active = [r for r in rules if r.status == RuleStatus.ACTIVE]
+        active.sort(key=lambda r: r.priority)
+        self.rules = [self._compile(rule, ordinal, cache) for ordinal, rule in enumerate(active)]
+
+        self._buckets = self._bucket(self.rules)
+        # match_batch covers threshold rules with NumPy, the rest from here
+        self._scalar_buckets = self._bucket([r for r in self.rules if not r.vectorizable])
+        self._anchor_getters = {
+            path: compile_getter(path)
+            for types in self._buckets.values()
+            for fields in types.values()
+            for path in fields
+            if path is not None
+        }
+        self._plans: dict[Any, _NumericPlan | None] = {}
+
+    @staticmethod
+    def _compile(rule: Rule, ordinal: int, cache: dict[tuple, CompiledRule] | None) -> CompiledRule:
+        if cache is None:
+            return compile_rule(rule, ordinal)
+        # القواعد تُعدَّل في مكانها مع تحديث updated_at - rules are edited in place
+        key = (rule.rule_id, rule.updated_at)
+        compiled = cache.get(key)
+        if compiled is None or compiled.rule is not rule:
+            compiled = cache[key] = compile_rule(rule, ordinal)
+        return compiled if compiled.ordinal == ordinal else replace(compiled, ordinal=ordinal)
+
+    @staticmethod
+    def _bucket(rules: list[CompiledRule]) -> dict:
+        # event_type → field_id → required path → rules (None = any)
+        buckets: dict[Any, dict[Any, dict[Any, list[CompiledRule]]]] = defaultdict(
+            lambda: defaultdict(lambda: defaultdict(list))
+        )
+        for compiled in rules:
+            path = compiled.required_paths[0] if compiled.required_paths else None
+            for event_type in compiled.event_types or (None,):
+                for field_id in compiled.field_ids or (None,):
+                    buckets[event_type][field_id][path].append(compiled)
+        return buckets
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    @staticmethod
+    def _buckets_for(buckets: dict, event_type: Any, field_id: Any) -> Iterable[dict]:
+        for types in (buckets.get(event_type), buckets.get(None)):
+            if types:
+                for fields in (types.get(field_id), types.get(None)):
+                    if fields:
+                        yield fields
+
+    def candidates(self, event: Any, scalar_only: bool = False) -> list[CompiledRule]:
+        """القواعد المرشحة لحدث، مرتبة حسب الأولوية - Candidate rules in priority order"""
+        buckets = self._scalar_buckets if scalar_only else self._buckets
+        found: list[list[CompiledRule]] = []
+        for fields in self._buckets_for(buckets, _plain(event.event_type), event.field_id):
+            for path, rules in fields.items():
+                if path is None or self._anchor_getters[path](event) is not None:
+                    found.append(rules)
+        if len(found) == 1:
+            return found[0]
+        return sorted(chain.from_iterable(found), key=lambda r: r.ordinal)
+
+    def match(self, event: Any) -> list[CompiledRule]:
+        """القواعد التي تتحقق شروطها - Rules whose conditions hold"""
+        return [r for r in self.candidates(event) if r.predicate(event)]
+
+    def match_batch(self, events: Sequence[Any]) -> list[list[CompiledRule]]:
+        """
+        تقييم دفعة أحداث
+        Match a batch of events
+
+        Events are grouped by type; threshold-only rules of each type are
+        evaluated for the whole group with NumPy, the remaining rules with
+        their compiled predicates. Without NumPy every event goes through
+        ``match``.
+
+        Returns:
+            Matched rules per event, in priority order
+        """
+        if np is None:
+            return [self.match(event) for event in events]
+
+        results: list[list[CompiledRule]] = [[] for _ in events]
+        by_type: dict[Any, list[int]] = defaultdict(list)
+        for i, event in enumerate(events):
+            by_type[_plain(event.event_type)].append(i)
+
+        for event_type, positions in by_type.items():
+            plan = self._plan_for(event_type)
+            group = [events[i] for i in positions]
+            vector_hits = plan.match(group) if plan else [[] for _ in group]
+
+            for i, event, hits in zip(positions, group, vector_hits, strict=True):
+                scalar = [r for r in self.candidates(event, scalar_only=True) if r.predicate(event)]
+                if hits and scalar:
+                    results[i] = sorted(hits + scalar, key=lambda r: r.ordinal)
+                else:
+                    results[i] = hits or scalar
+        return results
+
+    def _plan_for(self, event_type: Any) -> _NumericPlan | None:
+        if event_type not in self._plans:
+            vector_rules = [
+                r
+                for r in self.rules
+                if r.vectorizable and (not r.event_types or event_type in r.event_types)
+            ]
+            self._plans[event_type] = _NumericPlan(vector_rules) if vector_rules else None
+        return self._plans[event_type]
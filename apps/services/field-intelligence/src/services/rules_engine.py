@@ -21,11 +21,17 @@ License: MIT
 
 import logging
 import os
+import sys
 from datetime import UTC, datetime, timedelta
 from typing import Any
 
 import httpx
 
+# Shared integration imports (/app/shared in Docker, apps/services/shared locally)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+
+from shared.integration.http_pool import Upstream, get_upstream  # noqa: E402
+
 from ..models.events import EventResponse, EventSeverity, EventType
 from ..models.rules import (
     ActionConfig,
@@ -41,6 +47,8 @@ from ..models.rules import (
     RuleStatus,
     TaskConfig,
 )
+from .cooldown_store import CooldownStore, InMemoryCooldownStore, create_cooldown_store
+from .rule_compiler import CompiledRule, RuleIndex, compile_condition_group
 
 logger = logging.getLogger(__name__)
 
@@ -573,7 +581,7 @@ class ServiceClient:
     عميل HTTP للاتصال بالخدمات الأخرى
     HTTP Client for communicating with other services
 
-    يستخدم httpx للاتصال بـ:
+    يستخدم مجمع الاتصالات المشترك للاتصال بـ:
     - خدمة المهام (Task Service)
     - خدمة الإشعارات (Notification Service)
     - خدمة التنبيهات (Alert Service)
@@ -590,13 +598,14 @@ class ServiceClient:
         """
         self.base_url = base_url
         self.service_name = service_name
-        self._client: httpx.AsyncClient | None = None
+        self._client: Upstream | None = None
 
-    async def _get_client(self) -> httpx.AsyncClient:
-        """الحصول على عميل HTTP أو إنشاءه - Get or create HTTP client"""
+    async def _get_client(self) -> Upstream:
+        """الحصول على عميل الخدمة المشترك - Get the process-wide pooled client"""
         if self._client is None:
-            self._client = httpx.AsyncClient(
-                base_url=self.base_url,
+            self._client = get_upstream(
+                self.service_name,
+                self.base_url,
                 timeout=30.0,
                 headers={
                     "Content-Type": "application/json",
@@ -606,7 +615,7 @@ class ServiceClient:
         return self._client
 
     async def close(self):
-        """إغلاق عميل HTTP - Close HTTP client"""
+        """إغلاق اتصالات العميل - Close the pooled connections"""
         if self._client:
             await self._client.aclose()
             self._client = None
@@ -717,6 +726,7 @@ class FieldRulesEngine:
         task_service_url: str = TASK_SERVICE_URL,
         notification_service_url: str = NOTIFICATION_SERVICE_URL,
         alert_service_url: str = ALERT_SERVICE_URL,
+        cooldown_store: CooldownStore | None = None,
     ):
         """
         تهيئة محرك القواعد
@@ -726,14 +736,20 @@ class FieldRulesEngine:
             task_service_url: عنوان خدمة المهام
             notification_service_url: عنوان خدمة الإشعارات
             alert_service_url: عنوان خدمة التنبيهات
+            cooldown_store: مخزن فترات التهدئة (Redis عند ضبط REDIS_URL)
         """
         # عملاء الخدمات - Service clients
         self.task_client = ServiceClient(task_service_url, "TaskService")
         self.notification_client = ServiceClient(notification_service_url, "NotificationService")
         self.alert_client = ServiceClient(alert_service_url, "AlertService")
 
-        # سجل التنفيذ لإدارة فترة التهدئة - Execution history for cooldown
-        self.execution_history: dict[str, datetime] = {}
+        # مخزن فترات التهدئة - Cooldown store (shared across replicas with Redis)
+        self.cooldowns = cooldown_store or create_cooldown_store()
+
+        # فهرس القواعد المترجمة - Compiled rule index, rebuilt when rules change
+        self._index: RuleIndex | None = None
+        self._index_signature: tuple = ()
+        self._compiled_cache: dict[tuple, CompiledRule] = {}
 
         # إحصائيات - Statistics
         self.stats = {
@@ -752,6 +768,7 @@ class FieldRulesEngine:
         await self.task_client.close()
         await self.notification_client.close()
         await self.alert_client.close()
+        await self.cooldowns.close()
         logger.info("✅ تم إغلاق محرك القواعد - Rules engine closed")
 
     # ═══════════════════════════════════════════════════════════════════════════
@@ -809,6 +826,23 @@ class FieldRulesEngine:
     # Rule Evaluation - تقييم القواعد
     # ═══════════════════════════════════════════════════════════════════════════
 
+    def get_index(self, rules: list[Rule]) -> RuleIndex:
+        """
+        فهرس القواعد المترجمة لقائمة القواعد
+        Compiled rule index for a rule list
+
+        Rebuilt only when a rule is added, removed or updated; unchanged
+        rules keep their compiled predicates.
+        """
+        signature = tuple((r.rule_id, r.updated_at, r.status, r.priority) for r in rules)
+        if self._index is None or signature != self._index_signature:
+            live = {(rule_id, updated_at) for rule_id, updated_at, _, _ in signature}
+            for key in self._compiled_cache.keys() - live:
+                del self._compiled_cache[key]
+            self._index = RuleIndex(rules, cache=self._compiled_cache)
+            self._index_signature = signature
+        return self._index
+
     async def evaluate_rules(
         self, event: EventResponse, rules: list[Rule]
     ) -> list[RuleExecutionResult]:
@@ -825,25 +859,60 @@ class FieldRulesEngine:
         """
         self.stats["total_evaluations"] += 1
 
-        results: list[RuleExecutionResult] = []
+        index = self.get_index(rules)
+        logger.info(
+            f"📋 تقييم {len(index)} قاعدة نشطة من أصل {len(rules)} - "
+            f"Evaluating {len(index)} active rules out of {len(rules)}"
+        )
 
-        # فلترة القواعد النشطة فقط
-        # Filter only active rules
-        active_rules = [r for r in rules if r.status == RuleStatus.ACTIVE]
+        results = await self._execute_matched(event, index.match(event))
 
         logger.info(
-            f"📋 تقييم {len(active_rules)} قاعدة نشطة من أصل {len(rules)} - "
-            f"Evaluating {len(active_rules)} active rules out of {len(rules)}"
+            f"📊 نتائج التقييم: {len(results)} قاعدة نُفذت - "
+            f"Evaluation results: {len(results)} rules executed"
         )
 
-        # ترتيب حسب الأولوية (أقل رقم = أعلى أولوية)
-        # Sort by priority (lower number = higher priority)
-        active_rules.sort(key=lambda r: r.priority)
+        return results
+
+    async def evaluate_batch(
+        self, events: list[EventResponse], rules: list[Rule]
+    ) -> list[list[RuleExecutionResult]]:
+        """
+        تقييم دفعة أحداث
+        Evaluate a batch of events
 
-        # تقييم كل قاعدة
-        for rule in active_rules:
+        Conditions are matched for the whole batch at once (threshold rules
+        vectorized with NumPy); actions then run per event in batch order.
+
+        Args:
+            events: الأحداث
+            rules: قائمة القواعد
+
+        Returns:
+            نتائج التنفيذ لكل حدث
+        """
+        self.stats["total_evaluations"] += len(events)
+
+        index = self.get_index(rules)
+        matches = index.match_batch(events)
+        return [
+            await self._execute_matched(event, matched)
+            for event, matched in zip(events, matches, strict=True)
+        ]
+
+    async def _execute_matched(
+        self, event: EventResponse, matched: list[CompiledRule]
+    ) -> list[RuleExecutionResult]:
+        """
+        تنفيذ القواعد المطابقة بترتيب الأولوية
+        Execute matched rules in priority order
+        """
+        results: list[RuleExecutionResult] = []
+
+        for compiled in matched:
+            rule = compiled.rule
             try:
-                result = await self.evaluate_single_rule(event, rule)
+                result = await self._fire(event, rule)
                 if result:
                     results.append(result)
                     if result.success:
@@ -869,11 +938,6 @@ class FieldRulesEngine:
                     )
                 )
 
-        logger.info(
-            f"📊 نتائج التقييم: {len(results)} قاعدة نُفذت - "
-            f"Evaluation results: {len(results)} rules executed"
-        )
-
         return results
 
     async def evaluate_single_rule(
@@ -890,12 +954,6 @@ class FieldRulesEngine:
         Returns:
             نتيجة التنفيذ أو None إذا لم تطابق الشروط
         """
-        # التحقق من فترة التهدئة (Cooldown)
-        # Check cooldown period
-        if not self._check_cooldown(rule):
-            logger.debug(f"⏸️ القاعدة {rule.rule_id} ({rule.name}) ضمن فترة التهدئة - تم التجاهل")
-            return None
-
         # التحقق من الحقول المطبقة
         # Check applicable fields
         if rule.field_ids and event.field_id not in rule.field_ids:
@@ -916,46 +974,30 @@ class FieldRulesEngine:
             logger.debug(f"⏭️ القاعدة {rule.rule_id} ({rule.name}) - الشروط لم تتحقق")
             return None
 
-        logger.info(
-            f"✅ القاعدة {rule.rule_id} ({rule.name}) طابقت الحدث {event.event_id} - "
-            f"Rule matched event"
-        )
-
-        # تنفيذ الإجراءات
-        # Execute actions
-        execution_result = await self._execute_actions(event, rule)
-
-        # تحديث آخر وقت تفعيل
-        # Update last execution time
-        self.execution_history[rule.rule_id] = datetime.now(UTC)
-
-        return execution_result
+        return await self._fire(event, rule)
 
-    def _check_cooldown(self, rule: Rule) -> bool:
+    async def _fire(self, event: EventResponse, rule: Rule) -> RuleExecutionResult | None:
         """
-        التحقق من فترة التهدئة للقاعدة
-        Check if rule is in cooldown period
-
-        Args:
-            rule: القاعدة
+        بدء فترة التهدئة وتنفيذ إجراءات قاعدة مطابقة
+        Start the cooldown of a matched rule and execute its actions
 
         Returns:
-            True إذا كانت القاعدة قابلة للتنفيذ
+            نتيجة التنفيذ أو None إذا كانت القاعدة ضمن فترة التهدئة
         """
-        if rule.rule_id not in self.execution_history:
-            return True
-
-        last_execution = self.execution_history[rule.rule_id]
-        cooldown_end = last_execution + timedelta(minutes=rule.cooldown_minutes)
-        can_execute = datetime.now(UTC) >= cooldown_end
+        # التحقق من فترة التهدئة (Cooldown) وحجزها ذرياً
+        # Check and start the cooldown atomically
+        if not await self.cooldowns.try_acquire(rule.rule_id, rule.cooldown_minutes):
+            logger.debug(f"⏸️ القاعدة {rule.rule_id} ({rule.name}) ضمن فترة التهدئة - تم التجاهل")
+            return None
 
-        if not can_execute:
-            remaining_minutes = (cooldown_end - datetime.now(UTC)).total_seconds() / 60
-            logger.debug(
-                f"⏸️ القاعدة {rule.rule_id} في فترة تهدئة. متبقي {remaining_minutes:.1f} دقيقة"
-            )
+        logger.info(
+            f"✅ القاعدة {rule.rule_id} ({rule.name}) طابقت الحدث {event.event_id} - "
+            f"Rule matched event"
+        )
 
-        return can_execute
+        # تنفيذ الإجراءات
+        # Execute actions
+        return await self._execute_actions(event, rule)
 
     def _evaluate_conditions(
         self, event: EventResponse, condition_group: RuleConditionGroup
@@ -971,115 +1013,10 @@ class FieldRulesEngine:
         Returns:
             True إذا تحققت الشروط
         """
-        if not condition_group.conditions:
-            return True
-
-        results = []
-        for condition in condition_group.conditions:
-            result = self._evaluate_single_condition(event, condition)
-            results.append(result)
-            logger.debug(
-                f"  شرط: {condition.field} {condition.operator.value} {condition.value} = {result}"
-            )
-
-        # تطبيق المعامل المنطقي (AND/OR)
-        # Apply logical operator
-        if condition_group.logic.upper() == "AND":
-            final_result = all(results)
-        elif condition_group.logic.upper() == "OR":
-            final_result = any(results)
-        else:
-            logger.warning(f"⚠️ معامل منطقي غير معروف: {condition_group.logic}، استخدام AND")
-            final_result = all(results)
-
-        logger.debug(f"  نتيجة المجموعة ({condition_group.logic}): {final_result}")
-        return final_result
-
-    def _evaluate_single_condition(self, event: EventResponse, condition: RuleCondition) -> bool:
-        """
-        تقييم شرط واحد
-        Evaluate single condition
-
-        Args:
-            event: الحدث
-            condition: الشرط
-
-        Returns:
-            True إذا تحقق الشرط
-        """
-        try:
-            # استخراج قيمة الحقل من الحدث
-            # Extract field value from event
-            field_value = self._get_field_value(event, condition.field)
-
-            if field_value is None:
-                logger.debug(f"⚠️ الحقل {condition.field} غير موجود في الحدث")
-                return False
-
-            # تطبيق المعامل
-            # Apply operator
-            operator = condition.operator
-            expected_value = condition.value
-
-            if operator == ConditionOperator.EQUALS:
-                return field_value == expected_value
-
-            elif operator == ConditionOperator.NOT_EQUALS:
-                return field_value != expected_value
-
-            elif operator == ConditionOperator.GREATER_THAN:
-                return float(field_value) > float(expected_value)
-
-            elif operator == ConditionOperator.LESS_THAN:
-                return float(field_value) < float(expected_value)
-
-            elif operator == ConditionOperator.GREATER_EQUAL:
-                return float(field_value) >= float(expected_value)
-
-            elif operator == ConditionOperator.LESS_EQUAL:
-                return float(field_value) <= float(expected_value)
-
-            elif operator == ConditionOperator.CONTAINS:
-                return expected_value in str(field_value)
-
-            elif operator == ConditionOperator.IN:
-                return field_value in expected_value
-
-            elif operator == ConditionOperator.BETWEEN:
-                if isinstance(expected_value, list) and len(expected_value) == 2:
-                    return expected_value[0] <= float(field_value) <= expected_value[1]
-                return False
-
-            else:
-                logger.warning(f"⚠️ معامل غير معروف: {operator}")
-                return False
-
-        except Exception as e:
-            logger.error(f"❌ خطأ في تقييم الشرط {condition.field}: {str(e)}")
-            return False
-
-    def _get_field_value(self, event: EventResponse, field_path: str) -> Any:
-        """
-        استخراج قيمة حقل من الحدث (يدعم النقاط للحقول المتداخلة)
-        Extract field value from event (supports dot notation for nested fields)
-
-        Args:
-            event: الحدث
-            field_path: مسار الحقل (مثل: metadata.current_ndvi)
-
-        Returns:
-            قيمة الحقل أو None
-        """
-        parts = field_path.split(".")
-        value: Any = event
-
-        for part in parts:
-            value = value.get(part) if isinstance(value, dict) else getattr(value, part, None)
-
-            if value is None:
-                return None
-
-        return value
+        predicate, _, logic = compile_condition_group(condition_group)
+        result = predicate(event)
+        logger.debug(f"  نتيجة المجموعة ({logic}): {result}")
+        return result
 
     # ═══════════════════════════════════════════════════════════════════════════
     # Action Execution - تنفيذ الإجراءات
@@ -1496,29 +1433,32 @@ class FieldRulesEngine:
         logger.info(f"🌐 استدعاء Webhook: {webhook_config.method} {webhook_config.url}")
 
         try:
-            async with httpx.AsyncClient(timeout=webhook_config.timeout_seconds) as client:
-                response = await client.request(
-                    method=webhook_config.method,
-                    url=webhook_config.url,
-                    json=payload,
-                    headers=webhook_config.headers,
-                )
+            # Webhooks may have side effects: never hedged or coalesced
+            response = await get_upstream("webhooks").request(
+                webhook_config.method,
+                webhook_config.url,
+                json=payload,
+                headers=webhook_config.headers,
+                timeout=webhook_config.timeout_seconds,
+                hedge=False,
+                single_flight=False,
+            )
 
-                if response.status_code in (200, 201, 202, 204):
-                    return {
-                        "action_type": "webhook",
-                        "success": True,
-                        "url": webhook_config.url,
-                        "method": webhook_config.method,
-                        "status_code": response.status_code,
-                    }
-                else:
-                    return {
-                        "action_type": "webhook",
-                        "success": False,
-                        "error": f"HTTP {response.status_code}",
-                        "details": response.text,
-                    }
+            if response.status_code in (200, 201, 202, 204):
+                return {
+                    "action_type": "webhook",
+                    "success": True,
+                    "url": webhook_config.url,
+                    "method": webhook_config.method,
+                    "status_code": response.status_code,
+                }
+            else:
+                return {
+                    "action_type": "webhook",
+                    "success": False,
+                    "error": f"HTTP {response.status_code}",
+                    "details": response.text,
+                }
 
         except Exception as e:
             logger.error(f"❌ فشل استدعاء Webhook: {str(e)}")
@@ -1604,9 +1544,13 @@ class FieldRulesEngine:
         Returns:
             إحصائيات الأداء
         """
+        in_memory = isinstance(self.cooldowns, InMemoryCooldownStore)
         return {
             **self.stats,
-            "active_cooldowns": len(self.execution_history),
+            "compiled_rules": len(self._index) if self._index else 0,
+            "cooldown_backend": "memory" if in_memory else "redis",
+            # Redis cooldowns expire server-side; count them with cooldowns.active_count()
+            "active_cooldowns": len(self.cooldowns.last_triggered) if in_memory else None,
         }
 
     def reset_statistics(self):
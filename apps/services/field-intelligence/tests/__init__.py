@@ -0,0 +1,3 @@
+"""
+Field Intelligence Tests
+"""
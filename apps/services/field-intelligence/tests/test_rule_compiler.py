@@ -0,0 +1,213 @@
+"""
+Tests for the rule compiler, dispatch index and rules engine cooldowns
+"""
+
+from datetime import UTC, datetime
+
+import pytest
+
+from src.models.events import EventResponse, EventSeverity, EventStatus, EventType
+from src.models.rules import (
+    ActionConfig,
+    ActionType,
+    ConditionOperator,
+    Rule,
+    RuleCondition,
+    RuleConditionGroup,
+    RuleStatus,
+)
+from src.services.cooldown_store import InMemoryCooldownStore
+from src.services.rule_compiler import RuleIndex, compile_condition
+from src.services.rules_engine import FieldRulesEngine
+
+NOW = datetime(2026, 5, 1, tzinfo=UTC)
+
+
+def make_event(
+    event_type=EventType.NDVI_DROP,
+    field_id="field-1",
+    severity=EventSeverity.HIGH,
+    **metadata,
+) -> EventResponse:
+    return EventResponse(
+        event_id=f"evt-{field_id}-{event_type.value}",
+        tenant_id="tenant-1",
+        field_id=field_id,
+        event_type=event_type,
+        severity=severity,
+        status=EventStatus.ACTIVE,
+        title="test",
+        description="test",
+        source_service="test",
+        metadata=metadata,
+        created_at=NOW,
+    )
+
+
+def make_rule(rule_id, *conditions, logic="AND", priority=100, **kwargs) -> Rule:
+    return Rule(
+        rule_id=rule_id,
+        tenant_id="tenant-1",
+        name=rule_id,
+        conditions=RuleConditionGroup(
+            logic=logic,
+            conditions=[RuleCondition(field=f, operator=op, value=v) for f, op, v in conditions],
+        ),
+        actions=[ActionConfig(action_type=ActionType.LOG_EVENT)],
+        priority=priority,
+        created_at=NOW,
+        updated_at=NOW,
+        **kwargs,
+    )
+
+
+def holds(field, operator, value, event) -> bool:
+    return compile_condition(RuleCondition(field=field, operator=operator, value=value)).predicate(
+        event
+    )
+
+
+class TestCompileCondition:
+    """Compiled predicates keep the interpreted operator semantics"""
+
+    @pytest.mark.parametrize(
+        ("operator", "value", "expected"),
+        [
+            (ConditionOperator.LESS_THAN, 0.3, True),
+            (ConditionOperator.LESS_THAN, "0.2", False),
+            (ConditionOperator.GREATER_EQUAL, 0.25, True),
+            (ConditionOperator.LESS_EQUAL, 0.24, False),
+            (ConditionOperator.BETWEEN, [0.2, 0.3], True),
+            (ConditionOperator.BETWEEN, [0.3], False),
+            (ConditionOperator.EQUALS, 0.25, True),
+            (ConditionOperator.NOT_EQUALS, 0.25, False),
+            (ConditionOperator.GREATER_THAN, "not a number", False),
+        ],
+    )
+    def test_numeric_operators(self, operator, value, expected):
+        event = make_event(current_ndvi=0.25)
+        assert holds("metadata.current_ndvi", operator, value, event) is expected
+
+    def test_missing_field_never_matches(self):
+        event = make_event()
+        assert not holds("metadata.current_ndvi", ConditionOperator.NOT_EQUALS, 1, event)
+        assert not holds("metadata.a.b.c", ConditionOperator.EQUALS, None, event)
+
+    def test_in_compares_enum_values(self):
+        event = make_event(severity=EventSeverity.CRITICAL)
+        assert holds("severity", ConditionOperator.IN, ["high", "critical"], event)
+        assert not holds("severity", ConditionOperator.IN, ["low"], event)
+
+    def test_contains_and_nested_paths(self):
+        event = make_event(alert={"type": "frost_warning"})
+        assert holds("metadata.alert.type", ConditionOperator.CONTAINS, "frost", event)
+        assert not holds("metadata.alert.type", ConditionOperator.CONTAINS, 1, event)
+
+
+class TestRuleIndex:
+    """Dispatch and batch matching"""
+
+    @pytest.fixture
+    def rules(self):
+        lt = ConditionOperator.LESS_THAN
+        return [
+            make_rule("ndvi-low", ("metadata.current_ndvi", lt, 0.3), event_types=["ndvi_drop"]),
+            make_rule(
+                "ndvi-critical",
+                ("metadata.current_ndvi", lt, 0.2),
+                ("severity", ConditionOperator.IN, ["critical"]),
+                priority=10,
+            ),
+            make_rule(
+                "dry-or-hot",
+                ("metadata.moisture", lt, 20),
+                ("metadata.temperature", ConditionOperator.GREATER_THAN, 40),
+                logic="OR",
+            ),
+            make_rule(
+                "field-2-only", ("metadata.current_ndvi", lt, 1), field_ids=["field-2"], priority=5
+            ),
+            make_rule("inactive", ("metadata.current_ndvi", lt, 1), status=RuleStatus.INACTIVE),
+        ]
+
+    def test_match_respects_filters_and_priority(self, rules):
+        index = RuleIndex(rules)
+        assert len(index) == 4
+
+        critical = make_event(severity=EventSeverity.CRITICAL, current_ndvi=0.1)
+        assert [r.rule.rule_id for r in index.match(critical)] == ["ndvi-critical", "ndvi-low"]
+
+        other_field = make_event(field_id="field-2", current_ndvi=0.1)
+        assert [r.rule.rule_id for r in index.match(other_field)] == ["field-2-only", "ndvi-low"]
+
+        weather = make_event(EventType.WEATHER_ALERT, temperature=45)
+        assert [r.rule.rule_id for r in index.match(weather)] == ["dry-or-hot"]
+
+    def test_batch_matches_single_event_evaluation(self, rules):
+        index = RuleIndex(rules)
+        events = [
+            make_event(
+                event_type,
+                field_id=f"field-{i % 3}",
+                severity=severity,
+                current_ndvi=(i % 10) / 20,
+                moisture=i % 40,
+                temperature=30 + i % 15,
+            )
+            for i, (event_type, severity) in enumerate(
+                (t, s) for t in EventType for s in EventSeverity for _ in range(3)
+            )
+        ]
+        events.append(make_event(current_ndvi="n/a"))
+
+        batch = index.match_batch(events)
+        assert [[r.rule.rule_id for r in m] for m in batch] == [
+            [r.rule.rule_id for r in index.match(e)] for e in events
+        ]
+        assert any(batch)
+
+    def test_shared_cache_recompiles_only_updated_rules(self, rules):
+        cache = {}
+        first = RuleIndex(rules, cache=cache)
+        rules[0].updated_at = datetime(2026, 5, 2, tzinfo=UTC)
+        second = RuleIndex(rules, cache=cache)
+
+        reused = {a.rule.rule_id for a, b in zip(first.rules, second.rules, strict=True) if a is b}
+        assert reused == {"ndvi-critical", "dry-or-hot", "field-2-only"}
+
+
+class TestEngineCooldown:
+    """Cooldowns go through the cooldown store"""
+
+    async def test_rule_fires_once_within_cooldown(self):
+        engine = FieldRulesEngine(cooldown_store=InMemoryCooldownStore())
+        rules = [make_rule("ndvi-low", ("metadata.current_ndvi", ConditionOperator.LESS_THAN, 0.3))]
+        event = make_event(current_ndvi=0.1)
+
+        first = await engine.evaluate_rules(event, rules)
+        second = await engine.evaluate_rules(event, rules)
+
+        assert [r.rule_id for r in first] == ["ndvi-low"]
+        assert second == []
+        assert engine.get_statistics()["active_cooldowns"] == 1
+        await engine.close()
+
+    async def test_batch_shares_cooldowns(self):
+        engine = FieldRulesEngine(cooldown_store=InMemoryCooldownStore())
+        rules = [
+            make_rule(
+                "ndvi-low",
+                ("metadata.current_ndvi", ConditionOperator.LESS_THAN, 0.3),
+                cooldown_minutes=0,
+            ),
+            make_rule("ndvi-any", ("metadata.current_ndvi", ConditionOperator.LESS_THAN, 1)),
+        ]
+        events = [make_event(current_ndvi=0.1), make_event(current_ndvi=0.2)]
+
+        results = await engine.evaluate_batch(events, rules)
+
+        assert [[r.rule_id for r in per_event] for per_event in results] == [
+            ["ndvi-low", "ndvi-any"],
+            ["ndvi-low"],
+        ]
+        await engine.close()
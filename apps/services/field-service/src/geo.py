@@ -3,14 +3,22 @@ SAHOOL Field Service - Geo-spatial Utilities
 وظائف الحسابات الجغرافية
 """
 
-import math
+import sys
+from pathlib import Path
 from typing import Any
 
+try:
+    from apps.services.shared import geometry
+except ImportError:
+    # محاولة بديلة - Fallback: shared services modules on the path
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+    from shared import geometry
+
 
 def calculate_polygon_area(coordinates: list[list[list[float]]]) -> float:
     """
     حساب مساحة المضلع بالهكتار
-    باستخدام صيغة Shoelace مع تحويل الإحداثيات
+    المساحة الجيوديزية على الكرة (الحلقة الخارجية ناقص الثقوب)
 
     Args:
         coordinates: إحداثيات المضلع [[lng, lat], ...]
@@ -21,38 +29,11 @@ def calculate_polygon_area(coordinates: list[list[list[float]]]) -> float:
     if not coordinates or not coordinates[0]:
         return 0.0
 
-    outer_ring = coordinates[0]
-    n = len(outer_ring)
-    if n < 4:
+    if len(coordinates[0]) < 4:
         return 0.0
 
-    # تحويل الإحداثيات إلى متر باستخدام تقريب عند خط الاستواء
-    # 1 درجة ≈ 111,320 متر عند خط الاستواء
-    METERS_PER_DEGREE_LAT = 111320
-    METERS_PER_DEGREE_LNG = 111320  # تقريب، يتغير حسب خط العرض
-
-    # حساب مركز المضلع لتحديد معامل التحويل
-    avg_lat = sum(p[1] for p in outer_ring) / n
-    lng_scale = math.cos(math.radians(avg_lat))
-
-    # تحويل إلى متر
-    points_meters = []
-    for lng, lat in outer_ring:
-        x = lng * METERS_PER_DEGREE_LNG * lng_scale
-        y = lat * METERS_PER_DEGREE_LAT
-        points_meters.append((x, y))
-
-    # صيغة Shoelace
-    area = 0.0
-    for i in range(n - 1):
-        j = (i + 1) % (n - 1)
-        area += points_meters[i][0] * points_meters[j][1]
-        area -= points_meters[j][0] * points_meters[i][1]
-
-    area = abs(area) / 2.0
-
     # تحويل من متر مربع إلى هكتار (1 هكتار = 10,000 متر مربع)
-    return area / 10000.0
+    return geometry.polygon_area_m2(coordinates) / 10000.0
 
 
 def calculate_centroid(coordinates: list[list[list[float]]]) -> tuple[float, float]:
@@ -195,19 +176,8 @@ def distance_between_points(point1: tuple[float, float], point2: tuple[float, fl
         point1: (lat, lng)
         point2: (lat, lng)
     """
-    R = 6371  # نصف قطر الأرض بالكيلومتر
-
-    lat1, lng1 = math.radians(point1[0]), math.radians(point1[1])
-    lat2, lng2 = math.radians(point2[0]), math.radians(point2[1])
-
-    dlat = lat2 - lat1
-    dlng = lng2 - lng1
-
-    a = math.sin(dlat / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlng / 2) ** 2
-
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-
-    return R * c
+    distance_m = geometry.haversine_m(point1[0], point1[1], point2[0], point2[1])
+    return float(distance_m) / 1000.0
 
 
 def polygon_to_kml(
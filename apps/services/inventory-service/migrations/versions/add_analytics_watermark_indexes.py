@@ -0,0 +1,46 @@
+"""
+Add Analytics Snapshot Watermark Indexes
+
+The tenant analytics snapshot is cached until the tenant's latest movement
+or item change moves; these indexes keep that check to two index lookups:
+- Latest recorded movement per tenant
+- Latest item change per tenant
+
+Revision ID: inv_0002_analytics_watermark
+Revises: inv_0001_perf_indexes
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+
+revision = "inv_0002_analytics_watermark"
+down_revision = "inv_0001_perf_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Create analytics watermark indexes.
+    """
+    # Used for: MAX(created_at) of a tenant's movements
+    op.create_index(
+        "idx_inventory_movements_tenant_created",
+        "inventory_movements",
+        ["tenant_id", "created_at"],
+    )
+
+    # Used for: MAX(updated_at) of a tenant's items
+    op.create_index(
+        "idx_inventory_items_tenant_updated",
+        "inventory_items",
+        ["tenant_id", "updated_at"],
+    )
+
+
+def downgrade() -> None:
+    """
+    Drop analytics watermark indexes.
+    """
+    op.drop_index("idx_inventory_items_tenant_updated", table_name="inventory_items")
+    op.drop_index("idx_inventory_movements_tenant_created", table_name="inventory_movements")
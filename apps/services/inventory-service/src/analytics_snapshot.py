@@ -0,0 +1,386 @@
+"""
+Inventory Analytics Snapshot
+لقطة تحليلات المخزون
+
+Tenant-wide analytics in one pass instead of a query per item:
+- Three grouped queries: active items with category and supplier, the
+  daily issue quantities of each item over the forecast lookback (one
+  array per item), and issue COGS plus last issue date per item
+- Forecasts, turnover, ABC classes and slow/dead-stock ages computed as
+  NumPy arrays with one element per active item
+- Snapshots cached per tenant until the next stock movement or item change
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import UTC, date, datetime, timedelta
+
+import numpy as np
+from sqlalchemy import ARRAY, Float, and_, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models.inventory import InventoryItem, InventoryMovement, ItemCategory, MovementType, Supplier
+
+FORECAST_LOOKBACK_DAYS = 90
+TURNOVER_PERIOD_DAYS = 365
+SAFETY_STOCK_DAYS = 7
+DEFAULT_LEAD_TIME_DAYS = 7
+NO_STOCKOUT_DAYS = 999  # Sentinel used when there is no consumption to project
+
+# Velocity classes by annual turnover, fastest first
+VELOCITY_THRESHOLDS = ((4.0, "fast"), (2.0, "medium"), (0.5, "slow"))
+
+SNAPSHOT_CACHE_TENANTS = 64
+# Bounds staleness from writes that never move the watermark (long-running
+# transactions) and lets the lookback windows slide
+SNAPSHOT_MAX_AGE = timedelta(hours=1)
+
+_snapshots: OrderedDict[str, "InventorySnapshot"] = OrderedDict()
+
+
+@dataclass
+class InventorySnapshot:
+    """
+    Column arrays for a tenant's active items, aligned by position.
+    مصفوفات أعمدة العناصر النشطة للمستأجر
+    """
+
+    tenant_id: str
+    watermark: tuple
+    taken_at: datetime
+
+    # Item attributes
+    item_ids: list[str]
+    names: list[str]
+    skus: list[str]
+    category_codes: np.ndarray  # object, None when uncategorised
+    supplier_names: list[str | None]
+    current_stock: np.ndarray
+    available_stock: np.ndarray
+    reorder_level: np.ndarray
+    reorder_quantity: np.ndarray
+    average_cost: np.ndarray
+    has_expiry: np.ndarray
+    expiry_date: np.ndarray  # datetime64[D], NaT without an expiry date
+    lead_time_days: np.ndarray
+
+    # Issue aggregates
+    days_with_data: np.ndarray  # Days with issues in the forecast lookback
+    consumption_total: np.ndarray
+    consumption_std: np.ndarray  # Sample stdev of daily issues, NaN below two days
+    cogs: np.ndarray  # Issue cost over TURNOVER_PERIOD_DAYS
+    last_issue: np.ndarray  # datetime64[us] UTC, NaT when never issued
+
+    def __len__(self) -> int:
+        return len(self.item_ids)
+
+    @property
+    def stock_value(self) -> np.ndarray:
+        return self.current_stock * self.average_cost
+
+    @classmethod
+    def from_rows(
+        cls,
+        tenant_id: str,
+        item_rows: list[tuple],
+        consumption_rows: list[tuple],
+        issue_rows: list[tuple],
+        *,
+        watermark: tuple = (),
+        taken_at: datetime | None = None,
+    ) -> "InventorySnapshot":
+        """
+        Build from the rows of the three snapshot queries:
+        item_rows: (id, name_en, sku, category_code, current_stock,
+            available_stock, reorder_level, reorder_quantity, average_cost,
+            has_expiry, expiry_date, supplier_name, lead_time_days)
+        consumption_rows: (item_id, [daily quantity, ...])
+        issue_rows: (item_id, cogs, last_issue)
+        """
+        n = len(item_rows)
+        columns = list(zip(*item_rows)) if item_rows else [()] * 13
+        index = {item_id: i for i, item_id in enumerate(columns[0])}
+
+        def floats(values) -> np.ndarray:
+            return np.array([float(v or 0) for v in values], dtype=np.float64)
+
+        # Daily quantities of every item, flattened -> per-item count, total
+        # and two-pass stdev
+        rows = [(index[item_id], days) for item_id, days in consumption_rows if item_id in index]
+        lengths = np.array([len(days) for _, days in rows], dtype=np.intp)
+        idx = np.repeat(np.array([i for i, _ in rows], dtype=np.intp), lengths)
+        qty = np.fromiter(
+            (float(q) for _, days in rows for q in days), dtype=np.float64, count=int(lengths.sum())
+        )
+        days_with_data = np.bincount(idx, minlength=n)
+        total = np.bincount(idx, weights=qty, minlength=n)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = total / days_with_data
+            squares = np.bincount(idx, weights=(qty - mean[idx]) ** 2, minlength=n)
+            std = np.where(days_with_data > 1, np.sqrt(squares / (days_with_data - 1)), np.nan)
+
+        cogs = np.zeros(n, dtype=np.float64)
+        last_issue = np.full(n, np.datetime64("NaT"), dtype="datetime64[us]")
+        for item_id, item_cogs, last in issue_rows:
+            i = index.get(item_id)
+            if i is None:
+                continue
+            cogs[i] = float(item_cogs or 0)
+            if last is not None:
+                last_issue[i] = np.datetime64(_as_utc(last), "us")
+
+        return cls(
+            tenant_id=tenant_id,
+            watermark=watermark,
+            taken_at=taken_at or datetime.now(UTC),
+            item_ids=[str(item_id) for item_id in columns[0]],
+            names=list(columns[1]),
+            skus=list(columns[2]),
+            category_codes=np.array(columns[3], dtype=object),
+            supplier_names=list(columns[11]),
+            current_stock=floats(columns[4]),
+            available_stock=floats(columns[5]),
+            reorder_level=floats(columns[6]),
+            reorder_quantity=floats(columns[7]),
+            average_cost=floats(columns[8]),
+            has_expiry=np.array([bool(v) for v in columns[9]], dtype=bool),
+            expiry_date=np.array(
+                [np.datetime64(v, "D") if v else np.datetime64("NaT") for v in columns[10]],
+                dtype="datetime64[D]",
+            ),
+            lead_time_days=np.array(
+                [DEFAULT_LEAD_TIME_DAYS if v is None else int(v) for v in columns[12]],
+                dtype=np.int64,
+            ),
+            days_with_data=days_with_data,
+            consumption_total=total,
+            consumption_std=std,
+            cogs=cogs,
+            last_issue=last_issue,
+        )
+
+    # ─────────────────────────────────────────────────────────────────────
+    # Vectorized metrics
+    # ─────────────────────────────────────────────────────────────────────
+
+    def forecast(self, forecast_days: int = 90) -> dict[str, np.ndarray]:
+        """
+        Consumption forecast for every item; same rules as
+        InventoryAnalytics.get_consumption_forecast.
+        """
+        n = self.days_with_data
+        has_history = n > 0
+        with np.errstate(invalid="ignore", divide="ignore"):
+            avg_daily = np.where(has_history, self.consumption_total / np.maximum(n, 1), 0.0)
+            stockout = np.where(
+                avg_daily > 0,
+                np.trunc(self.available_stock / np.where(avg_daily > 0, avg_daily, 1.0)),
+                NO_STOCKOUT_DAYS,
+            ).astype(np.int64)
+            cv = self.consumption_std / avg_daily
+        reorder_days = np.where(
+            has_history,
+            np.maximum(0, stockout - self.lead_time_days - SAFETY_STOCK_DAYS),
+            NO_STOCKOUT_DAYS,
+        )
+        recommended = np.where(
+            has_history,
+            (avg_daily * forecast_days) + (avg_daily * SAFETY_STOCK_DAYS),
+            self.reorder_quantity,
+        )
+        steady = np.where((n > 1) & (avg_daily > 0), np.clip(1.0 - (cv / 2), 0.0, 1.0), 0.5)
+        confidence = np.select([n >= 30, has_history], [steady, 0.3], 0.0)
+        return {
+            "has_history": has_history,
+            "avg_daily": avg_daily,
+            "days_until_stockout": stockout,
+            "reorder_days": reorder_days,
+            "recommended_order_qty": recommended,
+            "confidence": confidence,
+        }
+
+    def turnover(self, cogs: np.ndarray | None = None) -> dict[str, np.ndarray]:
+        """
+        Turnover Ratio = COGS / (current stock * average cost)
+        Days of Inventory = 365 / Turnover Ratio
+        """
+        cogs = self.cogs if cogs is None else cogs
+        value = self.stock_value
+        with np.errstate(invalid="ignore", divide="ignore"):
+            ratio = np.where(value > 0, cogs / value, 0.0)
+            days = np.where(ratio > 0, 365 / ratio, 999.0)
+        velocity = np.select(
+            [ratio >= threshold for threshold, _ in VELOCITY_THRESHOLDS],
+            [name for _, name in VELOCITY_THRESHOLDS],
+            "dead",
+        )
+        return {"turnover_ratio": ratio, "days_of_inventory": days, "velocity": velocity}
+
+    def abc_classes(self) -> dict[str, np.ndarray]:
+        """
+        Pareto classes by stock value: A up to 80% of cumulative value,
+        B up to 95%, C for the rest. ``order`` sorts items by value, highest first.
+        """
+        value = self.stock_value
+        order = np.argsort(-value, kind="stable")
+        cumulative = np.cumsum(value[order])
+        total = cumulative[-1] if len(cumulative) else 0.0
+        percentage = cumulative / total * 100 if total > 0 else np.zeros_like(cumulative)
+        classes = np.select([percentage <= 80, percentage <= 95], ["A", "B"], "C")
+        return {
+            "order": order,
+            "value": value[order],
+            "cumulative_value": cumulative,
+            "cumulative_percentage": percentage,
+            "class": classes,
+        }
+
+    def days_since_issue(self, now: datetime | None = None) -> np.ndarray:
+        """Whole days since the last issue; NO_STOCKOUT_DAYS when never issued"""
+        now64 = np.datetime64(_as_utc(now or datetime.now(UTC)), "us")
+        with np.errstate(invalid="ignore"):
+            days = (now64 - self.last_issue) // np.timedelta64(1, "D")
+        return np.where(np.isnat(self.last_issue), NO_STOCKOUT_DAYS, days)
+
+    def days_to_expiry(self, today: date | None = None) -> np.ndarray:
+        """Days until expiry as float; NaN for items without an expiry date"""
+        today64 = np.datetime64(today or date.today(), "D")
+        days = (self.expiry_date - today64).astype(np.float64)
+        return np.where(np.isnat(self.expiry_date), np.nan, days)
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Naive UTC datetime; naive input is taken to be UTC already"""
+    if value.tzinfo is not None:
+        value = value.astimezone(UTC).replace(tzinfo=None)
+    return value
+
+
+# ─────────────────────────────────────────────────────────────────────────
+# Loading and caching
+# ─────────────────────────────────────────────────────────────────────────
+
+
+async def _watermark(db: AsyncSession, tenant_id: str) -> tuple:
+    """Changes whenever a movement is recorded or an item is added or edited"""
+    movements = select(func.max(InventoryMovement.created_at)).where(
+        InventoryMovement.tenant_id == tenant_id
+    )
+    items = select(func.max(InventoryItem.updated_at), func.count(InventoryItem.id)).where(
+        InventoryItem.tenant_id == tenant_id
+    )
+    latest_movement = (await db.execute(movements)).scalar()
+    latest_item, item_count = (await db.execute(items)).one()
+    return (latest_movement, latest_item, item_count)
+
+
+async def build_snapshot(
+    db: AsyncSession, tenant_id: str, watermark: tuple = ()
+) -> InventorySnapshot:
+    """Run the three snapshot queries and compute the per-item arrays"""
+    taken_at = datetime.now(UTC)
+
+    items_stmt = (
+        select(
+            InventoryItem.id,
+            InventoryItem.name_en,
+            InventoryItem.sku,
+            ItemCategory.code,
+            InventoryItem.current_stock,
+            InventoryItem.available_stock,
+            InventoryItem.reorder_level,
+            InventoryItem.reorder_quantity,
+            InventoryItem.average_cost,
+            InventoryItem.has_expiry,
+            InventoryItem.expiry_date,
+            Supplier.name,
+            Supplier.lead_time_days,
+        )
+        .outerjoin(ItemCategory, InventoryItem.category_id == ItemCategory.id)
+        .outerjoin(Supplier, InventoryItem.supplier_id == Supplier.id)
+        .where(
+            and_(
+                InventoryItem.tenant_id == tenant_id,
+                InventoryItem.is_active.is_(True),
+            )
+        )
+    )
+
+    issues = and_(
+        InventoryMovement.tenant_id == tenant_id,
+        InventoryMovement.movement_type == MovementType.ISSUE,
+    )
+    day = func.date_trunc("day", InventoryMovement.movement_date).label("day")
+    daily = (
+        select(InventoryMovement.item_id, day, func.sum(InventoryMovement.quantity).label("qty"))
+        .where(
+            issues,
+            InventoryMovement.movement_date >= taken_at - timedelta(days=FORECAST_LOOKBACK_DAYS),
+        )
+        .group_by(InventoryMovement.item_id, day)
+        .subquery()
+    )
+    # One row per item keeps the transfer to the item count, not item-days
+    consumption_stmt = select(
+        daily.c.item_id, func.array_agg(daily.c.qty, type_=ARRAY(Float))
+    ).group_by(daily.c.item_id)
+
+    turnover_start = taken_at - timedelta(days=TURNOVER_PERIOD_DAYS)
+    issue_stmt = (
+        select(
+            InventoryMovement.item_id,
+            func.sum(InventoryMovement.total_cost).filter(
+                InventoryMovement.movement_date >= turnover_start
+            ),
+            func.max(InventoryMovement.movement_date),
+        )
+        .where(issues)
+        .group_by(InventoryMovement.item_id)
+    )
+
+    item_rows = (await db.execute(items_stmt)).all()
+    consumption_rows = (await db.execute(consumption_stmt)).all()
+    issue_rows = (await db.execute(issue_stmt)).all()
+
+    return InventorySnapshot.from_rows(
+        tenant_id,
+        item_rows,
+        consumption_rows,
+        issue_rows,
+        watermark=watermark,
+        taken_at=taken_at,
+    )
+
+
+async def load_snapshot(db: AsyncSession, tenant_id: str) -> InventorySnapshot:
+    """
+    Cached snapshot for the tenant, rebuilt when the watermark has moved,
+    the snapshot is older than SNAPSHOT_MAX_AGE or the day has changed.
+    """
+    watermark = await _watermark(db, tenant_id)
+    now = datetime.now(UTC)
+
+    snapshot = _snapshots.get(tenant_id)
+    if (
+        snapshot is not None
+        and snapshot.watermark == watermark
+        and now - snapshot.taken_at < SNAPSHOT_MAX_AGE
+        and snapshot.taken_at.date() == now.date()
+    ):
+        _snapshots.move_to_end(tenant_id)
+        return snapshot
+
+    snapshot = await build_snapshot(db, tenant_id, watermark)
+    _snapshots[tenant_id] = snapshot
+    _snapshots.move_to_end(tenant_id)
+    while len(_snapshots) > SNAPSHOT_CACHE_TENANTS:
+        _snapshots.popitem(last=False)
+    return snapshot
+
+
+def invalidate_snapshot(tenant_id: str | None = None) -> None:
+    """Drop the cached snapshot for a tenant, or for every tenant"""
+    if tenant_id is None:
+        _snapshots.clear()
+    else:
+        _snapshots.pop(tenant_id, None)
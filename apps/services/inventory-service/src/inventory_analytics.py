@@ -15,12 +15,14 @@ Comprehensive analytics for agricultural inventory management:
 
 import statistics
 from dataclasses import asdict, dataclass
-from datetime import date, datetime, timedelta
+from datetime import UTC, date, datetime, timedelta
 from decimal import Decimal
 
+import numpy as np
 from sqlalchemy import and_, desc, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from .analytics_snapshot import TURNOVER_PERIOD_DAYS, InventorySnapshot, load_snapshot
 from .models.inventory import (
     InventoryItem,
     InventoryMovement,
@@ -211,30 +213,16 @@ class InventoryAnalytics:
         self, category: str | None = None, low_stock_only: bool = False
     ) -> list[ConsumptionForecast]:
         """Get forecasts for all items or filtered subset"""
-        # Build query
-        stmt = select(InventoryItem).where(
-            and_(
-                InventoryItem.tenant_id == self.tenant_id,
-                InventoryItem.is_active is True,
-            )
-        )
+        snapshot = await load_snapshot(self.db, self.tenant_id)
 
+        mask = np.ones(len(snapshot), dtype=bool)
         if category:
-            stmt = stmt.join(ItemCategory).where(ItemCategory.code == category)
-
+            mask &= snapshot.category_codes == category
         if low_stock_only:
-            stmt = stmt.where(InventoryItem.current_stock <= InventoryItem.reorder_level)
-
-        result = await self.db.execute(stmt)
-        items = result.scalars().all()
+            mask &= snapshot.current_stock <= snapshot.reorder_level
 
-        forecasts = []
-        for item in items:
-            forecast = await self.get_consumption_forecast(str(item.id))
-            if forecast:
-                forecasts.append(forecast)
-
-        return forecasts
+        forecast = snapshot.forecast()
+        return [_forecast_for(snapshot, forecast, i) for i in np.flatnonzero(mask)]
 
     async def get_inventory_valuation(
         self, as_of_date: date | None = None, warehouse_id: str | None = None
@@ -329,122 +317,70 @@ class InventoryAnalytics:
         Turnover Ratio = Cost of Goods Used / Average Inventory Value
         Days of Inventory = 365 / Turnover Ratio
         """
-        start_date = datetime.now() - timedelta(days=period_days)
-
-        # Get all active items
-        items_stmt = select(InventoryItem).where(
-            and_(
-                InventoryItem.tenant_id == self.tenant_id,
-                InventoryItem.is_active is True,
-            )
-        )
-        items_result = await self.db.execute(items_stmt)
-        items = items_result.scalars().all()
-
-        metrics = []
+        snapshot = await load_snapshot(self.db, self.tenant_id)
+
+        # The snapshot holds COGS for the default period; other periods need
+        # one more grouped query
+        cogs = None
+        if period_days != TURNOVER_PERIOD_DAYS:
+            cogs = await self._cogs_by_item(snapshot, period_days)
+
+        turnover = snapshot.turnover(cogs)
+        ratios = turnover["turnover_ratio"].tolist()
+        days = turnover["days_of_inventory"].tolist()
+        velocities = turnover["velocity"].tolist()
+
+        return [
+            TurnoverMetrics(
+                item_id=snapshot.item_ids[i],
+                item_name=snapshot.names[i],
+                turnover_ratio=round(ratios[i], 2),
+                days_of_inventory=round(days[i], 1),
+                velocity=velocities[i],
+            )
+            for i in range(len(snapshot))
+        ]
 
-        for item in items:
-            # Calculate total cost of goods used (issued)
-            cogs_stmt = select(func.sum(InventoryMovement.total_cost)).where(
+    async def _cogs_by_item(self, snapshot: InventorySnapshot, period_days: int) -> np.ndarray:
+        """Issue cost per snapshot item over the last ``period_days`` days"""
+        start_date = datetime.now(UTC) - timedelta(days=period_days)
+        stmt = (
+            select(InventoryMovement.item_id, func.sum(InventoryMovement.total_cost))
+            .where(
                 and_(
                     InventoryMovement.tenant_id == self.tenant_id,
-                    InventoryMovement.item_id == item.id,
                     InventoryMovement.movement_type == MovementType.ISSUE,
                     InventoryMovement.movement_date >= start_date,
                 )
             )
-            cogs_result = await self.db.execute(cogs_stmt)
-            cogs = cogs_result.scalar() or Decimal("0.0")
-
-            # Average inventory value (simplified: current stock * average cost)
-            avg_inventory_value = item.current_stock * item.average_cost
-
-            # Calculate turnover ratio - prevent division by zero
-            if avg_inventory_value > 0:
-                turnover_ratio = float(cogs / avg_inventory_value)
-                days_of_inventory = 365 / turnover_ratio if turnover_ratio > 0 else 999.0
-            else:
-                turnover_ratio = 0.0
-                days_of_inventory = 999.0
-
-            # Classify velocity
-            if turnover_ratio >= 4:  # Turns over 4+ times per year
-                velocity = "fast"
-            elif turnover_ratio >= 2:
-                velocity = "medium"
-            elif turnover_ratio >= 0.5:
-                velocity = "slow"
-            else:
-                velocity = "dead"
-
-            metrics.append(
-                TurnoverMetrics(
-                    item_id=str(item.id),
-                    item_name=item.name_en,
-                    turnover_ratio=round(turnover_ratio, 2),
-                    days_of_inventory=round(days_of_inventory, 1),
-                    velocity=velocity,
-                )
-            )
+            .group_by(InventoryMovement.item_id)
+        )
+        result = await self.db.execute(stmt)
 
-        return metrics
+        index = {item_id: i for i, item_id in enumerate(snapshot.item_ids)}
+        cogs = np.zeros(len(snapshot), dtype=np.float64)
+        for item_id, total_cost in result:
+            i = index.get(str(item_id))
+            if i is not None:
+                cogs[i] = float(total_cost or 0)
+        return cogs
 
     async def identify_slow_moving(self, days_threshold: int = 90) -> list[dict]:
         """Identify items with no movement in N days"""
-        datetime.now() - timedelta(days=days_threshold)
+        snapshot = await load_snapshot(self.db, self.tenant_id)
 
-        # Get items with last movement before threshold
-        stmt = (
-            select(
-                InventoryItem,
-                func.max(InventoryMovement.movement_date).label("last_movement"),
-            )
-            .outerjoin(
-                InventoryMovement,
-                and_(
-                    InventoryMovement.item_id == InventoryItem.id,
-                    InventoryMovement.movement_type == MovementType.ISSUE,
-                ),
-            )
-            .where(
-                and_(
-                    InventoryItem.tenant_id == self.tenant_id,
-                    InventoryItem.is_active is True,
-                    InventoryItem.current_stock > 0,
-                )
-            )
-            .group_by(InventoryItem.id)
-        )
-
-        result = await self.db.execute(stmt)
-        rows = result.all()
+        days_since = snapshot.days_since_issue()
+        never_issued = np.isnat(snapshot.last_issue)
+        mask = (snapshot.current_stock > 0) & (never_issued | (days_since >= days_threshold))
 
-        slow_moving = []
-        for row in rows:
-            item = row.InventoryItem
-            last_movement = row.last_movement
-
-            days_since_movement = 999
-            if last_movement:
-                days_since_movement = (datetime.now() - last_movement).days
-
-            if last_movement is None or days_since_movement >= days_threshold:
-                item_value = float(item.current_stock * item.average_cost)
-
-                slow_moving.append(
-                    {
-                        "item_id": str(item.id),
-                        "item_name": item.name_en,
-                        "sku": item.sku,
-                        "current_stock": item.current_stock,
-                        "unit_cost": float(item.average_cost),
-                        "total_value": round(item_value, 2),
-                        "last_movement_date": (
-                            last_movement.date().isoformat() if last_movement else None
-                        ),
-                        "days_since_movement": days_since_movement,
-                    }
-                )
+        slow_moving = [
+            {
+                **_stock_entry(snapshot, i),
+                "last_movement_date": _last_issue_date(snapshot, i),
+                "days_since_movement": int(days_since[i]),
+            }
+            for i in np.flatnonzero(mask)
+        ]
 
         # Sort by value (highest first)
         slow_moving.sort(key=lambda x: x["total_value"], reverse=True)
@@ -455,77 +391,34 @@ class InventoryAnalytics:
         """
         Identify dead stock (no movement + near expiry or very long time)
         """
-        datetime.now() - timedelta(days=days_threshold)
-        expiry_threshold = date.today() + timedelta(days=60)
+        snapshot = await load_snapshot(self.db, self.tenant_id)
 
-        stmt = (
-            select(
-                InventoryItem,
-                func.max(InventoryMovement.movement_date).label("last_movement"),
-            )
-            .outerjoin(
-                InventoryMovement,
-                and_(
-                    InventoryMovement.item_id == InventoryItem.id,
-                    InventoryMovement.movement_type == MovementType.ISSUE,
-                ),
-            )
-            .where(
-                and_(
-                    InventoryItem.tenant_id == self.tenant_id,
-                    InventoryItem.is_active is True,
-                    InventoryItem.current_stock > 0,
-                )
-            )
-            .group_by(InventoryItem.id)
-        )
+        days_since = snapshot.days_since_issue()
+        days_to_expiry = snapshot.days_to_expiry()
+        in_stock = snapshot.current_stock > 0
 
-        result = await self.db.execute(stmt)
-        rows = result.all()
+        # Criteria: No movement for 180+ days OR expiring within 60 days
+        idle = in_stock & (np.isnat(snapshot.last_issue) | (days_since >= days_threshold))
+        expiring = in_stock & snapshot.has_expiry & (days_to_expiry <= 60)
 
         dead_stock = []
-        for row in rows:
-            item = row.InventoryItem
-            last_movement = row.last_movement
-
-            days_since_movement = 999
-            if last_movement:
-                days_since_movement = (datetime.now() - last_movement).days
-
-            # Criteria: No movement for 180+ days OR expiring within 60 days
-            is_dead = False
-            reason = ""
-
-            if last_movement is None or days_since_movement >= days_threshold:
-                is_dead = True
-                reason = f"No movement for {days_since_movement} days"
-
-            if item.has_expiry and item.expiry_date and item.expiry_date <= expiry_threshold:
-                is_dead = True
-                days_to_expiry = (item.expiry_date - date.today()).days
-                if reason:
-                    reason += f" and expiring in {days_to_expiry} days"
-                else:
-                    reason = f"Expiring in {days_to_expiry} days"
-
-            if is_dead:
-                item_value = float(item.current_stock * item.average_cost)
-
-                dead_stock.append(
-                    {
-                        "item_id": str(item.id),
-                        "item_name": item.name_en,
-                        "sku": item.sku,
-                        "current_stock": item.current_stock,
-                        "unit_cost": float(item.average_cost),
-                        "total_value": round(item_value, 2),
-                        "reason": reason,
-                        "expiry_date": (item.expiry_date.isoformat() if item.expiry_date else None),
-                        "last_movement_date": (
-                            last_movement.date().isoformat() if last_movement else None
-                        ),
-                    }
-                )
+        for i in np.flatnonzero(idle | expiring):
+            reasons = []
+            if idle[i]:
+                reasons.append(f"No movement for {int(days_since[i])} days")
+            if expiring[i]:
+                reasons.append(f"expiring in {int(days_to_expiry[i])} days")
+            reason = " and ".join(reasons)
+
+            expiry_date = snapshot.expiry_date[i]
+            dead_stock.append(
+                {
+                    **_stock_entry(snapshot, i),
+                    "reason": reason[0].upper() + reason[1:],
+                    "expiry_date": None if np.isnat(expiry_date) else str(expiry_date),
+                    "last_movement_date": _last_issue_date(snapshot, i),
+                }
+            )
 
         # Sort by value
         dead_stock.sort(key=lambda x: x["total_value"], reverse=True)
@@ -600,51 +493,35 @@ class InventoryAnalytics:
         - Lead time from supplier
         - Seasonal demand
         """
-        # Get items below reorder level
-        stmt = (
-            select(InventoryItem, Supplier)
-            .outerjoin(Supplier, InventoryItem.supplier_id == Supplier.id)
-            .where(
-                and_(
-                    InventoryItem.tenant_id == self.tenant_id,
-                    InventoryItem.is_active is True,
-                    InventoryItem.available_stock <= InventoryItem.reorder_level,
-                )
-            )
-        )
+        snapshot = await load_snapshot(self.db, self.tenant_id)
+        forecast = snapshot.forecast()
 
-        result = await self.db.execute(stmt)
-        rows = result.all()
+        # Items below reorder level
+        below = np.flatnonzero(snapshot.available_stock <= snapshot.reorder_level)
 
         recommendations = []
-        for row in rows:
-            item = row.InventoryItem
-            supplier = row.Supplier
-
-            # Get forecast
-            forecast = await self.get_consumption_forecast(str(item.id))
+        for i in below:
+            item_forecast = _forecast_for(snapshot, forecast, i)
+            available_stock = float(snapshot.available_stock[i])
+            supplier_name = snapshot.supplier_names[i]
 
             recommendations.append(
                 {
-                    "item_id": str(item.id),
-                    "item_name": item.name_en,
-                    "sku": item.sku,
-                    "current_stock": item.current_stock,
-                    "available_stock": item.available_stock,
-                    "reorder_level": item.reorder_level,
-                    "reorder_quantity": item.reorder_quantity,
-                    "recommended_order_qty": (
-                        forecast.recommended_order_qty if forecast else item.reorder_quantity
-                    ),
-                    "days_until_stockout": (forecast.days_until_stockout if forecast else 0),
-                    "supplier_name": supplier.name if supplier else None,
-                    "lead_time_days": supplier.lead_time_days if supplier else 7,
+                    "item_id": snapshot.item_ids[i],
+                    "item_name": snapshot.names[i],
+                    "sku": snapshot.skus[i],
+                    "current_stock": float(snapshot.current_stock[i]),
+                    "available_stock": available_stock,
+                    "reorder_level": float(snapshot.reorder_level[i]),
+                    "reorder_quantity": float(snapshot.reorder_quantity[i]),
+                    "recommended_order_qty": item_forecast.recommended_order_qty,
+                    "days_until_stockout": item_forecast.days_until_stockout,
+                    "supplier_name": supplier_name,
+                    "lead_time_days": int(snapshot.lead_time_days[i]),
                     "urgency": (
                         "critical"
-                        if item.available_stock <= 0
-                        else (
-                            "high" if forecast and forecast.days_until_stockout <= 7 else "medium"
-                        )
+                        if available_stock <= 0
+                        else ("high" if item_forecast.days_until_stockout <= 7 else "medium")
                     ),
                 }
             )
@@ -662,104 +539,50 @@ class InventoryAnalytics:
         - B items: 15% of value (next ~30%)
         - C items: 5% of value (bottom ~50%)
         """
-        # Get all items with their values
-        stmt = select(InventoryItem).where(
-            and_(
-                InventoryItem.tenant_id == self.tenant_id,
-                InventoryItem.is_active is True,
-            )
-        )
-
-        result = await self.db.execute(stmt)
-        items = result.scalars().all()
-
-        # Calculate values
-        item_values = []
-        total_value = 0.0
-
-        for item in items:
-            value = float(item.current_stock * item.average_cost)
-            total_value += value
-            item_values.append(
+        snapshot = await load_snapshot(self.db, self.tenant_id)
+        abc = snapshot.abc_classes()
+
+        total_value = float(abc["cumulative_value"][-1]) if len(snapshot) else 0.0
+        values = abc["value"].tolist()
+        cumulative = abc["cumulative_value"].tolist()
+        percentages = abc["cumulative_percentage"].tolist()
+        classes = abc["class"].tolist()
+
+        by_class = {"A": [], "B": [], "C": []}
+        for rank, i in enumerate(abc["order"].tolist()):
+            by_class[classes[rank]].append(
                 {
-                    "item_id": str(item.id),
-                    "item_name": item.name_en,
-                    "sku": item.sku,
-                    "stock": item.current_stock,
-                    "value": value,
+                    "item_id": snapshot.item_ids[i],
+                    "item_name": snapshot.names[i],
+                    "sku": snapshot.skus[i],
+                    "stock": float(snapshot.current_stock[i]),
+                    "value": round(values[rank], 2),
+                    "cumulative_value": round(cumulative[rank], 2),
+                    "cumulative_percentage": round(percentages[rank], 2),
+                    "class": classes[rank],
                 }
             )
 
-        # Sort by value (descending)
-        item_values.sort(key=lambda x: x["value"], reverse=True)
-
-        # Classify into ABC
-        cumulative_value = 0.0
-        a_items = []
-        b_items = []
-        c_items = []
-
-        for item in item_values:
-            cumulative_value += item["value"]
-            # Prevent division by zero
-            percentage = (cumulative_value / total_value * 100) if total_value > 0 else 0.0
-
-            item["cumulative_value"] = round(cumulative_value, 2)
-            item["cumulative_percentage"] = round(percentage, 2)
-            item["value"] = round(item["value"], 2)
-
-            if percentage <= 80:
-                item["class"] = "A"
-                a_items.append(item)
-            elif percentage <= 95:
-                item["class"] = "B"
-                b_items.append(item)
-            else:
-                item["class"] = "C"
-                c_items.append(item)
-
-        return {
-            "total_value": round(total_value, 2),
-            "total_items": len(item_values),
-            "a_class": {
-                "items": a_items,
-                "count": len(a_items),
-                "percentage_of_items": (
-                    round(len(a_items) / len(item_values) * 100, 1) if item_values else 0
-                ),
-                "value": round(sum(i["value"] for i in a_items), 2),
-                "percentage_of_value": (
-                    round(sum(i["value"] for i in a_items) / total_value * 100, 1)
-                    if total_value > 0
-                    else 0
-                ),
-            },
-            "b_class": {
-                "items": b_items,
-                "count": len(b_items),
-                "percentage_of_items": (
-                    round(len(b_items) / len(item_values) * 100, 1) if item_values else 0
-                ),
-                "value": round(sum(i["value"] for i in b_items), 2),
-                "percentage_of_value": (
-                    round(sum(i["value"] for i in b_items) / total_value * 100, 1)
-                    if total_value > 0
-                    else 0
-                ),
-            },
-            "c_class": {
-                "items": c_items,
-                "count": len(c_items),
+        def summary(items: list[dict]) -> dict:
+            value = sum(i["value"] for i in items)
+            return {
+                "items": items,
+                "count": len(items),
                 "percentage_of_items": (
-                    round(len(c_items) / len(item_values) * 100, 1) if item_values else 0
+                    round(len(items) / len(snapshot) * 100, 1) if len(snapshot) else 0
                 ),
-                "value": round(sum(i["value"] for i in c_items), 2),
+                "value": round(value, 2),
                 "percentage_of_value": (
-                    round(sum(i["value"] for i in c_items) / total_value * 100, 1)
-                    if total_value > 0
-                    else 0
+                    round(value / total_value * 100, 1) if total_value > 0 else 0
                 ),
-            },
+            }
+
+        return {
+            "total_value": round(total_value, 2),
+            "total_items": len(snapshot),
+            "a_class": summary(by_class["A"]),
+            "b_class": summary(by_class["B"]),
+            "c_class": summary(by_class["C"]),
         }
 
     async def get_cost_analysis(
@@ -987,40 +810,25 @@ class InventoryAnalytics:
         - Top consumed items
         - Recent movements
         """
+        snapshot = await load_snapshot(self.db, self.tenant_id)
+
         # Total SKUs
-        total_skus_stmt = select(func.count(InventoryItem.id)).where(
-            and_(
-                InventoryItem.tenant_id == self.tenant_id,
-                InventoryItem.is_active is True,
-            )
-        )
-        total_skus = (await self.db.execute(total_skus_stmt)).scalar() or 0
+        total_skus = len(snapshot)
 
         # Total inventory value
         valuation = await self.get_inventory_valuation()
 
         # Low stock count
-        low_stock_stmt = select(func.count(InventoryItem.id)).where(
-            and_(
-                InventoryItem.tenant_id == self.tenant_id,
-                InventoryItem.is_active is True,
-                InventoryItem.available_stock <= InventoryItem.reorder_level,
-            )
-        )
-        low_stock_count = (await self.db.execute(low_stock_stmt)).scalar() or 0
+        low_stock_count = int(np.sum(snapshot.available_stock <= snapshot.reorder_level))
 
         # Expiring soon (30 days)
-        expiring_date = date.today() + timedelta(days=30)
-        expiring_stmt = select(func.count(InventoryItem.id)).where(
-            and_(
-                InventoryItem.tenant_id == self.tenant_id,
-                InventoryItem.is_active is True,
-                InventoryItem.has_expiry is True,
-                InventoryItem.expiry_date <= expiring_date,
-                InventoryItem.current_stock > 0,
+        expiring_count = int(
+            np.sum(
+                snapshot.has_expiry
+                & (snapshot.days_to_expiry() <= 30)
+                & (snapshot.current_stock > 0)
             )
         )
-        expiring_count = (await self.db.execute(expiring_stmt)).scalar() or 0
 
         # Top consumed items (last 30 days)
         last_30_days = datetime.now() - timedelta(days=30)
@@ -1090,3 +898,56 @@ class InventoryAnalytics:
             "by_category": valuation.by_category,
             "by_warehouse": valuation.by_warehouse,
         }
+
+
+def _forecast_for(
+    snapshot: InventorySnapshot, forecast: dict[str, np.ndarray], i: int
+) -> ConsumptionForecast:
+    """ConsumptionForecast for item ``i`` of a snapshot forecast"""
+    if not forecast["has_history"][i]:
+        # No consumption history
+        return ConsumptionForecast(
+            item_id=snapshot.item_ids[i],
+            item_name=snapshot.names[i],
+            current_stock=float(snapshot.current_stock[i]),
+            avg_daily_consumption=0.0,
+            avg_weekly_consumption=0.0,
+            avg_monthly_consumption=0.0,
+            days_until_stockout=999,
+            reorder_date=date.today() + timedelta(days=999),
+            recommended_order_qty=float(snapshot.reorder_quantity[i]),
+            confidence=0.0,
+        )
+
+    avg_daily = float(forecast["avg_daily"][i])
+    return ConsumptionForecast(
+        item_id=snapshot.item_ids[i],
+        item_name=snapshot.names[i],
+        current_stock=float(snapshot.current_stock[i]),
+        avg_daily_consumption=round(avg_daily, 2),
+        avg_weekly_consumption=round(avg_daily * 7, 2),
+        avg_monthly_consumption=round(avg_daily * 30, 2),
+        days_until_stockout=int(forecast["days_until_stockout"][i]),
+        reorder_date=date.today() + timedelta(days=int(forecast["reorder_days"][i])),
+        recommended_order_qty=round(float(forecast["recommended_order_qty"][i]), 2),
+        confidence=round(float(forecast["confidence"][i]), 2),
+    )
+
+
+def _stock_entry(snapshot: InventorySnapshot, i: int) -> dict:
+    """Common fields of slow-moving and dead-stock entries"""
+    current_stock = float(snapshot.current_stock[i])
+    unit_cost = float(snapshot.average_cost[i])
+    return {
+        "item_id": snapshot.item_ids[i],
+        "item_name": snapshot.names[i],
+        "sku": snapshot.skus[i],
+        "current_stock": current_stock,
+        "unit_cost": unit_cost,
+        "total_value": round(current_stock * unit_cost, 2),
+    }
+
+
+def _last_issue_date(snapshot: InventorySnapshot, i: int) -> str | None:
+    last_issue = snapshot.last_issue[i]
+    return None if np.isnat(last_issue) else str(last_issue.astype("datetime64[D]"))
@@ -246,6 +246,8 @@ class InventoryItem(TenantEntity):
             "barcode",
             postgresql_where=sa.text("barcode IS NOT NULL"),
         ),
+        # Latest item change per tenant (analytics snapshot watermark)
+        Index("idx_inventory_items_tenant_updated", "tenant_id", "updated_at"),
     )
 
 
@@ -311,6 +313,8 @@ class InventoryMovement(TenantEntity):
             "tenant_id",
             sa.text("movement_date DESC"),
         ),
+        # Latest recorded movement per tenant (analytics snapshot watermark)
+        Index("idx_inventory_movements_tenant_created", "tenant_id", "created_at"),
     )
 
 
@@ -0,0 +1,171 @@
+"""
+Unit Tests for the Inventory Analytics Snapshot
+اختبارات الوحدة للقطة تحليلات المخزون
+"""
+
+import statistics
+from datetime import UTC, date, datetime, timedelta
+from decimal import Decimal
+from unittest.mock import AsyncMock, patch
+
+import numpy as np
+import pytest
+
+NOW = datetime.now(UTC)
+
+
+def item_row(item_id, stock=100.0, available=None, reorder_level=20.0, cost="10.00", **extra):
+    """(id, name_en, sku, category_code, current_stock, available_stock,
+    reorder_level, reorder_quantity, average_cost, has_expiry, expiry_date,
+    supplier_name, lead_time_days)"""
+    return (
+        item_id,
+        f"Item {item_id}",
+        f"SKU-{item_id}",
+        extra.get("category", "FERT"),
+        stock,
+        stock if available is None else available,
+        reorder_level,
+        50.0,
+        Decimal(cost),
+        extra.get("expiry") is not None,
+        extra.get("expiry"),
+        extra.get("supplier"),
+        extra.get("lead_time"),
+    )
+
+
+@pytest.fixture
+def snapshot():
+    from src.analytics_snapshot import InventorySnapshot
+
+    steady = [4.0, 6.0] * 20  # 40 days, mean 5
+    items = [
+        item_row("steady", stock=100.0, supplier="AgriSupply", lead_time=10),
+        item_row("sparse", stock=30.0, available=10.0),
+        item_row("idle", stock=200.0, cost="15.00", category="SEED"),
+        item_row("expiring", stock=5.0, expiry=NOW.date() + timedelta(days=20)),
+        item_row("empty", stock=0.0, available=-3.0),
+    ]
+    consumption = [("steady", steady), ("sparse", [1.0, 3.0]), ("unknown", [9.0])]
+    issues = [
+        ("steady", Decimal("500.00"), NOW - timedelta(hours=5)),
+        ("sparse", Decimal("12.50"), NOW - timedelta(days=120)),
+        ("unknown", Decimal("1.00"), NOW),  # Inactive item, ignored
+    ]
+    return InventorySnapshot.from_rows("t1", items, consumption, issues, taken_at=NOW)
+
+
+class TestSnapshotMetrics:
+    """Vectorized metrics follow the per-item rules"""
+
+    def test_forecast(self, snapshot):
+        """Averages, stockout, lead time and confidence per item"""
+        forecast = snapshot.forecast(forecast_days=90)
+        steady, sparse, idle = 0, 1, 2
+
+        assert forecast["avg_daily"][steady] == 5.0
+        assert forecast["days_until_stockout"][steady] == 20
+        assert forecast["reorder_days"][steady] == 3  # 20 - 10 lead - 7 safety
+        assert forecast["recommended_order_qty"][steady] == 5.0 * 90 + 5.0 * 7
+        cv = statistics.stdev([4.0, 6.0] * 20) / 5.0
+        assert forecast["confidence"][steady] == pytest.approx(1.0 - cv / 2)
+
+        # Under 30 days of data: default lead time, low confidence
+        assert forecast["days_until_stockout"][sparse] == 5
+        assert forecast["reorder_days"][sparse] == 0
+        assert forecast["confidence"][sparse] == 0.3
+
+        # No history
+        assert not forecast["has_history"][idle]
+        assert forecast["days_until_stockout"][idle] == 999
+        assert forecast["recommended_order_qty"][idle] == 50.0
+        assert forecast["confidence"][idle] == 0.0
+
+    def test_turnover_and_abc(self, snapshot):
+        """Turnover velocity and Pareto classes by stock value"""
+        turnover = snapshot.turnover()
+        assert turnover["turnover_ratio"][0] == 0.5
+        assert turnover["velocity"].tolist() == ["slow", "dead", "dead", "dead", "dead"]
+        assert turnover["days_of_inventory"][2] == 999.0
+
+        abc = snapshot.abc_classes()
+        ranked = [snapshot.item_ids[i] for i in abc["order"]]
+        assert ranked == ["idle", "steady", "sparse", "expiring", "empty"]
+        assert abc["class"].tolist() == ["A", "B", "C", "C", "C"]
+        assert abc["cumulative_percentage"][-1] == pytest.approx(100.0)
+
+    def test_ages(self, snapshot):
+        """Days since the last issue and days to expiry"""
+        assert snapshot.days_since_issue(NOW).tolist() == [0, 120, 999, 999, 999]
+        to_expiry = snapshot.days_to_expiry(NOW.date())
+        assert to_expiry[3] == 20
+        assert np.isnan(to_expiry[0])
+
+    def test_empty_tenant(self):
+        """A tenant without items gives empty arrays"""
+        from src.analytics_snapshot import InventorySnapshot
+
+        empty = InventorySnapshot.from_rows("t1", [], [], [], taken_at=NOW)
+
+        assert len(empty) == 0
+        assert len(empty.forecast()["avg_daily"]) == 0
+        assert len(empty.abc_classes()["order"]) == 0
+
+
+class TestSnapshotAnalytics:
+    """InventoryAnalytics reports read from the snapshot"""
+
+    @pytest.fixture
+    def analytics(self, snapshot, sample_tenant_id):
+        from src.inventory_analytics import InventoryAnalytics
+
+        with patch(
+            "src.inventory_analytics.load_snapshot", AsyncMock(return_value=snapshot)
+        ) as load:
+            yield InventoryAnalytics(AsyncMock(), sample_tenant_id)
+            assert load.await_count > 0
+
+    @pytest.mark.asyncio
+    async def test_forecasts_and_reorder(self, analytics):
+        """All forecasts, filters and reorder urgency"""
+        forecasts = await analytics.get_all_forecasts()
+        assert [f.item_id for f in forecasts] == ["steady", "sparse", "idle", "expiring", "empty"]
+        assert forecasts[0].reorder_date == date.today() + timedelta(days=3)
+
+        seeds = await analytics.get_all_forecasts(category="SEED")
+        assert [f.item_id for f in seeds] == ["idle"]
+
+        recommendations = await analytics.get_reorder_recommendations()
+        assert [(r["item_id"], r["urgency"]) for r in recommendations] == [
+            ("empty", "critical"),
+            ("sparse", "high"),
+            ("expiring", "medium"),
+        ]
+        assert recommendations[2]["lead_time_days"] == 7
+
+    @pytest.mark.asyncio
+    async def test_slow_and_dead_stock(self, analytics):
+        """Items in stock without recent issues or close to expiry"""
+        slow = await analytics.identify_slow_moving(days_threshold=90)
+        assert [i["item_id"] for i in slow] == ["idle", "sparse", "expiring"]
+        assert slow[0]["last_movement_date"] is None
+        assert slow[1]["days_since_movement"] >= 120
+
+        dead = await analytics.identify_dead_stock(days_threshold=180)
+        reasons = {i["item_id"]: i["reason"] for i in dead}
+        assert reasons["idle"] == "No movement for 999 days"
+        assert reasons["expiring"].startswith("No movement for 999 days and expiring in")
+        assert "sparse" not in reasons
+
+    @pytest.mark.asyncio
+    async def test_abc_analysis(self, analytics):
+        """Class summaries add up to the tenant totals"""
+        abc = await analytics.get_abc_analysis()
+
+        assert abc["total_items"] == 5
+        assert abc["total_value"] == 4350.0
+        assert abc["a_class"]["count"] == 1
+        assert abc["a_class"]["items"][0]["sku"] == "SKU-idle"
+        counts = sum(abc[key]["count"] for key in ("a_class", "b_class", "c_class"))
+        assert counts == 5
@@ -44,6 +44,11 @@ SERVICE_NAME = "knowledge-graph"
 SERVICE_VERSION = "1.0.0"
 SERVICE_PORT = 8140
 
+# Graph store: snapshots + delta log live here; unset keeps the graph in memory
+GRAPH_DATA_DIR = os.getenv("KNOWLEDGE_GRAPH_DATA_DIR")
+GRAPH_COMPACT_AFTER = int(os.getenv("KNOWLEDGE_GRAPH_COMPACT_AFTER", "10000"))
+GRAPH_CACHE_SIZE = int(os.getenv("KNOWLEDGE_GRAPH_CACHE_SIZE", "4096"))
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("knowledge-graph")
@@ -61,7 +66,11 @@ async def lifespan(app: FastAPI):
     logger.info(f"🚀 Starting {SERVICE_NAME} v{SERVICE_VERSION}")
 
     # Initialize knowledge graph service
-    graph_service = KnowledgeGraphService()
+    graph_service = KnowledgeGraphService(
+        data_dir=GRAPH_DATA_DIR,
+        compact_after=GRAPH_COMPACT_AFTER,
+        cache_size=GRAPH_CACHE_SIZE,
+    )
     await graph_service.initialize()
     app.state.graph_service = graph_service
 
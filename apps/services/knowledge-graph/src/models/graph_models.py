@@ -30,6 +30,7 @@ class Crop(BaseModel):
     name_ar: str = Field(..., description="Arabic crop name")
     description_en: str | None = Field(None, description="English description")
     description_ar: str | None = Field(None, description="Arabic description")
+    synonyms: list[str] = Field(default_factory=list, description="Other English or Arabic names, searchable")
     growing_season: str | None = Field(None, description="Growing season (spring/summer/fall/winter)")
     family: str | None = Field(None, description="Botanical family")
     attributes: dict[str, Any] = Field(default_factory=dict, description="Additional attributes")
@@ -55,6 +56,7 @@ class Disease(BaseModel):
     name_ar: str = Field(..., description="Arabic disease name")
     description_en: str | None = Field(None, description="English description")
     description_ar: str | None = Field(None, description="Arabic description")
+    synonyms: list[str] = Field(default_factory=list, description="Other English or Arabic names, searchable")
     pathogen_type: str | None = Field(None, description="Type of pathogen (fungal, bacterial, viral, etc.)")
     symptoms_en: list[str] | None = Field(None, description="List of English symptoms")
     symptoms_ar: list[str] | None = Field(None, description="List of Arabic symptoms")
@@ -84,6 +86,7 @@ class Treatment(BaseModel):
     name_ar: str = Field(..., description="Arabic treatment name")
     description_en: str | None = Field(None, description="English description")
     description_ar: str | None = Field(None, description="Arabic description")
+    synonyms: list[str] = Field(default_factory=list, description="Other English or Arabic names, searchable")
     treatment_type: str | None = Field(None, description="Type (fungicide, bactericide, insecticide, etc.)")
     active_ingredient: str | None = Field(None, description="Active ingredient")
     concentration: str | None = Field(None, description="Concentration/dosage (e.g., '0.2%')")
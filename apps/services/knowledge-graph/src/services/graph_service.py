@@ -11,8 +11,9 @@ Handles all graph operations including:
 
 import json
 import logging
+from collections import OrderedDict
+from collections.abc import Iterator, Mapping
 from typing import Any, Dict, List, Optional, Tuple
-import networkx as nx
 
 from models import (
     Crop,
@@ -24,25 +25,47 @@ from models import (
     GraphEdge,
     PathResponse,
 )
+from storage import GraphStore
 
 logger = logging.getLogger(__name__)
 
+# Delta log entries replayed at startup before the service compacts them
+DEFAULT_COMPACT_AFTER = 10_000
+DEFAULT_CACHE_SIZE = 4096
+
 
 class KnowledgeGraphService:
     """
-    In-memory knowledge graph using NetworkX.
-    For production, this should be backed by PostgreSQL JSONB or Neo4j.
+    Knowledge graph on a GraphStore: CSR snapshots memory-mapped from
+    ``data_dir`` plus an append-only delta log, or in memory without one.
+    Traversal and search results are cached until the next write.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        data_dir: str | None = None,
+        compact_after: int = DEFAULT_COMPACT_AFTER,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+    ):
         """Initialize the knowledge graph"""
-        self.graph: nx.DiGraph = nx.DiGraph()
-        self.entities: dict[str, dict[str, Any]] = {}
-        self.relationships: dict[str, Relationship] = {}
+        self.graph = GraphStore(data_dir)
+        self.entities = EntityView(self.graph)
+        self.relationships = RelationshipView(self.graph)
+        self.cache = QueryCache(self.graph, cache_size)
+        self.compact_after = compact_after
         logger.info("Knowledge Graph Service initialized")
 
     async def initialize(self):
-        """Initialize with sample data"""
+        """Open the stored graph, or start from sample data when empty"""
+        if self.graph.data_dir and self.graph.delta_size >= self.compact_after:
+            logger.info(f"Compacting {self.graph.delta_size} graph delta log entries")
+            self.graph.compact()
+        if self.graph.number_of_nodes() > 0:
+            logger.info(
+                f"Knowledge Graph loaded: {self.graph.number_of_nodes()} nodes, "
+                f"{self.graph.number_of_edges()} edges"
+            )
+            return
         logger.info("Initializing Knowledge Graph with sample data")
         await self._load_sample_data()
 
@@ -54,6 +77,7 @@ class KnowledgeGraphService:
                 "id": "wheat",
                 "name_en": "Wheat",
                 "name_ar": "القمح",
+                "synonyms": ["Bread wheat", "حنطة"],
                 "growing_season": "winter",
                 "family": "Poaceae",
             },
@@ -79,6 +103,7 @@ class KnowledgeGraphService:
                 "id": "powdery-mildew",
                 "name_en": "Powdery Mildew",
                 "name_ar": "البياض الدقيقي",
+                "synonyms": ["Oidium"],
                 "pathogen_type": "fungal",
                 "severity_level": 7,
                 "symptoms_en": ["White powder coating", "Leaf distortion"],
@@ -258,40 +283,19 @@ class KnowledgeGraphService:
 
     async def add_crop(self, crop: Crop) -> bool:
         """Add a crop to the knowledge graph"""
-        node_id = f"crop:{crop.id}"
-        self.entities[node_id] = crop.model_dump()
-        self.graph.add_node(
-            node_id,
-            node_type="crop",
-            label=crop.name_en,
-            label_ar=crop.name_ar,
-        )
+        self.graph.add_node(f"crop:{crop.id}", "crop", crop.model_dump())
         logger.info(f"Added crop: {crop.id}")
         return True
 
     async def add_disease(self, disease: Disease) -> bool:
         """Add a disease to the knowledge graph"""
-        node_id = f"disease:{disease.id}"
-        self.entities[node_id] = disease.model_dump()
-        self.graph.add_node(
-            node_id,
-            node_type="disease",
-            label=disease.name_en,
-            label_ar=disease.name_ar,
-        )
+        self.graph.add_node(f"disease:{disease.id}", "disease", disease.model_dump())
         logger.info(f"Added disease: {disease.id}")
         return True
 
     async def add_treatment(self, treatment: Treatment) -> bool:
         """Add a treatment to the knowledge graph"""
-        node_id = f"treatment:{treatment.id}"
-        self.entities[node_id] = treatment.model_dump()
-        self.graph.add_node(
-            node_id,
-            node_type="treatment",
-            label=treatment.name_en,
-            label_ar=treatment.name_ar,
-        )
+        self.graph.add_node(f"treatment:{treatment.id}", "treatment", treatment.model_dump())
         logger.info(f"Added treatment: {treatment.id}")
         return True
 
@@ -314,49 +318,31 @@ class KnowledgeGraphService:
             logger.warning(f"One or both nodes do not exist: {source_node}, {target_node}")
             return False
 
-        rel_id = f"{source_node}--{relationship_type}--{target_node}"
-        relationship = Relationship(
-            id=rel_id,
-            source_type=source_type,
-            source_id=source_id,
-            target_type=target_type,
-            target_id=target_id,
-            relationship_type=relationship_type,
-            confidence=confidence,
-            evidence=evidence,
-        )
-
-        self.relationships[rel_id] = relationship
+        rel_id = relationship_id(source_node, relationship_type.value, target_node)
         self.graph.add_edge(
             source_node,
             target_node,
-            relationship_type=relationship_type.value,
+            relationship_type.value,
             confidence=confidence,
-            rel_id=rel_id,
+            evidence=evidence,
         )
         logger.info(f"Added relationship: {rel_id}")
         return True
 
     async def get_crop(self, crop_id: str) -> Crop | None:
         """Get a crop by ID"""
-        node_id = f"crop:{crop_id}"
-        if node_id in self.entities:
-            return Crop(**self.entities[node_id])
-        return None
+        data = self.graph.get_node(f"crop:{crop_id}")
+        return Crop(**data) if data else None
 
     async def get_disease(self, disease_id: str) -> Disease | None:
         """Get a disease by ID"""
-        node_id = f"disease:{disease_id}"
-        if node_id in self.entities:
-            return Disease(**self.entities[node_id])
-        return None
+        data = self.graph.get_node(f"disease:{disease_id}")
+        return Disease(**data) if data else None
 
     async def get_treatment(self, treatment_id: str) -> Treatment | None:
         """Get a treatment by ID"""
-        node_id = f"treatment:{treatment_id}"
-        if node_id in self.entities:
-            return Treatment(**self.entities[node_id])
-        return None
+        data = self.graph.get_node(f"treatment:{treatment_id}")
+        return Treatment(**data) if data else None
 
     async def get_related_entities(
         self,
@@ -364,36 +350,33 @@ class KnowledgeGraphService:
         entity_id: str,
         relationship_type: RelationshipType | None = None,
         limit: int = 50,
+        direction: str = "out",
     ) -> list[dict[str, Any]]:
-        """Get entities related to a given entity"""
-        node_id = f"{entity_type}:{entity_id}"
+        """
+        Get entities related to a given entity
 
-        if node_id not in self.graph:
-            return []
+        ``direction="in"`` follows edges that point at the entity, e.g. the
+        treatments COMPATIBLE with a crop or the diseases that AFFECT it.
+        """
+        node_id = f"{entity_type}:{entity_id}"
+        rel_type = relationship_type.value if relationship_type else None
+        cache_key = ("related", node_id, rel_type, direction, limit)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return [dict(entity) for entity in cached]
 
         related = []
-        successors = self.graph.successors(node_id)
-
-        for successor in successors:
-            edge_data = self.graph[node_id][successor]
-            edge_rel_type = edge_data.get("relationship_type")
-
-            # Filter by relationship type if specified
-            if relationship_type and edge_rel_type != relationship_type.value:
-                continue
-
-            if successor in self.entities:
-                entity_data = self.entities[successor].copy()
-                entity_data["relationship"] = {
-                    "type": edge_rel_type,
-                    "confidence": edge_data.get("confidence", 1.0),
-                }
-                related.append(entity_data)
-
-                if len(related) >= limit:
-                    break
-
-        return related
+        for entity_data, edge_rel_type, confidence in self.graph.neighbor_nodes(
+            node_id, rel_type, direction, limit
+        ):
+            entity_data["relationship"] = {
+                "type": edge_rel_type,
+                "confidence": confidence,
+            }
+            related.append(entity_data)
+
+        self.cache.put(cache_key, related)
+        return [dict(entity) for entity in related]
 
     async def find_shortest_path(
         self,
@@ -406,61 +389,52 @@ class KnowledgeGraphService:
         source_node = f"{source_type}:{source_id}"
         target_node = f"{target_type}:{target_id}"
 
-        if source_node not in self.graph or target_node not in self.graph:
+        path = self.graph.shortest_path(source_node, target_node)
+        if path is None:
             return None
-
-        try:
-            path = nx.shortest_path(self.graph, source_node, target_node)
-            length = len(path) - 1
-
-            # Build edges
-            edges = []
-            for i in range(len(path) - 1):
-                curr = path[i]
-                next_node = path[i + 1]
-                edge_data = self.graph[curr][next_node]
-
-                edges.append(
-                    GraphEdge(
-                        id=f"{curr}-->{next_node}",
-                        source=curr,
-                        target=next_node,
-                        relationship_type=RelationshipType(
-                            edge_data.get("relationship_type")
-                        ),
-                        confidence=edge_data.get("confidence", 1.0),
-                    )
+        length = len(path) - 1
+
+        # Build edges
+        edges = []
+        for curr, next_node in zip(path, path[1:]):
+            edge_rel_type, confidence = self.graph.edge_between(curr, next_node)
+            edges.append(
+                GraphEdge(
+                    id=f"{curr}-->{next_node}",
+                    source=curr,
+                    target=next_node,
+                    relationship_type=RelationshipType(edge_rel_type),
+                    confidence=confidence,
                 )
-
-            # Get start and end node details
-            start_node_data = self.entities.get(path[0], {})
-            end_node_data = self.entities.get(path[-1], {})
-
-            start_type, start_id = path[0].split(":", 1)
-            end_type, end_id = path[-1].split(":", 1)
-
-            return PathResponse(
-                start_node=GraphNode(
-                    id=path[0],
-                    node_type=start_type,
-                    label=start_node_data.get("name_en", ""),
-                    label_ar=start_node_data.get("name_ar"),
-                    metadata={},
-                ),
-                end_node=GraphNode(
-                    id=path[-1],
-                    node_type=end_type,
-                    label=end_node_data.get("name_en", ""),
-                    label_ar=end_node_data.get("name_ar"),
-                    metadata={},
-                ),
-                path=path,
-                length=length,
-                edges=edges,
-                explanation=f"Found path of length {length} from {start_id} to {end_id}",
             )
-        except nx.NetworkXNoPath:
-            return None
+
+        # Get start and end node details
+        start_node_data = self.graph.get_node(path[0]) or {}
+        end_node_data = self.graph.get_node(path[-1]) or {}
+
+        start_type, start_id = path[0].split(":", 1)
+        end_type, end_id = path[-1].split(":", 1)
+
+        return PathResponse(
+            start_node=GraphNode(
+                id=path[0],
+                node_type=start_type,
+                label=start_node_data.get("name_en", ""),
+                label_ar=start_node_data.get("name_ar"),
+                metadata={},
+            ),
+            end_node=GraphNode(
+                id=path[-1],
+                node_type=end_type,
+                label=end_node_data.get("name_en", ""),
+                label_ar=end_node_data.get("name_ar"),
+                metadata={},
+            ),
+            path=path,
+            length=length,
+            edges=edges,
+            explanation=f"Found path of length {length} from {start_id} to {end_id}",
+        )
 
     async def search_entities(
         self,
@@ -468,88 +442,54 @@ class KnowledgeGraphService:
         entity_type: str | None = None,
         limit: int = 20,
     ) -> list[dict[str, Any]]:
-        """Search for entities by name or description"""
-        results = []
-        query_lower = query.lower()
-
-        for node_id, entity_data in self.entities.items():
-            node_type = node_id.split(":")[0]
-
-            # Filter by entity type if specified
-            if entity_type and node_type != entity_type:
-                continue
+        """
+        Search entities by English or Arabic name, synonym or description
 
-            # Search in English and Arabic names and descriptions
-            matches = False
-            for field in ["name_en", "name_ar", "description_en", "description_ar"]:
-                if field in entity_data:
-                    value = str(entity_data.get(field, "")).lower()
-                    if query_lower in value:
-                        matches = True
-                        break
+        Every query word must start a word of the entity; whole-word matches
+        come first.
+        """
+        cache_key = ("search", query, entity_type, limit)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return [dict(entity) for entity in cached]
 
-            if matches:
-                entity_data_copy = entity_data.copy()
-                entity_data_copy["id"] = node_id
-                results.append(entity_data_copy)
-
-                if len(results) >= limit:
-                    break
-
-        return results
+        results = []
+        for node_id in self.graph.search(query, entity_type, limit):
+            entity_data = self.graph.get_node(node_id)
+            entity_data["id"] = node_id
+            results.append(entity_data)
+
+        self.cache.put(cache_key, results)
+        return [dict(entity) for entity in results]
+
+    async def _get_all(self, entity_type: str, limit: int) -> list[dict[str, Any]]:
+        entities = []
+        for node_id in self.graph.nodes(entity_type, limit):
+            data = self.graph.get_node(node_id)
+            data["id"] = node_id
+            entities.append(data)
+        return entities
 
     async def get_all_crops(self, limit: int = 100) -> list[dict[str, Any]]:
         """Get all crops"""
-        crops = []
-        for node_id, data in self.entities.items():
-            if node_id.startswith("crop:"):
-                data_copy = data.copy()
-                data_copy["id"] = node_id
-                crops.append(data_copy)
-                if len(crops) >= limit:
-                    break
-        return crops
+        return await self._get_all("crop", limit)
 
     async def get_all_diseases(self, limit: int = 100) -> list[dict[str, Any]]:
         """Get all diseases"""
-        diseases = []
-        for node_id, data in self.entities.items():
-            if node_id.startswith("disease:"):
-                data_copy = data.copy()
-                data_copy["id"] = node_id
-                diseases.append(data_copy)
-                if len(diseases) >= limit:
-                    break
-        return diseases
+        return await self._get_all("disease", limit)
 
     async def get_all_treatments(self, limit: int = 100) -> list[dict[str, Any]]:
         """Get all treatments"""
-        treatments = []
-        for node_id, data in self.entities.items():
-            if node_id.startswith("treatment:"):
-                data_copy = data.copy()
-                data_copy["id"] = node_id
-                treatments.append(data_copy)
-                if len(treatments) >= limit:
-                    break
-        return treatments
+        return await self._get_all("treatment", limit)
 
     async def get_graph_stats(self) -> dict[str, Any]:
         """Get graph statistics"""
-        crop_count = sum(1 for node in self.graph.nodes() if node.startswith("crop:"))
-        disease_count = sum(
-            1 for node in self.graph.nodes() if node.startswith("disease:")
-        )
-        treatment_count = sum(
-            1 for node in self.graph.nodes() if node.startswith("treatment:")
-        )
-
         return {
             "total_nodes": self.graph.number_of_nodes(),
             "total_edges": self.graph.number_of_edges(),
-            "crops": crop_count,
-            "diseases": disease_count,
-            "treatments": treatment_count,
+            "crops": self.graph.count_nodes("crop"),
+            "diseases": self.graph.count_nodes("disease"),
+            "treatments": self.graph.count_nodes("treatment"),
             "relationships": len(self.relationships),
         }
 
@@ -564,3 +504,104 @@ class KnowledgeGraphService:
         except Exception as e:
             logger.error(f"Health check failed: {e}")
             return False
+
+
+def relationship_id(source_node: str, relationship_type: str, target_node: str) -> str:
+    """Relationship IDs are "<source node>--<type>--<target node>" """
+    return f"{source_node}--{relationship_type}--{target_node}"
+
+
+class EntityView(Mapping):
+    """Read-only ``{node_id: entity dict}`` view of the graph store"""
+
+    def __init__(self, graph: GraphStore):
+        self.graph = graph
+
+    def __getitem__(self, node_id: str) -> dict[str, Any]:
+        data = self.graph.get_node(node_id)
+        if data is None:
+            raise KeyError(node_id)
+        return data
+
+    def __contains__(self, node_id: object) -> bool:
+        return node_id in self.graph
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.graph.nodes())
+
+    def __len__(self) -> int:
+        return self.graph.number_of_nodes()
+
+
+class RelationshipView(Mapping):
+    """Read-only ``{relationship_id: Relationship}`` view of the graph store"""
+
+    def __init__(self, graph: GraphStore):
+        self.graph = graph
+
+    def _parse(self, rel_id: str) -> tuple[str, str, str] | None:
+        for rel_type in RelationshipType:
+            source, sep, target = rel_id.partition(f"--{rel_type.value}--")
+            if sep:
+                return source, rel_type.value, target
+        return None
+
+    def __getitem__(self, rel_id: str) -> Relationship:
+        parsed = self._parse(rel_id)
+        edge = self.graph.get_edge(parsed[0], parsed[2], parsed[1]) if parsed else None
+        if edge is None:
+            raise KeyError(rel_id)
+        source, rel_type, target = parsed
+        source_type, source_id = source.split(":", 1)
+        target_type, target_id = target.split(":", 1)
+        return Relationship(
+            id=rel_id,
+            source_type=source_type,
+            source_id=source_id,
+            target_type=target_type,
+            target_id=target_id,
+            relationship_type=RelationshipType(rel_type),
+            confidence=edge["confidence"],
+            evidence=edge["evidence"],
+        )
+
+    def __contains__(self, rel_id: object) -> bool:
+        parsed = self._parse(rel_id) if isinstance(rel_id, str) else None
+        return bool(parsed) and self.graph.get_edge(parsed[0], parsed[2], parsed[1]) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return (relationship_id(s, t, d) for s, t, d in self.graph.edges())
+
+    def __len__(self) -> int:
+        return self.graph.number_of_edges()
+
+
+class QueryCache:
+    """LRU of query results, emptied whenever the graph store's version moves"""
+
+    def __init__(self, graph: GraphStore, max_entries: int = DEFAULT_CACHE_SIZE):
+        self.graph = graph
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple, Any] = OrderedDict()
+        self._version = graph.version
+
+    def get(self, key: tuple) -> Any | None:
+        if self._version != self.graph.version:
+            self._entries.clear()
+            self._version = self.graph.version
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: tuple, value: Any) -> None:
+        if self.max_entries <= 0 or self._version != self.graph.version:
+            return
+        self._entries[key] = value
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
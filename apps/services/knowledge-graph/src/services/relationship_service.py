@@ -55,6 +55,7 @@ class RelationshipService:
         entity_id: str,
         relationship_type: RelationshipType,
         limit: int = 50,
+        direction: str = "out",
     ) -> list[dict[str, Any]]:
         """Get entities related by a specific relationship type"""
         try:
@@ -63,6 +64,7 @@ class RelationshipService:
                 entity_id=entity_id,
                 relationship_type=relationship_type,
                 limit=limit,
+                direction=direction,
             )
         except Exception as e:
             logger.error(f"Error getting related entities: {e}")
@@ -140,11 +142,13 @@ class RelationshipService:
         limit: int = 50,
     ) -> list[dict[str, Any]]:
         """Get treatments compatible with a crop"""
+        # COMPATIBLE edges run treatment → crop
         return await self.get_related_by_type(
             entity_type="crop",
             entity_id=crop_id,
             relationship_type=RelationshipType.COMPATIBLE,
             limit=limit,
+            direction="in",
         )
 
     async def get_diseases_affecting_crop(
@@ -153,14 +157,14 @@ class RelationshipService:
         limit: int = 50,
     ) -> list[dict[str, Any]]:
         """Get diseases that affect a specific crop"""
-        # Get all nodes connected to this crop
-        related = await self.get_all_related(
+        # AFFECTS edges run disease → crop
+        return await self.get_related_by_type(
             entity_type="crop",
             entity_id=crop_id,
+            relationship_type=RelationshipType.AFFECTS,
             limit=limit,
+            direction="in",
         )
-        # Filter to only diseases
-        return [r for r in related if r.get("id", "").startswith("disease:")]
 
     async def get_preventive_treatments(
         self,
@@ -185,7 +189,9 @@ class RelationshipService:
     ) -> dict[str, Any]:
         """Validate if a relationship exists and return its details"""
         try:
-            rel_id = f"{source_type}:{source_id}--{relationship_type.value}--{target_type}:{target_id}"
+            rel_id = (
+                f"{source_type}:{source_id}--{relationship_type.value}--{target_type}:{target_id}"
+            )
             if rel_id in self.graph.relationships:
                 rel = self.graph.relationships[rel_id]
                 return {
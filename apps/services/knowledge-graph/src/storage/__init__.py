@@ -0,0 +1,18 @@
+"""
+Graph Storage
+تخزين الرسم البياني
+"""
+
+from .graph_store import GraphStore, Snapshot, term_pairs, write_snapshot
+from .names import name_terms, normalize, query_terms, tokenize
+
+__all__ = [
+    "GraphStore",
+    "Snapshot",
+    "write_snapshot",
+    "term_pairs",
+    "name_terms",
+    "normalize",
+    "query_terms",
+    "tokenize",
+]
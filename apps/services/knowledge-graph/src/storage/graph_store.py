@@ -0,0 +1,813 @@
+"""
+Graph Store
+مخزن الرسم البياني
+
+Nodes and typed edges of the knowledge graph in compact arrays:
+- Snapshot: node keys sorted (a node's index is its position), node types,
+  entity JSON, a forward and a reverse CSR adjacency (indptr, indices,
+  confidence) per relationship type, and the name-term index. Every array is
+  an .npy file opened with mmap, so startup maps files instead of parsing
+  them and uvicorn workers share one copy in the page cache.
+- Delta log: writes since the snapshot, appended as JSON lines and replayed
+  on open into an in-memory overlay.
+- compact() folds the overlay into a new snapshot and empties the log.
+
+Writes are upserts, so replaying a log entry twice is harmless. Processes
+sharing a data directory serialize appends and compaction with a file lock
+and pick up each other's writes before appending. Without a data directory
+the store lives only in memory.
+"""
+
+import fcntl
+import logging
+import os
+import shutil
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import orjson
+
+from .names import name_terms, query_terms
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = 1
+CURRENT_FILE = "CURRENT"
+DELTA_LOG = "delta.log"
+LOCK_FILE = ".lock"
+SNAPSHOT_DIR = "snapshots"
+
+# Edge confidence is stored as float32; reads round it back to this many places
+CONFIDENCE_DECIMALS = 6
+
+_CSR_PARTS = ("indptr", "indices", "confidence")
+
+
+@dataclass
+class Adjacency:
+    """CSR adjacency: the neighbours of node i are indices[indptr[i]:indptr[i + 1]]"""
+
+    indptr: np.ndarray  # int64, one more than the number of rows
+    indices: np.ndarray  # int32, sorted within each row
+    confidence: np.ndarray  # float32, aligned with indices
+
+    @classmethod
+    def from_pairs(
+        cls, rows: np.ndarray, cols: np.ndarray, confidence: np.ndarray, n: int
+    ) -> "Adjacency":
+        order = np.lexsort((cols, rows))
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+        return cls(
+            indptr=indptr,
+            indices=cols[order].astype(np.int32),
+            confidence=confidence[order].astype(np.float32),
+        )
+
+    def row(self, i: int) -> tuple[np.ndarray, np.ndarray]:
+        if i >= len(self.indptr) - 1:
+            return self.indices[:0], self.confidence[:0]
+        lo, hi = self.indptr[i], self.indptr[i + 1]
+        return self.indices[lo:hi], self.confidence[lo:hi]
+
+    def find(self, i: int, j: int) -> float | None:
+        """Confidence of the edge i → j, None without one"""
+        cols, confidence = self.row(i)
+        k = int(np.searchsorted(cols, j))
+        if k < len(cols) and cols[k] == j:
+            return float(confidence[k])
+        return None
+
+    def expand(self, frontier: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """All (neighbour, parent) pairs of a BFS frontier in one gather"""
+        frontier = frontier[frontier < len(self.indptr) - 1]
+        starts = self.indptr[frontier]
+        lengths = self.indptr[frontier + 1] - starts
+        total = int(lengths.sum())
+        if not total:
+            return self.indices[:0], frontier[:0]
+        first = np.cumsum(lengths) - lengths
+        positions = np.arange(total) + np.repeat(starts - first, lengths)
+        return self.indices[positions], np.repeat(frontier, lengths)
+
+    def pairs(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        rows = np.repeat(np.arange(len(self.indptr) - 1), np.diff(self.indptr))
+        return rows, np.asarray(self.indices), np.asarray(self.confidence)
+
+
+class Snapshot:
+    """Immutable arrays of one compacted graph version"""
+
+    def __init__(self, path: Path | None = None):
+        self.path = path
+        if path is None:
+            self.meta = {"node_types": [], "edge_types": [], "edge_count": 0}
+            self.keys = np.array([], dtype="S1")
+            self.types = np.array([], dtype=np.uint8)
+            self.offsets = np.zeros(1, dtype=np.int64)
+            self.data = np.array([], dtype=np.uint8)
+            self.terms = np.array([], dtype="S1")
+            self.term_indptr = np.zeros(1, dtype=np.int64)
+            self.term_nodes = np.array([], dtype=np.int32)
+            self.out: dict[str, Adjacency] = {}
+            self.inn: dict[str, Adjacency] = {}
+            self.evidence: dict[tuple[str, str, str], list[str]] = {}
+            return
+
+        def load(name: str) -> np.ndarray:
+            # A plain ndarray view skips np.memmap's per-slice Python overhead
+            return np.load(path / f"{name}.npy", mmap_mode="r").view(np.ndarray)
+
+        self.meta = orjson.loads((path / "meta.json").read_bytes())
+        if self.meta["format"] != SNAPSHOT_FORMAT:
+            raise ValueError(f"Unsupported graph snapshot format {self.meta['format']}")
+        self.keys = load("node_keys")
+        self.types = load("node_types")
+        self.offsets = load("node_offsets")
+        self.data = load("node_data")
+        self.terms = load("terms")
+        self.term_indptr = load("term_indptr")
+        self.term_nodes = load("term_nodes")
+        self.out = {}
+        self.inn = {}
+        for code, edge_type in enumerate(self.meta["edge_types"]):
+            for direction, adjacency in (("out", self.out), ("in", self.inn)):
+                adjacency[edge_type] = Adjacency(
+                    *(load(f"edges_{code}_{direction}_{part}") for part in _CSR_PARTS)
+                )
+        self.evidence = {
+            (src, edge_type, dst): evidence
+            for src, edge_type, dst, evidence in orjson.loads((path / "evidence.json").read_bytes())
+        }
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @property
+    def node_types(self) -> list[str]:
+        return self.meta["node_types"]
+
+    def index(self, key: bytes) -> int | None:
+        if len(key) > self.keys.itemsize:
+            return None
+        i = int(np.searchsorted(self.keys, key))
+        if i < len(self.keys) and self.keys[i] == key:
+            return i
+        return None
+
+    def blob(self, i: int) -> bytes:
+        return self.data[self.offsets[i] : self.offsets[i + 1]].tobytes()
+
+    def term_postings(self, term: str, prefix: bool = False) -> np.ndarray:
+        """Sorted nodes indexed under ``term``, or under any term it prefixes"""
+        key = term.encode()
+        if len(key) > self.terms.itemsize:
+            return np.asarray(self.term_nodes[:0])
+        lo = int(np.searchsorted(self.terms, key, "left"))
+        if not prefix or len(key) == self.terms.itemsize:
+            hi = int(np.searchsorted(self.terms, key, "right"))
+        else:
+            # UTF-8 never contains 0xff, so it sorts after every extension of key
+            hi = int(np.searchsorted(self.terms, key + b"\xff", "left"))
+        nodes = np.asarray(self.term_nodes[self.term_indptr[lo] : self.term_indptr[hi]])
+        return nodes if hi - lo <= 1 else _sorted_unique(nodes)
+
+
+def _sorted_unique(values: np.ndarray) -> np.ndarray:
+    values = np.sort(values)
+    if len(values) < 2:
+        return values
+    return values[np.concatenate(([True], values[1:] != values[:-1]))]
+
+
+def _intersect(postings: list[np.ndarray]) -> np.ndarray:
+    """Intersection of sorted unique arrays, smallest first"""
+    postings = sorted(postings, key=len)
+    result = postings[0]
+    for other in postings[1:]:
+        if not len(result):
+            break
+        result = np.intersect1d(result, other, assume_unique=True)
+    return result
+
+
+def write_snapshot(
+    path: Path,
+    keys: np.ndarray,
+    types: np.ndarray,
+    node_types: list[str],
+    blobs: list[bytes],
+    edges: dict[str, tuple[np.ndarray, np.ndarray, np.ndarray]],
+    terms: tuple[np.ndarray, np.ndarray],
+    evidence: dict[tuple[str, str, str], list[str]] | None = None,
+) -> None:
+    """
+    Write a snapshot directory from columns aligned by node position
+
+    ``keys`` are unique UTF-8 node keys in any order, ``types`` codes into
+    ``node_types``, ``blobs`` entity JSON. ``edges`` maps each relationship
+    type to (source, target, confidence) position arrays; a later duplicate
+    of an edge wins. ``terms`` pairs node positions with UTF-8 index terms.
+    """
+    path.mkdir(parents=True)
+    n = len(keys)
+    order = np.argsort(keys, kind="stable")
+    position = np.empty(n, dtype=np.int64)
+    position[order] = np.arange(n)
+    keys = keys[order]
+    if n > 1 and (keys[1:] == keys[:-1]).any():
+        raise ValueError("Duplicate node keys in graph snapshot")
+
+    def save(name: str, array: np.ndarray) -> None:
+        np.save(path / f"{name}.npy", array)
+
+    save("node_keys", keys)
+    save("node_types", np.asarray(types, dtype=np.uint8)[order])
+    ordered = [blobs[i] for i in order]
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in ordered], out=offsets[1:])
+    save("node_offsets", offsets)
+    save("node_data", np.frombuffer(b"".join(ordered), dtype=np.uint8))
+    del ordered
+
+    edge_types = sorted(edges)
+    edge_count = 0
+    for code, edge_type in enumerate(edge_types):
+        src, dst, confidence = edges[edge_type]
+        src, dst = position[src], position[dst]
+        # Keep the last write of each edge: unique() on the reversed keys
+        # returns first occurrences, i.e. the latest ones
+        _, last = np.unique((src * n + dst)[::-1], return_index=True)
+        keep = len(src) - 1 - last
+        src, dst, confidence = src[keep], dst[keep], confidence[keep]
+        edge_count += len(src)
+        for direction, (rows, cols) in (("out", (src, dst)), ("in", (dst, src))):
+            adjacency = Adjacency.from_pairs(rows, cols, confidence, n)
+            for part in _CSR_PARTS:
+                save(f"edges_{code}_{direction}_{part}", getattr(adjacency, part))
+
+    term_positions, term_values = terms
+    unique_terms, term_ids = np.unique(term_values, return_inverse=True)
+    term_nodes = position[term_positions]
+    postings = np.lexsort((term_nodes, term_ids))
+    term_indptr = np.zeros(len(unique_terms) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(term_ids, minlength=len(unique_terms)), out=term_indptr[1:])
+    save("terms", unique_terms if len(unique_terms) else np.array([], dtype="S1"))
+    save("term_indptr", term_indptr)
+    save("term_nodes", term_nodes[postings].astype(np.int32))
+
+    (path / "evidence.json").write_bytes(
+        orjson.dumps([[*key, value] for key, value in (evidence or {}).items()])
+    )
+    (path / "meta.json").write_bytes(
+        orjson.dumps(
+            {
+                "format": SNAPSHOT_FORMAT,
+                "node_count": n,
+                "edge_count": edge_count,
+                "node_types": node_types,
+                "edge_types": edge_types,
+                "created_at": datetime.now(UTC).isoformat(),
+            }
+        )
+    )
+
+
+def term_pairs(nodes: list[tuple[int, dict[str, Any]]]) -> tuple[np.ndarray, np.ndarray]:
+    """(position, term) pairs of entity dicts for ``write_snapshot``"""
+    positions: list[int] = []
+    values: list[bytes] = []
+    for i, data in nodes:
+        for term in name_terms(data):
+            positions.append(i)
+            values.append(term.encode())
+    return np.array(positions, dtype=np.int64), np.array(values, dtype="S")
+
+
+class GraphStore:
+    """
+    Typed, directed graph of entity nodes on a snapshot plus delta overlay
+
+    Nodes are addressed by key ("crop:wheat"); at most one edge of each
+    relationship type joins a pair of nodes.
+    """
+
+    def __init__(self, data_dir: str | os.PathLike | None = None):
+        self.data_dir = Path(data_dir) if data_dir else None
+        # Bumped on every applied write; query caches compare against it
+        self.version = 0
+        if self.data_dir is not None:
+            (self.data_dir / SNAPSHOT_DIR).mkdir(parents=True, exist_ok=True)
+            with self._locked():
+                self._load()
+        else:
+            self._reset(Snapshot(), None)
+
+    # ─────────────────────────────────────────────────────────────────────
+    # Loading and persistence
+    # ─────────────────────────────────────────────────────────────────────
+
+    def _reset(self, snapshot: Snapshot, name: str | None) -> None:
+        self._snap = snapshot
+        self._snapshot_name = name
+        self._base = len(snapshot)
+        self._type_counts = np.bincount(snapshot.types, minlength=len(snapshot.node_types))
+        self._edge_count = int(snapshot.meta["edge_count"])
+        # Overlay: nodes added after the snapshot get indices from len(snapshot)
+        self._new_keys: list[str] = []
+        self._new_index: dict[str, int] = {}
+        self._new_types: list[str] = []
+        self._data: dict[int, dict[str, Any]] = {}
+        self._out: dict[str, dict[int, dict[int, float]]] = {}
+        self._in: dict[str, dict[int, dict[int, float]]] = {}
+        self._terms: dict[str, set[int]] = {}
+        self._evidence = dict(snapshot.evidence)
+        self._delta_ops = 0
+        self._delta_csr: tuple[int, Adjacency, Adjacency] | None = None
+        self._log_offset = 0
+        self.version += 1
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        with open(self.data_dir / LOCK_FILE, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _current(self) -> str | None:
+        try:
+            return (self.data_dir / CURRENT_FILE).read_text().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def _load(self) -> None:
+        """Map the current snapshot and replay the delta log; caller holds the lock"""
+        name = self._current()
+        snapshot = Snapshot(self.data_dir / SNAPSHOT_DIR / name) if name else Snapshot()
+        self._reset(snapshot, name)
+        self._replay_tail()
+        logger.info(
+            f"Opened graph store {self.data_dir}: {self.number_of_nodes()} nodes, "
+            f"{self.number_of_edges()} edges, {self._delta_ops} delta log entries"
+        )
+
+    def _replay_tail(self) -> None:
+        """Apply log entries appended since the last read, including other processes'"""
+        log_path = self.data_dir / DELTA_LOG
+        if not log_path.exists():
+            return
+        with open(log_path, "rb+") as log:
+            log.seek(self._log_offset)
+            tail = log.read()
+            end = tail.rfind(b"\n") + 1
+            if end < len(tail):
+                # A torn final entry from a crash mid-append was never acknowledged
+                logger.warning(f"Dropping incomplete delta log entry in {log_path}")
+                log.truncate(self._log_offset + end)
+        for line in tail[:end].splitlines():
+            self._apply(orjson.loads(line))
+        self._log_offset += end
+
+    def _append(self, entry: dict[str, Any]) -> None:
+        if self.data_dir is None:
+            self._apply(entry)
+            return
+        with self._locked():
+            if self._current() != self._snapshot_name:
+                # Another process compacted; its snapshot includes our writes
+                self._load()
+            else:
+                self._replay_tail()
+            with open(self.data_dir / DELTA_LOG, "ab") as log:
+                log.write(orjson.dumps(entry) + b"\n")
+                log.flush()
+                os.fsync(log.fileno())
+                self._log_offset = log.tell()
+        self._apply(entry)
+
+    @property
+    def delta_size(self) -> int:
+        """Writes replayed on top of the snapshot"""
+        return self._delta_ops
+
+    def compact(self) -> None:
+        """Write the merged graph as a new snapshot and empty the delta log"""
+        if self.data_dir is None:
+            raise ValueError("An in-memory graph store has nothing to compact")
+        with self._locked():
+            if self._current() != self._snapshot_name:
+                self._load()
+            else:
+                self._replay_tail()
+            name = f"{int(datetime.now(UTC).timestamp() * 1000):015d}"
+            self._write_merged(self.data_dir / SNAPSHOT_DIR / name)
+            tmp = self.data_dir / f"{CURRENT_FILE}.tmp"
+            tmp.write_text(name)
+            os.replace(tmp, self.data_dir / CURRENT_FILE)
+            # Replaying the old log on the new snapshot would be harmless,
+            # so a crash before this truncation loses nothing
+            open(self.data_dir / DELTA_LOG, "wb").close()
+            previous = self._snapshot_name
+            self._load()
+            if previous:
+                shutil.rmtree(self.data_dir / SNAPSHOT_DIR / previous, ignore_errors=True)
+
+    def _write_merged(self, path: Path) -> None:
+        snap = self._snap
+        n = self.number_of_nodes()
+        node_types = list(dict.fromkeys([*snap.node_types, *self._new_types]))
+        type_codes = {t: code for code, t in enumerate(node_types)}
+        keys = np.concatenate(
+            [np.asarray(snap.keys), np.array([k.encode() for k in self._new_keys], dtype="S")]
+        )
+        types = np.concatenate(
+            [np.asarray(snap.types), np.array([type_codes[t] for t in self._new_types])]
+        ).astype(np.uint8)
+        blobs = [orjson.dumps(self._data[i]) if i in self._data else snap.blob(i) for i in range(n)]
+
+        edges = {}
+        for edge_type in set(snap.out) | set(self._out):
+            parts = [snap.out[edge_type].pairs()] if edge_type in snap.out else []
+            rows = self._out.get(edge_type, {})
+            pairs = [(i, j, c) for i, row in rows.items() for j, c in row.items()]
+            if pairs:
+                i, j, c = zip(*pairs, strict=True)
+                parts.append((np.array(i), np.array(j), np.array(c)))
+            edges[edge_type] = tuple(np.concatenate(column) for column in zip(*parts, strict=True))
+
+        # Base postings of nodes without overlay data, plus overlay nodes' terms
+        term_ids = np.repeat(np.arange(len(snap.terms)), np.diff(snap.term_indptr))
+        stale = np.isin(snap.term_nodes, np.fromiter(self._data, dtype=np.int64))
+        overlay_positions, overlay_terms = term_pairs(list(self._data.items()))
+        terms = (
+            np.concatenate([np.asarray(snap.term_nodes)[~stale], overlay_positions]),
+            np.concatenate([np.asarray(snap.terms)[term_ids[~stale]], overlay_terms]),
+        )
+        write_snapshot(path, keys, types, node_types, blobs, edges, terms, self._evidence)
+
+    # ─────────────────────────────────────────────────────────────────────
+    # Writes
+    # ─────────────────────────────────────────────────────────────────────
+
+    def add_node(self, key: str, node_type: str, data: dict[str, Any]) -> None:
+        """Insert or replace a node's entity data"""
+        self._append(
+            {"op": "node", "key": key, "type": node_type, "data": orjson.loads(orjson.dumps(data))}
+        )
+
+    def add_edge(
+        self,
+        source: str,
+        target: str,
+        relationship_type: str,
+        confidence: float = 1.0,
+        evidence: list[str] | None = None,
+    ) -> None:
+        """Insert or replace the typed edge source → target"""
+        if source not in self or target not in self:
+            raise KeyError(f"Unknown node in edge {source} -> {target}")
+        self._append(
+            {
+                "op": "edge",
+                "source": source,
+                "target": target,
+                "type": relationship_type,
+                "confidence": confidence,
+                "evidence": evidence,
+            }
+        )
+
+    def _apply(self, entry: dict[str, Any]) -> None:
+        if entry["op"] == "node":
+            i = self.index(entry["key"])
+            if i is None:
+                i = self._base + len(self._new_keys)
+                self._new_keys.append(entry["key"])
+                self._new_index[entry["key"]] = i
+                self._new_types.append(entry["type"])
+            self._data[i] = entry["data"]
+            for term in name_terms(entry["data"]):
+                self._terms.setdefault(term, set()).add(i)
+        else:
+            i, j, edge_type = (
+                self.index(entry["source"]),
+                self.index(entry["target"]),
+                entry["type"],
+            )
+            if self._confidence(edge_type, i, j) is None:
+                self._edge_count += 1
+            self._out.setdefault(edge_type, {}).setdefault(i, {})[j] = entry["confidence"]
+            self._in.setdefault(edge_type, {}).setdefault(j, {})[i] = entry["confidence"]
+            evidence_key = (entry["source"], edge_type, entry["target"])
+            if entry["evidence"]:
+                self._evidence[evidence_key] = entry["evidence"]
+            else:
+                self._evidence.pop(evidence_key, None)
+        self._delta_ops += 1
+        self.version += 1
+
+    # ─────────────────────────────────────────────────────────────────────
+    # Nodes
+    # ─────────────────────────────────────────────────────────────────────
+
+    def index(self, key: str) -> int | None:
+        i = self._new_index.get(key)
+        return i if i is not None else self._snap.index(key.encode())
+
+    def key(self, i: int) -> str:
+        if i < self._base:
+            return self._snap.keys[i].decode()
+        return self._new_keys[i - self._base]
+
+    def node_type(self, i: int) -> str:
+        if i < self._base:
+            return self._snap.node_types[self._snap.types[i]]
+        return self._new_types[i - self._base]
+
+    def node_data(self, i: int) -> dict[str, Any]:
+        data = self._data.get(i)
+        return dict(data) if data is not None else orjson.loads(self._snap.blob(i))
+
+    def get_node(self, key: str) -> dict[str, Any] | None:
+        i = self.index(key)
+        return None if i is None else self.node_data(i)
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self.index(key) is not None
+
+    def number_of_nodes(self) -> int:
+        return self._base + len(self._new_keys)
+
+    def number_of_edges(self) -> int:
+        return self._edge_count
+
+    def count_nodes(self, node_type: str) -> int:
+        count = self._new_types.count(node_type)
+        if node_type in self._snap.node_types:
+            count += int(self._type_counts[self._snap.node_types.index(node_type)])
+        return count
+
+    def nodes(self, node_type: str | None = None, limit: int | None = None) -> list[str]:
+        """Node keys in snapshot order, then in insertion order"""
+        if node_type is None:
+            indices = np.arange(self._base)
+        elif node_type in self._snap.node_types:
+            code = self._snap.node_types.index(node_type)
+            indices = np.flatnonzero(self._snap.types == code)
+        else:
+            indices = np.arange(0)
+        keys = [k.decode() for k in self._snap.keys[indices[:limit]]]
+        for key, new_type in zip(self._new_keys, self._new_types, strict=True):
+            if limit is not None and len(keys) >= limit:
+                break
+            if node_type is None or new_type == node_type:
+                keys.append(key)
+        return keys
+
+    # ─────────────────────────────────────────────────────────────────────
+    # Edges
+    # ─────────────────────────────────────────────────────────────────────
+
+    @property
+    def edge_types(self) -> list[str]:
+        return list(dict.fromkeys([*self._snap.out, *self._out]))
+
+    def _confidence(self, edge_type: str, i: int, j: int) -> float | None:
+        row = self._out.get(edge_type, {}).get(i)
+        if row is not None and j in row:
+            return row[j]
+        adjacency = self._snap.out.get(edge_type)
+        if adjacency is None or i >= self._base:
+            return None
+        return adjacency.find(i, j)
+
+    def get_edge(self, source: str, target: str, relationship_type: str) -> dict[str, Any] | None:
+        """Confidence and evidence of one typed edge"""
+        i, j = self.index(source), self.index(target)
+        if i is None or j is None:
+            return None
+        confidence = self._confidence(relationship_type, i, j)
+        if confidence is None:
+            return None
+        return {
+            "confidence": round(confidence, CONFIDENCE_DECIMALS),
+            "evidence": self._evidence.get((source, relationship_type, target)),
+        }
+
+    def neighbors(
+        self,
+        key: str,
+        relationship_type: str | None = None,
+        direction: str = "out",
+        limit: int | None = None,
+    ) -> list[tuple[str, str, float]]:
+        """
+        (neighbour key, relationship type, confidence) along outgoing or
+        incoming edges, read from the per-type traversal index
+        """
+        return [
+            (self.key(j), edge_type, c)
+            for j, edge_type, c in self._adjacent(key, relationship_type, direction, limit)
+        ]
+
+    def neighbor_nodes(
+        self,
+        key: str,
+        relationship_type: str | None = None,
+        direction: str = "out",
+        limit: int | None = None,
+    ) -> list[tuple[dict[str, Any], str, float]]:
+        """Like ``neighbors`` with each neighbour's entity data instead of its key"""
+        return [
+            (self.node_data(j), edge_type, c)
+            for j, edge_type, c in self._adjacent(key, relationship_type, direction, limit)
+        ]
+
+    def _adjacent(
+        self,
+        key: str,
+        relationship_type: str | None,
+        direction: str,
+        limit: int | None,
+    ) -> list[tuple[int, str, float]]:
+        i = self.index(key)
+        if i is None:
+            return []
+        snapshot_index = self._snap.out if direction == "out" else self._snap.inn
+        overlay_index = self._out if direction == "out" else self._in
+        edge_types = [relationship_type] if relationship_type else self.edge_types
+        found: list[tuple[int, str, float]] = []
+        for edge_type in edge_types:
+            overlay = overlay_index.get(edge_type, {}).get(i, {})
+            adjacency = snapshot_index.get(edge_type)
+            if adjacency is None or i >= self._base:
+                adjacency = None
+            else:
+                # Snapshot edges first; rewritten ones take their overlay confidence
+                cols, confidence = adjacency.row(i)
+                if limit is not None:
+                    cols, confidence = cols[: limit - len(found)], confidence[: limit - len(found)]
+                for j, c in zip(cols.tolist(), confidence.tolist(), strict=True):
+                    found.append((j, edge_type, overlay.get(j, round(c, CONFIDENCE_DECIMALS))))
+            found.extend(
+                (j, edge_type, c)
+                for j, c in overlay.items()
+                if adjacency is None or adjacency.find(i, j) is None
+            )
+            if limit is not None and len(found) >= limit:
+                return found[:limit]
+        return found
+
+    def edges(self) -> Iterator[tuple[str, str, str]]:
+        """Every (source, relationship type, target) key triple"""
+        for edge_type in self.edge_types:
+            overlay = self._out.get(edge_type, {})
+            adjacency = self._snap.out.get(edge_type)
+            if adjacency is not None:
+                for i, j, _ in zip(*adjacency.pairs(), strict=True):
+                    if j not in overlay.get(i, {}):
+                        yield self.key(int(i)), edge_type, self.key(int(j))
+            for i, row in overlay.items():
+                for j in row:
+                    yield self.key(i), edge_type, self.key(j)
+
+    def _overlay_csr(self) -> tuple[Adjacency, Adjacency]:
+        """Overlay edges of every type as CSR, rebuilt after writes"""
+        if self._delta_csr is None or self._delta_csr[0] != self.version:
+            pairs = [(i, j) for rows in self._out.values() for i, row in rows.items() for j in row]
+            rows = np.array([i for i, _ in pairs], dtype=np.int64)
+            cols = np.array([j for _, j in pairs], dtype=np.int64)
+            n = self.number_of_nodes()
+            ones = np.ones(len(rows), dtype=np.float32)
+            self._delta_csr = (
+                self.version,
+                Adjacency.from_pairs(rows, cols, ones, n),
+                Adjacency.from_pairs(cols, rows, ones, n),
+            )
+        return self._delta_csr[1], self._delta_csr[2]
+
+    def shortest_path(self, source: str, target: str) -> list[str] | None:
+        """Fewest-hop directed path over all edge types (bidirectional BFS)"""
+        s, t = self.index(source), self.index(target)
+        if s is None or t is None:
+            return None
+        if s == t:
+            return [source]
+        overlay_out, overlay_in = self._overlay_csr()
+        forward = [*self._snap.out.values(), overlay_out]
+        backward = [*self._snap.inn.values(), overlay_in]
+        n = self.number_of_nodes()
+        parent = np.full(n, -1, dtype=np.int32)
+        child = np.full(n, -1, dtype=np.int32)
+        parent[s], child[t] = s, t
+        front, back = np.array([s]), np.array([t])
+
+        while front.size and back.size:
+            # Grow the smaller side by one full level
+            grow_front = front.size <= back.size
+            frontier, adjacencies = (front, forward) if grow_front else (back, backward)
+            seen, other = (parent, child) if grow_front else (child, parent)
+            expanded = [adjacency.expand(frontier) for adjacency in adjacencies]
+            reached = np.concatenate([e[0] for e in expanded]).astype(np.int64)
+            via = np.concatenate([e[1] for e in expanded]).astype(np.int64)
+            new = seen[reached] == -1
+            seen[reached[new]] = via[new]
+            frontier = np.unique(reached[new])
+            if grow_front:
+                front = frontier
+            else:
+                back = frontier
+            meet = frontier[other[frontier] != -1]
+            if meet.size:
+                return self._join_path(int(meet[0]), s, t, parent, child)
+        return None
+
+    def _join_path(
+        self, meet: int, s: int, t: int, parent: np.ndarray, child: np.ndarray
+    ) -> list[str]:
+        path = [meet]
+        while path[-1] != s:
+            path.append(int(parent[path[-1]]))
+        path.reverse()
+        while path[-1] != t:
+            path.append(int(child[path[-1]]))
+        return [self.key(i) for i in path]
+
+    def edge_between(self, source: str, target: str) -> tuple[str, float] | None:
+        """Relationship type and confidence of the first edge source → target"""
+        i, j = self.index(source), self.index(target)
+        if i is None or j is None:
+            return None
+        for edge_type in self.edge_types:
+            confidence = self._confidence(edge_type, i, j)
+            if confidence is not None:
+                return edge_type, round(confidence, CONFIDENCE_DECIMALS)
+        return None
+
+    # ─────────────────────────────────────────────────────────────────────
+    # Name search
+    # ─────────────────────────────────────────────────────────────────────
+
+    def search(self, query: str, node_type: str | None = None, limit: int = 20) -> list[str]:
+        """
+        Keys of nodes whose names, synonyms or descriptions have a word
+        starting with every query word. Whole-word matches rank first.
+        """
+        tokens = query_terms(query)
+        if not tokens:
+            return []
+        results: list[str] = []
+        exact = _intersect([self._term_postings(token, False) for token in tokens])
+        self._collect(results, exact, tokens, node_type, limit, whole_words=True)
+        if len(results) < limit:
+            prefix = _intersect([self._term_postings(token, True) for token in tokens])
+            prefix = np.setdiff1d(prefix, exact, assume_unique=True)
+            self._collect(results, prefix, tokens, node_type, limit, whole_words=False)
+        return results
+
+    def _collect(
+        self,
+        results: list[str],
+        candidates: np.ndarray,
+        tokens: list[str],
+        node_type: str | None,
+        limit: int,
+        whole_words: bool,
+    ) -> None:
+        for i in candidates.tolist():
+            if len(results) >= limit:
+                return
+            if node_type and self.node_type(i) != node_type:
+                continue
+            if i in self._data and not self._matches(self._data[i], tokens, whole_words):
+                continue
+            results.append(self.key(i))
+
+    def _term_postings(self, token: str, prefix: bool) -> np.ndarray:
+        nodes = self._snap.term_postings(token, prefix)
+        if not self._terms:
+            return nodes
+        if prefix:
+            overlay = [
+                i for term, ids in self._terms.items() if term.startswith(token) for i in ids
+            ]
+        else:
+            overlay = list(self._terms.get(token, ()))
+        if not overlay:
+            return nodes
+        return _sorted_unique(np.concatenate([nodes, np.array(overlay, dtype=nodes.dtype)]))
+
+    @staticmethod
+    def _matches(data: dict[str, Any], tokens: list[str], whole_words: bool) -> bool:
+        """Recheck overlay nodes, whose older versions may still be in the postings"""
+        terms = name_terms(data)
+        if whole_words:
+            return all(token in terms for token in tokens)
+        return all(any(term.startswith(token) for term in terms) for token in tokens)
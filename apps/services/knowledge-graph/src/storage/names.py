@@ -0,0 +1,62 @@
+"""
+Name Terms for Entity Search
+مصطلحات الأسماء للبحث عن الكيانات
+
+Entity names, synonyms and descriptions are split into normalized terms:
+- English is case-folded
+- Arabic drops diacritics and tatweel and folds the letter variants that
+  users type interchangeably (أ/إ/آ → ا, ى → ي, ة → ه)
+- Arabic words with the definite article also index their bare form, so
+  "قمح" finds "القمح"
+"""
+
+import re
+from typing import Any
+
+# Entity fields whose words are searchable
+NAME_FIELDS = ("name_en", "name_ar", "description_en", "description_ar")
+SYNONYM_FIELD = "synonyms"
+
+_ARABIC_DIACRITICS = re.compile("[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]")
+_ARABIC_FOLD = str.maketrans({"أ": "ا", "إ": "ا", "آ": "ا", "ٱ": "ا", "ى": "ي", "ة": "ه"})
+_TOKEN = re.compile(r"\w+")
+_ARTICLE = "ال"
+
+
+def normalize(text: str) -> str:
+    """Case-fold English and fold Arabic spelling variants"""
+    text = _ARABIC_DIACRITICS.sub("", text.casefold())
+    return text.translate(_ARABIC_FOLD)
+
+
+def tokenize(text: str) -> list[str]:
+    """Normalized words of a query or field value"""
+    return _TOKEN.findall(normalize(text))
+
+
+def _without_article(token: str) -> str | None:
+    if token.startswith(_ARTICLE) and len(token) > len(_ARTICLE) + 1:
+        return token[len(_ARTICLE) :]
+    return None
+
+
+def query_terms(query: str) -> list[str]:
+    """
+    Search words of a query. The article is dropped because every indexed
+    word with one is also indexed without it.
+    """
+    return [_without_article(token) or token for token in tokenize(query)]
+
+
+def name_terms(data: dict[str, Any]) -> set[str]:
+    """Index terms of an entity"""
+    values: list[str] = [str(data[f]) for f in NAME_FIELDS if data.get(f)]
+    values.extend(str(s) for s in data.get(SYNONYM_FIELD) or ())
+    terms: set[str] = set()
+    for value in values:
+        for token in tokenize(value):
+            terms.add(token)
+            bare = _without_article(token)
+            if bare:
+                terms.add(bare)
+    return terms
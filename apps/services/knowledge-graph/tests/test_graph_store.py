@@ -0,0 +1,182 @@
+"""
+Tests for the Graph Store
+اختبارات مخزن الرسم البياني
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from models import Crop, RelationshipType, Treatment
+from services import KnowledgeGraphService, RelationshipService
+from storage import GraphStore
+
+
+def _snapshot_view(store: GraphStore) -> dict:
+    return {
+        "nodes": sorted(store.nodes()),
+        "edges": sorted(store.edges()),
+        "wheat_in": sorted(store.neighbors("crop:wheat", direction="in")),
+        "search": store.search("قمح"),
+        "path": store.shortest_path("disease:late-blight", "crop:wheat"),
+    }
+
+
+@pytest.fixture
+async def persisted_service(tmp_path):
+    service = KnowledgeGraphService(data_dir=str(tmp_path))
+    await service.initialize()
+    return service
+
+
+class TestTraversal:
+    """Typed-edge traversal in both directions"""
+
+    @pytest.fixture
+    async def relationships(self):
+        service = KnowledgeGraphService()
+        await service.initialize()
+        return RelationshipService(service)
+
+    async def test_crop_compatible_treatments(self, relationships):
+        treatments = await relationships.get_crop_compatible_treatments("wheat")
+
+        assert [t["id"] for t in treatments] == ["sulfur-dust"]
+        assert treatments[0]["relationship"] == {"type": "compatible", "confidence": 0.99}
+
+    async def test_diseases_affecting_crop(self, relationships):
+        diseases = await relationships.get_diseases_affecting_crop("tomato")
+
+        assert {d["id"] for d in diseases} == {"late-blight", "leaf-spot", "powdery-mildew"}
+
+    async def test_cached_results_follow_writes(self, relationships):
+        graph = relationships.graph
+        assert len(await relationships.get_crop_compatible_treatments("wheat")) == 1
+        assert len(await relationships.get_crop_compatible_treatments("wheat")) == 1
+        assert graph.cache.hits == 1
+
+        await relationships.add_relationship(
+            "treatment", "neem-oil", "crop", "wheat", RelationshipType.COMPATIBLE, 0.8
+        )
+
+        treatments = await relationships.get_crop_compatible_treatments("wheat")
+        assert {t["id"] for t in treatments} == {"sulfur-dust", "neem-oil"}
+
+    async def test_validate_relationship(self, relationships):
+        result = await relationships.validate_relationship(
+            "disease", "late-blight", "treatment", "neem-oil", RelationshipType.TREATED_BY
+        )
+
+        assert result["exists"] is True
+        assert result["relationship"]["confidence"] == 0.7
+
+
+class TestNameSearch:
+    """English and Arabic name and synonym search"""
+
+    @pytest.fixture
+    async def graph_service(self):
+        service = KnowledgeGraphService()
+        await service.initialize()
+        return service
+
+    @pytest.mark.parametrize(
+        "query",
+        ["wheat", "WHEAT", "whe", "القمح", "قمح", "الْقَمْح", "حنطة", "حنطه", "bread wh"],
+    )
+    async def test_finds_wheat(self, graph_service, query):
+        results = await graph_service.search_entities(query)
+
+        assert [r["id"] for r in results] == ["crop:wheat"]
+
+    async def test_whole_words_rank_first(self, graph_service):
+        await graph_service.add_treatment(
+            Treatment(id="oidium-guard", name_en="Oidiumguard", name_ar="حارس")
+        )
+
+        results = await graph_service.search_entities("oidium")
+
+        assert [r["id"] for r in results] == ["disease:powdery-mildew", "treatment:oidium-guard"]
+
+    async def test_entity_type_filter(self, graph_service):
+        results = await graph_service.search_entities("copper", entity_type="crop")
+
+        assert results == []
+
+    async def test_renamed_entity_leaves_old_name(self, graph_service):
+        await graph_service.add_crop(Crop(id="wheat", name_en="Durum", name_ar="قمح صلب"))
+
+        assert await graph_service.search_entities("bread") == []
+        assert [r["id"] for r in await graph_service.search_entities("durum")] == ["crop:wheat"]
+
+
+class TestPersistence:
+    """Snapshots, delta log replay and compaction"""
+
+    async def test_reopen_replays_delta_log(self, persisted_service, tmp_path):
+        before = _snapshot_view(persisted_service.graph)
+
+        reopened = GraphStore(tmp_path)
+
+        assert reopened.delta_size == persisted_service.graph.delta_size > 0
+        assert _snapshot_view(reopened) == before
+
+    async def test_compaction_keeps_the_graph(self, persisted_service, tmp_path):
+        store = persisted_service.graph
+        before = _snapshot_view(store)
+
+        store.compact()
+
+        assert store.delta_size == 0
+        assert _snapshot_view(store) == before
+        assert _snapshot_view(GraphStore(tmp_path)) == before
+
+    async def test_writes_after_compaction(self, persisted_service, tmp_path):
+        store = persisted_service.graph
+        store.compact()
+        await persisted_service.add_crop(Crop(id="rice", name_en="Rice", name_ar="الأرز"))
+        await persisted_service.add_relationship(
+            "disease", "leaf-spot", "crop", "rice", RelationshipType.AFFECTS, 0.6
+        )
+        await persisted_service.add_relationship(
+            "disease", "leaf-spot", "crop", "tomato", RelationshipType.AFFECTS, 0.5
+        )
+
+        for reopened in (GraphStore(tmp_path), store):
+            assert reopened.number_of_edges() == 11
+            assert reopened.neighbors("disease:leaf-spot") == [
+                ("crop:tomato", "affects", 0.5),
+                ("crop:rice", "affects", 0.6),
+            ]
+            assert reopened.search("ارز") == ["crop:rice"]
+
+    async def test_torn_log_entry_is_dropped(self, persisted_service, tmp_path):
+        expected = _snapshot_view(persisted_service.graph)
+        with open(tmp_path / "delta.log", "ab") as log:
+            log.write(b'{"op": "node", "key": "crop:ri')
+
+        assert _snapshot_view(GraphStore(tmp_path)) == expected
+        GraphStore(tmp_path).add_node("crop:rice", "crop", {"id": "rice", "name_en": "Rice"})
+        assert "crop:rice" in GraphStore(tmp_path)
+
+    async def test_processes_sharing_a_directory(self, tmp_path):
+        first, second = GraphStore(tmp_path), GraphStore(tmp_path)
+        first.add_node("crop:a", "crop", {"name_en": "A"})
+        second.add_node("crop:b", "crop", {"name_en": "B"})
+        second.compact()
+        first.add_node("crop:c", "crop", {"name_en": "C"})
+
+        assert GraphStore(tmp_path).nodes() == ["crop:a", "crop:b", "crop:c"]
+        assert GraphStore(tmp_path).delta_size == 1
+
+    async def test_sample_data_loaded_once(self, persisted_service, tmp_path):
+        reopened = KnowledgeGraphService(data_dir=str(tmp_path), compact_after=1)
+        await reopened.initialize()
+
+        assert reopened.graph.delta_size == 0
+        assert reopened.graph.number_of_nodes() == 9
+        assert len(os.listdir(tmp_path / "snapshots")) == 1
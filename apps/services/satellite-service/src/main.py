@@ -41,6 +41,7 @@ import sys
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "shared"))
 from shared.errors_py import add_request_id_middleware, setup_exception_handlers
+from shared.integration import DeadlineMiddleware, close_upstreams
 
 shared_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "shared"))
 sys.path.insert(0, shared_path)
@@ -300,6 +301,7 @@ async def lifespan(app: FastAPI):
         await _multi_provider.close()
     if _sar_processor:
         await _sar_processor.close()
+    await close_upstreams()
     print("👋 Satellite Service shutting down")
 
 
@@ -314,6 +316,9 @@ app = FastAPI(
 setup_exception_handlers(app)
 add_request_id_middleware(app)
 
+# Propagate incoming request deadlines to provider and service calls
+app.add_middleware(DeadlineMiddleware)
+
 # Setup rate limiting middleware
 try:
     from middleware.rate_limiter import setup_rate_limiting
@@ -834,6 +839,44 @@ async def cache_health():
     return await cache_health_check()
 
 
+@app.get("/v1/scene-cache/stats")
+async def scene_cache_statistics():
+    """إحصائيات ذاكرة بلاطات المشاهد"""
+    if not (_multi_provider and _multi_provider.scene_cache):
+        return {"available": False, "message": "Scene cache not enabled"}
+    return {"available": True, **_multi_provider.scene_cache.snapshot()}
+
+
+class FieldIndexStatsRequest(BaseModel):
+    """Request for per-field index statistics from cached scene tiles"""
+
+    field_id: str = Field(..., description="معرف الحقل")
+    boundary: list[tuple[float, float]] = Field(
+        ..., min_length=3, description="حدود الحقل [(lon, lat), ...]"
+    )
+    acquisition_date: date = Field(default_factory=date.today, description="تاريخ الالتقاط")
+
+
+@app.post("/v1/fields/index-stats")
+async def field_index_statistics(request: FieldIndexStatsRequest):
+    """
+    إحصاءات المؤشرات النباتية داخل حدود الحقل
+    Index distribution over the field boundary, clipped from cached scene tiles
+    """
+    if not (_multi_provider and _multi_provider.scene_cache):
+        raise HTTPException(status_code=503, detail="Scene cache not enabled")
+
+    result = await _multi_provider.get_field_statistics(
+        request.boundary, request.acquisition_date, MultiSatelliteType.SENTINEL2
+    )
+    if not result.success:
+        raise HTTPException(
+            status_code=404,
+            detail={"error": result.error, "error_ar": result.error_ar},
+        )
+    return {"field_id": request.field_id, "provider": result.provider, **result.data.to_dict()}
+
+
 @app.get("/v1/eo-status")
 def eo_status():
     """حالة تكامل eo-learn"""
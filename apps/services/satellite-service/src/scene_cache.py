@@ -0,0 +1,692 @@
+"""
+SAHOOL Satellite Service - Scene Tile Cache
+ذاكرة تخزين مشاهد الأقمار الصناعية على مستوى البلاطات
+
+Band reflectance is fetched once per tile, date and satellite and kept on
+local disk. Per-field index statistics are answered by clipping the cached
+arrays to the field, so neighbouring fields in the same tile share a single
+upstream request.
+
+Tiles sit on a regular lon/lat grid (``tile_deg`` square, ``pixel_deg``
+pixels, ~10 m at the default). Each tile is stored as a Zarr v2 directory
+store, readable by ``zarr`` but written with numpy and zlib only:
+
+    <root>/<satellite>/<date>/<x>_<y>/
+        .zgroup, .zattrs          grid, bbox, level shapes, bands
+        <level>/<band>/.zarray    shape, chunks, dtype, zlib compressor
+        <level>/<band>/<i>.<j>    compressed chunk
+
+Level 0 is full resolution. Each further level halves it (mean of the valid
+pixels), down to a single chunk. Large fields are read from the coarsest
+level that still gives them ``min_pixels`` pixels.
+
+The disk footprint is bounded by ``max_bytes``. The least recently used
+tiles are evicted first. Decompressed chunks are kept in memory under
+``memory_bytes``.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+import zlib
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Bands the cache stores, Sentinel-2 L2A reflectance x 10000, 0 = no data
+BANDS = ("B02", "B04", "B08", "B11")
+REFLECTANCE_SCALE = 10000.0
+INDEX_NAMES = ("ndvi", "ndwi", "evi", "savi", "ndmi", "lai")
+
+Bbox = tuple[float, float, float, float]  # (min_lon, min_lat, max_lon, max_lat)
+Ring = Sequence[tuple[float, float]]  # [(lon, lat), ...]
+
+# fetch(bbox, width, height) -> {band: uint16 array (height, width)} or None
+TileFetcher = Callable[[Bbox, int, int], Awaitable[dict[str, np.ndarray] | None]]
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Tile Grid
+# ═══════════════════════════════════════════════════════════════════════════════
+
+
+@dataclass(frozen=True)
+class TileGrid:
+    """Regular lon/lat tiling; row 0 of a tile is its northern edge"""
+
+    tile_deg: float = 0.05
+    pixel_deg: float = 0.0001
+
+    @property
+    def size(self) -> int:
+        """Pixels along each side of a tile"""
+        return round(self.tile_deg / self.pixel_deg)
+
+    @property
+    def grid_id(self) -> str:
+        return f"{self.tile_deg:g}/{self.pixel_deg:g}"
+
+    def tile_bbox(self, x: int, y: int) -> Bbox:
+        return (
+            x * self.tile_deg,
+            y * self.tile_deg,
+            (x + 1) * self.tile_deg,
+            (y + 1) * self.tile_deg,
+        )
+
+    def tiles_for_bbox(self, bbox: Bbox) -> list[tuple[int, int]]:
+        min_lon, min_lat, max_lon, max_lat = bbox
+        x0, x1 = int(np.floor(min_lon / self.tile_deg)), int(np.floor(max_lon / self.tile_deg))
+        y0, y1 = int(np.floor(min_lat / self.tile_deg)), int(np.floor(max_lat / self.tile_deg))
+        return [(x, y) for y in range(y0, y1 + 1) for x in range(x0, x1 + 1)]
+
+    def window(self, x: int, y: int, bbox: Bbox) -> tuple[int, int, int, int] | None:
+        """Pixel rows/cols [r0, r1) x [c0, c1) of tile (x, y) whose centres fall in bbox"""
+        t_min_lon, _, _, t_max_lat = self.tile_bbox(x, y)
+        min_lon, min_lat, max_lon, max_lat = bbox
+        size = self.size
+        c0 = max(0, int(np.ceil((min_lon - t_min_lon) / self.pixel_deg - 0.5)))
+        c1 = min(size, int(np.floor((max_lon - t_min_lon) / self.pixel_deg - 0.5)) + 1)
+        r0 = max(0, int(np.ceil((t_max_lat - max_lat) / self.pixel_deg - 0.5)))
+        r1 = min(size, int(np.floor((t_max_lat - min_lat) / self.pixel_deg - 0.5)) + 1)
+        if r0 >= r1 or c0 >= c1:
+            return None
+        return r0, r1, c0, c1
+
+
+@dataclass(frozen=True)
+class TileKey:
+    """One tile of one acquisition"""
+
+    satellite: str
+    acquired: date
+    x: int
+    y: int
+
+    @property
+    def relpath(self) -> Path:
+        return Path(self.satellite, self.acquired.isoformat(), f"{self.x}_{self.y}")
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Results
+# ═══════════════════════════════════════════════════════════════════════════════
+
+
+@dataclass
+class IndexSummary:
+    """Distribution of one index over a field's valid pixels"""
+
+    mean: float
+    std: float
+    min: float
+    max: float
+    p10: float
+    p50: float
+    p90: float
+
+
+@dataclass
+class FieldIndexStats:
+    """Per-field index statistics clipped from cached scene tiles"""
+
+    acquisition_date: date
+    satellite: str
+    pixel_count: int
+    valid_pixels: int
+    level: int
+    tiles: list[str]
+    indices: dict[str, IndexSummary] = field(default_factory=dict)
+
+    @property
+    def valid_fraction(self) -> float:
+        return self.valid_pixels / self.pixel_count if self.pixel_count else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "acquisition_date": self.acquisition_date.isoformat(),
+            "satellite": self.satellite,
+            "pixel_count": self.pixel_count,
+            "valid_pixels": self.valid_pixels,
+            "valid_fraction": round(self.valid_fraction, 4),
+            "level": self.level,
+            "tiles": self.tiles,
+            "indices": {
+                name: {k: round(v, 4) for k, v in summary.__dict__.items()}
+                for name, summary in self.indices.items()
+            },
+        }
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Raster helpers
+# ═══════════════════════════════════════════════════════════════════════════════
+
+
+def downsample(band: np.ndarray) -> np.ndarray:
+    """Halve resolution, averaging the valid (non-zero) pixels of each 2x2 block"""
+    h, w = band.shape
+    padded = np.zeros((h + h % 2, w + w % 2), dtype=np.uint32)
+    padded[:h, :w] = band
+    blocks = padded.reshape(padded.shape[0] // 2, 2, padded.shape[1] // 2, 2)
+    valid = (blocks > 0).sum(axis=(1, 3))
+    total = blocks.sum(axis=(1, 3))
+    mean = (total + valid // 2) // np.maximum(valid, 1)
+    return np.where(valid > 0, mean, 0).astype(np.uint16)
+
+
+def polygon_mask(ring: Ring, lons: np.ndarray, lats: np.ndarray) -> np.ndarray:
+    """Even-odd test of pixel centres (lats x lons) against a lon/lat ring"""
+    x = lons[None, :]
+    y = lats[:, None]
+    inside = np.zeros((len(lats), len(lons)), dtype=bool)
+    points = list(ring)
+    for (x1, y1), (x2, y2) in zip(points, points[1:] + points[:1], strict=True):
+        if y1 == y2:
+            continue
+        crosses = (y1 > y) != (y2 > y)
+        x_cross = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+        inside ^= crosses & (x < x_cross)
+    return inside
+
+
+def compute_indices(
+    blue: np.ndarray, red: np.ndarray, nir: np.ndarray, swir: np.ndarray
+) -> dict[str, np.ndarray]:
+    """Vegetation indices from reflectance in 0..1, as in the Sentinel Hub evalscript"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ndvi = (nir - red) / (nir + red)
+        ndwi = (nir - swir) / (nir + swir)
+        evi = 2.5 * (nir - red) / (nir + 6 * red - 7.5 * blue + 1)
+        savi = (nir - red) / (nir + red + 0.5) * 1.5
+    # Empirical LAI from EVI (Boegh et al.)
+    lai = np.maximum(3.618 * evi - 0.118, 0.0)
+    return {"ndvi": ndvi, "ndwi": ndwi, "evi": evi, "savi": savi, "ndmi": ndwi, "lai": lai}
+
+
+def summarize(values: np.ndarray) -> IndexSummary:
+    values = values[np.isfinite(values)]
+    if values.size == 0:
+        return IndexSummary(*(float("nan"),) * 7)
+    p10, p50, p90 = np.percentile(values, (10, 50, 90))
+    return IndexSummary(
+        mean=float(values.mean()),
+        std=float(values.std()),
+        min=float(values.min()),
+        max=float(values.max()),
+        p10=float(p10),
+        p50=float(p50),
+        p90=float(p90),
+    )
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Zarr v2 directory store (numpy + zlib)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+
+def write_array(path: Path, data: np.ndarray, chunk: int, level: int = 4) -> int:
+    """Write a 2-D uint16 array as a zlib-compressed Zarr v2 array, return bytes written"""
+    path.mkdir(parents=True, exist_ok=True)
+    h, w = data.shape
+    meta = {
+        "zarr_format": 2,
+        "shape": [h, w],
+        "chunks": [chunk, chunk],
+        "dtype": "<u2",
+        "compressor": {"id": "zlib", "level": level},
+        "fill_value": 0,
+        "order": "C",
+        "filters": None,
+    }
+    written = 0
+    for i in range(-(-h // chunk)):
+        for j in range(-(-w // chunk)):
+            block = data[i * chunk : (i + 1) * chunk, j * chunk : (j + 1) * chunk]
+            if not block.any():
+                continue  # all fill value, zarr reads missing chunks as fill
+            if block.shape != (chunk, chunk):  # zarr v2 stores edge chunks full size
+                full = np.zeros((chunk, chunk), dtype=np.uint16)
+                full[: block.shape[0], : block.shape[1]] = block
+                block = full
+            payload = zlib.compress(np.ascontiguousarray(block, dtype="<u2").tobytes(), level)
+            (path / f"{i}.{j}").write_bytes(payload)
+            written += len(payload)
+    (path / ".zarray").write_text(json.dumps(meta))
+    return written
+
+
+def read_chunk(path: Path, i: int, j: int, chunk: int) -> np.ndarray:
+    try:
+        payload = (path / f"{i}.{j}").read_bytes()
+    except FileNotFoundError:
+        return np.zeros((chunk, chunk), dtype=np.uint16)
+    return np.frombuffer(zlib.decompress(payload), dtype="<u2").reshape(chunk, chunk)
+
+
+def _dir_size(path: Path) -> int:
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Scene Cache
+# ═══════════════════════════════════════════════════════════════════════════════
+
+
+@dataclass
+class _TileEntry:
+    path: Path
+    nbytes: int
+    shapes: list[tuple[int, int]]
+    touched: float = 0.0
+
+
+class SceneCache:
+    """
+    Disk cache of scene tiles with per-field statistics
+    ذاكرة البلاطات على القرص مع إحصاءات الحقول
+
+    Usage:
+        cache = SceneCache("/var/cache/sahool/scenes", max_bytes=2 << 30)
+        stats = await cache.field_stats(fetch, "sentinel-2", date(2025, 6, 1), ring=boundary)
+    """
+
+    # Failed or empty fetches are not retried for this long
+    NEGATIVE_TTL = 60 * 60
+    # Access times are written to disk at most this often per tile
+    TOUCH_INTERVAL = 60.0
+
+    def __init__(
+        self,
+        root: str | Path,
+        max_bytes: int = 2 << 30,
+        grid: TileGrid | None = None,
+        chunk: int = 128,
+        min_pixels: int = 1024,
+        memory_bytes: int = 64 << 20,
+    ):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.grid = grid or TileGrid()
+        self.chunk = chunk
+        self.min_pixels = min_pixels
+        self.memory_bytes = memory_bytes
+
+        self._tiles: OrderedDict[TileKey, _TileEntry] | None = None  # LRU, loaded lazily
+        self._bytes = 0
+        self._chunks: OrderedDict[tuple, np.ndarray] = OrderedDict()
+        self._chunk_bytes = 0
+        self._inflight: dict[TileKey, asyncio.Future] = {}
+        self._missing: dict[TileKey, float] = {}
+        self.stats = {
+            "hits": 0,
+            "fetches": 0,
+            "coalesced": 0,
+            "empty": 0,
+            "evictions": 0,
+            "chunk_reads": 0,
+        }
+
+    @classmethod
+    def from_env(cls) -> "SceneCache":
+        root = os.getenv(
+            "SCENE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "sahool-scene-cache")
+        )
+        return cls(
+            root,
+            max_bytes=int(os.getenv("SCENE_CACHE_MAX_MB", "2048")) << 20,
+            grid=TileGrid(tile_deg=float(os.getenv("SCENE_TILE_DEG", "0.05"))),
+        )
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # Public API
+    # ─────────────────────────────────────────────────────────────────────────
+
+    async def field_stats(
+        self,
+        fetch: TileFetcher,
+        satellite: str,
+        acquired: date,
+        ring: Ring | None = None,
+        bbox: Bbox | None = None,
+    ) -> FieldIndexStats | None:
+        """
+        Index statistics over a field boundary (or bbox), fetching any
+        missing tiles. Returns None when no tile has data for the date.
+        """
+        if ring is not None:
+            lons = [p[0] for p in ring]
+            lats = [p[1] for p in ring]
+            bbox = (min(lons), min(lats), max(lons), max(lats))
+        if bbox is None:
+            raise ValueError("ring or bbox is required")
+
+        keys = [TileKey(satellite, acquired, x, y) for x, y in self.grid.tiles_for_bbox(bbox)]
+        entries = await asyncio.gather(*(self.ensure_tile(key, fetch) for key in keys))
+        available = [(k, e) for k, e in zip(keys, entries, strict=True) if e is not None]
+        if not available:
+            return None
+
+        windows = [(k, e, self.grid.window(k.x, k.y, bbox)) for k, e in available]
+        windows = [(k, e, w) for k, e, w in windows if w is not None]
+        pixels = sum((w[1] - w[0]) * (w[3] - w[2]) for _, _, w in windows)
+        level = self._level_for(pixels, min(len(e.shapes) for _, e, _ in windows))
+
+        parts: dict[str, list[np.ndarray]] = {band: [] for band in BANDS}
+        pixel_count = 0
+        for key, entry, window in windows:
+            bands, mask = self._clip(key, entry, window, level, ring)
+            pixel_count += int(mask.sum())
+            for band in BANDS:
+                parts[band].append(bands[band][mask])
+
+        values = {band: np.concatenate(parts[band]) for band in BANDS}
+        valid = np.logical_and.reduce([values[band] > 0 for band in BANDS])
+        reflectance = [values[band][valid].astype(np.float32) / REFLECTANCE_SCALE for band in BANDS]
+        indices = compute_indices(*reflectance)
+
+        return FieldIndexStats(
+            acquisition_date=acquired,
+            satellite=satellite,
+            pixel_count=pixel_count,
+            valid_pixels=int(valid.sum()),
+            level=level,
+            tiles=[str(k.relpath) for k, _, _ in windows],
+            indices={name: summarize(indices[name]) for name in INDEX_NAMES},
+        )
+
+    async def ndvi_raster(
+        self, fetch: TileFetcher, satellite: str, acquired: date, bbox: Bbox
+    ) -> tuple[np.ndarray, Bbox] | None:
+        """
+        Full-resolution NDVI over a bbox, mosaicked from the cached tiles, and
+        the bbox of the mosaic's pixel edges. NaN where there is no data.
+        Returns None when no tile has data for the date.
+        """
+        keys = [TileKey(satellite, acquired, x, y) for x, y in self.grid.tiles_for_bbox(bbox)]
+        entries = await asyncio.gather(*(self.ensure_tile(key, fetch) for key in keys))
+
+        # Position of each window in global pixel rows (from the equator,
+        # growing southwards) and cols (from the meridian)
+        size = self.grid.size
+        placed = []
+        for key, entry in zip(keys, entries, strict=True):
+            window = self.grid.window(key.x, key.y, bbox) if entry is not None else None
+            if window is not None:
+                r0, _, c0, _ = window
+                placed.append((entry, window, -(key.y + 1) * size + r0, key.x * size + c0))
+        if not placed:
+            return None
+
+        top = min(row for _, _, row, _ in placed)
+        left = min(col for _, _, _, col in placed)
+        bottom = max(row + w[1] - w[0] for _, w, row, _ in placed)
+        right = max(col + w[3] - w[2] for _, w, _, col in placed)
+        ndvi = np.full((bottom - top, right - left), np.nan, dtype=np.float32)
+        for entry, (r0, r1, c0, c1), row, col in placed:
+            red = self._read_window(entry.path, 0, "B04", r0, r1, c0, c1).astype(np.float32)
+            nir = self._read_window(entry.path, 0, "B08", r0, r1, c0, c1).astype(np.float32)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                values = np.where((red > 0) & (nir > 0), (nir - red) / (nir + red), np.nan)
+            ndvi[row - top : row - top + r1 - r0, col - left : col - left + c1 - c0] = values
+
+        pixel = self.grid.pixel_deg
+        return ndvi, (left * pixel, -bottom * pixel, right * pixel, -top * pixel)
+
+    async def ensure_tile(self, key: TileKey, fetch: TileFetcher) -> _TileEntry | None:
+        """Cached tile, fetching it once if absent. Concurrent callers share the fetch."""
+        tiles = self._index()
+        entry = tiles.get(key)
+        if entry is not None:
+            self.stats["hits"] += 1
+            self._touch(key, entry)
+            return entry
+
+        expires = self._missing.get(key)
+        if expires is not None:
+            if time.monotonic() < expires:
+                self.stats["empty"] += 1
+                return None
+            del self._missing[key]
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            entry = await self._fetch_tile(key, fetch)
+            future.set_result(entry)
+            return entry
+        except BaseException as exc:
+            future.set_exception(exc)
+            future.exception()  # mark retrieved when nobody else was waiting
+            raise
+        finally:
+            del self._inflight[key]
+
+    def read_overview(self, key: TileKey, band: str, level: int = -1) -> np.ndarray | None:
+        """A whole pyramid level of a cached band (coarsest by default), for previews"""
+        entry = self._index().get(key)
+        if entry is None:
+            return None
+        level = level % len(entry.shapes)
+        h, w = entry.shapes[level]
+        self._touch(key, entry)
+        return self._read_window(entry.path, level, band, 0, h, 0, w)
+
+    def snapshot(self) -> dict[str, Any]:
+        tiles = self._index()
+        return {
+            **self.stats,
+            "tiles": len(tiles),
+            "disk_bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "memory_bytes": self._chunk_bytes,
+        }
+
+    def clear(self) -> None:
+        shutil.rmtree(self.root, ignore_errors=True)
+        self._tiles = OrderedDict()
+        self._bytes = 0
+        self._drop_chunks()
+        self._missing.clear()
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # Fetch and store
+    # ─────────────────────────────────────────────────────────────────────────
+
+    async def _fetch_tile(self, key: TileKey, fetch: TileFetcher) -> _TileEntry | None:
+        size = self.grid.size
+        self.stats["fetches"] += 1
+        bands = await fetch(self.grid.tile_bbox(key.x, key.y), size, size)
+        if not bands or not any(bands[band].any() for band in BANDS if band in bands):
+            self._missing[key] = time.monotonic() + self.NEGATIVE_TTL
+            return None
+
+        entry = await asyncio.to_thread(self._write_tile, key, bands)
+        tiles = self._index()
+        tiles[key] = entry
+        self._bytes += entry.nbytes
+        self._evict()
+        return entry
+
+    def _write_tile(self, key: TileKey, bands: dict[str, np.ndarray]) -> _TileEntry:
+        final = self.root / key.relpath
+        staging = final.with_name(f".{final.name}.{os.getpid()}.{id(bands)}")
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir(parents=True)
+
+        nbytes = 0
+        shapes: list[tuple[int, int]] = []
+        for band in BANDS:
+            data = np.asarray(bands[band], dtype=np.uint16)
+            level = 0
+            while True:
+                if band == BANDS[0]:
+                    shapes.append(data.shape)
+                nbytes += write_array(staging / str(level) / band, data, self.chunk)
+                if max(data.shape) <= self.chunk:
+                    break
+                data = downsample(data)
+                level += 1
+
+        attrs = {
+            "grid": self.grid.grid_id,
+            "bbox": self.grid.tile_bbox(key.x, key.y),
+            "levels": [list(s) for s in shapes],
+            "bands": list(BANDS),
+            "scale": REFLECTANCE_SCALE,
+            "fetched_at": datetime.utcnow().isoformat(),
+        }
+        (staging / ".zgroup").write_text(json.dumps({"zarr_format": 2}))
+        (staging / ".zattrs").write_text(json.dumps(attrs))
+        for level in range(len(shapes)):
+            (staging / str(level) / ".zgroup").write_text(json.dumps({"zarr_format": 2}))
+
+        shutil.rmtree(final, ignore_errors=True)
+        os.replace(staging, final)
+        return _TileEntry(final, _dir_size(final), shapes, time.time())
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # Read
+    # ─────────────────────────────────────────────────────────────────────────
+
+    def _level_for(self, pixels: int, levels: int) -> int:
+        level = 0
+        while level + 1 < levels and pixels / 4 ** (level + 1) >= self.min_pixels:
+            level += 1
+        return level
+
+    def _clip(
+        self,
+        key: TileKey,
+        entry: _TileEntry,
+        window: tuple[int, int, int, int],
+        level: int,
+        ring: Ring | None,
+    ) -> tuple[dict[str, np.ndarray], np.ndarray]:
+        scale = 2**level
+        r0, r1, c0, c1 = window
+        r0, c0 = r0 // scale, c0 // scale
+        h, w = entry.shapes[level]
+        r1, c1 = min(h, -(-r1 // scale)), min(w, -(-c1 // scale))
+
+        bands = {band: self._read_window(entry.path, level, band, r0, r1, c0, c1) for band in BANDS}
+        if ring is None:
+            return bands, np.ones((r1 - r0, c1 - c0), dtype=bool)
+
+        pixel = self.grid.pixel_deg * scale
+        t_min_lon, _, _, t_max_lat = self.grid.tile_bbox(key.x, key.y)
+        lons = t_min_lon + (np.arange(c0, c1) + 0.5) * pixel
+        lats = t_max_lat - (np.arange(r0, r1) + 0.5) * pixel
+        return bands, polygon_mask(ring, lons, lats)
+
+    def _read_window(
+        self, path: Path, level: int, band: str, r0: int, r1: int, c0: int, c1: int
+    ) -> np.ndarray:
+        chunk = self.chunk
+        out = np.empty((r1 - r0, c1 - c0), dtype=np.uint16)
+        array_path = path / str(level) / band
+        for i in range(r0 // chunk, (r1 - 1) // chunk + 1):
+            for j in range(c0 // chunk, (c1 - 1) // chunk + 1):
+                block = self._chunk(array_path, i, j)
+                top, left = i * chunk, j * chunk
+                rs, re = max(r0, top), min(r1, top + chunk)
+                cs, ce = max(c0, left), min(c1, left + chunk)
+                out[rs - r0 : re - r0, cs - c0 : ce - c0] = block[
+                    rs - top : re - top, cs - left : ce - left
+                ]
+        return out
+
+    def _chunk(self, array_path: Path, i: int, j: int) -> np.ndarray:
+        key = (array_path, i, j)
+        block = self._chunks.get(key)
+        if block is not None:
+            self._chunks.move_to_end(key)
+            return block
+        self.stats["chunk_reads"] += 1
+        block = read_chunk(array_path, i, j, self.chunk)
+        self._chunks[key] = block
+        self._chunk_bytes += block.nbytes
+        while self._chunk_bytes > self.memory_bytes and len(self._chunks) > 1:
+            _, dropped = self._chunks.popitem(last=False)
+            self._chunk_bytes -= dropped.nbytes
+        return block
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # Index and eviction
+    # ─────────────────────────────────────────────────────────────────────────
+
+    def _index(self) -> OrderedDict[TileKey, _TileEntry]:
+        """Tiles on disk, least recently used first, scanned on first use"""
+        if self._tiles is not None:
+            return self._tiles
+
+        found = []
+        for attrs_path in self.root.glob("*/*/*/.zattrs"):
+            tile_dir = attrs_path.parent
+            try:
+                attrs = json.loads(attrs_path.read_text())
+                x, y = (int(v) for v in tile_dir.name.split("_"))
+                key = TileKey(
+                    tile_dir.parent.parent.name, date.fromisoformat(tile_dir.parent.name), x, y
+                )
+            except (ValueError, OSError) as e:
+                logger.warning(f"Scene cache: skipping {tile_dir}: {e}")
+                continue
+            if attrs.get("grid") != self.grid.grid_id:
+                shutil.rmtree(tile_dir, ignore_errors=True)
+                continue
+            shapes = [tuple(s) for s in attrs["levels"]]
+            mtime = attrs_path.stat().st_mtime
+            found.append((mtime, key, _TileEntry(tile_dir, _dir_size(tile_dir), shapes, mtime)))
+
+        found.sort(key=lambda item: item[0])
+        self._tiles = OrderedDict((key, entry) for _, key, entry in found)
+        self._bytes = sum(entry.nbytes for entry in self._tiles.values())
+        if found:
+            logger.info(f"Scene cache: {len(found)} tiles, {self._bytes >> 20} MB in {self.root}")
+        self._evict()
+        return self._tiles
+
+    def _touch(self, key: TileKey, entry: _TileEntry) -> None:
+        self._tiles.move_to_end(key)
+        now = time.time()
+        if now - entry.touched >= self.TOUCH_INTERVAL:
+            entry.touched = now
+            try:
+                os.utime(entry.path / ".zattrs")
+            except OSError:
+                pass
+
+    def _evict(self) -> None:
+        tiles = self._tiles
+        while self._bytes > self.max_bytes and len(tiles) > 1:
+            key, entry = tiles.popitem(last=False)
+            self._bytes -= entry.nbytes
+            self.stats["evictions"] += 1
+            shutil.rmtree(entry.path, ignore_errors=True)
+            self._drop_chunks(entry.path)
+            logger.debug(f"Scene cache: evicted {key.relpath} ({entry.nbytes} bytes)")
+
+    def _drop_chunks(self, tile_path: Path | None = None) -> None:
+        if tile_path is None:
+            self._chunks.clear()
+            self._chunk_bytes = 0
+            return
+        for key in [k for k in self._chunks if k[0].is_relative_to(tile_path)]:
+            self._chunk_bytes -= self._chunks.pop(key).nbytes
@@ -42,6 +42,9 @@ class VRARequest(BaseModel):
     product_price_per_unit: float | None = Field(None, description="سعر الوحدة للمنتج")
     notes: str | None = Field(None, description="ملاحظات (إنجليزي)")
     notes_ar: str | None = Field(None, description="ملاحظات (عربي)")
+    boundary: list[list[float]] | None = Field(
+        None, description="حدود الحقل [[lon, lat], ...] (افتراضياً مربع حول المركز)"
+    )
 
 
 class ManagementZoneResponse(BaseModel):
@@ -165,6 +168,7 @@ def register_vra_endpoints(app: FastAPI, vra_generator: VRAGenerator):
                 product_price_per_unit=request.product_price_per_unit,
                 notes=request.notes,
                 notes_ar=request.notes_ar,
+                boundary=[(p[0], p[1]) for p in request.boundary] if request.boundary else None,
             )
 
             # Convert to response model
@@ -270,6 +274,7 @@ def register_vra_endpoints(app: FastAPI, vra_generator: VRAGenerator):
                     "std": zones_stats.ndvi_std,
                     "min": zones_stats.ndvi_min,
                     "max": zones_stats.ndvi_max,
+                    "source": zones_stats.ndvi_source,
                 },
             }
 
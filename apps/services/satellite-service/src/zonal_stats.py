@@ -0,0 +1,726 @@
+"""
+SAHOOL Satellite Service - Raster Zonal Statistics
+إحصاءات المناطق من البيانات النقطية
+
+Per-field NDVI statistics and management zones computed from an index
+raster and a field polygon:
+
+1. Rasterize the polygon with a scanline even-odd fill (holes supported)
+2. One pass over row blocks accumulates the field histogram and, per cell
+   of the management grid, count / sum / sum of squares / min / max
+3. Cell means are split into 3-5 zones (Jenks natural breaks, k-means or
+   equal-area quantiles)
+4. A majority filter removes speckle from the zone grid
+5. Zones are polygonized by tracing cell edges and simplified with
+   Douglas-Peucker
+
+Only one block of rows is in memory at a time, plus the management grid,
+which is capped at ``max_grid`` cells per side. Rasters larger than RAM can
+be passed as numpy memmaps (``np.load(path, mmap_mode="r")``).
+"""
+
+import logging
+import math
+import os
+import sys
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from shared import geometry  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+METERS_PER_DEGREE = 111320.0
+PERCENTILES = (10, 25, 50, 75, 90)
+ZONE_METHODS = ("jenks", "kmeans", "quantile")
+
+Ring = Sequence[tuple[float, float]]  # [(lon, lat), ...]
+
+
+# =============================================================================
+# Data Models
+# =============================================================================
+
+
+@dataclass(frozen=True)
+class RasterTransform:
+    """North-up lon/lat raster: pixel (row, col) starts at (west + col * w, north - row * h)"""
+
+    west: float
+    north: float
+    pixel_width: float  # degrees of longitude
+    pixel_height: float  # degrees of latitude
+
+    @classmethod
+    def from_bounds(
+        cls, west: float, south: float, east: float, north: float, width: int, height: int
+    ) -> "RasterTransform":
+        return cls(west, north, (east - west) / width, (north - south) / height)
+
+    def window(self, row: int, col: int, scale: int = 1) -> "RasterTransform":
+        """Transform of a sub-raster starting at (row, col), with pixels ``scale`` times larger"""
+        return RasterTransform(
+            self.west + col * self.pixel_width,
+            self.north - row * self.pixel_height,
+            self.pixel_width * scale,
+            self.pixel_height * scale,
+        )
+
+    def col_centers(self, c0: int, c1: int) -> np.ndarray:
+        return self.west + (np.arange(c0, c1) + 0.5) * self.pixel_width
+
+    def row_centers(self, r0: int, r1: int) -> np.ndarray:
+        return self.north - (np.arange(r0, r1) + 0.5) * self.pixel_height
+
+    def pixel_area_m2(self, latitude: float) -> float:
+        width_m = self.pixel_width * METERS_PER_DEGREE * math.cos(math.radians(latitude))
+        return width_m * self.pixel_height * METERS_PER_DEGREE
+
+
+@dataclass
+class RasterStats:
+    """NDVI distribution over the valid pixels of a field"""
+
+    pixel_count: int  # pixels inside the polygon
+    valid_count: int  # ... with a valid value
+    mean: float
+    std: float
+    min: float
+    max: float
+    percentiles: dict[int, float]
+    area_ha: float
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "pixel_count": self.pixel_count,
+            "valid_count": self.valid_count,
+            "mean": round(self.mean, 4),
+            "std": round(self.std, 4),
+            "min": round(self.min, 4),
+            "max": round(self.max, 4),
+            "percentiles": {f"p{q}": round(v, 4) for q, v in self.percentiles.items()},
+            "area_ha": round(self.area_ha, 4),
+        }
+
+
+@dataclass
+class Zone:
+    """One management zone, 1 = lowest NDVI"""
+
+    zone: int
+    ndvi_range: tuple[float, float]  # class interval
+    pixel_count: int
+    area_ha: float
+    percentage: float
+    mean: float
+    std: float
+    min: float
+    max: float
+    centroid: tuple[float, float]  # (lon, lat)
+    polygons: list[list[list[tuple[float, float]]]] = field(default_factory=list)  # MultiPolygon
+
+
+@dataclass
+class ZonalResult:
+    """Field statistics and management zones"""
+
+    stats: RasterStats
+    method: str
+    breaks: list[float]
+    cell_size: int  # raster pixels per management cell side
+    zones: list[Zone]
+
+
+# =============================================================================
+# Rasterization
+# =============================================================================
+
+
+def rasterize(
+    rings: Sequence[Ring], transform: RasterTransform, r0: int, r1: int, c0: int, c1: int
+) -> np.ndarray:
+    """
+    Boolean mask of the pixels in rows [r0, r1) and cols [c0, c1) whose centres
+    fall inside the polygon (even-odd over all rings, so holes are excluded)
+    """
+    lats = transform.row_centers(r0, r1)[:, None]
+    width = c1 - c0
+    toggles = np.zeros((r1 - r0, width + 1), dtype=np.int32)
+    for ring in rings:
+        pts = np.asarray(ring, dtype=np.float64)
+        x1, y1 = pts[:, 0], pts[:, 1]
+        x2, y2 = np.roll(x1, -1), np.roll(y1, -1)
+        rows, edges = np.nonzero((y1 > lats) != (y2 > lats))
+        if rows.size == 0:
+            continue
+        y = lats[rows, 0]
+        x = x1[edges] + (y - y1[edges]) * (x2[edges] - x1[edges]) / (y2[edges] - y1[edges])
+        # First pixel whose centre lies east of the crossing
+        cols = np.floor((x - transform.west) / transform.pixel_width - 0.5).astype(np.int64) + 1
+        np.add.at(toggles, (rows, np.clip(cols - c0, 0, width)), 1)
+    return (np.cumsum(toggles[:, :width], axis=1) & 1).astype(bool)
+
+
+def _as_rings(polygon) -> list[Ring]:
+    """Accept a single ring [(lon, lat), ...] or GeoJSON polygon rings [[(lon, lat), ...], ...]"""
+    first = polygon[0]
+    if len(first) == 2 and not isinstance(first[0], list | tuple):
+        return [polygon]
+    return list(polygon)
+
+
+# =============================================================================
+# Class breaks
+# =============================================================================
+
+
+def jenks_breaks(values: np.ndarray, weights: np.ndarray, k: int) -> np.ndarray:
+    """
+    Fisher-Jenks natural breaks: optimal (minimum within-class sum of squares)
+    split of sorted weighted values into k classes. Returns the k-1 inner breaks.
+    """
+    n = len(values)
+    if n <= k:
+        return _pad_breaks(values, k)
+
+    cw = np.concatenate(([0.0], np.cumsum(weights)))
+    cwx = np.concatenate(([0.0], np.cumsum(weights * values)))
+    cwxx = np.concatenate(([0.0], np.cumsum(weights * values * values)))
+    i = np.arange(n + 1)[:, None]
+    j = np.arange(n + 1)[None, :]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        w = cw[j] - cw[i]
+        sse = cwxx[j] - cwxx[i] - (cwx[j] - cwx[i]) ** 2 / w
+    sse = np.where(j > i, np.maximum(sse, 0.0), np.inf)
+
+    cost = sse[0].copy()  # one class covering values[:j]
+    back = np.zeros((k, n + 1), dtype=np.int64)
+    for m in range(1, k):
+        total = cost[:, None] + sse
+        back[m] = total.argmin(axis=0)
+        cost = total.min(axis=0)
+
+    starts = []
+    end = n
+    for m in range(k - 1, 0, -1):
+        end = back[m, end]
+        starts.append(end)
+    starts = np.array(sorted(starts))
+    return (values[starts - 1] + values[starts]) / 2
+
+
+def kmeans_breaks(
+    values: np.ndarray, weights: np.ndarray, k: int, iterations: int = 100
+) -> np.ndarray:
+    """Weighted 1-D k-means (Lloyd), seeded at quantiles. Returns the k-1 inner breaks."""
+    if len(values) <= k:
+        return _pad_breaks(values, k)
+    centers = np.unique(_weighted_quantiles(values, weights, (np.arange(k) + 0.5) / k))
+    if len(centers) < k:
+        centers = np.linspace(values[0], values[-1], k)
+    for _ in range(iterations):
+        breaks = (centers[1:] + centers[:-1]) / 2
+        labels = np.searchsorted(breaks, values)
+        wsum = np.bincount(labels, weights=weights, minlength=k)
+        xsum = np.bincount(labels, weights=weights * values, minlength=k)
+        updated = np.where(wsum > 0, xsum / np.maximum(wsum, 1e-12), centers)
+        updated.sort()
+        if np.allclose(updated, centers, rtol=0, atol=1e-9):
+            break
+        centers = updated
+    return (centers[1:] + centers[:-1]) / 2
+
+
+def quantile_breaks(values: np.ndarray, weights: np.ndarray, k: int) -> np.ndarray:
+    """Equal-area classes, breaking halfway between neighbouring values"""
+    if len(values) <= k:
+        return _pad_breaks(values, k)
+    cum = np.cumsum(weights)
+    idx = np.minimum(np.searchsorted(cum, np.arange(1, k) / k * cum[-1]), len(values) - 2)
+    return (values[idx] + values[idx + 1]) / 2
+
+
+def _weighted_quantiles(values: np.ndarray, weights: np.ndarray, q: np.ndarray) -> np.ndarray:
+    cum = np.cumsum(weights)
+    return values[np.minimum(np.searchsorted(cum, q * cum[-1]), len(values) - 1)]
+
+
+def _pad_breaks(values: np.ndarray, k: int) -> np.ndarray:
+    inner = list((values[1:] + values[:-1]) / 2)
+    top = values[-1] if len(values) else 0.0
+    return np.array(inner + [top] * (k - 1 - len(inner)))[: k - 1]
+
+
+# =============================================================================
+# Zone grid clean-up and polygonization
+# =============================================================================
+
+
+def majority_filter(labels: np.ndarray, num_zones: int) -> np.ndarray:
+    """3x3 majority over in-field cells (label > 0); ties keep the current label"""
+    h, w = labels.shape
+    padded = np.pad(labels, 1)
+    counts = np.zeros((num_zones + 1, h, w), dtype=np.uint8)
+    for dr in range(3):
+        for dc in range(3):
+            window = padded[dr : dr + h, dc : dc + w]
+            for z in range(1, num_zones + 1):
+                counts[z] += window == z
+    best = counts[1:].argmax(axis=0).astype(labels.dtype) + 1
+    current = np.take_along_axis(counts, labels[None].astype(np.int64), axis=0)[0]
+    keep = (labels == 0) | (current >= counts[1:].max(axis=0))
+    return np.where(keep, labels, best)
+
+
+# Edge directions in cell-corner space (x = col, y = row, y down), clockwise order
+_DX = np.array([1, 0, -1, 0])
+_DY = np.array([0, 1, 0, -1])
+
+
+def trace_rings(mask: np.ndarray) -> list[np.ndarray]:
+    """
+    Boundary rings of the True regions of a grid, as (x, y) corner coordinates.
+
+    Outer rings run clockwise (positive shoelace area with y down), holes
+    counter-clockwise. Diagonal neighbours are separate regions.
+    """
+    h, w = mask.shape
+    p = np.pad(mask, 1)
+    inner = p[1:-1, 1:-1]
+    starts_x, starts_y, dirs = [], [], []
+    # top edge east, right edge south, bottom edge west, left edge north
+    for d, neighbour, (ox, oy) in (
+        (0, p[:-2, 1:-1], (0, 0)),
+        (1, p[1:-1, 2:], (1, 0)),
+        (2, p[2:, 1:-1], (1, 1)),
+        (3, p[1:-1, :-2], (0, 1)),
+    ):
+        rows, cols = np.nonzero(inner & ~neighbour)
+        starts_x.append(cols + ox)
+        starts_y.append(rows + oy)
+        dirs.append(np.full(rows.size, d))
+    sx = np.concatenate(starts_x)
+    sy = np.concatenate(starts_y)
+    sd = np.concatenate(dirs)
+    if sx.size == 0:
+        return []
+
+    stride = w + 1
+    start = sy * stride + sx
+    end = (sy + _DY[sd]) * stride + (sx + _DX[sd])
+
+    # Successor of each edge: the edge leaving its end vertex, preferring a
+    # right turn (keeps diagonal regions apart), then straight, then left
+    key = start * 4 + sd
+    order = np.argsort(key)
+    sorted_keys = key[order]
+    successor = np.full(sx.size, -1, dtype=np.int64)
+    for turn in (1, 0, 3):
+        pending = successor < 0
+        want = end[pending] * 4 + (sd[pending] + turn) % 4
+        pos = np.minimum(np.searchsorted(sorted_keys, want), len(sorted_keys) - 1)
+        found = sorted_keys[pos] == want
+        idx = np.nonzero(pending)[0][found]
+        successor[idx] = order[pos[found]]
+
+    nxt = successor.tolist()
+    seen = bytearray(sx.size)
+    rings = []
+    for e0 in range(sx.size):
+        if seen[e0]:
+            continue
+        cycle = []
+        e = e0
+        while not seen[e]:
+            seen[e] = 1
+            cycle.append(e)
+            e = nxt[e]
+        idx = np.array(cycle)
+        d = sd[idx]
+        corner = d != np.roll(d, 1)  # keep vertices where the direction changes
+        rings.append(np.stack([sx[idx][corner], sy[idx][corner]], axis=1).astype(np.float64))
+    return rings
+
+
+def ring_area(ring: np.ndarray) -> float:
+    """Signed shoelace area"""
+    x, y = ring[:, 0], ring[:, 1]
+    return 0.5 * float(np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y))
+
+
+def point_in_ring(x: float, y: float, ring: np.ndarray) -> bool:
+    x1, y1 = ring[:, 0], ring[:, 1]
+    x2, y2 = np.roll(x1, -1), np.roll(y1, -1)
+    crosses = (y1 > y) != (y2 > y)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_cross = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+    return bool(np.count_nonzero(crosses & (x < x_cross)) % 2)
+
+
+def simplify_ring(ring: np.ndarray, tolerance: float) -> np.ndarray:
+    """Douglas-Peucker on a closed ring (shared geometry kernel)"""
+    if len(ring) <= 4 or tolerance <= 0:
+        return ring
+    simplified = geometry.simplify(ring, tolerance)
+    return simplified if len(simplified) >= 3 else ring
+
+
+def polygonize(
+    labels: np.ndarray,
+    zone: int,
+    transform: RasterTransform,
+    tolerance: float = 1.0,
+    min_cells: float = 1.0,
+) -> list[list[list[tuple[float, float]]]]:
+    """
+    MultiPolygon coordinates of one zone of a label grid. ``tolerance`` and
+    ``min_cells`` are in cells; rings smaller than ``min_cells`` are dropped.
+    Outer rings are counter-clockwise and closed, as in GeoJSON, and parts
+    are ordered largest first.
+    """
+    outers: list[tuple[np.ndarray, float]] = []
+    holes: list[np.ndarray] = []
+    for ring in trace_rings(labels == zone):
+        area = ring_area(ring)
+        if abs(area) < min_cells:
+            continue
+        if area > 0:
+            outers.append((ring, area))
+        else:
+            holes.append(ring)
+
+    outers.sort(key=lambda outer: -outer[1])  # largest part first
+    polygons: list[list[np.ndarray]] = [[ring] for ring, _ in outers]
+    for hole in holes:
+        # A point just inside the hole: left of its first edge
+        (x0, y0), (x1, y1) = hole[0], hole[1]
+        dx, dy = np.sign(x1 - x0), np.sign(y1 - y0)
+        px, py = x0 + dx * 0.5 + dy * 0.5, y0 + dy * 0.5 - dx * 0.5
+        containing = [
+            (area, i) for i, (ring, area) in enumerate(outers) if point_in_ring(px, py, ring)
+        ]
+        if containing:
+            polygons[min(containing)[1]].append(hole)
+
+    result = []
+    for rings in polygons:
+        coords = []
+        for ring in rings:
+            ring = simplify_ring(ring, tolerance)
+            lon = transform.west + ring[:, 0] * transform.pixel_width
+            lat = transform.north - ring[:, 1] * transform.pixel_height
+            # y flips going to lat, so reverse to keep outer rings counter-clockwise
+            points = list(zip(lon[::-1].tolist(), lat[::-1].tolist(), strict=True))
+            coords.append(points + points[:1])
+        result.append(coords)
+    return result
+
+
+# =============================================================================
+# Engine
+# =============================================================================
+
+
+class ZonalStatsEngine:
+    """
+    Zonal statistics and management zones for index rasters
+    محرك الإحصاءات والمناطق للبيانات النقطية
+
+    Usage:
+        engine = ZonalStatsEngine()
+        transform = RasterTransform.from_bounds(west, south, east, north, width, height)
+        stats = engine.field_statistics(ndvi, boundary, transform)
+        result = engine.management_zones(ndvi, boundary, transform, num_zones=3)
+    """
+
+    def __init__(
+        self,
+        block_rows: int = 512,
+        histogram_bins: int = 2000,
+        value_range: tuple[float, float] = (-1.0, 1.0),
+        max_grid: int = 512,
+        class_bins: int = 256,
+        smoothing: bool = True,
+    ):
+        self.block_rows = block_rows
+        self.histogram_bins = histogram_bins
+        self.value_range = value_range
+        self.max_grid = max_grid
+        self.class_bins = class_bins
+        self.smoothing = smoothing
+
+    def field_statistics(
+        self, ndvi: np.ndarray, polygon, transform: RasterTransform
+    ) -> RasterStats:
+        """Mean, std, min, max and percentiles of the valid pixels inside the polygon"""
+        stats, _ = self._accumulate(ndvi, _as_rings(polygon), transform, cell=None)
+        return stats
+
+    def management_zones(
+        self,
+        ndvi: np.ndarray,
+        polygon,
+        transform: RasterTransform,
+        num_zones: int = 3,
+        method: str = "jenks",
+        cell_size: int | None = None,
+        simplify_tolerance: float = 1.0,
+    ) -> ZonalResult:
+        """
+        Split the field into ``num_zones`` zones of similar NDVI.
+
+        Args:
+            ndvi: 2-D index raster (array or memmap), NaN / out-of-range = no data
+            polygon: field ring [(lon, lat), ...] or GeoJSON polygon rings
+            transform: raster georeference
+            num_zones: number of zones (2-7)
+            method: "jenks", "kmeans" or "quantile"
+            cell_size: raster pixels per management cell side (default: the
+                smallest that keeps the grid within ``max_grid`` per side)
+            simplify_tolerance: Douglas-Peucker tolerance in cells
+        """
+        if method not in ZONE_METHODS:
+            raise ValueError(f"method must be one of {', '.join(ZONE_METHODS)}")
+        if not 2 <= num_zones <= 7:
+            raise ValueError("num_zones must be between 2 and 7")
+
+        rings = _as_rings(polygon)
+        window = self._window(ndvi.shape, rings, transform)
+        if cell_size is None:
+            r0, r1, c0, c1 = window
+            cell_size = max(1, math.ceil(max(r1 - r0, c1 - c0) / self.max_grid))
+        stats, cells = self._accumulate(ndvi, rings, transform, cell=cell_size, window=window)
+        count, total, squares, low, high = cells
+
+        in_field = count > 0
+        means = np.zeros_like(total)
+        means[in_field] = total[in_field] / count[in_field]
+
+        values, weights = self._class_histogram(means[in_field], count[in_field])
+        breaks = {
+            "jenks": jenks_breaks,
+            "kmeans": kmeans_breaks,
+            "quantile": quantile_breaks,
+        }[method](values, weights, num_zones)
+
+        labels = np.zeros(count.shape, dtype=np.uint8)
+        labels[in_field] = np.searchsorted(breaks, means[in_field], side="right") + 1
+        if self.smoothing:
+            labels = majority_filter(labels, num_zones)
+
+        r0, _, c0, _ = window
+        grid = transform.window(r0, c0, cell_size)
+        zones = self._zones(
+            labels, cells, grid, breaks, stats, num_zones, cell_size, simplify_tolerance
+        )
+        return ZonalResult(
+            stats=stats,
+            method=method,
+            breaks=[float(b) for b in breaks],
+            cell_size=cell_size,
+            zones=zones,
+        )
+
+    # -------------------------------------------------------------------------
+    # Accumulation
+    # -------------------------------------------------------------------------
+
+    def _window(
+        self, shape: tuple[int, int], rings: Sequence[Ring], transform: RasterTransform
+    ) -> tuple[int, int, int, int]:
+        """Rows/cols of the raster covering the polygon's bbox"""
+        pts = np.concatenate([np.asarray(r, dtype=np.float64) for r in rings])
+        min_lon, min_lat = pts.min(axis=0)
+        max_lon, max_lat = pts.max(axis=0)
+        h, w = shape
+        c0 = max(0, int(math.floor((min_lon - transform.west) / transform.pixel_width)))
+        c1 = min(w, int(math.ceil((max_lon - transform.west) / transform.pixel_width)))
+        r0 = max(0, int(math.floor((transform.north - max_lat) / transform.pixel_height)))
+        r1 = min(h, int(math.ceil((transform.north - min_lat) / transform.pixel_height)))
+        if r0 >= r1 or c0 >= c1:
+            raise ValueError("Field polygon does not overlap the raster")
+        return r0, r1, c0, c1
+
+    def _accumulate(
+        self,
+        ndvi: np.ndarray,
+        rings: Sequence[Ring],
+        transform: RasterTransform,
+        cell: int | None,
+        window: tuple[int, int, int, int] | None = None,
+    ) -> tuple[RasterStats, tuple[np.ndarray, ...] | None]:
+        r0, r1, c0, c1 = window or self._window(ndvi.shape, rings, transform)
+        lo, hi = self.value_range
+        bins = self.histogram_bins
+        histogram = np.zeros(bins, dtype=np.int64)
+        inside = valid_count = 0
+        total = squares = 0.0
+        v_min, v_max = np.inf, -np.inf
+
+        step = self.block_rows
+        cells = None
+        if cell is not None:
+            step = max(cell, step // cell * cell)
+            shape = (-(-(r1 - r0) // cell), -(-(c1 - c0) // cell))
+            cells = (
+                np.zeros(shape),
+                np.zeros(shape),
+                np.zeros(shape),
+                np.full(shape, np.inf),
+                np.full(shape, -np.inf),
+            )
+
+        for top in range(r0, r1, step):
+            bottom = min(top + step, r1)
+            block = np.asarray(ndvi[top:bottom, c0:c1], dtype=np.float32)
+            mask = rasterize(rings, transform, top, bottom, c0, c1)
+            inside += int(mask.sum())
+            valid = mask & np.isfinite(block) & (block >= lo) & (block <= hi)
+            values = block[valid]
+            if values.size:
+                valid_count += values.size
+                total += float(values.sum(dtype=np.float64))
+                squares += float(np.square(values, dtype=np.float64).sum())
+                v_min = min(v_min, float(values.min()))
+                v_max = max(v_max, float(values.max()))
+                idx = ((values - lo) * (bins / (hi - lo))).astype(np.int64)
+                histogram += np.bincount(np.clip(idx, 0, bins - 1), minlength=bins)
+            if cells is not None:
+                self._accumulate_cells(cells, block, valid, (top - r0) // cell, cell)
+
+        if valid_count == 0:
+            raise ValueError("No valid pixels inside the field")
+
+        mean = total / valid_count
+        latitude = transform.north - (r0 + r1) / 2 * transform.pixel_height
+        stats = RasterStats(
+            pixel_count=inside,
+            valid_count=valid_count,
+            mean=mean,
+            std=math.sqrt(max(squares / valid_count - mean * mean, 0.0)),
+            min=v_min,
+            max=v_max,
+            percentiles=self._percentiles(histogram, v_min, v_max),
+            area_ha=inside * transform.pixel_area_m2(latitude) / 10000,
+        )
+        return stats, cells
+
+    @staticmethod
+    def _accumulate_cells(
+        cells: tuple[np.ndarray, ...], block: np.ndarray, valid: np.ndarray, row: int, cell: int
+    ) -> None:
+        count, total, squares, low, high = cells
+        rows = -(-block.shape[0] // cell)
+        cols = count.shape[1]
+        padded = np.zeros((rows * cell, cols * cell), dtype=np.float64)
+        ok = np.zeros(padded.shape, dtype=bool)
+        padded[: block.shape[0], : block.shape[1]] = np.where(valid, block, 0.0)
+        ok[: block.shape[0], : block.shape[1]] = valid
+
+        shape = (rows, cell, cols, cell)
+        v = padded.reshape(shape)
+        m = ok.reshape(shape)
+        count[row : row + rows] += m.sum(axis=(1, 3))
+        total[row : row + rows] += v.sum(axis=(1, 3))
+        squares[row : row + rows] += (v * v).sum(axis=(1, 3))
+        low[row : row + rows] = np.minimum(
+            low[row : row + rows], np.where(m, v, np.inf).min(axis=(1, 3))
+        )
+        high[row : row + rows] = np.maximum(
+            high[row : row + rows], np.where(m, v, -np.inf).max(axis=(1, 3))
+        )
+
+    def _percentiles(self, histogram: np.ndarray, v_min: float, v_max: float) -> dict[int, float]:
+        lo, hi = self.value_range
+        width = (hi - lo) / self.histogram_bins
+        cum = np.cumsum(histogram)
+        n = cum[-1]
+        result = {}
+        for q in PERCENTILES:
+            target = q / 100 * n
+            b = int(np.searchsorted(cum, target))
+            before = cum[b - 1] if b > 0 else 0
+            fraction = (target - before) / histogram[b] if histogram[b] else 0.0
+            value = lo + (b + fraction) * width
+            result[q] = float(min(max(value, v_min), v_max))
+        return result
+
+    def _class_histogram(
+        self, means: np.ndarray, weights: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Weighted cell means binned for classification, empty bins dropped"""
+        lo, hi = float(means.min()), float(means.max())
+        if hi - lo < 1e-9:
+            return np.array([lo]), np.array([weights.sum()])
+        idx = np.minimum(
+            ((means - lo) / (hi - lo) * self.class_bins).astype(np.int64), self.class_bins - 1
+        )
+        w = np.bincount(idx, weights=weights, minlength=self.class_bins)
+        x = np.bincount(idx, weights=weights * means, minlength=self.class_bins)
+        keep = w > 0
+        return x[keep] / w[keep], w[keep]
+
+    # -------------------------------------------------------------------------
+    # Zones
+    # -------------------------------------------------------------------------
+
+    def _zones(
+        self,
+        labels: np.ndarray,
+        cells: tuple[np.ndarray, ...],
+        grid: RasterTransform,
+        breaks: np.ndarray,
+        stats: RasterStats,
+        num_zones: int,
+        cell_size: int,
+        tolerance: float,
+    ) -> list[Zone]:
+        count, total, squares, low, high = cells
+        flat = labels.ravel().astype(np.int64)
+        n = num_zones + 1
+        z_count = np.bincount(flat, weights=count.ravel(), minlength=n)
+        z_total = np.bincount(flat, weights=total.ravel(), minlength=n)
+        z_squares = np.bincount(flat, weights=squares.ravel(), minlength=n)
+        z_min = np.full(n, np.inf)
+        z_max = np.full(n, -np.inf)
+        np.minimum.at(z_min, flat, low.ravel())
+        np.maximum.at(z_max, flat, high.ravel())
+
+        rows, cols = np.indices(labels.shape)
+        lon = grid.west + (cols.ravel() + 0.5) * grid.pixel_width
+        lat = grid.north - (rows.ravel() + 0.5) * grid.pixel_height
+        z_lon = np.bincount(flat, weights=count.ravel() * lon, minlength=n)
+        z_lat = np.bincount(flat, weights=count.ravel() * lat, minlength=n)
+
+        edges = [stats.min, *breaks.tolist(), stats.max]
+        valid_total = max(float(z_count[1:].sum()), 1.0)
+        # Cells smaller than a pixel-sized speck are not worth a polygon
+        min_cells = 1.0 if cell_size > 1 else 4.0
+
+        zones = []
+        nan = float("nan")
+        for z in range(1, n):
+            c = float(z_count[z])
+            mean = float(z_total[z]) / c if c else nan
+            zones.append(
+                Zone(
+                    zone=z,
+                    ndvi_range=(round(edges[z - 1], 4), round(edges[z], 4)),
+                    pixel_count=int(c),
+                    # Share of the in-polygon area, valid pixels as the proxy
+                    area_ha=stats.area_ha * c / valid_total,
+                    percentage=100.0 * c / valid_total,
+                    mean=mean,
+                    std=math.sqrt(max(float(z_squares[z]) / c - mean * mean, 0.0)) if c else nan,
+                    min=float(z_min[z]) if c else nan,
+                    max=float(z_max[z]) if c else nan,
+                    centroid=(float(z_lon[z]) / c, float(z_lat[z]) / c) if c else (nan, nan),
+                    polygons=polygonize(labels, z, grid, tolerance, min_cells) if c else [],
+                )
+            )
+        return zones
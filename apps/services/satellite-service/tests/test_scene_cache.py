@@ -0,0 +1,290 @@
+"""
+Unit tests for the scene tile cache
+"""
+
+import asyncio
+import json
+from datetime import date
+
+import numpy as np
+import pytest
+from src.multi_provider import (
+    MultiSatelliteService,
+    SatelliteProvider,
+    SatelliteType,
+)
+from src.scene_cache import (
+    BANDS,
+    SceneCache,
+    TileGrid,
+    TileKey,
+    compute_indices,
+    downsample,
+    polygon_mask,
+)
+
+ACQUIRED = date(2025, 6, 1)
+GRID = TileGrid(tile_deg=0.02, pixel_deg=0.0001)  # 200 x 200 px tiles
+
+# Constant reflectance: NDVI 0.6, NDWI 1/3
+CONSTANT = {"B02": 500, "B04": 1000, "B08": 4000, "B11": 2000}
+
+
+class FakeTiles:
+    """Tile fetcher returning synthetic bands and counting calls"""
+
+    def __init__(self, pattern=None, delay: float = 0.01):
+        self.pattern = pattern
+        self.delay = delay
+        self.calls: list[tuple] = []
+
+    async def __call__(self, bbox, width, height):
+        self.calls.append(bbox)
+        await asyncio.sleep(self.delay)
+        if self.pattern is None:
+            return {band: np.full((height, width), v, np.uint16) for band, v in CONSTANT.items()}
+        return self.pattern(bbox, width, height)
+
+
+def make_cache(tmp_path, **settings) -> SceneCache:
+    settings.setdefault("grid", GRID)
+    settings.setdefault("chunk", 64)
+    return SceneCache(tmp_path / "scenes", **settings)
+
+
+def square(lon: float, lat: float, side: float) -> list[tuple[float, float]]:
+    return [(lon, lat), (lon + side, lat), (lon + side, lat + side), (lon, lat + side)]
+
+
+class TestRasterHelpers:
+    """Pure helpers"""
+
+    def test_downsample_ignores_nodata(self):
+        band = np.array([[100, 300, 0, 0], [0, 200, 0, 0], [7, 7, 7, 7]], np.uint16)
+
+        out = downsample(band)
+
+        assert out.tolist() == [[200, 0], [7, 7]]
+
+    def test_polygon_mask_triangle(self):
+        lons = (np.arange(100) + 0.5) / 100
+        lats = (np.arange(100) + 0.5) / 100
+
+        mask = polygon_mask([(0, 0), (1, 0), (0, 1)], lons, lats)
+
+        assert mask.sum() == pytest.approx(5000, rel=0.03)
+        assert mask[0, 0] and not mask[-1, -1]
+
+    def test_indices_match_formulas(self):
+        values = [np.array([CONSTANT[b] / 10000.0], np.float32) for b in BANDS]
+
+        indices = compute_indices(*values)
+
+        assert indices["ndvi"][0] == pytest.approx(0.6)
+        assert indices["ndwi"][0] == pytest.approx(1 / 3)
+
+
+class TestSceneCache:
+    """Fetch once per tile, answer fields from disk"""
+
+    async def test_fields_in_one_tile_share_one_fetch(self, tmp_path):
+        cache = make_cache(tmp_path)
+        fetch = FakeTiles()
+        fields = [square(44.001 + i * 0.0003, 15.201 + i * 0.0003, 0.0005) for i in range(50)]
+
+        results = await asyncio.gather(
+            *(cache.field_stats(fetch, "sentinel-2", ACQUIRED, ring=ring) for ring in fields)
+        )
+
+        assert len(fetch.calls) == 1
+        assert cache.stats["coalesced"] == 49
+        assert all(r.indices["ndvi"].mean == pytest.approx(0.6, abs=1e-4) for r in results)
+        assert all(r.valid_pixels == r.pixel_count > 0 for r in results)
+
+    async def test_clipping_follows_the_boundary(self, tmp_path):
+        def halves(bbox, width, height):
+            # Western half bare soil, eastern half dense crop
+            red = np.full((height, width), 1000, np.uint16)
+            nir = np.full((height, width), 1500, np.uint16)
+            nir[:, width // 2 :] = 4000
+            return {"B02": red // 2, "B04": red, "B08": nir, "B11": red * 2}
+
+        cache = make_cache(tmp_path)
+        fetch = FakeTiles(halves)
+        west = square(44.0005, 15.2005, 0.005)
+        east = square(44.0105, 15.2005, 0.005)
+
+        west_stats = await cache.field_stats(fetch, "sentinel-2", ACQUIRED, ring=west)
+        east_stats = await cache.field_stats(fetch, "sentinel-2", ACQUIRED, ring=east)
+
+        assert west_stats.indices["ndvi"].max == pytest.approx(0.2, abs=1e-4)
+        assert east_stats.indices["ndvi"].min == pytest.approx(0.6, abs=1e-4)
+        assert west_stats.pixel_count == pytest.approx(2500, rel=0.05)
+        assert len(fetch.calls) == 1
+
+    async def test_field_across_tiles(self, tmp_path):
+        cache = make_cache(tmp_path)
+        fetch = FakeTiles()
+
+        stats = await cache.field_stats(
+            fetch, "sentinel-2", ACQUIRED, bbox=(44.019, 15.219, 44.021, 15.221)
+        )
+
+        assert len(fetch.calls) == 4
+        assert len(stats.tiles) == 4
+        assert stats.pixel_count == pytest.approx(400, rel=0.1)
+
+    async def test_large_fields_read_overviews(self, tmp_path):
+        cache = make_cache(tmp_path, min_pixels=1024)
+        fetch = FakeTiles()
+
+        small = await cache.field_stats(
+            fetch, "sentinel-2", ACQUIRED, ring=square(44.001, 15.201, 0.002)
+        )
+        large = await cache.field_stats(
+            fetch, "sentinel-2", ACQUIRED, ring=square(44.001, 15.201, 0.018)
+        )
+
+        assert small.level == 0
+        assert large.level >= 1
+        assert large.indices["ndvi"].mean == pytest.approx(small.indices["ndvi"].mean, abs=1e-3)
+
+    async def test_empty_tiles_are_not_refetched(self, tmp_path):
+        cache = make_cache(tmp_path)
+
+        async def nothing(bbox, width, height):
+            nothing.calls += 1
+            return None
+
+        nothing.calls = 0
+        for _ in range(3):
+            assert (
+                await cache.field_stats(
+                    nothing, "sentinel-2", ACQUIRED, bbox=(44.001, 15.201, 44.002, 15.202)
+                )
+                is None
+            )
+
+        assert nothing.calls == 1
+        assert cache.stats["empty"] == 2
+
+
+class TestStorage:
+    """Zarr layout, persistence and eviction"""
+
+    async def test_zarr_v2_layout(self, tmp_path):
+        cache = make_cache(tmp_path)
+        await cache.field_stats(
+            FakeTiles(), "sentinel-2", ACQUIRED, bbox=(44.001, 15.201, 44.002, 15.202)
+        )
+        tile = cache.root / "sentinel-2" / "2025-06-01" / "2200_760"
+
+        meta = json.loads((tile / "0" / "B04" / ".zarray").read_text())
+        attrs = json.loads((tile / ".zattrs").read_text())
+
+        assert meta["shape"] == [200, 200]
+        assert meta["chunks"] == [64, 64]
+        assert meta["compressor"]["id"] == "zlib"
+        assert attrs["levels"] == [[200, 200], [100, 100], [50, 50]]
+        overview = cache.read_overview(TileKey("sentinel-2", ACQUIRED, 2200, 760), "B08")
+        assert overview.shape == (50, 50)
+        assert (overview == 4000).all()
+
+    async def test_restart_reuses_disk_tiles(self, tmp_path):
+        fetch = FakeTiles()
+        bbox = (44.001, 15.201, 44.002, 15.202)
+        await make_cache(tmp_path).field_stats(fetch, "sentinel-2", ACQUIRED, bbox=bbox)
+
+        restarted = make_cache(tmp_path)
+        stats = await restarted.field_stats(fetch, "sentinel-2", ACQUIRED, bbox=bbox)
+
+        assert len(fetch.calls) == 1
+        assert restarted.stats["hits"] == 1
+        assert stats.indices["ndvi"].mean == pytest.approx(0.6, abs=1e-4)
+
+    async def test_eviction_bounds_disk_usage(self, tmp_path):
+        def noisy(bbox, width, height):
+            rng = np.random.default_rng(int(bbox[0] * 1000))
+            return {b: rng.integers(1, 5000, (height, width), dtype=np.uint16) for b in BANDS}
+
+        probe = make_cache(tmp_path / "probe")
+        await probe.field_stats(
+            FakeTiles(noisy), "sentinel-2", ACQUIRED, bbox=(44.001, 15.201, 44.002, 15.202)
+        )
+        tile_bytes = probe.snapshot()["disk_bytes"]
+
+        cache = make_cache(tmp_path, max_bytes=int(tile_bytes * 2.5))
+        fetch = FakeTiles(noisy)
+        for i in range(5):
+            lon = 44.001 + i * GRID.tile_deg
+            await cache.field_stats(
+                fetch, "sentinel-2", ACQUIRED, bbox=(lon, 15.201, lon + 0.001, 15.202)
+            )
+
+        snapshot = cache.snapshot()
+        assert snapshot["tiles"] == 2
+        assert snapshot["evictions"] == 3
+        assert snapshot["disk_bytes"] <= cache.max_bytes
+        assert len(list(cache.root.glob("*/*/*/.zattrs"))) == 2
+
+
+class TileProvider(SatelliteProvider):
+    """Provider with scene tiles only"""
+
+    def __init__(self):
+        super().__init__("Tiles", "بلاطات")
+        self.fetch = FakeTiles()
+
+    @property
+    def is_configured(self) -> bool:
+        return True
+
+    @property
+    def supported_satellites(self):
+        return [SatelliteType.SENTINEL2]
+
+    @property
+    def supports_tiles(self) -> bool:
+        return True
+
+    async def search_scenes(self, *args, **kwargs):
+        return []
+
+    async def get_indices(self, *args, **kwargs):
+        raise AssertionError("point lookups should go through the scene cache")
+
+    async def fetch_tile_bands(self, bbox, width, height, acquisition_date, satellite):
+        return await self.fetch(bbox, width, height)
+
+
+class TestMultiSatelliteService:
+    """Providers with tile support are served from the scene cache"""
+
+    async def test_get_indices_and_field_statistics(self, tmp_path):
+        service = MultiSatelliteService(scene_cache=make_cache(tmp_path))
+        provider = TileProvider()
+        service.providers.insert(0, provider)
+
+        indices = await service.get_indices(15.205, 44.005, ACQUIRED)
+        field_result = await service.get_field_statistics(square(44.006, 15.206, 0.001), ACQUIRED)
+
+        assert indices.provider == "Tiles"
+        assert indices.data.ndvi == pytest.approx(0.6, abs=1e-4)
+        assert field_result.success
+        assert field_result.data.to_dict()["indices"]["ndvi"]["mean"] == pytest.approx(0.6)
+        assert len(provider.fetch.calls) == 1
+
+    async def test_ndvi_raster_mosaics_tiles(self, tmp_path):
+        service = MultiSatelliteService(scene_cache=make_cache(tmp_path))
+        provider = TileProvider()
+        service.providers.insert(0, provider)
+
+        result = await service.get_ndvi_raster(square(44.0195, 15.0195, 0.001), ACQUIRED)
+        ndvi, (west, south, east, north) = result.data
+
+        assert result.success
+        assert len(provider.fetch.calls) == 4
+        assert ndvi.shape == (10, 10)
+        assert np.allclose(ndvi, 0.6)
+        assert (west, north) == pytest.approx((44.0195, 15.0205))
+        assert (east - west, north - south) == pytest.approx((0.001, 0.001))
@@ -0,0 +1,367 @@
+"""
+SAHOOL FAO-56 Engine
+محرك FAO-56 الموحد للتبخر-نتح وميزان الماء
+
+Vectorized FAO-56 Penman-Monteith reference evapotranspiration (ET0), crop
+evapotranspiration (ETc) and root-zone water balance. Every function takes
+scalars or NumPy arrays and broadcasts them, so the same call computes one
+field-day or a whole (fields x days) grid.
+
+Used by the virtual-sensors service and the kernel irrigation scheduler.
+
+Reference: Allen et al. (1998), FAO Irrigation and Drainage Paper 56.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+ArrayLike = float | np.ndarray
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Constants - الثوابت
+# ═══════════════════════════════════════════════════════════════════════════════
+
+ALBEDO = 0.23  # Grass reference surface
+SOLAR_CONSTANT = 0.0820  # MJ/m²/min
+STEFAN_BOLTZMANN = 4.903e-9  # MJ/K⁴/m²/day
+ANGSTROM_A = 0.25
+ANGSTROM_B = 0.50
+HARGREAVES_KRS = 0.16  # Interior location
+
+# Share of rainfall that reaches the root zone
+RAIN_EFFICIENCY = 0.80
+
+# Root-zone depletion (% of TAW) where each moisture status begins
+DEPLETION_THRESHOLDS = (30.0, 50.0, 70.0, 85.0)
+MOISTURE_STATUSES = ("optimal", "adequate", "moderate_stress", "high_stress", "critical")
+
+
+def _array(value: ArrayLike) -> np.ndarray:
+    return np.asarray(value, dtype=np.float64)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Atmospheric parameters - المعاملات الجوية
+# ═══════════════════════════════════════════════════════════════════════════════
+
+
+def saturation_vapour_pressure(temperature: ArrayLike) -> np.ndarray:
+    """ضغط البخار المشبع - Saturation vapour pressure e°(T) (kPa)"""
+    t = _array(temperature)
+    return 0.6108 * np.exp((17.27 * t) / (t + 237.3))
+
+
+def vapour_pressure_slope(temperature: ArrayLike) -> np.ndarray:
+    """ميل منحنى ضغط البخار - Slope of the saturation vapour pressure curve Δ (kPa/°C)"""
+    t = _array(temperature)
+    return (4098 * saturation_vapour_pressure(t)) / ((t + 237.3) ** 2)
+
+
+def psychrometric_constant(altitude: ArrayLike) -> np.ndarray:
+    """ثابت البسيكرومتر - Psychrometric constant γ (kPa/°C) from altitude (m)"""
+    pressure = 101.3 * ((293 - 0.0065 * _array(altitude)) / 293) ** 5.26
+    return 0.000665 * pressure
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Radiation - الإشعاع
+# ═══════════════════════════════════════════════════════════════════════════════
+
+
+def extraterrestrial_radiation(
+    latitude: ArrayLike, day_of_year: ArrayLike
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    الإشعاع خارج الغلاف الجوي وزاوية الغروب
+    Extraterrestrial radiation Ra (MJ/m²/day) and sunset hour angle ωs (rad)
+
+    The sunset angle is clamped for polar day and night.
+    """
+    lat = np.radians(_array(latitude))
+    day = _array(day_of_year)
+    declination = 0.409 * np.sin(2 * np.pi * day / 365 - 1.39)
+    ws = np.arccos(np.clip(-np.tan(lat) * np.tan(declination), -1, 1))
+    dr = 1 + 0.033 * np.cos(2 * np.pi * day / 365)
+    ra = (
+        (24 * 60 / np.pi)
+        * SOLAR_CONSTANT
+        * dr
+        * (ws * np.sin(lat) * np.sin(declination) + np.cos(lat) * np.cos(declination) * np.sin(ws))
+    )
+    return ra, ws
+
+
+def daylight_hours(sunset_angle: ArrayLike) -> np.ndarray:
+    """ساعات النهار القصوى - Maximum daylight hours N"""
+    return 24 * _array(sunset_angle) / np.pi
+
+
+def shortwave_radiation(
+    ra: ArrayLike,
+    sunset_angle: ArrayLike,
+    t_max: ArrayLike,
+    t_min: ArrayLike,
+    solar_radiation: ArrayLike | None = None,
+    sunshine_hours: ArrayLike | None = None,
+) -> np.ndarray:
+    """
+    الإشعاع الشمسي - Incoming solar radiation Rs (MJ/m²/day)
+
+    Per element: measured Rs where given, else Angström from sunshine
+    hours, else Hargreaves from the temperature range. Missing values in
+    ``solar_radiation`` and ``sunshine_hours`` are NaN.
+    """
+    ra = _array(ra)
+    t_range = np.maximum(_array(t_max) - _array(t_min), 0)
+    rs = HARGREAVES_KRS * np.sqrt(t_range) * ra
+    if sunshine_hours is not None:
+        n = _array(sunshine_hours)
+        day_length = daylight_hours(sunset_angle)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            angstrom = np.where(
+                day_length > 0, (ANGSTROM_A + ANGSTROM_B * n / day_length) * ra, 0.0
+            )
+        rs = np.where(np.isnan(n), rs, angstrom)
+    if solar_radiation is not None:
+        measured = _array(solar_radiation)
+        rs = np.where(np.isnan(measured), rs, measured)
+    return rs
+
+
+def net_longwave_radiation(
+    t_max: ArrayLike, t_min: ArrayLike, ea: ArrayLike, relative_shortwave: ArrayLike
+) -> np.ndarray:
+    """
+    الإشعاع طويل الموجة الصافي - Net outgoing longwave radiation Rnl (MJ/m²/day)
+
+    ``relative_shortwave`` is Rs/Rso, the cloudiness term.
+    """
+    return (
+        STEFAN_BOLTZMANN
+        * ((_array(t_max) + 273.16) ** 4 + (_array(t_min) + 273.16) ** 4)
+        / 2
+        * (0.34 - 0.14 * np.sqrt(_array(ea)))
+        * (1.35 * _array(relative_shortwave) - 0.35)
+    )
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Evapotranspiration - التبخر-نتح
+# ═══════════════════════════════════════════════════════════════════════════════
+
+
+def penman_monteith(
+    delta: ArrayLike,
+    gamma: ArrayLike,
+    t_mean: ArrayLike,
+    wind_speed: ArrayLike,
+    vapour_pressure_deficit: ArrayLike,
+    net_radiation: ArrayLike,
+    soil_heat_flux: ArrayLike = 0.0,
+) -> np.ndarray:
+    """
+    معادلة بنمان-مونتيث - FAO-56 Penman-Monteith equation (mm/day, unclamped)
+
+    ET0 = [0.408 Δ(Rn-G) + γ(900/(T+273))u2(es-ea)] / [Δ + γ(1+0.34u2)]
+    """
+    delta, gamma, u2 = _array(delta), _array(gamma), _array(wind_speed)
+    radiation_term = 0.408 * delta * (_array(net_radiation) - soil_heat_flux)
+    aerodynamic_term = gamma * (900 / (_array(t_mean) + 273)) * u2 * _array(vapour_pressure_deficit)
+    return (radiation_term + aerodynamic_term) / (delta + gamma * (1 + 0.34 * u2))
+
+
+def reference_et0(
+    t_max: ArrayLike,
+    t_min: ArrayLike,
+    humidity: ArrayLike,
+    wind_speed: ArrayLike,
+    latitude: ArrayLike,
+    day_of_year: ArrayLike,
+    altitude: ArrayLike = 0.0,
+    solar_radiation: ArrayLike | None = None,
+    sunshine_hours: ArrayLike | None = None,
+) -> np.ndarray:
+    """
+    التبخر-نتح المرجعي - Reference evapotranspiration ET0 (mm/day)
+
+    Daily FAO-56 Penman-Monteith from max/min temperature (°C), mean
+    relative humidity (%), 2 m wind speed (m/s), latitude (degrees), day of
+    year and altitude (m). Soil heat flux is zero; negative results are 0.
+    """
+    t_max, t_min = _array(t_max), _array(t_min)
+    altitude = _array(altitude)
+    t_mean = (t_max + t_min) / 2
+
+    es = (saturation_vapour_pressure(t_max) + saturation_vapour_pressure(t_min)) / 2
+    ea = (_array(humidity) / 100) * es
+
+    ra, ws = extraterrestrial_radiation(latitude, day_of_year)
+    rs = shortwave_radiation(ra, ws, t_max, t_min, solar_radiation, sunshine_hours)
+    rso = (0.75 + 2e-5 * altitude) * ra
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs_rso = np.where(rso > 0, np.minimum(rs / rso, 1.0), 0.5)
+    rn = (1 - ALBEDO) * rs - net_longwave_radiation(t_max, t_min, ea, rs_rso)
+
+    et0 = penman_monteith(
+        vapour_pressure_slope(t_mean),
+        psychrometric_constant(altitude),
+        t_mean,
+        wind_speed,
+        es - ea,
+        rn,
+    )
+    return np.where(et0 > 0, et0, 0.0)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Root-zone water balance - ميزان الماء في منطقة الجذور
+# ═══════════════════════════════════════════════════════════════════════════════
+
+
+@dataclass
+class WaterBalanceGrid:
+    """
+    ميزان الماء اليومي لشبكة (حقول × أيام)
+    Daily water balance for a (fields x days) grid, all values in mm
+    """
+
+    et0: np.ndarray
+    etc: np.ndarray
+    effective_rainfall: np.ndarray
+    drainage: np.ndarray  # Input above TAW lost to deep percolation
+    available_water: np.ndarray  # End-of-day available water in the root zone
+    depletion_percent: np.ndarray  # End-of-day depletion (% of TAW)
+
+    @property
+    def final_available_water(self) -> np.ndarray:
+        return self.available_water[:, -1]
+
+    @property
+    def final_depletion_percent(self) -> np.ndarray:
+        return self.depletion_percent[:, -1]
+
+
+def available_water_since_irrigation(
+    total_available_water: ArrayLike,
+    irrigation: ArrayLike,
+    rainfall: ArrayLike,
+    daily_etc: ArrayLike,
+    days: ArrayLike,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    الماء المتاح منذ آخر ري
+    Available water (mm) after ``days`` of constant ETc since the last
+    irrigation, and the ET loss. Irrigation plus effective rainfall fills
+    the root zone up to TAW.
+    """
+    water_input = np.minimum(
+        _array(irrigation) + _array(rainfall) * RAIN_EFFICIENCY, _array(total_available_water)
+    )
+    et_loss = _array(daily_etc) * _array(days)
+    return np.maximum(0, water_input - et_loss), et_loss
+
+
+def daily_water_balance(
+    et0: ArrayLike,
+    kc: ArrayLike,
+    total_available_water: ArrayLike,
+    initial_available_water: ArrayLike = 0.0,
+    rainfall: ArrayLike = 0.0,
+    irrigation: ArrayLike = 0.0,
+) -> WaterBalanceGrid:
+    """
+    ميزان الماء اليومي
+    Daily root-zone water balance for ``fields x days`` grids.
+
+    ``et0``, ``kc``, ``rainfall`` and ``irrigation`` broadcast to
+    (fields, days), a 1-D series being one field; ``total_available_water``
+    and ``initial_available_water`` are per field. Each day, irrigation and
+    effective rainfall fill the root zone up to TAW (the rest drains), then
+    ETc = Kc x ET0 is withdrawn down to empty. The day loop runs over
+    whole field columns.
+    """
+    etc = np.atleast_2d(_array(et0) * _array(kc))
+    effective_rainfall = np.atleast_2d(_array(rainfall) * RAIN_EFFICIENCY)
+    irrigation = np.atleast_2d(_array(irrigation))
+    taw = _array(total_available_water).reshape(-1, 1)
+    initial = _array(initial_available_water).reshape(-1, 1)
+    shape = np.broadcast_shapes(
+        etc.shape, effective_rainfall.shape, irrigation.shape, taw.shape, initial.shape
+    )
+
+    et0 = np.broadcast_to(np.atleast_2d(_array(et0)), shape)
+    etc = np.broadcast_to(etc, shape)
+    effective_rainfall = np.broadcast_to(effective_rainfall, shape)
+    irrigation = np.broadcast_to(irrigation, shape)
+    taw = np.broadcast_to(taw, (shape[0], 1))[:, 0]
+    water = np.broadcast_to(initial, (shape[0], 1))[:, 0].copy()
+
+    drainage = np.empty(shape)
+    available = np.empty(shape)
+    for day in range(shape[1]):
+        water += irrigation[:, day]
+        water += effective_rainfall[:, day]
+        np.subtract(water, taw, out=drainage[:, day])
+        np.maximum(drainage[:, day], 0, out=drainage[:, day])
+        np.minimum(water, taw, out=water)
+        water -= etc[:, day]
+        np.maximum(water, 0, out=water)
+        available[:, day] = water
+
+    return WaterBalanceGrid(
+        et0=et0,
+        etc=etc,
+        effective_rainfall=effective_rainfall,
+        drainage=drainage,
+        available_water=available,
+        depletion_percent=depletion_percent(available, taw[:, None]),
+    )
+
+
+def depletion_percent(available_water: ArrayLike, total_available_water: ArrayLike) -> np.ndarray:
+    """نسبة استنفاد الماء المتاح - Root-zone depletion (% of TAW); 100 when TAW is 0"""
+    aw, taw = _array(available_water), _array(total_available_water)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(taw > 0, (taw - aw) / taw * 100, 100.0)
+
+
+def moisture_status_index(depletion: ArrayLike) -> np.ndarray:
+    """
+    مؤشر حالة الرطوبة
+    Index into MOISTURE_STATUSES for each depletion percentage
+    """
+    return np.searchsorted(DEPLETION_THRESHOLDS, _array(depletion), side="right")
+
+
+def irrigation_requirement(
+    total_available_water: ArrayLike,
+    available_water: ArrayLike,
+    etc: ArrayLike,
+    depletion_fraction: ArrayLike,
+    efficiency: ArrayLike,
+) -> dict[str, np.ndarray]:
+    """
+    احتياج الري
+    Irrigation need per field.
+
+    Irrigation starts 10 points of depletion before the management allowed
+    depletion (p x TAW) and refills to field capacity with 10% extra for
+    distribution uniformity. ``days_until_needed`` is 7 when ETc is zero.
+    """
+    taw, aw = _array(total_available_water), _array(available_water)
+    etc, p = _array(etc), _array(depletion_fraction)
+    current_depletion = taw - aw
+
+    needed = depletion_percent(aw, taw) > (p * 100 - 10)
+    net_mm = np.where(needed, current_depletion * 1.1, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        days = np.trunc((taw * p - current_depletion) / etc)
+    days_until_needed = np.where(etc > 0, np.maximum(days, 0), 7).astype(np.int64)
+
+    return {
+        "irrigation_needed": needed,
+        "net_mm": net_mm,
+        "gross_mm": net_mm / _array(efficiency),
+        "days_until_needed": days_until_needed,
+    }
@@ -0,0 +1,293 @@
+"""
+SAHOOL Geometry Kernel
+نواة الحسابات الهندسية لحدود الحقول
+
+Vectorized great-circle distance, geodesic area and perimeter, and
+Douglas-Peucker simplification for lon/lat rings. Every function works on
+NumPy arrays; the batch forms (``areas_m2``, ``perimeters_m``,
+``simplify_many``) take many rings at once, either as a list of rings of
+any length or as one (polygons x vertices x 2) array.
+
+Rings are sequences of (lon, lat) in degrees, open or closed (first point
+repeated at the end); polygons are GeoJSON-style lists of rings, exterior
+first.
+
+Used by the satellite and vegetation-analysis services (boundary detection
+and management zones), the field service and the kernel boundary validator.
+
+Reference: Chamberlain & Duquette (2007), Some Algorithms for Polygons on
+a Sphere, JPL Publication 07-03.
+"""
+
+from collections.abc import Sequence
+
+import numpy as np
+
+ArrayLike = float | np.ndarray
+
+# IUGG mean Earth radius (metres)
+EARTH_RADIUS_M = 6371008.8
+
+Ring = Sequence[Sequence[float]] | np.ndarray  # [(lon, lat), ...]
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Distance - المسافة
+# ═══════════════════════════════════════════════════════════════════════════════
+
+
+def haversine_m(lat1: ArrayLike, lon1: ArrayLike, lat2: ArrayLike, lon2: ArrayLike) -> ArrayLike:
+    """Great-circle distance in metres between points given in degrees (broadcasts)"""
+    phi1, phi2 = np.radians(lat1), np.radians(lat2)
+    dphi = phi2 - phi1
+    dlam = np.radians(np.subtract(lon2, lon1))
+    a = np.sin(dphi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlam / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Ring packing - تجميع الحلقات
+# ═══════════════════════════════════════════════════════════════════════════════
+
+
+def _open(ring: Ring) -> np.ndarray:
+    """(n, 2) float array without the closing point"""
+    pts = np.asarray(ring, dtype=np.float64).reshape(-1, 2)
+    if len(pts) > 1 and (pts[0] == pts[-1]).all():
+        pts = pts[:-1]
+    return pts
+
+
+def _pack(rings: Sequence[Ring] | np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Flatten rings into one (M, 2) array of open rings plus each ring's start
+    offset and vertex count
+    """
+    if isinstance(rings, np.ndarray) and rings.ndim == 3:
+        n, v, _ = rings.shape
+        points = rings.astype(np.float64, copy=False)
+        closed = (points[:, 0] == points[:, -1]).all(axis=1) & (v > 1)
+        if closed.all():
+            points, v = points[:, :-1], v - 1
+        elif closed.any():
+            return _pack(list(rings))
+        counts = np.full(n, v, dtype=np.int64)
+        return points.reshape(-1, 2), np.arange(n, dtype=np.int64) * v, counts
+
+    parts = [_open(ring) for ring in rings]
+    counts = np.array([len(p) for p in parts], dtype=np.int64)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1])).astype(np.int64)
+    points = np.concatenate(parts) if parts else np.empty((0, 2))
+    return points, starts, counts
+
+
+def _rolled(values: np.ndarray, starts: np.ndarray, counts: np.ndarray, shift: int) -> np.ndarray:
+    """Value at the vertex ``shift`` places ahead of every packed vertex, wrapping per ring"""
+    n = len(counts)
+    if n and (counts == counts[0]).all():
+        # Equal-length rings: roll the (rings, vertices) view
+        return np.roll(values.reshape(n, -1), -shift, axis=1).reshape(-1)
+    idx = np.arange(len(values), dtype=np.int64) + shift
+    nonempty = counts > 0
+    first, last = starts[nonempty], (starts + counts - 1)[nonempty]
+    if shift > 0:
+        idx[last] = first
+    else:
+        idx[first] = last
+    return values[idx]
+
+
+def _ring_sums(values: np.ndarray, starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Per-ring sums of per-vertex values (empty rings sum to 0)"""
+    n = len(counts)
+    if n and (counts == counts[0]).all():
+        return values.reshape(n, -1).sum(axis=1)
+    sums = np.zeros(n)
+    nonempty = counts > 0
+    if values.size:
+        sums[nonempty] = np.add.reduceat(values, starts[nonempty])
+    return sums
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Area and perimeter - المساحة والمحيط
+# ═══════════════════════════════════════════════════════════════════════════════
+
+
+def signed_areas_m2(rings: Sequence[Ring] | np.ndarray) -> np.ndarray:
+    """
+    Spherical area of each ring in m², positive when counter-clockwise
+    (GeoJSON exterior orientation). Rings with fewer than 3 vertices are 0.
+    """
+    points, starts, counts = _pack(rings)
+    if not len(points):
+        return np.zeros(len(counts))
+    lam = np.radians(points[:, 0])
+    sin_phi = np.sin(np.radians(points[:, 1]))
+    dlam = _rolled(lam, starts, counts, 1) - _rolled(lam, starts, counts, -1)
+    # Keep longitude steps across the antimeridian short
+    wrap = np.abs(dlam) > np.pi
+    if wrap.any():
+        dlam[wrap] -= np.copysign(2 * np.pi, dlam[wrap])
+    areas = _ring_sums(dlam * sin_phi, starts, counts) * -(EARTH_RADIUS_M**2) / 2
+    areas[counts < 3] = 0.0
+    return areas
+
+
+def areas_m2(rings: Sequence[Ring] | np.ndarray) -> np.ndarray:
+    """Unsigned spherical area of each ring in m²"""
+    return np.abs(signed_areas_m2(rings))
+
+
+def perimeters_m(rings: Sequence[Ring] | np.ndarray, closed: bool = True) -> np.ndarray:
+    """Length of each ring in metres (``closed=False`` for open polylines)"""
+    points, starts, counts = _pack(rings)
+    if not len(points):
+        return np.zeros(len(counts))
+    lam = np.radians(points[:, 0])
+    phi = np.radians(points[:, 1])
+    cos_phi = np.cos(phi)
+    dphi = _rolled(phi, starts, counts, 1) - phi
+    dlam = _rolled(lam, starts, counts, 1) - lam
+    a = (
+        np.sin(dphi / 2) ** 2
+        + cos_phi * _rolled(cos_phi, starts, counts, 1) * np.sin(dlam / 2) ** 2
+    )
+    steps = 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+    if not closed:
+        steps[(starts + counts - 1)[counts > 0]] = 0.0
+    return _ring_sums(steps, starts, counts)
+
+
+def ring_area_m2(ring: Ring) -> float:
+    return float(areas_m2([ring])[0])
+
+
+def polygon_area_m2(rings: Sequence[Ring]) -> float:
+    """Area of a polygon in m²: exterior minus holes"""
+    if not rings:
+        return 0.0
+    areas = areas_m2(list(rings))
+    return float(max(areas[0] - areas[1:].sum(), 0.0))
+
+
+def perimeter_m(ring: Ring, closed: bool = True) -> float:
+    return float(perimeters_m([ring], closed)[0])
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Simplification - التبسيط
+# ═══════════════════════════════════════════════════════════════════════════════
+
+
+def _douglas_peucker(points: np.ndarray, first: np.ndarray, last: np.ndarray, tolerance: float):
+    """
+    Keep-mask of Douglas-Peucker over the polylines points[first[i]..last[i]].
+
+    Iterative and breadth-first: each pass measures every open segment of
+    every polyline at once and splits those whose farthest point is beyond
+    the tolerance, so the number of passes is the depth of the recursion.
+    """
+    xs = np.ascontiguousarray(points[:, 0])
+    ys = np.ascontiguousarray(points[:, 1])
+    keep = np.zeros(len(points), dtype=bool)
+    keep[first] = True
+    keep[last] = True
+    seg_a, seg_b = first, last
+
+    while seg_a.size:
+        lengths = seg_b - seg_a - 1
+        active = lengths > 0
+        seg_a, seg_b, lengths = seg_a[active], seg_b[active], lengths[active]
+        if not seg_a.size:
+            break
+
+        offsets = np.cumsum(lengths) - lengths
+        idx = np.arange(int(lengths.sum())) + np.repeat(seg_a + 1 - offsets, lengths)
+
+        ax, ay = xs[seg_a], ys[seg_a]
+        dx, dy = xs[seg_b] - ax, ys[seg_b] - ay
+        rx = xs[idx] - np.repeat(ax, lengths)
+        ry = ys[idx] - np.repeat(ay, lengths)
+        # |d x r| ranks points within a segment like the distance to its line
+        key = np.abs(np.repeat(dx, lengths) * ry - np.repeat(dy, lengths) * rx)
+        norm = np.hypot(dx, dy)
+        degenerate = norm == 0
+        if degenerate.any():
+            # Start and end coincide: distance to the point itself
+            mask = np.repeat(degenerate, lengths)
+            key[mask] = np.hypot(rx[mask], ry[mask])
+            norm[degenerate] = 1.0
+
+        top = np.maximum.reduceat(key, offsets)
+        # First position of each segment's maximum
+        candidates = np.flatnonzero(key == np.repeat(top, lengths))
+        owner = np.searchsorted(offsets, candidates, side="right") - 1
+        leading = np.ones(len(owner), dtype=bool)
+        leading[1:] = owner[1:] != owner[:-1]
+        split_at = idx[candidates[leading]]
+
+        split = top / norm > tolerance
+        mid = split_at[split]
+        keep[mid] = True
+        seg_a = np.concatenate([seg_a[split], mid])
+        seg_b = np.concatenate([mid, seg_b[split]])
+    return keep
+
+
+def simplify_many(
+    rings: Sequence[Ring] | np.ndarray,
+    tolerance: float,
+    closed: bool = True,
+    batch_vertices: int = 2_000_000,
+) -> list[np.ndarray]:
+    """
+    Douglas-Peucker simplification of many rings (or polylines with
+    ``closed=False``), tolerance in coordinate units (degrees for lon/lat).
+
+    A closed ring is simplified as the polyline that starts and ends at its
+    first vertex, and is returned open. Rings are processed in batches of
+    about ``batch_vertices`` vertices to bound memory.
+    """
+    points, starts, counts = _pack(rings)
+    results: list[np.ndarray] = []
+    n = len(counts)
+    i = 0
+    while i < n:
+        # Rings [i, j) of about batch_vertices vertices
+        j = int(np.searchsorted(np.cumsum(counts[i:]), batch_vertices, side="right")) + i
+        j = min(max(j, i + 1), n)
+        base = starts[i]
+        chunk = points[base : starts[j - 1] + counts[j - 1]]
+        b_starts, b_counts = starts[i:j] - base, counts[i:j]
+
+        if closed:
+            # Append each ring's first vertex after its last one
+            b_len = b_counts + (b_counts > 0)
+            b_offsets = np.concatenate(([0], np.cumsum(b_len)[:-1]))
+            lines = np.empty((int(b_len.sum()), 2))
+            ring_of = np.repeat(np.arange(j - i), b_counts)
+            within = np.arange(len(chunk)) - b_starts[ring_of]
+            lines[b_offsets[ring_of] + within] = chunk
+            nonempty = b_counts > 0
+            lines[(b_offsets + b_len - 1)[nonempty]] = chunk[b_starts[nonempty]]
+        else:
+            b_len, b_offsets, lines = b_counts, b_starts, chunk
+
+        nonempty = b_len > 0
+        keep = _douglas_peucker(
+            lines, b_offsets[nonempty], (b_offsets + b_len - 1)[nonempty], tolerance
+        )
+        for offset, length, count in zip(b_offsets, b_len, b_counts, strict=True):
+            line = lines[offset : offset + length]
+            kept = line[keep[offset : offset + length]]
+            if closed and count:
+                kept = kept[:-1] if len(kept) > 1 else kept
+            results.append(kept if count >= 3 or not closed else line[:count])
+        i = j
+    return results
+
+
+def simplify(ring: Ring, tolerance: float, closed: bool = True) -> np.ndarray:
+    """Douglas-Peucker simplification of one ring (see ``simplify_many``)"""
+    return simplify_many([ring], tolerance, closed)[0]
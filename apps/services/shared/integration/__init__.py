@@ -8,11 +8,27 @@ This module provides:
 - Circuit breaker pattern
 - Retry mechanisms
 - Caching for inter-service calls
+- Pooled per-upstream HTTP clients with deadlines, hedging and single-flight
 """
 
 from .circuit_breaker import CircuitBreaker, CircuitState
 from .client import ServiceClient, get_service_client
+from .deadline import (
+    TIMEOUT_HEADER,
+    DeadlineExceeded,
+    DeadlineMiddleware,
+    deadline_scope,
+    remaining_time,
+)
 from .discovery import ServiceDiscovery, ServiceHealth
+from .http_pool import (
+    LatencyHistogram,
+    Upstream,
+    UpstreamConfig,
+    close_upstreams,
+    get_upstream,
+    upstream_stats,
+)
 
 __all__ = [
     "ServiceClient",
@@ -21,4 +37,15 @@ __all__ = [
     "ServiceHealth",
     "CircuitBreaker",
     "CircuitState",
+    "Upstream",
+    "UpstreamConfig",
+    "LatencyHistogram",
+    "get_upstream",
+    "upstream_stats",
+    "close_upstreams",
+    "DeadlineMiddleware",
+    "DeadlineExceeded",
+    "deadline_scope",
+    "remaining_time",
+    "TIMEOUT_HEADER",
 ]
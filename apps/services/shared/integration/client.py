@@ -13,6 +13,7 @@ from typing import Any
 import httpx
 
 from ..versions import get_service_url
+from .http_pool import get_upstream
 
 logger = logging.getLogger(__name__)
 
@@ -71,6 +72,7 @@ class ServiceClient:
         self.auth_token = auth_token
 
         self.base_url = get_service_url(service.value, self.host)
+        self._upstream = get_upstream(service.value, self.base_url, timeout=timeout)
 
         # Request cache
         self._cache: dict[str, dict[str, Any]] = {}
@@ -117,30 +119,29 @@ class ServiceClient:
 
         start = datetime.utcnow()
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(
-                    f"{self.base_url}{path}",
-                    params=params,
-                    headers=self._get_headers(),
-                )
-                latency = (datetime.utcnow() - start).total_seconds() * 1000
-
-                result = ServiceResponse(
-                    success=response.is_success,
-                    status_code=response.status_code,
-                    data=response.json() if response.is_success else None,
-                    error=response.text if not response.is_success else None,
-                    latency_ms=latency,
-                )
-
-                # Cache successful responses
-                if use_cache and result.success:
-                    self._cache[cache_key] = {
-                        "response": result,
-                        "cached_at": datetime.utcnow(),
-                    }
-
-                return result
+            response = await self._upstream.get(
+                path,
+                params=params,
+                headers=self._get_headers(),
+            )
+            latency = (datetime.utcnow() - start).total_seconds() * 1000
+
+            result = ServiceResponse(
+                success=response.is_success,
+                status_code=response.status_code,
+                data=response.json() if response.is_success else None,
+                error=response.text if not response.is_success else None,
+                latency_ms=latency,
+            )
+
+            # Cache successful responses
+            if use_cache and result.success:
+                self._cache[cache_key] = {
+                    "response": result,
+                    "cached_at": datetime.utcnow(),
+                }
+
+            return result
 
         except httpx.TimeoutException:
             return ServiceResponse(
@@ -165,22 +166,21 @@ class ServiceClient:
         """Make POST request to service"""
         start = datetime.utcnow()
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}{path}",
-                    data=data,
-                    json=json,
-                    headers=self._get_headers(),
-                )
-                latency = (datetime.utcnow() - start).total_seconds() * 1000
-
-                return ServiceResponse(
-                    success=response.is_success,
-                    status_code=response.status_code,
-                    data=response.json() if response.is_success else None,
-                    error=response.text if not response.is_success else None,
-                    latency_ms=latency,
-                )
+            response = await self._upstream.post(
+                path,
+                data=data,
+                json=json,
+                headers=self._get_headers(),
+            )
+            latency = (datetime.utcnow() - start).total_seconds() * 1000
+
+            return ServiceResponse(
+                success=response.is_success,
+                status_code=response.status_code,
+                data=response.json() if response.is_success else None,
+                error=response.text if not response.is_success else None,
+                latency_ms=latency,
+            )
 
         except httpx.TimeoutException:
             return ServiceResponse(
@@ -205,22 +205,21 @@ class ServiceClient:
         """Make PUT request to service"""
         start = datetime.utcnow()
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.put(
-                    f"{self.base_url}{path}",
-                    data=data,
-                    json=json,
-                    headers=self._get_headers(),
-                )
-                latency = (datetime.utcnow() - start).total_seconds() * 1000
-
-                return ServiceResponse(
-                    success=response.is_success,
-                    status_code=response.status_code,
-                    data=response.json() if response.is_success else None,
-                    error=response.text if not response.is_success else None,
-                    latency_ms=latency,
-                )
+            response = await self._upstream.put(
+                path,
+                data=data,
+                json=json,
+                headers=self._get_headers(),
+            )
+            latency = (datetime.utcnow() - start).total_seconds() * 1000
+
+            return ServiceResponse(
+                success=response.is_success,
+                status_code=response.status_code,
+                data=response.json() if response.is_success else None,
+                error=response.text if not response.is_success else None,
+                latency_ms=latency,
+            )
 
         except Exception as e:
             logger.error(f"Error calling {self.service.value}: {e}")
@@ -234,20 +233,19 @@ class ServiceClient:
         """Make DELETE request to service"""
         start = datetime.utcnow()
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.delete(
-                    f"{self.base_url}{path}",
-                    headers=self._get_headers(),
-                )
-                latency = (datetime.utcnow() - start).total_seconds() * 1000
-
-                return ServiceResponse(
-                    success=response.is_success,
-                    status_code=response.status_code,
-                    data=response.json() if response.is_success else None,
-                    error=response.text if not response.is_success else None,
-                    latency_ms=latency,
-                )
+            response = await self._upstream.delete(
+                path,
+                headers=self._get_headers(),
+            )
+            latency = (datetime.utcnow() - start).total_seconds() * 1000
+
+            return ServiceResponse(
+                success=response.is_success,
+                status_code=response.status_code,
+                data=response.json() if response.is_success else None,
+                error=response.text if not response.is_success else None,
+                latency_ms=latency,
+            )
 
         except Exception as e:
             logger.error(f"Error calling {self.service.value}: {e}")
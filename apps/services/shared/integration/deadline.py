@@ -0,0 +1,127 @@
+"""
+Request Deadline Propagation
+نشر المهلة الزمنية للطلبات
+
+An incoming request may carry the time its caller is still willing to wait
+in ``X-Request-Timeout-Ms``. ``DeadlineMiddleware`` turns that budget into an
+absolute deadline for the request's task, and every call made through the
+upstream pool is clamped to what is left and forwards the remainder, so a
+chain of services gives up together instead of working for a caller that
+has already timed out.
+
+The header carries a relative budget rather than a wall-clock time so that
+clock skew between hosts does not matter.
+
+Usage:
+    app.add_middleware(DeadlineMiddleware, default_timeout=30.0)
+
+    with deadline_scope(2.0):
+        await upstream.get("/v1/forecast")  # at most 2 s, less if the caller has less
+"""
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import httpx
+
+TIMEOUT_HEADER = "X-Request-Timeout-Ms"
+
+# Absolute deadline on the time.monotonic() clock, None when unbounded
+_deadline: ContextVar[float | None] = ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceeded(httpx.TimeoutException):
+    """
+    The request's deadline passed before an upstream call could be made
+    انتهت مهلة الطلب قبل استدعاء الخدمة
+
+    A ``TimeoutException`` so callers that already handle httpx timeouts
+    handle it the same way.
+    """
+
+    def __init__(self, message: str = "Request deadline exceeded"):
+        super().__init__(message)
+
+
+def get_deadline() -> float | None:
+    """Deadline of the current request on the ``time.monotonic()`` clock"""
+    return _deadline.get()
+
+
+def remaining_time() -> float | None:
+    """Seconds left before the current request's deadline, None when unbounded"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def parse_timeout_header(value: str | None) -> float | None:
+    """Budget in seconds from an ``X-Request-Timeout-Ms`` value, None if invalid"""
+    if not value:
+        return None
+    try:
+        budget_ms = float(value)
+    except ValueError:
+        return None
+    if budget_ms != budget_ms or budget_ms < 0:  # NaN or negative
+        return None
+    return budget_ms / 1000.0
+
+
+@contextmanager
+def deadline_scope(timeout: float | None) -> Iterator[float | None]:
+    """
+    Bound the enclosed calls to ``timeout`` seconds from now. An enclosing
+    deadline that is sooner wins.
+    """
+    deadline = _deadline.get()
+    if timeout is not None:
+        candidate = time.monotonic() + timeout
+        deadline = candidate if deadline is None else min(deadline, candidate)
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
+
+
+class DeadlineMiddleware:
+    """
+    ASGI middleware that sets the request deadline from ``X-Request-Timeout-Ms``
+    ميدلوير يضبط مهلة الطلب من الترويسة
+
+    Requests without the header get ``default_timeout`` (unbounded if None).
+    ``max_timeout`` caps what a caller may ask for.
+    """
+
+    def __init__(
+        self,
+        app,
+        default_timeout: float | None = None,
+        max_timeout: float | None = None,
+    ):
+        self.app = app
+        self.default_timeout = default_timeout
+        self.max_timeout = max_timeout
+        self._header = TIMEOUT_HEADER.lower().encode("latin-1")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        budget = None
+        for name, value in scope.get("headers", ()):
+            if name == self._header:
+                budget = parse_timeout_header(value.decode("latin-1"))
+                break
+        if budget is None:
+            budget = self.default_timeout
+        if budget is not None and self.max_timeout is not None:
+            budget = min(budget, self.max_timeout)
+
+        with deadline_scope(budget):
+            await self.app(scope, receive, send)
@@ -0,0 +1,434 @@
+"""
+Pooled HTTP Clients for Upstream Services
+عملاء HTTP مجمّعون للاتصال بالخدمات الأخرى
+
+Each upstream gets one ``httpx.AsyncClient`` for the whole process instead
+of a client per call or per object, so connections are reused across
+requests and bounded by the pool limits.
+
+Features:
+- Keep-alive pool with connection limits per upstream. HTTP/2 is used when
+  ``h2`` is installed; httpx only negotiates it over TLS, so plain
+  ``http://`` hops between services stay on pooled HTTP/1.1 connections
+- Timeouts clamped to the incoming request's deadline, with the remaining
+  budget forwarded in ``X-Request-Timeout-Ms`` (see ``deadline.py``)
+- Hedged reads: an idempotent request still running after the upstream's
+  p95 latency is sent once more and the first response wins. Hedges are
+  capped at ``hedge_budget`` of the upstream's requests
+- Single-flight: concurrent identical GETs share one upstream call. A
+  caller only joins a call whose deadline is no sooner than its own
+- Per-upstream latency histogram, and Prometheus metrics when
+  ``prometheus_client`` is installed
+
+Usage:
+    weather = get_upstream("weather-service", "http://weather-service:8092")
+    response = await weather.get("/v1/forecast", params={"days": 7})
+"""
+
+import asyncio
+import logging
+import math
+import time
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any
+
+import httpx
+
+from .deadline import TIMEOUT_HEADER, DeadlineExceeded, get_deadline, remaining_time
+
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+try:
+    from prometheus_client import Counter, Histogram
+
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+# Methods sent through the client's shorthand (client.get, client.post, ...)
+# so wrappers and test patches around those methods still see the call
+_SHORTHAND_METHODS = frozenset({"GET", "POST", "PUT", "PATCH", "DELETE"})
+
+# Request arguments that single-flight can key on; anything else sends alone
+_FLIGHT_KWARGS = frozenset({"params", "headers"})
+
+if PROMETHEUS_AVAILABLE:
+    UPSTREAM_LATENCY = Histogram(
+        "sahool_upstream_request_duration_seconds",
+        "Latency of calls to upstream services",
+        ["upstream", "method", "outcome"],
+        buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+    )
+    UPSTREAM_EVENTS = Counter(
+        "sahool_upstream_events_total",
+        "Hedged, coalesced and deadline-exceeded upstream calls",
+        ["upstream", "event"],
+    )
+
+
+class LatencyHistogram:
+    """
+    Log-bucketed latency histogram
+    مدرج تكراري لزمن الاستجابة
+
+    Buckets are 5% wide from 0.1 ms up, so quantiles are within 5%. Counts
+    are halved every ``decay_every`` samples so quantiles follow recent
+    traffic.
+    """
+
+    MIN_SECONDS = 1e-4
+    GROWTH = 1.05
+    BUCKETS = 400  # 0.1 ms * 1.05**400 ≈ 8.6 hours
+
+    def __init__(self, decay_every: int = 10_000):
+        self.decay_every = decay_every
+        self.counts = [0] * (self.BUCKETS + 1)
+        self.count = 0
+        self.total = 0
+        self.max = 0.0
+        self._log_growth = math.log(self.GROWTH)
+
+    def record(self, seconds: float) -> None:
+        if seconds <= self.MIN_SECONDS:
+            index = 0
+        else:
+            index = int(math.log(seconds / self.MIN_SECONDS) / self._log_growth) + 1
+            index = min(index, self.BUCKETS)
+        self.counts[index] += 1
+        self.count += 1
+        self.total += 1
+        self.max = max(self.max, seconds)
+        if self.count >= self.decay_every:
+            self.counts = [c // 2 for c in self.counts]
+            self.count = sum(self.counts)
+
+    def quantile(self, q: float) -> float | None:
+        """Upper bound of the bucket holding the ``q`` quantile, None when empty"""
+        if self.count == 0:
+            return None
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for index, bucket in enumerate(self.counts):
+            seen += bucket
+            if seen >= rank:
+                return min(self.MIN_SECONDS * self.GROWTH**index, self.max)
+        return self.max
+
+
+@dataclass
+class UpstreamConfig:
+    """Connection, timeout and hedging settings of one upstream"""
+
+    base_url: str = ""
+    timeout: float = 30.0
+    connect_timeout: float = 5.0
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    http2: bool = True
+    headers: dict[str, str] = field(default_factory=dict)
+    # Hedging of idempotent reads; a fixed delay, or the upstream's p95 once
+    # it has min_samples latencies
+    hedge: bool = True
+    hedge_delay: float | None = None
+    hedge_min_delay: float = 0.005
+    hedge_budget: float = 0.05
+    min_samples: int = 50
+    single_flight: bool = True
+    # Replaces the pooled network transport (tests, unix sockets)
+    transport: httpx.AsyncBaseTransport | None = None
+
+
+class Upstream:
+    """
+    Pooled client for one upstream service
+    عميل مجمّع لخدمة واحدة
+
+    ``get``/``post``/... take the same arguments as ``httpx.AsyncClient`` and
+    return an ``httpx.Response``. ``timeout`` is a number of seconds.
+    """
+
+    def __init__(self, name: str, config: UpstreamConfig | None = None):
+        self.name = name
+        self.config = config or UpstreamConfig()
+        self.latency = LatencyHistogram()
+        self.stats = {
+            "requests": 0,
+            "errors": 0,
+            "hedged": 0,
+            "hedge_wins": 0,
+            "coalesced": 0,
+            "deadline_exceeded": 0,
+        }
+        self._client: httpx.AsyncClient | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        # key -> (shared call, its deadline; inf when unbounded)
+        self._inflight: dict[tuple, tuple[asyncio.Future, float]] = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """
+        The pooled client. Connections belong to an event loop, so a new loop
+        (a test, a worker thread) gets its own client.
+        """
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._loop is not loop:
+            self._client = self._build_client()
+            self._loop = loop
+            self._inflight = {}
+        return self._client
+
+    def _build_client(self) -> httpx.AsyncClient:
+        config = self.config
+        return httpx.AsyncClient(
+            base_url=config.base_url,
+            headers=config.headers,
+            timeout=httpx.Timeout(config.timeout, connect=config.connect_timeout),
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive_connections,
+                keepalive_expiry=config.keepalive_expiry,
+            ),
+            http2=config.http2 and HTTP2_AVAILABLE,
+            transport=config.transport,
+        )
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def put(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("PUT", url, **kwargs)
+
+    async def patch(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("PATCH", url, **kwargs)
+
+    async def delete(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("DELETE", url, **kwargs)
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        timeout: float | None = None,
+        hedge: bool | None = None,
+        single_flight: bool | None = None,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """
+        Send a request through the pool
+
+        ``hedge`` and ``single_flight`` default to on for idempotent methods
+        when enabled for the upstream. Pass ``hedge=True`` for a POST that
+        only reads.
+        """
+        method = method.upper()
+        idempotent = method in IDEMPOTENT_METHODS
+        if hedge is None:
+            hedge = self.config.hedge and idempotent
+        if single_flight is None:
+            single_flight = self.config.single_flight and idempotent
+        if not single_flight or not _FLIGHT_KWARGS.issuperset(kwargs):
+            return await self._call(method, url, timeout, hedge, kwargs)
+
+        remaining = remaining_time()
+        if remaining is not None and remaining <= 0:
+            self.stats["deadline_exceeded"] += 1
+            self._count_event("deadline_exceeded")
+            raise DeadlineExceeded(f"{self.name}: request deadline exceeded")
+
+        client = self.client
+        key = (method, url, repr(kwargs.get("params")), repr(kwargs.get("headers")))
+        deadline = get_deadline()
+        deadline = math.inf if deadline is None else deadline
+        flight, flight_deadline = self._inflight.get(key, (None, -math.inf))
+        # The shared call is clamped to the deadline of the caller that
+        # started it, so only join when that leaves at least our own budget
+        if flight is None or flight_deadline < deadline:
+            flight = asyncio.ensure_future(self._call(method, url, timeout, hedge, kwargs))
+            self._inflight[key] = (flight, deadline)
+            flight.add_done_callback(partial(self._land, client, key))
+        else:
+            self.stats["coalesced"] += 1
+            self._count_event("coalesced")
+
+        # Shielded so a caller that gives up does not cancel the others' call
+        try:
+            if remaining is None:
+                return await asyncio.shield(flight)
+            return await asyncio.wait_for(asyncio.shield(flight), max(remaining, 0))
+        except TimeoutError:
+            self.stats["deadline_exceeded"] += 1
+            self._count_event("deadline_exceeded")
+            raise DeadlineExceeded(f"{self.name}: request deadline exceeded") from None
+
+    def _land(self, client: httpx.AsyncClient, key: tuple, flight: asyncio.Future) -> None:
+        if client is self._client and self._inflight.get(key, (None,))[0] is flight:
+            del self._inflight[key]
+        if not flight.cancelled():
+            flight.exception()  # retrieved here when every caller gave up
+
+    async def _call(
+        self,
+        method: str,
+        url: str,
+        timeout: float | None,
+        hedge: bool,
+        kwargs: dict[str, Any],
+    ) -> httpx.Response:
+        self.stats["requests"] += 1
+        budget = self.config.timeout if timeout is None else timeout
+        remaining = remaining_time()
+        if remaining is not None:
+            if remaining <= 0:
+                self.stats["deadline_exceeded"] += 1
+                self._count_event("deadline_exceeded")
+                raise DeadlineExceeded(f"{self.name}: request deadline exceeded")
+            budget = min(budget, remaining)
+
+        headers = dict(kwargs.get("headers") or {})
+        headers[TIMEOUT_HEADER] = str(max(1, int(budget * 1000)))
+        kwargs = {
+            **kwargs,
+            "headers": headers,
+            "timeout": httpx.Timeout(budget, connect=min(budget, self.config.connect_timeout)),
+        }
+
+        delay = self.hedge_delay() if hedge else None
+        if delay is None or delay >= budget:
+            return await self._attempt(method, url, budget, kwargs)
+
+        first = asyncio.ensure_future(self._attempt(method, url, budget, kwargs))
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        if done or not self._hedge_allowed():
+            return await first
+
+        self.stats["hedged"] += 1
+        self._count_event("hedged")
+        second = asyncio.ensure_future(self._attempt(method, url, budget - delay, kwargs))
+        pending = {first, second}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for attempt in done:
+                    if attempt.exception() is None:
+                        if attempt is second:
+                            self.stats["hedge_wins"] += 1
+                        return attempt.result()
+            return first.result()
+        finally:
+            for attempt in pending:
+                attempt.cancel()
+
+    async def _attempt(
+        self,
+        method: str,
+        url: str,
+        budget: float,
+        kwargs: dict[str, Any],
+    ) -> httpx.Response:
+        client = self.client
+        started = time.perf_counter()
+        try:
+            # The httpx timeouts bound each phase; this bounds the whole call
+            async with asyncio.timeout(budget):
+                if method in _SHORTHAND_METHODS:
+                    response = await getattr(client, method.lower())(url, **kwargs)
+                else:
+                    response = await client.request(method, url, **kwargs)
+        except TimeoutError:
+            self._observe(method, "timeout", time.perf_counter() - started)
+            raise DeadlineExceeded(f"{self.name}: no response within {budget:.3f}s") from None
+        except Exception:
+            self._observe(method, "error", time.perf_counter() - started)
+            raise
+        self._observe(method, f"{response.status_code // 100}xx", time.perf_counter() - started)
+        return response
+
+    def hedge_delay(self) -> float | None:
+        """How long a read waits before it is hedged, None while unknown"""
+        if self.config.hedge_delay is not None:
+            return self.config.hedge_delay
+        if self.latency.count < self.config.min_samples:
+            return None
+        return max(self.latency.quantile(0.95), self.config.hedge_min_delay)
+
+    def _hedge_allowed(self) -> bool:
+        return self.stats["hedged"] < self.config.hedge_budget * self.stats["requests"]
+
+    def _observe(self, method: str, outcome: str, seconds: float) -> None:
+        self.latency.record(seconds)
+        if outcome in ("error", "timeout"):
+            self.stats["errors"] += 1
+        if PROMETHEUS_AVAILABLE:
+            UPSTREAM_LATENCY.labels(self.name, method, outcome).observe(seconds)
+
+    def _count_event(self, event: str) -> None:
+        if PROMETHEUS_AVAILABLE:
+            UPSTREAM_EVENTS.labels(self.name, event).inc()
+
+    def snapshot(self) -> dict[str, Any]:
+        """Counters and recent p50/p95/p99 latency in milliseconds"""
+        quantiles = {
+            f"p{round(q * 100)}_ms": (
+                None if (value := self.latency.quantile(q)) is None else round(value * 1000, 3)
+            )
+            for q in (0.5, 0.95, 0.99)
+        }
+        return {"upstream": self.name, "base_url": self.config.base_url, **self.stats, **quantiles}
+
+    async def aclose(self) -> None:
+        """Close the pooled connections of the current event loop"""
+        client, self._client = self._client, None
+        if client is not None and not client.is_closed:
+            try:
+                running = asyncio.get_running_loop()
+            except RuntimeError:
+                running = None
+            if running is self._loop:
+                await client.aclose()
+        self._inflight = {}
+
+
+# Process-wide upstream registry
+_upstreams: dict[str, Upstream] = {}
+
+
+def get_upstream(name: str, base_url: str = "", **settings: Any) -> Upstream:
+    """
+    Get or create the process-wide upstream for ``name`` and ``base_url``
+    الحصول على عميل الخدمة المشترك أو إنشاؤه
+
+    ``settings`` are ``UpstreamConfig`` fields; the first call's settings win.
+    """
+    key = f"{name}:{base_url}"
+    upstream = _upstreams.get(key)
+    if upstream is None:
+        upstream = Upstream(name, UpstreamConfig(base_url=base_url, **settings))
+        _upstreams[key] = upstream
+        logger.debug(f"Registered upstream {name} ({base_url or 'absolute URLs'})")
+    return upstream
+
+
+def upstream_stats() -> list[dict[str, Any]]:
+    """Snapshot of every registered upstream"""
+    return [upstream.snapshot() for upstream in _upstreams.values()]
+
+
+async def close_upstreams() -> None:
+    """Close every pooled client; call on service shutdown"""
+    for upstream in _upstreams.values():
+        await upstream.aclose()
@@ -0,0 +1,288 @@
+"""
+SAHOOL Upstream Pool Tests
+اختبارات مجمع اتصالات الخدمات
+
+Deadline propagation, single-flight, hedged reads and latency histograms
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+import pytest
+
+# إضافة المسار للحزمة المشتركة - Add apps/services to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+
+from shared.integration.deadline import (  # noqa: E402
+    TIMEOUT_HEADER,
+    DeadlineExceeded,
+    DeadlineMiddleware,
+    deadline_scope,
+    remaining_time,
+)
+from shared.integration.http_pool import (  # noqa: E402
+    LatencyHistogram,
+    Upstream,
+    UpstreamConfig,
+    close_upstreams,
+    get_upstream,
+    upstream_stats,
+)
+
+
+class StubUpstream:
+    """Mock transport that records requests and answers after ``delays``"""
+
+    def __init__(self, *delays: float):
+        self.delays = list(delays)
+        self.requests: list[httpx.Request] = []
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        delay = self.delays.pop(0) if self.delays else 0.0
+        await asyncio.sleep(delay)
+        return httpx.Response(200, json={"call": len(self.requests)})
+
+
+def make_upstream(stub: StubUpstream, **settings) -> Upstream:
+    config = UpstreamConfig(base_url="http://stub", transport=httpx.MockTransport(stub), **settings)
+    return Upstream("stub", config)
+
+
+class TestDeadlines:
+    """Timeouts follow the request deadline and are forwarded"""
+
+    async def test_forwards_configured_timeout(self):
+        stub = StubUpstream()
+        upstream = make_upstream(stub, timeout=2.5)
+
+        await upstream.get("/v1/forecast")
+
+        assert stub.requests[0].headers[TIMEOUT_HEADER] == "2500"
+
+    async def test_deadline_clamps_timeout(self):
+        stub = StubUpstream()
+        upstream = make_upstream(stub, timeout=30.0)
+
+        with deadline_scope(0.5):
+            await upstream.get("/v1/forecast")
+
+        assert 400 < int(stub.requests[0].headers[TIMEOUT_HEADER]) <= 500
+
+    async def test_inner_scope_cannot_extend_deadline(self):
+        with deadline_scope(0.2), deadline_scope(10):
+            assert remaining_time() <= 0.2
+
+    async def test_expired_deadline_skips_the_call(self):
+        stub = StubUpstream()
+        upstream = make_upstream(stub)
+
+        with deadline_scope(0), pytest.raises(DeadlineExceeded):
+            await upstream.post("/api/tasks", json={})
+
+        assert stub.requests == []
+        assert upstream.stats["deadline_exceeded"] == 1
+
+    async def test_slow_upstream_hits_deadline(self):
+        upstream = make_upstream(StubUpstream(1.0), single_flight=False)
+
+        started = time.perf_counter()
+        with deadline_scope(0.05), pytest.raises(httpx.TimeoutException):
+            await upstream.get("/slow")
+
+        assert time.perf_counter() - started < 0.5
+        assert upstream.stats["errors"] == 1
+
+    @pytest.mark.parametrize(
+        "headers,default,expected",
+        [
+            ([(b"x-request-timeout-ms", b"1500")], None, 1.5),
+            ([], None, None),
+            ([], 3.0, 3.0),
+            ([(b"x-request-timeout-ms", b"bogus")], 3.0, 3.0),
+            ([(b"x-request-timeout-ms", b"90000")], 3.0, 60.0),
+        ],
+    )
+    async def test_middleware_sets_deadline(self, headers, default, expected):
+        seen = []
+
+        async def app(scope, receive, send):
+            seen.append(remaining_time())
+
+        middleware = DeadlineMiddleware(app, default_timeout=default, max_timeout=60.0)
+        await middleware({"type": "http", "headers": headers}, None, None)
+
+        if expected is None:
+            assert seen == [None]
+        else:
+            assert expected - 0.1 < seen[0] <= expected
+        assert remaining_time() is None
+
+
+class TestSingleFlight:
+    """Concurrent identical reads share one upstream call"""
+
+    async def test_identical_gets_share_one_call(self):
+        stub = StubUpstream(0.05)
+        upstream = make_upstream(stub)
+
+        responses = await asyncio.gather(
+            *(upstream.get("/v1/ndvi", params={"field": "f1"}) for _ in range(10))
+        )
+
+        assert len(stub.requests) == 1
+        assert {r.json()["call"] for r in responses} == {1}
+        assert upstream.stats["coalesced"] == 9
+
+    async def test_different_params_and_posts_are_separate(self):
+        stub = StubUpstream(0.05, 0.05, 0.05, 0.05)
+        upstream = make_upstream(stub)
+
+        await asyncio.gather(
+            upstream.get("/v1/ndvi", params={"field": "f1"}),
+            upstream.get("/v1/ndvi", params={"field": "f2"}),
+            upstream.post("/v1/ndvi", json={"field": "f1"}),
+            upstream.post("/v1/ndvi", json={"field": "f1"}),
+        )
+
+        assert len(stub.requests) == 4
+
+    async def test_caller_timeout_does_not_cancel_the_others(self):
+        stub = StubUpstream(0.1)
+        upstream = make_upstream(stub)
+
+        async def impatient():
+            with deadline_scope(0.02):
+                await asyncio.sleep(0.001)
+                return await upstream.get("/v1/ndvi")
+
+        leader = asyncio.ensure_future(upstream.get("/v1/ndvi"))
+        await asyncio.sleep(0)
+        with pytest.raises(DeadlineExceeded):
+            await impatient()
+
+        assert (await leader).status_code == 200
+        assert len(stub.requests) == 1
+
+    async def test_later_deadline_does_not_join_a_sooner_call(self):
+        stub = StubUpstream(0.1, 0.1)
+        upstream = make_upstream(stub)
+
+        async def get_within(seconds: float):
+            with deadline_scope(seconds):
+                return await upstream.get("/v1/ndvi")
+
+        leader = asyncio.ensure_future(get_within(0.05))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(get_within(1.0))
+        sooner = asyncio.ensure_future(get_within(0.5))
+
+        with pytest.raises(httpx.TimeoutException):
+            await leader
+        assert (await follower).status_code == 200
+        assert (await sooner).json() == (await follower).json()
+        assert len(stub.requests) == 2
+        assert upstream.stats["coalesced"] == 1
+
+    async def test_expired_deadline_does_not_start_a_flight(self):
+        stub = StubUpstream()
+        upstream = make_upstream(stub)
+
+        with deadline_scope(0), pytest.raises(DeadlineExceeded):
+            await upstream.get("/v1/ndvi")
+
+        assert stub.requests == []
+        assert upstream.stats["deadline_exceeded"] == 1
+
+
+class TestHedging:
+    """Slow idempotent reads are sent a second time"""
+
+    async def test_hedge_wins_over_slow_attempt(self):
+        stub = StubUpstream(1.0, 0.0)
+        upstream = make_upstream(stub, hedge_delay=0.02)
+
+        started = time.perf_counter()
+        response = await upstream.get("/v1/scenes")
+
+        assert time.perf_counter() - started < 0.5
+        assert response.json() == {"call": 2}
+        assert upstream.stats["hedged"] == upstream.stats["hedge_wins"] == 1
+
+    async def test_fast_reads_and_writes_are_not_hedged(self):
+        stub = StubUpstream(0.0, 0.1)
+        upstream = make_upstream(stub, hedge_delay=0.02)
+
+        await upstream.get("/v1/scenes")
+        await upstream.post("/api/tasks", json={})
+
+        assert len(stub.requests) == 2
+        assert upstream.stats["hedged"] == 0
+
+    async def test_hedge_budget(self):
+        stub = StubUpstream(*[0.05] * 40)
+        upstream = make_upstream(stub, hedge_delay=0.01, hedge_budget=0.1, single_flight=False)
+
+        await asyncio.gather(*(upstream.get(f"/v1/scenes/{i}") for i in range(20)))
+
+        assert 1 <= upstream.stats["hedged"] <= 2
+
+    async def test_adaptive_delay_waits_for_samples(self):
+        upstream = make_upstream(StubUpstream(), min_samples=10)
+        assert upstream.hedge_delay() is None
+
+        for _ in range(10):
+            upstream.latency.record(0.2)
+
+        assert upstream.hedge_delay() == pytest.approx(0.2, rel=0.05)
+
+
+class TestLatencyHistogram:
+    """Quantiles from log buckets"""
+
+    def test_quantiles_within_bucket_width(self):
+        histogram = LatencyHistogram()
+        for ms in range(1, 1001):
+            histogram.record(ms / 1000)
+
+        assert histogram.quantile(0.5) == pytest.approx(0.5, rel=0.05)
+        assert histogram.quantile(0.99) == pytest.approx(0.99, rel=0.05)
+        assert histogram.quantile(1.0) == 1.0
+
+    def test_decay_follows_recent_traffic(self):
+        histogram = LatencyHistogram(decay_every=100)
+        for _ in range(1000):
+            histogram.record(1.0)
+        for _ in range(1000):
+            histogram.record(0.01)
+
+        assert histogram.quantile(0.95) == pytest.approx(0.01, rel=0.05)
+        assert histogram.total == 2000
+
+
+class TestRegistry:
+    """One pooled client per upstream for the process"""
+
+    async def test_get_upstream_is_shared(self):
+        first = get_upstream("ndvi-engine-test", "http://ndvi-engine:8107", timeout=5.0)
+        second = get_upstream("ndvi-engine-test", "http://ndvi-engine:8107")
+
+        assert first is second
+        assert first.config.timeout == 5.0
+        assert first.client is second.client
+        assert any(s["upstream"] == "ndvi-engine-test" for s in upstream_stats())
+
+        await close_upstreams()
+        assert first._client is None
+
+    async def test_snapshot_reports_quantiles(self):
+        upstream = make_upstream(StubUpstream())
+        await upstream.get("/healthz")
+
+        snapshot = upstream.snapshot()
+
+        assert snapshot["requests"] == 1
+        assert snapshot["p99_ms"] is not None
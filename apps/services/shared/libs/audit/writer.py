@@ -0,0 +1,425 @@
+"""
+SAHOOL Audit Writer
+Group-commit audit writer with cached per-tenant chain heads
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Protocol
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from .models import AuditLog
+from .service import ChainHead, build_audit_entry, get_chain_head, next_created_at
+
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------------------------
+# Chain heads
+# ---------------------------------------------------------------------------
+
+
+class ChainHeadStore(Protocol):
+    """
+    Where the writer keeps the last hash of every tenant chain.
+
+    A batch is committed as: ``hold`` the batch tenants, ``get`` each head,
+    ``mark_pending`` the heads being replaced, commit, then ``advance`` to
+    the new heads (or ``discard`` them if the commit failed).
+    """
+
+    def hold(self, tenant_ids: Iterable[UUID]) -> Any: ...
+
+    def get(self, db: Session, tenant_id: UUID) -> ChainHead: ...
+
+    def mark_pending(self, tenant_ids: Iterable[UUID]) -> None: ...
+
+    def advance(self, heads: dict[UUID, ChainHead]) -> None: ...
+
+    def discard(self, tenant_ids: Iterable[UUID]) -> None: ...
+
+
+class InMemoryChainHeads:
+    """
+    Chain heads cached in this process.
+
+    Correct when one AuditWriter is the only writer for its tenants (a
+    single audit worker process). Heads are loaded from the database on
+    first use and after a failed commit.
+    """
+
+    def __init__(self):
+        self._heads: dict[UUID, ChainHead] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def hold(self, tenant_ids: Iterable[UUID]) -> Iterator[None]:
+        with self._lock:
+            yield
+
+    def get(self, db: Session, tenant_id: UUID) -> ChainHead:
+        head = self._heads.get(tenant_id)
+        if head is None:
+            head = self._heads[tenant_id] = get_chain_head(db, tenant_id)
+        return head
+
+    def mark_pending(self, tenant_ids: Iterable[UUID]) -> None:
+        pass
+
+    def advance(self, heads: dict[UUID, ChainHead]) -> None:
+        self._heads.update(heads)
+
+    def discard(self, tenant_ids: Iterable[UUID]) -> None:
+        for tenant_id in tenant_ids:
+            self._heads.pop(tenant_id, None)
+
+
+class RedisChainHeads:
+    """
+    Chain heads shared by several writer processes through Redis.
+
+    Each tenant chain is guarded by a Redis lock held for the whole group
+    commit. The head is stored in a hash with a ``state`` field set to
+    ``pending`` before the commit and ``committed`` after it; a head left
+    pending by a crashed writer is re-read from the database.
+
+    Args:
+        client: Synchronous ``redis.Redis`` client
+        key_prefix: Prefix for lock and head keys
+        lock_timeout: Seconds before an abandoned lock expires
+        blocking_timeout: Seconds to wait for a tenant lock
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        *,
+        key_prefix: str = "sahool:audit:",
+        lock_timeout: float = 30.0,
+        blocking_timeout: float = 10.0,
+    ):
+        self._client = client
+        self._prefix = key_prefix
+        self._lock_timeout = lock_timeout
+        self._blocking_timeout = blocking_timeout
+
+    def _head_key(self, tenant_id: UUID) -> str:
+        return f"{self._prefix}head:{tenant_id}"
+
+    @contextmanager
+    def hold(self, tenant_ids: Iterable[UUID]) -> Iterator[None]:
+        with ExitStack() as stack:
+            # Sorted order so two writers never wait on each other's locks
+            for tenant_id in sorted(set(tenant_ids), key=str):
+                lock = self._client.lock(
+                    f"{self._prefix}lock:{tenant_id}",
+                    timeout=self._lock_timeout,
+                    blocking_timeout=self._blocking_timeout,
+                )
+                if not lock.acquire():
+                    raise TimeoutError(f"Could not lock audit chain for tenant {tenant_id}")
+                stack.callback(lock.release)
+            yield
+
+    def get(self, db: Session, tenant_id: UUID) -> ChainHead:
+        raw = self._client.hgetall(self._head_key(tenant_id))
+        data = {_text(k): _text(v) for k, v in raw.items()}
+        if data.get("state") != "committed":
+            return get_chain_head(db, tenant_id)
+        return ChainHead(
+            data.get("entry_hash") or None,
+            datetime.fromisoformat(data["created_at"]) if data.get("created_at") else None,
+        )
+
+    def mark_pending(self, tenant_ids: Iterable[UUID]) -> None:
+        pipe = self._client.pipeline()
+        for tenant_id in tenant_ids:
+            pipe.hset(self._head_key(tenant_id), "state", "pending")
+        pipe.execute()
+
+    def advance(self, heads: dict[UUID, ChainHead]) -> None:
+        pipe = self._client.pipeline()
+        for tenant_id, head in heads.items():
+            pipe.hset(
+                self._head_key(tenant_id),
+                mapping={
+                    "entry_hash": head.entry_hash or "",
+                    "created_at": head.created_at.isoformat() if head.created_at else "",
+                    "state": "committed",
+                },
+            )
+        pipe.execute()
+
+    def discard(self, tenant_ids: Iterable[UUID]) -> None:
+        keys = [self._head_key(tenant_id) for tenant_id in tenant_ids]
+        if keys:
+            self._client.delete(*keys)
+
+
+def _text(value: Any) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+# ---------------------------------------------------------------------------
+# Writer
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class AuditWriterStats:
+    """Group-commit counters"""
+
+    batches: int = 0
+    entries: int = 0
+    failed: int = 0
+    max_batch_size: int = 0
+
+    def record(self, size: int) -> None:
+        self.batches += 1
+        self.entries += size
+        self.max_batch_size = max(self.max_batch_size, size)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "entries": self.entries,
+            "failed": self.failed,
+            "max_batch_size": self.max_batch_size,
+            "avg_batch_size": round(self.entries / self.batches, 2) if self.batches else 0.0,
+        }
+
+
+class AuditWriter:
+    """
+    Asynchronous group-commit audit writer.
+
+    Requests put entries on a bounded queue; a single worker drains it and
+    commits up to ``max_batch_size`` chained entries in one transaction on
+    a dedicated thread. Chain heads come from ``chain_heads`` instead of a
+    per-entry ``get_last_hash`` query, and because every batch is built
+    while the batch tenants are held, a tenant chain never forks.
+
+    Durability: ``write`` returns only after the entry's transaction has
+    committed. ``submit`` returns as soon as the entry is queued; entries
+    still queued are committed by ``flush``/``close`` but are lost if the
+    process dies first.
+
+    Usage:
+        ```python
+        from shared.libs.audit import AuditWriter
+
+        writer = AuditWriter(SessionLocal)
+
+        await writer.write(
+            tenant_id=tenant_id,
+            actor_id=user_id,
+            actor_type="user",
+            action="field.create",
+            resource_type="field",
+            resource_id=str(field.id),
+            correlation_id=correlation_id,
+        )
+
+        await writer.close()  # on shutdown
+        ```
+
+    Args:
+        session_factory: Callable returning a new SQLAlchemy Session
+        chain_heads: Chain head store (default: InMemoryChainHeads)
+        max_batch_size: Maximum entries per transaction
+        max_wait_ms: How long the first queued entry waits for company
+        max_queue_size: Queued entries before ``submit`` applies backpressure
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        *,
+        chain_heads: ChainHeadStore | None = None,
+        max_batch_size: int = 500,
+        max_wait_ms: float = 2.0,
+        max_queue_size: int = 10000,
+    ):
+        self.session_factory = session_factory
+        self.chain_heads = chain_heads if chain_heads is not None else InMemoryChainHeads()
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.max_queue_size = max_queue_size
+        self.stats = AuditWriterStats()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="audit-writer")
+        self._queue: asyncio.Queue | None = None
+        self._worker: asyncio.Task | None = None
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def _ensure_worker(self) -> asyncio.Queue:
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+        return self._queue
+
+    async def submit(
+        self,
+        *,
+        tenant_id: UUID,
+        actor_id: UUID | None,
+        actor_type: str,
+        action: str,
+        resource_type: str,
+        resource_id: str,
+        correlation_id: UUID,
+        ip: str | None = None,
+        user_agent: str | None = None,
+        details: dict[str, Any] | None = None,
+    ) -> asyncio.Future:
+        """
+        Queue an audit entry without waiting for its commit.
+
+        Arguments are those of ``write_audit_log`` without ``db``.
+
+        Returns:
+            Future resolving to the committed AuditLog
+        """
+        future = asyncio.get_running_loop().create_future()
+        entry = {
+            "tenant_id": tenant_id,
+            "actor_id": actor_id,
+            "actor_type": actor_type,
+            "action": action,
+            "resource_type": resource_type,
+            "resource_id": resource_id,
+            "correlation_id": correlation_id,
+            "ip": ip,
+            "user_agent": user_agent,
+            "details": details,
+        }
+        await self._ensure_worker().put((entry, future))
+        return future
+
+    async def write(self, **kwargs: Any) -> AuditLog:
+        """
+        Write an audit entry and wait until it is committed.
+
+        Arguments are those of ``write_audit_log`` without ``db``.
+
+        Returns:
+            Committed (detached) AuditLog entry
+        """
+        return await (await self.submit(**kwargs))
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        queue = self._queue
+
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.max_wait_ms / 1000
+            while len(batch) < self.max_batch_size:
+                if not queue.empty():
+                    batch.append(queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except TimeoutError:
+                    break
+
+            try:
+                await self._commit_batch(loop, batch)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    async def _commit_batch(self, loop: asyncio.AbstractEventLoop, batch: list) -> None:
+        fields = [entry for entry, _ in batch]
+        try:
+            entries = await loop.run_in_executor(self._executor, self._commit, fields)
+        except Exception as e:
+            if len(batch) == 1:
+                self.stats.failed += 1
+                logger.error(f"Audit write failed: {e}")
+                _resolve(batch[0][1], error=e)
+                return
+            # Retry one by one so a bad entry does not fail its neighbours
+            logger.warning(f"Audit group commit of {len(batch)} entries failed, retrying: {e}")
+            for item in batch:
+                await self._commit_batch(loop, [item])
+            return
+
+        self.stats.record(len(batch))
+        for (_, future), entry in zip(batch, entries, strict=True):
+            _resolve(future, result=entry)
+
+    def _commit(self, batch: list[dict[str, Any]]) -> list[AuditLog]:
+        """Chain and commit one batch (runs on the writer thread)"""
+        tenant_ids = {entry["tenant_id"] for entry in batch}
+
+        with self.chain_heads.hold(tenant_ids):
+            db = self.session_factory()
+            try:
+                heads: dict[UUID, ChainHead] = {}
+                rows = []
+                for entry in batch:
+                    tenant_id = entry["tenant_id"]
+                    head = heads.get(tenant_id) or self.chain_heads.get(db, tenant_id)
+                    row = build_audit_entry(
+                        prev_hash=head.entry_hash, created_at=next_created_at(head), **entry
+                    )
+                    heads[tenant_id] = ChainHead(row.entry_hash, row.created_at)
+                    rows.append(row)
+
+                self.chain_heads.mark_pending(heads)
+                db.add_all(rows)
+                db.flush()
+                # Detach before commit so callers keep the loaded attributes
+                db.expunge_all()
+                db.commit()
+            except Exception:
+                db.rollback()
+                self.chain_heads.discard(tenant_ids)
+                raise
+            finally:
+                db.close()
+
+            self.chain_heads.advance(heads)
+        return rows
+
+    async def flush(self) -> None:
+        """Wait until every queued entry has been committed or failed"""
+        if self._queue is not None and self._worker is not None and not self._worker.done():
+            await self._queue.join()
+
+    async def close(self) -> None:
+        """Flush queued entries, stop the worker and release the thread"""
+        await self.flush()
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        self._executor.shutdown(wait=True)
+
+
+def _resolve(future: asyncio.Future, *, result: Any = None, error: Exception | None = None) -> None:
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
@@ -0,0 +1,141 @@
+"""
+SAHOOL Geometry Kernel Tests
+اختبارات نواة الحسابات الهندسية
+
+Haversine, spherical area and perimeter, batch APIs and Douglas-Peucker
+"""
+
+import math
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# إضافة المسار للحزمة المشتركة - Add apps/services to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from shared import geometry  # noqa: E402
+
+SQUARE = [(44.0, 15.0), (44.01, 15.0), (44.01, 15.01), (44.0, 15.01)]
+
+
+def legacy_douglas_peucker(points, tolerance):
+    """Recursive reference implementation"""
+    if len(points) <= 2:
+        return points
+    (x1, y1), (x2, y2) = points[0], points[-1]
+    dx, dy = x2 - x1, y2 - y1
+    best, index = 0.0, 0
+    for i in range(1, len(points) - 1):
+        x, y = points[i]
+        if dx == 0 and dy == 0:
+            distance = math.hypot(x - x1, y - y1)
+        else:
+            distance = abs(dy * x - dx * y + x2 * y1 - y2 * x1) / math.hypot(dx, dy)
+        if distance > best:
+            best, index = distance, i
+    if best > tolerance:
+        left = legacy_douglas_peucker(points[: index + 1], tolerance)
+        return left[:-1] + legacy_douglas_peucker(points[index:], tolerance)
+    return [points[0], points[-1]]
+
+
+def wobbly_ring(rng, vertices=200):
+    angles = np.sort(rng.uniform(0, 2 * math.pi, vertices))
+    radius = 0.01 * (1 + 0.2 * rng.standard_normal(vertices).cumsum() / vertices**0.5)
+    return np.column_stack([44 + radius * np.cos(angles), 15 + radius * np.sin(angles)])
+
+
+class TestMeasures:
+    """Distance, area, perimeter"""
+
+    def test_haversine_degree_and_broadcast(self):
+        assert geometry.haversine_m(0, 0, 0, 1) == pytest.approx(111195, abs=1)
+
+        distances = geometry.haversine_m(15.0, 44.0, np.array([15.0, 16.0]), 44.0)
+
+        assert distances.shape == (2,)
+        assert distances[0] == 0
+
+    def test_square_area_and_perimeter(self):
+        side_x = geometry.haversine_m(15.005, 44.0, 15.005, 44.01)
+        side_y = geometry.haversine_m(15.0, 44.0, 15.01, 44.0)
+
+        assert geometry.ring_area_m2(SQUARE) == pytest.approx(side_x * side_y, rel=1e-4)
+        assert geometry.perimeter_m(SQUARE) == pytest.approx(2 * (side_x + side_y), rel=1e-4)
+        assert geometry.perimeter_m(SQUARE, closed=False) < geometry.perimeter_m(SQUARE)
+
+    def test_orientation_closing_point_and_holes(self):
+        closed = SQUARE + [SQUARE[0]]
+        hole = [(44.004, 15.004), (44.004, 15.006), (44.006, 15.006), (44.006, 15.004)]
+
+        signed = geometry.signed_areas_m2([SQUARE, closed, SQUARE[::-1]])
+
+        assert signed[0] > 0
+        assert signed[1] == signed[0]
+        assert signed[2] == pytest.approx(-signed[0])
+        assert geometry.polygon_area_m2([closed, hole]) == pytest.approx(
+            signed[0] - geometry.ring_area_m2(hole)
+        )
+
+    def test_antimeridian(self):
+        ring = [(179.995, 0.0), (-179.995, 0.0), (-179.995, 0.01), (179.995, 0.01)]
+
+        assert geometry.ring_area_m2(ring) == pytest.approx(
+            geometry.ring_area_m2([(0, 0), (0.01, 0), (0.01, 0.01), (0, 0.01)])
+        )
+
+
+class TestBatch:
+    """Many rings at once"""
+
+    def test_ragged_matches_single(self):
+        rng = np.random.default_rng(3)
+        rings = [wobbly_ring(rng, n) for n in (3, 10, 250)] + [np.empty((0, 2)), SQUARE[:2]]
+
+        areas = geometry.areas_m2(rings)
+        perimeters = geometry.perimeters_m(rings)
+
+        for ring, area, perimeter in zip(rings, areas, perimeters, strict=True):
+            assert area == pytest.approx(geometry.ring_area_m2(ring) if len(ring) > 2 else 0)
+            assert perimeter == pytest.approx(geometry.perimeter_m(ring))
+        assert areas[3] == perimeters[3] == 0
+
+    def test_stacked_array_matches_list(self):
+        rng = np.random.default_rng(4)
+        stacked = np.stack([wobbly_ring(rng, 50) for _ in range(6)])
+        closed = np.concatenate([stacked, stacked[:, :1]], axis=1)
+
+        assert geometry.areas_m2(stacked) == pytest.approx(geometry.areas_m2(list(stacked)))
+        assert geometry.perimeters_m(closed) == pytest.approx(geometry.perimeters_m(stacked))
+
+
+class TestSimplify:
+    """Vectorized Douglas-Peucker"""
+
+    @pytest.mark.parametrize("tolerance", [0.0001, 0.0005, 0.002])
+    def test_matches_recursive_reference(self, tolerance):
+        rng = np.random.default_rng(5)
+        rings = [wobbly_ring(rng, n) for n in (5, 80, 400)]
+
+        simplified = geometry.simplify_many(rings, tolerance, batch_vertices=100)
+
+        for ring, result in zip(rings, simplified, strict=True):
+            points = [tuple(p) for p in ring.tolist()]
+            expected = legacy_douglas_peucker(points + [points[0]], tolerance)[:-1]
+            assert [tuple(p) for p in result.tolist()] == expected
+
+    def test_open_polyline_keeps_endpoints(self):
+        line = [(0.0, 0.0), (1.0, 0.01), (2.0, 0.0), (3.0, 1.0)]
+
+        result = geometry.simplify(line, 0.1, closed=False)
+
+        assert result.tolist() == [[0.0, 0.0], [2.0, 0.0], [3.0, 1.0]]
+
+    def test_degenerate_rings_pass_through(self):
+        results = geometry.simplify_many([SQUARE[:2], [], SQUARE], 1.0)
+
+        assert len(results[0]) == 2 and len(results[1]) == 0
+        # Whole ring within tolerance of its first vertex collapses onto it
+        assert results[2].tolist() == [[44.0, 15.0]]
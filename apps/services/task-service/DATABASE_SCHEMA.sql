@@ -144,6 +144,36 @@ COMMENT ON TABLE task_history IS 'Audit trail for task changes - سجل تغيي
 COMMENT ON COLUMN task_history.action IS 'created, updated, started, completed, cancelled, assigned';
 COMMENT ON COLUMN task_history.changes IS 'Detailed field changes in JSON format';
 
+-- ============================================================================
+-- Table: task_status_counters
+-- Description: Per-tenant task counts by status for the dashboard statistics
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS task_status_counters (
+    tenant_id VARCHAR(50) NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    task_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (tenant_id, status)
+);
+
+-- Comments
+COMMENT ON TABLE task_status_counters IS 'Task counts by status, maintained with each task write - عدادات حالة المهام';
+
+-- ============================================================================
+-- Table: task_due_buckets
+-- Description: Per-tenant histogram of tasks by UTC due day and status
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS task_due_buckets (
+    tenant_id VARCHAR(50) NOT NULL,
+    due_day DATE NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    task_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (tenant_id, due_day, status)
+);
+
+-- Comments
+COMMENT ON TABLE task_due_buckets IS 'Tasks per due day and status for week progress and overdue counts - توزيع المهام حسب يوم الاستحقاق';
+COMMENT ON COLUMN task_due_buckets.due_day IS 'UTC calendar day of tasks.due_date; tasks without a due date are not bucketed';
+
 -- ============================================================================
 -- Sample Queries
 -- ============================================================================
@@ -200,6 +230,8 @@ COMMENT ON COLUMN task_history.changes IS 'Detailed field changes in JSON format
 -- 3. Enums are stored as strings for flexibility
 -- 4. JSONB fields allow flexible schema evolution
 -- 5. Indexes are optimized for common query patterns
+-- 6. task_status_counters and task_due_buckets are updated in the same transaction as the task;
+--    TaskRepository.reconcile_task_stats() rebuilds them from tasks
 
 -- ============================================================================
 -- Maintenance Queries
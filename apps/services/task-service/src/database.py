@@ -22,7 +22,7 @@ if shared_path not in sys.path:
 from database import Base
 
 # Import models to ensure they're registered with Base
-from .models import Task
+from .models import Task, TaskStatusCounter
 
 logger = logging.getLogger(__name__)
 
@@ -321,6 +321,11 @@ def seed_demo_data(db: Session) -> None:
         db.commit()
         logger.info(f"Seeded {len(demo_tasks)} demo tasks")
 
+        # Seeded tasks bypass the repository, so build their statistics counters
+        from .repository import TaskRepository
+
+        TaskRepository(db).reconcile_task_stats("tenant_demo")
+
     except Exception as e:
         db.rollback()
         logger.error(f"Error seeding demo data: {e}", exc_info=True)
@@ -336,3 +341,21 @@ def init_demo_data_if_needed() -> None:
     if os.getenv("SEED_DEMO_DATA", "true").lower() == "true":
         with get_db_session() as db:
             seed_demo_data(db)
+
+
+def init_task_stats_if_needed() -> None:
+    """
+    Build task statistics counters for tasks that predate them
+    بناء عدادات إحصائيات المهام للمهام الموجودة قبلها
+
+    Runs once: after the counters exist, the repository keeps them current
+    and reconcile_task_stats() repairs any drift.
+    """
+    from .repository import TaskRepository
+
+    with get_db_session() as db:
+        has_tasks = db.query(Task.task_id).first() is not None
+        has_counters = db.query(TaskStatusCounter.tenant_id).first() is not None
+        if has_tasks and not has_counters:
+            logger.info("Building task statistics counters...")
+            TaskRepository(db).reconcile_task_stats()
@@ -26,7 +26,13 @@ from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
 # Database imports
-from .database import close_database, get_db, init_database, init_demo_data_if_needed
+from .database import (
+    close_database,
+    get_db,
+    init_database,
+    init_demo_data_if_needed,
+    init_task_stats_if_needed,
+)
 from .models import Task as TaskModel
 from .repository import TaskRepository
 
@@ -97,6 +103,14 @@ if setup_exception_handlers:
 if add_request_id_middleware:
     add_request_id_middleware(app)
 
+# Propagate incoming request deadlines to upstream calls
+try:
+    from shared.integration import DeadlineMiddleware
+
+    app.add_middleware(DeadlineMiddleware)
+except ImportError:
+    pass
+
 # CORS - Secure configuration
 # In production, use explicit origins from environment or CORS_SETTINGS
 try:
@@ -422,6 +436,7 @@ async def startup_event():
     try:
         init_database(create_tables=True)
         init_demo_data_if_needed()
+        init_task_stats_if_needed()
         logger.info("Task-service database initialized successfully")
     except Exception as e:
         logger.error(f"Failed to initialize database: {e}", exc_info=True)
@@ -8,10 +8,11 @@ This file defines the database schema for tasks and evidence.
 
 import sys
 import uuid
-from datetime import datetime
+from datetime import date, datetime
 
 from sqlalchemy import (
     Boolean,
+    Date,
     DateTime,
     ForeignKey,
     Index,
@@ -323,3 +324,65 @@ class TaskHistory(Base, TimestampMixin):
 
     def __repr__(self):
         return f"<TaskHistory(task_id={self.task_id}, action={self.action}, performed_by={self.performed_by})>"
+
+
+class TaskStatusCounter(Base):
+    """
+    Task Status Counter model - نموذج عدادات حالات المهام
+
+    Per-tenant task counts by status, maintained by TaskRepository in the
+    same transaction as each task change.
+    عدد المهام لكل حالة لكل مستأجر، يُحدَّث في نفس معاملة تغيير المهمة.
+    """
+
+    __tablename__ = "task_status_counters"
+
+    tenant_id: Mapped[str] = mapped_column(
+        String(50),
+        primary_key=True,
+    )
+    status: Mapped[str] = mapped_column(
+        String(20),
+        primary_key=True,
+    )
+    task_count: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+    )
+
+    def __repr__(self):
+        return f"<TaskStatusCounter(tenant_id={self.tenant_id}, status={self.status}, count={self.task_count})>"
+
+
+class TaskDueBucket(Base):
+    """
+    Task Due Bucket model - نموذج توزيع المهام حسب تاريخ الاستحقاق
+
+    Daily histogram of task counts by due date (UTC day) and status, used for
+    week progress and overdue counts without scanning tasks.
+    توزيع يومي لعدد المهام حسب يوم الاستحقاق والحالة لتقدم الأسبوع والمتأخرات.
+    """
+
+    __tablename__ = "task_due_buckets"
+
+    tenant_id: Mapped[str] = mapped_column(
+        String(50),
+        primary_key=True,
+    )
+    due_day: Mapped[date] = mapped_column(
+        Date,
+        primary_key=True,
+    )
+    status: Mapped[str] = mapped_column(
+        String(20),
+        primary_key=True,
+    )
+    task_count: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+    )
+
+    def __repr__(self):
+        return f"<TaskDueBucket(tenant_id={self.tenant_id}, due_day={self.due_day}, status={self.status}, count={self.task_count})>"
@@ -10,12 +10,19 @@ License: MIT
 """
 
 import logging
+import os
+import sys
 from dataclasses import dataclass
 from enum import Enum
 from typing import Any
 
 import httpx
 
+# Shared integration imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from shared.integration.http_pool import Upstream, get_upstream  # noqa: E402
+
 logger = logging.getLogger(__name__)
 
 
@@ -124,21 +131,22 @@ class NDVIClient:
         """
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
-        self._client: httpx.AsyncClient | None = None
-
-    async def _get_client(self) -> httpx.AsyncClient:
-        """Get or create HTTP client"""
-        if self._client is None or self._client.is_closed:
-            self._client = httpx.AsyncClient(
-                base_url=self.base_url,
+        self._client: Upstream | None = None
+
+    async def _get_client(self) -> Upstream:
+        """Get the process-wide pooled client for the NDVI service"""
+        if self._client is None:
+            self._client = get_upstream(
+                "ndvi-engine",
+                self.base_url,
                 timeout=self.timeout,
                 headers={"Content-Type": "application/json"},
             )
         return self._client
 
     async def close(self):
-        """Close HTTP client"""
-        if self._client and not self._client.is_closed:
+        """Close the pooled connections"""
+        if self._client:
             await self._client.aclose()
             self._client = None
 
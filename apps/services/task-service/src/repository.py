@@ -6,16 +6,107 @@ Provides database operations for tasks and evidence.
 """
 
 import logging
-from datetime import datetime
+from datetime import UTC, date, datetime, timedelta
 
-from sqlalchemy import and_, func, select
+from sqlalchemy import and_, delete, func, insert, select, text, true
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, selectinload
 
-from .models import Task, TaskEvidence, TaskHistory
+from .models import Task, TaskDueBucket, TaskEvidence, TaskHistory, TaskStatusCounter
 
 logger = logging.getLogger(__name__)
 
+# Statuses that no longer count towards overdue work
+CLOSED_STATUSES = ("completed", "cancelled")
+
+
+def _due_day(due_date: datetime | None) -> date | None:
+    """UTC calendar day of a due date (naive datetimes are UTC)"""
+    if due_date is None:
+        return None
+    if due_date.tzinfo is not None:
+        due_date = due_date.astimezone(UTC)
+    return due_date.date()
+
+
+def _stats_key(task: Task) -> tuple[str, date | None]:
+    """The (status, due day) cell a task occupies in the statistics"""
+    return task.status or "pending", _due_day(task.due_date)
+
+
+def _week_window(now: datetime) -> tuple[datetime, datetime]:
+    """Start (Monday 00:00) and end of the week containing ``now``"""
+    week_start = (now - timedelta(days=now.weekday())).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    return week_start, week_start + timedelta(days=7)
+
+
+def _stats_changes(
+    tenant_id: str,
+    old: tuple[str, date | None] | None,
+    new: tuple[str, date | None] | None,
+) -> list[tuple[type, int, dict]]:
+    """
+    Counter increments that move a task from the ``old`` to the ``new``
+    (status, due day) cell, as (model, delta, row key)
+    """
+    old_status, old_day = old or (None, None)
+    new_status, new_day = new or (None, None)
+    changes = []
+
+    if old_status != new_status:
+        if old_status is not None:
+            changes.append((TaskStatusCounter, -1, {"tenant_id": tenant_id, "status": old_status}))
+        if new_status is not None:
+            changes.append((TaskStatusCounter, 1, {"tenant_id": tenant_id, "status": new_status}))
+
+    if (old_status, old_day) != (new_status, new_day):
+        if old_day is not None:
+            changes.append(
+                (
+                    TaskDueBucket,
+                    -1,
+                    {"tenant_id": tenant_id, "due_day": old_day, "status": old_status},
+                )
+            )
+        if new_day is not None:
+            changes.append(
+                (
+                    TaskDueBucket,
+                    1,
+                    {"tenant_id": tenant_id, "due_day": new_day, "status": new_status},
+                )
+            )
+    return changes
+
+
+def _increment_stmt(model, delta: int, key: dict):
+    """Upsert adding ``delta`` to a counter row, creating it if missing"""
+    stmt = pg_insert(model).values(**key, task_count=delta)
+    return stmt.on_conflict_do_update(
+        index_elements=list(key),
+        set_={"task_count": model.task_count + delta},
+    )
+
+
+def _stats_response(
+    total: int, by_status: dict[str, int], overdue: int, week_total: int, week_completed: int
+) -> dict:
+    return {
+        "total": total,
+        "pending": by_status.get("pending", 0),
+        "in_progress": by_status.get("in_progress", 0),
+        "completed": by_status.get("completed", 0),
+        "overdue": overdue,
+        "week_progress": {
+            "completed": week_completed,
+            "total": week_total,
+            "percentage": (round(week_completed / week_total * 100) if week_total > 0 else 0),
+        },
+    }
+
 
 class TaskRepository:
     """
@@ -34,6 +125,7 @@ class TaskRepository:
         """
         try:
             self.db.add(task)
+            self._apply_stats_change(task.tenant_id, None, _stats_key(task))
             self.db.commit()
             self.db.refresh(task)
 
@@ -52,12 +144,16 @@ class TaskRepository:
             logger.error(f"Error creating task: {e}")
             raise
 
-    def get_task_by_id(self, task_id: str, tenant_id: str) -> Task | None:
+    def get_task_by_id(self, task_id: str, tenant_id: str, for_update: bool = False) -> Task | None:
         """
         Get task by ID and tenant
         الحصول على مهمة بواسطة المعرف والمستأجر
+
+        Args:
+            for_update: Lock the row until commit, so concurrent status
+                changes cannot both apply the same counter transition
         """
-        return (
+        query = (
             self.db.query(Task)
             .options(selectinload(Task.evidence))
             .filter(
@@ -66,8 +162,10 @@ class TaskRepository:
                     Task.tenant_id == tenant_id,
                 )
             )
-            .first()
         )
+        if for_update:
+            query = query.with_for_update(of=Task)
+        return query.first()
 
     def list_tasks(
         self,
@@ -131,12 +229,13 @@ class TaskRepository:
         Update task fields
         تحديث حقول المهمة
         """
-        task = self.get_task_by_id(task_id, tenant_id)
+        task = self.get_task_by_id(task_id, tenant_id, for_update=True)
         if not task:
             return None
 
         try:
             old_status = task.status
+            old_key = _stats_key(task)
             changes = {}
 
             for key, value in updates.items():
@@ -151,6 +250,7 @@ class TaskRepository:
 
             task.updated_at = datetime.utcnow()
 
+            self._apply_stats_change(tenant_id, old_key, _stats_key(task))
             self.db.commit()
             self.db.refresh(task)
 
@@ -178,11 +278,12 @@ class TaskRepository:
         Delete a task
         حذف مهمة
         """
-        task = self.get_task_by_id(task_id, tenant_id)
+        task = self.get_task_by_id(task_id, tenant_id, for_update=True)
         if not task:
             return False
 
         try:
+            self._apply_stats_change(tenant_id, _stats_key(task), None)
             self.db.delete(task)
             self.db.commit()
             logger.info(f"Deleted task: {task_id}")
@@ -202,18 +303,21 @@ class TaskRepository:
         Mark task as in progress
         تعيين المهمة كقيد التنفيذ
         """
-        task = self.get_task_by_id(task_id, tenant_id)
+        task = self.get_task_by_id(task_id, tenant_id, for_update=True)
         if not task:
             return None
 
         if task.status != "pending":
+            self.db.rollback()  # release the row lock
             raise ValueError("Task is not in pending status")
 
         try:
             old_status = task.status
+            old_key = _stats_key(task)
             task.status = "in_progress"
             task.updated_at = datetime.utcnow()
 
+            self._apply_stats_change(tenant_id, old_key, _stats_key(task))
             self.db.commit()
             self.db.refresh(task)
 
@@ -246,12 +350,13 @@ class TaskRepository:
         Mark task as completed
         تعيين المهمة كمكتملة
         """
-        task = self.get_task_by_id(task_id, tenant_id)
+        task = self.get_task_by_id(task_id, tenant_id, for_update=True)
         if not task:
             return None
 
         try:
             old_status = task.status
+            old_key = _stats_key(task)
             now = datetime.utcnow()
 
             task.status = "completed"
@@ -265,6 +370,7 @@ class TaskRepository:
             if completion_metadata:
                 task.task_metadata = {**(task.task_metadata or {}), **completion_metadata}
 
+            self._apply_stats_change(tenant_id, old_key, _stats_key(task))
             self.db.commit()
             self.db.refresh(task)
 
@@ -296,18 +402,20 @@ class TaskRepository:
         Cancel a task
         إلغاء مهمة
         """
-        task = self.get_task_by_id(task_id, tenant_id)
+        task = self.get_task_by_id(task_id, tenant_id, for_update=True)
         if not task:
             return None
 
         try:
             old_status = task.status
+            old_key = _stats_key(task)
             task.status = "cancelled"
             task.updated_at = datetime.utcnow()
 
             if reason:
                 task.task_metadata = {**(task.task_metadata or {}), "cancel_reason": reason}
 
+            self._apply_stats_change(tenant_id, old_key, _stats_key(task))
             self.db.commit()
             self.db.refresh(task)
 
@@ -355,87 +463,183 @@ class TaskRepository:
             logger.error(f"Error adding evidence: {e}")
             raise
 
+    # ============== Statistics ==============
+
     def get_task_stats(self, tenant_id: str) -> dict:
         """
         Get task statistics for a tenant
         الحصول على إحصائيات المهام للمستأجر
-        """
-        from datetime import timedelta
 
+        Reads the per-tenant status counters and the due-date histogram,
+        so the cost does not grow with the number of tasks. Only tasks due
+        earlier today are counted from the tasks table, since today's bucket
+        mixes overdue and not-yet-due tasks.
+        """
         now = datetime.utcnow()
-        week_start = now - timedelta(days=now.weekday())
-        week_start = week_start.replace(hour=0, minute=0, second=0, microsecond=0)
-        week_end = week_start + timedelta(days=7)
+        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        week_start, week_end = _week_window(now)
 
-        # Total counts by status
-        total = self.db.query(func.count(Task.task_id)).filter(Task.tenant_id == tenant_id).scalar()
-        pending = (
-            self.db.query(func.count(Task.task_id))
-            .filter(and_(Task.tenant_id == tenant_id, Task.status == "pending"))
-            .scalar()
+        by_status = dict(
+            self.db.query(TaskStatusCounter.status, TaskStatusCounter.task_count)
+            .filter(TaskStatusCounter.tenant_id == tenant_id)
+            .all()
         )
-        in_progress = (
-            self.db.query(func.count(Task.task_id))
-            .filter(and_(Task.tenant_id == tenant_id, Task.status == "in_progress"))
-            .scalar()
+        if not by_status:
+            # No tasks yet, or counters not built for this tenant
+            return self.get_task_stats_direct(tenant_id)
+
+        def bucket_count(condition):
+            return func.coalesce(func.sum(TaskDueBucket.task_count).filter(condition), 0)
+
+        in_week = and_(
+            TaskDueBucket.due_day >= week_start.date(),
+            TaskDueBucket.due_day < week_end.date(),
         )
-        completed = (
-            self.db.query(func.count(Task.task_id))
-            .filter(and_(Task.tenant_id == tenant_id, Task.status == "completed"))
-            .scalar()
+        week_total, week_completed, overdue_before_today = (
+            self.db.query(
+                bucket_count(in_week),
+                bucket_count(and_(in_week, TaskDueBucket.status == "completed")),
+                bucket_count(
+                    and_(
+                        TaskDueBucket.due_day < today_start.date(),
+                        TaskDueBucket.status.notin_(CLOSED_STATUSES),
+                    )
+                ),
+            )
+            .filter(TaskDueBucket.tenant_id == tenant_id)
+            .one()
         )
 
-        # Overdue tasks
-        overdue = (
+        overdue_today = (
             self.db.query(func.count(Task.task_id))
             .filter(
                 and_(
                     Task.tenant_id == tenant_id,
-                    Task.status.notin_(["completed", "cancelled"]),
+                    Task.status.notin_(CLOSED_STATUSES),
+                    Task.due_date >= today_start,
                     Task.due_date < now,
                 )
             )
             .scalar()
         )
 
-        # Week progress
-        week_total = (
-            self.db.query(func.count(Task.task_id))
-            .filter(
-                and_(
-                    Task.tenant_id == tenant_id,
-                    Task.due_date >= week_start,
-                    Task.due_date < week_end,
-                )
+        return _stats_response(
+            total=sum(by_status.values()),
+            by_status=by_status,
+            overdue=int(overdue_before_today) + (overdue_today or 0),
+            week_total=int(week_total),
+            week_completed=int(week_completed),
+        )
+
+    def get_task_stats_direct(self, tenant_id: str) -> dict:
+        """
+        Compute task statistics from the tasks table in one query
+        حساب الإحصائيات مباشرة من جدول المهام باستعلام واحد
+
+        FILTER aggregates over the tenant's tasks; used for tenants without
+        counters and to check the counters during reconciliation.
+        """
+        now = datetime.utcnow()
+        week_start, week_end = _week_window(now)
+        in_week = and_(Task.due_date >= week_start, Task.due_date < week_end)
+
+        row = (
+            self.db.query(
+                func.count(Task.task_id),
+                func.count(Task.task_id).filter(Task.status == "pending"),
+                func.count(Task.task_id).filter(Task.status == "in_progress"),
+                func.count(Task.task_id).filter(Task.status == "completed"),
+                func.count(Task.task_id).filter(
+                    and_(Task.status.notin_(CLOSED_STATUSES), Task.due_date < now)
+                ),
+                func.count(Task.task_id).filter(in_week),
+                func.count(Task.task_id).filter(and_(in_week, Task.status == "completed")),
             )
-            .scalar()
+            .filter(Task.tenant_id == tenant_id)
+            .one()
+        )
+        total, pending, in_progress, completed, overdue, week_total, week_completed = row
+
+        return _stats_response(
+            total=total,
+            by_status={"pending": pending, "in_progress": in_progress, "completed": completed},
+            overdue=overdue,
+            week_total=week_total,
+            week_completed=week_completed,
         )
 
-        week_completed = (
-            self.db.query(func.count(Task.task_id))
-            .filter(
-                and_(
-                    Task.tenant_id == tenant_id,
-                    Task.due_date >= week_start,
-                    Task.due_date < week_end,
-                    Task.status == "completed",
+    def reconcile_task_stats(self, tenant_id: str | None = None) -> None:
+        """
+        Rebuild the statistics counters from the tasks table
+        إعادة بناء عدادات الإحصائيات من جدول المهام
+
+        Backfills counters for existing tasks and repairs drift from writes
+        that bypassed the repository. Takes an exclusive lock on the counter
+        tables for the duration, so task writes wait rather than interleave.
+
+        Args:
+            tenant_id: Tenant to rebuild, or None for all tenants
+        """
+        tenant_tasks = Task.tenant_id == tenant_id if tenant_id else true()
+        due_day = func.date(func.timezone("UTC", Task.due_date))
+
+        try:
+            self.db.execute(
+                text("LOCK TABLE task_status_counters, task_due_buckets IN EXCLUSIVE MODE")
+            )
+            if tenant_id:
+                self.db.execute(
+                    delete(TaskStatusCounter).where(TaskStatusCounter.tenant_id == tenant_id)
+                )
+                self.db.execute(delete(TaskDueBucket).where(TaskDueBucket.tenant_id == tenant_id))
+            else:
+                self.db.execute(delete(TaskStatusCounter))
+                self.db.execute(delete(TaskDueBucket))
+
+            self.db.execute(
+                insert(TaskStatusCounter).from_select(
+                    ["tenant_id", "status", "task_count"],
+                    select(Task.tenant_id, Task.status, func.count(Task.task_id))
+                    .where(tenant_tasks)
+                    .group_by(Task.tenant_id, Task.status),
                 )
             )
-            .scalar()
-        )
+            self.db.execute(
+                insert(TaskDueBucket).from_select(
+                    ["tenant_id", "due_day", "status", "task_count"],
+                    select(Task.tenant_id, due_day, Task.status, func.count(Task.task_id))
+                    .where(and_(tenant_tasks, Task.due_date.isnot(None)))
+                    .group_by(Task.tenant_id, due_day, Task.status),
+                )
+            )
+            self.db.commit()
+            logger.info(f"Reconciled task statistics for {tenant_id or 'all tenants'}")
+
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error reconciling task statistics: {e}")
+            raise
+
+    def _apply_stats_change(
+        self,
+        tenant_id: str,
+        old: tuple[str, date | None] | None,
+        new: tuple[str, date | None] | None,
+    ) -> None:
+        """
+        Move a task between statistics cells
+        نقل المهمة بين خلايا الإحصائيات
+
+        ``old`` / ``new`` are (status, due day) before and after the change,
+        None when the task is created or deleted. Runs inside the caller's
+        transaction so counters commit or roll back with the task.
+        """
+        for model, delta, key in _stats_changes(tenant_id, old, new):
+            self._increment(model, delta, **key)
 
-        return {
-            "total": total or 0,
-            "pending": pending or 0,
-            "in_progress": in_progress or 0,
-            "completed": completed or 0,
-            "overdue": overdue or 0,
-            "week_progress": {
-                "completed": week_completed or 0,
-                "total": week_total or 0,
-                "percentage": (round(week_completed / week_total * 100) if week_total > 0 else 0),
-            },
-        }
+    def _increment(self, model, delta: int, **key) -> None:
+        """Atomically add ``delta`` to a counter row, creating it if missing"""
+        self.db.execute(_increment_stmt(model, delta, key))
 
     def _record_history(
         self,
@@ -483,6 +687,7 @@ class AsyncTaskRepository:
         """Create a new task asynchronously"""
         try:
             self.db.add(task)
+            await self._apply_stats_change(task.tenant_id, None, _stats_key(task))
             await self.db.commit()
             await self.db.refresh(task)
 
@@ -514,6 +719,16 @@ class AsyncTaskRepository:
         )
         return result.scalar_one_or_none()
 
+    async def _apply_stats_change(
+        self,
+        tenant_id: str,
+        old: tuple[str, date | None] | None,
+        new: tuple[str, date | None] | None,
+    ) -> None:
+        """Move a task between statistics cells (see TaskRepository._apply_stats_change)"""
+        for model, delta, key in _stats_changes(tenant_id, old, new):
+            await self.db.execute(_increment_stmt(model, delta, key))
+
     async def _record_history(
         self,
         task_id: str,
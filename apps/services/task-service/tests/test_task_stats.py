@@ -0,0 +1,247 @@
+"""
+Unit Tests for Task Statistics Counters
+اختبارات عدادات إحصائيات المهام
+
+Tests that the incrementally maintained status counters and due-date
+histogram give the same statistics as counting the tasks table.
+The counter tests require PostgreSQL: set TEST_DATABASE_URL=postgresql://...
+"""
+
+import asyncio
+import os
+import sys
+import uuid
+from datetime import UTC, date, datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "shared"))
+
+from src.models import Base, Task, TaskDueBucket, TaskStatusCounter
+from src.repository import (
+    AsyncTaskRepository,
+    TaskRepository,
+    _due_day,
+    _stats_changes,
+    _week_window,
+)
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL", "")
+
+requires_postgres = pytest.mark.skipif(
+    not TEST_DATABASE_URL.startswith("postgresql"),
+    reason="task statistics use PostgreSQL upserts and FILTER aggregates",
+)
+
+
+@pytest.fixture
+def repo():
+    """Repository on a fresh schema"""
+    engine = create_engine(TEST_DATABASE_URL)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine, autoflush=False)()
+    try:
+        yield TaskRepository(db)
+    finally:
+        db.close()
+        Base.metadata.drop_all(engine)
+        engine.dispose()
+
+
+def make_task(tenant_id: str, due_date: datetime | None, status: str = "pending") -> Task:
+    return Task(
+        task_id=f"task_{uuid.uuid4().hex[:12]}",
+        tenant_id=tenant_id,
+        title="Irrigate",
+        task_type="irrigation",
+        priority="medium",
+        status=status,
+        created_by="user_test",
+        due_date=due_date,
+    )
+
+
+def due_dates() -> list[datetime | None]:
+    """Due dates covering past days, earlier today, later this week and no date"""
+    now = datetime.utcnow()
+    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    return [
+        now - timedelta(days=9),
+        now - timedelta(days=1),
+        today_start + (now - today_start) / 2,
+        now + timedelta(minutes=30),
+        now + timedelta(days=2),
+        now + timedelta(days=12),
+        None,
+    ]
+
+
+@requires_postgres
+class TestTaskStatsCounters:
+    """Counter-based statistics match the tasks table"""
+
+    def test_transitions_keep_counters_exact(self, repo):
+        """Create, start, complete, cancel, update and delete"""
+        tasks = [repo.create_task(make_task("t1", due)) for due in due_dates() * 3]
+        repo.create_task(make_task("t2", datetime.utcnow() - timedelta(days=1)))
+
+        for task in tasks[0:7]:
+            repo.start_task(task.task_id, "t1", "user_test")
+        for task in tasks[3:10]:
+            repo.complete_task(task.task_id, "t1", "user_test")
+        for task in tasks[10:14]:
+            repo.cancel_task(task.task_id, "t1", "user_test", reason="rain")
+        repo.update_task(
+            tasks[14].task_id,
+            "t1",
+            {"due_date": datetime.utcnow() - timedelta(days=3)},
+            "user_test",
+        )
+        repo.update_task(tasks[15].task_id, "t1", {"status": "completed"}, "user_test")
+        repo.delete_task(tasks[16].task_id, "t1")
+
+        stats = repo.get_task_stats("t1")
+
+        assert stats == repo.get_task_stats_direct("t1")
+        assert stats["total"] == 20
+        assert stats["overdue"] > 0
+        assert repo.get_task_stats("t2")["overdue"] == 1
+
+    def test_start_rejects_non_pending(self, repo):
+        """A rejected transition leaves the counters unchanged"""
+        task = repo.create_task(make_task("t1", datetime.utcnow()))
+        repo.complete_task(task.task_id, "t1", "user_test")
+
+        with pytest.raises(ValueError):
+            repo.start_task(task.task_id, "t1", "user_test")
+
+        assert repo.get_task_stats("t1")["completed"] == 1
+        assert repo.get_task_stats("t1")["in_progress"] == 0
+
+    def test_tenant_without_counters_uses_direct_query(self, repo):
+        """Tasks written outside the repository are counted until reconciled"""
+        repo.db.execute(
+            insert(Task),
+            [
+                {
+                    "task_id": f"raw_{i}",
+                    "tenant_id": "t1",
+                    "title": "Scout",
+                    "task_type": "scouting",
+                    "priority": "low",
+                    "status": "pending",
+                    "created_by": "user_test",
+                    "due_date": due,
+                }
+                for i, due in enumerate(due_dates())
+            ],
+        )
+        repo.db.commit()
+
+        assert repo.db.query(TaskStatusCounter).count() == 0
+        assert repo.get_task_stats("t1")["total"] == 7
+
+    def test_reconcile_repairs_drift(self, repo):
+        """Reconciliation rebuilds counters from the tasks table"""
+        for due in due_dates():
+            repo.create_task(make_task("t1", due))
+            repo.create_task(make_task("t2", due, status="in_progress"))
+        repo.db.query(TaskStatusCounter).update({"task_count": 99})
+        repo.db.query(TaskDueBucket).delete()
+        repo.db.commit()
+
+        repo.reconcile_task_stats("t1")
+
+        assert repo.get_task_stats("t1") == repo.get_task_stats_direct("t1")
+        assert repo.get_task_stats("t2") != repo.get_task_stats_direct("t2")
+
+        repo.reconcile_task_stats()
+
+        assert repo.get_task_stats("t2") == repo.get_task_stats_direct("t2")
+
+
+def test_due_day_is_utc():
+    """Aware due dates are bucketed by their UTC day"""
+    sanaa = timezone(timedelta(hours=3))
+
+    assert _due_day(datetime(2026, 3, 2, 1, 30, tzinfo=sanaa)).isoformat() == "2026-03-01"
+    assert _due_day(datetime(2026, 3, 2, 1, 30, tzinfo=UTC)).isoformat() == "2026-03-02"
+    assert _due_day(datetime(2026, 3, 1, 23, 59)).isoformat() == "2026-03-01"
+    assert _due_day(None) is None
+
+
+def test_week_window_starts_monday():
+    """The week runs from Monday 00:00 for seven days"""
+    start, end = _week_window(datetime(2026, 3, 5, 14, 20))  # Thursday
+
+    assert start == datetime(2026, 3, 2)
+    assert end == datetime(2026, 3, 9)
+    assert _week_window(datetime(2026, 3, 2))[0] == datetime(2026, 3, 2)
+
+
+class TestStatsCellMoves:
+    """Counter increments for each kind of change, without a database"""
+
+    DAY = date(2026, 3, 1)
+
+    def moves(self, old, new) -> list[tuple[str, int, dict]]:
+        """Increments recorded by TaskRepository._apply_stats_change"""
+        repo = TaskRepository(MagicMock())
+        calls = []
+        repo._increment = lambda model, delta, **key: calls.append((model.__name__, delta, key))
+        repo._apply_stats_change("t1", old, new)
+        return calls
+
+    def test_create_and_delete(self):
+        assert self.moves(None, ("pending", self.DAY)) == [
+            ("TaskStatusCounter", 1, {"tenant_id": "t1", "status": "pending"}),
+            ("TaskDueBucket", 1, {"tenant_id": "t1", "due_day": self.DAY, "status": "pending"}),
+        ]
+        assert self.moves(("completed", None), None) == [
+            ("TaskStatusCounter", -1, {"tenant_id": "t1", "status": "completed"}),
+        ]
+
+    def test_status_change_moves_both_cells(self):
+        assert self.moves(("pending", self.DAY), ("completed", self.DAY)) == [
+            ("TaskStatusCounter", -1, {"tenant_id": "t1", "status": "pending"}),
+            ("TaskStatusCounter", 1, {"tenant_id": "t1", "status": "completed"}),
+            ("TaskDueBucket", -1, {"tenant_id": "t1", "due_day": self.DAY, "status": "pending"}),
+            ("TaskDueBucket", 1, {"tenant_id": "t1", "due_day": self.DAY, "status": "completed"}),
+        ]
+
+    def test_due_date_change_moves_only_the_bucket(self):
+        later = self.DAY + timedelta(days=3)
+
+        assert self.moves(("pending", self.DAY), ("pending", later)) == [
+            ("TaskDueBucket", -1, {"tenant_id": "t1", "due_day": self.DAY, "status": "pending"}),
+            ("TaskDueBucket", 1, {"tenant_id": "t1", "due_day": later, "status": "pending"}),
+        ]
+        assert self.moves(("pending", self.DAY), ("pending", None)) == [
+            ("TaskDueBucket", -1, {"tenant_id": "t1", "due_day": self.DAY, "status": "pending"}),
+        ]
+
+    def test_unchanged_cell_is_a_no_op(self):
+        assert self.moves(("in_progress", self.DAY), ("in_progress", self.DAY)) == []
+        assert _stats_changes("t1", None, None) == []
+
+    def test_async_create_updates_counters(self):
+        """AsyncTaskRepository.create_task counts the new task"""
+        db = MagicMock()
+        db.execute = AsyncMock()
+        db.commit = AsyncMock()
+        db.refresh = AsyncMock()
+        task = make_task("t1", datetime(2026, 3, 1, 9, 0))
+
+        asyncio.run(AsyncTaskRepository(db).create_task(task))
+
+        statements = [call.args[0] for call in db.execute.await_args_list]
+        assert [stmt.table.name for stmt in statements] == [
+            TaskStatusCounter.__tablename__,
+            TaskDueBucket.__tablename__,
+        ]
+        db.commit.assert_awaited_once()
@@ -21,11 +21,22 @@ References:
 
 import logging
 import math
+import os
+import sys
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
 from typing import Any
 
+import numpy as np
+
+# Shared geometry kernel
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from shared import geometry  # noqa: E402
+
+from .zonal_stats import RasterTransform, ZonalStatsEngine, ring_area, trace_rings  # noqa: E402
+
 logger = logging.getLogger(__name__)
 
 
@@ -180,25 +191,28 @@ class FieldBoundaryDetector:
             edges = self._detect_edges(ndvi_data)
 
             # Step 3: Extract contours from edges
-            contours = self._extract_contours(edges, latitude, longitude, radius_meters)
+            contours = self._extract_contours(edges, ndvi_data)
 
             # Step 4: Convert contours to field boundaries
-            boundaries = []
-            for i, contour in enumerate(contours):
-                if len(contour) < 4:  # Need at least 4 points for a polygon
-                    continue
+            # Need at least 4 points for a polygon
+            contours = [(i, c) for i, c in enumerate(contours) if len(c) >= 4]
 
-                # Simplify the boundary
-                simplified = self.simplify_boundary(contour, self.simplify_tolerance)
+            # Simplify and measure all contours in one batch
+            rings = geometry.simplify_many([c for _, c in contours], self.simplify_tolerance)
+            areas = np.round(geometry.areas_m2(rings) / 10000.0, 4)
+            perimeters = np.round(geometry.perimeters_m(rings), 2)
 
-                # Calculate properties
-                area = self.calculate_area(simplified)
+            boundaries = []
+            for (i, _), ring, area, perimeter in zip(
+                contours, rings, areas, perimeters, strict=True
+            ):
+                area, perimeter = float(area), float(perimeter)
 
                 # Filter by area
                 if area < self.min_area_hectares or area > self.max_area_hectares:
                     continue
 
-                perimeter = self.calculate_perimeter(simplified)
+                simplified = [(float(lon), float(lat)) for lon, lat in ring]
                 centroid = self._calculate_centroid(simplified)
 
                 # Calculate detection confidence based on edge clarity and shape
@@ -421,10 +435,7 @@ class FieldBoundaryDetector:
 
     def calculate_area(self, coords: list[tuple[float, float]]) -> float:
         """
-        Calculate area in hectares using Shoelace formula with Haversine correction.
-
-        For geographic coordinates, we need to account for the Earth's curvature.
-        This uses a planar approximation with latitude-dependent scaling.
+        Calculate area in hectares on the sphere (geodesic ring area).
 
         Args:
             coords: List of (lon, lat) coordinates
@@ -435,30 +446,7 @@ class FieldBoundaryDetector:
         if len(coords) < 3:
             return 0.0
 
-        # Get average latitude for scaling
-        avg_lat = sum(lat for _, lat in coords) / len(coords)
-
-        # Meters per degree at this latitude
-        lat_to_meters = 111320.0  # meters per degree latitude (constant)
-        lon_to_meters = 111320.0 * math.cos(math.radians(avg_lat))  # varies by latitude
-
-        # Convert to meters
-        coords_meters = [(lon * lon_to_meters, lat * lat_to_meters) for lon, lat in coords]
-
-        # Shoelace formula
-        area_m2 = 0.0
-        n = len(coords_meters)
-        for i in range(n):
-            x1, y1 = coords_meters[i]
-            x2, y2 = coords_meters[(i + 1) % n]
-            area_m2 += x1 * y2 - x2 * y1
-
-        area_m2 = abs(area_m2) / 2.0
-
-        # Convert to hectares (1 hectare = 10,000 m²)
-        area_hectares = area_m2 / 10000.0
-
-        return round(area_hectares, 4)
+        return round(geometry.ring_area_m2(coords) / 10000.0, 4)
 
     def calculate_perimeter(self, coords: list[tuple[float, float]]) -> float:
         """
@@ -473,16 +461,7 @@ class FieldBoundaryDetector:
         if len(coords) < 2:
             return 0.0
 
-        perimeter = 0.0
-        n = len(coords)
-
-        for i in range(n):
-            lon1, lat1 = coords[i]
-            lon2, lat2 = coords[(i + 1) % n]
-            distance = self._haversine_distance(lat1, lon1, lat2, lon2)
-            perimeter += distance
-
-        return round(perimeter, 2)
+        return round(geometry.perimeter_m(coords), 2)
 
     def simplify_boundary(
         self, coords: list[tuple[float, float]], tolerance: float = 0.0001
@@ -502,66 +481,8 @@ class FieldBoundaryDetector:
         if len(coords) < 3:
             return coords
 
-        # Douglas-Peucker algorithm
-        def perpendicular_distance(point, line_start, line_end):
-            """Calculate perpendicular distance from point to line"""
-            x, y = point
-            x1, y1 = line_start
-            x2, y2 = line_end
-
-            # Vector from line_start to line_end
-            dx = x2 - x1
-            dy = y2 - y1
-
-            # Handle degenerate case
-            if dx == 0 and dy == 0:
-                return math.sqrt((x - x1) ** 2 + (y - y1) ** 2)
-
-            # Calculate perpendicular distance
-            numerator = abs(dy * x - dx * y + x2 * y1 - y2 * x1)
-            denominator = math.sqrt(dx**2 + dy**2)
-
-            return numerator / denominator
-
-        def douglas_peucker(points, tolerance):
-            """Recursive Douglas-Peucker implementation"""
-            if len(points) <= 2:
-                return points
-
-            # Find point with maximum distance
-            max_distance = 0
-            max_index = 0
-
-            for i in range(1, len(points) - 1):
-                distance = perpendicular_distance(points[i], points[0], points[-1])
-                if distance > max_distance:
-                    max_distance = distance
-                    max_index = i
-
-            # If max distance is greater than tolerance, split and recurse
-            if max_distance > tolerance:
-                # Recursive call
-                left = douglas_peucker(points[: max_index + 1], tolerance)
-                right = douglas_peucker(points[max_index:], tolerance)
-
-                # Combine (removing duplicate point)
-                return left[:-1] + right
-            else:
-                # All points are within tolerance, return endpoints
-                return [points[0], points[-1]]
-
-        # Close the polygon if not already closed
-        if coords[0] != coords[-1]:
-            coords = coords + [coords[0]]
-
-        # Apply Douglas-Peucker
-        simplified = douglas_peucker(coords, tolerance)
-
-        # Remove the duplicate closing point
-        if simplified[0] == simplified[-1]:
-            simplified = simplified[:-1]
-
-        return simplified
+        simplified = geometry.simplify(coords, tolerance)
+        return [(float(lon), float(lat)) for lon, lat in simplified]
 
     # =========================================================================
     # Private Helper Methods
@@ -570,43 +491,93 @@ class FieldBoundaryDetector:
     async def _fetch_ndvi_data(
         self, lat: float, lon: float, radius: float, date: datetime
     ) -> dict[str, Any]:
-        """Fetch NDVI data for the specified area"""
-        # In production, this would fetch real satellite data
-        # For now, return simulated data structure
+        """Fetch NDVI raster for the specified area (scene cache, else simulated parcels)"""
+        bounds = {
+            "north": lat + radius / 111320.0,
+            "south": lat - radius / 111320.0,
+            "east": lon + radius / (111320.0 * math.cos(math.radians(lat))),
+            "west": lon - radius / (111320.0 * math.cos(math.radians(lat))),
+        }
+
+        if self.multi_provider is not None and hasattr(self.multi_provider, "get_ndvi_raster"):
+            ring = [
+                (bounds["west"], bounds["south"]),
+                (bounds["east"], bounds["south"]),
+                (bounds["east"], bounds["north"]),
+                (bounds["west"], bounds["north"]),
+            ]
+            result = await self.multi_provider.get_ndvi_raster(ring, date.date())
+            if result.success:
+                ndvi, (west, south, east, north) = result.data
+                return {
+                    "ndvi_values": ndvi,
+                    "resolution": 10,
+                    "bounds": {"north": north, "south": south, "east": east, "west": west},
+                }
+
         return {
-            "ndvi_values": [[0.3, 0.4, 0.5], [0.4, 0.6, 0.5], [0.3, 0.4, 0.3]],
+            "ndvi_values": self._simulated_parcels(lat, lon, radius, resolution=10),
             "resolution": 10,  # meters
-            "bounds": {
-                "north": lat + radius / 111320.0,
-                "south": lat - radius / 111320.0,
-                "east": lon + radius / (111320.0 * math.cos(math.radians(lat))),
-                "west": lon - radius / (111320.0 * math.cos(math.radians(lat))),
-            },
+            "bounds": bounds,
         }
 
+    @staticmethod
+    def _simulated_parcels(lat: float, lon: float, radius: float, resolution: float) -> np.ndarray:
+        """Parcels of uniform crop separated by bare tracks, placed from the location"""
+        size = max(3, round(2 * radius / resolution))
+        rng = np.random.default_rng(abs(int(lat * 1e4)) * 100003 + abs(int(lon * 1e4)))
+        rows, cols = np.mgrid[0:size, 0:size]
+        parcel_h, parcel_w = 24, 30  # ~6 ha at 10 m
+        crop = rng.uniform(0.35, 0.8, (size // parcel_h + 1, size // parcel_w + 1))
+        ndvi = crop[rows // parcel_h, cols // parcel_w] + rng.normal(0.0, 0.02, (size, size))
+        tracks = (rows % parcel_h < 2) | (cols % parcel_w < 2)
+        ndvi[tracks] = 0.12
+        return ndvi.astype(np.float32)
+
+    def _raster_transform(self, ndvi_data: dict[str, Any]) -> RasterTransform:
+        bounds = ndvi_data["bounds"]
+        height, width = np.shape(ndvi_data["ndvi_values"])
+        return RasterTransform.from_bounds(
+            bounds["west"], bounds["south"], bounds["east"], bounds["north"], width, height
+        )
+
     def _detect_edges(
         self, ndvi_data: dict[str, Any], high_sensitivity: bool = False
     ) -> list[list[tuple[int, int]]]:
-        """Detect edges in NDVI image using gradient analysis"""
-        # Simplified edge detection - in production would use Sobel/Canny
-        # Returns list of edge pixel coordinates
-        return [[(0, 0), (0, 100), (100, 100), (100, 0)]]
+        """
+        Detect edges in NDVI image using gradient analysis. Returns the
+        outlines, in pixel corner coordinates (col, row), of the cultivated
+        regions enclosed by edges.
+        """
+        ndvi = np.asarray(ndvi_data["ndvi_values"], dtype=np.float32)
+        filled = np.nan_to_num(ndvi, nan=0.0)
+        d_row, d_col = np.gradient(filled)
+        gradient = np.hypot(d_row, d_col)
+
+        threshold = self.edge_sensitivity / 2 if high_sensitivity else self.edge_sensitivity
+        cultivated = (filled >= self.ndvi_threshold) & (gradient < threshold)
+        return [
+            [(int(x), int(y)) for x, y in ring]
+            for ring in trace_rings(cultivated)
+            if ring_area(ring) > 0  # outer rings; holes are dropped
+        ]
 
     def _extract_contours(
-        self, edges: list[list[tuple[int, int]]], lat: float, lon: float, radius: float
+        self, edges: list[list[tuple[int, int]]], ndvi_data: dict[str, Any]
     ) -> list[list[tuple[float, float]]]:
         """Extract contours from edges and convert to geographic coordinates"""
-        # Convert pixel coordinates to lat/lon
-        meters_per_pixel = 10  # Assume 10m resolution
+        transform = self._raster_transform(ndvi_data)
         contours = []
 
         for edge in edges:
-            contour = []
-            for px, py in edge:
-                # Convert pixel offset to geographic coordinates
-                lon_offset = (px * meters_per_pixel) / (111320.0 * math.cos(math.radians(lat)))
-                lat_offset = (py * meters_per_pixel) / 111320.0
-                contour.append((lon + lon_offset, lat + lat_offset))
+            # trace_rings runs clockwise in image space; reverse for (lon, lat)
+            contour = [
+                (
+                    transform.west + px * transform.pixel_width,
+                    transform.north - py * transform.pixel_height,
+                )
+                for px, py in reversed(edge)
+            ]
             contours.append(contour)
 
         return contours
@@ -652,8 +623,13 @@ class FieldBoundaryDetector:
         self, coords: list[tuple[float, float]], ndvi_data: dict[str, Any]
     ) -> float:
         """Calculate mean NDVI within boundary"""
-        # Simplified - would sample NDVI values within polygon
-        return 0.65
+        try:
+            stats = ZonalStatsEngine().field_statistics(
+                ndvi_data["ndvi_values"], coords, self._raster_transform(ndvi_data)
+            )
+        except ValueError:
+            return 0.0
+        return round(stats.mean, 4)
 
     def _calculate_quality_score(
         self, coords: list[tuple[float, float]], area: float, perimeter: float
@@ -691,20 +667,7 @@ class FieldBoundaryDetector:
 
     def _haversine_distance(self, lat1: float, lon1: float, lat2: float, lon2: float) -> float:
         """Calculate distance between two points using Haversine formula"""
-        R = 6371000  # Earth radius in meters
-
-        lat1_rad = math.radians(lat1)
-        lat2_rad = math.radians(lat2)
-        dlat = math.radians(lat2 - lat1)
-        dlon = math.radians(lon2 - lon1)
-
-        a = (
-            math.sin(dlat / 2) ** 2
-            + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon / 2) ** 2
-        )
-        c = 2 * math.asin(math.sqrt(a))
-
-        return R * c
+        return float(geometry.haversine_m(lat1, lon1, lat2, lon2))
 
     def _calculate_average_radius(
         self, coords: list[tuple[float, float]], centroid: tuple[float, float]
@@ -713,12 +676,9 @@ class FieldBoundaryDetector:
         if not coords:
             return 0.0
 
-        total_distance = 0.0
-        for lon, lat in coords:
-            distance = self._haversine_distance(lat, lon, centroid[1], centroid[0])
-            total_distance += distance
-
-        return total_distance / len(coords)
+        points = np.asarray(coords, dtype=np.float64)
+        distances = geometry.haversine_m(points[:, 1], points[:, 0], centroid[1], centroid[0])
+        return float(distances.mean())
 
     def _snap_to_edges(
         self,
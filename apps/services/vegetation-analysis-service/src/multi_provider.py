@@ -9,18 +9,38 @@ Supported Providers:
 4. Copernicus STAC (Direct) - Free, no auth for some datasets
 """
 
+import io
 import logging
 import os
+import sys
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from datetime import date, datetime, timedelta
 from enum import Enum
 from typing import Any
 
-import httpx
+import numpy as np
+
+# Shared integration imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from shared.integration.http_pool import Upstream, get_upstream  # noqa: E402
+
+from .scene_cache import BANDS, FieldIndexStats, SceneCache, TileFetcher  # noqa: E402
 
 logger = logging.getLogger(__name__)
 
+# Optional TIFF decoding for tile fetches
+try:
+    import tifffile
+
+    TIFFFILE_AVAILABLE = True
+except ImportError:
+    TIFFFILE_AVAILABLE = False
+    logger.warning("tifffile not installed - scene tile fetches disabled")
+
+SCENE_CACHE_ENABLED = os.getenv("SCENE_CACHE_ENABLED", "true").lower() == "true"
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # Data Models
@@ -110,7 +130,7 @@ class SatelliteProvider(ABC):
     def __init__(self, name: str, name_ar: str):
         self.name = name
         self.name_ar = name_ar
-        self._client: httpx.AsyncClient | None = None
+        self._client: Upstream | None = None
 
     @property
     @abstractmethod
@@ -124,9 +144,10 @@ class SatelliteProvider(ABC):
         """List of supported satellite types"""
         pass
 
-    async def _get_client(self) -> httpx.AsyncClient:
+    async def _get_client(self) -> Upstream:
+        """Process-wide pooled client of this provider"""
         if self._client is None:
-            self._client = httpx.AsyncClient(timeout=60.0)
+            self._client = get_upstream(f"satellite-{self.name}", timeout=60.0)
         return self._client
 
     async def close(self):
@@ -158,6 +179,25 @@ class SatelliteProvider(ABC):
         """Get vegetation indices for a location"""
         pass
 
+    @property
+    def supports_tiles(self) -> bool:
+        """Whether fetch_tile_bands can feed the scene cache"""
+        return False
+
+    async def fetch_tile_bands(
+        self,
+        bbox: tuple[float, float, float, float],
+        width: int,
+        height: int,
+        acquisition_date: date,
+        satellite: SatelliteType = SatelliteType.SENTINEL2,
+    ) -> dict[str, np.ndarray] | None:
+        """
+        Band reflectance for a bbox as uint16 arrays (x10000, 0 = no data),
+        keyed by the scene cache's BANDS
+        """
+        return None
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # Sentinel Hub Provider (ESA Copernicus)
@@ -365,6 +405,75 @@ class SentinelHubProvider(SatelliteProvider):
             logger.error(f"Sentinel Hub indices failed: {e}")
             return None
 
+    @property
+    def supports_tiles(self) -> bool:
+        return self.is_configured and TIFFFILE_AVAILABLE
+
+    async def fetch_tile_bands(
+        self,
+        bbox: tuple[float, float, float, float],
+        width: int,
+        height: int,
+        acquisition_date: date,
+        satellite: SatelliteType = SatelliteType.SENTINEL2,
+    ) -> dict[str, np.ndarray] | None:
+        token = await self._get_token()
+        if not token or not TIFFFILE_AVAILABLE:
+            return None
+
+        client = await self._get_client()
+
+        # Raw L2A digital numbers (reflectance x 10000), 0 where there is no data
+        evalscript = """
+        //VERSION=3
+        function setup() {
+            return {
+                input: [{ bands: ["B02", "B04", "B08", "B11", "dataMask"], units: "DN" }],
+                output: { bands: 4, sampleType: "UINT16" }
+            };
+        }
+        function evaluatePixel(sample) {
+            if (!sample.dataMask) return [0, 0, 0, 0];
+            return [sample.B02, sample.B04, sample.B08, sample.B11];
+        }
+        """
+
+        try:
+            response = await client.post(
+                self.PROCESS_URL,
+                headers={"Authorization": f"Bearer {token}", "Accept": "image/tiff"},
+                json={
+                    "input": {
+                        "bounds": {"bbox": list(bbox)},
+                        "data": [
+                            {
+                                "type": "sentinel-2-l2a",
+                                "dataFilter": {
+                                    "timeRange": {
+                                        "from": acquisition_date.isoformat() + "T00:00:00Z",
+                                        "to": acquisition_date.isoformat() + "T23:59:59Z",
+                                    },
+                                    "maxCloudCoverage": 50,
+                                },
+                            }
+                        ],
+                    },
+                    "output": {
+                        "width": width,
+                        "height": height,
+                        "responses": [{"format": {"type": "image/tiff"}}],
+                    },
+                    "evalscript": evalscript,
+                },
+                timeout=120.0,
+            )
+            response.raise_for_status()
+            raster = tifffile.imread(io.BytesIO(response.content))
+            return {band: raster[:, :, i] for i, band in enumerate(BANDS)}
+        except Exception as e:
+            logger.error(f"Sentinel Hub tile fetch failed: {e}")
+            return None
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # NASA Earthdata Provider (MODIS/VIIRS)
@@ -506,6 +615,7 @@ class CopernicusSTACProvider(SatelliteProvider):
                     "limit": 10,
                     "query": {"eo:cloud_cover": {"lt": max_cloud_cover}},
                 },
+                hedge=True,  # catalog search only reads
             )
             response.raise_for_status()
             data = response.json()
@@ -642,7 +752,7 @@ class MultiSatelliteService:
     4. Simulated (always available)
     """
 
-    def __init__(self):
+    def __init__(self, scene_cache: SceneCache | None = None):
         self.providers: list[SatelliteProvider] = []
 
         # Add providers in priority order
@@ -668,6 +778,11 @@ class MultiSatelliteService:
         self._cache: dict[str, tuple[Any, datetime]] = {}
         self._cache_duration = timedelta(hours=1)
 
+        # Band tiles shared by neighbouring fields
+        if scene_cache is None and SCENE_CACHE_ENABLED:
+            scene_cache = SceneCache.from_env()
+        self.scene_cache = scene_cache
+
     async def close(self):
         for provider in self.providers:
             await provider.close()
@@ -750,7 +865,12 @@ class MultiSatelliteService:
                 continue
 
             try:
-                indices = await provider.get_indices(lat, lon, acq_date, satellite)
+                if self.scene_cache and provider.supports_tiles:
+                    indices = await self._indices_from_scenes(
+                        provider, lat, lon, acq_date, satellite
+                    )
+                else:
+                    indices = await provider.get_indices(lat, lon, acq_date, satellite)
                 if indices:
                     self._set_cached(cache_key, indices)
                     return SatelliteResult(
@@ -770,6 +890,121 @@ class MultiSatelliteService:
             error_ar="فشل جميع مزودي المؤشرات",
         )
 
+    async def get_field_statistics(
+        self,
+        boundary: list[tuple[float, float]],
+        acquisition_date: date | None = None,
+        satellite: SatelliteType = SatelliteType.SENTINEL2,
+    ) -> SatelliteResult:
+        """
+        Index statistics over a field boundary [(lon, lat), ...] from cached scene tiles
+        إحصاءات المؤشرات لحدود الحقل من البلاطات المخزنة
+        """
+        acq_date = acquisition_date or date.today()
+        failed_providers = []
+
+        for provider in self.providers:
+            if not (self.scene_cache and provider.supports_tiles):
+                continue
+            if satellite not in provider.supported_satellites:
+                continue
+
+            try:
+                stats = await self.scene_cache.field_stats(
+                    self._tile_fetcher(provider, acq_date, satellite),
+                    satellite.value,
+                    acq_date,
+                    ring=boundary,
+                )
+                if stats and stats.valid_pixels:
+                    return SatelliteResult(
+                        data=stats, provider=provider.name, failed_providers=failed_providers
+                    )
+            except Exception as e:
+                failed_providers.append(f"{provider.name}: {str(e)}")
+
+        return SatelliteResult(
+            data=None,
+            provider="none",
+            failed_providers=failed_providers,
+            error="No scene data available for this field",
+            error_ar="لا تتوفر بيانات مشهد لهذا الحقل",
+        )
+
+    async def get_ndvi_raster(
+        self,
+        boundary: list[tuple[float, float]],
+        acquisition_date: date | None = None,
+        satellite: SatelliteType = SatelliteType.SENTINEL2,
+    ) -> SatelliteResult:
+        """
+        Full-resolution NDVI raster covering a field boundary, from cached scene tiles.
+        data is (ndvi, (west, south, east, north)), NaN where there is no data.
+        خريطة NDVI بالدقة الكاملة لحدود الحقل
+        """
+        acq_date = acquisition_date or date.today()
+        lons = [p[0] for p in boundary]
+        lats = [p[1] for p in boundary]
+        bbox = (min(lons), min(lats), max(lons), max(lats))
+        failed_providers = []
+
+        for provider in self.providers:
+            if not (self.scene_cache and provider.supports_tiles):
+                continue
+            if satellite not in provider.supported_satellites:
+                continue
+
+            try:
+                raster = await self.scene_cache.ndvi_raster(
+                    self._tile_fetcher(provider, acq_date, satellite),
+                    satellite.value,
+                    acq_date,
+                    bbox,
+                )
+                if raster is not None and np.isfinite(raster[0]).any():
+                    return SatelliteResult(
+                        data=raster, provider=provider.name, failed_providers=failed_providers
+                    )
+            except Exception as e:
+                failed_providers.append(f"{provider.name}: {str(e)}")
+
+        return SatelliteResult(
+            data=None,
+            provider="none",
+            failed_providers=failed_providers,
+            error="No scene data available for this field",
+            error_ar="لا تتوفر بيانات مشهد لهذا الحقل",
+        )
+
+    def _tile_fetcher(
+        self, provider: SatelliteProvider, acq_date: date, satellite: SatelliteType
+    ) -> TileFetcher:
+        async def fetch(bbox, width, height):
+            return await provider.fetch_tile_bands(bbox, width, height, acq_date, satellite)
+
+        return fetch
+
+    async def _indices_from_scenes(
+        self,
+        provider: SatelliteProvider,
+        lat: float,
+        lon: float,
+        acq_date: date,
+        satellite: SatelliteType,
+    ) -> VegetationIndices | None:
+        """Mean indices around a point (~100m) clipped from the scene cache"""
+        buffer = 0.001
+        stats: FieldIndexStats | None = await self.scene_cache.field_stats(
+            self._tile_fetcher(provider, acq_date, satellite),
+            satellite.value,
+            acq_date,
+            bbox=(lon - buffer, lat - buffer, lon + buffer, lat + buffer),
+        )
+        if stats is None or not stats.valid_pixels:
+            return None
+        means = {name: round(summary.mean, 4) for name, summary in stats.indices.items()}
+        return VegetationIndices(**means, provider=provider.name)
+
     async def analyze_field(
         self,
         field_id: str,
@@ -912,6 +1147,7 @@ class MultiSatelliteService:
                 "configured": p.is_configured,
                 "satellites": [s.value for s in p.supported_satellites],
                 "type": p.__class__.__name__,
+                "scene_cache": bool(self.scene_cache and p.supports_tiles),
             }
             for p in self.providers
         ]
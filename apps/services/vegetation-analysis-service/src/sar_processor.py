@@ -10,11 +10,16 @@ Sentinel-1 SAR (Synthetic Aperture Radar) Integration
 
 import logging
 import math
+import os
+import sys
 from dataclasses import dataclass
 from datetime import date, datetime, timedelta
 from typing import Any
 
-import httpx
+# Shared integration imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from shared.integration.http_pool import Upstream, get_upstream  # noqa: E402
 
 logger = logging.getLogger(__name__)
 
@@ -104,19 +109,19 @@ class SARProcessor:
 
     def __init__(self):
         """Initialize SAR processor"""
-        self._client: httpx.AsyncClient | None = None
+        self._client: Upstream | None = None
         self._cache: dict[str, tuple[Any, datetime]] = {}
         self._cache_duration = timedelta(hours=6)  # SAR data updates less frequently
         logger.info("SAR Processor initialized with Yemen soil calibration")
 
-    async def _get_client(self) -> httpx.AsyncClient:
-        """Get or create HTTP client"""
+    async def _get_client(self) -> Upstream:
+        """Get the process-wide pooled client for the STAC catalog"""
         if self._client is None:
-            self._client = httpx.AsyncClient(timeout=60.0)
+            self._client = get_upstream("sentinel1-stac", timeout=60.0)
         return self._client
 
     async def close(self):
-        """Close HTTP client"""
+        """Close the pooled connections"""
         if self._client:
             await self._client.aclose()
             self._client = None
@@ -164,6 +169,7 @@ class SARProcessor:
                     "limit": 50,
                 },
                 timeout=30.0,
+                hedge=True,  # catalog search only reads
             )
 
             if response.status_code == 200:
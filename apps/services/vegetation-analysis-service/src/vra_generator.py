@@ -11,17 +11,34 @@ Generate prescription maps for variable-rate application of:
 
 Based on NDVI zones, yield maps, soil analysis, or combined factors.
 Similar to OneSoil VRA capabilities.
+
+Zones come from the field's NDVI raster (scene cache when a tile provider
+is configured, otherwise a simulated raster), classified with natural
+breaks and polygonized by the zonal statistics engine.
 """
 
+import asyncio
 import logging
+import math
 import uuid
-from dataclasses import asdict, dataclass
+import zlib
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
 from enum import Enum
 from typing import Any
 
+import numpy as np
+
+try:
+    from .zonal_stats import RasterTransform, ZonalResult, ZonalStatsEngine
+except ImportError:  # imported as a top-level module, with src/ on sys.path
+    from zonal_stats import RasterTransform, ZonalResult, ZonalStatsEngine
+
 logger = logging.getLogger(__name__)
 
+# Raster used when no scene data is available (~10 m pixels, as the scene cache)
+SIMULATED_PIXEL_DEG = 0.0001
+
 
 # =============================================================================
 # Enums
@@ -91,6 +108,9 @@ class ManagementZone:
     total_product: float  # Total product needed for this zone
     color: str  # Hex color for visualization
 
+    # All parts of the zone, largest first (polygon is the first)
+    polygons: list[list[list[tuple[float, float]]]] = field(default_factory=list)
+
 
 @dataclass
 class PrescriptionMap:
@@ -156,6 +176,7 @@ class ZoneStatistics:
     ndvi_std: float
     ndvi_min: float
     ndvi_max: float
+    ndvi_source: str = "simulated"  # "simulated" or the satellite provider name
 
 
 # =============================================================================
@@ -176,8 +197,8 @@ class VRAGenerator:
     - Export to GeoJSON, Shapefile, ISO-XML
     """
 
-    # Zone classification thresholds (NDVI-based)
-    # Thresholds divide NDVI range into equal or optimal percentiles
+    # Reference NDVI ranges per zone level. Classified zones use natural
+    # breaks of the field's own NDVI instead (see classify_zones)
     ZONE_THRESHOLDS = {
         3: {"low": (0.0, 0.4), "medium": (0.4, 0.6), "high": (0.6, 1.0)},
         5: {
@@ -267,6 +288,7 @@ class VRAGenerator:
             multi_provider: MultiSatelliteService instance for fetching NDVI data
         """
         self.multi_provider = multi_provider
+        self.zonal_engine = ZonalStatsEngine()
         self._prescription_store: dict[str, PrescriptionMap] = {}  # In-memory store
 
     async def generate_prescription(
@@ -285,6 +307,7 @@ class VRAGenerator:
         product_price_per_unit: float | None = None,
         notes: str | None = None,
         notes_ar: str | None = None,
+        boundary: list[tuple[float, float]] | None = None,
     ) -> PrescriptionMap:
         """
         Generate VRA prescription map based on NDVI zones.
@@ -304,6 +327,7 @@ class VRAGenerator:
             product_price_per_unit: Price per unit for cost savings calculation
             notes: Additional notes (English)
             notes_ar: Additional notes (Arabic)
+            boundary: Field boundary [(lon, lat), ...] (optional)
 
         Returns:
             PrescriptionMap with zones and recommendations
@@ -337,6 +361,7 @@ class VRAGenerator:
             longitude=longitude,
             num_zones=num_zones,
             date=date,
+            boundary=boundary,
         )
 
         # Step 2: Calculate application rates for each zone
@@ -408,6 +433,8 @@ class VRAGenerator:
         longitude: float,
         num_zones: int = 3,
         date: datetime | None = None,
+        boundary: list[tuple[float, float]] | None = None,
+        method: str = "jenks",
     ) -> ZoneStatistics:
         """
         Classify field into management zones based on NDVI
@@ -418,96 +445,130 @@ class VRAGenerator:
             longitude: Field center longitude
             num_zones: Number of zones (3 or 5)
             date: Date for NDVI data
+            boundary: Field boundary [(lon, lat), ...] (default: ~400 m square
+                around the center)
+            method: Class breaks, "jenks", "kmeans" or "quantile"
 
         Returns:
             ZoneStatistics with classified zones
         """
         logger.info(f"Classifying field {field_id} into {num_zones} zones")
 
-        # For simulation, we'll create synthetic zones
-        # In production, this would fetch actual NDVI data and classify pixels
+        if boundary is None:
+            boundary = [
+                (longitude - 0.002, latitude - 0.002),
+                (longitude + 0.002, latitude - 0.002),
+                (longitude + 0.002, latitude + 0.002),
+                (longitude - 0.002, latitude + 0.002),
+            ]
 
-        # Simulated NDVI statistics for the field
-        ndvi_mean = 0.55
-        ndvi_std = 0.15
-        ndvi_min = 0.25
-        ndvi_max = 0.85
+        ndvi, transform, source = await self._ndvi_raster(field_id, boundary, date)
+        try:
+            result: ZonalResult = await asyncio.to_thread(
+                self.zonal_engine.management_zones, ndvi, boundary, transform, num_zones, method
+            )
+        except ValueError as e:
+            if source == "simulated":
+                raise
+            # The scene has valid pixels in the bbox but none in the field (cloud, no data)
+            logger.warning(f"{source} NDVI unusable for field {field_id}: {e}")
+            ndvi, transform = self._simulated_ndvi(field_id, boundary)
+            source = "simulated"
+            result = await asyncio.to_thread(
+                self.zonal_engine.management_zones, ndvi, boundary, transform, num_zones, method
+            )
 
-        # Get zone thresholds
-        thresholds = self.ZONE_THRESHOLDS[num_zones]
+        level_names = (
+            ["low", "medium", "high"]
+            if num_zones == 3
+            else ["very_low", "low", "medium", "high", "very_high"]
+        )
 
-        # Create management zones
         zones = []
-        zone_id = 1
-
-        # Simulated field area (in real implementation, get from field data)
-        total_area_ha = 10.0  # 10 hectares
-
-        # Create zones based on thresholds
-        if num_zones == 3:
-            zone_configs = [
-                ("low", ZoneLevel.LOW, 0.25),
-                ("medium", ZoneLevel.MEDIUM, 0.50),
-                ("high", ZoneLevel.HIGH, 0.25),
-            ]
-        else:  # 5 zones
-            zone_configs = [
-                ("very_low", ZoneLevel.VERY_LOW, 0.15),
-                ("low", ZoneLevel.LOW, 0.20),
-                ("medium", ZoneLevel.MEDIUM, 0.30),
-                ("high", ZoneLevel.HIGH, 0.20),
-                ("very_high", ZoneLevel.VERY_HIGH, 0.15),
-            ]
-
-        for zone_name, zone_level, area_pct in zone_configs:
-            zone_area = total_area_ha * area_pct
-
-            # Get NDVI range for this zone
-            ndvi_range = thresholds[zone_name]
-
-            # Create simplified polygon (in reality, this would be actual field geometry)
-            # For simulation, create a rectangular zone
-            offset = zone_id * 0.001
-            polygon = [
-                [
-                    [longitude - 0.002 + offset, latitude - 0.002],
-                    [longitude + 0.002 + offset, latitude - 0.002],
-                    [longitude + 0.002 + offset, latitude + 0.002],
-                    [longitude - 0.002 + offset, latitude + 0.002],
-                    [longitude - 0.002 + offset, latitude - 0.002],
-                ]
-            ]
-
-            centroid = (longitude + offset, latitude)
-
-            zone = ManagementZone(
-                zone_id=zone_id,
-                zone_name=zone_name.replace("_", " ").title(),
-                zone_name_ar=self.ZONE_NAMES_AR[zone_name],
-                zone_level=zone_level,
-                ndvi_range=ndvi_range,
-                area_ha=round(zone_area, 2),
-                percentage=round(area_pct * 100, 1),
-                centroid=centroid,
-                polygon=polygon,
-                recommended_rate=0.0,  # Will be set later
-                unit="",  # Will be set later
-                total_product=0.0,  # Will be calculated later
-                color=self.ZONE_COLORS[num_zones][zone_name],
+        for zone_name, classified in zip(level_names, result.zones, strict=True):
+            centroid = classified.centroid
+            if math.isnan(centroid[0]):
+                centroid = (longitude, latitude)
+            zones.append(
+                ManagementZone(
+                    zone_id=classified.zone,
+                    zone_name=zone_name.replace("_", " ").title(),
+                    zone_name_ar=self.ZONE_NAMES_AR[zone_name],
+                    zone_level=ZoneLevel(zone_name),
+                    ndvi_range=classified.ndvi_range,
+                    area_ha=round(classified.area_ha, 2),
+                    percentage=round(classified.percentage, 2),
+                    centroid=(round(centroid[0], 6), round(centroid[1], 6)),
+                    polygon=classified.polygons[0] if classified.polygons else [],
+                    recommended_rate=0.0,  # Will be set later
+                    unit="",  # Will be set later
+                    total_product=0.0,  # Will be calculated later
+                    color=self.ZONE_COLORS[num_zones][zone_name],
+                    polygons=classified.polygons,
+                )
             )
 
-            zones.append(zone)
-            zone_id += 1
-
+        stats = result.stats
         return ZoneStatistics(
             num_zones=num_zones,
             zones=zones,
-            total_area_ha=total_area_ha,
-            ndvi_mean=ndvi_mean,
-            ndvi_std=ndvi_std,
-            ndvi_min=ndvi_min,
-            ndvi_max=ndvi_max,
+            total_area_ha=round(stats.area_ha, 2),
+            ndvi_mean=round(stats.mean, 4),
+            ndvi_std=round(stats.std, 4),
+            ndvi_min=round(stats.min, 4),
+            ndvi_max=round(stats.max, 4),
+            ndvi_source=source,
+        )
+
+    async def _ndvi_raster(
+        self,
+        field_id: str,
+        boundary: list[tuple[float, float]],
+        date: datetime | None,
+    ) -> tuple[np.ndarray, RasterTransform, str]:
+        """NDVI raster covering the boundary, from the scene cache when possible"""
+        if self.multi_provider is not None and hasattr(self.multi_provider, "get_ndvi_raster"):
+            try:
+                result = await self.multi_provider.get_ndvi_raster(
+                    boundary, date.date() if isinstance(date, datetime) else date
+                )
+                if result.success:
+                    ndvi, bbox = result.data
+                    height, width = ndvi.shape
+                    return ndvi, RasterTransform.from_bounds(*bbox, width, height), result.provider
+            except Exception as e:
+                logger.warning(f"NDVI raster unavailable for field {field_id}: {e}")
+
+        return (*self._simulated_ndvi(field_id, boundary), "simulated")
+
+    @staticmethod
+    def _simulated_ndvi(
+        field_id: str, boundary: list[tuple[float, float]]
+    ) -> tuple[np.ndarray, RasterTransform]:
+        """
+        Deterministic NDVI raster for a field: healthy canopy with a low-vigor
+        patch and a gentle gradient placed from the field id, plus sensor noise
+        """
+        lons = [p[0] for p in boundary]
+        lats = [p[1] for p in boundary]
+        west, east = min(lons), max(lons)
+        south, north = min(lats), max(lats)
+        width = max(1, math.ceil((east - west) / SIMULATED_PIXEL_DEG))
+        height = max(1, math.ceil((north - south) / SIMULATED_PIXEL_DEG))
+        transform = RasterTransform(west, north, SIMULATED_PIXEL_DEG, SIMULATED_PIXEL_DEG)
+
+        rng = np.random.default_rng(zlib.crc32(field_id.encode()))
+        rows, cols = np.mgrid[0:height, 0:width] / max(height, width)
+        patch_row, patch_col = rng.uniform(0.2, 0.8, 2) * (height, width) / max(height, width)
+        angle = rng.uniform(0, 2 * math.pi)
+        distance2 = (rows - patch_row) ** 2 + (cols - patch_col) ** 2
+        ndvi = (
+            0.8
+            - 0.45 * np.exp(-distance2 / 0.08)
+            + 0.05 * (cols * math.cos(angle) + rows * math.sin(angle))
+            + rng.normal(0.0, 0.01, rows.shape)
         )
+        return np.clip(ndvi, 0.0, 1.0).astype(np.float32), transform
 
     def calculate_zone_rate(
         self,
@@ -578,7 +639,7 @@ class VRAGenerator:
         for zone in prescription.zones:
             feature = {
                 "type": "Feature",
-                "geometry": {"type": "Polygon", "coordinates": zone.polygon},
+                "geometry": self._zone_geometry(zone),
                 "properties": {
                     "zone_id": zone.zone_id,
                     "zone_name": zone.zone_name,
@@ -614,6 +675,13 @@ class VRAGenerator:
 
         return geojson
 
+    @staticmethod
+    def _zone_geometry(zone: ManagementZone) -> dict[str, Any]:
+        """Polygon, or MultiPolygon when the zone has several parts"""
+        if len(zone.polygons) > 1:
+            return {"type": "MultiPolygon", "coordinates": zone.polygons}
+        return {"type": "Polygon", "coordinates": zone.polygon}
+
     def to_shapefile_data(self, prescription: PrescriptionMap) -> dict[str, Any]:
         """
         Convert prescription to Shapefile-compatible data structure
@@ -632,7 +700,7 @@ class VRAGenerator:
         for zone in prescription.zones:
             features.append(
                 {
-                    "geometry": {"type": "Polygon", "coordinates": zone.polygon},
+                    "geometry": self._zone_geometry(zone),
                     "properties": {
                         "ZONE_ID": zone.zone_id,
                         "ZONE_NAME": zone.zone_name,
@@ -681,8 +749,8 @@ class VRAGenerator:
         <Polygon PolygonType="1">
 """
             # Add polygon points
-            if zone.polygon:
-                for ring in zone.polygon:
+            for polygon in zone.polygons or [zone.polygon]:
+                for ring in polygon:
                     for point in ring:
                         lon, lat = point
                         xml += f'          <Point PointEast="{lon}" PointNorth="{lat}"/>\n'
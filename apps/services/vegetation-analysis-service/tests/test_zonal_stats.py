@@ -0,0 +1,164 @@
+"""
+Unit tests for raster zonal statistics and management zones
+"""
+
+import numpy as np
+import pytest
+from src.zonal_stats import (
+    RasterTransform,
+    ZonalStatsEngine,
+    jenks_breaks,
+    kmeans_breaks,
+    polygonize,
+    rasterize,
+    ring_area,
+    trace_rings,
+)
+
+# 200 x 200 px raster of 0.0001 deg pixels
+TRANSFORM = RasterTransform.from_bounds(44.0, 15.0, 44.02, 15.02, 200, 200)
+FIELD = [(44.002, 15.002), (44.018, 15.002), (44.018, 15.018), (44.002, 15.018)]
+
+
+def ramp(levels=None) -> np.ndarray:
+    """NDVI rising west to east, optionally stepped into ``levels`` bands"""
+    cols = np.broadcast_to(np.arange(200) / 199, (200, 200))
+    if levels:
+        cols = np.floor(cols * levels) / levels
+    return (0.2 + 0.6 * cols).astype(np.float32)
+
+
+class TestRasterize:
+    """Polygon to pixel mask"""
+
+    def test_square_and_hole(self):
+        hole = [(44.008, 15.008), (44.012, 15.008), (44.012, 15.012), (44.008, 15.012)]
+
+        mask = rasterize([FIELD, hole], TRANSFORM, 0, 200, 0, 200)
+
+        assert mask.sum() == 160 * 160 - 40 * 40
+        assert mask[100, 30] and not mask[100, 100] and not mask[10, 10]
+
+    def test_blocks_match_whole(self):
+        triangle = [(44.001, 15.001), (44.019, 15.004), (44.006, 15.019)]
+
+        whole = rasterize([triangle], TRANSFORM, 0, 200, 0, 200)
+        blocks = np.vstack(
+            [rasterize([triangle], TRANSFORM, r, r + 7, 0, 200) for r in range(0, 200, 7)]
+        )
+
+        assert whole.sum() == pytest.approx(0.5 * 180 * 150 + 0.5 * 180 * 30, rel=0.15)
+        assert (whole == blocks[:200]).all()
+
+
+class TestFieldStatistics:
+    """Streaming statistics"""
+
+    def test_matches_numpy(self):
+        rng = np.random.default_rng(1)
+        ndvi = rng.uniform(0.1, 0.9, (200, 200)).astype(np.float32)
+        ndvi[50:60, 50:60] = np.nan
+
+        stats = ZonalStatsEngine(block_rows=16).field_statistics(ndvi, FIELD, TRANSFORM)
+        inside = ndvi[20:180, 20:180]
+        values = inside[np.isfinite(inside)]
+
+        assert stats.pixel_count == 160 * 160
+        assert stats.valid_count == values.size
+        assert stats.mean == pytest.approx(values.mean(), abs=1e-6)
+        assert stats.std == pytest.approx(values.std(), abs=1e-6)
+        assert stats.min == pytest.approx(values.min())
+        for q, value in stats.percentiles.items():
+            assert value == pytest.approx(np.percentile(values, q), abs=2e-3)
+        # 160 x 160 pixels of ~10.75 x 11.13 m
+        assert stats.area_ha == pytest.approx(306, rel=0.01)
+
+    def test_field_outside_raster(self):
+        with pytest.raises(ValueError):
+            ZonalStatsEngine().field_statistics(
+                ramp(), [(45, 16), (45.1, 16), (45, 16.1)], TRANSFORM
+            )
+
+
+class TestBreaks:
+    """Class breaks on weighted values"""
+
+    def test_jenks_finds_gaps(self):
+        values = np.array([0.1, 0.12, 0.14, 0.5, 0.52, 0.9, 0.91, 0.93])
+
+        breaks = jenks_breaks(values, np.ones_like(values), 3)
+
+        assert breaks == pytest.approx([0.32, 0.71])
+
+    def test_kmeans_respects_weights(self):
+        values = np.array([0.1, 0.2, 0.3, 0.4])
+
+        breaks = kmeans_breaks(values, np.array([1.0, 1.0, 1.0, 100.0]), 2)
+
+        assert 0.2 < breaks[0] < 0.4
+
+
+class TestPolygonize:
+    """Cell edges to rings"""
+
+    def test_diagonal_cells_are_separate(self):
+        mask = np.array([[1, 0], [0, 1]], bool)
+
+        rings = trace_rings(mask)
+
+        assert len(rings) == 2
+        assert all(ring_area(r) == 1 for r in rings)
+
+    def test_hole_is_attached_to_its_polygon(self):
+        labels = np.ones((6, 6), np.uint8)
+        labels[2:4, 2:4] = 2
+        grid = RasterTransform(0.0, 6.0, 1.0, 1.0)
+
+        outer = polygonize(labels, 1, grid, min_cells=1)
+        inner = polygonize(labels, 2, grid, min_cells=1)
+
+        assert len(outer) == 1 and len(outer[0]) == 2
+        assert outer[0][0][0] == outer[0][0][-1]
+        # GeoJSON orientation: exterior counter-clockwise, hole clockwise
+        assert ring_area(np.array(outer[0][0][:-1])) > 0
+        assert ring_area(np.array(outer[0][1][:-1])) < 0
+        assert sorted(inner[0][0][:-1]) == [(2.0, 2.0), (2.0, 4.0), (4.0, 2.0), (4.0, 4.0)]
+
+
+class TestManagementZones:
+    """End to end"""
+
+    @pytest.mark.parametrize("method", ["jenks", "kmeans", "quantile"])
+    def test_stepped_field_gives_bands(self, method):
+        result = ZonalStatsEngine().management_zones(ramp(3), FIELD, TRANSFORM, 3, method)
+
+        assert [z.zone for z in result.zones] == [1, 2, 3]
+        assert sum(z.percentage for z in result.zones) == pytest.approx(100)
+        assert sum(z.area_ha for z in result.zones) == pytest.approx(result.stats.area_ha)
+        means = [z.mean for z in result.zones]
+        assert means == sorted(means)
+        for zone in result.zones:
+            assert len(zone.polygons) == 1
+            lons = [p[0] for p in zone.polygons[0][0]]
+            assert min(lons) >= 44.002 - 1e-9 and max(lons) <= 44.018 + 1e-9
+        # Western band centroid lies west of the eastern one
+        assert result.zones[0].centroid[0] < result.zones[2].centroid[0]
+
+    def test_coarse_cells_for_large_rasters(self):
+        engine = ZonalStatsEngine(max_grid=50, block_rows=30)
+
+        result = engine.management_zones(ramp(5), FIELD, TRANSFORM, 5)
+
+        assert result.cell_size == 4
+        assert len(result.zones) == 5
+        assert result.zones[0].max < result.zones[-1].min
+
+    def test_memmap_input(self, tmp_path):
+        path = tmp_path / "ndvi.npy"
+        np.save(path, ramp())
+
+        result = ZonalStatsEngine(block_rows=32).management_zones(
+            np.load(path, mmap_mode="r"), FIELD, TRANSFORM, 3
+        )
+
+        assert result.stats.valid_count == 160 * 160
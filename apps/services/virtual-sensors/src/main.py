@@ -15,16 +15,19 @@ Field-First Architecture:
 - Badge "تقدير افتراضي" لتمييز البيانات عن IoT
 """
 
+import asyncio
 import logging
-import math
 import os
 import sys
+import threading
+import time
 import uuid
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 from datetime import date, datetime, timedelta
 from enum import Enum
 from typing import Any
 
+import numpy as np
 from fastapi import BackgroundTasks, FastAPI, HTTPException, Query
 
 # Shared middleware imports
@@ -32,6 +35,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
 
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
+from shared import fao56
 from shared.errors_py import add_request_id_middleware, setup_exception_handlers
 
 logger = logging.getLogger(__name__)
@@ -401,6 +405,15 @@ IRRIGATION_EFFICIENCY = {
     IrrigationMethod.FURROW: 0.55,
 }
 
+# Soil moisture status by root-zone depletion (fao56.MOISTURE_STATUSES order)
+MOISTURE_STATUS_LEVELS = [
+    ("optimal", "مثالي", UrgencyLevel.NONE),
+    ("adequate", "كافي", UrgencyLevel.LOW),
+    ("moderate_stress", "إجهاد متوسط", UrgencyLevel.MEDIUM),
+    ("high_stress", "إجهاد عالي", UrgencyLevel.HIGH),
+    ("critical", "حرج", UrgencyLevel.CRITICAL),
+]
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # Pydantic Models
@@ -586,120 +599,129 @@ class WaterBalanceResponse(BaseModel):
     recommended_adjustment_ar: str
 
 
-# ═══════════════════════════════════════════════════════════════════════════════
-# Calculation Functions
-# دوال الحساب
-# ═══════════════════════════════════════════════════════════════════════════════
+class DailyWaterInput(BaseModel):
+    """Daily weather and water inputs for one field-day"""
 
+    day: date
+    temperature_max: float = Field(..., description="Maximum temperature (°C)")
+    temperature_min: float = Field(..., description="Minimum temperature (°C)")
+    humidity: float = Field(..., ge=0, le=100, description="Relative humidity (%)")
+    wind_speed: float = Field(..., ge=0, description="Wind speed at 2m height (m/s)")
+    solar_radiation: float | None = Field(None, description="Solar radiation (MJ/m²/day)")
+    sunshine_hours: float | None = Field(None, ge=0, le=24, description="Sunshine hours")
+    rainfall: float = Field(0, ge=0, description="Rainfall (mm)")
+    irrigation: float = Field(0, ge=0, description="Net irrigation applied (mm)")
 
-def calculate_et0_penman_monteith(weather: WeatherInput) -> float:
-    """
-    Calculate reference evapotranspiration using FAO-56 Penman-Monteith equation.
-    حساب التبخر-نتح المرجعي باستخدام معادلة بنمان-مونتيث FAO-56
 
-    ET0 = [0.408 Δ(Rn-G) + γ(900/(T+273))u2(es-ea)] / [Δ + γ(1+0.34u2)]
-    """
-    # Temperature calculations
-    T_max = weather.temperature_max
-    T_min = weather.temperature_min
-    T_mean = (T_max + T_min) / 2
+class FieldSensorConfig(BaseModel):
+    """Field setup for the virtual soil moisture sensor"""
 
-    # Saturation vapor pressure (kPa)
-    e_T_max = 0.6108 * math.exp((17.27 * T_max) / (T_max + 237.3))
-    e_T_min = 0.6108 * math.exp((17.27 * T_min) / (T_min + 237.3))
-    es = (e_T_max + e_T_min) / 2  # Mean saturation vapor pressure
+    crop_type: str
+    growth_stage: GrowthStage
+    soil_type: SoilType
+    irrigation_method: IrrigationMethod = IrrigationMethod.DRIP
+    root_depth: float | None = Field(
+        None, gt=0, le=3.0, description="Root depth (m); defaults to the growth stage depth"
+    )
+    latitude: float = Field(..., ge=-90, le=90, description="Latitude (degrees)")
+    altitude: float = Field(0, description="Altitude above sea level (m)")
 
-    # Actual vapor pressure from humidity
-    ea = (weather.humidity / 100) * es
 
-    # Vapor pressure deficit
-    vpd = es - ea
+class FieldSensorRegistration(FieldSensorConfig):
+    """Register or update a field for the nightly soil moisture refresh"""
 
-    # Slope of saturation vapor pressure curve (kPa/°C)
-    delta = (4098 * (0.6108 * math.exp((17.27 * T_mean) / (T_mean + 237.3)))) / (
-        (T_mean + 237.3) ** 2
+    available_water: float | None = Field(
+        None, ge=0, description="Known available water (mm); keeps the current state if omitted"
     )
+    as_of: date | None = Field(None, description="Day the available water was measured")
 
-    # Atmospheric pressure (kPa)
-    P = 101.3 * ((293 - 0.0065 * weather.altitude) / 293) ** 5.26
 
-    # Psychrometric constant (kPa/°C)
-    gamma = 0.000665 * P
+class FieldWaterBalanceInput(FieldSensorConfig):
+    """One field of a batch water balance request"""
 
-    # Day of year
-    day_of_year = weather.calculation_date.timetuple().tm_yday
+    field_id: str
+    initial_available_water: float | None = Field(
+        None, ge=0, description="Available water before the first day (mm); defaults to TAW"
+    )
+    days: list[DailyWaterInput] = Field(..., min_length=1, max_length=366)
 
-    # Solar calculations
-    lat_rad = math.radians(weather.latitude)
 
-    # Solar declination
-    solar_dec = 0.409 * math.sin(2 * math.pi * day_of_year / 365 - 1.39)
+class WaterBalanceBatchRequest(BaseModel):
+    """Batch water balance request"""
 
-    # Sunset hour angle
-    cos_ws = -math.tan(lat_rad) * math.tan(solar_dec)
-    cos_ws = max(-1, min(1, cos_ws))  # Clamp to valid range
-    ws = math.acos(cos_ws)
+    fields: list[FieldWaterBalanceInput] = Field(..., min_length=1, max_length=10000)
 
-    # Extraterrestrial radiation (MJ/m²/day)
-    dr = 1 + 0.033 * math.cos(2 * math.pi * day_of_year / 365)
-    Gsc = 0.0820  # Solar constant
-    Ra = (
-        (24 * 60 / math.pi)
-        * Gsc
-        * dr
-        * (
-            ws * math.sin(lat_rad) * math.sin(solar_dec)
-            + math.cos(lat_rad) * math.cos(solar_dec) * math.sin(ws)
-        )
-    )
 
-    # Solar radiation
-    if weather.solar_radiation is not None:
-        Rs = weather.solar_radiation
-    elif weather.sunshine_hours is not None:
-        # Angstrom formula
-        N = 24 * ws / math.pi  # Daylight hours
-        n = weather.sunshine_hours
-        Rs = (0.25 + 0.50 * n / N) * Ra
-    else:
-        # Estimate from temperature range (Hargreaves)
-        kRs = 0.16  # Interior location
-        Rs = kRs * math.sqrt(T_max - T_min) * Ra
-
-    # Clear-sky radiation
-    Rso = (0.75 + 2e-5 * weather.altitude) * Ra
-
-    # Net shortwave radiation
-    albedo = 0.23
-    Rns = (1 - albedo) * Rs
-
-    # Net longwave radiation
-    sigma = 4.903e-9  # Stefan-Boltzmann constant
-    Rs_Rso = min(Rs / Rso, 1.0) if Rso > 0 else 0.5
-    Rnl = (
-        sigma
-        * ((T_max + 273.16) ** 4 + (T_min + 273.16) ** 4)
-        / 2
-        * (0.34 - 0.14 * math.sqrt(ea))
-        * (1.35 * Rs_Rso - 0.35)
-    )
+class FieldWaterBalanceResult(BaseModel):
+    """Water balance of one field over the requested days"""
 
-    # Net radiation
-    Rn = Rns - Rnl
+    field_id: str
+    kc: float
+    root_depth: float
+    total_available_water: float
+    daily_balance: list[dict]
+    available_water: float = Field(..., description="Available water after the last day (mm)")
+    moisture_depletion_percent: float
+    estimated_moisture: float = Field(..., description="Estimated soil moisture (m³/m³)")
+    status: str
+    status_ar: str
+    urgency: UrgencyLevel
+    irrigation_needed: bool
+    recommended_amount_mm: float
+    gross_irrigation_mm: float
+    next_irrigation_days: int
 
-    # Soil heat flux (assumed 0 for daily calculation)
-    G = 0
 
-    # Wind speed (convert if needed, assume at 2m)
-    u2 = weather.wind_speed
+class WaterBalanceBatchResponse(BaseModel):
+    """Batch water balance response"""
 
-    # FAO-56 Penman-Monteith equation
-    numerator = 0.408 * delta * (Rn - G) + gamma * (900 / (T_mean + 273)) * u2 * vpd
-    denominator = delta + gamma * (1 + 0.34 * u2)
+    calculation_id: str
+    field_count: int
+    field_days: int
+    results: list[FieldWaterBalanceResult]
+
+
+class FieldSoilMoistureState(BaseModel):
+    """Current virtual soil moisture state of a registered field"""
+
+    field_id: str
+    as_of: date | None
+    available_water: float
+    total_available_water: float
+    moisture_depletion_percent: float
+    estimated_moisture: float
+    status: str
+    status_ar: str
+    urgency: UrgencyLevel
+    pending_days: int
 
-    ET0 = numerator / denominator
 
-    return max(0, ET0)  # ET0 cannot be negative
+# ═══════════════════════════════════════════════════════════════════════════════
+# Calculation Functions
+# دوال الحساب
+# ═══════════════════════════════════════════════════════════════════════════════
+
+
+def calculate_et0_penman_monteith(weather: WeatherInput) -> float:
+    """
+    Calculate reference evapotranspiration using FAO-56 Penman-Monteith equation.
+    حساب التبخر-نتح المرجعي باستخدام معادلة بنمان-مونتيث FAO-56
+
+    ET0 = [0.408 Δ(Rn-G) + γ(900/(T+273))u2(es-ea)] / [Δ + γ(1+0.34u2)]
+    """
+    return float(
+        fao56.reference_et0(
+            t_max=weather.temperature_max,
+            t_min=weather.temperature_min,
+            humidity=weather.humidity,
+            wind_speed=weather.wind_speed,
+            latitude=weather.latitude,
+            day_of_year=weather.calculation_date.timetuple().tm_yday,
+            altitude=weather.altitude,
+            solar_radiation=weather.solar_radiation,
+            sunshine_hours=weather.sunshine_hours,
+        )
+    )
 
 
 def get_crop_kc(crop_type: str, growth_stage: GrowthStage, days_in_stage: int = None) -> float:
@@ -770,45 +792,23 @@ def estimate_soil_moisture(
     today = date.today()
     days_elapsed = (today - last_irrigation_date).days
 
-    # Effective rainfall (assume 80% efficiency)
-    effective_rainfall = rainfall_since * 0.80
-
-    # Total water input
-    water_input = min(last_irrigation_amount + effective_rainfall, taw)
-
-    # Total ET loss
-    total_et_loss = daily_etc * days_elapsed
-
-    # Remaining available water
-    remaining_aw = max(0, water_input - total_et_loss)
+    # Remaining available water after ET losses (80% of rainfall is effective)
+    remaining_aw, total_et_loss = fao56.available_water_since_irrigation(
+        taw, last_irrigation_amount, rainfall_since, daily_etc, days_elapsed
+    )
+    remaining_aw = float(remaining_aw)
+    total_et_loss = float(total_et_loss)
 
     # Depletion percentage
-    depletion_percent = ((taw - remaining_aw) / taw * 100) if taw > 0 else 100
+    depletion_percent = float(fao56.depletion_percent(remaining_aw, taw))
 
     # Estimate moisture content (m³/m³)
     moisture_content = soil["wilting_point"] + (remaining_aw / (root_depth * 1000))
 
     # Status determination
-    if depletion_percent < 30:
-        status = "optimal"
-        status_ar = "مثالي"
-        urgency = UrgencyLevel.NONE
-    elif depletion_percent < 50:
-        status = "adequate"
-        status_ar = "كافي"
-        urgency = UrgencyLevel.LOW
-    elif depletion_percent < 70:
-        status = "moderate_stress"
-        status_ar = "إجهاد متوسط"
-        urgency = UrgencyLevel.MEDIUM
-    elif depletion_percent < 85:
-        status = "high_stress"
-        status_ar = "إجهاد عالي"
-        urgency = UrgencyLevel.HIGH
-    else:
-        status = "critical"
-        status_ar = "حرج"
-        urgency = UrgencyLevel.CRITICAL
+    status, status_ar, urgency = MOISTURE_STATUS_LEVELS[
+        int(fao56.moisture_status_index(depletion_percent))
+    ]
 
     return {
         "moisture_content": moisture_content,
@@ -845,26 +845,22 @@ def calculate_irrigation_recommendation(
 
     # Management Allowed Depletion (MAD) - typically 50% of TAW
     p = crop.get("depletion_fraction", 0.5)
-    mad_percent = p * 100
 
     depletion = moisture_status["depletion_percent"]
-    taw = moisture_status["total_aw"]
-    remaining_aw = moisture_status["remaining_aw"]
 
-    # Check if irrigation is needed
-    irrigation_needed = depletion > (mad_percent - 10)  # Start 10% before MAD
+    # Irrigation need starts 10% before MAD; refill to field capacity
+    need = fao56.irrigation_requirement(
+        moisture_status["total_aw"], moisture_status["remaining_aw"], etc, p, efficiency
+    )
+    irrigation_needed = bool(need["irrigation_needed"])
+    days_until_needed = int(need["days_until_needed"])
 
     warnings = []
     warnings_ar = []
 
-    # Calculate required irrigation
     if irrigation_needed:
-        # Refill to field capacity
-        deficit = taw - remaining_aw
-        recommended_mm = deficit * 1.1  # 10% extra for distribution uniformity
-
-        # Gross irrigation (accounting for efficiency)
-        gross_mm = recommended_mm / efficiency
+        recommended_mm = float(need["net_mm"])
+        gross_mm = float(need["gross_mm"])  # Accounting for efficiency
 
         # Convert to volume
         recommended_liters = recommended_mm * field_area_hectares * 10000  # 1 mm = 10 m³/ha
@@ -875,15 +871,6 @@ def calculate_irrigation_recommendation(
         recommended_liters = 0
         recommended_m3 = 0
 
-    # Calculate days until next irrigation needed
-    if etc > 0:
-        allowable_depletion_mm = taw * p
-        current_depletion_mm = taw - remaining_aw
-        remaining_allowable = allowable_depletion_mm - current_depletion_mm
-        days_until_needed = max(0, int(remaining_allowable / etc))
-    else:
-        days_until_needed = 7  # Default
-
     # Optimal timing advice
     if moisture_status["urgency"] == UrgencyLevel.CRITICAL:
         optimal_time = "Immediately - early morning preferred"
@@ -941,6 +928,294 @@ def calculate_irrigation_recommendation(
     }
 
 
+def get_root_depth(crop_type: str, growth_stage: GrowthStage) -> float:
+    """Effective root depth (m) for the crop's growth stage"""
+    max_root = CROP_COEFFICIENTS[crop_type]["root_depth_max"]
+    if growth_stage == GrowthStage.INITIAL:
+        return max_root * 0.3
+    elif growth_stage == GrowthStage.DEVELOPMENT:
+        return max_root * 0.6
+    return max_root
+
+
+def calculate_water_balance_batch(fields: list[FieldWaterBalanceInput]) -> dict:
+    """
+    Daily ET0, ETc and soil water balance for many fields in one pass.
+    حساب ميزان الماء اليومي لعدة حقول دفعة واحدة
+
+    Field-days are packed into (fields x days) arrays for the shared FAO-56
+    engine. Shorter series are padded with empty days (no weather, rain or
+    irrigation), which leave the water balance unchanged.
+    """
+    n = len(fields)
+    lengths = np.array([len(f.days) for f in fields], dtype=np.int64)
+    rows = np.array(
+        [
+            (
+                d.temperature_max,
+                d.temperature_min,
+                d.humidity,
+                d.wind_speed,
+                d.solar_radiation,
+                d.sunshine_hours,
+                d.rainfall,
+                d.irrigation,
+                d.day.timetuple().tm_yday,
+            )
+            for f in fields
+            for d in f.days
+        ],
+        dtype=np.float64,
+    ).reshape(-1, 9)
+    row_field = np.repeat(np.arange(n), lengths)
+    row_day = np.arange(len(rows)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    columns = np.full((9, n, int(lengths.max(initial=0))), np.nan)
+    columns[:, row_field, row_day] = rows.T
+    t_max, t_min, humidity, wind_speed, solar, sunshine, rainfall, irrigation, day_of_year = columns
+
+    crops = [CROP_COEFFICIENTS[f.crop_type] for f in fields]
+    soils = [SOIL_PROPERTIES[f.soil_type] for f in fields]
+    kc = np.array([get_crop_kc(f.crop_type, f.growth_stage) for f in fields])
+    root_depth = np.array(
+        [f.root_depth or get_root_depth(f.crop_type, f.growth_stage) for f in fields]
+    )
+    wilting_point = np.array([soil["wilting_point"] for soil in soils])
+    field_capacity = np.array([soil["field_capacity"] for soil in soils])
+    taw = (field_capacity - wilting_point) * root_depth * 1000
+    # Fields without a starting state (None -> NaN) start at field capacity
+    initial = np.array([f.initial_available_water for f in fields], dtype=np.float64)
+    initial = np.where(np.isnan(initial), taw, np.minimum(initial, taw))
+
+    latitude = np.array([f.latitude for f in fields])[:, None]
+    altitude = np.array([f.altitude for f in fields])[:, None]
+    et0 = fao56.reference_et0(
+        t_max, t_min, humidity, wind_speed, latitude, day_of_year, altitude, solar, sunshine
+    )
+    grid = fao56.daily_water_balance(
+        et0,
+        kc[:, None],
+        taw,
+        initial,
+        np.nan_to_num(rainfall),
+        np.nan_to_num(irrigation),
+    )
+
+    available = grid.final_available_water
+    depletion = grid.final_depletion_percent
+    requirement = fao56.irrigation_requirement(
+        taw,
+        available,
+        grid.etc[np.arange(n), lengths - 1],
+        np.array([crop.get("depletion_fraction", 0.5) for crop in crops]),
+        np.array([IRRIGATION_EFFICIENCY[f.irrigation_method] for f in fields]),
+    )
+
+    return {
+        "grid": grid,
+        "days": lengths,
+        "kc": kc,
+        "root_depth": root_depth,
+        "total_available_water": taw,
+        "available_water": available,
+        "depletion_percent": depletion,
+        "moisture_content": wilting_point + available / (root_depth * 1000),
+        "status_index": fao56.moisture_status_index(depletion),
+        **requirement,
+    }
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Virtual Soil Moisture State (nightly refresh)
+# حالة رطوبة التربة الافتراضية (تحديث ليلي)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+SOIL_MOISTURE_REFRESH_ENABLED = os.getenv("SOIL_MOISTURE_REFRESH_ENABLED", "true").lower() == "true"
+SOIL_MOISTURE_REFRESH_HOUR = int(os.getenv("SOIL_MOISTURE_REFRESH_HOUR", "1"))  # UTC
+
+
+def _state_snapshot(config: FieldSensorConfig, available_water: float | None) -> dict:
+    """Water state of one field at the given available water (full root zone if None)"""
+    root_depth = config.root_depth or get_root_depth(config.crop_type, config.growth_stage)
+    taw, _, _ = calculate_available_water(config.soil_type, root_depth)
+    available = taw if available_water is None else min(available_water, taw)
+    depletion = float(fao56.depletion_percent(available, taw))
+    return {
+        "available_water": available,
+        "total_available_water": taw,
+        "depletion_percent": depletion,
+        "moisture_content": SOIL_PROPERTIES[config.soil_type]["wilting_point"]
+        + available / (root_depth * 1000),
+        "status_index": int(fao56.moisture_status_index(depletion)),
+    }
+
+
+class SoilMoistureStateStore:
+    """
+    مخزن حالة رطوبة التربة الافتراضية
+    Virtual soil moisture state of every registered field.
+
+    Daily inputs are queued per field; refresh() folds them into the state,
+    advancing all fields to the same day in one batch water balance run.
+    Days without recorded weather reuse the field's latest weather, with no
+    rain or irrigation.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._fields: dict[str, FieldSensorConfig] = {}
+        self._state: dict[str, dict] = {}
+        self._pending: dict[str, dict[date, DailyWaterInput]] = {}
+        self._last_weather: dict[str, DailyWaterInput] = {}
+        self.last_refresh: dict | None = None
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def __contains__(self, field_id: str) -> bool:
+        return field_id in self._fields
+
+    def register(self, field_id: str, registration: FieldSensorRegistration) -> None:
+        """Add or update a field; a given available water resets its state"""
+        config = FieldSensorConfig(**registration.model_dump(exclude={"available_water", "as_of"}))
+        with self._lock:
+            state = self._state.get(field_id, {"available_water": None, "as_of": None})
+            if registration.available_water is not None:
+                state["available_water"] = registration.available_water
+                state["as_of"] = registration.as_of or date.today()
+            self._fields[field_id] = config
+            self._state[field_id] = {
+                **_state_snapshot(config, state["available_water"]),
+                "as_of": state["as_of"],
+            }
+            self._pending.setdefault(field_id, {})
+
+    def record(self, field_id: str, days: list[DailyWaterInput]) -> None:
+        """Queue daily inputs; days already folded into the state are ignored"""
+        with self._lock:
+            as_of = self._state[field_id]["as_of"]
+            pending = self._pending[field_id]
+            for day in days:
+                if as_of is None or day.day > as_of:
+                    pending[day.day] = day
+
+    def get(self, field_id: str) -> FieldSoilMoistureState | None:
+        with self._lock:
+            if field_id not in self._fields:
+                return None
+            state = self._state[field_id]
+            status, status_ar, urgency = MOISTURE_STATUS_LEVELS[state["status_index"]]
+            return FieldSoilMoistureState(
+                field_id=field_id,
+                as_of=state["as_of"],
+                available_water=round(state["available_water"], 2),
+                total_available_water=round(state["total_available_water"], 2),
+                moisture_depletion_percent=round(state["depletion_percent"], 1),
+                estimated_moisture=round(state["moisture_content"], 3),
+                status=status,
+                status_ar=status_ar,
+                urgency=urgency,
+                pending_days=len(self._pending[field_id]),
+            )
+
+    def refresh(self, until: date) -> dict:
+        """Advance every field's water balance through ``until``"""
+        started = time.perf_counter()
+        with self._lock:
+            batch, skipped = self._collect(until)
+
+        if batch:
+            result = calculate_water_balance_batch(batch)
+            with self._lock:
+                for i, field in enumerate(batch):
+                    if field.field_id not in self._fields:
+                        continue
+                    self._state[field.field_id] = {
+                        "available_water": float(result["available_water"][i]),
+                        "total_available_water": float(result["total_available_water"][i]),
+                        "depletion_percent": float(result["depletion_percent"][i]),
+                        "moisture_content": float(result["moisture_content"][i]),
+                        "status_index": int(result["status_index"][i]),
+                        "as_of": until,
+                    }
+                    self._last_weather[field.field_id] = field.days[-1]
+                    # Only the inputs folded in; days recorded meanwhile stay queued
+                    pending = self._pending[field.field_id]
+                    for day in field.days:
+                        if pending.get(day.day) is day:
+                            del pending[day.day]
+
+        self.last_refresh = {
+            "as_of": until.isoformat(),
+            "fields_refreshed": len(batch),
+            "fields_skipped": skipped,
+            "field_days": sum(len(f.days) for f in batch),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+        return self.last_refresh
+
+    def _collect(self, until: date) -> tuple[list[FieldWaterBalanceInput], int]:
+        batch, skipped = [], 0
+        for field_id, config in self._fields.items():
+            state = self._state[field_id]
+            pending = self._pending[field_id]
+            if state["as_of"] is not None:
+                start = state["as_of"] + timedelta(days=1)
+            elif pending:
+                start = min(pending)
+            else:
+                start = None
+            weather = self._last_weather.get(field_id) or (
+                pending[min(pending)] if pending else None
+            )
+            if start is None or start > until or weather is None:
+                skipped += 1
+                continue
+
+            days = []
+            for offset in range((until - start).days + 1):
+                day = start + timedelta(days=offset)
+                if day in pending:
+                    weather = pending[day]
+                    days.append(weather)
+                else:
+                    days.append(
+                        weather.model_copy(update={"day": day, "rainfall": 0, "irrigation": 0})
+                    )
+            batch.append(
+                FieldWaterBalanceInput.model_construct(
+                    **dict(config),
+                    field_id=field_id,
+                    initial_available_water=state["available_water"],
+                    days=days,
+                )
+            )
+        return batch, skipped
+
+
+soil_moisture_store = SoilMoistureStateStore()
+
+
+def seconds_until_refresh(now: datetime | None = None) -> float:
+    """Seconds until the next nightly refresh (UTC)"""
+    now = now or datetime.utcnow()
+    run_at = now.replace(hour=SOIL_MOISTURE_REFRESH_HOUR, minute=0, second=0, microsecond=0)
+    if run_at <= now:
+        run_at += timedelta(days=1)
+    return (run_at - now).total_seconds()
+
+
+async def run_nightly_soil_moisture_refresh() -> None:
+    """Refresh every field's soil moisture through yesterday, once a night"""
+    while True:
+        await asyncio.sleep(seconds_until_refresh())
+        yesterday = datetime.utcnow().date() - timedelta(days=1)
+        try:
+            summary = await asyncio.to_thread(soil_moisture_store.refresh, yesterday)
+            logger.info(f"Nightly soil moisture refresh: {summary}")
+        except Exception as e:
+            logger.error(f"Nightly soil moisture refresh failed: {e}")
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # FastAPI Application
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -952,7 +1227,15 @@ async def lifespan(app: FastAPI):
     print(f"🌱 {SERVICE_NAME} v{SERVICE_VERSION} starting on port {SERVICE_PORT}")
     print(f"📊 Loaded {len(CROP_COEFFICIENTS)} crop types with Kc values")
     print(f"🌍 Loaded {len(SOIL_PROPERTIES)} soil types")
+    refresh_task = None
+    if SOIL_MOISTURE_REFRESH_ENABLED:
+        refresh_task = asyncio.create_task(run_nightly_soil_moisture_refresh())
+        print(f"🌙 Nightly soil moisture refresh at {SOIL_MOISTURE_REFRESH_HOUR:02d}:00 UTC")
     yield
+    if refresh_task:
+        refresh_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await refresh_task
     print(f"👋 {SERVICE_NAME} shutting down")
 
 
@@ -1023,6 +1306,8 @@ async def service_info():
             "Virtual soil moisture estimation",
             "Irrigation scheduling",
             "Water balance tracking",
+            "Batch water balance (fields x days)",
+            "Nightly virtual soil moisture refresh",
         ],
         "supported_crops": len(CROP_COEFFICIENTS),
         "supported_soils": len(SOIL_PROPERTIES),
@@ -1221,6 +1506,118 @@ async def estimate_virtual_soil_moisture(input_data: SoilMoistureInput):
     )
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+# Batch Water Balance & Soil Moisture State
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+def _require_known_crops(crop_types: set[str]) -> None:
+    unknown = sorted(crop_types - CROP_COEFFICIENTS.keys())
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Crops not found: {', '.join(unknown)}")
+
+
+@app.post("/v1/water-balance/batch", response_model=WaterBalanceBatchResponse)
+async def water_balance_batch(request: WaterBalanceBatchRequest):
+    """
+    Daily ET0, ETc and soil water balance for many fields in one call.
+    حساب التبخر-نتح وميزان الماء اليومي لعدة حقول في طلب واحد
+    """
+    _require_known_crops({f.crop_type for f in request.fields})
+
+    result = await asyncio.to_thread(calculate_water_balance_batch, request.fields)
+    grid = result["grid"]
+    daily_columns = {
+        "et0": np.round(grid.et0, 2).tolist(),
+        "etc": np.round(grid.etc, 2).tolist(),
+        "effective_rainfall": np.round(grid.effective_rainfall, 2).tolist(),
+        "drainage": np.round(grid.drainage, 2).tolist(),
+        "available_water": np.round(grid.available_water, 2).tolist(),
+        "depletion_percent": np.round(grid.depletion_percent, 1).tolist(),
+    }
+
+    results = []
+    for i, field in enumerate(request.fields):
+        status, status_ar, urgency = MOISTURE_STATUS_LEVELS[int(result["status_index"][i])]
+        rows = zip(*(column[i] for column in daily_columns.values()))
+        results.append(
+            FieldWaterBalanceResult(
+                field_id=field.field_id,
+                kc=round(float(result["kc"][i]), 2),
+                root_depth=round(float(result["root_depth"][i]), 2),
+                total_available_water=round(float(result["total_available_water"][i]), 2),
+                daily_balance=[
+                    {"day": day.day, **dict(zip(daily_columns, values, strict=True))}
+                    for day, values in zip(field.days, rows)
+                ],
+                available_water=round(float(result["available_water"][i]), 2),
+                moisture_depletion_percent=round(float(result["depletion_percent"][i]), 1),
+                estimated_moisture=round(float(result["moisture_content"][i]), 3),
+                status=status,
+                status_ar=status_ar,
+                urgency=urgency,
+                irrigation_needed=bool(result["irrigation_needed"][i]),
+                recommended_amount_mm=round(float(result["net_mm"][i]), 1),
+                gross_irrigation_mm=round(float(result["gross_mm"][i]), 1),
+                next_irrigation_days=int(result["days_until_needed"][i]),
+            )
+        )
+
+    return WaterBalanceBatchResponse(
+        calculation_id=str(uuid.uuid4()),
+        field_count=len(results),
+        field_days=int(result["days"].sum()),
+        results=results,
+    )
+
+
+@app.put("/v1/fields/{field_id}/soil-moisture-state", response_model=FieldSoilMoistureState)
+async def register_field_soil_moisture(field_id: str, registration: FieldSensorRegistration):
+    """
+    Register a field for the nightly soil moisture refresh.
+    تسجيل حقل لتحديث رطوبة التربة الليلي
+    """
+    _require_known_crops({registration.crop_type})
+    soil_moisture_store.register(field_id, registration)
+    return soil_moisture_store.get(field_id)
+
+
+@app.post("/v1/fields/{field_id}/daily-inputs", response_model=FieldSoilMoistureState)
+async def record_field_daily_inputs(field_id: str, days: list[DailyWaterInput]):
+    """
+    Record daily weather, rainfall and irrigation for the next refresh.
+    تسجيل الطقس والأمطار والري اليومية للتحديث القادم
+    """
+    if field_id not in soil_moisture_store:
+        raise HTTPException(status_code=404, detail=f"Field '{field_id}' not registered")
+    soil_moisture_store.record(field_id, days)
+    return soil_moisture_store.get(field_id)
+
+
+@app.get("/v1/fields/{field_id}/soil-moisture-state", response_model=FieldSoilMoistureState)
+async def get_field_soil_moisture(field_id: str):
+    """
+    Current virtual soil moisture of a registered field.
+    رطوبة التربة الافتراضية الحالية للحقل
+    """
+    state = soil_moisture_store.get(field_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail=f"Field '{field_id}' not registered")
+    return state
+
+
+@app.post("/v1/soil-moisture/refresh")
+async def refresh_soil_moisture(
+    until: date | None = Query(None, description="Last day to include (default: yesterday UTC)"),
+):
+    """
+    Run the nightly soil moisture refresh now.
+    تشغيل تحديث رطوبة التربة الليلي الآن
+    """
+    until = until or datetime.utcnow().date() - timedelta(days=1)
+    return await asyncio.to_thread(soil_moisture_store.refresh, until)
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Irrigation Recommendation
 # ─────────────────────────────────────────────────────────────────────────────
@@ -1259,13 +1656,7 @@ async def get_irrigation_recommendation(input_data: IrrigationRecommendationInpu
     etc = et0 * kc
 
     # Get root depth based on growth stage
-    max_root = crop["root_depth_max"]
-    if input_data.growth_stage == GrowthStage.INITIAL:
-        root_depth = max_root * 0.3
-    elif input_data.growth_stage == GrowthStage.DEVELOPMENT:
-        root_depth = max_root * 0.6
-    else:
-        root_depth = max_root
+    root_depth = get_root_depth(input_data.crop_type, input_data.growth_stage)
 
     # Estimate soil moisture
     last_irr_date = input_data.last_irrigation_date or (date.today() - timedelta(days=7))
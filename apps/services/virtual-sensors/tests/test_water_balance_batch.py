@@ -0,0 +1,340 @@
+"""
+SAHOOL Virtual Sensors - Batch FAO-56 Engine Tests
+اختبارات محرك FAO-56 الدفعي وتحديث رطوبة التربة الليلي
+"""
+
+import os
+import sys
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import main  # noqa: E402
+from shared import fao56  # noqa: E402
+
+# ET0 from the per-request implementation before the shared engine
+GOLDEN_ET0 = [
+    (
+        {
+            "temperature_max": 34,
+            "temperature_min": 21,
+            "humidity": 45,
+            "wind_speed": 2.5,
+            "latitude": 15.35,
+            "altitude": 2250,
+            "calculation_date": date(2026, 7, 15),
+        },
+        6.383292521008591,
+    ),
+    (
+        {
+            "temperature_max": 29,
+            "temperature_min": 18,
+            "humidity": 60,
+            "wind_speed": 1.2,
+            "latitude": 14.8,
+            "altitude": 10,
+            "sunshine_hours": 9.5,
+            "calculation_date": date(2026, 3, 1),
+        },
+        4.438064637386406,
+    ),
+    (
+        {
+            "temperature_max": 38,
+            "temperature_min": 26,
+            "humidity": 35,
+            "wind_speed": 3.8,
+            "latitude": 13.6,
+            "altitude": 400,
+            "solar_radiation": 24.5,
+            "calculation_date": date(2026, 6, 21),
+        },
+        9.202843819727603,
+    ),
+    (
+        {
+            "temperature_max": 5,
+            "temperature_min": -8,
+            "humidity": 80,
+            "wind_speed": 4,
+            "latitude": 69.5,
+            "calculation_date": date(2026, 12, 21),
+        },
+        0.3662475744771856,
+    ),
+]
+
+
+def _days(start: date, n: int, rain_day: int | None = None) -> list[main.DailyWaterInput]:
+    return [
+        main.DailyWaterInput(
+            day=start + timedelta(days=i),
+            temperature_max=33 + i % 3,
+            temperature_min=19,
+            humidity=40,
+            wind_speed=2.0,
+            sunshine_hours=10 if i % 2 else None,
+            rainfall=20 if i == rain_day else 0,
+        )
+        for i in range(n)
+    ]
+
+
+def _field(field_id: str, days: list, **overrides) -> main.FieldWaterBalanceInput:
+    values = {
+        "field_id": field_id,
+        "crop_type": "wheat",
+        "growth_stage": main.GrowthStage.MID_SEASON,
+        "soil_type": main.SoilType.LOAM,
+        "latitude": 15.3,
+        "altitude": 2200,
+        "days": days,
+    }
+    values.update(overrides)
+    return main.FieldWaterBalanceInput(**values)
+
+
+class TestReferenceET0:
+    """Test the vectorized ET0 against the scalar results"""
+
+    @pytest.mark.parametrize(("weather", "expected"), GOLDEN_ET0)
+    def test_scalar_wrapper_matches_previous_results(self, weather, expected):
+        et0 = main.calculate_et0_penman_monteith(main.WeatherInput(**weather))
+
+        assert et0 == pytest.approx(expected, rel=1e-12)
+
+    def test_grid_matches_scalar_calls(self):
+        rng = np.random.default_rng(7)
+        n = 500
+        t_min = rng.uniform(-5, 30, n)
+        t_max = t_min + rng.uniform(0, 20, n)
+        humidity = rng.uniform(5, 100, n)
+        wind = rng.uniform(0, 6, n)
+        latitude = rng.uniform(-50, 50, n)
+        altitude = rng.uniform(0, 3000, n)
+        day_of_year = rng.integers(1, 366, n)
+        solar = np.where(rng.random(n) < 0.3, rng.uniform(5, 30, n), np.nan)
+        sunshine = np.where(rng.random(n) < 0.5, rng.uniform(0, 12, n), np.nan)
+
+        grid = fao56.reference_et0(
+            t_max, t_min, humidity, wind, latitude, day_of_year, altitude, solar, sunshine
+        )
+
+        for i in range(n):
+            weather = main.WeatherInput(
+                temperature_max=t_max[i],
+                temperature_min=t_min[i],
+                humidity=humidity[i],
+                wind_speed=wind[i],
+                latitude=latitude[i],
+                altitude=altitude[i],
+                solar_radiation=None if np.isnan(solar[i]) else solar[i],
+                sunshine_hours=None if np.isnan(sunshine[i]) else sunshine[i],
+                calculation_date=date(2026, 1, 1) + timedelta(days=int(day_of_year[i]) - 1),
+            )
+            assert grid[i] == pytest.approx(main.calculate_et0_penman_monteith(weather), rel=1e-12)
+
+
+class TestWaterBalance:
+    """Test the daily root-zone water balance"""
+
+    def test_matches_since_irrigation_estimate(self):
+        """Day-by-day balance equals the lumped estimate for constant ETc"""
+        taw, irrigation, rainfall, etc = 90.0, 60.0, 25.0, 6.5
+        rain = np.zeros((1, 12))
+        rain[0, 0] = rainfall
+        water = np.zeros((1, 12))
+        water[0, 0] = irrigation
+
+        grid = fao56.daily_water_balance(etc, 1.0, taw, 0.0, rain, water)
+
+        for day in range(12):
+            expected, _ = fao56.available_water_since_irrigation(
+                taw, irrigation, rainfall, etc, day + 1
+            )
+            assert grid.available_water[0, day] == pytest.approx(float(expected))
+
+    def test_inputs_above_capacity_drain(self):
+        grid = fao56.daily_water_balance([[4.0, 4.0]], 1.0, 50.0, 40.0, [[0, 30]], [[20, 0]])
+
+        assert grid.drainage[0].tolist() == pytest.approx([10.0, 20.0])
+        assert grid.available_water[0].tolist() == pytest.approx([46.0, 46.0])
+        assert grid.depletion_percent[0, 0] == pytest.approx(8.0)
+
+    def test_status_thresholds(self):
+        statuses = fao56.moisture_status_index([0, 29.9, 30, 50, 69.9, 70, 85, 100])
+
+        assert statuses.tolist() == [0, 0, 1, 2, 2, 3, 4, 4]
+
+    def test_batch_matches_single_field_runs(self):
+        fields = [
+            _field("a", _days(date(2026, 7, 1), 10, rain_day=3)),
+            _field(
+                "b",
+                _days(date(2026, 7, 1), 4),
+                crop_type="tomato",
+                growth_stage=main.GrowthStage.INITIAL,
+                soil_type=main.SoilType.SANDY,
+                initial_available_water=6.0,
+            ),
+        ]
+
+        batch = main.calculate_water_balance_batch(fields)
+
+        for i, field in enumerate(fields):
+            single = main.calculate_water_balance_batch([field])
+            for key in ("available_water", "depletion_percent", "gross_mm", "days_until_needed"):
+                assert batch[key][i] == pytest.approx(single[key][0])
+        # The short field's padding days change nothing
+        assert batch["grid"].available_water[1, 3:].tolist() == pytest.approx(
+            [batch["available_water"][1]] * 7
+        )
+
+
+class TestSoilMoistureRefresh:
+    """Test the nightly refresh of registered fields"""
+
+    @pytest.fixture
+    def store(self):
+        return main.SoilMoistureStateStore()
+
+    def _register(self, store, field_id="f1", **overrides):
+        values = {
+            "crop_type": "maize",
+            "growth_stage": main.GrowthStage.MID_SEASON,
+            "soil_type": main.SoilType.CLAY_LOAM,
+            "latitude": 15.0,
+        }
+        values.update(overrides)
+        store.register(field_id, main.FieldSensorRegistration(**values))
+
+    def test_refresh_matches_batch_balance(self, store):
+        days = _days(date(2026, 7, 1), 5, rain_day=1)
+        self._register(store)
+        store.record("f1", days)
+
+        summary = store.refresh(date(2026, 7, 5))
+
+        expected = main.calculate_water_balance_batch(
+            [
+                _field(
+                    "f1",
+                    days,
+                    crop_type="maize",
+                    soil_type=main.SoilType.CLAY_LOAM,
+                    latitude=15.0,
+                    altitude=0,
+                )
+            ]
+        )
+        state = store.get("f1")
+        assert summary["fields_refreshed"] == 1
+        assert summary["field_days"] == 5
+        assert state.as_of == date(2026, 7, 5)
+        assert state.pending_days == 0
+        assert state.available_water == pytest.approx(
+            round(float(expected["available_water"][0]), 2)
+        )
+
+    def test_missing_days_reuse_latest_weather(self, store):
+        days = _days(date(2026, 7, 1), 2)
+        self._register(store)
+        store.record("f1", days)
+        store.refresh(date(2026, 7, 2))
+        before = store.get("f1").available_water
+
+        summary = store.refresh(date(2026, 7, 4))
+
+        assert summary["field_days"] == 2
+        assert store.get("f1").as_of == date(2026, 7, 4)
+        assert store.get("f1").available_water < before
+
+    def test_days_recorded_during_refresh_stay_queued(self, store, monkeypatch):
+        days = _days(date(2026, 7, 1), 4)
+        self._register(store)
+        store.record("f1", days[:2])
+        batch_balance = main.calculate_water_balance_batch
+
+        def record_meanwhile(batch):
+            store.record("f1", days[2:])
+            return batch_balance(batch)
+
+        monkeypatch.setattr(main, "calculate_water_balance_batch", record_meanwhile)
+        store.refresh(date(2026, 7, 3))
+
+        assert store.get("f1").pending_days == 2
+
+    def test_fields_without_weather_are_skipped(self, store):
+        self._register(store, available_water=40.0, as_of=date(2026, 7, 1))
+
+        summary = store.refresh(date(2026, 7, 3))
+
+        assert summary["fields_skipped"] == 1
+        assert store.get("f1").available_water == 40.0
+
+    def test_refresh_time_is_next_run(self):
+        run_at = datetime(2026, 7, 1, main.SOIL_MOISTURE_REFRESH_HOUR)
+
+        assert main.seconds_until_refresh(run_at - timedelta(minutes=30)) == 1800
+        assert main.seconds_until_refresh(run_at) == 86400
+
+
+class TestBatchEndpoint:
+    """Test the batch water balance API"""
+
+    @pytest.fixture
+    def client(self):
+        return TestClient(main.app)
+
+    def test_batch_endpoint(self, client):
+        days = [d.model_dump(mode="json") for d in _days(date(2026, 7, 1), 3)]
+        payload = {
+            "fields": [
+                {
+                    "field_id": "a",
+                    "crop_type": "wheat",
+                    "growth_stage": "mid_season",
+                    "soil_type": "loam",
+                    "latitude": 15.3,
+                    "days": days,
+                },
+                {
+                    "field_id": "b",
+                    "crop_type": "onion",
+                    "growth_stage": "initial",
+                    "soil_type": "sandy",
+                    "latitude": 14.5,
+                    "days": days[:1],
+                },
+            ]
+        }
+
+        response = client.post("/v1/water-balance/batch", json=payload)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["field_days"] == 4
+        assert [len(r["daily_balance"]) for r in data["results"]] == [3, 1]
+        assert data["results"][0]["daily_balance"][0]["day"] == "2026-07-01"
+
+    def test_unknown_crop_returns_404(self, client):
+        days = [d.model_dump(mode="json") for d in _days(date(2026, 7, 1), 1)]
+        payload = {
+            "fields": [
+                {
+                    "field_id": "a",
+                    "crop_type": "not_a_crop",
+                    "growth_stage": "mid_season",
+                    "soil_type": "loam",
+                    "latitude": 15.3,
+                    "days": days,
+                }
+            ]
+        }
+
+        assert client.post("/v1/water-balance/batch", json=payload).status_code == 404
@@ -1017,6 +1017,7 @@ CREATE TABLE IF NOT EXISTS chat_threads (
     is_archived BOOLEAN DEFAULT false,
     last_message_at TIMESTAMPTZ,
     message_count INTEGER DEFAULT 0,
+    event_seq INTEGER NOT NULL DEFAULT 0,
     created_at TIMESTAMPTZ DEFAULT NOW(),
     UNIQUE(tenant_id, scope_type, scope_id)
 );
@@ -1077,6 +1078,82 @@ CREATE TABLE IF NOT EXISTS chat_attachments (
 
 CREATE INDEX IF NOT EXISTS idx_attachments_message ON chat_attachments(message_id);
 
+-- Chat Event Log (سجل أحداث المحادثات)
+-- Appended with every chat change; gap-free seq per thread (chat_threads.event_seq)
+CREATE TABLE IF NOT EXISTS chat_events (
+    id BIGSERIAL PRIMARY KEY,
+    tenant_id VARCHAR(64) NOT NULL,
+    thread_id UUID NOT NULL,
+    seq INTEGER NOT NULL,
+    event_type VARCHAR(64) NOT NULL,
+    payload JSONB NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    UNIQUE (thread_id, seq)
+);
+
+-- Chat Inbox Read Model (صندوق الوارد)
+CREATE TABLE IF NOT EXISTS chat_inbox_threads (
+    thread_id UUID PRIMARY KEY,
+    tenant_id VARCHAR(64) NOT NULL,
+    seq INTEGER NOT NULL DEFAULT 0,
+    scope_type VARCHAR(16) NOT NULL,
+    scope_id VARCHAR(128) NOT NULL,
+    created_by VARCHAR(64) NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL,
+    title VARCHAR(255),
+    is_archived BOOLEAN NOT NULL DEFAULT false,
+    message_count INTEGER NOT NULL DEFAULT 0,
+    last_message_id UUID,
+    last_message_preview VARCHAR(255),
+    last_sender_id VARCHAR(64),
+    last_message_at TIMESTAMPTZ,
+    activity_at TIMESTAMPTZ NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_chat_inbox_threads_tenant ON chat_inbox_threads (tenant_id);
+
+CREATE TABLE IF NOT EXISTS chat_inbox (
+    id BIGSERIAL PRIMARY KEY,
+    tenant_id VARCHAR(64) NOT NULL,
+    user_id VARCHAR(64) NOT NULL,
+    thread_id UUID NOT NULL,
+    scope_type VARCHAR(16) NOT NULL,
+    scope_id VARCHAR(128) NOT NULL,
+    created_by VARCHAR(64) NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL,
+    title VARCHAR(255),
+    is_archived BOOLEAN NOT NULL DEFAULT false,
+    message_count INTEGER NOT NULL DEFAULT 0,
+    last_message_id UUID,
+    last_message_preview VARCHAR(255),
+    last_sender_id VARCHAR(64),
+    last_message_at TIMESTAMPTZ,
+    activity_at TIMESTAMPTZ NOT NULL,
+    unread_count INTEGER NOT NULL DEFAULT 0,
+    last_read_message_id UUID,
+    last_read_at TIMESTAMPTZ,
+    joined_at TIMESTAMPTZ,
+    UNIQUE (thread_id, user_id)
+);
+CREATE INDEX IF NOT EXISTS idx_chat_inbox_thread ON chat_inbox (thread_id);
+CREATE INDEX IF NOT EXISTS idx_chat_inbox_user_activity
+    ON chat_inbox (tenant_id, user_id, is_archived, activity_at DESC, thread_id DESC);
+
+-- Chat Message Search (فهرس البحث في الرسائل)
+-- Analyzed Arabic/English text per message, written by the field-chat projection worker
+CREATE TABLE IF NOT EXISTS chat_message_search (
+    message_id UUID PRIMARY KEY,
+    tenant_id VARCHAR(64) NOT NULL,
+    thread_id UUID NOT NULL,
+    sender_id VARCHAR(64) NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL,
+    event_at TIMESTAMPTZ NOT NULL,
+    terms TSVECTOR NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_chat_message_search_terms
+    ON chat_message_search USING GIN (terms);
+CREATE INDEX IF NOT EXISTS idx_chat_message_search_recent
+    ON chat_message_search (tenant_id, created_at DESC, message_id DESC);
+
 -- ─────────────────────────────────────────────────────────────────────────────
 -- SECTION 13: ASTRONOMICAL CALENDAR (أنواء)
 -- ─────────────────────────────────────────────────────────────────────────────
@@ -0,0 +1,83 @@
+-- ═══════════════════════════════════════════════════════════════════════════════
+-- SAHOOL Platform - Chat Event Log and Inbox Read Model
+-- سجل أحداث المحادثات وصندوق الوارد
+-- Version: V20261019
+-- Description: chat_threads.event_seq, chat_events, chat_inbox_threads and
+--              chat_inbox for field-chat. field-chat also applies this on
+--              startup (src/events/store.py ensure_schema); both are idempotent.
+-- ═══════════════════════════════════════════════════════════════════════════════
+
+ALTER TABLE chat_threads ADD COLUMN IF NOT EXISTS event_seq INTEGER NOT NULL DEFAULT 0;
+
+CREATE TABLE IF NOT EXISTS chat_events (
+    id BIGSERIAL PRIMARY KEY,
+    tenant_id VARCHAR(64) NOT NULL,
+    thread_id UUID NOT NULL,
+    seq INTEGER NOT NULL,
+    event_type VARCHAR(64) NOT NULL,
+    payload JSONB NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    UNIQUE (thread_id, seq)
+);
+
+CREATE TABLE IF NOT EXISTS chat_inbox_threads (
+    thread_id UUID PRIMARY KEY,
+    tenant_id VARCHAR(64) NOT NULL,
+    seq INTEGER NOT NULL DEFAULT 0,
+    scope_type VARCHAR(16) NOT NULL,
+    scope_id VARCHAR(128) NOT NULL,
+    created_by VARCHAR(64) NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL,
+    title VARCHAR(255),
+    is_archived BOOLEAN NOT NULL DEFAULT false,
+    message_count INTEGER NOT NULL DEFAULT 0,
+    last_message_id UUID,
+    last_message_preview VARCHAR(255),
+    last_sender_id VARCHAR(64),
+    last_message_at TIMESTAMPTZ,
+    activity_at TIMESTAMPTZ NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_chat_inbox_threads_tenant ON chat_inbox_threads (tenant_id);
+
+CREATE TABLE IF NOT EXISTS chat_inbox (
+    id BIGSERIAL PRIMARY KEY,
+    tenant_id VARCHAR(64) NOT NULL,
+    user_id VARCHAR(64) NOT NULL,
+    thread_id UUID NOT NULL,
+    scope_type VARCHAR(16) NOT NULL,
+    scope_id VARCHAR(128) NOT NULL,
+    created_by VARCHAR(64) NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL,
+    title VARCHAR(255),
+    is_archived BOOLEAN NOT NULL DEFAULT false,
+    message_count INTEGER NOT NULL DEFAULT 0,
+    last_message_id UUID,
+    last_message_preview VARCHAR(255),
+    last_sender_id VARCHAR(64),
+    last_message_at TIMESTAMPTZ,
+    activity_at TIMESTAMPTZ NOT NULL,
+    unread_count INTEGER NOT NULL DEFAULT 0,
+    last_read_message_id UUID,
+    last_read_at TIMESTAMPTZ,
+    joined_at TIMESTAMPTZ,
+    UNIQUE (thread_id, user_id)
+);
+CREATE INDEX IF NOT EXISTS idx_chat_inbox_thread ON chat_inbox (thread_id);
+CREATE INDEX IF NOT EXISTS idx_chat_inbox_user_activity
+    ON chat_inbox (tenant_id, user_id, is_archived, activity_at DESC, thread_id DESC);
+
+DO $$
+BEGIN
+    -- Record migration if _migrations table exists
+    IF EXISTS (
+        SELECT 1 FROM information_schema.tables
+        WHERE table_schema = 'public'
+        AND table_name = '_migrations'
+    ) THEN
+        INSERT INTO public._migrations (name, applied_at)
+        VALUES ('V20261019__chat_event_log_and_inbox', CURRENT_TIMESTAMP)
+        ON CONFLICT (name) DO NOTHING;
+    END IF;
+
+    RAISE NOTICE '✅ Migration V20261019__chat_event_log_and_inbox completed successfully';
+END $$;
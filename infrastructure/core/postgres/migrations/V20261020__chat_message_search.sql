@@ -0,0 +1,39 @@
+-- ═══════════════════════════════════════════════════════════════════════════════
+-- SAHOOL Platform - Chat Message Search Index
+-- فهرس البحث في رسائل المحادثات
+-- Version: V20261020
+-- Description: chat_message_search (tsvector + GIN) for field-chat message
+--              search. field-chat also applies this on startup
+--              (src/search/index.py ensure_schema); both are idempotent.
+--              Existing messages are indexed with src.search.reindex_messages.
+-- ═══════════════════════════════════════════════════════════════════════════════
+
+CREATE TABLE IF NOT EXISTS chat_message_search (
+    message_id UUID PRIMARY KEY,
+    tenant_id VARCHAR(64) NOT NULL,
+    thread_id UUID NOT NULL,
+    sender_id VARCHAR(64) NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL,
+    event_at TIMESTAMPTZ NOT NULL,
+    terms TSVECTOR NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_chat_message_search_terms
+    ON chat_message_search USING GIN (terms);
+CREATE INDEX IF NOT EXISTS idx_chat_message_search_recent
+    ON chat_message_search (tenant_id, created_at DESC, message_id DESC);
+
+DO $$
+BEGIN
+    -- Record migration if _migrations table exists
+    IF EXISTS (
+        SELECT 1 FROM information_schema.tables
+        WHERE table_schema = 'public'
+        AND table_name = '_migrations'
+    ) THEN
+        INSERT INTO public._migrations (name, applied_at)
+        VALUES ('V20261020__chat_message_search', CURRENT_TIMESTAMP)
+        ON CONFLICT (name) DO NOTHING;
+    END IF;
+
+    RAISE NOTICE '✅ Migration V20261020__chat_message_search completed successfully';
+END $$;
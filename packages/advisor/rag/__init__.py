@@ -3,12 +3,16 @@ SAHOOL RAG Module
 Retrieval-Augmented Generation for agricultural knowledge
 """
 
+from .lexical_index import BM25Index, normalize_arabic, tokenize
 from .models import Document, DocumentChunk, SearchResult
 from .service import RAGService
 
 __all__ = [
+    "BM25Index",
     "Document",
     "DocumentChunk",
     "SearchResult",
     "RAGService",
+    "normalize_arabic",
+    "tokenize",
 ]
@@ -0,0 +1,501 @@
+"""
+SAHOOL Local Vector Store
+Embedded approximate-nearest-neighbour index implementing the VectorStore protocol
+
+Runs retrieval in-process without a Qdrant server (small nodes, tests):
+- IVF (inverted file) index: k-means coarse quantizer, only the ``nprobe``
+  closest lists are scanned per query; exact scan until the index is trained
+- int8 scalar quantization with a per-vector scale (4x smaller than float32)
+- Optional memory-mapped storage file with a metadata sidecar, so a
+  collection survives restarts and does not have to fit in RAM
+- Payload filtering by tenant and category
+- Incremental inserts and deletes (deleted slots are reused)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from collections.abc import Callable
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from .doc_store import DocChunk
+
+Embedder = Callable[[list[str]], np.ndarray]
+
+_GLOBAL_TENANT = 0  # code reserved for chunks without a tenant
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _kmeans(data: np.ndarray, k: int, iterations: int, seed: int) -> np.ndarray:
+    """Lloyd's k-means on unit vectors (spherical: centroids re-normalized)."""
+    rng = np.random.default_rng(seed)
+    centroids = data[rng.choice(len(data), size=k, replace=False)].copy()
+    for _ in range(iterations):
+        assign = np.argmax(data @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, data)
+        counts = np.bincount(assign, minlength=k)
+        empty = counts == 0
+        if empty.any():
+            # Re-seed empty lists from random points
+            sums[empty] = data[rng.choice(len(data), size=int(empty.sum()))]
+        centroids = _normalize_rows(sums)
+    return centroids
+
+
+class IVFIndex:
+    """IVF index over int8-quantized unit vectors with cosine scoring.
+
+    Vectors are addressed by string ID and carry a JSON-serializable
+    payload. ``tenant_id`` and ``category`` payload keys are indexed for
+    filtering; a tenant filter also admits global entries (no tenant).
+    """
+
+    def __init__(
+        self,
+        dim: int,
+        path: str | Path | None = None,
+        nlist: int = 256,
+        nprobe: int = 16,
+        train_size: int = 10_000,
+        seed: int = 0,
+    ) -> None:
+        """Initialize the index.
+
+        Args:
+            dim: Vector dimension
+            path: Storage file for memory-mapped codes; None keeps it in RAM
+            nlist: Maximum number of inverted lists
+            nprobe: Lists scanned per query once trained
+            train_size: Vector count that triggers k-means training
+            seed: Random seed for training
+        """
+        self.dim = dim
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.train_size = train_size
+        self.seed = seed
+        self._path = Path(path) if path is not None else None
+
+        self._size = 0  # high-water mark of used slots
+        self._codes = np.zeros((0, dim), dtype=np.int8)
+        self._scales = np.zeros(1024, dtype=np.float32)
+        self._alive = np.zeros(1024, dtype=bool)
+        self._assign = np.zeros(1024, dtype=np.int32)
+        self._tenant = np.zeros(1024, dtype=np.int32)
+        self._category = np.zeros(1024, dtype=np.int32)
+        self._centroids: np.ndarray | None = None
+        # CSR view of the inverted lists, rebuilt lazily after training
+        self._list_slots: np.ndarray | None = None
+        self._list_offsets: np.ndarray | None = None
+        self._pending: list[int] = []  # slots assigned since the last rebuild
+
+        self._ids: list[str | None] = []
+        self._payloads: list[dict[str, Any] | None] = []
+        self._slots: dict[str, int] = {}
+        self._free_slots: list[int] = []
+        self._tenant_codes: dict[str | None, int] = {None: _GLOBAL_TENANT}
+        self._category_codes: dict[str | None, int] = {None: 0}
+
+        if self._path is not None and self._meta_path.exists():
+            self._load()
+        else:
+            self._codes = self._allocate_codes(len(self._alive))
+
+    # ─────────────────────────────────────────────────────────────────────
+    # Storage
+    # ─────────────────────────────────────────────────────────────────────
+
+    @property
+    def _meta_path(self) -> Path:
+        return self._path.with_suffix(".meta.npz")
+
+    @property
+    def _payload_path(self) -> Path:
+        return self._path.with_suffix(".payloads.json")
+
+    def _allocate_codes(self, capacity: int) -> np.ndarray:
+        if self._path is None:
+            return np.zeros((capacity, self.dim), dtype=np.int8)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        return np.lib.format.open_memmap(
+            self._path, mode="w+", dtype=np.int8, shape=(capacity, self.dim)
+        )
+
+    def _grow(self, needed: int) -> None:
+        capacity = len(self._alive)
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2)
+
+        if self._path is None:
+            codes = np.zeros((new_capacity, self.dim), dtype=np.int8)
+            codes[:capacity] = self._codes
+        else:
+            tmp_path = self._path.with_suffix(".grow.npy")
+            codes = np.lib.format.open_memmap(
+                tmp_path, mode="w+", dtype=np.int8, shape=(new_capacity, self.dim)
+            )
+            codes[:capacity] = self._codes
+            codes.flush()
+            del self._codes
+            os.replace(tmp_path, self._path)
+            codes = np.load(self._path, mmap_mode="r+")
+        self._codes = codes
+
+        for name in ("_scales", "_alive", "_assign", "_tenant", "_category"):
+            old = getattr(self, name)
+            new = np.zeros(new_capacity, dtype=old.dtype)
+            new[:capacity] = old
+            setattr(self, name, new)
+
+    def flush(self) -> None:
+        """Persist codes and metadata. No-op for in-memory indexes."""
+        if self._path is None:
+            return
+        self._codes.flush()
+        n = self._size
+        np.savez(
+            self._meta_path,
+            scales=self._scales[:n],
+            alive=self._alive[:n],
+            assign=self._assign[:n],
+            tenant=self._tenant[:n],
+            category=self._category[:n],
+            centroids=self._centroids if self._centroids is not None else np.empty((0, self.dim)),
+        )
+        self._payload_path.write_text(
+            json.dumps(
+                {
+                    "ids": self._ids,
+                    "payloads": self._payloads,
+                    "tenants": [[k, v] for k, v in self._tenant_codes.items()],
+                    "categories": [[k, v] for k, v in self._category_codes.items()],
+                },
+                ensure_ascii=False,
+            ),
+            encoding="utf-8",
+        )
+
+    def _load(self) -> None:
+        meta = np.load(self._meta_path)
+        stored = json.loads(self._payload_path.read_text(encoding="utf-8"))
+        self._codes = np.load(self._path, mmap_mode="r+")
+        n = len(meta["alive"])
+        capacity = len(self._codes)
+
+        for name in ("scales", "alive", "assign", "tenant", "category"):
+            column = np.zeros(capacity, dtype=meta[name].dtype)
+            column[:n] = meta[name]
+            setattr(self, f"_{name}", column)
+        self._centroids = meta["centroids"] if len(meta["centroids"]) else None
+
+        self._size = n
+        self._ids = stored["ids"]
+        self._payloads = stored["payloads"]
+        self._tenant_codes = dict(stored["tenants"])
+        self._category_codes = dict(stored["categories"])
+        self._slots = {doc_id: slot for slot, doc_id in enumerate(self._ids) if doc_id is not None}
+        self._free_slots = [slot for slot, doc_id in enumerate(self._ids) if doc_id is None]
+
+    # ─────────────────────────────────────────────────────────────────────
+    # Mutation
+    # ─────────────────────────────────────────────────────────────────────
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    @property
+    def is_trained(self) -> bool:
+        return self._centroids is not None
+
+    def _code_for(self, table: dict[str | None, int], value: str | None) -> int:
+        if value not in table:
+            table[value] = len(table)
+        return table[value]
+
+    def upsert(
+        self,
+        ids: list[str],
+        vectors: np.ndarray,
+        payloads: list[dict[str, Any]] | None = None,
+    ) -> None:
+        """Insert or replace vectors by ID."""
+        vectors = _normalize_rows(vectors)
+        payloads = payloads if payloads is not None else [{} for _ in ids]
+
+        slots = []
+        for doc_id in ids:
+            slot = self._slots.get(doc_id)
+            if slot is None:
+                if self._free_slots:
+                    slot = self._free_slots.pop()
+                else:
+                    slot = self._size
+                    self._size += 1
+                    self._grow(self._size)
+                    self._ids.append(None)
+                    self._payloads.append(None)
+            self._slots[doc_id] = slot
+            slots.append(slot)
+        slots_arr = np.asarray(slots, dtype=np.int64)
+
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        self._codes[slots_arr] = np.round(vectors / scales[:, None]).astype(np.int8)
+        self._scales[slots_arr] = scales
+        self._alive[slots_arr] = True
+        if self._centroids is not None:
+            self._assign[slots_arr] = np.argmax(vectors @ self._centroids.T, axis=1)
+            self._pending.extend(slots)
+            if len(self._pending) > max(1024, self._size // 10):
+                self._list_slots = None
+
+        for slot, doc_id, payload in zip(slots, ids, payloads):
+            self._ids[slot] = doc_id
+            self._payloads[slot] = payload
+            self._tenant[slot] = self._code_for(self._tenant_codes, payload.get("tenant_id"))
+            self._category[slot] = self._code_for(self._category_codes, payload.get("category"))
+
+        if self._centroids is None and len(self._slots) >= self.train_size:
+            self.train()
+
+    def delete(self, ids: list[str]) -> int:
+        """Delete vectors by ID. Returns the number removed."""
+        removed = 0
+        for doc_id in ids:
+            slot = self._slots.pop(doc_id, None)
+            if slot is None:
+                continue
+            self._alive[slot] = False
+            self._ids[slot] = None
+            self._payloads[slot] = None
+            self._free_slots.append(slot)
+            removed += 1
+        return removed
+
+    def train(self, iterations: int = 10, sample_size: int = 100_000) -> None:
+        """Train the coarse quantizer on live vectors and reassign all lists."""
+        live = np.flatnonzero(self._alive[: self._size])
+        if len(live) == 0:
+            return
+        nlist = min(self.nlist, max(1, int(np.sqrt(len(live)))))
+        rng = np.random.default_rng(self.seed)
+        sample = live if len(live) <= sample_size else rng.choice(live, sample_size, replace=False)
+        self._centroids = _kmeans(self._dequantize(sample), nlist, iterations, self.seed)
+
+        for start in range(0, len(live), 65_536):
+            block = live[start : start + 65_536]
+            self._assign[block] = np.argmax(self._dequantize(block) @ self._centroids.T, axis=1)
+        self._list_slots = None
+
+    def _dequantize(self, slots: np.ndarray) -> np.ndarray:
+        return self._codes[slots].astype(np.float32) * self._scales[slots, None]
+
+    # ─────────────────────────────────────────────────────────────────────
+    # Search
+    # ─────────────────────────────────────────────────────────────────────
+
+    def _rebuild_lists(self) -> None:
+        """Group live slots by inverted list (CSR layout)."""
+        live = np.flatnonzero(self._alive[: self._size])
+        order = np.argsort(self._assign[live], kind="stable")
+        self._list_slots = live[order]
+        counts = np.bincount(self._assign[live], minlength=len(self._centroids))
+        self._list_offsets = np.concatenate(([0], np.cumsum(counts)))
+        self._pending = []
+
+    def _candidates(self, query: np.ndarray, exact: bool) -> np.ndarray:
+        """Slots to score: the ``nprobe`` closest lists, or every live slot."""
+        if self._centroids is None or exact:
+            return np.flatnonzero(self._alive[: self._size])
+
+        if self._list_slots is None:
+            self._rebuild_lists()
+
+        nprobe = min(self.nprobe, len(self._centroids))
+        probes = np.argpartition(-(self._centroids @ query), nprobe - 1)[:nprobe]
+        offsets = self._list_offsets
+        rows = np.concatenate(
+            [self._list_slots[offsets[p] : offsets[p + 1]] for p in probes]
+            + [np.asarray(self._pending, dtype=np.int64)]
+        )
+        # Drop deleted slots and slots that moved lists since the last rebuild
+        rows = rows[self._alive[rows] & np.isin(self._assign[rows], probes)]
+        return np.unique(rows) if self._pending else rows
+
+    def search(
+        self,
+        vector: np.ndarray,
+        k: int,
+        tenant_id: str | None = None,
+        category: str | None = None,
+        exact: bool = False,
+    ) -> list[tuple[str, float, dict[str, Any]]]:
+        """Return up to ``k`` (id, cosine score, payload) tuples, best first.
+
+        Args:
+            vector: Query vector
+            k: Number of results
+            tenant_id: Restrict to this tenant plus global entries
+            category: Restrict to this category
+            exact: Scan all lists instead of the ``nprobe`` closest
+        """
+        if k <= 0 or not self._slots:
+            return []
+
+        query = _normalize_rows(vector)[0]
+        rows = self._candidates(query, exact)
+
+        if tenant_id is not None:
+            tenants = self._tenant[rows]
+            tenant_code = self._tenant_codes.get(tenant_id, -1)
+            rows = rows[(tenants == tenant_code) | (tenants == _GLOBAL_TENANT)]
+
+        if category is not None:
+            rows = rows[self._category[rows] == self._category_codes.get(category, -1)]
+
+        if len(rows) == 0:
+            return []
+
+        scores = (self._codes[rows].astype(np.float32) @ query) * self._scales[rows]
+        if len(rows) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(rows))
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        return [(self._ids[rows[i]], float(scores[i]), self._payloads[rows[i]]) for i in top]
+
+
+class LocalVectorStore:
+    """In-process vector store implementing the VectorStore protocol.
+
+    Embeddings are produced by the supplied ``embedder`` (any callable that
+    maps a list of texts to a 2-D array), e.g. a sentence-transformers
+    model's ``encode``. Chunk metadata keys ``tenant_id`` and ``category``
+    are indexed for filtered search.
+    """
+
+    def __init__(
+        self,
+        embedder: Embedder,
+        vector_size: int = 384,
+        storage_dir: str | Path | None = None,
+        nlist: int = 256,
+        nprobe: int = 16,
+        train_size: int = 10_000,
+    ) -> None:
+        """Initialize the store.
+
+        Args:
+            embedder: Callable that embeds a list of texts
+            vector_size: Dimension of embedding vectors (default: 384 for MiniLM)
+            storage_dir: Directory for memory-mapped collection files; None keeps
+                collections in memory
+            nlist: Maximum number of IVF lists per collection
+            nprobe: IVF lists scanned per query
+            train_size: Collection size that triggers IVF training
+        """
+        self._embedder = embedder
+        self._vector_size = vector_size
+        self._storage_dir = Path(storage_dir) if storage_dir is not None else None
+        self._nlist = nlist
+        self._nprobe = nprobe
+        self._train_size = train_size
+        self._collections: dict[str, IVFIndex] = {}
+
+    def _index(self, collection: str) -> IVFIndex:
+        index = self._collections.get(collection)
+        if index is None:
+            path = (
+                self._storage_dir / f"{collection}.npy" if self._storage_dir is not None else None
+            )
+            index = IVFIndex(
+                self._vector_size,
+                path=path,
+                nlist=self._nlist,
+                nprobe=self._nprobe,
+                train_size=self._train_size,
+            )
+            self._collections[collection] = index
+        return index
+
+    def upsert_chunks(self, collection: str, chunks: list[DocChunk]) -> None:
+        if not chunks:
+            return
+        vectors = self._embedder([chunk.text for chunk in chunks])
+        self._index(collection).upsert(
+            [f"{chunk.doc_id}:{chunk.chunk_id}" for chunk in chunks],
+            vectors,
+            [
+                {
+                    **asdict(chunk),
+                    "tenant_id": chunk.metadata.get("tenant_id"),
+                    "category": chunk.metadata.get("category"),
+                }
+                for chunk in chunks
+            ],
+        )
+
+    def search(
+        self,
+        collection: str,
+        query: str,
+        limit: int,
+        tenant_id: str | None = None,
+        category: str | None = None,
+    ) -> list[tuple[DocChunk, float]]:
+        vector = self._embedder([query])[0]
+        return self.search_vector(collection, vector, limit, tenant_id, category)
+
+    def search_vector(
+        self,
+        collection: str,
+        vector: np.ndarray,
+        limit: int,
+        tenant_id: str | None = None,
+        category: str | None = None,
+    ) -> list[tuple[DocChunk, float]]:
+        """Search with a precomputed query embedding."""
+        if collection not in self._collections and self._storage_dir is None:
+            return []
+        hits = self._index(collection).search(vector, limit, tenant_id, category)
+        return [
+            (
+                DocChunk(
+                    doc_id=payload["doc_id"],
+                    chunk_id=payload["chunk_id"],
+                    text=payload["text"],
+                    metadata=payload["metadata"],
+                ),
+                score,
+            )
+            for _, score, payload in hits
+        ]
+
+    def delete_chunks(self, collection: str, chunk_keys: list[str]) -> int:
+        """Delete chunks by ``"doc_id:chunk_id"`` key."""
+        return self._index(collection).delete(chunk_keys)
+
+    def count(self, collection: str) -> int:
+        """Get number of chunks in a collection."""
+        if collection not in self._collections and self._storage_dir is None:
+            return 0
+        return len(self._index(collection))
+
+    def flush(self) -> None:
+        """Persist all collections to the storage directory."""
+        for index in self._collections.values():
+            index.flush()
@@ -11,6 +11,8 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Any, Protocol
 
+from .lexical_index import BM25Index, tokenize
+
 
 @dataclass(frozen=True)
 class DocChunk:
@@ -54,53 +56,37 @@ class VectorStore(Protocol):
 class InMemoryVectorStore:
     """In-memory vector store for testing.
 
-    Uses simple keyword matching instead of embeddings.
+    Uses a BM25 lexical index instead of embeddings.
     NOT for production use.
     """
 
     def __init__(self) -> None:
-        self._collections: dict[str, list[DocChunk]] = {}
+        self._collections: dict[str, BM25Index] = {}
 
     def upsert_chunks(self, collection: str, chunks: list[DocChunk]) -> None:
-        if collection not in self._collections:
-            self._collections[collection] = []
+        index = self._collections.setdefault(collection, BM25Index())
 
-        # Simple upsert: replace existing chunks with same IDs
-        existing_ids = {f"{c.doc_id}:{c.chunk_id}" for c in self._collections[collection]}
+        # Chunks with an existing ID replace the old chunk in place
         for chunk in chunks:
-            chunk_key = f"{chunk.doc_id}:{chunk.chunk_id}"
-            if chunk_key in existing_ids:
-                self._collections[collection] = [
-                    c
-                    for c in self._collections[collection]
-                    if f"{c.doc_id}:{c.chunk_id}" != chunk_key
-                ]
-        self._collections[collection].extend(chunks)
+            index.add(f"{chunk.doc_id}:{chunk.chunk_id}", chunk.text, payload=chunk)
 
     def search(self, collection: str, query: str, limit: int) -> list[tuple[DocChunk, float]]:
-        if collection not in self._collections:
+        index = self._collections.get(collection)
+        if index is None:
             return []
 
-        # Simple keyword matching for testing
-        query_words = set(query.lower().split())
-        results: list[tuple[DocChunk, float]] = []
-
-        for chunk in self._collections[collection]:
-            chunk_words = set(chunk.text.lower().split())
-            overlap = len(query_words & chunk_words)
-            if overlap > 0 or not query_words:
-                score = overlap / max(len(query_words), 1)
-                results.append((chunk, score))
+        # An empty query matches everything with a zero score
+        if not tokenize(query):
+            return [(chunk, 0.0) for chunk in index.payloads()[:limit]]
 
-        # Sort by score descending
-        results.sort(key=lambda x: -x[1])
-        return results[:limit]
+        return [(index.get(key), score) for key, score in index.search(query, limit)]
 
     def clear(self, collection: str) -> None:
         """Clear all chunks from a collection."""
         if collection in self._collections:
-            self._collections[collection] = []
+            self._collections[collection].clear()
 
     def count(self, collection: str) -> int:
         """Get number of chunks in a collection."""
-        return len(self._collections.get(collection, []))
+        index = self._collections.get(collection)
+        return len(index) if index is not None else 0
@@ -0,0 +1,290 @@
+"""
+SAHOOL Lexical Index
+BM25 inverted index with Arabic normalization for RAG retrieval
+
+Replaces the per-query full scan used by the keyword placeholders in
+RAGService and InMemoryVectorStore:
+- Postings lists (term -> {slot: term frequency}) so a query only touches
+  chunks that share at least one term with it
+- Okapi BM25 scoring, normalized to [0, 1] against the query's best
+  attainable score so callers can keep treating scores as confidences
+- Arabic normalization (diacritics, tatweel, alef/yaa/taa-marbuta folding)
+  and light prefix/suffix stemming
+- Tenant/category filter bitsets
+- O(1) chunk replacement through slot reuse
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+import re
+from dataclasses import dataclass, field
+
+# Arabic diacritics (tashkeel), superscript alef and tatweel
+_DIACRITICS_RE = re.compile(r"[\u064B-\u065F\u0670\u0640]")
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+_ARABIC_FOLDING = str.maketrans(
+    {
+        "أ": "ا",
+        "إ": "ا",
+        "آ": "ا",
+        "ٱ": "ا",
+        "ى": "ي",
+        "ة": "ه",
+        "ؤ": "و",
+        "ئ": "ي",
+    }
+)
+
+# Longest affixes first so "وال" wins over "و"
+_ARABIC_PREFIXES = ("وال", "بال", "كال", "فال", "لل", "ال")
+_ARABIC_SUFFIXES = ("هما", "كما", "ات", "ون", "ين", "ان", "يه", "ها", "هم", "ه", "ي")
+# Minimum stem lengths keep short roots such as "ري" (irrigation) intact
+_MIN_PREFIX_STEM = 2
+_MIN_SUFFIX_STEM = 3
+
+
+def normalize_arabic(text: str) -> str:
+    """Normalize Arabic text for matching.
+
+    Strips diacritics and tatweel and folds alef, yaa, taa marbuta and hamza
+    carrier variations, following ContextCompressor._normalize_arabic.
+    Latin text is lower-cased.
+    """
+    text = _DIACRITICS_RE.sub("", text)
+    return text.translate(_ARABIC_FOLDING).lower()
+
+
+def light_stem(token: str) -> str:
+    """Light Arabic stemmer: strip one common prefix and one common suffix.
+
+    Stems never drop below two characters after prefix removal or three
+    after suffix removal.
+    Non-Arabic tokens are returned unchanged.
+    """
+    if not token or not ("\u0600" <= token[0] <= "\u06ff"):
+        return token
+
+    for prefix in _ARABIC_PREFIXES:
+        if token.startswith(prefix) and len(token) - len(prefix) >= _MIN_PREFIX_STEM:
+            token = token[len(prefix) :]
+            break
+
+    for suffix in _ARABIC_SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= _MIN_SUFFIX_STEM:
+            token = token[: -len(suffix)]
+            break
+
+    return token
+
+
+def tokenize(text: str) -> list[str]:
+    """Normalize, split and stem text into index terms."""
+    return [light_stem(token) for token in _TOKEN_RE.findall(normalize_arabic(text))]
+
+
+@dataclass
+class _Entry:
+    """Per-slot bookkeeping for an indexed chunk"""
+
+    key: str
+    term_freqs: dict[str, int]
+    length: int
+    tenant_id: str | None
+    category: str | None
+    payload: object = field(default=None)
+
+
+class _Bitset:
+    """Growable bitset over slot numbers"""
+
+    __slots__ = ("_bits",)
+
+    def __init__(self) -> None:
+        self._bits = bytearray()
+
+    def set(self, slot: int) -> None:
+        byte = slot >> 3
+        if byte >= len(self._bits):
+            self._bits.extend(b"\x00" * (byte + 1 - len(self._bits)))
+        self._bits[byte] |= 1 << (slot & 7)
+
+    def clear(self, slot: int) -> None:
+        byte = slot >> 3
+        if byte < len(self._bits):
+            self._bits[byte] &= ~(1 << (slot & 7)) & 0xFF
+
+    def as_int(self) -> int:
+        return int.from_bytes(self._bits, "little")
+
+
+class BM25Index:
+    """Okapi BM25 inverted index keyed by chunk key.
+
+    Each chunk occupies an integer slot. Replacing a chunk removes its old
+    postings and reuses its slot, so upserts cost O(terms in chunk) instead
+    of rebuilding the collection.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self._postings: dict[str, dict[int, int]] = {}
+        self._entries: list[_Entry | None] = []
+        self._slots: dict[str, int] = {}
+        self._free_slots: list[int] = []
+        self._total_length = 0
+        self._tenant_bits: dict[str | None, _Bitset] = {}
+        self._category_bits: dict[str | None, _Bitset] = {}
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._slots
+
+    @property
+    def average_length(self) -> float:
+        return self._total_length / len(self._slots) if self._slots else 0.0
+
+    def add(
+        self,
+        key: str,
+        text: str,
+        tenant_id: str | None = None,
+        category: str | None = None,
+        payload: object = None,
+    ) -> None:
+        """Index a chunk, replacing any existing chunk with the same key."""
+        if key in self._slots:
+            self.remove(key)
+
+        terms = tokenize(text)
+        term_freqs: dict[str, int] = {}
+        for term in terms:
+            term_freqs[term] = term_freqs.get(term, 0) + 1
+
+        if self._free_slots:
+            slot = self._free_slots.pop()
+        else:
+            slot = len(self._entries)
+            self._entries.append(None)
+
+        self._entries[slot] = _Entry(
+            key=key,
+            term_freqs=term_freqs,
+            length=len(terms),
+            tenant_id=tenant_id,
+            category=category,
+            payload=payload,
+        )
+        self._slots[key] = slot
+        self._total_length += len(terms)
+
+        for term, tf in term_freqs.items():
+            self._postings.setdefault(term, {})[slot] = tf
+
+        self._tenant_bits.setdefault(tenant_id, _Bitset()).set(slot)
+        self._category_bits.setdefault(category, _Bitset()).set(slot)
+
+    def remove(self, key: str) -> bool:
+        """Remove a chunk from the index. Returns False if it was not indexed."""
+        slot = self._slots.pop(key, None)
+        if slot is None:
+            return False
+
+        entry = self._entries[slot]
+        for term in entry.term_freqs:
+            postings = self._postings[term]
+            del postings[slot]
+            if not postings:
+                del self._postings[term]
+
+        self._tenant_bits[entry.tenant_id].clear(slot)
+        self._category_bits[entry.category].clear(slot)
+        self._total_length -= entry.length
+        self._entries[slot] = None
+        self._free_slots.append(slot)
+        return True
+
+    def clear(self) -> None:
+        """Drop every indexed chunk."""
+        self.__init__(k1=self.k1, b=self.b)
+
+    def get(self, key: str) -> object:
+        """Return the payload stored with a chunk, or None."""
+        slot = self._slots.get(key)
+        return self._entries[slot].payload if slot is not None else None
+
+    def payloads(self) -> list[object]:
+        """Return the payloads of all indexed chunks in slot order."""
+        return [entry.payload for entry in self._entries if entry is not None]
+
+    def _allowed_mask(self, tenant_id: str | None, category: str | None) -> bytes | None:
+        """Combine filter bitsets into a single mask, or None when unfiltered.
+
+        A tenant filter also admits global chunks (tenant_id None).
+        """
+        mask: int | None = None
+        if tenant_id is not None:
+            mask = 0
+            for owner in (tenant_id, None):
+                bits = self._tenant_bits.get(owner)
+                if bits is not None:
+                    mask |= bits.as_int()
+        if category is not None:
+            bits = self._category_bits.get(category)
+            category_mask = bits.as_int() if bits is not None else 0
+            mask = category_mask if mask is None else mask & category_mask
+
+        if mask is None:
+            return None
+        return mask.to_bytes((len(self._entries) + 7) // 8 or 1, "little")
+
+    def search(
+        self,
+        query: str,
+        limit: int,
+        tenant_id: str | None = None,
+        category: str | None = None,
+    ) -> list[tuple[str, float]]:
+        """Return up to ``limit`` (key, score) pairs, best first.
+
+        Scores are BM25 scores divided by the query's maximum attainable
+        score (every term matched with saturated frequency), so they fall
+        in [0, 1) and grow with query-term coverage.
+        """
+        terms = set(tokenize(query))
+        if not terms or not self._slots or limit <= 0:
+            return []
+
+        mask = self._allowed_mask(tenant_id, category)
+        n_docs = len(self._slots)
+        k1 = self.k1
+        norm_b = self.b / (self.average_length or 1.0)
+        one_minus_b = 1.0 - self.b
+        entries = self._entries
+
+        scores: dict[int, float] = {}
+        max_score = 0.0
+        for term in terms:
+            postings = self._postings.get(term)
+            if not postings:
+                # Unseen terms still count towards the attainable score
+                max_score += math.log(1.0 + (n_docs + 0.5) / 0.5) * (k1 + 1.0)
+                continue
+            idf = math.log(1.0 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            max_score += idf * (k1 + 1.0)
+            for slot, tf in postings.items():
+                if mask is not None and not mask[slot >> 3] & (1 << (slot & 7)):
+                    continue
+                denom = tf + k1 * (one_minus_b + norm_b * entries[slot].length)
+                scores[slot] = scores.get(slot, 0.0) + idf * tf * (k1 + 1.0) / denom
+
+        if not scores:
+            return []
+
+        top = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [(entries[slot].key, score / max_score) for slot, score in top]
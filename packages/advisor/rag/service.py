@@ -7,6 +7,7 @@ from __future__ import annotations
 
 from uuid import uuid4
 
+from .lexical_index import BM25Index
 from .models import Document, DocumentChunk, SearchResult
 
 
@@ -18,6 +19,7 @@ class RAGService:
         self.chunk_overlap = chunk_overlap
         self._documents: dict[str, Document] = {}
         self._chunks: dict[str, DocumentChunk] = {}
+        self._index = BM25Index()
 
     def add_document(
         self,
@@ -48,6 +50,12 @@ class RAGService:
         self._documents[document.id] = document
         for chunk in chunks:
             self._chunks[chunk.id] = chunk
+            self._index.add(
+                chunk.id,
+                chunk.content,
+                tenant_id=document.tenant_id,
+                category=document.category,
+            )
 
         return document
 
@@ -92,43 +100,21 @@ class RAGService:
         """
         Search for relevant document chunks.
 
-        In production, this would use vector similarity search.
-        This is a simple keyword-based placeholder.
+        Uses the BM25 lexical index; tenant searches also include global
+        documents. In production, this would be combined with vector
+        similarity search.
         """
         results = []
-        query_words = set(query.lower().split())
+        hits = self._index.search(query, top_k, tenant_id=tenant_id, category=category)
 
-        for chunk in self._chunks.values():
-            # Get parent document
+        for chunk_id, score in hits:
+            chunk = self._chunks[chunk_id]
             document = self._documents.get(chunk.document_id)
             if not document:
                 continue
+            results.append(SearchResult(chunk=chunk, document=document, score=score))
 
-            # Filter by tenant (include global documents)
-            if tenant_id and document.tenant_id and document.tenant_id != tenant_id:
-                continue
-
-            # Filter by category
-            if category and document.category != category:
-                continue
-
-            # Simple keyword matching (placeholder for vector search)
-            chunk_words = set(chunk.content.lower().split())
-            overlap = len(query_words & chunk_words)
-
-            if overlap > 0:
-                score = overlap / len(query_words)
-                results.append(
-                    SearchResult(
-                        chunk=chunk,
-                        document=document,
-                        score=score,
-                    )
-                )
-
-        # Sort by score and return top-k
-        results.sort(key=lambda r: r.score, reverse=True)
-        return results[:top_k]
+        return results
 
     def get_document(self, document_id: str) -> Document | None:
         """Get document by ID"""
@@ -159,6 +145,7 @@ class RAGService:
         # Delete chunks
         for chunk in document.chunks:
             self._chunks.pop(chunk.id, None)
+            self._index.remove(chunk.id)
 
         # Delete document
         del self._documents[document_id]
@@ -5,21 +5,37 @@ Unified audit trail with hash chain for tamper evidence
 
 from .hashchain import compute_entry_hash, sha256_hex, verify_chain
 from .middleware import AuditContext, AuditContextMiddleware
-from .models import AuditLog, Base
+from .models import AuditCheckpoint, AuditLog, Base
 from .redact import SENSITIVE_KEYS, redact_dict
-from .service import get_last_hash, query_audit_logs, write_audit_log
+from .service import (
+    ChainHead,
+    get_chain_head,
+    get_last_hash,
+    query_audit_logs,
+    write_audit_log,
+)
+from .verifier import ChainVerification, ChainVerifier
+from .writer import AuditWriter, InMemoryChainHeads, RedisChainHeads
 
 __all__ = [
     "AuditLog",
+    "AuditCheckpoint",
     "Base",
     "write_audit_log",
     "get_last_hash",
+    "get_chain_head",
+    "ChainHead",
+    "AuditWriter",
+    "InMemoryChainHeads",
+    "RedisChainHeads",
     "query_audit_logs",
     "redact_dict",
     "SENSITIVE_KEYS",
     "compute_entry_hash",
     "sha256_hex",
     "verify_chain",
+    "ChainVerifier",
+    "ChainVerification",
     "AuditContext",
     "AuditContextMiddleware",
 ]
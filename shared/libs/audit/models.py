@@ -8,7 +8,7 @@ from __future__ import annotations
 from datetime import UTC, datetime
 from uuid import UUID, uuid4
 
-from sqlalchemy import DateTime, Index, Integer, String, Text
+from sqlalchemy import BigInteger, DateTime, Index, Integer, String, Text
 from sqlalchemy.dialects.postgresql import UUID as PGUUID
 from sqlalchemy.orm import Mapped, declarative_base, mapped_column
 
@@ -162,3 +162,65 @@ class AuditLog(Base):
             "ip": self.ip,
             "created_at": self.created_at.isoformat(),
         }
+
+
+class AuditCheckpoint(Base):
+    """
+    Signed anchor into a tenant's audit hash chain.
+
+    Records that the chain's ``seq``-th entry (1-based) had ``entry_hash``.
+    The HMAC ``signature`` covers the tenant, position, entry id, hash and
+    timestamp, so an anchor cannot be rewritten together with the chain.
+    Verification resumes from the last anchor and independent segments
+    between anchors can be verified in parallel.
+    """
+
+    __tablename__ = "audit_checkpoints"
+
+    id: Mapped[UUID] = mapped_column(
+        PGUUID(as_uuid=True),
+        primary_key=True,
+        default=uuid4,
+        comment="Unique checkpoint identifier",
+    )
+    tenant_id: Mapped[UUID] = mapped_column(
+        PGUUID(as_uuid=True),
+        nullable=False,
+        comment="Tenant whose chain is anchored",
+    )
+    seq: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+        comment="Number of chain entries up to and including the anchored entry",
+    )
+    entry_id: Mapped[UUID] = mapped_column(
+        PGUUID(as_uuid=True),
+        nullable=False,
+        comment="Anchored audit entry",
+    )
+    entry_hash: Mapped[str] = mapped_column(
+        String(64),
+        nullable=False,
+        comment="Hash of the anchored audit entry",
+    )
+    entry_created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        comment="created_at of the anchored audit entry",
+    )
+    signature: Mapped[str] = mapped_column(
+        String(64),
+        nullable=False,
+        comment="HMAC-SHA256 of the anchor fields",
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(UTC),
+        comment="When the checkpoint was recorded",
+    )
+
+    __table_args__ = (Index("ux_audit_checkpoint_tenant_seq", "tenant_id", "seq", unique=True),)
+
+    def __repr__(self) -> str:
+        return f"<AuditCheckpoint(tenant={self.tenant_id}, seq={self.seq})>"
@@ -7,11 +7,11 @@ from __future__ import annotations
 
 import json
 import logging
-from datetime import datetime
-from typing import Any
-from uuid import UUID
+from datetime import UTC, datetime, timedelta
+from typing import Any, NamedTuple
+from uuid import UUID, uuid4
 
-from sqlalchemy import select
+from sqlalchemy import select, text
 from sqlalchemy.orm import Session
 
 from .hashchain import build_canonical_string, compute_entry_hash
@@ -21,24 +21,144 @@ from .redact import redact_dict
 logger = logging.getLogger(__name__)
 
 
-def get_last_hash(db: Session, tenant_id: UUID) -> str | None:
+class ChainHead(NamedTuple):
+    """Last entry of a tenant's hash chain"""
+
+    entry_hash: str | None
+    created_at: datetime | None
+
+
+EMPTY_CHAIN = ChainHead(None, None)
+
+
+def get_chain_head(db: Session, tenant_id: UUID) -> ChainHead:
     """
-    Get the hash of the last audit entry for a tenant.
+    Get the hash and timestamp of the last audit entry for a tenant.
 
     Args:
         db: SQLAlchemy session
         tenant_id: Tenant UUID
 
     Returns:
-        Last entry hash or None if no entries exist
+        ChainHead of the last entry, or EMPTY_CHAIN if no entries exist
     """
     stmt = (
-        select(AuditLog.entry_hash)
+        select(AuditLog.entry_hash, AuditLog.created_at)
         .where(AuditLog.tenant_id == tenant_id)
         .order_by(AuditLog.created_at.desc())
         .limit(1)
     )
-    return db.execute(stmt).scalar_one_or_none()
+    row = db.execute(stmt).first()
+    return ChainHead(row.entry_hash, row.created_at) if row else EMPTY_CHAIN
+
+
+def get_last_hash(db: Session, tenant_id: UUID) -> str | None:
+    """
+    Get the hash of the last audit entry for a tenant.
+
+    Args:
+        db: SQLAlchemy session
+        tenant_id: Tenant UUID
+
+    Returns:
+        Last entry hash or None if no entries exist
+    """
+    return get_chain_head(db, tenant_id).entry_hash
+
+
+def next_created_at(head: ChainHead) -> datetime:
+    """
+    Timestamp for the entry that follows ``head``.
+
+    The chain is ordered by created_at, so timestamps must be strictly
+    increasing per tenant even when many entries share one clock tick.
+    """
+    now = datetime.now(UTC)
+    last = head.created_at
+    if last is not None:
+        if last.tzinfo is None:
+            last = last.replace(tzinfo=UTC)
+        if now <= last:
+            now = last + timedelta(microseconds=1)
+    return now
+
+
+def build_audit_entry(
+    *,
+    prev_hash: str | None,
+    created_at: datetime,
+    tenant_id: UUID,
+    actor_id: UUID | None,
+    actor_type: str,
+    action: str,
+    resource_type: str,
+    resource_id: str,
+    correlation_id: UUID,
+    ip: str | None = None,
+    user_agent: str | None = None,
+    details: dict[str, Any] | None = None,
+) -> AuditLog:
+    """
+    Build a fully hashed audit entry chained after ``prev_hash``.
+
+    All fields, including id and created_at, are set before the insert so
+    the entry is written with a single INSERT and never updated (the
+    audit_logs table rejects UPDATEs).
+
+    Returns:
+        Unsaved AuditLog entry
+    """
+    # Redact sensitive data from details
+    safe_details = redact_dict(details or {})
+    details_json = json.dumps(safe_details, ensure_ascii=False, sort_keys=True)
+
+    # Truncate user_agent if too long
+    if user_agent and len(user_agent) > 256:
+        user_agent = user_agent[:253] + "..."
+
+    canonical = build_canonical_string(
+        tenant_id=str(tenant_id),
+        actor_id=str(actor_id) if actor_id else None,
+        actor_type=actor_type,
+        action=action,
+        resource_type=resource_type,
+        resource_id=resource_id,
+        correlation_id=str(correlation_id),
+        details_json=details_json,
+        created_at_iso=created_at.isoformat(),
+    )
+
+    return AuditLog(
+        id=uuid4(),
+        tenant_id=tenant_id,
+        actor_id=actor_id,
+        actor_type=actor_type,
+        action=action,
+        resource_type=resource_type,
+        resource_id=resource_id,
+        correlation_id=correlation_id,
+        ip=ip,
+        user_agent=user_agent,
+        details_json=details_json,
+        prev_hash=prev_hash,
+        entry_hash=compute_entry_hash(prev_hash=prev_hash, canonical=canonical),
+        created_at=created_at,
+    )
+
+
+def lock_tenant_chain(db: Session, tenant_id: UUID) -> None:
+    """
+    Serialize chain appends for a tenant until the transaction ends.
+
+    On PostgreSQL this takes a transaction-scoped advisory lock, so two
+    concurrent transactions cannot read the same head and fork the chain.
+    Other databases are left to the caller (e.g. SQLite in tests).
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(
+            text("SELECT pg_advisory_xact_lock(hashtextextended(:key, 0))"),
+            {"key": f"audit_chain:{tenant_id}"},
+        )
 
 
 def write_audit_log(
@@ -96,19 +216,13 @@ def write_audit_log(
         )
         ```
     """
-    # Redact sensitive data from details
-    safe_details = redact_dict(details or {})
-    details_json = json.dumps(safe_details, ensure_ascii=False, sort_keys=True)
+    # Hold the tenant's chain until commit, then read its head
+    lock_tenant_chain(db, tenant_id)
+    head = get_chain_head(db, tenant_id)
 
-    # Truncate user_agent if too long
-    if user_agent and len(user_agent) > 256:
-        user_agent = user_agent[:253] + "..."
-
-    # Get previous hash for chain
-    prev_hash = get_last_hash(db, tenant_id)
-
-    # Create entry (without hash initially)
-    entry = AuditLog(
+    entry = build_audit_entry(
+        prev_hash=head.entry_hash,
+        created_at=next_created_at(head),
         tenant_id=tenant_id,
         actor_id=actor_id,
         actor_type=actor_type,
@@ -118,28 +232,10 @@ def write_audit_log(
         correlation_id=correlation_id,
         ip=ip,
         user_agent=user_agent,
-        details_json=details_json,
-        prev_hash=prev_hash,
-        entry_hash="",  # Will be computed after flush
+        details=details,
     )
 
     db.add(entry)
-    db.flush()  # Ensures created_at is set
-
-    # Compute hash with all fields including created_at
-    canonical = build_canonical_string(
-        tenant_id=str(entry.tenant_id),
-        actor_id=str(entry.actor_id) if entry.actor_id else None,
-        actor_type=entry.actor_type,
-        action=entry.action,
-        resource_type=entry.resource_type,
-        resource_id=entry.resource_id,
-        correlation_id=str(entry.correlation_id),
-        details_json=entry.details_json,
-        created_at_iso=entry.created_at.isoformat(),
-    )
-    entry.entry_hash = compute_entry_hash(prev_hash=entry.prev_hash, canonical=canonical)
-
     db.flush()
 
     logger.info(
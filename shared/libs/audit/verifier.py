@@ -0,0 +1,627 @@
+"""
+SAHOOL Audit Chain Verifier
+Streaming, checkpointed and parallel verification of audit hash chains
+"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import logging
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import create_engine, func, select, tuple_
+from sqlalchemy.orm import Session
+
+from .hashchain import build_canonical_string, compute_entry_hash
+from .models import AuditCheckpoint, AuditLog
+
+logger = logging.getLogger(__name__)
+
+# Columns needed to recompute an entry hash, in unpacking order
+_CHAIN_COLUMNS = (
+    AuditLog.id,
+    AuditLog.tenant_id,
+    AuditLog.actor_id,
+    AuditLog.actor_type,
+    AuditLog.action,
+    AuditLog.resource_type,
+    AuditLog.resource_id,
+    AuditLog.correlation_id,
+    AuditLog.details_json,
+    AuditLog.prev_hash,
+    AuditLog.entry_hash,
+    AuditLog.created_at,
+)
+
+
+@dataclass(frozen=True)
+class ChainAnchor:
+    """
+    A position in a tenant chain.
+
+    ``seq`` counts the entries up to and including the anchored one, so
+    GENESIS (seq 0) sits before the first entry. ``entry_id`` and
+    ``entry_hash`` are None for positions known only by time.
+    """
+
+    seq: int = 0
+    entry_id: UUID | None = None
+    entry_hash: str | None = None
+    created_at: datetime | None = None
+
+
+GENESIS = ChainAnchor()
+
+
+@dataclass(frozen=True)
+class Segment:
+    """
+    A contiguous slice of a chain, verified independently.
+
+    Args:
+        start: Position just before the segment
+        end: Last position of the segment (None for "up to the head")
+        linked: Whether ``start.entry_hash`` is known, i.e. whether the
+            first entry's prev_hash can be checked inside the segment
+    """
+
+    start: ChainAnchor
+    end: ChainAnchor | None = None
+    linked: bool = True
+
+
+@dataclass
+class SegmentResult:
+    """Outcome of verifying one segment"""
+
+    start_seq: int
+    entries_checked: int = 0
+    first_prev_hash: str | None = None
+    last: ChainAnchor = GENESIS
+    anchors: list[ChainAnchor] = field(default_factory=list)
+    errors: list[str] = field(default_factory=list)
+    error_count: int = 0
+
+    @property
+    def is_valid(self) -> bool:
+        return self.error_count == 0
+
+    def fail(self, message: str, max_errors: int) -> None:
+        self.error_count += 1
+        if len(self.errors) < max_errors:
+            self.errors.append(message)
+
+
+@dataclass
+class ChainVerification:
+    """Outcome of verifying a tenant chain"""
+
+    tenant_id: UUID
+    start: ChainAnchor
+    head: ChainAnchor
+    entries_checked: int = 0
+    segments: int = 0
+    checkpoints_created: int = 0
+    errors: list[str] = field(default_factory=list)
+    error_count: int = 0
+    duration_ms: float = 0.0
+
+    @property
+    def is_valid(self) -> bool:
+        return self.error_count == 0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "tenant_id": str(self.tenant_id),
+            "is_valid": self.is_valid,
+            "start_seq": self.start.seq,
+            "head_seq": self.head.seq,
+            "head_hash": self.head.entry_hash,
+            "entries_checked": self.entries_checked,
+            "segments": self.segments,
+            "checkpoints_created": self.checkpoints_created,
+            "error_count": self.error_count,
+            "errors": self.errors,
+            "duration_ms": round(self.duration_ms, 2),
+        }
+
+
+# ---------------------------------------------------------------------------
+# Checkpoints
+# ---------------------------------------------------------------------------
+
+
+def _utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=UTC) if value.tzinfo is None else value.astimezone(UTC)
+
+
+def sign_checkpoint(key: bytes, tenant_id: UUID, anchor: ChainAnchor) -> str:
+    """
+    Compute the HMAC-SHA256 signature of a checkpoint anchor.
+
+    Args:
+        key: Secret signing key
+        tenant_id: Tenant UUID
+        anchor: Anchored position (entry id, hash and timestamp required)
+
+    Returns:
+        Hex-encoded signature
+    """
+    message = "|".join(
+        [
+            str(tenant_id),
+            str(anchor.seq),
+            str(anchor.entry_id),
+            anchor.entry_hash or "",
+            _utc(anchor.created_at).isoformat(),
+        ]
+    )
+    return hmac.new(key, message.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+def load_checkpoints(
+    db: Session, tenant_id: UUID, key: bytes
+) -> tuple[list[ChainAnchor], list[str]]:
+    """
+    Load a tenant's checkpoints whose signatures verify.
+
+    Checkpoints after the first bad signature are not trusted.
+
+    Returns:
+        Tuple of (trusted anchors in chain order, error messages)
+    """
+    stmt = (
+        select(AuditCheckpoint)
+        .where(AuditCheckpoint.tenant_id == tenant_id)
+        .order_by(AuditCheckpoint.seq.asc())
+    )
+    anchors: list[ChainAnchor] = []
+    for checkpoint in db.execute(stmt).scalars():
+        anchor = ChainAnchor(
+            seq=checkpoint.seq,
+            entry_id=checkpoint.entry_id,
+            entry_hash=checkpoint.entry_hash,
+            created_at=_utc(checkpoint.entry_created_at),
+        )
+        if not hmac.compare_digest(sign_checkpoint(key, tenant_id, anchor), checkpoint.signature):
+            return anchors, [f"Checkpoint at entry {checkpoint.seq - 1}: invalid signature"]
+        anchors.append(anchor)
+    return anchors, []
+
+
+def save_checkpoints(
+    db: Session, tenant_id: UUID, key: bytes, anchors: Iterable[ChainAnchor]
+) -> int:
+    """
+    Store signed checkpoints for verified anchors.
+
+    Returns:
+        Number of checkpoints added (not committed)
+    """
+    rows = [
+        AuditCheckpoint(
+            tenant_id=tenant_id,
+            seq=anchor.seq,
+            entry_id=anchor.entry_id,
+            entry_hash=anchor.entry_hash,
+            entry_created_at=anchor.created_at,
+            signature=sign_checkpoint(key, tenant_id, anchor),
+        )
+        for anchor in anchors
+    ]
+    db.add_all(rows)
+    return len(rows)
+
+
+# ---------------------------------------------------------------------------
+# Streaming verification
+# ---------------------------------------------------------------------------
+
+
+def _bounded(stmt: Any, after: ChainAnchor, until: ChainAnchor | None) -> Any:
+    """Restrict a chain query to the entries after ``after`` up to ``until``"""
+    position = tuple_(AuditLog.created_at, AuditLog.id)
+    if after.entry_id is not None:
+        stmt = stmt.where(position > (after.created_at, after.entry_id))
+    elif after.created_at is not None:
+        stmt = stmt.where(AuditLog.created_at > after.created_at)
+    if until is not None:
+        if until.entry_id is not None:
+            stmt = stmt.where(position <= (until.created_at, until.entry_id))
+        else:
+            stmt = stmt.where(AuditLog.created_at <= until.created_at)
+    return stmt
+
+
+def stream_chain(
+    db: Any,
+    tenant_id: UUID,
+    *,
+    after: ChainAnchor = GENESIS,
+    until: ChainAnchor | None = None,
+    batch_size: int = 10000,
+) -> Iterator[Any]:
+    """
+    Stream a tenant's chain entries in chain order.
+
+    Uses a server-side cursor (``yield_per``), so memory stays bounded by
+    ``batch_size`` rows however long the chain is.
+
+    Args:
+        db: SQLAlchemy Session or Connection
+        tenant_id: Tenant UUID
+        after: Position to start after (exclusive)
+        until: Position to stop at (inclusive)
+        batch_size: Rows fetched per round trip
+
+    Yields:
+        Rows with the columns of ``_CHAIN_COLUMNS``
+    """
+    stmt = (
+        select(*_CHAIN_COLUMNS)
+        .where(AuditLog.tenant_id == tenant_id)
+        .order_by(AuditLog.created_at.asc(), AuditLog.id.asc())
+    )
+    stmt = _bounded(stmt, after, until).execution_options(yield_per=batch_size)
+    yield from db.execute(stmt)
+
+
+def count_entries(
+    db: Any, tenant_id: UUID, *, after: ChainAnchor = GENESIS, until: ChainAnchor | None = None
+) -> int:
+    """Count chain entries after ``after`` up to ``until``"""
+    stmt = select(func.count()).select_from(AuditLog).where(AuditLog.tenant_id == tenant_id)
+    return db.execute(_bounded(stmt, after, until)).scalar_one()
+
+
+def get_head(db: Any, tenant_id: UUID) -> ChainAnchor | None:
+    """Last entry of a tenant chain (seq unknown, left at 0)"""
+    stmt = (
+        select(AuditLog.id, AuditLog.entry_hash, AuditLog.created_at)
+        .where(AuditLog.tenant_id == tenant_id)
+        .order_by(AuditLog.created_at.desc(), AuditLog.id.desc())
+        .limit(1)
+    )
+    row = db.execute(stmt).first()
+    if row is None:
+        return None
+    return ChainAnchor(entry_id=row.id, entry_hash=row.entry_hash, created_at=_utc(row.created_at))
+
+
+def verify_segment(
+    rows: Iterable[Any],
+    segment: Segment,
+    *,
+    checkpoint_interval: int = 0,
+    max_errors: int = 100,
+) -> SegmentResult:
+    """
+    Verify a stream of chain entries in one pass.
+
+    Checks every prev_hash link and recomputes every entry hash. When
+    ``segment.end`` carries a hash, the segment must end exactly on it.
+    Anchors are collected every ``checkpoint_interval`` entries while the
+    segment is still valid.
+
+    Args:
+        rows: Entries in chain order (see ``stream_chain``)
+        segment: Segment the rows belong to
+        checkpoint_interval: Anchor spacing in entries (0 disables)
+        max_errors: Error messages kept (all errors are counted)
+
+    Returns:
+        SegmentResult
+    """
+    start = segment.start
+    result = SegmentResult(start_seq=start.seq, last=start)
+    prev_hash = start.entry_hash
+    seq = start.seq
+    last = None
+
+    for row in rows:
+        (
+            entry_id,
+            tenant_id,
+            actor_id,
+            actor_type,
+            action,
+            resource_type,
+            resource_id,
+            correlation_id,
+            details_json,
+            stored_prev_hash,
+            stored_entry_hash,
+            created_at,
+        ) = row
+        index = seq
+        seq += 1
+
+        if last is None:
+            result.first_prev_hash = stored_prev_hash
+            check_link = segment.linked
+        else:
+            check_link = True
+        if check_link and stored_prev_hash != prev_hash:
+            result.fail(
+                f"Entry {index}: prev_hash mismatch. Expected {prev_hash}, got {stored_prev_hash}",
+                max_errors,
+            )
+
+        created_at = _utc(created_at)
+        canonical = build_canonical_string(
+            tenant_id=str(tenant_id),
+            actor_id=str(actor_id) if actor_id else None,
+            actor_type=actor_type,
+            action=action,
+            resource_type=resource_type,
+            resource_id=resource_id,
+            correlation_id=str(correlation_id),
+            details_json=details_json,
+            created_at_iso=created_at.isoformat(),
+        )
+        computed_hash = compute_entry_hash(prev_hash=stored_prev_hash, canonical=canonical)
+        if computed_hash != stored_entry_hash:
+            result.fail(
+                f"Entry {index}: entry_hash mismatch. "
+                f"Expected {computed_hash}, got {stored_entry_hash}",
+                max_errors,
+            )
+
+        prev_hash = stored_entry_hash
+        last = (entry_id, created_at)
+        if checkpoint_interval and seq % checkpoint_interval == 0 and result.is_valid:
+            result.anchors.append(ChainAnchor(seq, entry_id, stored_entry_hash, created_at))
+
+    result.entries_checked = seq - start.seq
+    if last is not None:
+        result.last = ChainAnchor(seq, last[0], prev_hash, last[1])
+
+    end = segment.end
+    if end is not None and (
+        result.last.seq != end.seq
+        or (end.entry_hash is not None and result.last.entry_hash != end.entry_hash)
+    ):
+        result.fail(
+            f"Entry {end.seq - 1}: chain does not reach checkpoint "
+            f"(ends at entry {result.last.seq - 1} with {result.last.entry_hash})",
+            max_errors,
+        )
+    return result
+
+
+# Engines opened by verifier worker processes, one per database URL
+_worker_engines: dict[str, Any] = {}
+
+
+def _verify_segment_job(
+    database_url: str,
+    tenant_id: UUID,
+    segment: Segment,
+    checkpoint_interval: int,
+    batch_size: int,
+    max_errors: int,
+) -> SegmentResult:
+    """Verify one segment on its own connection (runs in a worker process)"""
+    engine = _worker_engines.get(database_url)
+    if engine is None:
+        engine = _worker_engines[database_url] = create_engine(database_url)
+    with engine.connect() as conn:
+        rows = stream_chain(
+            conn, tenant_id, after=segment.start, until=segment.end, batch_size=batch_size
+        )
+        return verify_segment(
+            rows, segment, checkpoint_interval=checkpoint_interval, max_errors=max_errors
+        )
+
+
+# ---------------------------------------------------------------------------
+# Verifier
+# ---------------------------------------------------------------------------
+
+
+class ChainVerifier:
+    """
+    Verifies tenant audit chains in bounded memory.
+
+    Rows are streamed with a server-side cursor instead of being loaded
+    into a list. Every ``checkpoint_interval`` verified entries a signed
+    AuditCheckpoint is stored; checkpoints split the chain into segments
+    that ``processes`` worker processes verify in parallel, and the
+    incremental (nightly) run only verifies entries after the last
+    checkpoint.
+
+    An incremental run trusts history before the last checkpoint. Run with
+    ``full=True`` periodically to re-verify everything, including that
+    each checkpointed segment still holds exactly the anchored entries.
+
+    Usage:
+        ```python
+        from shared.libs.audit import ChainVerifier
+
+        verifier = ChainVerifier(SessionLocal, signing_key, processes=8)
+
+        result = verifier.verify(tenant_id)  # nightly: new entries only
+        result = verifier.verify(tenant_id, full=True)  # weekly: whole chain
+        ```
+
+    Args:
+        session_factory: Callable returning a new SQLAlchemy Session
+        signing_key: Secret key for checkpoint signatures
+        checkpoint_interval: Entries between checkpoints
+        processes: Worker processes (1 verifies in this process)
+        batch_size: Rows fetched per cursor round trip
+        max_errors: Error messages kept per run
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        signing_key: bytes,
+        *,
+        checkpoint_interval: int = 100000,
+        processes: int = 1,
+        batch_size: int = 10000,
+        max_errors: int = 100,
+    ):
+        if not signing_key:
+            raise ValueError("signing_key is required")
+        self.session_factory = session_factory
+        self.signing_key = signing_key
+        self.checkpoint_interval = checkpoint_interval
+        self.processes = processes
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+
+    def verify(self, tenant_id: UUID, *, full: bool = False) -> ChainVerification:
+        """
+        Verify a tenant chain and checkpoint the newly verified entries.
+
+        Args:
+            tenant_id: Tenant UUID
+            full: Verify from the first entry instead of the last checkpoint
+
+        Returns:
+            ChainVerification
+        """
+        started = time.perf_counter()
+
+        with self.session_factory() as db:
+            anchors, checkpoint_errors = load_checkpoints(db, tenant_id, self.signing_key)
+            start = GENESIS if full or not anchors else anchors[-1]
+            segments = self._plan(db, tenant_id, anchors, full=full)
+
+            result = ChainVerification(tenant_id=tenant_id, start=start, head=start)
+            for error in checkpoint_errors:
+                self._fail(result, error)
+
+            if segments:
+                results = self._run(db, tenant_id, segments)
+                new_anchors = self._merge(result, segments, results, after=anchors[-1:])
+                result.checkpoints_created = save_checkpoints(
+                    db, tenant_id, self.signing_key, new_anchors
+                )
+                db.commit()
+
+        result.duration_ms = (time.perf_counter() - started) * 1000
+        logger.info(
+            f"Audit chain verified: tenant={tenant_id} valid={result.is_valid} "
+            f"entries={result.entries_checked} segments={result.segments} "
+            f"duration_ms={result.duration_ms:.0f}"
+        )
+        return result
+
+    def _plan(
+        self, db: Session, tenant_id: UUID, anchors: list[ChainAnchor], *, full: bool
+    ) -> list[Segment]:
+        """Split the part of the chain to verify into segments"""
+        segments = []
+        start = GENESIS
+        for anchor in anchors:
+            if full:
+                segments.append(Segment(start=start, end=anchor))
+            start = anchor
+
+        head = get_head(db, tenant_id)
+        if head is None or head.entry_id == start.entry_id:
+            return segments
+
+        # Split the unanchored tail into time slices and count each one, so
+        # every slice knows its position in the chain
+        first = start.created_at
+        if first is None:
+            first = _utc(
+                db.execute(
+                    select(func.min(AuditLog.created_at)).where(AuditLog.tenant_id == tenant_id)
+                ).scalar_one()
+            )
+        slices = max(1, self.processes)
+        span = (head.created_at - first) / slices
+        bounds = [ChainAnchor(created_at=first + span * i) for i in range(1, slices)]
+
+        for bound in [*bounds, head]:
+            seq = start.seq + count_entries(db, tenant_id, after=start, until=bound)
+            if seq == start.seq:
+                continue
+            end = ChainAnchor(seq, bound.entry_id, None, bound.created_at)
+            linked = start.seq == 0 or start.entry_hash is not None
+            segments.append(Segment(start=start, end=end, linked=linked))
+            start = end
+        return segments
+
+    def _run(self, db: Session, tenant_id: UUID, segments: list[Segment]) -> list[SegmentResult]:
+        args = (self.checkpoint_interval, self.batch_size, self.max_errors)
+        if self.processes <= 1 or len(segments) == 1:
+            return [
+                verify_segment(
+                    stream_chain(
+                        db, tenant_id, after=s.start, until=s.end, batch_size=self.batch_size
+                    ),
+                    s,
+                    checkpoint_interval=self.checkpoint_interval,
+                    max_errors=self.max_errors,
+                )
+                for s in segments
+            ]
+
+        url = db.get_bind().url.render_as_string(hide_password=False)
+        with ProcessPoolExecutor(max_workers=min(self.processes, len(segments))) as pool:
+            futures = [pool.submit(_verify_segment_job, url, tenant_id, s, *args) for s in segments]
+            return [future.result() for future in futures]
+
+    def _merge(
+        self,
+        result: ChainVerification,
+        segments: list[Segment],
+        results: list[SegmentResult],
+        *,
+        after: list[ChainAnchor],
+    ) -> list[ChainAnchor]:
+        """Stitch segment results together; return anchors safe to checkpoint"""
+        known = after[-1].seq if after else 0
+        new_anchors: list[ChainAnchor] = []
+        prev = segments[0].start
+        trusted = result.is_valid
+
+        for segment, part in zip(segments, results, strict=True):
+            # Unlinked segments start mid-chain: check the seam here
+            if (
+                not segment.linked
+                and part.entries_checked
+                and part.first_prev_hash != prev.entry_hash
+            ):
+                part.fail(
+                    f"Entry {part.start_seq}: prev_hash mismatch. "
+                    f"Expected {prev.entry_hash}, got {part.first_prev_hash}",
+                    self.max_errors,
+                )
+                part.anchors.clear()
+
+            if trusted:
+                new_anchors.extend(a for a in part.anchors if a.seq > known)
+            trusted = trusted and part.is_valid
+
+            result.entries_checked += part.entries_checked
+            result.error_count += part.error_count
+            for error in part.errors:
+                if len(result.errors) < self.max_errors:
+                    result.errors.append(error)
+            prev = part.last if part.entries_checked else prev
+
+        result.segments = len(segments)
+        result.head = prev
+        # Anchor the verified head too, so the next run starts from here
+        if trusted and prev.seq > known and (not new_anchors or new_anchors[-1] != prev):
+            new_anchors.append(prev)
+        return new_anchors
+
+    def _fail(self, result: ChainVerification, message: str) -> None:
+        result.error_count += 1
+        if len(result.errors) < self.max_errors:
+            result.errors.append(message)
@@ -0,0 +1,243 @@
+"""
+SAHOOL Benchmark: alert-service period statistics
+Latency and peak RSS of get_alert_statistics over a 30-day window holding
+1M alerts for one tenant: the previous path (hydrate every Alert row and
+count in Python) vs. get_alert_statistics_direct (GROUP BY + percentile_cont)
+vs. get_alert_statistics (hourly rollup merged with the partial leading hour).
+Also reports what the rollup adds to a status update and a full rebuild.
+
+Each mode runs in its own process so peak RSS is measured independently.
+Requires PostgreSQL; the tables are created and dropped in the given database.
+
+Usage:
+    python tests/benchmarks/bench_alert_statistics.py --database-url postgresql://... --alerts 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import time
+from datetime import UTC, datetime, timedelta
+from queue import Empty
+from uuid import UUID
+
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, "apps/services/alert-service")
+
+from src.db_models import Alert, Base  # noqa: E402
+from src.repository import (  # noqa: E402
+    get_alert_statistics,
+    get_alert_statistics_direct,
+    rebuild_alert_rollups,
+    update_alert_status,
+)
+
+TENANT = UUID("6a1e7c2e-0000-4000-8000-000000000001")
+
+
+# ─── Previous path (get_alert_statistics before the rollup) ───
+
+
+def legacy_alert_statistics(db, *, tenant_id=None, field_id=None, days=30) -> dict:
+    cutoff = datetime.now(UTC) - timedelta(days=days)
+
+    query = select(Alert).where(Alert.created_at >= cutoff)
+
+    if tenant_id:
+        query = query.where(Alert.tenant_id == tenant_id)
+
+    if field_id:
+        query = query.where(Alert.field_id == field_id)
+
+    alerts = list(db.execute(query).scalars())
+
+    total = len(alerts)
+    active = len([a for a in alerts if a.status == "active"])
+
+    by_type = {}
+    by_severity = {}
+    by_status = {}
+
+    for alert in alerts:
+        by_type[alert.type] = by_type.get(alert.type, 0) + 1
+        by_severity[alert.severity] = by_severity.get(alert.severity, 0) + 1
+        by_status[alert.status] = by_status.get(alert.status, 0) + 1
+
+    resolution_times = []
+    for alert in alerts:
+        if alert.resolved_at and alert.created_at:
+            delta = alert.resolved_at - alert.created_at
+            hours = delta.total_seconds() / 3600
+            resolution_times.append(hours)
+
+    avg_resolution = sum(resolution_times) / len(resolution_times) if resolution_times else None
+
+    return {
+        "total_alerts": total,
+        "active_alerts": active,
+        "by_type": by_type,
+        "by_severity": by_severity,
+        "by_status": by_status,
+        "acknowledged_count": by_status.get("acknowledged", 0),
+        "resolved_count": by_status.get("resolved", 0),
+        "average_resolution_hours": (round(avg_resolution, 2) if avg_resolution else None),
+    }
+
+
+# ─── Setup ───
+
+
+def populate(url: str, count: int, days: int) -> None:
+    """
+    Alerts spread over ``days`` days; resolved ones took up to 3 days. None
+    are created within a day of the 30-day cutoff, so the window holds the
+    same alerts for every mode however long the slower ones run.
+    """
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                """
+                INSERT INTO alerts (id, tenant_id, field_id, type, severity, status,
+                                    title, message, created_at, resolved_at)
+                SELECT gen_random_uuid(), CAST(:tenant_id AS uuid), 'field-' || (i % 200),
+                       (ARRAY['weather', 'pest', 'disease', 'irrigation', 'ndvi_low'])
+                           [1 + i % 5],
+                       (ARRAY['critical', 'high', 'medium', 'low'])[1 + i % 4],
+                       status,
+                       'تنبيه', 'رسالة', created_at,
+                       CASE WHEN status = 'resolved'
+                            THEN created_at + ((i::bigint * 7919) % 259200) * interval '1 second'
+                       END
+                FROM (
+                    SELECT i,
+                           now() - (CASE WHEN age BETWEEN 29 * 86400 AND 31 * 86400
+                                         THEN age + 2 * 86400 ELSE age END)
+                               * interval '1 second' AS created_at,
+                           (ARRAY['active', 'acknowledged', 'resolved', 'resolved', 'dismissed'])
+                               [1 + i % 5] AS status
+                    FROM generate_series(1, :count) AS i,
+                         LATERAL (SELECT (i::bigint * 104729) % (:days * 86400) AS age) AS offsets
+                ) AS seed
+                """
+            ),
+            {"tenant_id": str(TENANT), "count": count, "days": days},
+        )
+        conn.execute(text("ANALYZE alerts"))
+    engine.dispose()
+
+
+def run_mode(url: str, mode: str, rounds: int, queue) -> None:
+    engine = create_engine(url)
+    db = sessionmaker(bind=engine, autoflush=False)()
+    fn = {
+        "legacy": legacy_alert_statistics,
+        "direct": get_alert_statistics_direct,
+        "rollup": get_alert_statistics,
+    }[mode]
+    seconds, stats = [], None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        stats = fn(db, tenant_id=TENANT, days=30)
+        seconds.append(time.perf_counter() - start)
+        db.rollback()
+        db.expunge_all()
+    stats.pop("median_resolution_hours", None)
+    stats.pop("p90_resolution_hours", None)
+    queue.put(
+        {
+            "seconds": sorted(seconds),
+            "stats": stats,
+            "peak_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        }
+    )
+    db.close()
+    engine.dispose()
+
+
+def in_child(url: str, mode: str, rounds: int) -> dict:
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=run_mode, args=(url, mode, rounds, queue))
+    process.start()
+    while True:
+        try:
+            outcome = queue.get(timeout=1)
+            break
+        except Empty:
+            if not process.is_alive():
+                raise RuntimeError(f"{mode} exited with code {process.exitcode}") from None
+    process.join()
+    return outcome
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--alerts", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=45, help="days the alerts are spread over")
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--legacy-rounds", type=int, default=3)
+    args = parser.parse_args()
+    if not args.database_url:
+        parser.error("--database-url (or DATABASE_URL) must point to PostgreSQL")
+
+    engine = create_engine(args.database_url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    began = time.perf_counter()
+    populate(args.database_url, args.alerts, args.days)
+    print(f"populated {args.alerts:,} alerts in {time.perf_counter() - began:.0f}s")
+
+    db = sessionmaker(bind=engine, autoflush=False)()
+    start = time.perf_counter()
+    rollup_rows = rebuild_alert_rollups(db)
+    db.commit()
+    rebuild_seconds = time.perf_counter() - start
+
+    modes = {
+        "hydrate + count (previous)": ("legacy", args.legacy_rounds),
+        "GROUP BY + percentile_cont": ("direct", args.rounds),
+        "hourly rollup + head": ("rollup", args.rounds),
+    }
+    results = {name: in_child(args.database_url, *mode) for name, mode in modes.items()}
+    reference = results["hydrate + count (previous)"]["stats"]
+    for name, r in results.items():
+        assert r["stats"] == reference, f"{name} differs: {r['stats']} != {reference}"
+
+    alert_ids = db.execute(select(Alert.id).where(Alert.status == "active").limit(200)).scalars()
+    start = time.perf_counter()
+    updated = 0
+    for alert_id in alert_ids:
+        update_alert_status(db, alert_id=alert_id, status="resolved", user_id="bench")
+        db.commit()
+        updated += 1
+    update_ms = (time.perf_counter() - start) / max(1, updated) * 1000
+    db.close()
+
+    print(f"{args.alerts:,} alerts for one tenant, 30-day window, {rollup_rows:,} rollup rows")
+    print(f"{'get_alert_statistics':<28}{'p50 ms':>10}{'max ms':>10}{'peak MB':>10}{'speedup':>10}")
+    baseline = None
+    for name, r in results.items():
+        p50 = r["seconds"][len(r["seconds"]) // 2]
+        baseline = baseline or p50
+        print(
+            f"{name:<28}{p50 * 1000:>10.1f}{r['seconds'][-1] * 1000:>10.1f}"
+            f"{r['peak_mb']:>10.0f}{baseline / p50:>9.0f}x"
+        )
+    print(f"update_alert_status + commit with rollup: {update_ms:.2f} ms per alert")
+    print(f"rebuild_alert_rollups: {rebuild_seconds:.1f}s")
+    print("all paths return identical counts and average resolution time")
+
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+SAHOOL Benchmark: analytics rollups
+DAU / WAU / MAU, retention, per-governorate uniques and feature usage over
+a synthetic event stream: raw scans that build Python sets over every event
+in range (previous UserAnalyticsService queries) vs. AnalyticsRollups
+(per-day bitmaps, HyperLogLog sketches and counters)
+
+Raw events are held as NumPy columns so 50M events fit in memory; the scan
+side still materialises every user id in range, like the original code.
+
+Usage:
+    python tests/benchmarks/bench_analytics_rollups.py --events 50000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import resource
+import sys
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+sys.path.insert(0, ".")
+
+from apps.kernel.analytics import AnalyticsRollups, EventType, Governorate  # noqa: E402
+
+START = date(2025, 1, 1)
+GOVERNORATES = [g.value for g in Governorate]
+FEATURES = ["field_management", "recommendations", "alerts", "reports", "irrigation", "maps"]
+CROPS = ["wheat", "coffee", "qat", "tomato", "sorghum", "mango"]
+EVENT_TYPES = [EventType.FIELD_VIEWED, EventType.LOGIN, EventType.CROP_PLANTED]
+
+
+def generate(n: int, users: int, days: int, seed: int, chunk: int = 5_000_000):
+    """Yield column chunks: day, user, governorate, feature, crop, event type"""
+    rng = np.random.default_rng(seed)
+    for offset in range(0, n, chunk):
+        size = min(chunk, n - offset)
+        user = (rng.pareto(1.2, size) * users / 20).astype(np.int64) % users
+        yield {
+            "day": rng.integers(0, days, size, dtype=np.int16),
+            "user": user.astype(np.int32),
+            # Each user farms in one governorate
+            "gov": (user % len(GOVERNORATES)).astype(np.int8),
+            "feature": rng.integers(-1, len(FEATURES), size, dtype=np.int8),
+            "crop": rng.integers(-1, len(CROPS), size, dtype=np.int8),
+            "type": rng.choice(3, size, p=[0.8, 0.15, 0.05]).astype(np.int8),
+        }
+
+
+def timed(fn, repeat: int = 3):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - start) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=50_000_000)
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=120)
+    args = parser.parse_args()
+
+    user_ids = [f"user_{i}" for i in range(args.users)]
+    columns = {k: [] for k in ("day", "user", "gov", "feature", "crop", "type")}
+    rollups = AnalyticsRollups()
+    days = [START + timedelta(days=d) for d in range(args.days)]
+
+    ingest = 0.0
+    for chunk in generate(args.events, args.users, args.days, seed=0):
+        for key, values in chunk.items():
+            columns[key].append(values)
+        start = time.perf_counter()
+        for day, user, gov, feature, crop, kind in zip(
+            chunk["day"].tolist(),
+            chunk["user"].tolist(),
+            chunk["gov"].tolist(),
+            chunk["feature"].tolist(),
+            chunk["crop"].tolist(),
+            chunk["type"].tolist(),
+            strict=True,
+        ):
+            rollups.record(
+                days[day],
+                user_ids[user],
+                EVENT_TYPES[kind],
+                governorate=GOVERNORATES[gov],
+                crop_type=CROPS[crop] if crop >= 0 else None,
+                feature=FEATURES[feature] if feature >= 0 else None,
+            )
+        ingest += time.perf_counter() - start
+
+    raw = {k: np.concatenate(v) for k, v in columns.items()}
+    del columns
+
+    def scan_users(first: int, last: int, extra=None) -> int:
+        mask = (raw["day"] >= first) & (raw["day"] <= last)
+        if extra is not None:
+            mask &= extra
+        return len(set(raw["user"][mask].tolist()))
+
+    def scan_retention(cohort_start: int, offset: int) -> float:
+        logins = (
+            (raw["type"] == 1) & (raw["day"] >= cohort_start) & (raw["day"] < cohort_start + 30)
+        )
+        cohort = set(raw["user"][logins].tolist())
+        active = set(raw["user"][raw["day"] == cohort_start + offset].tolist())
+        return len(cohort & active) / len(cohort)
+
+    def scan_by_governorate(first: int, last: int) -> dict:
+        mask = (raw["day"] >= first) & (raw["day"] <= last)
+        users, govs = raw["user"][mask].tolist(), raw["gov"][mask].tolist()
+        groups: dict[int, set] = {}
+        for user, gov in zip(users, govs, strict=True):
+            groups.setdefault(gov, set()).add(user)
+        return {GOVERNORATES[g]: len(u) for g, u in groups.items()}
+
+    feature_code = FEATURES.index("irrigation")
+    queries = [
+        (
+            "DAU",
+            lambda: scan_users(10, 10),
+            lambda: rollups.active_users(days[10], days[10]),
+        ),
+        (
+            "WAU",
+            lambda: scan_users(10, 17),
+            lambda: rollups.active_users(days[10], days[17]),
+        ),
+        (
+            "MAU",
+            lambda: scan_users(10, 40),
+            lambda: rollups.active_users(days[10], days[40]),
+        ),
+        (
+            "retention d7",
+            lambda: scan_retention(10, 7),
+            lambda: rollups.retention(days[10], 30, (7,))["retention"][7],
+        ),
+        (
+            "feature uniques/30d",
+            lambda: scan_users(10, 40, raw["feature"] == feature_code),
+            lambda: rollups.distinct("feature", "irrigation", days[10], days[40]),
+        ),
+        (
+            "users by gov/30d",
+            lambda: scan_by_governorate(10, 40),
+            lambda: rollups.distinct_by("governorate", days[10], days[40]),
+        ),
+    ]
+
+    print(
+        f"events={args.events:,} users={args.users:,} days={args.days} "
+        f"ingest={args.events / ingest:,.0f} events/s "
+        f"peak rss={resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:,.0f} MB"
+    )
+    print(f"rollups: {rollups.get_stats()}")
+    print(f"{'query':<22} {'scan ms':>10} {'rollup ms':>10} {'speedup':>8} {'rel err':>8}")
+    for name, scan, rollup in queries:
+        expected, scan_ms = timed(scan, repeat=1)
+        actual, rollup_ms = timed(rollup)
+        if isinstance(expected, dict):
+            error = max(abs(actual[k] - v) / v for k, v in expected.items())
+        else:
+            error = abs(actual - expected) / expected if expected else 0.0
+        print(
+            f"{name:<22} {scan_ms:>10.1f} {rollup_ms:>10.2f} "
+            f"{scan_ms / rollup_ms:>7.0f}x {error:>8.2%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+SAHOOL Benchmark: local vector store
+Recall@10 and QPS of the embedded IVF index vs. exact NumPy search
+
+Usage:
+    python tests/benchmarks/bench_ann_vector_store.py --vectors 1000000 --dim 384
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, "packages")
+
+from advisor.rag.ann_store import IVFIndex
+
+
+def clustered_vectors(n: int, dim: int, clusters: int, rng: np.random.Generator) -> np.ndarray:
+    """Embedding-like data: points scattered around topic centers."""
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    out = np.empty((n, dim), dtype=np.float32)
+    for start in range(0, n, 100_000):
+        stop = min(start + 100_000, n)
+        labels = rng.integers(0, clusters, size=stop - start)
+        out[start:stop] = centers[labels] + 0.4 * rng.standard_normal((stop - start, dim))
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--vectors", type=int, default=200_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--clusters", type=int, default=1000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--nlist", type=int, default=1024)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[8, 16, 32])
+    parser.add_argument("--mmap", action="store_true", help="store codes in a memory-mapped file")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    data = clustered_vectors(args.vectors, args.dim, args.clusters, rng)
+    normalized = data / np.linalg.norm(data, axis=1, keepdims=True)
+    queries = normalized[rng.choice(args.vectors, args.queries, replace=False)]
+    queries = queries + 0.05 * rng.standard_normal(queries.shape).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    start = time.perf_counter()
+    truth = [set(np.argpartition(-(normalized @ q), 10)[:10].tolist()) for q in queries]
+    exact_qps = args.queries / (time.perf_counter() - start)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = f"{tmp}/bench.npy" if args.mmap else None
+        start = time.perf_counter()
+        index = IVFIndex(args.dim, path=path, nlist=args.nlist, train_size=args.vectors + 1)
+        for offset in range(0, args.vectors, 50_000):
+            stop = min(offset + 50_000, args.vectors)
+            index.upsert([str(i) for i in range(offset, stop)], data[offset:stop])
+        index.train()
+        build_s = time.perf_counter() - start
+
+        print(f"vectors={args.vectors:,} dim={args.dim} lists={len(index._centroids)}")
+        print(
+            f"float32 size={normalized.nbytes / 1e6:.0f} MB  int8 size={index._codes.nbytes / 1e6:.0f} MB"
+        )
+        print(f"build+train: {build_s:.1f} s")
+        print(f"{'exact numpy':<14} recall@10=1.000  qps={exact_qps:8.1f}")
+
+        for nprobe in args.nprobe:
+            index.nprobe = nprobe
+            start = time.perf_counter()
+            found = [index.search(q, 10) for q in queries]
+            qps = args.queries / (time.perf_counter() - start)
+            recall = np.mean(
+                [len(t & {int(doc_id) for doc_id, _, _ in f}) / 10 for t, f in zip(truth, found)]
+            )
+            print(f"{'ivf nprobe=' + str(nprobe):<14} recall@10={recall:.3f}  qps={qps:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
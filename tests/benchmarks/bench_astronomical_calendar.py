@@ -0,0 +1,86 @@
+"""
+SAHOOL Benchmark: astronomical calendar best-days query
+Latency of a 365-day /v1/best-days query: recomputing every day per request
+(previous endpoint loop) vs. the precomputed AstronomicalTable, and the
+end-to-end endpoint with and without a matching If-None-Match
+
+Usage:
+    python tests/benchmarks/bench_astronomical_calendar.py --days 365
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, "apps/services/astronomical-calendar/src")
+
+import main as calendar_service  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+
+def best_days_recompute(activity: str, start: datetime, days: int) -> list[str]:
+    found = []
+    for i in range(days):
+        data = calendar_service.get_daily_astronomical_data(start + timedelta(days=i))
+        for rec in data.recommendations:
+            if rec.activity == activity and rec.suitability_score >= 7:
+                found.append(data.date_gregorian)
+                break
+    return found
+
+
+def best_days_table(activity: str, start: datetime, days: int) -> list[str]:
+    table = calendar_service.get_astronomical_table()
+    return [d.date_gregorian for d in table.best_days(activity, start.date(), days)]
+
+
+def timeit(fn, repeat: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--activity", default="زراعة")
+    args = parser.parse_args()
+
+    now = datetime.utcnow()
+    # The table holds one row per day, computed at midnight UTC
+    start = datetime(now.year, now.month, now.day)
+    build_start = time.perf_counter()
+    table = calendar_service.get_astronomical_table()
+    build_ms = (time.perf_counter() - build_start) * 1000
+
+    assert best_days_recompute(args.activity, start, args.days) == best_days_table(
+        args.activity, start, args.days
+    )
+
+    recompute = timeit(lambda: best_days_recompute(args.activity, start, args.days), args.repeat)
+    lookup = timeit(lambda: best_days_table(args.activity, start, args.days), args.repeat)
+
+    client = TestClient(calendar_service.app)
+    params = {"activity": args.activity, "days": args.days}
+    etag = client.get("/v1/best-days", params=params).headers["etag"]
+    endpoint = timeit(lambda: client.get("/v1/best-days", params=params), args.repeat)
+    revalidate = timeit(
+        lambda: client.get("/v1/best-days", params=params, headers={"If-None-Match": etag}),
+        args.repeat,
+    )
+
+    print(f"table: {len(table)} days built in {build_ms:.1f} ms, query days={args.days}")
+    print(f"{'recompute':<12} {recompute:8.3f} ms/query")
+    print(f"{'table':<12} {lookup:8.3f} ms/query  ({recompute / lookup:.0f}x)")
+    print(f"{'endpoint':<12} {endpoint:8.3f} ms/request")
+    print(f"{'304':<12} {revalidate:8.3f} ms/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+SAHOOL Benchmark: audit chain verification
+Wall time and peak memory for verifying one tenant chain: load-everything
+list + verify_chain (previous HashChainValidator.load_from_database path)
+vs. ChainVerifier streaming, parallel segments and the nightly incremental
+run after new entries.
+
+Each mode runs in its own process so peak RSS is measured independently.
+Defaults to a file-backed SQLite database; pass --database-url to run
+against PostgreSQL (where yield_per uses a real server-side cursor).
+
+Usage:
+    python tests/benchmarks/bench_audit_verifier.py --entries 20000000 --processes 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import multiprocessing
+import resource
+import sys
+import tempfile
+import time
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from queue import Empty
+from uuid import UUID, uuid4
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, ".")
+
+from shared.libs.audit.hashchain import build_canonical_string, verify_chain  # noqa: E402
+from shared.libs.audit.models import AuditLog, Base  # noqa: E402
+from shared.libs.audit.verifier import ChainVerifier  # noqa: E402
+
+SIGNING_KEY = b"bench-checkpoint-key"
+
+
+def populate(url: str, tenant_id: UUID, count: int, start: datetime, prev_hash=None) -> str:
+    """Insert ``count`` chained entries in bulk; return the last hash"""
+    engine = create_engine(url)
+    actor_id = uuid4()
+    rows = []
+    with engine.begin() as conn:
+        for i in range(count):
+            created_at = start + timedelta(milliseconds=i)
+            correlation_id = uuid4()
+            details_json = f'{{"ndvi": 0.61, "seq": {i}}}'
+            canonical = build_canonical_string(
+                tenant_id=str(tenant_id),
+                actor_id=str(actor_id),
+                actor_type="user",
+                action="field.update",
+                resource_type="field",
+                resource_id=f"field-{i % 5000}",
+                correlation_id=str(correlation_id),
+                details_json=details_json,
+                created_at_iso=created_at.isoformat(),
+            )
+            entry_hash = hashlib.sha256(((prev_hash or "") + canonical).encode()).hexdigest()
+            rows.append(
+                {
+                    "id": uuid4(),
+                    "tenant_id": tenant_id,
+                    "actor_id": actor_id,
+                    "actor_type": "user",
+                    "action": "field.update",
+                    "resource_type": "field",
+                    "resource_id": f"field-{i % 5000}",
+                    "correlation_id": correlation_id,
+                    "details_json": details_json,
+                    "prev_hash": prev_hash,
+                    "entry_hash": entry_hash,
+                    "created_at": created_at,
+                    "version": 1,
+                }
+            )
+            prev_hash = entry_hash
+            if len(rows) == 50000:
+                conn.execute(insert(AuditLog), rows)
+                rows = []
+        if rows:
+            conn.execute(insert(AuditLog), rows)
+    engine.dispose()
+    return prev_hash
+
+
+def load_all(url: str, tenant_id: UUID, **_) -> dict:
+    """Previous path: load every ORM entry into a list, then verify_chain"""
+    engine = create_engine(url)
+    with sessionmaker(bind=engine)() as db:
+        stmt = (
+            select(AuditLog)
+            .where(AuditLog.tenant_id == tenant_id)
+            .order_by(AuditLog.created_at.asc())
+        )
+        entries = [
+            {
+                "tenant_id": e.tenant_id,
+                "actor_id": e.actor_id,
+                "actor_type": e.actor_type,
+                "action": e.action,
+                "resource_type": e.resource_type,
+                "resource_id": e.resource_id,
+                "correlation_id": e.correlation_id,
+                "details_json": e.details_json,
+                "prev_hash": e.prev_hash,
+                "entry_hash": e.entry_hash,
+                "created_at": e.created_at.replace(tzinfo=UTC).isoformat(),
+            }
+            for e in db.execute(stmt).scalars()
+        ]
+    is_valid, _ = verify_chain(iter(entries))
+    return {"valid": is_valid, "checked": len(entries)}
+
+
+def run_verifier(url: str, tenant_id: UUID, *, full: bool, processes: int) -> dict:
+    engine = create_engine(url)
+    verifier = ChainVerifier(sessionmaker(bind=engine), SIGNING_KEY, processes=processes)
+    result = verifier.verify(tenant_id, full=full)
+    return {"valid": result.is_valid, "checked": result.entries_checked}
+
+
+def measured(fn, queue, *args, **kwargs) -> None:
+    start = time.perf_counter()
+    outcome = fn(*args, **kwargs)
+    outcome["seconds"] = time.perf_counter() - start
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    workers = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    outcome["peak_mb"] = own / 1024
+    outcome["worker_peak_mb"] = workers / 1024
+    queue.put(outcome)
+
+
+def in_child(fn, *args, **kwargs) -> dict:
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=measured, args=(fn, queue, *args), kwargs=kwargs)
+    process.start()
+    while True:
+        try:
+            outcome = queue.get(timeout=1)
+            break
+        except Empty:
+            if not process.is_alive():
+                raise RuntimeError(f"{fn.__name__} exited with code {process.exitcode}") from None
+    process.join()
+    return outcome
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=20_000_000)
+    parser.add_argument("--new-entries", type=int, default=None, help="default: 1%% of entries")
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--skip-load-all", action="store_true", help="skip the list baseline")
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    url = args.database_url or f"sqlite+pysqlite:///{Path(tmp.name) / 'audit.db'}"
+    engine = create_engine(url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    engine.dispose()
+
+    tenant_id = uuid4()
+    start = datetime(2026, 1, 1, tzinfo=UTC)
+    began = time.perf_counter()
+    last_hash = populate(url, tenant_id, args.entries, start)
+    print(f"populated {args.entries:,} entries in {time.perf_counter() - began:.0f}s")
+
+    results = []
+    if not args.skip_load_all:
+        results.append(("list + verify_chain", in_child(load_all, url, tenant_id)))
+    results.append(
+        ("streaming, first run", in_child(run_verifier, url, tenant_id, full=True, processes=1))
+    )
+    results.append(
+        (
+            f"parallel full, {args.processes} procs",
+            in_child(run_verifier, url, tenant_id, full=True, processes=args.processes),
+        )
+    )
+
+    new_entries = args.new_entries or max(1, args.entries // 100)
+    populate(url, tenant_id, new_entries, start + timedelta(milliseconds=args.entries), last_hash)
+    results.append(
+        (
+            f"nightly (+{new_entries:,} new)",
+            in_child(run_verifier, url, tenant_id, full=False, processes=1),
+        )
+    )
+
+    print(f"{'mode':<28}{'checked':>12}{'seconds':>10}{'peak MB':>10}{'worker MB':>11}{'ok':>5}")
+    for name, r in results:
+        print(
+            f"{name:<28}{r['checked']:>12,}{r['seconds']:>10.1f}{r['peak_mb']:>10.0f}"
+            f"{r['worker_peak_mb']:>11.0f}{'yes' if r['valid'] else 'NO':>5}"
+        )
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+SAHOOL Benchmark: audit log group commits
+Audit writes/s with 64 concurrent requests: one write_audit_log transaction
+per request (previous per-entry head query + commit) vs. AuditWriter group
+commits with cached chain heads. Also counts forked chains.
+
+Defaults to a file-backed SQLite database; pass --database-url to run
+against PostgreSQL.
+
+Usage:
+    python tests/benchmarks/bench_audit_writer.py --concurrency 64 --writes 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from uuid import uuid4
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, ".")
+
+from shared.libs.audit.models import AuditLog, Base  # noqa: E402
+from shared.libs.audit.service import write_audit_log  # noqa: E402
+from shared.libs.audit.writer import AuditWriter  # noqa: E402
+
+
+def audit_fields(tenant_id, i: int) -> dict:
+    return {
+        "tenant_id": tenant_id,
+        "actor_id": uuid4(),
+        "actor_type": "user",
+        "action": "field.update",
+        "resource_type": "field",
+        "resource_id": f"field-{i}",
+        "correlation_id": uuid4(),
+        "details": {"ndvi": 0.61, "irrigation_mm": 12},
+    }
+
+
+def make_session_factory(url: str):
+    connect_args = {"timeout": 60, "check_same_thread": False} if url.startswith("sqlite") else {}
+    engine = create_engine(url, connect_args=connect_args, pool_size=80, max_overflow=0)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    return engine, sessionmaker(bind=engine)
+
+
+def count_forks(session_factory) -> int:
+    """Entries whose parent already has another child"""
+    with session_factory() as db:
+        rows = db.execute(select(AuditLog.tenant_id, AuditLog.prev_hash)).all()
+    children = Counter(rows)
+    return sum(n - 1 for n in children.values())
+
+
+async def run_per_request(session_factory, tenants, concurrency: int, writes: int):
+    def write_one(tenant_id, i):
+        with session_factory() as db:
+            write_audit_log(db, **audit_fields(tenant_id, i))
+            db.commit()
+
+    async def request(worker: int):
+        for i in range(writes):
+            tenant_id = tenants[(worker + i) % len(tenants)]
+            await asyncio.to_thread(write_one, tenant_id, i)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(request(w) for w in range(concurrency)))
+    return time.perf_counter() - start
+
+
+async def run_group_commit(session_factory, tenants, concurrency: int, writes: int):
+    writer = AuditWriter(session_factory)
+
+    async def request(worker: int):
+        for i in range(writes):
+            tenant_id = tenants[(worker + i) % len(tenants)]
+            await writer.write(**audit_fields(tenant_id, i))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(request(w) for w in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    await writer.close()
+    return elapsed, writer.stats.to_dict()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--writes", type=int, default=20, help="writes per request loop")
+    parser.add_argument("--tenants", type=int, default=8)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    url = args.database_url or f"sqlite+pysqlite:///{Path(tmp.name) / 'audit.db'}"
+    tenants = [uuid4() for _ in range(args.tenants)]
+    total = args.concurrency * args.writes
+
+    engine, factory = make_session_factory(url)
+    baseline = asyncio.run(run_per_request(factory, tenants, args.concurrency, args.writes))
+    baseline_forks = count_forks(factory)
+    engine.dispose()
+
+    engine, factory = make_session_factory(url)
+    grouped, stats = asyncio.run(run_group_commit(factory, tenants, args.concurrency, args.writes))
+    grouped_forks = count_forks(factory)
+    engine.dispose()
+
+    print(f"database: {engine.dialect.name}, concurrency: {args.concurrency}, writes: {total}")
+    print(f"{'path':<28}{'writes/s':>12}{'forks':>8}")
+    print(f"{'per-request transaction':<28}{total / baseline:>12,.0f}{baseline_forks:>8}")
+    print(f"{'AuditWriter group commit':<28}{total / grouped:>12,.0f}{grouped_forks:>8}")
+    print(f"speedup: {baseline / grouped:.1f}x")
+    print(f"writer stats: {stats}")
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
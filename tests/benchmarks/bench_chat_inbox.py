@@ -0,0 +1,369 @@
+"""
+SAHOOL Benchmark: field-chat inbox read model
+Inbox-open latency and database load for 100k active users on PostgreSQL:
+the previous path (participants → threads IN (...) ordered by
+last_message_at, unread counts from chat_participants and, for previews,
+the latest message of every listed thread) vs. one range scan of the
+denormalized chat_inbox read model. Opens are measured one at a time and
+with concurrent clients; database load is the statements, buffer pages
+touched and rows read per open from pg_stat_database. Also measures the
+send-message write path (previous unread fan-out in the request vs. the
+event log append) and what the projection worker then pays per message.
+
+The large tenant is generated in SQL with its inbox rows derived from the
+same data, and both paths must return the same inbox for sampled users. A
+small second tenant is driven through ChatRepository and the InboxProjector,
+including a rebuild from the event log, and checked against a direct replay
+of the same operations.
+
+Requires PostgreSQL; the tables are created and dropped in the given database.
+
+Usage:
+    python tests/benchmarks/bench_chat_inbox.py --database-url postgres://... --users 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import datetime
+from uuid import UUID, uuid4
+
+from tortoise import Tortoise, connections
+from tortoise.expressions import F
+
+sys.path.insert(0, "apps/services/field-chat")
+
+from src.models import ChatMessage, ChatParticipant, ChatThread  # noqa: E402
+from src.projections import InboxProjector  # noqa: E402
+from src.repository import ChatRepository  # noqa: E402
+
+TENANT = "bench-tenant"
+CHECK_TENANT = "bench-check"
+TABLES = (
+    "chat_inbox, chat_inbox_threads, chat_events, chat_messages, chat_threads,"
+    " chat_participants, chat_attachments"
+)
+
+
+# ─── Previous path (ChatRepository before the inbox read model) ───
+
+
+async def legacy_list_threads(tenant_id, user_id, limit=50, offset=0):
+    query = ChatThread.filter(tenant_id=tenant_id, is_archived=False)
+    participant_threads = await ChatParticipant.filter(
+        tenant_id=tenant_id,
+        user_id=user_id,
+    ).values_list("thread_id", flat=True)
+    query = query.filter(id__in=participant_threads)
+    return await query.order_by("-last_message_at").offset(offset).limit(limit)
+
+
+async def legacy_get_unread_counts(tenant_id, user_id):
+    participants = await ChatParticipant.filter(
+        tenant_id=tenant_id,
+        user_id=user_id,
+    ).values("thread_id", "unread_count")
+    return {str(p["thread_id"]): p["unread_count"] for p in participants}
+
+
+async def legacy_create_message(tenant_id, thread_id, sender_id, text):
+    # The fan-out used ChatParticipant.unread_count + 1, which raises; F() is what it meant
+    message = await ChatMessage.create(
+        id=uuid4(), tenant_id=tenant_id, thread_id=thread_id, sender_id=sender_id, text=text
+    )
+    await ChatThread.filter(id=thread_id).update(
+        last_message_at=datetime.utcnow(),
+        message_count=await ChatMessage.filter(thread_id=thread_id).count(),
+    )
+    await (
+        ChatParticipant.filter(thread_id=thread_id)
+        .exclude(user_id=sender_id)
+        .update(unread_count=F("unread_count") + 1)
+    )
+    return message
+
+
+async def legacy_open(user_id, previews: bool):
+    """What a client fetched to draw the inbox: threads, unread counts, previews"""
+    threads = await legacy_list_threads(TENANT, user_id)
+    unread = await legacy_get_unread_counts(TENANT, user_id)
+    last = {}
+    if previews:
+        for thread in threads:
+            messages = (
+                await ChatMessage.filter(thread_id=thread.id, tenant_id=TENANT)
+                .order_by("-created_at")
+                .limit(1)
+            )
+            last[thread.id] = messages[0].text if messages else None
+    return [(t.id, unread.get(str(t.id), 0), last.get(t.id)) for t in threads]
+
+
+async def inbox_open(repo: ChatRepository, user_id):
+    entries = await repo.get_inbox(TENANT, user_id)
+    return [(e.thread_id, e.unread_count, e.last_message_preview) for e in entries]
+
+
+# ─── Setup ───
+
+
+async def populate(users: int, per_thread: int, memberships: int, messages: int) -> int:
+    """
+    Thread t has ``per_thread`` participants chosen by a permutation of the
+    user ids, so every user is in ``memberships`` threads. Inbox rows are
+    what the projection yields for the same threads, messages and counts.
+    """
+    db = connections.get("default")
+    threads = users * memberships // per_thread
+    await db.execute_query(
+        """
+        INSERT INTO chat_threads (id, tenant_id, scope_type, scope_id, created_by, created_at,
+                                  title, is_archived, last_message_at, message_count, event_seq)
+        SELECT md5('t' || t)::uuid, $1, 'field', 'field-' || t, 'user-0',
+               now() - interval '90 days', 'Field ' || t, false,
+               now() - ((t * 7919) % 2592000) * interval '1 second', $2, 0
+        FROM generate_series(0, $3 - 1) AS t
+        """,
+        [TENANT, messages, threads],
+    )
+    await db.execute_query(
+        """
+        INSERT INTO chat_participants (id, tenant_id, thread_id, user_id, unread_count,
+                                       is_muted, joined_at)
+        SELECT gen_random_uuid(), $1, md5('t' || t)::uuid,
+               'user-' || ((t::bigint * $2 + k) * 7919 % $3), (t + k) % 4, false,
+               now() - interval '90 days'
+        FROM generate_series(0, $4 - 1) AS t, generate_series(0, $2 - 1) AS k
+        """,
+        [TENANT, per_thread, users, threads],
+    )
+    await db.execute_query(
+        """
+        INSERT INTO chat_messages (id, tenant_id, thread_id, sender_id, text, attachments,
+                                   message_type, is_edited, created_at)
+        SELECT gen_random_uuid(), th.tenant_id, th.id, 'user-' || j, 'رسالة ' || j || ' عن الري والحقل',
+               '[]', 'text', false, th.last_message_at - j * interval '1 minute'
+        FROM chat_threads AS th, generate_series(0, $2 - 1) AS j
+        WHERE th.tenant_id = $1
+        """,
+        [TENANT, messages],
+    )
+    await db.execute_query(
+        """
+        INSERT INTO chat_inbox_threads (thread_id, tenant_id, seq, scope_type, scope_id,
+            created_by, created_at, title, is_archived, message_count, last_message_id,
+            last_message_preview, last_sender_id, last_message_at, activity_at)
+        SELECT DISTINCT ON (th.id) th.id, th.tenant_id, 0, th.scope_type, th.scope_id,
+               th.created_by, th.created_at, th.title, th.is_archived, th.message_count,
+               m.id, m.text, m.sender_id, th.last_message_at, th.last_message_at
+        FROM chat_threads AS th JOIN chat_messages AS m ON m.thread_id = th.id
+        WHERE th.tenant_id = $1
+        ORDER BY th.id, m.created_at DESC
+        """,
+        [TENANT],
+    )
+    await db.execute_query(
+        """
+        INSERT INTO chat_inbox (tenant_id, user_id, thread_id, scope_type, scope_id, created_by,
+            created_at, title, is_archived, message_count, last_message_id, last_message_preview,
+            last_sender_id, last_message_at, activity_at, unread_count, joined_at)
+        SELECT p.tenant_id, p.user_id, s.thread_id, s.scope_type, s.scope_id, s.created_by,
+               s.created_at, s.title, s.is_archived, s.message_count, s.last_message_id,
+               s.last_message_preview, s.last_sender_id, s.last_message_at, s.activity_at,
+               p.unread_count, p.joined_at
+        FROM chat_participants AS p JOIN chat_inbox_threads AS s ON s.thread_id = p.thread_id
+        WHERE p.tenant_id = $1
+        """,
+        [TENANT],
+    )
+    await db.execute_script("VACUUM ANALYZE")
+    return threads
+
+
+async def check_projection(repo: ChatRepository) -> None:
+    """
+    Inbox built through the repository and projector, with catch-ups at
+    random points, equals a direct replay of the same operations and
+    survives a rebuild from the event log
+    """
+    rng = random.Random(3)
+    projector = InboxProjector()
+    unread: dict[UUID, dict[str, int]] = {}
+    threads = []
+    for t in range(40):
+        thread, _ = await repo.get_or_create_thread(CHECK_TENANT, "task", f"task-{t}", "user-0")
+        unread[thread.id] = {"user-0": 0}
+        for user in rng.sample(range(1, 30), 6):
+            await repo.add_participant(CHECK_TENANT, thread.id, f"user-{user}")
+            unread[thread.id][f"user-{user}"] = 0
+        threads.append(thread)
+    for i in range(600):
+        thread = rng.choice(threads)
+        members = unread[thread.id]
+        sender = rng.choice(sorted(members))
+        await repo.create_message(CHECK_TENANT, thread.id, sender, f"m{i}")
+        for user in members:
+            members[user] += user != sender
+        if i % 7 == 0:
+            user = rng.choice(sorted(members))
+            await repo.mark_read(thread.id, user)
+            members[user] = 0
+        if i % 97 == 0 and len(members) > 1:
+            user = rng.choice(sorted(members))
+            await repo.remove_participant(thread.id, user)
+            del members[user]
+        if i % 13 == 0:
+            await projector.catch_up(rng.choice(threads).id)
+    await projector.catch_up_pending()
+
+    async def inbox(user_id):
+        entries = await repo.get_inbox(CHECK_TENANT, user_id, limit=100)
+        return {e.thread_id: e.unread_count for e in entries}
+
+    users = [f"user-{u}" for u in range(30)]
+    incremental = {u: await inbox(u) for u in users}
+    for user in users:
+        expected = {t: members[user] for t, members in unread.items() if user in members}
+        assert incremental[user] == expected, user
+    await projector.rebuild(CHECK_TENANT)
+    assert {u: await inbox(u) for u in users} == incremental
+
+
+async def db_stats() -> dict:
+    rows = await connections.get("default").execute_query_dict(
+        """
+        SELECT xact_commit + xact_rollback AS xacts, blks_hit + blks_read AS pages,
+               tup_returned + tup_fetched AS rows
+        FROM pg_stat_database WHERE datname = current_database()
+        """
+    )
+    return rows[0]
+
+
+async def measure(open_fn, users: list[str], concurrency: int, statements: int):
+    """Latencies (sorted seconds), wall time and database work per open"""
+    await asyncio.sleep(1.5)  # Let backends flush pending statistics
+    before = await db_stats()
+    semaphore = asyncio.Semaphore(concurrency)
+    seconds = []
+
+    async def one(user_id):
+        async with semaphore:
+            start = time.perf_counter()
+            await open_fn(user_id)
+            seconds.append(time.perf_counter() - start)
+
+    began = time.perf_counter()
+    await asyncio.gather(*(one(u) for u in users))
+    wall = time.perf_counter() - began
+    await asyncio.sleep(1.5)
+    after = await db_stats()
+    n = len(users)
+    return {
+        "seconds": sorted(seconds),
+        "opens_per_s": n / wall,
+        "statements": statements,
+        "pages": (after["pages"] - before["pages"]) / n,
+        "rows": (after["rows"] - before["rows"]) / n,
+    }
+
+
+async def run(args) -> None:
+    url = args.database_url
+    url += ("&" if "?" in url else "?") + f"maxsize={max(args.concurrency, 5)}"
+    await Tortoise.init(db_url=url, modules={"models": ["src.models"]})
+    db = connections.get("default")
+    await db.execute_script(f"DROP TABLE IF EXISTS {TABLES} CASCADE")
+    await Tortoise.generate_schemas()
+
+    repo = ChatRepository()
+    await check_projection(repo)
+    print("check tenant: incremental projection, rebuild and replay agree")
+
+    began = time.perf_counter()
+    threads = await populate(args.users, args.per_thread, args.memberships, args.messages)
+    print(
+        f"populated {args.users:,} users, {threads:,} threads, "
+        f"{threads * args.messages:,} messages, {threads * args.per_thread:,} inbox rows "
+        f"in {time.perf_counter() - began:.0f}s"
+    )
+
+    rng = random.Random(11)
+    sample = [f"user-{rng.randrange(args.users)}" for _ in range(200)]
+    for user in sample[:50]:
+        legacy = await legacy_open(user, previews=True)
+        assert legacy == await inbox_open(repo, user), user
+
+    paths = [
+        ("previous: threads + unread", lambda u: legacy_open(u, previews=False), 3),
+        ("previous: + previews", lambda u: legacy_open(u, previews=True), 3 + 20),
+        ("inbox read model", lambda u: inbox_open(repo, u), 1),
+    ]
+    print(
+        f"\n{'inbox open':<28}{'clients':>8}{'p50 ms':>9}{'p95 ms':>9}{'opens/s':>9}"
+        f"{'stmts':>7}{'pages':>8}{'rows':>8}"
+    )
+    for concurrency in (1, args.concurrency):
+        users = [f"user-{rng.randrange(args.users)}" for _ in range(args.opens)]
+        for name, fn, statements in paths:
+            m = await measure(fn, users, concurrency, statements)
+            s = m["seconds"]
+            print(
+                f"{name:<28}{concurrency:>8}{s[len(s) // 2] * 1000:>9.2f}"
+                f"{s[int(len(s) * 0.95)] * 1000:>9.2f}{m['opens_per_s']:>9.0f}"
+                f"{m['statements']:>7}{m['pages']:>8.0f}{m['rows']:>8.0f}"
+            )
+
+    # Write path: per-message cost in the request, then in the worker
+    thread_ids = [
+        UUID(str(r["id"]))
+        for r in await db.execute_query_dict(
+            "SELECT id FROM chat_threads WHERE tenant_id = $1 ORDER BY random() LIMIT $2",
+            [TENANT, args.writes],
+        )
+    ]
+    start = time.perf_counter()
+    for thread_id in thread_ids:
+        await legacy_create_message(TENANT, thread_id, "user-1", "رسالة جديدة")
+    legacy_ms = (time.perf_counter() - start) / len(thread_ids) * 1000
+    start = time.perf_counter()
+    for thread_id in thread_ids:
+        await repo.create_message(TENANT, thread_id, "user-1", text="رسالة جديدة")
+    send_ms = (time.perf_counter() - start) / len(thread_ids) * 1000
+    projector = InboxProjector()
+    start = time.perf_counter()
+    for thread_id in thread_ids:
+        assert await projector.catch_up(thread_id) == 1
+    project_ms = (time.perf_counter() - start) / len(thread_ids) * 1000
+    print(
+        f"\nsend message: previous {legacy_ms:.2f} ms (count + unread fan-out), "
+        f"now {send_ms:.2f} ms (event log append); projection {project_ms:.2f} ms per message"
+    )
+
+    await db.execute_script(f"DROP TABLE IF EXISTS {TABLES} CASCADE")
+    await Tortoise.close_connections()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--memberships", type=int, default=20, help="threads per user")
+    parser.add_argument("--per-thread", type=int, default=10, help="participants per thread")
+    parser.add_argument("--messages", type=int, default=20, help="messages per thread")
+    parser.add_argument("--opens", type=int, default=2000, help="inbox opens per measurement")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--writes", type=int, default=1000)
+    args = parser.parse_args()
+    if not args.database_url:
+        parser.error("--database-url (or DATABASE_URL) must point to PostgreSQL")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+"""
+SAHOOL Benchmark: field-chat message search
+Latency of ChatRepository.search_messages for one tenant holding 10M Arabic
+messages: the previous path (``text ILIKE '%q%'`` ordered by created_at) vs.
+the chat_message_search tsvector/GIN read model, ranked by relevance and by
+recency, on the first page and deep in the keyset pagination. Also counts the
+spelling-variant matches the substring scan misses and the per-message cost
+the projection worker pays to index.
+
+Messages are generated from a Zipf-distributed vocabulary with the usual
+spelling variation (hamza forms, taa marbuta/haa, tashkeel, attached
+articles). A small second tenant is checked against the embedded
+MemorySearchIndex so both backends return the same messages.
+
+Requires PostgreSQL; the tables are created and dropped in the given database.
+
+Usage:
+    python tests/benchmarks/bench_chat_search.py --database-url postgres://... --messages 10000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from collections import Counter
+from datetime import UTC, datetime
+from uuid import uuid4
+
+from tortoise import Tortoise, connections
+
+sys.path.insert(0, "apps/services/field-chat")
+
+from src.models import ChatMessage  # noqa: E402
+from src.repository import ChatRepository  # noqa: E402
+from src.search import (  # noqa: E402
+    MemorySearchIndex,
+    PostgresSearchIndex,
+    SearchDocument,
+    analyze,
+    parse_query,
+)
+from src.search.arabic import to_tsvector_literal  # noqa: E402
+
+TENANT = "bench-tenant"
+CHECK_TENANT = "bench-check"
+
+# Field vocabulary; each entry lists the spellings people actually type
+WORDS = [
+    ["الأمطار", "الامطار", "أمطار", "امطار", "والأمطار"],
+    ["الري", "للري", "بالري", "والري"],
+    ["المزرعة", "المزرعه", "مزرعة", "بالمزرعة"],
+    ["الحقل", "حقل", "الحقول", "بالحقل", "للحقل"],
+    ["السماد", "سماد", "الأسمدة", "الاسمدة"],
+    ["المبيد", "مبيد", "المبيدات", "مُبيد"],
+    ["القمح", "قمح", "للقمح"],
+    ["الطماطم", "طماطم", "الطماطة"],
+    ["آفة", "افة", "الآفات", "الافات"],
+    ["إصابة", "اصابة", "الإصابة", "إصابات"],
+    ["المضخة", "المضخه", "مضخة"],
+    ["الحصاد", "حصاد", "للحصاد"],
+    ["التربة", "التربه", "تربة"],
+    ["الرطوبة", "رطوبة", "الرطوبه"],
+    ["العمال", "عمال", "العاملين"],
+    ["غداً", "غدا", "غدًا"],
+    ["اليوم", "اليومَ"],
+    ["الشمالي", "الشمالى", "شمالي"],
+    ["الصقيع", "صقيع"],
+    ["التنقيط", "بالتنقيط"],
+]
+FILLER = ["في", "على", "من", "إلى", "تم", "يرجى", "بعد", "قبل", "هل", "لا", "نعم", "كل"]
+
+
+def make_vocabulary(size: int, rng: random.Random) -> list[list[str]]:
+    """Field words plus synthetic three/four letter words for a long tail"""
+    letters = "بتثجحخدذرزسشصضطظعغفقكلمنهوي"
+    vocabulary = list(WORDS)
+    seen = {w for forms in WORDS for w in forms}
+    while len(vocabulary) < size:
+        root = "".join(rng.choice(letters) for _ in range(rng.choice((3, 4))))
+        if root in seen:
+            continue
+        seen.add(root)
+        vocabulary.append([root, "ال" + root, root + "ات", "وال" + root])
+    return vocabulary
+
+
+def make_corpus(count: int, vocabulary: list[list[str]], rng: random.Random) -> list[str]:
+    weights = [1 / (rank + 1) ** 1.1 for rank in range(len(vocabulary))]
+    corpus = []
+    for _ in range(count):
+        words = []
+        for forms in rng.choices(vocabulary, weights, k=rng.randint(5, 14)):
+            words.append(rng.choice(forms))
+            if rng.random() < 0.3:
+                words.append(rng.choice(FILLER))
+        corpus.append(" ".join(words))
+    return corpus
+
+
+def rarest_term(corpus: list[str]) -> str:
+    """An original word whose term occurs in exactly one corpus text"""
+    counts = Counter(term for text in corpus for term in set(analyze(text)))
+    for text in corpus:
+        for word in text.split():
+            if len(word) > 3 and counts[analyze(word)[0]] == 1:
+                return word
+    raise RuntimeError("corpus has no rare words; lower --corpus or raise --vocabulary")
+
+
+# ─── Previous path (ChatRepository.search_messages before the index) ───
+
+
+async def legacy_search_messages(tenant_id, query_text, thread_id=None, sender_id=None, limit=50):
+    query = ChatMessage.filter(
+        tenant_id=tenant_id,
+        text__icontains=query_text,
+    )
+
+    if thread_id:
+        query = query.filter(thread_id=thread_id)
+    if sender_id:
+        query = query.filter(sender_id=sender_id)
+
+    return await query.order_by("-created_at").limit(limit)
+
+
+# ─── Setup ───
+
+
+async def populate(tenant_id: str, count: int, corpus: list[str]) -> None:
+    """
+    Messages reference the corpus by index, and the search rows carry the
+    exact tsvector the projection worker writes for that text.
+    """
+    db = connections.get("default")
+    await db.execute_script(
+        "DROP TABLE IF EXISTS bench_corpus;"
+        "CREATE UNLOGGED TABLE bench_corpus (idx INT PRIMARY KEY, text TEXT, terms TSVECTOR)"
+    )
+    await db.execute_many(
+        "INSERT INTO bench_corpus VALUES ($1, $2, CAST($3 AS tsvector))",
+        [[i, text, to_tsvector_literal(analyze(text))] for i, text in enumerate(corpus)],
+    )
+    step = 1_000_000
+    for first in range(1, count + 1, step):
+        last = min(count, first + step - 1)
+        await db.execute_query(
+            """
+            WITH seed AS (
+                SELECT gen_random_uuid() AS id, i,
+                       md5($4 || (i % 2000))::uuid AS thread_id,
+                       now() - (($3::bigint - i) * interval '2 seconds') AS created_at
+                FROM generate_series($1::bigint, $2::bigint) AS i
+            ), messages AS (
+                INSERT INTO chat_messages (id, tenant_id, thread_id, sender_id, text,
+                                           attachments, message_type, is_edited, created_at)
+                SELECT s.id, $5, s.thread_id, 'user-' || (s.i % 500), c.text,
+                       '[]', 'text', false, s.created_at
+                FROM seed AS s
+                JOIN bench_corpus AS c ON c.idx = (s.i * 7919) % $6
+                RETURNING id
+            )
+            INSERT INTO chat_message_search
+                (message_id, tenant_id, thread_id, sender_id, created_at, event_at, terms)
+            SELECT s.id, $5, s.thread_id, 'user-' || (s.i % 500), s.created_at,
+                   s.created_at, c.terms
+            FROM seed AS s
+            JOIN bench_corpus AS c ON c.idx = (s.i * 7919) % $6
+            """,
+            [first, last, count, tenant_id, tenant_id, len(corpus)],
+        )
+    await db.execute_script(
+        "DROP TABLE bench_corpus; ANALYZE chat_messages; ANALYZE chat_message_search"
+    )
+
+
+async def timed(fn, rounds: int):
+    seconds, result = [], None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = await fn()
+        seconds.append(time.perf_counter() - start)
+    return sorted(seconds), result
+
+
+async def deep_page(repo: ChatRepository, q: str, pages: int, order: str):
+    """Time to the last of ``pages`` pages, following next_cursor"""
+    cursor = None
+    for _ in range(pages - 1):
+        page = await repo.search_messages(TENANT, q, limit=50, cursor=cursor, order=order)
+        cursor = page.next_cursor
+        if cursor is None:
+            return None
+    start = time.perf_counter()
+    await repo.search_messages(TENANT, q, limit=50, cursor=cursor, order=order)
+    return time.perf_counter() - start
+
+
+async def check_against_memory(corpus: list[str]) -> None:
+    """Both backends return the same messages in recency order"""
+    await populate(CHECK_TENANT, 3000, corpus)
+    memory = MemorySearchIndex()
+    postgres = PostgresSearchIndex()
+    for q in ("الامطار", "مزرعة الري", "آفة", "سماد ", "الحق"):
+        query = parse_query(q)
+        a = await postgres.search(CHECK_TENANT, query, limit=500, order="recent")
+        b = await memory.search(CHECK_TENANT, query, limit=500, order="recent")
+        assert [h.message_id for h in a.hits] == [h.message_id for h in b.hits], q
+
+
+async def run(args) -> None:
+    await Tortoise.init(db_url=args.database_url, modules={"models": ["src.models"]})
+    db = connections.get("default")
+    await db.execute_script(
+        "DROP TABLE IF EXISTS chat_message_search, chat_messages, chat_threads,"
+        " chat_participants, chat_attachments CASCADE"
+    )
+    await Tortoise.generate_schemas()
+    index = PostgresSearchIndex()
+    await index.ensure_schema()
+
+    rng = random.Random(7)
+    vocabulary = make_vocabulary(args.vocabulary, rng)
+    corpus = make_corpus(args.corpus, vocabulary, rng)
+
+    began = time.perf_counter()
+    await populate(TENANT, args.messages, corpus)
+    print(f"populated {args.messages:,} messages in {time.perf_counter() - began:.0f}s")
+    await check_against_memory(corpus)
+
+    repo = ChatRepository(search_index=index)
+    queries = {
+        "common word": "الأمطار",
+        "variant spelling": "امطار",
+        "two words": "مزرعة الري",
+        "mid-frequency": vocabulary[60][0],
+        "rare word": rarest_term(corpus),
+        "typing prefix": "المضخ",
+    }
+
+    print(f"{'query':<18}{'mode':<26}{'p50 ms':>10}{'max ms':>10}{'hits':>8}{'speedup':>10}")
+    for label, q in queries.items():
+        legacy_seconds, legacy = await timed(
+            lambda q=q: legacy_search_messages(TENANT, q), args.legacy_rounds
+        )
+        baseline = legacy_seconds[len(legacy_seconds) // 2]
+        rows = [("ILIKE (previous)", legacy_seconds, len(legacy))]
+        for order in ("relevance", "recent"):
+            seconds, page = await timed(
+                lambda q=q, order=order: repo.search_messages(TENANT, q, limit=50, order=order),
+                args.rounds,
+            )
+            assert all("<mark>" in hit.highlight for hit in page.hits), (q, order)
+            rows.append((f"index, {order}", seconds, len(page.hits)))
+        for name, seconds, hits in rows:
+            p50 = seconds[len(seconds) // 2]
+            print(
+                f"{label:<18}{name:<26}{p50 * 1000:>10.1f}{seconds[-1] * 1000:>10.1f}"
+                f"{hits:>8}{baseline / p50:>9.0f}x"
+            )
+        for order in ("relevance", "recent"):
+            deep = await deep_page(repo, q, args.deep_page, order)
+            if deep is not None:
+                print(f"{label:<18}{f'index, {order} p{args.deep_page}':<26}{deep * 1000:>10.1f}")
+
+    # Spelling variants the substring scan cannot see
+    variant = await db.execute_query_dict(
+        """
+        SELECT count(*) FILTER (WHERE text ILIKE '%امطار%') AS substring,
+               count(*) FILTER (WHERE terms @@ CAST('امطار' AS tsquery)) AS indexed
+        FROM chat_messages JOIN chat_message_search ON message_id = id
+        WHERE chat_messages.tenant_id = $1
+        """,
+        [TENANT],
+    )
+    print(
+        f"messages about rain: ILIKE '%امطار%' finds {variant[0]['substring']:,}, "
+        f"the index finds {variant[0]['indexed']:,}"
+    )
+
+    thread_id = uuid4()
+    docs = [
+        SearchDocument(
+            message_id=uuid4(),
+            tenant_id=TENANT,
+            thread_id=thread_id,
+            sender_id="user-1",
+            text=corpus[i],
+            created_at=datetime.now(UTC),
+        )
+        for i in range(args.index_writes)
+    ]
+    start = time.perf_counter()
+    for doc in docs:
+        await index.index([doc])
+    index_ms = (time.perf_counter() - start) / len(docs) * 1000
+    print(f"projection worker indexing: {index_ms:.2f} ms per message")
+
+    await db.execute_script(
+        "DROP TABLE IF EXISTS chat_message_search, chat_messages, chat_threads,"
+        " chat_participants, chat_attachments CASCADE"
+    )
+    await Tortoise.close_connections()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--messages", type=int, default=10_000_000)
+    parser.add_argument("--corpus", type=int, default=200_000, help="distinct message texts")
+    parser.add_argument("--vocabulary", type=int, default=20_000)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--legacy-rounds", type=int, default=3)
+    parser.add_argument("--deep-page", type=int, default=20)
+    parser.add_argument("--index-writes", type=int, default=1000)
+    args = parser.parse_args()
+    if not args.database_url:
+        parser.error("--database-url (or DATABASE_URL) must point to PostgreSQL")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
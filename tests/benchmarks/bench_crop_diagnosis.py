@@ -0,0 +1,187 @@
+"""
+SAHOOL Benchmark: crop disease diagnosis under concurrent uploads
+Throughput, p50/p95 latency and event-loop lag (what /healthz and every
+other endpoint wait for) with 50 concurrent clients on CPU:
+DiagnosisService.diagnose called inline from the async endpoint (previous
+path: one model call per image, image and history writes on the request)
+vs. diagnose_async through the dynamic batching InferenceServer.
+
+TensorFlow is not required: a synthetic Keras-style model (pooled input,
+three dense layers, ~220 MB of float32 weights) stands in for the CNN so that
+per-call weight traffic behaves like a real model on CPU.
+
+Usage:
+    python tests/benchmarks/bench_crop_diagnosis.py --clients 50 --requests 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+os.environ["UPLOAD_DIR"] = tempfile.mkdtemp()
+sys.path.insert(0, "apps/services/crop-health-ai")
+
+from src.services.diagnosis_service import DiagnosisService  # noqa: E402
+from src.services.inference_server import InferenceServer  # noqa: E402
+from src.services.prediction_service import PredictionService  # noqa: E402
+
+
+class SyntheticModel:
+    """Keras-like predict(): 4x4 pool -> 9408x4096 -> 4096x4096 -> 38 classes"""
+
+    def __init__(self, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        self.w1 = rng.standard_normal((56 * 56 * 3, 4096), dtype=np.float32) * 0.01
+        self.w2 = rng.standard_normal((4096, 4096), dtype=np.float32) * 0.02
+        self.w3 = rng.standard_normal((4096, 38), dtype=np.float32) * 0.05
+
+    def predict(self, x: np.ndarray, verbose: int = 0) -> np.ndarray:
+        pooled = x.reshape(len(x), 56, 4, 56, 4, 3).mean(axis=(2, 4)).reshape(len(x), -1)
+        hidden = np.maximum(np.maximum(pooled @ self.w1, 0) @ self.w2, 0)
+        return hidden @ self.w3
+
+
+def make_service() -> PredictionService:
+    service = PredictionService(model_path="synthetic")
+    service.model = SyntheticModel()
+    service.model_type = "keras"
+    service.is_loaded = service.is_real_model = True
+    return service
+
+
+def make_images(n: int) -> list[bytes]:
+    """3 MP phone-sized photos (~800 KB JPEG): colour gradients plus sensor noise"""
+    rng = np.random.default_rng(1)
+    yy, xx = np.mgrid[0:1536, 0:2048]
+    images = []
+    for i in range(n):
+        base = np.stack([(xx / 8 + i) % 255, (yy / 6) % 255, ((xx + yy) / 10) % 255], axis=-1)
+        pixels = np.clip(base + rng.normal(0, 12, base.shape), 0, 255).astype(np.uint8)
+        buffer = io.BytesIO()
+        Image.fromarray(pixels).save(buffer, format="JPEG", quality=85)
+        images.append(buffer.getvalue())
+    return images
+
+
+async def run_clients(call, images: list[bytes], clients: int, per_client: int) -> dict:
+    """Closed-loop clients: each sends its next upload when the previous response arrives"""
+    latencies: list[float] = []
+
+    async def client(offset: int) -> None:
+        sent = began
+        for i in range(per_client):
+            await call(images[(offset + i) % len(images)])
+            done = time.perf_counter()
+            latencies.append(done - sent)
+            sent = done
+            await asyncio.sleep(0)  # response goes back to the client
+
+    lags: list[float] = []
+    done = asyncio.Event()
+
+    async def probe() -> None:
+        # A 10 ms ticker; its overshoot is how long other requests wait for the loop
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.01)
+            lags.append(time.perf_counter() - start - 0.01)
+
+    prober = asyncio.create_task(probe())
+    began = time.perf_counter()
+    await asyncio.gather(*(client(c) for c in range(clients)))
+    wall = time.perf_counter() - began
+    done.set()
+    await prober
+    latencies.sort()
+    lags.sort()
+    return {
+        "requests": len(latencies),
+        "throughput": len(latencies) / wall,
+        "p50": statistics.median(latencies) * 1000,
+        "p95": percentile(latencies, 0.95) * 1000,
+        "lag_p95": percentile(lags, 0.95) * 1000,
+    }
+
+
+def percentile(values: list[float], q: float) -> float:
+    return values[max(0, int(len(values) * q) - 1)]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=20, help="per client")
+    parser.add_argument("--max-batch-size", type=int, default=16)
+    parser.add_argument("--max-wait-ms", type=float, default=10)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    images = make_images(16)
+    service = make_service()
+
+    # Previous path: sync diagnose inside the async endpoint
+    import src.services.diagnosis_service as module
+
+    module.prediction_service = service
+    inline = DiagnosisService()
+
+    async def diagnose_inline(image: bytes):
+        return inline.diagnose(image, "leaf.jpg")
+
+    server = InferenceServer(
+        service,
+        max_batch_size=args.max_batch_size,
+        max_wait_ms=args.max_wait_ms,
+        workers=args.workers,
+    )
+    batched = DiagnosisService(inference=server)
+
+    async def diagnose_batched(image: bytes):
+        return await batched.diagnose_async(image, "leaf.jpg")
+
+    # Alternate modes and keep the median round - shared CPUs are noisy
+    runs: dict[str, list[dict]] = {"inline diagnose (previous)": [], "dynamic batching": []}
+    for _ in range(args.rounds):
+        runs["inline diagnose (previous)"].append(
+            await run_clients(diagnose_inline, images, args.clients, args.requests)
+        )
+        await server.start()
+        await batched.start()
+        runs["dynamic batching"].append(
+            await run_clients(diagnose_batched, images, args.clients, args.requests)
+        )
+        await batched.stop()
+        await server.stop()
+    metrics = server.get_metrics()
+
+    print(
+        f"{args.clients} concurrent clients x {args.requests} uploads (2048x1536 JPEG), "
+        f"median of {args.rounds} rounds"
+    )
+    print(f"{'mode':<30}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'loop lag p95':>14}")
+    for name, rounds in runs.items():
+        r = sorted(rounds, key=lambda r: r["throughput"])[len(rounds) // 2]
+        print(
+            f"{name:<30}{r['throughput']:>9.1f}{r['p50']:>10.0f}{r['p95']:>10.0f}"
+            f"{r['lag_p95']:>14.1f}"
+        )
+    print(
+        f"avg batch {metrics['avg_batch_size']}, "
+        f"avg queue wait {metrics['avg_queue_wait_ms']} ms, "
+        f"batch sizes {metrics['batch_size_histogram']}"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
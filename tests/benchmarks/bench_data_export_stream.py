@@ -0,0 +1,161 @@
+"""
+SAHOOL Benchmark: large sensor-reading exports
+Peak RSS, time-to-first-byte and total time for exporting a year of
+10-minute readings: the previous buffered path (list of rows + one CSV
+string, as DataExporter.export_sensor_readings built it) vs. the streaming
+DataExporter.stream_sensor_readings writers (CSV, gzip CSV, NDJSON,
+GeoJSON and optionally write-only Excel) fed by a row cursor.
+
+Each mode runs in its own process so peak RSS is measured independently.
+Output chunks go to /dev/null the way a StreamingResponse hands them to
+the socket; the streamed CSV is checked against the buffered bytes.
+
+Usage:
+    python tests/benchmarks/bench_data_export_stream.py --rows 10000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import hashlib
+import io
+import multiprocessing
+import os
+import resource
+import sys
+import time
+from collections.abc import Iterator
+from datetime import datetime, timedelta
+from queue import Empty
+
+sys.path.insert(0, "apps/kernel/field_ops/services")
+
+from data_exporter import OPENPYXL_AVAILABLE, DataExporter, ExportFormat  # noqa: E402
+
+SENSORS = [("رطوبة التربة", "soil_moisture", "%"), ("درجة الحرارة", "temperature", "°C")]
+
+
+def readings(count: int) -> Iterator[dict]:
+    """Row cursor: readings every 10 minutes across a farm's sensors"""
+    start = datetime(2025, 1, 1)
+    for i in range(count):
+        sensor_ar, sensor_en, unit = SENSORS[i % len(SENSORS)]
+        yield {
+            "timestamp": (start + timedelta(minutes=10 * (i // 50))).isoformat(),
+            "sensor_type": sensor_ar,
+            "sensor_type_en": sensor_en,
+            "value": round(20 + (i % 400) / 10, 1),
+            "unit": unit,
+            "location": f"منطقة {i % 50}",
+        }
+
+
+# ─── Previous buffered path (DataExporter before streaming) ───
+
+
+def legacy_sensors_to_csv(exporter: DataExporter, sensors: list[dict]) -> str:
+    if not sensors:
+        return ""
+
+    output = io.StringIO()
+    output.write("\ufeff")  # BOM
+
+    fieldnames = list(sensors[0].keys())
+    translated = [exporter.ARABIC_HEADERS.get(f, f) for f in fieldnames]
+
+    writer = csv.DictWriter(output, fieldnames=fieldnames)
+    writer.writerow(dict(zip(fieldnames, translated, strict=False)))
+    writer.writerows(sensors)
+
+    return output.getvalue()
+
+
+def run_buffered(rows: int) -> dict:
+    start = time.perf_counter()
+    exporter = DataExporter()
+    data = legacy_sensors_to_csv(exporter, list(readings(rows))).encode("utf-8")
+    first_byte = time.perf_counter() - start
+    with open(os.devnull, "wb") as sink:
+        sink.write(data)
+    return {"ttfb": first_byte, "bytes": len(data), "sha256": hashlib.sha256(data).hexdigest()}
+
+
+def run_stream(rows: int, format: ExportFormat, compress: bool = False) -> dict:
+    start = time.perf_counter()
+    stream = DataExporter().stream_sensor_readings(
+        "F1", format, rows=readings(rows), compress=compress
+    )
+    digest = hashlib.sha256()
+    first_byte = None
+    with open(os.devnull, "wb") as sink:
+        for chunk in stream:
+            if first_byte is None:
+                first_byte = time.perf_counter() - start
+            digest.update(chunk)
+            sink.write(chunk)
+    return {"ttfb": first_byte, "bytes": stream.size_bytes, "sha256": digest.hexdigest()}
+
+
+def measured(fn, queue, *args) -> None:
+    start = time.perf_counter()
+    outcome = fn(*args)
+    outcome["seconds"] = time.perf_counter() - start
+    outcome["peak_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    queue.put(outcome)
+
+
+def in_child(fn, *args) -> dict:
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=measured, args=(fn, queue, *args))
+    process.start()
+    while True:
+        try:
+            outcome = queue.get(timeout=1)
+            break
+        except Empty:
+            if not process.is_alive():
+                raise RuntimeError(f"{fn.__name__} exited with code {process.exitcode}") from None
+    process.join()
+    return outcome
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--skip-buffered", action="store_true", help="skip the buffered baseline")
+    parser.add_argument("--excel", action="store_true", help="also stream write-only Excel")
+    args = parser.parse_args()
+
+    modes = []
+    if not args.skip_buffered:
+        modes.append(("buffered csv (previous)", run_buffered, ()))
+    modes += [
+        ("stream csv", run_stream, (ExportFormat.CSV,)),
+        ("stream csv + gzip", run_stream, (ExportFormat.CSV, True)),
+        ("stream ndjson", run_stream, (ExportFormat.NDJSON,)),
+        ("stream geojson", run_stream, (ExportFormat.GEOJSON,)),
+    ]
+    if args.excel and OPENPYXL_AVAILABLE:
+        modes.append(("stream xlsx (write-only)", run_stream, (ExportFormat.EXCEL,)))
+
+    results = {name: in_child(fn, args.rows, *extra) for name, fn, extra in modes}
+
+    if not args.skip_buffered:
+        assert (
+            results["stream csv"]["sha256"] == results["buffered csv (previous)"]["sha256"]
+        ), "streamed CSV differs from the buffered export"
+
+    print(f"{args.rows:,} sensor readings")
+    print(f"{'mode':<28}{'MB out':>10}{'TTFB ms':>10}{'seconds':>10}{'peak MB':>10}")
+    for name, r in results.items():
+        print(
+            f"{name:<28}{r['bytes'] / 2**20:>10.0f}{r['ttfb'] * 1000:>10.1f}"
+            f"{r['seconds']:>10.1f}{r['peak_mb']:>10.0f}"
+        )
+    if not args.skip_buffered:
+        print("streamed CSV is byte-identical to the buffered export")
+
+
+if __name__ == "__main__":
+    main()
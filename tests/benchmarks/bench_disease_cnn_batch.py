@@ -0,0 +1,174 @@
+"""
+SAHOOL Benchmark: DiseaseCNNModel batch inference on CPU
+Images/s for field batches with TTA off and on: the previous per-image
+path (preprocess each image, one model call per batch, or with TTA five PIL
+round-trip variants and one model call per image; region estimation per
+original image) vs. DiseaseCNNModel.predict_batch (array TTA over the whole
+batch, one model call over the expanded batch, one connected-component
+pass for regions, next batch loaded while the model runs).
+
+TensorFlow is not required: a synthetic Keras-style model (pooled input,
+three dense layers, ~80 MB of float32 weights) stands in for the CNN so that
+per-call weight traffic behaves like a real model on CPU.
+
+Usage:
+    python tests/benchmarks/bench_disease_cnn_batch.py --images 64 --batch-size 16
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, "apps/services/ai-agents-core/src/models")
+
+import disease_cnn  # noqa: E402
+
+logging.getLogger("disease_cnn").setLevel(logging.WARNING)
+
+
+class SyntheticModel:
+    """Keras-like predict(): 4x4 pool -> 9408x2048 -> 2048x1024 -> 8 classes"""
+
+    def __init__(self, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        self.w1 = rng.standard_normal((56 * 56 * 3, 2048), dtype=np.float32) * 0.01
+        self.w2 = rng.standard_normal((2048, 1024), dtype=np.float32) * 0.02
+        self.w3 = rng.standard_normal((1024, 8), dtype=np.float32) * 0.05
+
+    def predict(self, x: np.ndarray, verbose: int = 0) -> np.ndarray:
+        pooled = x.reshape(len(x), 56, 4, 56, 4, 3).mean(axis=(2, 4)).reshape(len(x), -1)
+        logits = np.maximum(np.maximum(pooled @ self.w1, 0) @ self.w2, 0) @ self.w3
+        scores = np.exp(logits - logits.max(axis=1, keepdims=True))
+        return scores / scores.sum(axis=1, keepdims=True)
+
+
+def make_model() -> disease_cnn.DiseaseCNNModel:
+    disease_cnn.TF_AVAILABLE = True  # framework check only; the model is synthetic
+    model = disease_cnn.DiseaseCNNModel(framework="tensorflow", enable_gpu=False)
+    model.model = SyntheticModel()
+    return model
+
+
+def make_images(n: int, directory: Path) -> list[str]:
+    """1024x768 field photos on disk: green leaf texture with brown lesions"""
+    rng = np.random.default_rng(1)
+    paths = []
+    for i in range(n):
+        pixels = np.empty((768, 1024, 3), dtype=np.uint8)
+        pixels[:] = (60, 140, 50)
+        pixels = np.clip(pixels + rng.normal(0, 15, pixels.shape), 0, 255).astype(np.uint8)
+        for _ in range(3):
+            y, x = rng.integers(0, 700), rng.integers(0, 950)
+            pixels[y : y + 60, x : x + 70] = (150, 100, 40)
+        path = directory / f"leaf_{i}.jpg"
+        Image.fromarray(pixels).save(path, quality=90)
+        paths.append(str(path))
+    return paths
+
+
+# ─── Previous per-image path (DiseaseCNNModel before batched TTA) ───
+
+
+def legacy_augment(image: np.ndarray) -> list[np.ndarray]:
+    augmented = [image, np.fliplr(image)]
+    for angle in [-10, 10]:
+        pil_img = Image.fromarray((image * 255).astype(np.uint8))
+        rotated = pil_img.rotate(angle, fillcolor=(0, 0, 0))
+        augmented.append(np.array(rotated).astype(np.float32) / 255.0)
+    augmented.append(np.clip(image * 1.1, 0, 1))
+    return augmented
+
+
+def legacy_predict_batch(
+    model: disease_cnn.DiseaseCNNModel, images: list[str], batch_size: int, use_tta: bool
+) -> list[tuple[str, float, dict | None]]:
+    mean = np.array(model.config.NORMALIZATION_MEAN)
+    std = np.array(model.config.NORMALIZATION_STD)
+    names = list(model.config.SUPPORTED_DISEASES.keys())
+    results = []
+    for i in range(0, len(images), batch_size):
+        batch = images[i : i + batch_size]
+        if use_tta:
+            predictions = []
+            for path in batch:
+                resized = model.resize_to_input_size(Image.open(path).convert("RGB"), 224)
+                pixels = np.array(resized).astype(np.float32) / 255.0
+                variants = np.stack([(v - mean) / std for v in legacy_augment(pixels)])
+                predictions.append(model.model.predict(variants, verbose=0).mean(axis=0))
+        else:
+            arrays = []
+            for path in batch:
+                resized = model.resize_to_input_size(Image.open(path).convert("RGB"), 224)
+                arrays.append((np.array(resized).astype(np.float32) / 255.0 - mean) / std)
+            predictions = model.model.predict(np.stack(arrays), verbose=0)
+        for j, pred in enumerate(predictions):
+            idx = int(np.argmax(pred))
+            results.append((names[idx], float(pred[idx]), model._estimate_disease_region(batch[j])))
+    return results
+
+
+def timed(fn) -> tuple[float, list]:
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--images", type=int, default=64)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    model = make_model()
+    with tempfile.TemporaryDirectory() as directory:
+        images = make_images(args.images, Path(directory))
+        model.predict_batch(images[: args.batch_size], batch_size=args.batch_size)  # warm-up
+
+        modes = {
+            "per-image (previous)": lambda tta: legacy_predict_batch(
+                model, images, args.batch_size, tta
+            ),
+            "predict_batch": lambda tta: model.predict_batch(
+                images, batch_size=args.batch_size, use_tta=tta
+            ),
+        }
+        # Alternate modes and keep the median round - shared CPUs are noisy
+        seconds: dict[tuple[str, bool], list[float]] = {}
+        outputs: dict[tuple[str, bool], list] = {}
+        for _ in range(args.rounds):
+            for tta in (False, True):
+                for name, run in modes.items():
+                    elapsed, outputs[name, tta] = timed(lambda run=run, tta=tta: run(tta))
+                    seconds.setdefault((name, tta), []).append(elapsed)
+
+    for tta in (False, True):
+        previous = [r[0] for r in outputs["per-image (previous)", tta]]
+        batched = [r[0] for r in outputs["predict_batch", tta]]
+        agree = np.mean([a == b for a, b in zip(previous, batched, strict=True)])
+        print(f"TTA {'on ' if tta else 'off'}: top-1 agreement with previous path {agree:.0%}")
+
+    print(
+        f"{args.images} images (1024x768 JPEG), batch size {args.batch_size}, "
+        f"median of {args.rounds} rounds"
+    )
+    print(f"{'mode':<24}{'TTA':>5}{'images/s':>11}{'speedup':>10}")
+    for tta in (False, True):
+        baseline = None
+        for name in modes:
+            median = sorted(seconds[name, tta])[len(seconds[name, tta]) // 2]
+            rate = args.images / median
+            baseline = baseline or rate
+            print(f"{name:<24}{'on' if tta else 'off':>5}{rate:>11.1f}{rate / baseline:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+SAHOOL Benchmark: embedding micro-batching
+Throughput of 200 concurrent query embeddings: one forward pass per query
+(previous EmbeddingsManager.encode_query) vs. the async MicroBatcher
+
+Uses sentence-transformers when installed, otherwise a synthetic CPU encoder
+with a fixed per-call overhead and per-text cost.
+
+Usage:
+    python tests/benchmarks/bench_embedding_batcher.py --concurrency 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, "apps/services/ai-advisor/src/rag")
+
+from embedding_cache import EmbeddingCache, MicroBatcher  # noqa: E402
+
+
+def load_encoder(model_name: str):
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError:
+        weights = np.random.default_rng(0).standard_normal((768, 384)).astype(np.float32)
+
+        def synthetic(texts: list[str]) -> np.ndarray:
+            # ~2 ms fixed overhead per forward pass plus per-text work
+            time.sleep(0.002)
+            features = np.random.default_rng(len(texts)).standard_normal((len(texts) * 32, 768))
+            return (features.astype(np.float32) @ weights).reshape(len(texts), 32, 384).mean(1)
+
+        return synthetic, "synthetic"
+
+    model = SentenceTransformer(model_name, device="cpu")
+    return (lambda texts: model.encode(texts, convert_to_numpy=True)), model_name
+
+
+async def run_unbatched(encode, queries: list[str]) -> float:
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    await asyncio.gather(*(loop.run_in_executor(None, encode, [q]) for q in queries))
+    return time.perf_counter() - start
+
+
+async def run_batched(encode, queries: list[str], max_batch: int, wait_ms: float):
+    batcher = MicroBatcher(encode, max_batch_size=max_batch, max_wait_ms=wait_ms)
+    start = time.perf_counter()
+    await asyncio.gather(*(batcher.submit(q) for q in queries))
+    elapsed = time.perf_counter() - start
+    await batcher.close()
+    return elapsed, batcher.stats.to_dict()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--wait-ms", type=float, default=5.0)
+    parser.add_argument(
+        "--model", default="sentence-transformers/paraphrase-multilingual-mpnet-base-v2"
+    )
+    args = parser.parse_args()
+
+    encode, name = load_encoder(args.model)
+    queries = [f"متى أروي الطماطم هذا الأسبوع؟ حقل رقم {i}" for i in range(args.concurrency)]
+    encode(queries[:2])  # warm up
+
+    unbatched = asyncio.run(run_unbatched(encode, queries))
+    batched, stats = asyncio.run(run_batched(encode, queries, args.max_batch, args.wait_ms))
+
+    cache = EmbeddingCache(name)
+    for q in queries:
+        cache.put(q, np.zeros(4))
+    start = time.perf_counter()
+    for q in queries:
+        cache.get(q)
+    cached = time.perf_counter() - start
+
+    n = args.concurrency
+    print(f"encoder={name} concurrent queries={n}")
+    print(f"{'unbatched':<10} {n / unbatched:10.1f} queries/s")
+    print(
+        f"{'batched':<10} {n / batched:10.1f} queries/s  "
+        f"avg batch={stats['avg_batch_size']} avg wait={stats['avg_queue_wait_ms']} ms"
+    )
+    print(f"{'cache hit':<10} {n / cached:10.1f} queries/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""
+SAHOOL Benchmark: FAO-56 ET0 and water balance over a fields x days grid
+Field-days/s for a season of daily weather: the previous per-request path
+(scalar Penman-Monteith and water balance, one field-day at a time) vs. the
+shared vectorized engine (shared.fao56 over the whole grid), and the
+virtual-sensors batch path that also packs the request models.
+Results are checked against the scalar path.
+
+Usage:
+    python tests/benchmarks/bench_fao56_batch.py --fields 1000 --days 100
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import sys
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+sys.path.insert(0, "apps/services")
+sys.path.insert(0, "apps/services/virtual-sensors/src")
+
+import main as virtual_sensors  # noqa: E402
+from shared import fao56  # noqa: E402
+
+# ─── Previous scalar path (virtual-sensors before the shared engine) ───
+
+
+def legacy_et0(t_max, t_min, humidity, wind_speed, latitude, altitude, day_of_year, sunshine):
+    t_mean = (t_max + t_min) / 2
+    e_t_max = 0.6108 * math.exp((17.27 * t_max) / (t_max + 237.3))
+    e_t_min = 0.6108 * math.exp((17.27 * t_min) / (t_min + 237.3))
+    es = (e_t_max + e_t_min) / 2
+    ea = (humidity / 100) * es
+    vpd = es - ea
+    delta = (4098 * (0.6108 * math.exp((17.27 * t_mean) / (t_mean + 237.3)))) / (
+        (t_mean + 237.3) ** 2
+    )
+    gamma = 0.000665 * 101.3 * ((293 - 0.0065 * altitude) / 293) ** 5.26
+    lat_rad = math.radians(latitude)
+    solar_dec = 0.409 * math.sin(2 * math.pi * day_of_year / 365 - 1.39)
+    cos_ws = max(-1, min(1, -math.tan(lat_rad) * math.tan(solar_dec)))
+    ws = math.acos(cos_ws)
+    dr = 1 + 0.033 * math.cos(2 * math.pi * day_of_year / 365)
+    ra = (
+        (24 * 60 / math.pi)
+        * 0.0820
+        * dr
+        * (
+            ws * math.sin(lat_rad) * math.sin(solar_dec)
+            + math.cos(lat_rad) * math.cos(solar_dec) * math.sin(ws)
+        )
+    )
+    if sunshine is not None:
+        rs = (0.25 + 0.50 * sunshine / (24 * ws / math.pi)) * ra
+    else:
+        rs = 0.16 * math.sqrt(t_max - t_min) * ra
+    rso = (0.75 + 2e-5 * altitude) * ra
+    rs_rso = min(rs / rso, 1.0) if rso > 0 else 0.5
+    rnl = (
+        4.903e-9
+        * ((t_max + 273.16) ** 4 + (t_min + 273.16) ** 4)
+        / 2
+        * (0.34 - 0.14 * math.sqrt(ea))
+        * (1.35 * rs_rso - 0.35)
+    )
+    rn = 0.77 * rs - rnl
+    numerator = 0.408 * delta * rn + gamma * (900 / (t_mean + 273)) * wind_speed * vpd
+    return max(0, numerator / (delta + gamma * (1 + 0.34 * wind_speed)))
+
+
+def legacy_season(weather: dict, kc, taw, rainfall) -> np.ndarray:
+    fields, days = weather["t_max"].shape
+    available = np.empty((fields, days))
+    for i in range(fields):
+        water = taw[i]
+        for d in range(days):
+            et0 = legacy_et0(
+                float(weather["t_max"][i, d]),
+                float(weather["t_min"][i, d]),
+                float(weather["humidity"][i, d]),
+                float(weather["wind"][i, d]),
+                float(weather["latitude"][i, 0]),
+                float(weather["altitude"][i, 0]),
+                int(weather["day_of_year"][0, d]),
+                None if math.isnan(weather["sunshine"][i, d]) else float(weather["sunshine"][i, d]),
+            )
+            water = min(water + rainfall[i, d] * 0.8, taw[i])
+            water = max(0, water - et0 * kc[i])
+            available[i, d] = water
+    return available
+
+
+# ─── Inputs ───
+
+
+def make_weather(fields: int, days: int, seed: int = 3) -> dict:
+    rng = np.random.default_rng(seed)
+    t_min = rng.uniform(8, 24, (fields, days))
+    return {
+        "t_max": t_min + rng.uniform(6, 16, (fields, days)),
+        "t_min": t_min,
+        "humidity": rng.uniform(15, 85, (fields, days)),
+        "wind": rng.uniform(0.5, 5, (fields, days)),
+        "sunshine": np.where(
+            rng.random((fields, days)) < 0.5, rng.uniform(4, 12, (fields, days)), np.nan
+        ),
+        "latitude": rng.uniform(12.5, 17.5, (fields, 1)),
+        "altitude": rng.uniform(0, 2800, (fields, 1)),
+        "day_of_year": np.arange(120, 120 + days)[None, :],
+    }
+
+
+def engine_season(weather: dict, kc, taw, rainfall) -> np.ndarray:
+    et0 = fao56.reference_et0(
+        weather["t_max"],
+        weather["t_min"],
+        weather["humidity"],
+        weather["wind"],
+        weather["latitude"],
+        weather["day_of_year"],
+        weather["altitude"],
+        sunshine_hours=weather["sunshine"],
+    )
+    return fao56.daily_water_balance(et0, kc[:, None], taw, taw, rainfall).available_water
+
+
+def make_requests(weather: dict, rainfall) -> tuple[list, np.ndarray, np.ndarray]:
+    """virtual-sensors request models for the same grid (wheat, mid-season, loam)"""
+    fields, days = weather["t_max"].shape
+    start = date(2026, 1, 1) + timedelta(days=int(weather["day_of_year"][0, 0]) - 1)
+    requests = []
+    for i in range(fields):
+        series = [
+            virtual_sensors.DailyWaterInput(
+                day=start + timedelta(days=d),
+                temperature_max=weather["t_max"][i, d],
+                temperature_min=weather["t_min"][i, d],
+                humidity=weather["humidity"][i, d],
+                wind_speed=weather["wind"][i, d],
+                sunshine_hours=None
+                if np.isnan(weather["sunshine"][i, d])
+                else weather["sunshine"][i, d],
+                rainfall=rainfall[i, d],
+            )
+            for d in range(days)
+        ]
+        requests.append(
+            virtual_sensors.FieldWaterBalanceInput(
+                field_id=f"field_{i}",
+                crop_type="wheat",
+                growth_stage=virtual_sensors.GrowthStage.MID_SEASON,
+                soil_type=virtual_sensors.SoilType.LOAM,
+                latitude=weather["latitude"][i, 0],
+                altitude=weather["altitude"][i, 0],
+                days=series,
+            )
+        )
+    kc = np.full(
+        fields, virtual_sensors.get_crop_kc("wheat", virtual_sensors.GrowthStage.MID_SEASON)
+    )
+    root_depth = virtual_sensors.get_root_depth("wheat", virtual_sensors.GrowthStage.MID_SEASON)
+    taw = np.full(
+        fields,
+        virtual_sensors.calculate_available_water(virtual_sensors.SoilType.LOAM, root_depth)[0],
+    )
+    return requests, kc, taw
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--fields", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    weather = make_weather(args.fields, args.days)
+    rng = np.random.default_rng(4)
+    rainfall = np.where(
+        rng.random((args.fields, args.days)) < 0.1,
+        rng.uniform(2, 30, (args.fields, args.days)),
+        0.0,
+    )
+    requests, kc, taw = make_requests(weather, rainfall)
+
+    modes = {
+        "scalar per field-day (previous)": lambda: legacy_season(weather, kc, taw, rainfall),
+        "fao56 grid": lambda: engine_season(weather, kc, taw, rainfall),
+        "water-balance batch (models)": lambda: virtual_sensors.calculate_water_balance_batch(
+            requests
+        )["grid"].available_water,
+    }
+    # Alternate modes and keep the median round - shared CPUs are noisy
+    seconds: dict[str, list[float]] = {name: [] for name in modes}
+    outputs: dict[str, np.ndarray] = {}
+    for _ in range(args.rounds):
+        for name, run in modes.items():
+            start = time.perf_counter()
+            outputs[name] = run()
+            seconds[name].append(time.perf_counter() - start)
+
+    reference = outputs["scalar per field-day (previous)"]
+    for name, output in outputs.items():
+        error = float(np.max(np.abs(output - reference)))
+        assert error < 1e-9, f"{name} differs from the scalar path by {error}"
+
+    field_days = args.fields * args.days
+    print(
+        f"{args.fields} fields x {args.days} days = {field_days:,} field-days, median of {args.rounds} rounds"
+    )
+    print(f"{'mode':<34}{'ms':>10}{'field-days/s':>16}{'speedup':>10}")
+    baseline = None
+    for name in modes:
+        median = sorted(seconds[name])[len(seconds[name]) // 2]
+        baseline = baseline or median
+        print(
+            f"{name:<34}{median * 1000:>10.1f}{field_days / median:>16,.0f}{baseline / median:>9.1f}x"
+        )
+    print("available water matches the scalar path (max abs diff < 1e-9 mm)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+SAHOOL Benchmark: field boundary overlap detection
+Overlap checks per second against 10k / 100k / 1M registered fields:
+brute-force shape() + intersects over every field (previous
+BoundaryValidator.check_overlap_with_existing loop) vs. FieldSpatialIndex,
+plus snapshot save / load time
+
+Usage:
+    python tests/benchmarks/bench_field_spatial_index.py --sizes 10000 100000 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import shapely
+from shapely.geometry import shape
+
+sys.path.insert(0, "apps/kernel/field_ops/services")
+
+from spatial_index import FieldSpatialIndex  # noqa: E402
+
+# Fields are ~1 ha squares scattered over the Sana'a basin
+LON, LAT, SPAN, SIZE = 44.0, 15.2, 0.8, 0.001
+
+
+def make_fields(n: int, seed: int = 0) -> tuple[list[dict], np.ndarray]:
+    rng = np.random.default_rng(seed)
+    corners = rng.uniform(0, SPAN, size=(n, 2)) + (LON, LAT)
+    boxes = shapely.box(corners[:, 0], corners[:, 1], corners[:, 0] + SIZE, corners[:, 1] + SIZE)
+    fields = [
+        {"field_id": f"f{i}", "geometry": geom, "tenant_id": "t1", "user_id": f"u{i % 997}"}
+        for i, geom in enumerate(boxes)
+    ]
+    return fields, corners
+
+
+def make_queries(k: int, seed: int = 1) -> list[dict]:
+    rng = np.random.default_rng(seed)
+    corners = rng.uniform(0, SPAN, size=(k, 2)) + (LON, LAT)
+    return [
+        shapely.geometry.mapping(shapely.box(x, y, x + 2 * SIZE, y + 2 * SIZE)) for x, y in corners
+    ]
+
+
+def brute_force(query: dict, geojson_fields: list[dict]) -> set[str]:
+    new_polygon = shape(query)
+    hits = set()
+    for field in geojson_fields:
+        if new_polygon.intersects(shape(field["geometry"])):
+            hits.add(field["field_id"])
+    return hits
+
+
+def indexed(query: dict, index: FieldSpatialIndex) -> set[str]:
+    return {field["field_id"] for field, _ in index.query(query, partition="t1")}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument(
+        "--brute-queries", type=int, default=5, help="queries for the brute-force baseline"
+    )
+    args = parser.parse_args()
+
+    queries = make_queries(args.queries)
+    print(
+        f"{'fields':>10} {'brute/s':>10} {'index/s':>10} {'speedup':>8} "
+        f"{'build s':>8} {'save s':>7} {'load s':>7}"
+    )
+
+    for n in args.sizes:
+        fields, _ = make_fields(n)
+
+        start = time.perf_counter()
+        index = FieldSpatialIndex()
+        index.bulk_load(fields)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for query in queries:
+            indexed(query, index)
+        index_rate = len(queries) / (time.perf_counter() - start)
+
+        geojson_fields = [
+            {"field_id": f["field_id"], "geometry": shapely.geometry.mapping(f["geometry"])}
+            for f in fields
+        ]
+        brute_q = queries[: args.brute_queries]
+        start = time.perf_counter()
+        for query in brute_q:
+            expected = brute_force(query, geojson_fields)
+            assert expected == indexed(query, index)
+        brute_rate = len(brute_q) / (time.perf_counter() - start)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "fields.npz"
+            start = time.perf_counter()
+            index.save(path)
+            save = time.perf_counter() - start
+            start = time.perf_counter()
+            FieldSpatialIndex.load(path)
+            load = time.perf_counter() - start
+
+        print(
+            f"{n:>10} {brute_rate:>10.1f} {index_rate:>10.1f} {index_rate / brute_rate:>7.0f}x "
+            f"{build:>8.2f} {save:>7.2f} {load:>7.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+SAHOOL Benchmark: boundary geometry kernel
+Polygons/s for area, perimeter and Douglas-Peucker simplification of
+--polygons wobbly field rings of --vertices vertices each:
+
+- legacy: the per-polygon pure-Python loops that FieldBoundaryDetector used
+  (planar shoelace, haversine loop, recursive Douglas-Peucker), timed on
+  --legacy-sample polygons and extrapolated
+- kernel: shared ``geometry`` batch APIs on (batch x vertices x 2) arrays,
+  --batch polygons at a time over all of them
+
+Usage:
+    python tests/benchmarks/bench_geometry.py --polygons 100000 --vertices 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, "apps/services")
+
+from shared import geometry  # noqa: E402
+
+TOLERANCE = 0.00005  # FieldBoundaryDetector default (~5 m)
+
+
+def make_rings(rng: np.random.Generator, count: int, vertices: int) -> np.ndarray:
+    """(count, vertices, 2) lon/lat rings of ~200 m fields scattered over Yemen"""
+    centers = np.column_stack([rng.uniform(43, 52, count), rng.uniform(13, 18, count)])
+    angles = np.linspace(0, 2 * math.pi, vertices, endpoint=False)
+    radius = 0.002 * (
+        1
+        + 0.15 * np.sin(angles * rng.integers(3, 8, (count, 1)))
+        + rng.normal(0, 0.01, (count, vertices))
+    )
+    rings = np.empty((count, vertices, 2))
+    rings[..., 0] = centers[:, :1] + radius * np.cos(angles)
+    rings[..., 1] = centers[:, 1:] + radius * np.sin(angles)
+    return rings
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Legacy per-polygon loops
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+def legacy_area(coords) -> float:
+    avg_lat = sum(lat for _, lat in coords) / len(coords)
+    lon_to_m = 111320.0 * math.cos(math.radians(avg_lat))
+    pts = [(lon * lon_to_m, lat * 111320.0) for lon, lat in coords]
+    area = 0.0
+    for i in range(len(pts)):
+        x1, y1 = pts[i]
+        x2, y2 = pts[(i + 1) % len(pts)]
+        area += x1 * y2 - x2 * y1
+    return abs(area) / 2.0 / 10000.0
+
+
+def legacy_haversine(lat1, lon1, lat2, lon2) -> float:
+    dlat = math.radians(lat2 - lat1)
+    dlon = math.radians(lon2 - lon1)
+    a = (
+        math.sin(dlat / 2) ** 2
+        + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon / 2) ** 2
+    )
+    return 6371000 * 2 * math.asin(math.sqrt(a))
+
+
+def legacy_perimeter(coords) -> float:
+    n = len(coords)
+    return sum(
+        legacy_haversine(coords[i][1], coords[i][0], coords[(i + 1) % n][1], coords[(i + 1) % n][0])
+        for i in range(n)
+    )
+
+
+def legacy_simplify(coords, tolerance):
+    def distance(point, start, end):
+        (x, y), (x1, y1), (x2, y2) = point, start, end
+        dx, dy = x2 - x1, y2 - y1
+        if dx == 0 and dy == 0:
+            return math.sqrt((x - x1) ** 2 + (y - y1) ** 2)
+        return abs(dy * x - dx * y + x2 * y1 - y2 * x1) / math.sqrt(dx**2 + dy**2)
+
+    def dp(points):
+        if len(points) <= 2:
+            return points
+        best, index = 0.0, 0
+        for i in range(1, len(points) - 1):
+            d = distance(points[i], points[0], points[-1])
+            if d > best:
+                best, index = d, i
+        if best > tolerance:
+            return dp(points[: index + 1])[:-1] + dp(points[index:])
+        return [points[0], points[-1]]
+
+    return dp(coords + [coords[0]])[:-1]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--polygons", type=int, default=100_000)
+    parser.add_argument("--vertices", type=int, default=500)
+    parser.add_argument("--batch", type=int, default=10_000)
+    parser.add_argument("--legacy-sample", type=int, default=1_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    sample = make_rings(rng, args.legacy_sample, args.vertices)
+    sample_lists = [[tuple(p) for p in ring.tolist()] for ring in sample]
+
+    legacy = {}
+    for name, fn in (
+        ("area", legacy_area),
+        ("perimeter", legacy_perimeter),
+        ("simplify", lambda c: legacy_simplify(c, TOLERANCE)),
+    ):
+        started = time.perf_counter()
+        out = [fn(c) for c in sample_lists]
+        legacy[name] = (args.legacy_sample / (time.perf_counter() - started), out)
+
+    # Agreement with the legacy results on the sample
+    kernel_area = geometry.areas_m2(sample) / 10000.0
+    legacy_area_ha = np.array(legacy["area"][1])
+    area_diff = np.abs(kernel_area / legacy_area_ha - 1).max()
+    simplified = geometry.simplify_many(sample, TOLERANCE)
+    same_dp = all(
+        [tuple(p) for p in s.tolist()] == ref
+        for s, ref in zip(simplified, legacy["simplify"][1], strict=True)
+    )
+
+    kernel = {"area": 0.0, "perimeter": 0.0, "simplify": 0.0}
+    kept = 0
+    rng = np.random.default_rng(11)
+    for start in range(0, args.polygons, args.batch):
+        rings = make_rings(rng, min(args.batch, args.polygons - start), args.vertices)
+        for name, fn in (
+            ("area", geometry.areas_m2),
+            ("perimeter", geometry.perimeters_m),
+            ("simplify", lambda r: geometry.simplify_many(r, TOLERANCE)),
+        ):
+            started = time.perf_counter()
+            out = fn(rings)
+            kernel[name] += time.perf_counter() - started
+        kept += sum(len(s) for s in out)
+
+    total = args.polygons * args.vertices
+    print(
+        f"{args.polygons:,} polygons x {args.vertices} vertices ({total / 1e6:.0f}M vertices), "
+        f"batches of {args.batch:,}; legacy timed on {args.legacy_sample:,} polygons"
+    )
+    header = (
+        f"{'operation':<12}{'legacy poly/s':>15}{'kernel poly/s':>15}{'kernel s':>10}{'speedup':>9}"
+    )
+    print(header)
+    print("-" * len(header))
+    for name in kernel:
+        rate = args.polygons / kernel[name]
+        print(
+            f"{name:<12}{legacy[name][0]:>15,.0f}{rate:>15,.0f}{kernel[name]:>10.2f}"
+            f"{rate / legacy[name][0]:>8.0f}x"
+        )
+    print(
+        f"\nsimplified to {kept / args.polygons:.0f} vertices/polygon on average; "
+        f"Douglas-Peucker identical to legacy on the sample: {same_dp}; "
+        f"max area difference vs. planar legacy: {area_diff:.3%}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""
+SAHOOL Benchmark: pooled upstream clients
+Connection churn, throughput and p50/p99 latency of service-to-service reads
+under load against a local stub upstream:
+
+- a new httpx.AsyncClient per call (previous ai-advisor tools and
+  shared ServiceClient)
+- one long-lived httpx.AsyncClient per object (previous field-intelligence
+  ServiceClient, NDVIClient, SatelliteProvider and SARProcessor)
+- the shared ``Upstream`` pool, with and without hedging and single-flight
+
+The stub runs in its own process. Each request takes ``--fast-ms`` except a
+``--tail`` fraction that takes ``--slow-ms``, the kind of tail a GC pause or
+a cold cache gives. Reads ask for one of ``--keys`` hot resources, so
+concurrent callers sometimes want the same one.
+
+Usage:
+    python tests/benchmarks/bench_http_pool.py --requests 3000 --rate 150
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import multiprocessing as mp
+import random
+import socket
+import statistics
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, "apps/services")
+
+from shared.integration.http_pool import Upstream, UpstreamConfig  # noqa: E402
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Stub upstream: minimal keep-alive HTTP/1.1 server
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+def run_stub(port: int, fast: float, slow: float, tail: float, counters, ready) -> None:
+    rng = random.Random(7)
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        with counters.get_lock():
+            counters[0] += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                with counters.get_lock():
+                    counters[1] += 1
+                length = 0
+                for line in head.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":", 1)[1])
+                if length:
+                    await reader.readexactly(length)
+                await asyncio.sleep(slow if rng.random() < tail else fast)
+                body = b'{"ndvi": 0.61, "status": "ok"}'
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    b"Content-Length: %d\r\n\r\n%s" % (len(body), body)
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve() -> None:
+        server = await asyncio.start_server(handle, "127.0.0.1", port, backlog=1024)
+        ready.set()
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(serve())
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Legacy clients, inline copies of the patterns the pool replaced
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+class LegacyPerCallClient:
+    """``async with httpx.AsyncClient(timeout=...)`` around every call"""
+
+    def __init__(self, base_url: str, timeout: float = 30.0):
+        self.base_url = base_url
+        self.timeout = timeout
+
+    async def get(self, path: str, **kwargs) -> httpx.Response:
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            return await client.get(f"{self.base_url}{path}", **kwargs)
+
+    async def aclose(self) -> None:
+        pass
+
+
+class LegacyLongLivedClient:
+    """Lazily created ``httpx.AsyncClient`` kept on the object"""
+
+    def __init__(self, base_url: str, timeout: float = 30.0):
+        self.base_url = base_url
+        self.timeout = timeout
+        self._client: httpx.AsyncClient | None = None
+
+    async def get(self, path: str, **kwargs) -> httpx.Response:
+        if self._client is None:
+            self._client = httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout)
+        return await self._client.get(path, **kwargs)
+
+    async def aclose(self) -> None:
+        if self._client:
+            await self._client.aclose()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Load generator
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+async def run_load(client, requests: int, rate: float, keys: int, warmup: int) -> dict:
+    """
+    Open loop: requests arrive at ``rate`` per second whether or not earlier
+    ones have finished, and latency counts from the scheduled arrival, so a
+    client that falls behind shows it
+    """
+    rng = random.Random(11)
+    paths = [f"/api/v1/ndvi/field-{rng.randrange(keys)}" for _ in range(requests + warmup)]
+    latencies: list[float] = []
+    errors = 0
+
+    async def call(path: str, arrival: float, record: bool) -> None:
+        nonlocal errors
+        try:
+            response = await client.get(path)
+            response.raise_for_status()
+        except httpx.HTTPError:
+            errors += 1
+            return
+        if record:
+            latencies.append(time.perf_counter() - arrival)
+
+    # Warm-up fills pools and, for the adaptive hedge, the latency histogram
+    started = time.perf_counter()
+    tasks = []
+    for i, path in enumerate(paths):
+        arrival = started + i / rate
+        delay = arrival - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.ensure_future(call(path, arrival, i >= warmup)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started - warmup / rate
+    await client.aclose()
+
+    latencies.sort()
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50": statistics.median(latencies) * 1000,
+        "p99": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "max": latencies[-1] * 1000,
+        "errors": errors,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--rate", type=float, default=150.0, help="requests per second")
+    parser.add_argument("--per-call-requests", type=int, default=300)
+    parser.add_argument("--keys", type=int, default=200)
+    parser.add_argument("--fast-ms", type=float, default=3.0)
+    parser.add_argument("--slow-ms", type=float, default=150.0)
+    parser.add_argument("--tail", type=float, default=0.02)
+    args = parser.parse_args()
+
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    counters = mp.Array("l", 2)  # connections accepted, requests served
+    ready = mp.Event()
+    stub = mp.Process(
+        target=run_stub,
+        args=(port, args.fast_ms / 1000, args.slow_ms / 1000, args.tail, counters, ready),
+        daemon=True,
+    )
+    stub.start()
+    ready.wait(10)
+
+    def pool(**settings) -> Upstream:
+        return Upstream("ndvi-engine", UpstreamConfig(base_url=base_url, **settings))
+
+    # The per-call client runs last and shorter: it builds a TLS context per
+    # call and falls far behind the arrival rate on a small machine
+    scenarios = [
+        ("long-lived client per object", lambda: LegacyLongLivedClient(base_url), args.requests),
+        ("Upstream pool", lambda: pool(hedge=False, single_flight=False), args.requests),
+        ("Upstream pool + single-flight", lambda: pool(hedge=False), args.requests),
+        ("Upstream pool + single-flight + hedging", lambda: pool(), args.requests),
+        ("new client per call", lambda: LegacyPerCallClient(base_url), args.per_call_requests),
+    ]
+
+    print(
+        f"{args.requests} GETs ({args.per_call_requests} per-call) at {args.rate:g}/s, "
+        f"{args.keys} hot keys; "
+        f"stub {args.fast_ms:g} ms, {args.tail:.0%} at {args.slow_ms:g} ms"
+    )
+    header = (
+        f"{'client':<42}{'req/s':>8}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+        f"{'conns':>8}{'upstream':>10}{'errors':>8}"
+    )
+    print(header)
+    print("-" * len(header))
+    # Warm the interpreter and the stub outside the measured scenarios
+    asyncio.run(run_load(LegacyLongLivedClient(base_url), 300, args.rate, args.keys, 0))
+    counters[:] = [0, 0]
+
+    for label, factory, requests in scenarios:
+        warmup = min(int(args.rate * 2), requests // 2)
+        client = factory()
+        before = list(counters)
+        result = asyncio.run(run_load(client, requests, args.rate, args.keys, warmup))
+        conns, served = (counters[i] - before[i] for i in range(2))
+        print(
+            f"{label:<42}{result['rps']:>8.0f}{result['p50']:>9.2f}{result['p99']:>9.2f}"
+            f"{result['max']:>9.1f}{conns:>8}{served:>10}{result['errors']:>8}"
+        )
+        if isinstance(client, Upstream):
+            stats = client.stats
+            print(
+                f"{'':<42}hedged {stats['hedged']}, hedge wins {stats['hedge_wins']}, "
+                f"coalesced {stats['coalesced']}"
+            )
+
+    print("\nconns and upstream count warm-up and measured requests together")
+    stub.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,587 @@
+"""
+SAHOOL Benchmark: inventory-service tenant analytics
+Wall time of a full analytics pass (all forecasts, reorder recommendations,
+turnover, slow-moving, dead stock and ABC) for a tenant with 20k SKUs: the
+previous per-item path (a consumption and a COGS query per item) vs. the
+NumPy snapshot built from three grouped queries, cold and cached.
+Also reports the snapshot build time and the cache watermark check.
+Results are checked against each other.
+
+Requires PostgreSQL; the tables are created and dropped in the given database.
+
+Usage:
+    python tests/benchmarks/bench_inventory_analytics.py --database-url postgresql://... --items 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from datetime import UTC, date, datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import and_, func, select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+sys.path.insert(0, "apps/services/inventory-service")
+
+from src.analytics_snapshot import (  # noqa: E402
+    _watermark,
+    build_snapshot,
+    invalidate_snapshot,
+)
+from src.inventory_analytics import ConsumptionForecast, InventoryAnalytics  # noqa: E402
+from src.models.inventory import (  # noqa: E402
+    Base,
+    InventoryItem,
+    InventoryMovement,
+    MovementType,
+    Supplier,
+)
+
+TENANT = "tenant_bench"
+
+
+# ─── Previous path (per-item InventoryAnalytics methods before the snapshot) ───
+# Copied with the fixes the per-item path needs to return rows at all:
+# is_active.is_(True) instead of `is True`, float stock values instead of
+# float * Decimal, supplier looked up by id instead of an async lazy load,
+# and timezone-aware "now" against timestamptz columns.
+
+
+class LegacyAnalytics(InventoryAnalytics):
+    async def get_consumption_forecast(self, item_id, forecast_days=90):
+        item = await self.db.get(InventoryItem, item_id)
+        if not item or item.tenant_id != self.tenant_id:
+            return None
+
+        lookback_date = datetime.now(UTC) - timedelta(days=90)
+
+        stmt = (
+            select(
+                func.date_trunc("day", InventoryMovement.movement_date).label("day"),
+                func.sum(InventoryMovement.quantity).label("total_qty"),
+            )
+            .where(
+                and_(
+                    InventoryMovement.tenant_id == self.tenant_id,
+                    InventoryMovement.item_id == item_id,
+                    InventoryMovement.movement_type == MovementType.ISSUE,
+                    InventoryMovement.movement_date >= lookback_date,
+                )
+            )
+            .group_by("day")
+        )
+
+        result = await self.db.execute(stmt)
+        daily_consumption = {row.day.date(): float(row.total_qty) for row in result}
+
+        if not daily_consumption:
+            return ConsumptionForecast(
+                item_id=str(item.id),
+                item_name=item.name_en,
+                current_stock=item.current_stock,
+                avg_daily_consumption=0.0,
+                avg_weekly_consumption=0.0,
+                avg_monthly_consumption=0.0,
+                days_until_stockout=999,
+                reorder_date=date.today() + timedelta(days=999),
+                recommended_order_qty=item.reorder_quantity,
+                confidence=0.0,
+            )
+
+        total_consumption = sum(daily_consumption.values())
+        days_with_data = len(daily_consumption)
+
+        avg_daily = total_consumption / max(days_with_data, 1)
+        avg_weekly = avg_daily * 7
+        avg_monthly = avg_daily * 30
+
+        days_until_stockout = int(item.available_stock / avg_daily) if avg_daily > 0 else 999
+
+        supplier_lead_time = 7
+        if item.supplier_id:
+            supplier = await self.db.get(Supplier, item.supplier_id)
+            if supplier:
+                supplier_lead_time = supplier.lead_time_days
+
+        safety_stock_days = 7
+        reorder_days = max(0, days_until_stockout - supplier_lead_time - safety_stock_days)
+        reorder_date = date.today() + timedelta(days=reorder_days)
+
+        recommended_qty = (avg_daily * forecast_days) + (avg_daily * safety_stock_days)
+
+        if days_with_data >= 30:
+            values = list(daily_consumption.values())
+            if len(values) > 1 and avg_daily > 0:
+                std_dev = statistics.stdev(values)
+                cv = std_dev / avg_daily
+                confidence = max(0.0, min(1.0, 1.0 - (cv / 2)))
+            else:
+                confidence = 0.5
+        else:
+            confidence = 0.3
+
+        return ConsumptionForecast(
+            item_id=str(item.id),
+            item_name=item.name_en,
+            current_stock=item.current_stock,
+            avg_daily_consumption=round(avg_daily, 2),
+            avg_weekly_consumption=round(avg_weekly, 2),
+            avg_monthly_consumption=round(avg_monthly, 2),
+            days_until_stockout=days_until_stockout,
+            reorder_date=reorder_date,
+            recommended_order_qty=round(recommended_qty, 2),
+            confidence=round(confidence, 2),
+        )
+
+    async def _active_items(self):
+        stmt = select(InventoryItem).where(
+            and_(InventoryItem.tenant_id == self.tenant_id, InventoryItem.is_active.is_(True))
+        )
+        return (await self.db.execute(stmt)).scalars().all()
+
+    async def get_all_forecasts(self, category=None, low_stock_only=False):
+        forecasts = []
+        for item in await self._active_items():
+            forecast = await self.get_consumption_forecast(item.id)
+            if forecast:
+                forecasts.append(forecast)
+        return forecasts
+
+    async def get_turnover_analysis(self, period_days=365):
+        start_date = datetime.now(UTC) - timedelta(days=period_days)
+        metrics = []
+        for item in await self._active_items():
+            cogs_stmt = select(func.sum(InventoryMovement.total_cost)).where(
+                and_(
+                    InventoryMovement.tenant_id == self.tenant_id,
+                    InventoryMovement.item_id == item.id,
+                    InventoryMovement.movement_type == MovementType.ISSUE,
+                    InventoryMovement.movement_date >= start_date,
+                )
+            )
+            cogs = (await self.db.execute(cogs_stmt)).scalar() or Decimal("0.0")
+            avg_inventory_value = item.current_stock * float(item.average_cost)
+            if avg_inventory_value > 0:
+                turnover_ratio = float(cogs) / avg_inventory_value
+                days_of_inventory = 365 / turnover_ratio if turnover_ratio > 0 else 999.0
+            else:
+                turnover_ratio = 0.0
+                days_of_inventory = 999.0
+            if turnover_ratio >= 4:
+                velocity = "fast"
+            elif turnover_ratio >= 2:
+                velocity = "medium"
+            elif turnover_ratio >= 0.5:
+                velocity = "slow"
+            else:
+                velocity = "dead"
+            metrics.append(
+                {
+                    "item_id": str(item.id),
+                    "item_name": item.name_en,
+                    "turnover_ratio": round(turnover_ratio, 2),
+                    "days_of_inventory": round(days_of_inventory, 1),
+                    "velocity": velocity,
+                }
+            )
+        return metrics
+
+    async def _last_issues(self):
+        stmt = (
+            select(InventoryItem, func.max(InventoryMovement.movement_date).label("last_movement"))
+            .outerjoin(
+                InventoryMovement,
+                and_(
+                    InventoryMovement.item_id == InventoryItem.id,
+                    InventoryMovement.movement_type == MovementType.ISSUE,
+                ),
+            )
+            .where(
+                and_(
+                    InventoryItem.tenant_id == self.tenant_id,
+                    InventoryItem.is_active.is_(True),
+                    InventoryItem.current_stock > 0,
+                )
+            )
+            .group_by(InventoryItem.id)
+        )
+        return (await self.db.execute(stmt)).all()
+
+    async def identify_slow_moving(self, days_threshold=90):
+        slow_moving = []
+        for row in await self._last_issues():
+            item, last_movement = row.InventoryItem, row.last_movement
+            days_since_movement = 999
+            if last_movement:
+                days_since_movement = (datetime.now(UTC) - last_movement).days
+            if last_movement is None or days_since_movement >= days_threshold:
+                item_value = float(item.current_stock * float(item.average_cost))
+                slow_moving.append(
+                    {
+                        "item_id": str(item.id),
+                        "item_name": item.name_en,
+                        "sku": item.sku,
+                        "current_stock": item.current_stock,
+                        "unit_cost": float(item.average_cost),
+                        "total_value": round(item_value, 2),
+                        "last_movement_date": (
+                            last_movement.astimezone(UTC).date().isoformat()
+                            if last_movement
+                            else None
+                        ),
+                        "days_since_movement": days_since_movement,
+                    }
+                )
+        slow_moving.sort(key=lambda x: x["total_value"], reverse=True)
+        return slow_moving
+
+    async def identify_dead_stock(self, days_threshold=180):
+        expiry_threshold = date.today() + timedelta(days=60)
+        dead_stock = []
+        for row in await self._last_issues():
+            item, last_movement = row.InventoryItem, row.last_movement
+            days_since_movement = 999
+            if last_movement:
+                days_since_movement = (datetime.now(UTC) - last_movement).days
+            is_dead = False
+            reason = ""
+            if last_movement is None or days_since_movement >= days_threshold:
+                is_dead = True
+                reason = f"No movement for {days_since_movement} days"
+            if item.has_expiry and item.expiry_date and item.expiry_date <= expiry_threshold:
+                is_dead = True
+                days_to_expiry = (item.expiry_date - date.today()).days
+                if reason:
+                    reason += f" and expiring in {days_to_expiry} days"
+                else:
+                    reason = f"Expiring in {days_to_expiry} days"
+            if is_dead:
+                item_value = float(item.current_stock * float(item.average_cost))
+                dead_stock.append(
+                    {
+                        "item_id": str(item.id),
+                        "item_name": item.name_en,
+                        "sku": item.sku,
+                        "current_stock": item.current_stock,
+                        "unit_cost": float(item.average_cost),
+                        "total_value": round(item_value, 2),
+                        "reason": reason,
+                        "expiry_date": (item.expiry_date.isoformat() if item.expiry_date else None),
+                        "last_movement_date": (
+                            last_movement.astimezone(UTC).date().isoformat()
+                            if last_movement
+                            else None
+                        ),
+                    }
+                )
+        dead_stock.sort(key=lambda x: x["total_value"], reverse=True)
+        return dead_stock
+
+    async def get_abc_analysis(self):
+        item_values = []
+        total_value = 0.0
+        for item in await self._active_items():
+            value = float(item.current_stock * float(item.average_cost))
+            total_value += value
+            item_values.append(
+                {
+                    "item_id": str(item.id),
+                    "item_name": item.name_en,
+                    "sku": item.sku,
+                    "stock": item.current_stock,
+                    "value": value,
+                }
+            )
+        item_values.sort(key=lambda x: x["value"], reverse=True)
+        classes = {"A": [], "B": [], "C": []}
+        cumulative_value = 0.0
+        for item in item_values:
+            cumulative_value += item["value"]
+            percentage = (cumulative_value / total_value * 100) if total_value > 0 else 0.0
+            item["cumulative_value"] = round(cumulative_value, 2)
+            item["cumulative_percentage"] = round(percentage, 2)
+            item["value"] = round(item["value"], 2)
+            item["class"] = "A" if percentage <= 80 else ("B" if percentage <= 95 else "C")
+            classes[item["class"]].append(item)
+        return {
+            "total_items": len(item_values),
+            **{key: [i["item_id"] for i in items] for key, items in classes.items()},
+        }
+
+    async def get_reorder_recommendations(self):
+        stmt = (
+            select(InventoryItem, Supplier)
+            .outerjoin(Supplier, InventoryItem.supplier_id == Supplier.id)
+            .where(
+                and_(
+                    InventoryItem.tenant_id == self.tenant_id,
+                    InventoryItem.is_active.is_(True),
+                    InventoryItem.available_stock <= InventoryItem.reorder_level,
+                )
+            )
+        )
+        recommendations = []
+        for row in (await self.db.execute(stmt)).all():
+            item, supplier = row.InventoryItem, row.Supplier
+            forecast = await self.get_consumption_forecast(item.id)
+            recommendations.append(
+                {
+                    "item_id": str(item.id),
+                    "recommended_order_qty": forecast.recommended_order_qty,
+                    "days_until_stockout": forecast.days_until_stockout,
+                    "supplier_name": supplier.name if supplier else None,
+                    "lead_time_days": supplier.lead_time_days if supplier else 7,
+                    "urgency": (
+                        "critical"
+                        if item.available_stock <= 0
+                        else ("high" if forecast.days_until_stockout <= 7 else "medium")
+                    ),
+                }
+            )
+        return recommendations
+
+
+async def analytics_pass(analytics: InventoryAnalytics) -> dict:
+    """Every tenant-wide report, normalised for comparison"""
+    forecasts = await analytics.get_all_forecasts()
+    reorder = await analytics.get_reorder_recommendations()
+    turnover = await analytics.get_turnover_analysis()
+    slow = await analytics.identify_slow_moving()
+    dead = await analytics.identify_dead_stock()
+    abc = await analytics.get_abc_analysis()
+
+    if "a_class" in abc:
+        abc = {
+            "total_items": abc["total_items"],
+            **{
+                key: [i["item_id"] for i in abc[f"{key.lower()}_class"]["items"]]
+                for key in ("A", "B", "C")
+            },
+        }
+    by_id = lambda rows: sorted(rows, key=lambda r: r["item_id"])  # noqa: E731
+    reorder_keys = (
+        "item_id",
+        "recommended_order_qty",
+        "days_until_stockout",
+        "supplier_name",
+        "lead_time_days",
+        "urgency",
+    )
+    return {
+        "forecasts": by_id([f.to_dict() for f in forecasts]),
+        "reorder": by_id([{k: r[k] for k in reorder_keys} for r in reorder]),
+        "turnover": by_id([m if isinstance(m, dict) else m.to_dict() for m in turnover]),
+        "slow_moving": by_id(slow),
+        "dead_stock": by_id(dead),
+        "abc": abc,
+    }
+
+
+# ─── Setup ───
+
+
+async def populate(engine, items: int, days: int) -> int:
+    """
+    ``items`` SKUs across 5 categories and 20 suppliers (every 7th has none).
+    A quarter are issued on most days, most on about one day in five, every
+    10th never and every 10th only more than 200 days ago. Issue times stay
+    an hour or more away from the lookback boundaries while the benchmark runs.
+    """
+    async with engine.begin() as conn:
+        await conn.execute(
+            text(
+                """
+                INSERT INTO inventory_categories (id, name_en, name_ar, code, is_active)
+                SELECT gen_random_uuid(), 'Category ' || c, 'فئة ' || c, 'BENCH-' || c, true
+                FROM generate_series(0, 4) AS c
+                """
+            )
+        )
+        await conn.execute(
+            text(
+                """
+                INSERT INTO inventory_suppliers (id, tenant_id, name, code, lead_time_days,
+                                                 is_active)
+                SELECT gen_random_uuid(), :tenant_id, 'Supplier ' || s, 'SUP-' || s,
+                       3 + s % 12, true
+                FROM generate_series(0, 19) AS s
+                """
+            ),
+            {"tenant_id": TENANT},
+        )
+        await conn.execute(
+            text(
+                """
+                INSERT INTO inventory_warehouses (id, tenant_id, name, code, is_active)
+                VALUES (gen_random_uuid(), :tenant_id, 'Main', 'WH-1', true)
+                """
+            ),
+            {"tenant_id": TENANT},
+        )
+        await conn.execute(
+            text(
+                """
+                WITH categories AS (
+                    SELECT array_agg(id ORDER BY code) AS ids FROM inventory_categories
+                ), suppliers AS (
+                    SELECT array_agg(id ORDER BY code) AS ids FROM inventory_suppliers
+                )
+                INSERT INTO inventory_items (
+                    id, tenant_id, name_en, name_ar, sku, category_id, warehouse_id,
+                    supplier_id, current_stock, reserved_stock, available_stock,
+                    reorder_level, reorder_quantity, unit_of_measure, unit_cost,
+                    average_cost, total_value, has_expiry, expiry_date, is_active
+                )
+                SELECT gen_random_uuid(), :tenant_id, 'Item ' || i, 'صنف ' || i,
+                       'SKU-' || i,
+                       categories.ids[1 + i % 5],
+                       (SELECT id FROM inventory_warehouses LIMIT 1),
+                       CASE WHEN i % 7 = 0 THEN NULL ELSE suppliers.ids[1 + i % 20] END,
+                       stock, reserved, stock - reserved,
+                       (i * 13) % 600, 200, 'KG', 2, 1 + (i % 97) / 4.0, 0,
+                       i % 9 = 0,
+                       CASE WHEN i % 9 = 0 THEN current_date + (i % 200 - 30) END,
+                       i % 101 <> 0
+                FROM generate_series(1, :items) AS i
+                CROSS JOIN categories
+                CROSS JOIN suppliers
+                CROSS JOIN LATERAL (
+                    SELECT (i % 500) + 0.5 + i * 0.000001 AS stock,
+                           CASE WHEN i % 50 = 0 THEN (i % 500) + 1.5 ELSE 0 END AS reserved
+                ) AS levels
+                """
+            ),
+            {"tenant_id": TENANT, "items": items},
+        )
+        await conn.execute(
+            text(
+                """
+                INSERT INTO inventory_movements (
+                    id, tenant_id, movement_type, movement_date, reference_no, item_id,
+                    warehouse_id, quantity, unit_cost, total_cost
+                )
+                SELECT gen_random_uuid(), item.tenant_id, 'ISSUE',
+                       now() - d * interval '1 day'
+                             - (3600 + (n * 7919) % 36000) * interval '1 second',
+                       'ISS-' || n || '-' || d, item.id, item.warehouse_id,
+                       1 + (n * d) % 9, 2, 2 * (1 + (n * d) % 9)
+                FROM (
+                    SELECT id, tenant_id, warehouse_id,
+                           CAST(substring(sku FROM 5) AS bigint) AS n
+                    FROM inventory_items
+                ) AS item
+                CROSS JOIN generate_series(0, :days - 1) AS d
+                WHERE n % 10 <> 0
+                  AND (n % 10 <> 5 OR d > 200)
+                  AND (n + d * 7) % 11 < CASE WHEN n % 4 = 0 THEN 8 ELSE 2 END
+                """
+            ),
+            {"days": days},
+        )
+        await conn.execute(text("ANALYZE"))
+        movements = await conn.execute(text("SELECT count(*) FROM inventory_movements"))
+        return movements.scalar()
+
+
+async def timed(fn, rounds: int) -> tuple[list[float], object]:
+    seconds, result = [], None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = await fn()
+        seconds.append(time.perf_counter() - start)
+    return seconds, result
+
+
+async def run(args) -> None:
+    url = args.database_url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    url = url.replace("postgresql+psycopg2://", "postgresql+asyncpg://", 1)
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    began = time.perf_counter()
+    movements = await populate(engine, args.items, args.days)
+    print(
+        f"populated {args.items:,} items and {movements:,} issues "
+        f"in {time.perf_counter() - began:.0f}s"
+    )
+
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def legacy():
+        async with Session() as db:
+            return await analytics_pass(LegacyAnalytics(db, TENANT))
+
+    async def cold():
+        invalidate_snapshot()
+        async with Session() as db:
+            return await analytics_pass(InventoryAnalytics(db, TENANT))
+
+    async def cached():
+        async with Session() as db:
+            return await analytics_pass(InventoryAnalytics(db, TENANT))
+
+    async def build():
+        async with Session() as db:
+            return await build_snapshot(db, TENANT)
+
+    async def watermark():
+        async with Session() as db:
+            return await _watermark(db, TENANT)
+
+    seconds, results = {}, {}
+    for name, fn, rounds in (
+        ("per-item queries (previous)", legacy, args.legacy_rounds),
+        ("snapshot, cold", cold, args.rounds),
+        ("snapshot, cached", cached, args.rounds),
+    ):
+        seconds[name], results[name] = await timed(fn, rounds)
+    reference = results["per-item queries (previous)"]
+    for name, result in results.items():
+        for report, rows in result.items():
+            assert rows == reference[report], f"{name} {report} differs"
+
+    build_seconds, snapshot = await timed(build, args.rounds)
+    check_seconds, _ = await timed(watermark, args.rounds)
+
+    print(f"{len(snapshot):,} active SKUs for one tenant, full analytics pass")
+    print(f"{'analytics pass':<30}{'p50 ms':>12}{'max ms':>12}{'speedup':>10}")
+    baseline = None
+    for name, values in seconds.items():
+        values = sorted(values)
+        p50 = values[len(values) // 2]
+        baseline = baseline or p50
+        print(f"{name:<30}{p50 * 1000:>12.1f}{values[-1] * 1000:>12.1f}{baseline / p50:>9.0f}x")
+    print(
+        f"build_snapshot (three grouped queries + NumPy): {sorted(build_seconds)[0] * 1000:.1f} ms"
+    )
+    print(f"watermark check per cached request: {sorted(check_seconds)[0] * 1000:.2f} ms")
+    print("all paths return identical reports")
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--items", type=int, default=20_000)
+    parser.add_argument("--days", type=int, default=300, help="days of issue history")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--legacy-rounds", type=int, default=1)
+    args = parser.parse_args()
+    if not args.database_url:
+        parser.error("--database-url (or DATABASE_URL) must point to PostgreSQL")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
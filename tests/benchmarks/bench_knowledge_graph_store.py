@@ -0,0 +1,362 @@
+"""
+SAHOOL Benchmark: knowledge-graph store
+Startup time, memory and query latency of KnowledgeGraphService at 1M nodes /
+10M edges on the GraphStore (memory-mapped CSR snapshot + delta log), next to
+the previous NetworkX DiGraph + entity dicts at a scale that fits in RAM.
+
+Queries: compatible treatments of a crop (incoming COMPATIBLE edges, cold and
+cached), treatments of a disease (outgoing TREATED_BY), English and Arabic
+name search, and a disease → crop shortest path. The delta section measures
+appends to the log, startup with a non-empty log and compaction.
+
+Each variant runs in a child process so RSS is its own.
+
+Usage:
+    python tests/benchmarks/bench_knowledge_graph_store.py \
+        --nodes 1000000 --edges 10000000 --legacy-nodes 100000 --legacy-edges 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import multiprocessing
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import orjson
+
+sys.path.insert(0, "apps/services/knowledge-graph/src")
+
+from models import RelationshipType  # noqa: E402
+from services import KnowledgeGraphService, RelationshipService  # noqa: E402
+from storage import GraphStore, term_pairs, write_snapshot  # noqa: E402
+
+# Share of nodes per type and of edges per relationship type
+NODE_MIX = {"crop": 0.02, "disease": 0.38, "treatment": 0.60}
+EDGE_MIX = {
+    "affects": ("disease", "crop", 0.4),
+    "treated_by": ("disease", "treatment", 0.3),
+    "compatible": ("treatment", "crop", 0.3),
+}
+ADJECTIVES = [
+    ("Golden", "ذهبي"),
+    ("Early", "مبكر"),
+    ("Red", "أحمر"),
+    ("Wild", "بري"),
+    ("Dwarf", "قزم"),
+    ("Giant", "عملاق"),
+    ("Sweet", "حلو"),
+    ("Late", "متأخر"),
+]
+NOUNS = {
+    "crop": [("Wheat", "القمح"), ("Tomato", "الطماطم"), ("Barley", "الشعير"), ("Date", "التمر")],
+    "disease": [("Blight", "اللفحة"), ("Mildew", "البياض"), ("Rust", "الصدأ"), ("Rot", "العفن")],
+    "treatment": [("Copper", "النحاس"), ("Sulfur", "الكبريت"), ("Neem", "النيم"), ("Oil", "الزيت")],
+}
+SEARCHES = ["golden wheat", "القمح الذهبي", "blight 4711", "نيم"]
+QUERIES = 300
+
+
+def rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize() / 2**20
+
+
+def percentiles(seconds: list[float]) -> str:
+    ms = np.array(seconds) * 1000
+    return f"{np.percentile(ms, 50):8.3f} {np.percentile(ms, 95):8.3f}"
+
+
+# ─── Data ───
+
+
+def make_graph(n: int, m: int, seed: int = 0) -> dict:
+    """Node records and per-type edge position arrays"""
+    rng = np.random.default_rng(seed)
+    counts = {t: int(n * share) for t, share in NODE_MIX.items()}
+    counts["treatment"] = n - counts["crop"] - counts["disease"]
+    keys, types, records, first = [], [], [], {}
+    for code, (node_type, count) in enumerate(counts.items()):
+        first[node_type] = len(keys)
+        nouns = NOUNS[node_type]
+        for i in range(count):
+            adj_en, adj_ar = ADJECTIVES[i % len(ADJECTIVES)]
+            noun_en, noun_ar = nouns[(i // len(ADJECTIVES)) % len(nouns)]
+            keys.append(f"{node_type}:{node_type[0]}{i}")
+            types.append(code)
+            records.append(
+                {
+                    "id": f"{node_type[0]}{i}",
+                    "name_en": f"{adj_en} {noun_en} {i}",
+                    "name_ar": f"{noun_ar} {adj_ar} {i}",
+                    "synonyms": [f"{noun_en[:3]}-{i}"],
+                }
+            )
+    edges = {}
+    for edge_type, (src_type, dst_type, share) in EDGE_MIX.items():
+        want = int(m * share)
+        src = rng.integers(0, counts[src_type], want * 11 // 10) + first[src_type]
+        dst = rng.integers(0, counts[dst_type], want * 11 // 10) + first[dst_type]
+        _, keep = np.unique(src * n + dst, return_index=True)
+        keep = np.sort(rng.permutation(keep)[:want])
+        confidence = rng.uniform(0.5, 1.0, len(keep)).round(2)
+        edges[edge_type] = (src[keep], dst[keep], confidence)
+    return {"keys": keys, "types": types, "records": records, "edges": edges, "counts": counts}
+
+
+def build_snapshot(graph: dict, directory: Path) -> float:
+    start = time.perf_counter()
+    blobs = [orjson.dumps(r) for r in graph["records"]]
+    write_snapshot(
+        directory / "snapshots" / "000000000000001",
+        np.array([k.encode() for k in graph["keys"]], dtype="S"),
+        np.array(graph["types"], dtype=np.uint8),
+        list(NODE_MIX),
+        blobs,
+        graph["edges"],
+        term_pairs(list(enumerate(graph["records"]))),
+    )
+    (directory / "CURRENT").write_text("000000000000001")
+    return time.perf_counter() - start
+
+
+def sample_queries(graph: dict, seed: int = 2) -> dict:
+    rng = np.random.default_rng(seed)
+    counts = graph["counts"]
+    return {
+        "crops": [f"c{i}" for i in rng.integers(0, counts["crop"], QUERIES)],
+        "diseases": [f"d{i}" for i in rng.integers(0, counts["disease"], QUERIES)],
+        "searches": [SEARCHES[i % len(SEARCHES)] for i in range(QUERIES // 10)],
+    }
+
+
+# ─── Previous implementation (NetworkX DiGraph + entity dicts) ───
+
+
+class LegacyGraph:
+    """Data layout and queries of the previous KnowledgeGraphService"""
+
+    def __init__(self):
+        import networkx as nx
+
+        self.nx = nx
+        self.graph = nx.DiGraph()
+        self.entities: dict[str, dict] = {}
+
+    def load(self, graph: dict) -> None:
+        node_types = list(NODE_MIX)
+        for key, code, record in zip(graph["keys"], graph["types"], graph["records"]):
+            self.entities[key] = record
+            self.graph.add_node(
+                key, node_type=node_types[code], label=record["name_en"], label_ar=record["name_ar"]
+            )
+        keys = graph["keys"]
+        for edge_type, (src, dst, confidence) in graph["edges"].items():
+            for s, d, c in zip(src.tolist(), dst.tolist(), confidence.tolist()):
+                self.graph.add_edge(
+                    keys[s],
+                    keys[d],
+                    relationship_type=edge_type,
+                    confidence=c,
+                    rel_id=f"{keys[s]}--{edge_type}--{keys[d]}",
+                )
+
+    def related(self, node_id: str, rel_type: str, incoming: bool, limit: int = 50) -> list:
+        # The old method only walked successors; predecessors is its natural extension
+        related = []
+        neighbors = self.graph.predecessors(node_id) if incoming else self.graph.successors(node_id)
+        for other in neighbors:
+            edge = self.graph[other][node_id] if incoming else self.graph[node_id][other]
+            if edge.get("relationship_type") != rel_type:
+                continue
+            entity = self.entities[other].copy()
+            entity["relationship"] = {"type": rel_type, "confidence": edge.get("confidence", 1.0)}
+            related.append(entity)
+            if len(related) >= limit:
+                break
+        return related
+
+    def search(self, query: str, limit: int = 20) -> list:
+        results, query_lower = [], query.lower()
+        for node_id, entity in self.entities.items():
+            for field in ["name_en", "name_ar", "description_en", "description_ar"]:
+                if field in entity and query_lower in str(entity.get(field, "")).lower():
+                    results.append({**entity, "id": node_id})
+                    break
+            if len(results) >= limit:
+                break
+        return results
+
+    def path(self, source: str, target: str) -> list | None:
+        try:
+            return self.nx.shortest_path(self.graph, source, target)
+        except self.nx.NetworkXNoPath:
+            return None
+
+
+# ─── Runs ───
+
+
+def timed(fn, args_list) -> list[float]:
+    seconds = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(*args)
+        seconds.append(time.perf_counter() - start)
+    return seconds
+
+
+def run_legacy(graph: dict, queue) -> None:
+    queries = sample_queries(graph)
+    before = rss_mb()
+    start = time.perf_counter()
+    legacy = LegacyGraph()
+    legacy.load(graph)
+    startup = time.perf_counter() - start
+    rows = {
+        "compatible treatments": timed(
+            legacy.related, [(f"crop:{c}", "compatible", True) for c in queries["crops"]]
+        ),
+        "disease treatments": timed(
+            legacy.related, [(f"disease:{d}", "treated_by", False) for d in queries["diseases"]]
+        ),
+        "search": timed(legacy.search, [(q,) for q in queries["searches"]]),
+        "shortest path": timed(
+            legacy.path,
+            [(f"disease:{d}", f"crop:{c}") for d, c in zip(queries["diseases"], queries["crops"])][
+                : QUERIES // 10
+            ],
+        ),
+    }
+    queue.put({"startup": startup, "rss": rss_mb() - before, "rows": rows})
+
+
+def run_store(graph: dict, directory: Path, queue) -> None:
+    queries = sample_queries(graph)
+    before = rss_mb()
+    start = time.perf_counter()
+    service = KnowledgeGraphService(data_dir=str(directory))
+    asyncio.run(service.initialize())
+    startup = time.perf_counter() - start
+    rss_open = rss_mb() - before
+    relationships = RelationshipService(service)
+    loop = asyncio.new_event_loop()
+
+    def call(coro_fn):
+        return lambda *args: loop.run_until_complete(coro_fn(*args))
+
+    compatible = call(relationships.get_crop_compatible_treatments)
+    # Cold rows first with the result cache off, then one warm pass
+    cache_size, service.cache.max_entries = service.cache.max_entries, 0
+    rows = {
+        "compatible treatments": timed(compatible, [(c,) for c in queries["crops"]]),
+        "disease treatments": timed(
+            call(relationships.get_disease_treatments), [(d,) for d in queries["diseases"]]
+        ),
+        "search": timed(call(service.search_entities), [(q,) for q in queries["searches"]]),
+        "shortest path": timed(
+            call(service.find_shortest_path),
+            [("disease", d, "crop", c) for d, c in zip(queries["diseases"], queries["crops"])][
+                : QUERIES // 10
+            ],
+        ),
+    }
+    service.cache.max_entries = cache_size
+    timed(compatible, [(c,) for c in queries["crops"]])
+    rows["compatible treatments (cached)"] = timed(compatible, [(c,) for c in queries["crops"]])
+    queue.put({"startup": startup, "rss": rss_open, "rss_queried": rss_mb() - before, "rows": rows})
+
+
+def run_delta(graph: dict, directory: Path, writes: int, queue) -> None:
+    rng = np.random.default_rng(3)
+    counts = graph["counts"]
+    store = GraphStore(directory)
+    start = time.perf_counter()
+    for t, c in zip(
+        rng.integers(0, counts["treatment"], writes), rng.integers(0, counts["crop"], writes)
+    ):
+        store.add_edge(f"treatment:t{t}", f"crop:c{c}", RelationshipType.COMPATIBLE.value, 0.9)
+    append = time.perf_counter() - start
+    start = time.perf_counter()
+    reopened = GraphStore(directory)
+    reopen = time.perf_counter() - start
+    start = time.perf_counter()
+    reopened.compact()
+    compact = time.perf_counter() - start
+    start = time.perf_counter()
+    GraphStore(directory)
+    after = time.perf_counter() - start
+    queue.put(
+        {
+            "writes/s": writes / append,
+            "startup with delta s": reopen,
+            "compaction s": compact,
+            "startup after compaction s": after,
+            "peak MB": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        }
+    )
+
+
+def in_child(target, *args) -> dict:
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=target, args=(*args, queue))
+    process.start()
+    outcome = queue.get()
+    process.join()
+    return outcome
+
+
+def report(label: str, outcome: dict) -> None:
+    rss = f"{outcome['rss']:,.0f} MB"
+    if "rss_queried" in outcome:
+        rss += f" ({outcome['rss_queried']:,.0f} MB after queries)"
+    print(f"\n{label}: startup {outcome['startup']:.3f} s, RSS {rss}")
+    print(f"  {'query':<32} {'p50 ms':>8} {'p95 ms':>8}")
+    for name, seconds in outcome["rows"].items():
+        print(f"  {name:<32} {percentiles(seconds)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--nodes", type=int, default=1_000_000)
+    parser.add_argument("--edges", type=int, default=10_000_000)
+    parser.add_argument("--legacy-nodes", type=int, default=100_000)
+    parser.add_argument("--legacy-edges", type=int, default=1_000_000)
+    parser.add_argument("--delta-writes", type=int, default=2000)
+    args = parser.parse_args()
+
+    for n, m, with_legacy in (
+        (args.legacy_nodes, args.legacy_edges, True),
+        (args.nodes, args.edges, False),
+    ):
+        start = time.perf_counter()
+        graph = make_graph(n, m)
+        print(f"\n=== {n:,} nodes, {m:,} edges (generated in {time.perf_counter() - start:.1f} s)")
+        with tempfile.TemporaryDirectory() as tmp:
+            directory = Path(tmp)
+            print(
+                f"snapshot build {build_snapshot(graph, directory):.1f} s, "
+                f"{sum(f.stat().st_size for f in directory.rglob('*')) / 2**20:,.0f} MB on disk"
+            )
+            if with_legacy:
+                try:
+                    import networkx  # noqa: F401
+
+                    report("NetworkX DiGraph (previous)", in_child(run_legacy, graph))
+                except ImportError:
+                    print("networkx not installed; skipping the previous implementation")
+            report("GraphStore", in_child(run_store, graph, directory))
+            if not with_legacy:
+                delta = in_child(run_delta, graph, directory, args.delta_writes)
+                print(f"\nDelta log ({args.delta_writes:,} edge writes):")
+                for name, value in delta.items():
+                    print(f"  {name:<28} {value:10.2f}")
+
+
+if __name__ == "__main__":
+    main()
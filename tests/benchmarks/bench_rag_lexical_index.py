@@ -0,0 +1,114 @@
+"""
+SAHOOL Benchmark: RAG lexical index
+Query latency of the BM25 inverted index vs. the previous full-scan search
+
+Usage:
+    python tests/benchmarks/bench_rag_lexical_index.py --chunks 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, "packages")
+
+from advisor.rag.lexical_index import BM25Index
+
+VOCABULARY = (
+    "wheat tomato potato maize sorghum coffee qat barley date palm mango "
+    "irrigation drip flood sprinkler fertilizer nitrogen phosphorus potassium "
+    "pest aphid whitefly locust fungus blight rust mildew harvest yield soil "
+    "salinity ph moisture drought frost heat sowing seedling nursery ndvi "
+    "القمح الطماطم البطاطس الذرة البن الري بالتنقيط المبيدات الآفات السماد "
+    "التربة الملوحة الحصاد المحصول الجفاف الصقيع الزراعة الإرشاد"
+).split()
+TENANTS = [None, "t1", "t2", "t3", "t4"]
+CATEGORIES = ["irrigation", "pests", "fertilization", "harvest"]
+
+
+def make_chunks(n: int, words_per_chunk: int, seed: int) -> list[tuple[str, str, str | None, str]]:
+    rng = random.Random(seed)
+    return [
+        (
+            f"chunk-{i}",
+            " ".join(rng.choices(VOCABULARY, k=words_per_chunk)),
+            rng.choice(TENANTS),
+            rng.choice(CATEGORIES),
+        )
+        for i in range(n)
+    ]
+
+
+def scan_search(chunks, query: str, limit: int, tenant_id: str | None, category: str | None):
+    """The previous RAGService.search algorithm: scan and intersect per chunk."""
+    query_words = set(query.lower().split())
+    results = []
+    for key, text, chunk_tenant, chunk_category in chunks:
+        if tenant_id and chunk_tenant and chunk_tenant != tenant_id:
+            continue
+        if category and chunk_category != category:
+            continue
+        overlap = len(query_words & set(text.lower().split()))
+        if overlap > 0:
+            results.append((key, overlap / len(query_words)))
+    results.sort(key=lambda r: r[1], reverse=True)
+    return results[:limit]
+
+
+def timed(fn, queries) -> list[float]:
+    samples = []
+    for query, tenant_id, category in queries:
+        start = time.perf_counter()
+        fn(query, tenant_id, category)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(name: str, samples: list[float]) -> None:
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1] if len(samples) >= 20 else samples[-1]
+    print(f"{name:<12} mean={statistics.mean(samples):9.2f} ms  p95={p95:9.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunks", type=int, default=1_000_000)
+    parser.add_argument("--words", type=int, default=60)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--scan-queries", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    chunks = make_chunks(args.chunks, args.words, args.seed)
+    rng = random.Random(args.seed + 1)
+    queries = [
+        (" ".join(rng.sample(VOCABULARY, 3)), rng.choice(TENANTS), rng.choice([None, *CATEGORIES]))
+        for _ in range(args.queries)
+    ]
+
+    start = time.perf_counter()
+    index = BM25Index()
+    for key, text, tenant_id, category in chunks:
+        index.add(key, text, tenant_id=tenant_id, category=category)
+    build_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for key, text, tenant_id, category in chunks[:1000]:
+        index.add(key, text[::-1], tenant_id=tenant_id, category=category)
+    replace_us = (time.perf_counter() - start) / 1000 * 1e6
+
+    print(f"chunks={args.chunks:,} words/chunk={args.words} terms={len(index._postings):,}")
+    print(f"index build: {build_s:.1f} s, replace: {replace_us:.1f} us/chunk")
+    report("bm25", timed(lambda q, t, c: index.search(q, 5, tenant_id=t, category=c), queries))
+    report(
+        "scan",
+        timed(lambda q, t, c: scan_search(chunks, q, 5, t, c), queries[: args.scan_queries]),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+SAHOOL Benchmark: field-intelligence rule evaluation
+Events matched per second against 10k rules: the interpreted loop the
+rules engine used before (every active rule re-sorted, filtered and its
+operators interpreted per event) vs. RuleIndex.match (compiled predicates
+behind the dispatch index) and RuleIndex.match_batch (NumPy thresholds).
+
+Only condition matching is timed; actions and cooldowns are excluded.
+
+Usage:
+    python tests/benchmarks/bench_rules_engine.py --rules 10000 --events 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from datetime import UTC, datetime
+from typing import Any
+
+sys.path.insert(0, "apps/services/field-intelligence")
+
+from src.models.events import (  # noqa: E402
+    EventResponse,
+    EventSeverity,
+    EventStatus,
+    EventType,
+)
+from src.models.rules import (  # noqa: E402
+    ConditionOperator,
+    Rule,
+    RuleCondition,
+    RuleConditionGroup,
+    RuleStatus,
+)
+from src.services.rule_compiler import RuleIndex  # noqa: E402
+
+NOW = datetime(2026, 5, 1, tzinfo=UTC)
+METRICS = [f"metric_{i}" for i in range(40)]
+FIELDS = [f"field-{i}" for i in range(500)]
+THRESHOLDS = [
+    ConditionOperator.LESS_THAN,
+    ConditionOperator.GREATER_THAN,
+    ConditionOperator.LESS_EQUAL,
+    ConditionOperator.GREATER_EQUAL,
+]
+
+
+# ─── Previous interpreted evaluation (FieldRulesEngine before compilation) ───
+
+
+def legacy_field_value(event: Any, field_path: str) -> Any:
+    value: Any = event
+    for part in field_path.split("."):
+        value = value.get(part) if isinstance(value, dict) else getattr(value, part, None)
+        if value is None:
+            return None
+    return value
+
+
+def legacy_condition(event: Any, condition: RuleCondition) -> bool:
+    try:
+        field_value = legacy_field_value(event, condition.field)
+        if field_value is None:
+            return False
+        op, expected = condition.operator, condition.value
+        if op == ConditionOperator.EQUALS:
+            return field_value == expected
+        elif op == ConditionOperator.NOT_EQUALS:
+            return field_value != expected
+        elif op == ConditionOperator.GREATER_THAN:
+            return float(field_value) > float(expected)
+        elif op == ConditionOperator.LESS_THAN:
+            return float(field_value) < float(expected)
+        elif op == ConditionOperator.GREATER_EQUAL:
+            return float(field_value) >= float(expected)
+        elif op == ConditionOperator.LESS_EQUAL:
+            return float(field_value) <= float(expected)
+        elif op == ConditionOperator.CONTAINS:
+            return expected in str(field_value)
+        elif op == ConditionOperator.IN:
+            return field_value in expected
+        elif op == ConditionOperator.BETWEEN:
+            if isinstance(expected, list) and len(expected) == 2:
+                return expected[0] <= float(field_value) <= expected[1]
+        return False
+    except Exception:
+        return False
+
+
+def legacy_match(event: EventResponse, rules: list[Rule]) -> list[str]:
+    active = [r for r in rules if r.status == RuleStatus.ACTIVE]
+    active.sort(key=lambda r: r.priority)
+    matched = []
+    for rule in active:
+        if rule.field_ids and event.field_id not in rule.field_ids:
+            continue
+        if rule.event_types and event.event_type.value not in rule.event_types:
+            continue
+        results = [legacy_condition(event, c) for c in rule.conditions.conditions]
+        ok = any(results) if rule.conditions.logic.upper() == "OR" else all(results)
+        if ok:
+            matched.append(rule.rule_id)
+    return matched
+
+
+# ─── Workload ───
+
+
+def make_rules(n: int, rng: random.Random) -> list[Rule]:
+    rules = []
+    for i in range(n):
+        kind = rng.random()
+        if kind < 0.7:  # thresholds on one or two metrics
+            conditions = [
+                RuleCondition(
+                    field=f"metadata.{rng.choice(METRICS)}",
+                    operator=rng.choice(THRESHOLDS),
+                    value=round(rng.uniform(0, 100), 1),
+                )
+                for _ in range(rng.choice((1, 1, 2)))
+            ]
+            logic = "AND"
+        elif kind < 0.85:  # band + severity
+            low = rng.uniform(0, 90)
+            conditions = [
+                RuleCondition(
+                    field=f"metadata.{rng.choice(METRICS)}",
+                    operator=ConditionOperator.BETWEEN,
+                    value=[low, low + 10],
+                ),
+                RuleCondition(
+                    field="severity", operator=ConditionOperator.IN, value=["high", "critical"]
+                ),
+            ]
+            logic = "AND"
+        else:  # OR alerts with text match
+            conditions = [
+                RuleCondition(
+                    field=f"metadata.{rng.choice(METRICS)}",
+                    operator=ConditionOperator.GREATER_THAN,
+                    value=rng.uniform(90, 100),
+                ),
+                RuleCondition(
+                    field="metadata.alert_type", operator=ConditionOperator.CONTAINS, value="frost"
+                ),
+            ]
+            logic = "OR"
+        rules.append(
+            Rule(
+                rule_id=f"rule-{i}",
+                tenant_id="tenant-1",
+                name=f"rule {i}",
+                status=RuleStatus.ACTIVE if rng.random() < 0.9 else RuleStatus.INACTIVE,
+                event_types=[rng.choice(list(EventType)).value] if rng.random() < 0.8 else [],
+                field_ids=rng.sample(FIELDS, 3) if rng.random() < 0.2 else [],
+                conditions=RuleConditionGroup(logic=logic, conditions=conditions),
+                priority=rng.randint(0, 1000),
+                created_at=NOW,
+                updated_at=NOW,
+            )
+        )
+    return rules
+
+
+def make_events(n: int, rng: random.Random) -> list[EventResponse]:
+    events = []
+    for i in range(n):
+        metadata: dict[str, Any] = {
+            m: round(rng.uniform(0, 100), 2) for m in rng.sample(METRICS, 8)
+        }
+        if rng.random() < 0.1:
+            metadata["alert_type"] = "frost_warning"
+        events.append(
+            EventResponse(
+                event_id=f"evt-{i}",
+                tenant_id="tenant-1",
+                field_id=rng.choice(FIELDS),
+                event_type=rng.choice(list(EventType)),
+                severity=rng.choice(list(EventSeverity)),
+                status=EventStatus.ACTIVE,
+                title="bench",
+                description="bench",
+                source_service="bench",
+                metadata=metadata,
+                created_at=NOW,
+            )
+        )
+    return events
+
+
+def timed(fn) -> tuple[float, Any]:
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rules", type=int, default=10_000)
+    parser.add_argument("--events", type=int, default=5_000)
+    parser.add_argument("--legacy-events", type=int, default=500, help="legacy loop is slow")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    rules = make_rules(args.rules, rng)
+    events = make_events(args.events, rng)
+    legacy_events = events[: args.legacy_events]
+
+    build_seconds, index = timed(lambda: RuleIndex(rules))
+    legacy_seconds, legacy = timed(lambda: [legacy_match(e, rules) for e in legacy_events])
+    single_seconds, single = timed(lambda: [index.match(e) for e in events])
+    batch_seconds, batch = timed(lambda: index.match_batch(events))
+
+    expected = [[r.rule.rule_id for r in m] for m in single]
+    assert expected[: len(legacy)] == legacy, "compiled matches differ from the interpreter"
+    assert [[r.rule.rule_id for r in m] for m in batch] == expected, "batch differs"
+
+    matches = sum(len(m) for m in single) / len(events)
+    print(f"{len(index):,} active of {args.rules:,} rules, {matches:.1f} matches/event")
+    print(f"index build: {build_seconds * 1000:.0f} ms")
+    print(f"{'mode':<28}{'events':>10}{'events/s':>12}{'speedup':>10}")
+    legacy_rate = len(legacy_events) / legacy_seconds
+    for name, count, seconds in (
+        ("interpreted loop", len(legacy_events), legacy_seconds),
+        ("RuleIndex.match", len(events), single_seconds),
+        ("RuleIndex.match_batch", len(events), batch_seconds),
+    ):
+        rate = count / seconds
+        print(f"{name:<28}{count:>10,}{rate:>12,.0f}{rate / legacy_rate:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""
+SAHOOL Benchmark: scene tile cache
+Upstream calls, pixels transferred and per-field latency for index
+statistics of --fields fields in one Sentinel-2 tile, served by a local fake
+provider with --latency-ms per request and --upstream-concurrency requests
+in flight (the provider's rate limit):
+
+- one Process API request per field and date (previous
+  SentinelHubProvider.get_indices flow)
+- SceneCache: one request per tile and date, fields clipped from the
+  cached arrays; cold, warm in memory, and after a restart (disk only)
+
+Usage:
+    python tests/benchmarks/bench_scene_cache.py --fields 1000 --latency-ms 250
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, "apps/services/satellite-service")
+
+from src.scene_cache import (  # noqa: E402
+    BANDS,
+    INDEX_NAMES,
+    REFLECTANCE_SCALE,
+    SceneCache,
+    TileGrid,
+    compute_indices,
+    polygon_mask,
+    summarize,
+)
+
+ACQUIRED = date(2025, 6, 1)
+GRID = TileGrid()  # 0.05 deg tiles of 500 x 500 px
+TILE_X, TILE_Y = 880, 304  # Sana'a basin, 44.0E 15.2N
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Fake provider: a deterministic scene, served with latency and a rate limit
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+def synthetic_bands(bbox, width: int, height: int) -> dict[str, np.ndarray]:
+    """Bands for the pixel grid covering bbox, a pure function of global pixel position"""
+    min_lon, _, _, max_lat = bbox
+    col = np.round(min_lon / GRID.pixel_deg).astype(np.int64) + np.arange(width)[None, :]
+    row = np.round(-max_lat / GRID.pixel_deg).astype(np.int64) + np.arange(height)[:, None]
+    noise = ((row * 73856093) ^ (col * 19349663)) % 200
+    red = 900 + 400 * np.sin(col / 37.0) * np.cos(row / 53.0) + noise
+    nir = 3000 + 1500 * np.sin(col / 71.0 + row / 29.0) + noise
+    return {
+        "B02": (red * 0.6).astype(np.uint16),
+        "B04": red.astype(np.uint16),
+        "B08": nir.astype(np.uint16),
+        "B11": (nir * 0.55 + 300).astype(np.uint16),
+    }
+
+
+class FakeProvider:
+    def __init__(self, latency: float, concurrency: int):
+        self.latency = latency
+        self.limit = asyncio.Semaphore(concurrency)
+        self.calls = 0
+        self.pixels = 0
+
+    async def fetch_tile_bands(self, bbox, width: int, height: int):
+        async with self.limit:
+            self.calls += 1
+            self.pixels += width * height
+            await asyncio.sleep(self.latency)
+            return synthetic_bands(bbox, width, height)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Legacy: one provider request per field, clipped on arrival
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+async def legacy_field_stats(provider: FakeProvider, ring) -> dict[str, float]:
+    lons = [p[0] for p in ring]
+    lats = [p[1] for p in ring]
+    pixel = GRID.pixel_deg
+    # Snap to the pixel grid so both paths see the same pixels
+    min_lon = np.floor(min(lons) / pixel) * pixel
+    max_lat = np.ceil(max(lats) / pixel) * pixel
+    width = int(np.ceil((max(lons) - min_lon) / pixel))
+    height = int(np.ceil((max_lat - min(lats)) / pixel))
+    bands = await provider.fetch_tile_bands(
+        (min_lon, max_lat - height * pixel, min_lon + width * pixel, max_lat), width, height
+    )
+    mask = polygon_mask(
+        ring,
+        min_lon + (np.arange(width) + 0.5) * pixel,
+        max_lat - (np.arange(height) + 0.5) * pixel,
+    )
+    values = [bands[band][mask].astype(np.float32) / REFLECTANCE_SCALE for band in BANDS]
+    indices = compute_indices(*values)
+    return {name: summarize(indices[name]).mean for name in INDEX_NAMES}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Workload
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+def make_fields(n: int, seed: int = 3) -> list[list[tuple[float, float]]]:
+    """Jittered quadrilaterals of ~1-4 ha inside one tile"""
+    rng = np.random.default_rng(seed)
+    min_lon, min_lat, max_lon, max_lat = GRID.tile_bbox(TILE_X, TILE_Y)
+    fields = []
+    for _ in range(n):
+        side = rng.uniform(0.0009, 0.002)
+        lon = rng.uniform(min_lon + 0.0005, max_lon - side - 0.0005)
+        lat = rng.uniform(min_lat + 0.0005, max_lat - side - 0.0005)
+        jitter = rng.uniform(-0.15, 0.15, size=(4, 2)) * side
+        corners = np.array([(0, 0), (side, 0), (side, side), (0, side)]) + jitter + (lon, lat)
+        fields.append([tuple(c) for c in corners])
+    return fields
+
+
+async def run(fields, answer, concurrency: int) -> dict:
+    """All fields requested at once, as a farm-wide refresh does, ``concurrency`` at a time"""
+    gate = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    results: list = [None] * len(fields)
+
+    async def one(i: int, ring) -> None:
+        async with gate:
+            started = time.perf_counter()
+            results[i] = await answer(ring)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i, ring) for i, ring in enumerate(fields)))
+    wall = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "wall": wall,
+        "p50": statistics.median(latencies) * 1000,
+        "p95": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--fields", type=int, default=1000)
+    parser.add_argument("--latency-ms", type=float, default=250.0)
+    parser.add_argument("--upstream-concurrency", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=64, help="field requests in flight")
+    args = parser.parse_args()
+
+    fields = make_fields(args.fields)
+    latency = args.latency_ms / 1000
+
+    print(
+        f"{args.fields} fields in one {GRID.size}x{GRID.size} px tile, "
+        f"provider {args.latency_ms:g} ms/request, {args.upstream_concurrency} in flight"
+    )
+    header = (
+        f"{'path':<36}{'upstream':>9}{'Mpx':>7}{'wall s':>9}{'p50 ms':>9}{'p95 ms':>9}"
+        f"{'disk MB':>9}"
+    )
+    print(header)
+    print("-" * len(header))
+
+    def report(label: str, provider: FakeProvider, result: dict, disk: float | None) -> None:
+        disk_text = f"{disk:>9.1f}" if disk is not None else f"{'-':>9}"
+        print(
+            f"{label:<36}{provider.calls:>9}{provider.pixels / 1e6:>7.2f}{result['wall']:>9.2f}"
+            f"{result['p50']:>9.1f}{result['p95']:>9.1f}{disk_text}"
+        )
+
+    async def legacy() -> tuple[FakeProvider, dict]:
+        provider = FakeProvider(latency, args.upstream_concurrency)
+        result = await run(
+            fields, lambda ring: legacy_field_stats(provider, ring), args.concurrency
+        )
+        return provider, result
+
+    provider, legacy_result = asyncio.run(legacy())
+    report("per-field request (legacy)", provider, legacy_result, None)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "scenes"
+
+        async def cached(cache: SceneCache, provider: FakeProvider) -> dict:
+            async def fetch(bbox, width, height):
+                return await provider.fetch_tile_bands(bbox, width, height)
+
+            async def answer(ring):
+                stats = await cache.field_stats(fetch, "sentinel-2", ACQUIRED, ring=ring)
+                return {name: stats.indices[name].mean for name in INDEX_NAMES}
+
+            return await run(fields, answer, args.concurrency)
+
+        cache = SceneCache(root, grid=GRID)
+        provider = FakeProvider(latency, args.upstream_concurrency)
+        cold = asyncio.run(cached(cache, provider))
+        disk = cache.snapshot()["disk_bytes"] / 1e6
+        report("SceneCache cold", provider, cold, disk)
+
+        provider = FakeProvider(latency, args.upstream_concurrency)
+        warm = asyncio.run(cached(cache, provider))
+        report("SceneCache warm (memory)", provider, warm, disk)
+
+        restarted = SceneCache(root, grid=GRID)
+        provider = FakeProvider(latency, args.upstream_concurrency)
+        reopened = asyncio.run(cached(restarted, provider))
+        report("SceneCache after restart (disk)", provider, reopened, disk)
+        chunk_reads = restarted.stats["chunk_reads"]
+
+    diffs = [
+        abs(a[name] - b[name])
+        for a, b in zip(legacy_result["results"], cold["results"], strict=True)
+        for name in ("ndvi", "evi", "ndwi")
+    ]
+    print(f"\nmax |mean index difference| vs. legacy: {max(diffs):.2e}")
+    print(f"chunks decompressed after restart: {chunk_reads}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+SAHOOL Benchmark: task-service dashboard statistics
+Latency of TaskRepository.get_task_stats for a tenant with 1M tasks: the
+previous seven COUNT queries vs. the single FILTER-aggregate query
+(get_task_stats_direct, the reconciliation path) vs. the incrementally
+maintained status counters and due-date histogram (get_task_stats).
+Also reports the cost the counters add to a status transition and a full
+reconcile_task_stats rebuild. Results are checked against each other.
+
+Requires PostgreSQL (JSONB columns, upserts, FILTER aggregates); the
+tables are created and dropped in the given database.
+
+Usage:
+    python tests/benchmarks/bench_task_stats.py --database-url postgresql://... --tasks 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, create_engine, func, text
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, "apps/services/shared")
+sys.path.insert(0, "apps/services/task-service")
+
+from src.models import Base, Task  # noqa: E402
+from src.repository import TaskRepository  # noqa: E402
+
+TENANT = "tenant_bench"
+
+
+# ─── Previous path (TaskRepository.get_task_stats before the counters) ───
+
+
+def legacy_task_stats(db, tenant_id: str) -> dict:
+    now = datetime.utcnow()
+    week_start = now - timedelta(days=now.weekday())
+    week_start = week_start.replace(hour=0, minute=0, second=0, microsecond=0)
+    week_end = week_start + timedelta(days=7)
+
+    def count(*conditions):
+        return (
+            db.query(func.count(Task.task_id))
+            .filter(and_(Task.tenant_id == tenant_id, *conditions))
+            .scalar()
+        )
+
+    total = count()
+    pending = count(Task.status == "pending")
+    in_progress = count(Task.status == "in_progress")
+    completed = count(Task.status == "completed")
+    overdue = count(Task.status.notin_(["completed", "cancelled"]), Task.due_date < now)
+    week_total = count(Task.due_date >= week_start, Task.due_date < week_end)
+    week_completed = count(
+        Task.due_date >= week_start, Task.due_date < week_end, Task.status == "completed"
+    )
+
+    return {
+        "total": total or 0,
+        "pending": pending or 0,
+        "in_progress": in_progress or 0,
+        "completed": completed or 0,
+        "overdue": overdue or 0,
+        "week_progress": {
+            "completed": week_completed or 0,
+            "total": week_total or 0,
+            "percentage": (round(week_completed / week_total * 100) if week_total > 0 else 0),
+        },
+    }
+
+
+# ─── Setup ───
+
+
+def populate(engine, tenant_id: str, count: int, offset: int = 0) -> None:
+    """Tasks due across a year around today; 5% without a due date"""
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                """
+                INSERT INTO tasks (task_id, tenant_id, title, task_type, priority, status,
+                                   created_by, due_date, suggested_by_calendar)
+                SELECT 'task_' || (:offset + i), :tenant_id, 'Irrigate', 'irrigation', 'medium',
+                       (ARRAY['pending', 'in_progress', 'completed', 'completed', 'cancelled'])
+                           [1 + i % 5],
+                       'user_bench',
+                       CASE WHEN i % 20 = 0 THEN NULL
+                            ELSE now() + ((i::bigint * 7919) % 525600 - 262800) * interval '1 minute'
+                       END,
+                       false
+                FROM generate_series(1, :count) AS i
+                """
+            ),
+            {"tenant_id": tenant_id, "count": count, "offset": offset},
+        )
+        conn.execute(text("ANALYZE tasks"))
+
+
+def timed(fn, rounds: int) -> tuple[list[float], object]:
+    seconds, result = [], None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = fn()
+        seconds.append(time.perf_counter() - start)
+    return seconds, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--other-tenants", type=int, default=20, help="tenants of 10k tasks each")
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+    if not args.database_url:
+        parser.error("--database-url (or DATABASE_URL) must point to PostgreSQL")
+
+    engine = create_engine(args.database_url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine, autoflush=False)()
+    repo = TaskRepository(db)
+
+    began = time.perf_counter()
+    populate(engine, TENANT, args.tasks)
+    for i in range(args.other_tenants):
+        populate(engine, f"tenant_{i}", 10_000, offset=args.tasks + i * 10_000)
+    print(f"populated {args.tasks:,} tasks in {time.perf_counter() - began:.0f}s")
+
+    start = time.perf_counter()
+    repo.reconcile_task_stats()
+    reconcile_seconds = time.perf_counter() - start
+
+    modes = {
+        "seven COUNTs (previous)": lambda: legacy_task_stats(db, TENANT),
+        "FILTER aggregate": lambda: repo.get_task_stats_direct(TENANT),
+        "counters + histogram": lambda: repo.get_task_stats(TENANT),
+    }
+    seconds: dict[str, list[float]] = {name: [] for name in modes}
+    results = {}
+    # Alternate modes so cache state and CPU noise hit all of them alike
+    for _ in range(args.rounds):
+        for name, run in modes.items():
+            elapsed, results[name] = timed(run, 1)
+            seconds[name] += elapsed
+            db.rollback()
+    reference = results["seven COUNTs (previous)"]
+    for name, result in results.items():
+        assert result == reference, f"{name} differs: {result} != {reference}"
+
+    pending = [
+        task_id
+        for (task_id,) in db.query(Task.task_id)
+        .filter(Task.tenant_id == TENANT, Task.status == "pending")
+        .limit(args.rounds * 10)
+    ]
+    transitions, _ = timed(
+        lambda: [
+            repo.start_task(task_id, TENANT, "user_bench")
+            for task_id in pending[: len(pending) // 2]
+        ],
+        1,
+    )
+    completions, _ = timed(
+        lambda: [
+            repo.complete_task(task_id, TENANT, "user_bench")
+            for task_id in pending[len(pending) // 2 :]
+        ],
+        1,
+    )
+    assert repo.get_task_stats(TENANT) == repo.get_task_stats_direct(TENANT)
+
+    print(f"{args.tasks:,} tasks for one tenant, {args.rounds} rounds")
+    print(f"{'get_task_stats':<26}{'p50 ms':>10}{'p95 ms':>10}{'speedup':>10}")
+    baseline = None
+    for name, values in seconds.items():
+        values = sorted(values)
+        p50 = values[len(values) // 2]
+        p95 = values[min(len(values) - 1, int(len(values) * 0.95))]
+        baseline = baseline or p50
+        print(f"{name:<26}{p50 * 1000:>10.2f}{p95 * 1000:>10.2f}{baseline / p50:>9.0f}x")
+    half = max(1, len(pending) // 2)
+    print(f"start_task with counters: {transitions[0] / half * 1000:.2f} ms per task")
+    print(f"complete_task with counters: {completions[0] / half * 1000:.2f} ms per task")
+    print(f"reconcile_task_stats (all tenants): {reconcile_seconds:.1f}s")
+    print("all paths return identical statistics")
+
+    db.close()
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+SAHOOL Benchmark: season-end yield forecast for a whole cooperative
+Fields/s for 10k fields: a Python loop over YieldEnsembleModel.predict
+(previous path) vs. YieldEnsembleModel.predict_batch (columnar NumPy
+sub-models), with and without building every per-field explanation.
+
+Logging is disabled for both paths; predict formats its per-model log
+lines either way.
+
+Usage:
+    python tests/benchmarks/bench_yield_ensemble_batch.py --fields 10000
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import math
+import random
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, "apps/services/ai-agents-core/src")
+
+from models.crop_parameters import Region, get_all_crop_ids  # noqa: E402
+from models.yield_ensemble import FieldData, YieldEnsembleModel  # noqa: E402
+
+
+def make_fields(n: int, seed: int = 7) -> list[FieldData]:
+    """Fields with the gaps real cooperatives have: ~25% of each input missing"""
+    rng = random.Random(seed)
+    crops = get_all_crop_ids()
+
+    def maybe(value, p=0.25):
+        return None if rng.random() < p else value
+
+    return [
+        FieldData(
+            field_id=f"field-{i}",
+            crop_id=rng.choice(crops),
+            region=rng.choice(list(Region)),
+            area_hectares=rng.uniform(0.5, 20),
+            ndvi_current=maybe(rng.uniform(0.1, 0.9)),
+            ndvi_peak=maybe(rng.uniform(0.2, 0.95)),
+            ndvi_history=maybe([(datetime(2026, 1, 1), 0.5)] * rng.randint(0, 10)),
+            accumulated_gdd=maybe(rng.uniform(100, 3500), 0.4),
+            current_temperature=maybe(rng.uniform(5, 45)),
+            soil_moisture_current=maybe(rng.uniform(5, 80)),
+            soil_ph=maybe(rng.uniform(4.5, 9)),
+            soil_ec=maybe(rng.uniform(0, 12)),
+            soil_nutrient_score=maybe(rng.random()),
+            total_irrigation_mm=maybe(rng.uniform(0, 900), 0.4),
+            total_rainfall_mm=maybe(rng.uniform(0, 400), 0.5),
+            planting_date=maybe(datetime(2026, 3, 1)),
+            days_since_planting=maybe(rng.randint(1, 200), 0.4),
+            historical_yields=maybe([rng.uniform(500, 8000) for _ in range(rng.randint(0, 10))]),
+            disease_severity=maybe(rng.random()),
+        )
+        for i in range(n)
+    ]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--fields", type=int, default=10_000)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    fields = make_fields(args.fields)
+    model = YieldEnsembleModel()
+
+    def batch_with_explanations():
+        batch = model.predict_batch(fields)
+        return [batch[i] for i in range(len(batch))]
+
+    modes = {
+        "predict loop (previous)": lambda: [model.predict(f) for f in fields],
+        "predict_batch": lambda: model.predict_batch(fields),
+        "predict_batch + all explanations": batch_with_explanations,
+    }
+    # Median of rounds - shared CPUs are noisy
+    seconds = {name: [] for name in modes}
+    results = {}
+    for _ in range(args.rounds):
+        for name, run in modes.items():
+            elapsed, results[name] = timed(run)
+            seconds[name].append(elapsed)
+
+    loop, batch = results["predict loop (previous)"], results["predict_batch"]
+    worst = max(
+        abs(p.predicted_yield_kg_per_hectare - y) / max(abs(y), 1e-9)
+        for p, y in zip(loop, batch.predicted_yield_kg_per_hectare, strict=True)
+    )
+    assert math.isclose(worst + 1, 1, abs_tol=1e-9), f"batch differs from predict: {worst}"
+
+    print(f"{args.fields:,} fields, median of {args.rounds} rounds, max rel. diff {worst:.1e}")
+    print(f"{'mode':<36}{'ms':>10}{'fields/s':>12}{'speedup':>10}")
+    baseline = None
+    for name in modes:
+        median = sorted(seconds[name])[len(seconds[name]) // 2]
+        baseline = baseline or median
+        print(
+            f"{name:<36}{median * 1000:>10.0f}{args.fields / median:>12,.0f}"
+            f"{baseline / median:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+SAHOOL Benchmark: raster zonal statistics
+Time and peak memory of NDVI field statistics and management zones over a
+--size x --size float32 raster kept on disk as a .npy memmap, clipped to an
+irregular field polygon covering most of it:
+
+- whole raster in memory: load it, mask the polygon, percentiles and
+  quantile classes over every pixel (no polygons)
+- ZonalStatsEngine: row blocks from the memmap, field statistics only
+- ZonalStatsEngine: field statistics, Jenks / k-means zones, polygons
+
+Each case runs in a fresh process so peak RSS is its own.
+
+Usage:
+    python tests/benchmarks/bench_zonal_stats.py --size 10000
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import multiprocessing as mp
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, "apps/services/satellite-service")
+
+from src.scene_cache import polygon_mask  # noqa: E402
+from src.zonal_stats import RasterTransform, ZonalStatsEngine  # noqa: E402
+
+PIXEL_DEG = 0.0001  # ~10 m
+
+
+def make_raster(path: Path, size: int, block: int = 1000) -> None:
+    """Smooth vigor pattern plus noise, written block by block"""
+    ndvi = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=(size, size))
+    rng = np.random.default_rng(5)
+    cols = np.arange(size) / size
+    for top in range(0, size, block):
+        rows = (np.arange(top, min(top + block, size)) / size)[:, None]
+        values = (
+            0.55
+            + 0.2 * np.sin(cols * 7.0 + rows * 3.0)
+            + 0.1 * np.cos(rows * 11.0)
+            + rng.normal(0.0, 0.03, (len(rows), size))
+        )
+        values[:, ::997] = np.nan  # cloud / no-data stripes
+        ndvi[top : top + len(rows)] = values
+    ndvi.flush()
+
+
+def make_field(transform: RasterTransform, size: int) -> list[tuple[float, float]]:
+    """Wobbly 256-vertex polygon spanning ~90% of the raster"""
+    cx = transform.west + size * PIXEL_DEG / 2
+    cy = transform.north - size * PIXEL_DEG / 2
+    radius = size * PIXEL_DEG * 0.45
+    angles = np.linspace(0, 2 * math.pi, 256, endpoint=False)
+    r = radius * (1 + 0.08 * np.sin(angles * 5))
+    return list(zip((cx + r * np.cos(angles)).tolist(), (cy + r * np.sin(angles)).tolist()))
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Cases, each run in its own process
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+def in_memory(path: Path, transform: RasterTransform, ring, num_zones: int) -> dict:
+    ndvi = np.load(path)
+    height, width = ndvi.shape
+    mask = polygon_mask(ring, transform.col_centers(0, width), transform.row_centers(0, height))
+    mask &= np.isfinite(ndvi)
+    values = ndvi[mask]
+    percentiles = np.percentile(values, (10, 25, 50, 75, 90))
+    breaks = np.percentile(values, np.arange(1, num_zones) / num_zones * 100)
+    labels = np.where(mask, np.digitize(ndvi, breaks) + 1, 0).astype(np.uint8)
+    return {
+        "mean": float(values.mean()),
+        "p50": float(percentiles[2]),
+        "zones": int(labels.max()),
+        "polygons": 0,
+    }
+
+
+def engine_stats(path: Path, transform: RasterTransform, ring, num_zones: int) -> dict:
+    stats = ZonalStatsEngine().field_statistics(np.load(path, mmap_mode="r"), ring, transform)
+    return {"mean": stats.mean, "p50": stats.percentiles[50], "zones": 0, "polygons": 0}
+
+
+def engine_zones(method: str):
+    def run(path: Path, transform: RasterTransform, ring, num_zones: int) -> dict:
+        result = ZonalStatsEngine().management_zones(
+            np.load(path, mmap_mode="r"), ring, transform, num_zones, method
+        )
+        return {
+            "mean": result.stats.mean,
+            "p50": result.stats.percentiles[50],
+            "zones": len(result.zones),
+            "polygons": sum(len(z.polygons) for z in result.zones),
+            "cell": result.cell_size,
+        }
+
+    return run
+
+
+CASES = {
+    "whole raster in memory (no polygons)": in_memory,
+    "engine: field statistics": engine_stats,
+    "engine: jenks zones + polygons": engine_zones("jenks"),
+    "engine: k-means zones + polygons": engine_zones("kmeans"),
+}
+
+
+def child(name: str, path: str, transform, ring, num_zones: int, trace: bool, out) -> None:
+    if trace:
+        tracemalloc.start()
+    started = time.perf_counter()
+    result = CASES[name](Path(path), transform, ring, num_zones)
+    result["seconds"] = time.perf_counter() - started
+    result["heap_mb"] = tracemalloc.get_traced_memory()[1] / 1e6 if trace else 0.0
+    result["peak_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    out.put(result)
+
+
+def run_case(ctx, name: str, path: Path, transform, ring, num_zones: int, trace: bool) -> dict:
+    out = ctx.Queue()
+    proc = ctx.Process(target=child, args=(name, str(path), transform, ring, num_zones, trace, out))
+    proc.start()
+    result = out.get()
+    proc.join()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=10000)
+    parser.add_argument("--zones", type=int, default=5)
+    parser.add_argument("--skip-in-memory", action="store_true")
+    args = parser.parse_args()
+
+    transform = RasterTransform(44.0, 15.5, PIXEL_DEG, PIXEL_DEG)
+    ring = make_field(transform, args.size)
+    ctx = mp.get_context("spawn")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "ndvi.npy"
+        started = time.perf_counter()
+        make_raster(path, args.size)
+        raster_mb = path.stat().st_size / 1e6
+        print(
+            f"{args.size}x{args.size} float32 raster ({raster_mb:.0f} MB on disk, "
+            f"written in {time.perf_counter() - started:.1f} s), {args.zones} zones"
+        )
+        header = (
+            f"{'case':<40}{'seconds':>9}{'heap MB':>9}{'RSS MB':>8}{'mean':>8}{'p50':>8}"
+            f"{'polygons':>10}"
+        )
+        print(header)
+        print("-" * len(header))
+
+        for name in CASES:
+            if args.skip_in_memory and name.startswith("whole"):
+                continue
+            # Timed without tracing, which slows numpy-heavy code down
+            result = run_case(ctx, name, path, transform, ring, args.zones, trace=False)
+            traced = run_case(ctx, name, path, transform, ring, args.zones, trace=True)
+            result["heap_mb"] = traced["heap_mb"]
+            print(
+                f"{name:<40}{result['seconds']:>9.2f}{result['heap_mb']:>9.0f}"
+                f"{result['peak_mb']:>8.0f}{result['mean']:>8.4f}{result['p50']:>8.4f}{result['polygons']:>10}"
+            )
+            if "cell" in result:
+                print(f"{'':<40}management cell {result['cell']} x {result['cell']} px")
+
+    print(
+        "\nheap MB: peak traced allocations (numpy arrays included); RSS MB: the case "
+        "process's max RSS, which also counts the interpreter and memmap pages read"
+    )
+
+
+if __name__ == "__main__":
+    main()
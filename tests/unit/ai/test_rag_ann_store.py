@@ -0,0 +1,150 @@
+"""
+SAHOOL Local Vector Store Tests
+Unit tests for the embedded IVF index and LocalVectorStore
+"""
+
+import sys
+
+import numpy as np
+
+sys.path.insert(0, "packages")
+
+from advisor.rag.ann_store import IVFIndex, LocalVectorStore
+from advisor.rag.doc_store import DocChunk
+
+VOCAB = ["wheat", "tomato", "irrigation", "pests", "fertilizer", "harvest", "soil", "frost"]
+
+
+def bag_of_words(texts: list[str]) -> np.ndarray:
+    """Deterministic toy embedder for tests"""
+    vectors = np.zeros((len(texts), len(VOCAB)), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for word in text.lower().split():
+            if word in VOCAB:
+                vectors[row, VOCAB.index(word)] += 1.0
+    return vectors
+
+
+def clustered_vectors(n: int, dim: int, clusters: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim))
+    labels = rng.integers(0, clusters, size=n)
+    return (centers[labels] + 0.3 * rng.standard_normal((n, dim))).astype(np.float32)
+
+
+class TestIVFIndex:
+    """Test the IVF index"""
+
+    def test_exact_before_training(self):
+        index = IVFIndex(dim=4, train_size=100)
+        index.upsert(["a", "b"], np.array([[1, 0, 0, 0], [0, 1, 0, 0]], dtype=np.float32))
+
+        results = index.search(np.array([1, 0.1, 0, 0]), k=2)
+
+        assert not index.is_trained
+        assert [doc_id for doc_id, _, _ in results] == ["a", "b"]
+        assert results[0][1] > 0.99
+
+    def test_recall_against_exact_search(self):
+        vectors = clustered_vectors(4000, 32, clusters=40)
+        index = IVFIndex(dim=32, nlist=64, nprobe=8, train_size=1000)
+        index.upsert([str(i) for i in range(len(vectors))], vectors)
+        normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+        rng = np.random.default_rng(1)
+        recall = 0.0
+        for query in vectors[rng.choice(len(vectors), 20, replace=False)]:
+            query = query / np.linalg.norm(query)
+            expected = {str(i) for i in np.argsort(-(normalized @ query))[:10]}
+            found = {doc_id for doc_id, _, _ in index.search(query, k=10)}
+            recall += len(expected & found) / 10
+
+        assert index.is_trained
+        assert recall / 20 >= 0.9
+
+    def test_delete_and_slot_reuse(self):
+        index = IVFIndex(dim=2)
+        index.upsert(["a", "b"], np.array([[1, 0], [0, 1]], dtype=np.float32))
+        assert index.delete(["a", "missing"]) == 1
+
+        index.upsert(["c"], np.array([[1, 0]], dtype=np.float32))
+
+        assert len(index) == 2
+        assert [doc_id for doc_id, _, _ in index.search(np.array([1, 0]), k=1)] == ["c"]
+
+    def test_tenant_and_category_filters(self):
+        index = IVFIndex(dim=2)
+        index.upsert(
+            ["global", "t1", "t2"],
+            np.ones((3, 2), dtype=np.float32),
+            [{}, {"tenant_id": "t1", "category": "pests"}, {"tenant_id": "t2"}],
+        )
+
+        tenant_hits = {doc_id for doc_id, _, _ in index.search(np.ones(2), 5, tenant_id="t1")}
+        category_hits = [doc_id for doc_id, _, _ in index.search(np.ones(2), 5, category="pests")]
+
+        assert tenant_hits == {"global", "t1"}
+        assert category_hits == ["t1"]
+
+    def test_memory_mapped_storage_survives_reopen(self, tmp_path):
+        vectors = clustered_vectors(3000, 16, clusters=10)
+        path = tmp_path / "kb.npy"
+        index = IVFIndex(dim=16, path=path, train_size=1000)
+        index.upsert(
+            [str(i) for i in range(len(vectors))], vectors, [{"n": i} for i in range(3000)]
+        )
+        index.flush()
+
+        reopened = IVFIndex(dim=16, path=path)
+
+        assert len(reopened) == 3000
+        assert reopened.is_trained
+        doc_id, score, payload = reopened.search(vectors[42], k=1)[0]
+        assert doc_id == "42"
+        assert payload == {"n": 42}
+
+
+class TestLocalVectorStore:
+    """Test the VectorStore protocol implementation"""
+
+    def test_upsert_and_search(self):
+        store = LocalVectorStore(bag_of_words, vector_size=len(VOCAB))
+        store.upsert_chunks(
+            "kb",
+            [
+                DocChunk("d1", "0", "wheat irrigation", {"category": "irrigation"}),
+                DocChunk("d2", "0", "tomato pests", {"category": "pests"}),
+            ],
+        )
+
+        results = store.search("kb", "irrigation of wheat", limit=1)
+
+        assert results[0][0].doc_id == "d1"
+        assert store.count("kb") == 2
+
+    def test_tenant_filter_from_metadata(self):
+        store = LocalVectorStore(bag_of_words, vector_size=len(VOCAB))
+        store.upsert_chunks(
+            "kb",
+            [
+                DocChunk("d1", "0", "wheat irrigation", {"tenant_id": "t1"}),
+                DocChunk("d2", "0", "wheat irrigation", {"tenant_id": "t2"}),
+            ],
+        )
+
+        results = store.search("kb", "wheat", limit=5, tenant_id="t2")
+
+        assert [chunk.doc_id for chunk, _ in results] == ["d2"]
+
+    def test_delete_chunks(self):
+        store = LocalVectorStore(bag_of_words, vector_size=len(VOCAB))
+        store.upsert_chunks("kb", [DocChunk("d1", "0", "wheat", {})])
+
+        assert store.delete_chunks("kb", ["d1:0"]) == 1
+        assert store.search("kb", "wheat", limit=5) == []
+
+    def test_unknown_collection_is_empty(self):
+        store = LocalVectorStore(bag_of_words, vector_size=len(VOCAB))
+
+        assert store.search("missing", "wheat", limit=5) == []
+        assert store.count("missing") == 0
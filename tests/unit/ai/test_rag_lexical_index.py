@@ -0,0 +1,116 @@
+"""
+SAHOOL RAG Lexical Index Tests
+Unit tests for the BM25 index and Arabic normalization
+"""
+
+import sys
+
+sys.path.insert(0, "packages")
+
+from advisor.rag.doc_store import DocChunk, InMemoryVectorStore
+from advisor.rag.lexical_index import BM25Index, light_stem, normalize_arabic, tokenize
+from advisor.rag.service import RAGService
+
+
+class TestArabicNormalization:
+    """Test Arabic normalization and stemming"""
+
+    def test_strips_diacritics_and_tatweel(self):
+        assert normalize_arabic("القَمْحُ") == "القمح"
+        assert normalize_arabic("قمــح") == "قمح"
+
+    def test_folds_alef_yaa_taa_marbuta(self):
+        assert normalize_arabic("إرشاد") == normalize_arabic("أرشاد") == "ارشاد"
+        assert normalize_arabic("مستوى") == "مستوي"
+        assert normalize_arabic("زراعة") == "زراعه"
+
+    def test_light_stem_strips_prefix_and_suffix(self):
+        assert light_stem("والمبيدات") == "مبيد"
+        assert light_stem("الري") == "ري"
+
+    def test_light_stem_leaves_latin_untouched(self):
+        assert light_stem("irrigation") == "irrigation"
+
+    def test_tokenize_matches_variants(self):
+        assert tokenize("بالمبيدات") == tokenize("المبيدات")
+
+
+class TestBM25Index:
+    """Test BM25 index behavior"""
+
+    def test_ranks_more_relevant_chunk_first(self):
+        index = BM25Index()
+        index.add("a", "wheat irrigation timing wheat irrigation")
+        index.add("b", "wheat fertilizer schedule")
+        index.add("c", "tomato pest control")
+
+        results = index.search("wheat irrigation", limit=5)
+
+        assert [key for key, _ in results] == ["a", "b"]
+        assert all(0 < score < 1 for _, score in results)
+
+    def test_replacement_reuses_slot(self):
+        index = BM25Index()
+        index.add("a", "wheat irrigation")
+        index.add("a", "tomato pests")
+
+        assert len(index) == 1
+        assert index.search("wheat", limit=5) == []
+        assert [key for key, _ in index.search("tomato", limit=5)] == ["a"]
+
+    def test_remove(self):
+        index = BM25Index()
+        index.add("a", "wheat irrigation")
+
+        assert index.remove("a") is True
+        assert index.remove("a") is False
+        assert index.search("wheat", limit=5) == []
+
+    def test_tenant_filter_includes_global(self):
+        index = BM25Index()
+        index.add("global", "wheat irrigation")
+        index.add("t1", "wheat irrigation", tenant_id="t1")
+        index.add("t2", "wheat irrigation", tenant_id="t2")
+
+        keys = {key for key, _ in index.search("wheat", limit=10, tenant_id="t1")}
+
+        assert keys == {"global", "t1"}
+
+    def test_category_filter(self):
+        index = BM25Index()
+        index.add("a", "wheat irrigation", category="irrigation")
+        index.add("b", "wheat irrigation", category="pests")
+
+        keys = [key for key, _ in index.search("wheat", limit=10, category="pests")]
+
+        assert keys == ["b"]
+
+    def test_arabic_query_matches_normalized_forms(self):
+        index = BM25Index()
+        index.add("a", "إرشادات الري للقمح")
+
+        assert [key for key, _ in index.search("ارشادات ري", limit=5)] == ["a"]
+
+
+class TestStoresUseIndex:
+    """Test InMemoryVectorStore and RAGService on top of the index"""
+
+    def test_vector_store_upsert_replaces_chunk(self):
+        store = InMemoryVectorStore()
+        store.upsert_chunks("kb", [DocChunk("d", "0", "wheat irrigation", {})])
+        store.upsert_chunks("kb", [DocChunk("d", "0", "tomato pests", {})])
+
+        assert store.count("kb") == 1
+        assert store.search("kb", "wheat", 5) == []
+        assert store.search("kb", "tomato", 5)[0][0].text == "tomato pests"
+
+    def test_rag_service_filters_and_deletes(self):
+        service = RAGService()
+        global_doc = service.add_document("g", "wheat irrigation guide", "manual", "irrigation")
+        service.add_document("t2", "wheat irrigation notes", "manual", "irrigation", tenant_id="t2")
+
+        results = service.search("wheat irrigation", tenant_id="t1")
+        assert [r.document.id for r in results] == [global_doc.id]
+
+        service.delete_document(global_doc.id)
+        assert service.search("wheat irrigation", tenant_id="t1") == []
@@ -0,0 +1,165 @@
+"""
+SAHOOL Audit Chain Verifier Tests
+Streaming verification, signed checkpoints, incremental and parallel runs
+"""
+
+from __future__ import annotations
+
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import create_engine, delete, update
+from sqlalchemy.orm import sessionmaker
+
+from shared.libs.audit.models import AuditCheckpoint, AuditLog, Base
+from shared.libs.audit.service import (
+    ChainHead,
+    build_audit_entry,
+    get_chain_head,
+    next_created_at,
+)
+from shared.libs.audit.verifier import ChainVerifier
+
+SIGNING_KEY = b"test-checkpoint-key"
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    # File-backed so worker processes can open their own connections
+    engine = create_engine(f"sqlite+pysqlite:///{tmp_path / 'audit.db'}")
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def append_entries(session_factory, tenant_id, count: int) -> None:
+    with session_factory() as db:
+        head = get_chain_head(db, tenant_id)
+        for i in range(count):
+            entry = build_audit_entry(
+                prev_hash=head.entry_hash,
+                created_at=next_created_at(head),
+                tenant_id=tenant_id,
+                actor_id=uuid4(),
+                actor_type="user",
+                action="field.update",
+                resource_type="field",
+                resource_id=f"field-{i}",
+                correlation_id=uuid4(),
+                details={"iteration": i},
+            )
+            db.add(entry)
+            head = ChainHead(entry.entry_hash, entry.created_at)
+        db.commit()
+
+
+def nth_entry_id(session_factory, tenant_id, index: int):
+    with session_factory() as db:
+        rows = db.query(AuditLog.id).filter(AuditLog.tenant_id == tenant_id)
+        return rows.order_by(AuditLog.created_at.asc()).offset(index).limit(1).scalar()
+
+
+class TestChainVerifier:
+    """Test streaming and checkpointed chain verification"""
+
+    def test_full_run_creates_signed_checkpoints(self, session_factory):
+        tenant_id = uuid4()
+        append_entries(session_factory, tenant_id, 250)
+
+        verifier = ChainVerifier(session_factory, SIGNING_KEY, checkpoint_interval=50)
+        result = verifier.verify(tenant_id)
+
+        assert result.is_valid, result.errors
+        assert result.entries_checked == 250
+        assert result.head.seq == 250
+        assert result.checkpoints_created == 5
+
+    def test_incremental_run_verifies_only_new_entries(self, session_factory):
+        tenant_id = uuid4()
+        append_entries(session_factory, tenant_id, 120)
+        verifier = ChainVerifier(session_factory, SIGNING_KEY, checkpoint_interval=50)
+        verifier.verify(tenant_id)
+
+        append_entries(session_factory, tenant_id, 30)
+        result = verifier.verify(tenant_id)
+
+        assert result.is_valid, result.errors
+        assert result.start.seq == 120  # the previous run anchored its head
+        assert result.entries_checked == 30
+        assert result.checkpoints_created == 1
+
+        # Nothing new since the last run
+        assert verifier.verify(tenant_id).entries_checked == 0
+
+    def test_full_run_detects_tampering_behind_checkpoint(self, session_factory):
+        tenant_id = uuid4()
+        append_entries(session_factory, tenant_id, 100)
+        verifier = ChainVerifier(session_factory, SIGNING_KEY, checkpoint_interval=50)
+        verifier.verify(tenant_id)
+
+        entry_id = nth_entry_id(session_factory, tenant_id, 10)
+        with session_factory() as db:
+            db.execute(
+                update(AuditLog).where(AuditLog.id == entry_id).values(details_json='{"x": 1}')
+            )
+            db.commit()
+
+        assert verifier.verify(tenant_id).is_valid  # behind the last checkpoint
+        result = verifier.verify(tenant_id, full=True)
+        assert not result.is_valid
+        assert any("Entry 10: entry_hash mismatch" in e for e in result.errors)
+
+    def test_forged_checkpoint_is_rejected(self, session_factory):
+        tenant_id = uuid4()
+        append_entries(session_factory, tenant_id, 100)
+        verifier = ChainVerifier(session_factory, SIGNING_KEY, checkpoint_interval=50)
+        verifier.verify(tenant_id)
+
+        with session_factory() as db:
+            db.execute(
+                update(AuditCheckpoint)
+                .where(AuditCheckpoint.seq == 100)
+                .values(entry_hash="0" * 64)
+            )
+            db.commit()
+
+        result = verifier.verify(tenant_id)
+        assert not result.is_valid
+        assert "Checkpoint at entry 99: invalid signature" in result.errors
+        assert result.checkpoints_created == 0
+
+    def test_parallel_matches_serial(self, session_factory):
+        tenant_id = uuid4()
+        append_entries(session_factory, tenant_id, 300)
+
+        serial = ChainVerifier(session_factory, SIGNING_KEY, checkpoint_interval=40)
+        parallel = ChainVerifier(session_factory, SIGNING_KEY, checkpoint_interval=40, processes=3)
+
+        first = parallel.verify(tenant_id)
+        assert first.is_valid, first.errors
+        assert first.segments == 3
+        assert first.checkpoints_created == 8  # 7 periodic + head
+
+        result = parallel.verify(tenant_id, full=True)
+        assert result.is_valid, result.errors
+        assert result.entries_checked == 300
+        assert result.head == serial.verify(tenant_id, full=True).head
+
+    def test_parallel_detects_deleted_entry(self, session_factory):
+        tenant_id = uuid4()
+        append_entries(session_factory, tenant_id, 300)
+        entry_id = nth_entry_id(session_factory, tenant_id, 150)
+        with session_factory() as db:
+            db.execute(delete(AuditLog).where(AuditLog.id == entry_id))
+            db.commit()
+
+        verifier = ChainVerifier(session_factory, SIGNING_KEY, processes=4)
+        result = verifier.verify(tenant_id)
+
+        assert not result.is_valid
+        assert result.error_count == 1
+        assert "Entry 150: prev_hash mismatch" in result.errors[0]
+
+    def test_requires_signing_key(self, session_factory):
+        with pytest.raises(ValueError):
+            ChainVerifier(session_factory, b"")
@@ -0,0 +1,173 @@
+"""
+SAHOOL Audit Writer Tests
+Group commits, cached chain heads and chain integrity under concurrency
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import defaultdict
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from shared.libs.audit.hashchain import verify_chain
+from shared.libs.audit.models import AuditLog, Base
+from shared.libs.audit.service import write_audit_log
+from shared.libs.audit.writer import AuditWriter
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def audit_fields(tenant_id, i: int = 0, **overrides) -> dict:
+    fields = {
+        "tenant_id": tenant_id,
+        "actor_id": uuid4(),
+        "actor_type": "user",
+        "action": "field.update",
+        "resource_type": "field",
+        "resource_id": f"field-{i}",
+        "correlation_id": uuid4(),
+        "details": {"iteration": i},
+    }
+    fields.update(overrides)
+    return fields
+
+
+def as_chain_dict(entry: AuditLog) -> dict:
+    return {
+        "tenant_id": entry.tenant_id,
+        "actor_id": entry.actor_id,
+        "actor_type": entry.actor_type,
+        "action": entry.action,
+        "resource_type": entry.resource_type,
+        "resource_id": entry.resource_id,
+        "correlation_id": entry.correlation_id,
+        "details_json": entry.details_json,
+        "created_at": entry.created_at.isoformat(),
+        "prev_hash": entry.prev_hash,
+        "entry_hash": entry.entry_hash,
+    }
+
+
+def stored_chain(session_factory, tenant_id) -> list[AuditLog]:
+    with session_factory() as db:
+        stmt = (
+            select(AuditLog)
+            .where(AuditLog.tenant_id == tenant_id)
+            .order_by(AuditLog.created_at.asc())
+        )
+        return list(db.execute(stmt).scalars())
+
+
+def assert_linear(rows: list[AuditLog]) -> None:
+    """Every entry points at the one before it and no two share a parent"""
+    prev_hashes = [row.prev_hash for row in rows]
+    assert len(prev_hashes) == len(set(prev_hashes))
+    assert rows[0].prev_hash is None
+    for prev, row in zip(rows, rows[1:], strict=False):
+        assert row.prev_hash == prev.entry_hash
+
+
+class TestAuditWriter:
+    """Test the group-commit audit writer"""
+
+    async def test_concurrent_writers_never_fork_the_chain(self, session_factory):
+        writer = AuditWriter(session_factory, max_batch_size=50)
+        tenants = [uuid4() for _ in range(3)]
+
+        async def request(worker: int) -> list[AuditLog]:
+            written = []
+            for i in range(10):
+                tenant_id = tenants[(worker + i) % len(tenants)]
+                written.append(await writer.write(**audit_fields(tenant_id, i)))
+            return written
+
+        results = await asyncio.gather(*(request(w) for w in range(64)))
+        await writer.close()
+
+        by_tenant = defaultdict(list)
+        for entry in (e for written in results for e in written):
+            by_tenant[entry.tenant_id].append(entry)
+
+        for tenant_id in tenants:
+            rows = stored_chain(session_factory, tenant_id)
+            assert len(rows) == len(by_tenant[tenant_id])
+            assert_linear(rows)
+
+            entries = sorted(by_tenant[tenant_id], key=lambda e: e.created_at)
+            is_valid, errors = verify_chain(iter(as_chain_dict(e) for e in entries))
+            assert is_valid, errors
+
+        assert writer.stats.entries == 640
+        assert writer.stats.batches < 640
+
+    async def test_continues_existing_chain(self, session_factory):
+        tenant_id = uuid4()
+        with session_factory() as db:
+            first = write_audit_log(db, **audit_fields(tenant_id))
+            db.commit()
+            first_hash = first.entry_hash
+
+        writer = AuditWriter(session_factory)
+        second = await writer.write(**audit_fields(tenant_id, 1))
+        await writer.close()
+
+        assert second.prev_hash == first_hash
+        assert_linear(stored_chain(session_factory, tenant_id))
+
+    async def test_bad_entry_does_not_fail_its_batch(self, session_factory):
+        tenant_id = uuid4()
+        writer = AuditWriter(session_factory, max_wait_ms=20)
+
+        futures = [
+            await writer.submit(**audit_fields(tenant_id, 0)),
+            await writer.submit(**audit_fields(tenant_id, 1, details={"bad": object()})),
+            await writer.submit(**audit_fields(tenant_id, 2)),
+        ]
+        results = await asyncio.gather(*futures, return_exceptions=True)
+        await writer.close()
+
+        assert isinstance(results[1], TypeError)
+        assert writer.stats.failed == 1
+        rows = stored_chain(session_factory, tenant_id)
+        assert [row.resource_id for row in rows] == ["field-0", "field-2"]
+        assert_linear(rows)
+
+    async def test_close_flushes_submitted_entries(self, session_factory):
+        tenant_id = uuid4()
+        writer = AuditWriter(session_factory)
+
+        for i in range(5):
+            await writer.submit(**audit_fields(tenant_id, i))
+        await writer.close()
+
+        assert len(stored_chain(session_factory, tenant_id)) == 5
+
+
+class TestWriteAuditLog:
+    """Test the synchronous single-entry path"""
+
+    def test_entry_hash_is_final_on_insert(self, session_factory):
+        tenant_id = uuid4()
+        with session_factory() as db:
+            entries = [write_audit_log(db, **audit_fields(tenant_id, i)) for i in range(3)]
+            chain = [as_chain_dict(e) for e in entries]
+            db.commit()
+
+        is_valid, errors = verify_chain(iter(chain))
+        assert is_valid, errors
+        assert_linear(stored_chain(session_factory, tenant_id))
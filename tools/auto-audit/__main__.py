@@ -18,6 +18,7 @@ Commands:
 Examples:
     python -m tools.auto-audit analyze -i logs.json -t tenant-123
     python -m tools.auto-audit validate -i logs.json --recovery
+    python -m tools.auto-audit validate --database-url $DATABASE_URL -t <uuid> --processes 8
     python -m tools.auto-audit compliance -i logs.json -f gdpr
     python -m tools.auto-audit detect -i logs.json -t tenant-123
     python -m tools.auto-audit export -i logs.json -f csv -o audit.csv
@@ -92,6 +93,34 @@ def cmd_analyze(args: argparse.Namespace) -> int:
     return 0
 
 
+def _validate_database(validator, args: argparse.Namespace):
+    """Validate a tenant chain from the database with signed checkpoints"""
+    import os
+    from uuid import UUID
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    signing_key = os.getenv("AUDIT_CHECKPOINT_KEY", "")
+    if not args.tenant_id or not signing_key:
+        print("Database validation needs --tenant-id and AUDIT_CHECKPOINT_KEY")
+        return None
+
+    mode = "full" if args.full else "since last checkpoint"
+    print(f"Validating hash chain for tenant {args.tenant_id} ({mode})...")
+    engine = create_engine(args.database_url)
+    try:
+        return validator.validate_database(
+            sessionmaker(bind=engine),
+            UUID(args.tenant_id),
+            signing_key.encode("utf-8"),
+            full=args.full,
+            processes=args.processes,
+        )
+    finally:
+        engine.dispose()
+
+
 def cmd_validate(args: argparse.Namespace) -> int:
     """Run hash chain validator"""
     from .hashchain_validator import (
@@ -99,12 +128,17 @@ def cmd_validate(args: argparse.Namespace) -> int:
         generate_markdown_report,
     )
 
-    print(f"Loading audit logs from: {args.input}")
     validator = HashChainValidator()
-    validator.load_from_file(Path(args.input))
+    if args.database_url:
+        report = _validate_database(validator, args)
+        if report is None:
+            return 2
+    else:
+        print(f"Loading audit logs from: {args.input}")
+        validator.load_from_file(Path(args.input))
 
-    print(f"Validating hash chain for {len(validator.entries):,} entries...")
-    report = validator.validate(tenant_id=args.tenant_id)
+        print(f"Validating hash chain for {len(validator.entries):,} entries...")
+        report = validator.validate(tenant_id=args.tenant_id)
 
     # Generate output
     if args.format == "json":
@@ -529,8 +563,18 @@ Examples:
 
     # Validate command
     validate_parser = subparsers.add_parser("validate", help="Verify hash chain integrity")
-    validate_parser.add_argument("--input", "-i", required=True, help="Input JSON file")
+    validate_source = validate_parser.add_mutually_exclusive_group(required=True)
+    validate_source.add_argument("--input", "-i", help="Input JSON file")
+    validate_source.add_argument(
+        "--database-url", help="Stream the chain from this database (needs --tenant-id)"
+    )
     validate_parser.add_argument("--tenant-id", "-t", help="Filter by tenant ID")
+    validate_parser.add_argument(
+        "--full", action="store_true", help="Database: re-verify from the first entry"
+    )
+    validate_parser.add_argument(
+        "--processes", type=int, default=1, help="Database: parallel verifier processes"
+    )
     validate_parser.add_argument(
         "--output", "-o", default="hashchain_validation.md", help="Output file"
     )
@@ -117,13 +117,31 @@ class HashChainValidator:
         start_date: datetime | None = None,
         end_date: datetime | None = None,
     ) -> None:
-        """Load entries from database in chronological order"""
+        """
+        Load entries from database in chronological order.
+
+        Rows are streamed, but the validator still keeps every entry in
+        memory; use validate_database() for full tenant chains.
+        """
         from sqlalchemy import select
 
         from shared.libs.audit.models import AuditLog
 
         stmt = (
-            select(AuditLog)
+            select(
+                AuditLog.id,
+                AuditLog.tenant_id,
+                AuditLog.actor_id,
+                AuditLog.actor_type,
+                AuditLog.action,
+                AuditLog.resource_type,
+                AuditLog.resource_id,
+                AuditLog.correlation_id,
+                AuditLog.details_json,
+                AuditLog.prev_hash,
+                AuditLog.entry_hash,
+                AuditLog.created_at,
+            )
             .where(AuditLog.tenant_id == tenant_id)
             .order_by(AuditLog.created_at.asc())
         )
@@ -133,11 +151,88 @@ class HashChainValidator:
         if end_date:
             stmt = stmt.where(AuditLog.created_at <= end_date)
 
-        results = db_session.execute(stmt).scalars()
-        self.entries = [self._entry_to_dict(entry) for entry in results]
+        results = db_session.execute(stmt.execution_options(yield_per=10000))
+        self.entries = [self._entry_to_dict(row) for row in results]
+
+    def validate_database(
+        self,
+        session_factory: Any,
+        tenant_id: UUID,
+        signing_key: bytes,
+        *,
+        full: bool = False,
+        processes: int = 1,
+        checkpoint_interval: int = 100000,
+    ) -> ValidationReport:
+        """
+        Validate a tenant chain straight from the database.
+
+        Streams the chain in bounded memory through ChainVerifier. Only
+        entries after the last signed checkpoint are verified unless
+        ``full`` is set; ``processes`` verifies segments in parallel.
+
+        Args:
+            session_factory: Callable returning a new SQLAlchemy Session
+            tenant_id: Tenant UUID
+            signing_key: Checkpoint signing key
+            full: Re-verify the whole chain
+            processes: Worker processes
+            checkpoint_interval: Entries between checkpoints
+
+        Returns:
+            ValidationReport (without forensic entry analysis)
+        """
+        from shared.libs.audit.verifier import ChainVerifier
+
+        verifier = ChainVerifier(
+            session_factory,
+            signing_key,
+            checkpoint_interval=checkpoint_interval,
+            processes=processes,
+        )
+        result = verifier.verify(tenant_id, full=full)
+
+        report = ValidationReport(
+            tenant_id=str(tenant_id),
+            total_entries=result.head.seq,
+            validated_entries=result.entries_checked,
+            is_valid=result.is_valid,
+            last_entry_id=str(result.head.entry_id) if result.head.entry_id else None,
+            last_entry_hash=result.head.entry_hash,
+            validation_duration_ms=result.duration_ms,
+            hash_computations=result.entries_checked,
+        )
+        report.errors = [self._error_from_message(message) for message in result.errors]
+        report.chain_breaks_detected = sum(
+            1 for e in report.errors if e.error_type == "chain_break"
+        )
+        report.tamper_indicators = sum(1 for e in report.errors if e.error_type == "hash_mismatch")
+        if result.entries_checked:
+            valid_links = result.entries_checked - min(result.error_count, result.entries_checked)
+            report.chain_integrity = round(valid_links / result.entries_checked * 100, 2)
+        return report
+
+    @staticmethod
+    def _error_from_message(message: str) -> ValidationError:
+        """Convert a ChainVerifier error message to a ValidationError"""
+        index_text, _, description = message.partition(": ")
+        index = index_text.rsplit(" ", 1)[-1]
+        if "entry_hash mismatch" in description:
+            error_type = "hash_mismatch"
+        elif "prev_hash mismatch" in description:
+            error_type = "chain_break"
+        else:
+            error_type = "sequence_error"
+        return ValidationError(
+            entry_index=int(index) if index.lstrip("-").isdigit() else -1,
+            entry_id="unknown",
+            error_type=error_type,
+            severity="critical",
+            description=message,
+        )
 
     def _entry_to_dict(self, entry: Any) -> dict:
-        """Convert ORM entry to dictionary"""
+        """Convert ORM entry or row to dictionary"""
         return {
             "id": str(entry.id),
             "tenant_id": str(entry.tenant_id),